@@ -0,0 +1,46 @@
+"""Platform metrics daily rollup table.
+
+Revision ID: 053
+Revises: 052
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "053"
+down_revision = "052"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "platform_metrics_daily",
+        sa.Column("metric_date", sa.Date, primary_key=True),
+        sa.Column("signups", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("total_users", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("active_users", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("mrr", sa.Float, nullable=False, server_default="0"),
+        sa.Column("mrr_by_plan", postgresql.JSON, nullable=False, server_default="{}"),
+        sa.Column("active_subscriptions", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("churned_subscriptions", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("new_streams", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("total_streams", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("new_videos", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("total_videos", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("computed_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+    # Support the grouped-by-day rollup and cohort queries
+    op.create_index("ix_users_created_at", "users", ["created_at"])
+    op.create_index("ix_users_last_login_at", "users", ["last_login_at"])
+    op.create_index("ix_subscriptions_canceled_at", "subscriptions", ["canceled_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_subscriptions_canceled_at", table_name="subscriptions")
+    op.drop_index("ix_users_last_login_at", table_name="users")
+    op.drop_index("ix_users_created_at", table_name="users")
+    op.drop_table("platform_metrics_daily")
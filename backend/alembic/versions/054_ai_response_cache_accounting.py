@@ -0,0 +1,42 @@
+"""AI response cache accounting columns.
+
+Revision ID: 054
+Revises: 053
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "054"
+down_revision = "053"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "ai_logs",
+        sa.Column("cache_hit", sa.Boolean, nullable=False, server_default=sa.false()),
+    )
+    op.add_column(
+        "ai_logs",
+        sa.Column("tokens_saved", sa.Integer, nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "ai_logs",
+        sa.Column("cost_saved_usd", sa.Float, nullable=False, server_default="0"),
+    )
+    op.create_index("ix_ai_logs_cache_hit", "ai_logs", ["cache_hit"])
+    op.add_column(
+        "ai_user_preferences",
+        sa.Column("disable_response_cache", sa.Boolean, nullable=False, server_default=sa.false()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("ai_user_preferences", "disable_response_cache")
+    op.drop_index("ix_ai_logs_cache_hit", table_name="ai_logs")
+    op.drop_column("ai_logs", "cost_saved_usd")
+    op.drop_column("ai_logs", "tokens_saved")
+    op.drop_column("ai_logs", "cache_hit")
@@ -0,0 +1,58 @@
+"""Resumable upload sessions.
+
+Revision ID: 055
+Revises: 054
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+revision = "055"
+down_revision = "054"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "upload_sessions",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column(
+            "user_id",
+            UUID(as_uuid=True),
+            sa.ForeignKey("users.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("filename", sa.String(255), nullable=False),
+        sa.Column("content_type", sa.String(100), nullable=True),
+        sa.Column("upload_length", sa.BigInteger, nullable=False),
+        sa.Column("upload_offset", sa.BigInteger, nullable=False, server_default="0"),
+        sa.Column("backend", sa.String(20), nullable=False),
+        sa.Column("temp_path", sa.String(1024), nullable=True),
+        sa.Column("storage_key", sa.String(1024), nullable=True),
+        sa.Column("multipart_upload_id", sa.String(1024), nullable=True),
+        sa.Column("parts", sa.JSON, nullable=False, server_default="[]"),
+        sa.Column("upload_metadata", sa.JSON, nullable=False, server_default="{}"),
+        sa.Column("status", sa.String(20), nullable=False, server_default="active"),
+        sa.Column(
+            "video_id",
+            UUID(as_uuid=True),
+            sa.ForeignKey("videos.id", ondelete="SET NULL"),
+            nullable=True,
+        ),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_upload_sessions_user_id", "upload_sessions", ["user_id"])
+    op.create_index("ix_upload_sessions_status", "upload_sessions", ["status"])
+    op.create_index("ix_upload_sessions_expires_at", "upload_sessions", ["expires_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_upload_sessions_expires_at", table_name="upload_sessions")
+    op.drop_index("ix_upload_sessions_status", table_name="upload_sessions")
+    op.drop_index("ix_upload_sessions_user_id", table_name="upload_sessions")
+    op.drop_table("upload_sessions")
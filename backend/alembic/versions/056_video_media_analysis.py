@@ -0,0 +1,26 @@
+"""Cached media analysis on videos.
+
+Revision ID: 056
+Revises: 055
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "056"
+down_revision = "055"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("videos", sa.Column("content_hash", sa.String(64), nullable=True))
+    op.add_column("videos", sa.Column("media_analysis", sa.JSON, nullable=True))
+    op.create_index("ix_videos_content_hash", "videos", ["content_hash"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_videos_content_hash", table_name="videos")
+    op.drop_column("videos", "media_analysis")
+    op.drop_column("videos", "content_hash")
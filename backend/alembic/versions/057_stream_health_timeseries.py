@@ -0,0 +1,168 @@
+"""Partitioned stream health samples with 1-minute and 1-hour rollups.
+
+stream_job_health and stream_health_logs become daily range partitions on
+collected_at. New stream_health_1m (daily partitions) and stream_health_1h
+(monthly partitions) tables hold min/avg/max rollups. Existing samples are
+rolled up into both tiers; only the raw retention window is copied into the
+partitioned tables.
+
+Revision ID: 057
+Revises: 056
+Create Date: 2026-10-18
+"""
+
+from datetime import date, datetime, timedelta
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "057"
+down_revision = "056"
+branch_labels = None
+depends_on = None
+
+# Defaults of STREAM_HEALTH_*; later partitions come from the maintenance task
+RAW_RETENTION_DAYS = 2
+MINUTE_RETENTION_DAYS = 30
+HOUR_RETENTION_MONTHS = 13
+AHEAD_DAYS = 7
+
+# table, series column, rollup source, fps column, cpu/memory expressions, alert condition
+RAW_TABLES = (
+    ("stream_job_health", "stream_job_id", "stream_job", "fps",
+     "max(cpu_percent)", "max(memory_mb)", "alert_type IS NOT NULL",
+     "stream_jobs"),
+    ("stream_health_logs", "session_id", "stream_session", "frame_rate",
+     "CAST(NULL AS FLOAT)", "CAST(NULL AS FLOAT)", "is_alert_triggered",
+     "stream_sessions"),
+)
+
+ROLLUP_COLUMNS = (
+    "source, series_id, bucket_start, samples, bitrate_min, bitrate_max, bitrate_sum, "
+    "fps_samples, fps_min, fps_max, fps_sum, dropped_frames_min, dropped_frames_max, "
+    "dropped_frames_sum, cpu_percent_max, memory_mb_max, alert_count"
+)
+
+
+def _days(start: date, end: date):
+    day = start
+    while day <= end:
+        yield day, day + timedelta(days=1)
+        day += timedelta(days=1)
+
+
+def _months(start: date, end: date):
+    month = start.replace(day=1)
+    while month <= end:
+        following = (month.replace(day=28) + timedelta(days=4)).replace(day=1)
+        yield month, following
+        month = following
+
+
+def _create_partitions(table: str, ranges, monthly: bool, aware: bool, parent: str = None) -> None:
+    suffix = "+00" if aware else ""
+    for start, end in ranges:
+        name = f"{table}_p{start.strftime('%Y%m' if monthly else '%Y%m%d')}"
+        op.execute(
+            f"CREATE TABLE {name} PARTITION OF {parent or table} "
+            f"FOR VALUES FROM ('{start} 00:00:00{suffix}') TO ('{end} 00:00:00{suffix}')"
+        )
+
+
+def _create_rollup_table(name: str) -> None:
+    op.create_table(
+        name,
+        sa.Column("source", sa.String(20), nullable=False),
+        sa.Column("series_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("bucket_start", sa.DateTime(timezone=False), nullable=False),
+        sa.Column("samples", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("bitrate_min", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("bitrate_max", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("bitrate_sum", sa.BigInteger, nullable=False, server_default="0"),
+        sa.Column("fps_samples", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("fps_min", sa.Float, nullable=True),
+        sa.Column("fps_max", sa.Float, nullable=True),
+        sa.Column("fps_sum", sa.Float, nullable=False, server_default="0"),
+        sa.Column("dropped_frames_min", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("dropped_frames_max", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("dropped_frames_sum", sa.BigInteger, nullable=False, server_default="0"),
+        sa.Column("cpu_percent_max", sa.Float, nullable=True),
+        sa.Column("memory_mb_max", sa.Float, nullable=True),
+        sa.Column("alert_count", sa.Integer, nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("source", "series_id", "bucket_start", name=f"{name}_pkey"),
+        postgresql_partition_by="RANGE (bucket_start)",
+    )
+
+
+def upgrade() -> None:
+    today = datetime.utcnow().date()
+    last_day = today + timedelta(days=AHEAD_DAYS)
+    raw_start = today - timedelta(days=RAW_RETENTION_DAYS)
+    minute_start = today - timedelta(days=MINUTE_RETENTION_DAYS)
+    hour_start = (today.replace(day=1) - timedelta(days=31 * (HOUR_RETENTION_MONTHS - 1))).replace(day=1)
+    upper = f"'{last_day + timedelta(days=1)} 00:00:00+00'"
+
+    # Rollup tiers
+    _create_rollup_table("stream_health_1m")
+    _create_partitions("stream_health_1m", _days(minute_start, last_day), monthly=False, aware=False)
+    _create_rollup_table("stream_health_1h")
+    _create_partitions("stream_health_1h", _months(hour_start, last_day), monthly=True, aware=False)
+
+    for table, series, source, fps, cpu, memory, alert, parent in RAW_TABLES:
+        # Roll existing samples up before the raw history is trimmed
+        for rollup, unit, since in (
+            ("stream_health_1m", "minute", minute_start),
+            ("stream_health_1h", "hour", hour_start),
+        ):
+            op.execute(f"""
+                INSERT INTO {rollup} ({ROLLUP_COLUMNS})
+                SELECT '{source}', {series}, date_trunc('{unit}', timezone('UTC', collected_at)),
+                       count(*), min(bitrate), max(bitrate), sum(bitrate),
+                       count({fps}), min({fps}), max({fps}), coalesce(sum({fps}), 0),
+                       min(dropped_frames_delta), max(dropped_frames_delta), sum(dropped_frames_delta),
+                       {cpu}, {memory}, count(*) FILTER (WHERE {alert})
+                FROM {table}
+                WHERE collected_at >= '{since} 00:00:00+00' AND collected_at < {upper}
+                GROUP BY 2, 3
+            """)
+
+        # Partitioned copy of the raw table holding the retention window
+        staging = f"{table}_partitioned"
+        op.execute(
+            f"CREATE TABLE {staging} (LIKE {table} INCLUDING DEFAULTS) "
+            f"PARTITION BY RANGE (collected_at)"
+        )
+        _create_partitions(table, _days(raw_start, last_day), monthly=False, aware=True, parent=staging)
+        op.execute(f"""
+            INSERT INTO {staging}
+            SELECT * FROM {table}
+            WHERE collected_at >= '{raw_start} 00:00:00+00' AND collected_at < {upper}
+        """)
+        op.execute(f"DROP TABLE {table}")
+        op.execute(f"ALTER TABLE {staging} RENAME TO {table}")
+        op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id, collected_at)")
+        op.execute(
+            f"ALTER TABLE {table} ADD CONSTRAINT {table}_{series}_fkey "
+            f"FOREIGN KEY ({series}) REFERENCES {parent} (id) ON DELETE CASCADE"
+        )
+        op.create_index(f"ix_{table}_{series}_collected_at", table, [series, "collected_at"])
+
+
+def downgrade() -> None:
+    for table, series, source, fps, cpu, memory, alert, parent in RAW_TABLES:
+        plain = f"{table}_plain"
+        op.execute(f"CREATE TABLE {plain} (LIKE {table} INCLUDING DEFAULTS)")
+        op.execute(f"INSERT INTO {plain} SELECT * FROM {table}")
+        op.execute(f"DROP TABLE {table} CASCADE")
+        op.execute(f"ALTER TABLE {plain} RENAME TO {table}")
+        op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id)")
+        op.execute(
+            f"ALTER TABLE {table} ADD CONSTRAINT {table}_{series}_fkey "
+            f"FOREIGN KEY ({series}) REFERENCES {parent} (id) ON DELETE CASCADE"
+        )
+        op.create_index(f"ix_{table}_{series}", table, [series])
+        op.create_index(f"ix_{table}_collected_at", table, ["collected_at"])
+
+    op.execute("DROP TABLE stream_health_1h CASCADE")
+    op.execute("DROP TABLE stream_health_1m CASCADE")
@@ -0,0 +1,43 @@
+"""Stream-ready renditions of library videos.
+
+Revision ID: 058
+Revises: 057
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+revision = "058"
+down_revision = "057"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "stream_renditions",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column(
+            "video_id",
+            UUID(as_uuid=True),
+            sa.ForeignKey("videos.id", ondelete="CASCADE"),
+            nullable=True,
+        ),
+        sa.Column("source_key", sa.String(512), nullable=False),
+        sa.Column("spec_key", sa.String(64), nullable=False),
+        sa.Column("storage_key", sa.String(512), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False, server_default="pending"),
+        sa.Column("size_bytes", sa.BigInteger, nullable=True),
+        sa.Column("error", sa.Text, nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.UniqueConstraint("source_key", "spec_key", name="uq_stream_renditions_source_spec"),
+    )
+    op.create_index("ix_stream_renditions_video_id", "stream_renditions", ["video_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_stream_renditions_video_id", table_name="stream_renditions")
+    op.drop_table("stream_renditions")
@@ -0,0 +1,24 @@
+"""Streaming node that owns a stream job's FFmpeg process.
+
+Revision ID: 059
+Revises: 058
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "059"
+down_revision = "058"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("stream_jobs", sa.Column("node_id", sa.String(255), nullable=True))
+    op.create_index("ix_stream_jobs_node_id", "stream_jobs", ["node_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_stream_jobs_node_id", table_name="stream_jobs")
+    op.drop_column("stream_jobs", "node_id")
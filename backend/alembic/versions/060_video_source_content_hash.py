@@ -0,0 +1,29 @@
+"""Source content hash on videos.
+
+Converted uploads are stored as a new MP4, so the media analysis cache
+also keys them by the hash of the bytes that were uploaded.
+
+Revision ID: 060
+Revises: 059
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "060"
+down_revision = "059"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("videos", sa.Column("source_content_hash", sa.String(64), nullable=True))
+    op.add_column("videos", sa.Column("source_media_analysis", sa.JSON, nullable=True))
+    op.create_index("ix_videos_source_content_hash", "videos", ["source_content_hash"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_videos_source_content_hash", table_name="videos")
+    op.drop_column("videos", "source_media_analysis")
+    op.drop_column("videos", "source_content_hash")
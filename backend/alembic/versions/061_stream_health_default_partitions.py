@@ -0,0 +1,29 @@
+"""DEFAULT partitions for stream health tables.
+
+Partitions are created a week ahead by the hourly maintenance task; a
+DEFAULT partition keeps inserts working if that task stalls for longer.
+Maintenance moves its rows into the proper partition once it exists.
+
+Revision ID: 061
+Revises: 060
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+revision = "061"
+down_revision = "060"
+branch_labels = None
+depends_on = None
+
+TABLES = ("stream_job_health", "stream_health_logs", "stream_health_1m", "stream_health_1h")
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.execute(f"DROP TABLE {table}_default")
@@ -1,7 +1,15 @@
 """Celery application configuration."""
 
 from celery import Celery
+from celery.signals import worker_init, worker_process_init, worker_process_shutdown, worker_shutdown
+from kombu import Queue
 
+from app.core.celery_queues import (
+    BROKER_TRANSPORT_OPTIONS,
+    BULK_QUEUE,
+    MONITORED_QUEUES,
+    route_task,
+)
 from app.core.config import settings
 
 celery_app = Celery(
@@ -17,12 +25,20 @@ celery_app.conf.update(
     timezone="UTC",
     enable_utc=True,
     task_track_started=True,
+    # Task events feed the cluster health collector
+    worker_send_task_events=True,
     task_time_limit=3600,
     worker_prefetch_multiplier=1,
     task_acks_late=True,
     task_reject_on_worker_lost=True,
     # Fix Celery 6.0 deprecation warning
     broker_connection_retry_on_startup=True,
+    # Queues and routing (see app.core.celery_queues). A worker started
+    # without -Q consumes every queue, as a single dev worker should.
+    task_queues=[Queue(name) for name in MONITORED_QUEUES],
+    task_default_queue=BULK_QUEUE,
+    task_routes=(route_task,),
+    broker_transport_options=BROKER_TRANSPORT_OPTIONS,
     # Periodic tasks schedule
     beat_schedule={
         "sync-video-stats-hourly": {
@@ -33,6 +49,10 @@ celery_app.conf.update(
             "task": "app.modules.video.tasks.check_scheduled_publishes",
             "schedule": 60.0,  # Every minute
         },
+        "cleanup-expired-uploads": {
+            "task": "app.modules.video.tasks.cleanup_expired_upload_sessions",
+            "schedule": 3600.0,  # Every hour
+        },
         # Stream Job Tasks (Video-to-Live Streaming)
         "check-scheduled-streams": {
             "task": "app.modules.stream.stream_job_tasks.check_scheduled_streams",
@@ -42,11 +62,29 @@ celery_app.conf.update(
             "task": "app.modules.stream.stream_job_tasks.collect_health_metrics",
             "schedule": 10.0,  # Every 10 seconds
         },
+        "rollup-stream-health-metrics": {
+            "task": "app.modules.stream.stream_job_tasks.rollup_health_metrics",
+            "schedule": 60.0,  # Every minute; raw samples -> 1m -> 1h
+        },
+        "maintain-stream-health-partitions": {
+            "task": "app.modules.stream.stream_job_tasks.maintain_health_partitions",
+            "schedule": 3600.0,  # Hourly; retention is a partition drop
+        },
         # Analytics Sync Tasks
         "sync-analytics-daily": {
             "task": "app.modules.analytics.tasks.sync_all_accounts_analytics",
             "schedule": 7200.0,  # Every 2 hours (YouTube data updates every few hours)
         },
+        # Admin Analytics Rollups
+        "rollup-platform-metrics": {
+            "task": "app.modules.admin.tasks.rollup_platform_metrics",
+            "schedule": 3600.0,  # Hourly; only re-computes from the last stored day
+        },
+        # Notification outbox (catches lost or failed deliveries)
+        "sweep-notification-outbox": {
+            "task": "app.modules.notification.tasks.sweep_notification_outbox",
+            "schedule": 30.0,  # Every 30 seconds, well inside the 60s SLA
+        },
     },
 )
 
@@ -59,4 +97,50 @@ celery_app.autodiscover_tasks([
     "app.modules.backup",
     "app.modules.analytics",
     "app.modules.integration",
+    "app.modules.admin",
+    "app.modules.notification",
 ])
+
+
+def _runs_tasks_in_threads(worker) -> bool:
+    """Whether the worker runs tasks in its own process rather than in forked children."""
+    from celery.concurrency import get_implementation
+    from celery.concurrency.solo import TaskPool as SoloPool
+    from celery.concurrency.thread import TaskPool as ThreadPool
+
+    return get_implementation(worker.pool_cls) in (ThreadPool, SoloPool)
+
+
+@worker_init.connect
+def _start_shared_task_loop(sender=None, **kwargs):
+    """Give a threads (or solo) worker one event loop and DB pool for all its tasks.
+
+    These pools fork no children, so worker_process_init never fires, and
+    they do not enforce task_time_limit, so the loop does.
+    """
+    if sender is not None and _runs_tasks_in_threads(sender):
+        from app.core.task_loop import start_task_loop
+
+        start_task_loop(time_limit=celery_app.conf.task_time_limit)
+
+
+@worker_shutdown.connect
+def _stop_shared_task_loop(**kwargs):
+    from app.core.task_loop import stop_task_loop
+
+    stop_task_loop()
+
+
+@worker_process_init.connect
+def _start_task_loop(**kwargs):
+    """Give each prefork child one event loop and DB pool for its tasks."""
+    from app.core.task_loop import start_task_loop
+
+    start_task_loop()
+
+
+@worker_process_shutdown.connect
+def _stop_task_loop(**kwargs):
+    from app.core.task_loop import stop_task_loop
+
+    stop_task_loop()
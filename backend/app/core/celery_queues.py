@@ -0,0 +1,143 @@
+"""Celery queue topology, task routing and priorities.
+
+Tasks are routed by name to one of four queues, each served by its own
+workers with a pool that suits the work:
+
+- ``realtime``: stream lifecycle and health. Short tasks that decide when
+  a stream goes live; prefork workers kept free of anything slow
+- ``io``: YouTube API calls, webhooks and notifications. Mostly waiting on
+  the network; a threads pool with high concurrency
+- ``media``: FFmpeg encodes that hold a CPU for minutes to hours; prefork
+  with one process per core it may use
+- ``bulk``: analytics syncs, rollups, cleanups and anything unrouted;
+  prefork with low concurrency
+
+A backlog in one queue cannot delay another. Within a queue, messages run
+by priority: the Redis transport keeps one list per priority step and
+serves the lowest number first. Every route sets a priority, and callers
+can pass ``priority=`` to ``apply_async`` to override it.
+"""
+
+from enum import IntEnum
+from fnmatch import fnmatchcase
+from typing import Iterable, Optional
+
+
+REALTIME_QUEUE = "realtime"
+IO_QUEUE = "io"
+MEDIA_QUEUE = "media"
+BULK_QUEUE = "bulk"
+TASK_QUEUES = (REALTIME_QUEUE, IO_QUEUE, MEDIA_QUEUE, BULK_QUEUE)
+
+# Celery's default queue. Bulk workers drain it, so tasks queued before
+# routing was enabled still run.
+LEGACY_QUEUE = "celery"
+MONITORED_QUEUES = TASK_QUEUES + (LEGACY_QUEUE,)
+
+
+class TaskPriority(IntEnum):
+    """Priority of a task within its queue; lower runs first."""
+
+    CRITICAL = 0
+    HIGH = 3
+    NORMAL = 5
+    LOW = 8
+
+
+# One Redis list per priority, named "<queue>:<priority>" (priority 0 uses
+# the queue's own name)
+PRIORITY_STEPS = list(range(10))
+PRIORITY_SEPARATOR = ":"
+
+BROKER_TRANSPORT_OPTIONS = {
+    "priority_steps": PRIORITY_STEPS,
+    "sep": PRIORITY_SEPARATOR,
+}
+
+_STREAM_JOBS = "app.modules.stream.stream_job_tasks"
+_STREAMS = "app.modules.stream.tasks"
+_VIDEOS = "app.modules.video.tasks"
+
+# (task name pattern, queue, priority); the first match wins
+TASK_ROUTES: tuple[tuple[str, str, TaskPriority], ...] = (
+    # Stream lifecycle: a scheduled stream has to go live on time
+    (f"{_STREAM_JOBS}.start_ffmpeg_worker", REALTIME_QUEUE, TaskPriority.CRITICAL),
+    (f"{_STREAM_JOBS}.stop_ffmpeg_worker", REALTIME_QUEUE, TaskPriority.CRITICAL),
+    (f"{_STREAM_JOBS}.restart_ffmpeg_worker", REALTIME_QUEUE, TaskPriority.HIGH),
+    (f"{_STREAMS}.start_stream_task", REALTIME_QUEUE, TaskPriority.CRITICAL),
+    (f"{_STREAMS}.stop_stream_task", REALTIME_QUEUE, TaskPriority.CRITICAL),
+    (f"{_STREAMS}.trigger_stream_failover", REALTIME_QUEUE, TaskPriority.CRITICAL),
+    (f"{_STREAMS}.restart_stream_task", REALTIME_QUEUE, TaskPriority.HIGH),
+    (f"{_STREAMS}.attempt_stream_reconnection", REALTIME_QUEUE, TaskPriority.HIGH),
+    (f"{_STREAMS}.handle_stream_disconnection", REALTIME_QUEUE, TaskPriority.HIGH),
+    # Encodes
+    (f"{_STREAM_JOBS}.prepare_stream_renditions", MEDIA_QUEUE, TaskPriority.NORMAL),
+    (f"{_VIDEOS}.process_library_upload_task", MEDIA_QUEUE, TaskPriority.NORMAL),
+    ("app.modules.transcoding.tasks.transcode_*", MEDIA_QUEUE, TaskPriority.NORMAL),
+    # Stream work that talks to YouTube or storage rather than FFmpeg
+    (f"{_STREAM_JOBS}.prefetch_stream_sources", IO_QUEUE, TaskPriority.HIGH),
+    (f"{_STREAM_JOBS}.auto_detect_and_start_moderation", IO_QUEUE, TaskPriority.HIGH),
+    # Stream housekeeping
+    (f"{_STREAM_JOBS}.rollup_health_metrics", BULK_QUEUE, TaskPriority.NORMAL),
+    (f"{_STREAM_JOBS}.maintain_health_partitions", BULK_QUEUE, TaskPriority.LOW),
+    (f"{_STREAMS}.cleanup_old_health_logs", BULK_QUEUE, TaskPriority.LOW),
+    # Schedule checks, health collection and alerts
+    ("app.modules.stream.*", REALTIME_QUEUE, TaskPriority.NORMAL),
+    # Video batch work
+    (f"{_VIDEOS}.sync_all_video_stats", BULK_QUEUE, TaskPriority.LOW),
+    (f"{_VIDEOS}.process_bulk_upload_task", BULK_QUEUE, TaskPriority.NORMAL),
+    (f"{_VIDEOS}.cleanup_expired_upload_sessions", BULK_QUEUE, TaskPriority.LOW),
+    # Uploads, publishing and other YouTube API calls
+    ("app.modules.video.*", IO_QUEUE, TaskPriority.NORMAL),
+    ("app.modules.notification.*", IO_QUEUE, TaskPriority.HIGH),
+    ("app.modules.integration.*", IO_QUEUE, TaskPriority.NORMAL),
+)
+
+DEFAULT_ROUTE = (BULK_QUEUE, TaskPriority.NORMAL)
+
+
+def route_for(name: str) -> tuple[str, TaskPriority]:
+    """Queue and priority of a task, by its name."""
+    for pattern, queue, priority in TASK_ROUTES:
+        if fnmatchcase(name, pattern):
+            return queue, priority
+    return DEFAULT_ROUTE
+
+
+def route_task(name, args, kwargs, options, task=None, **kw) -> dict:
+    """Celery router (``task_routes``) for ``route_for``.
+
+    Options given to ``apply_async`` take precedence over the route.
+    """
+    queue, priority = route_for(name)
+    return {"queue": queue, "priority": int(priority)}
+
+
+def queue_keys(queue: str) -> list[str]:
+    """The Redis lists holding a queue's messages, highest priority first."""
+    return [queue] + [f"{queue}{PRIORITY_SEPARATOR}{step}" for step in PRIORITY_STEPS if step]
+
+
+# Length of every list in KEYS, in one round trip
+_QUEUE_DEPTH_SCRIPT = """
+local depths = {}
+for i, key in ipairs(KEYS) do
+    depths[i] = redis.call('LLEN', key)
+end
+return depths
+"""
+
+
+async def queue_depths(redis, queue: str) -> dict[int, int]:
+    """Messages waiting in a queue, by priority."""
+    keys = queue_keys(queue)
+    depths = await redis.eval(_QUEUE_DEPTH_SCRIPT, len(keys), *keys)
+    return {step: int(depth or 0) for step, depth in zip(PRIORITY_STEPS, depths)}
+
+
+async def all_queue_depths(
+    redis,
+    queues: Optional[Iterable[str]] = None,
+) -> dict[str, dict[int, int]]:
+    """Messages waiting in each queue, by priority."""
+    return {queue: await queue_depths(redis, queue) for queue in (queues or MONITORED_QUEUES)}
@@ -60,6 +60,24 @@ class Settings(BaseSettings):
     STORAGE_SECRET_KEY: str = ""
     STORAGE_ENDPOINT_URL: Optional[str] = None  # Required for MinIO
     STORAGE_USE_SSL: bool = True
+
+    # S3/MinIO transfers: files at or above the threshold move as parallel parts
+    STORAGE_MULTIPART_THRESHOLD_BYTES: int = 64 * 1024 * 1024
+    STORAGE_PART_SIZE_BYTES: int = 64 * 1024 * 1024
+    STORAGE_TRANSFER_CONCURRENCY: int = 8
+    STORAGE_PART_MAX_ATTEMPTS: int = 3
+
+    # Async storage I/O: blocking backend calls run on a dedicated thread pool
+    STORAGE_IO_THREADS: int = 16
+    STORAGE_IO_MAX_PENDING: int = 64  # operations admitted per event loop; more callers wait
+    STORAGE_IO_TIMEOUT_SECONDS: float = 30.0  # exists, delete, small uploads
+    STORAGE_TRANSFER_TIMEOUT_SECONDS: float = 3600.0  # file uploads and downloads
+
+    # Resumable uploads (Requirements: 1.1)
+    # RESUMABLE_UPLOAD_BACKEND: auto (S3 multipart on cloud storage, temp files otherwise), local, s3
+    RESUMABLE_UPLOAD_BACKEND: str = "auto"
+    RESUMABLE_UPLOAD_EXPIRY_HOURS: int = 24
+    RESUMABLE_UPLOAD_MAX_CHUNK_BYTES: int = 64 * 1024 * 1024
     
     # CDN Configuration (optional, for any backend)
     CDN_DOMAIN: Optional[str] = None
@@ -70,6 +88,20 @@ class Settings(BaseSettings):
     OPENAI_MODEL: str = "gpt-4-turbo-preview"
     OPENAI_MAX_TOKENS: int = 2000
     OPENAI_TEMPERATURE: float = 0.7
+    OPENAI_BASE_URL: Optional[str] = None  # Override for OpenAI-compatible endpoints
+
+    # AI request execution (Requirements: 14.1, 14.2, 14.3)
+    AI_MAX_CONCURRENT_REQUESTS: int = 16
+    AI_TOKENS_PER_MINUTE: int = 0  # Match the account's OpenAI TPM limit; 0 disables
+    AI_REQUEST_DEADLINE_SECONDS: float = 30.0
+    AI_BATCH_SIZE: int = 10
+
+    # AI response cache (Requirements: 14.1, 14.2, 14.3)
+    AI_RESPONSE_CACHE_ENABLED: bool = True
+    AI_RESPONSE_CACHE_TTL_SECONDS: float = 3600.0
+    AI_RESPONSE_CACHE_MAX_ENTRIES: int = 5000
+    AI_RESPONSE_CACHE_SEMANTIC_ENABLED: bool = False
+    AI_RESPONSE_CACHE_SIMILARITY_THRESHOLD: float = 0.97
 
     # OpenRouter API (for AI blog generation)
     OPENROUTER_API_KEY: str = ""
@@ -80,6 +112,20 @@ class Settings(BaseSettings):
     # Celery
     CELERY_BROKER_URL: str = ""
     CELERY_RESULT_BACKEND: str = ""
+    # One event loop and pooled DB engine per prefork worker process (app.core.task_loop)
+    CELERY_PERSISTENT_LOOP: bool = True
+    CELERY_DB_POOL_SIZE: int = 2  # per worker process; a task may open several sessions at once
+    CELERY_DB_MAX_OVERFLOW: int = 3
+    # Cluster health snapshot (app.modules.system_monitoring.cluster_health)
+    CLUSTER_HEALTH_INTERVAL_SECONDS: float = 2.0  # collector rewrites the snapshot this often
+    CLUSTER_HEALTH_WINDOW_SECONDS: int = 300  # throughput and failure rate are over this window
+    CLUSTER_HEALTH_STALE_SECONDS: float = 30.0  # older snapshots mark worker health degraded
+
+    # Agent control channel: heartbeats, leases and pushed jobs in Redis (Requirements: 21.1-21.5)
+    AGENT_HEARTBEAT_TTL_SECONDS: float = 60.0  # an agent silent this long is unhealthy and its jobs are requeued
+    AGENT_JOB_ACK_TIMEOUT_SECONDS: float = 15.0  # a pushed job not acknowledged in time goes to another agent
+    AGENT_CONTROL_MAX_IDLE_SECONDS: float = 1.0  # expiry watcher re-checks at least this often
+    AGENT_CONTROL_POLL_SECONDS: float = 25.0  # longest wait of a long poll for jobs
 
     # Stripe Payment Processing (Requirements: 28.3)
     STRIPE_SECRET_KEY: str = ""
@@ -103,16 +149,80 @@ class Settings(BaseSettings):
 
     # Moderation Settings
     MODERATION_ANALYSIS_TIMEOUT_SECONDS: float = 2.0
+    MODERATION_LEASE_TTL_SECONDS: int = 30
+    MODERATION_REBALANCE_INTERVAL_SECONDS: float = 5.0
+    MODERATION_BROADCASTS_PER_WORKER: int = 50
+    MODERATION_MIN_WORKERS: int = 1
+    MODERATION_MAX_WORKERS: int = 20
+    MODERATION_DEDUP_WINDOW: int = 5000
     CHATBOT_RESPONSE_TIMEOUT_SECONDS: float = 3.0
+    CHATBOT_CONFIG_CACHE_TTL_SECONDS: float = 30.0
+    CHATBOT_AI_MAX_CONCURRENCY: int = 8
 
     # Stream Settings
     STREAM_HEALTH_CHECK_INTERVAL_SECONDS: int = 10
     STREAM_RECONNECT_MAX_ATTEMPTS: int = 5
 
+    # Stream source cache: cloud-stored sources are streamed from local disk (Requirements: 11.1)
+    STREAM_SOURCE_CACHE_ENABLED: bool = True
+    STREAM_SOURCE_CACHE_DIR: str = "./storage/stream_cache"
+    STREAM_SOURCE_CACHE_MAX_BYTES: int = 50 * 1024 * 1024 * 1024
+    STREAM_SOURCE_CACHE_DOWNLOAD_CONCURRENCY: int = 4  # playlist items downloaded at once before FFmpeg starts
+    STREAM_SOURCE_PREFETCH_LEAD_SECONDS: int = 900  # prefetch scheduled streams this early
+    STREAM_PLAYLIST_SOURCE_CACHE_TTL_SECONDS: float = 600.0  # checked playlist sources are reused this long
+    STREAM_PLAYLIST_RESOLVE_CONCURRENCY: int = 16  # source existence checks in flight per playlist
+
+    # Stream-ready renditions: library videos encoded once, streamed with -c copy (Requirements: 10.1)
+    STREAM_RENDITIONS_ENABLED: bool = True
+    STREAM_RENDITION_PRESET: str = "veryfast"  # libx264 preset for offline encodes
+    STREAM_RENDITION_TIMEOUT_SECONDS: int = 6 * 3600  # an encode (or abandoned claim) older than this is retried
+
+    # Simulcast: one encode fanned out with the FFmpeg tee muxer (Requirements: 9.2, 9.3, 9.4)
+    SIMULCAST_TAP_HOST: str = "239.255.77.1"  # multicast group of the local feed re-added targets relay from
+    SIMULCAST_TAP_PORT_BASE: int = 27000  # one port per simulcast on this node, counting up
+    SIMULCAST_STARTUP_GRACE_SECONDS: float = 3.0  # targets failing within this are reported as not started
+    SIMULCAST_HEALTH_INTERVAL_SECONDS: float = 10.0
+
+    # Per-node stream supervisor owning FFmpeg processes (Requirements: 1.2, 1.3, 3.2, 3.3)
+    STREAM_SUPERVISOR_ENABLED: bool = False  # send starts/stops to node supervisors instead of spawning FFmpeg in Celery
+    STREAM_SUPERVISOR_HEALTH_INTERVAL_SECONDS: float = 10.0
+    STREAM_NODE_ID: str = ""  # defaults to the hostname
+    STREAM_NODE_MAX_STREAMS: int = 20
+    STREAM_NODE_MAX_CPU_PERCENT: float = 85.0  # no new starts are taken above this node CPU
+    STREAM_NODE_MAX_ENCODER_SESSIONS: int = 0  # concurrent live encodes, 0 = unlimited (consumer NVENC allows 3-5)
+    STREAM_NODE_HEARTBEAT_SECONDS: float = 5.0
+    STREAM_NODE_TTL_SECONDS: float = 20.0  # a node silent this long is dead and its streams start elsewhere
+    STREAM_NODE_CAPACITY_UNITS: float = 0.0  # stream units (720p30 software encodes) offered, 0 = one per CPU core
+    STREAM_PLACEMENT_POLICY: str = "least_loaded"  # least_loaded or bin_pack
+
+    # Scheduled start/stop deadlines in a Redis delay queue (Requirements: 1.2, 1.3)
+    STREAM_SCHEDULER_ENABLED: bool = True
+    STREAM_SCHEDULER_MAX_IDLE_SECONDS: float = 0.5  # dispatcher re-checks the queue at least this often
+    STREAM_SCHEDULER_CLAIM_TTL_SECONDS: float = 30.0  # unacknowledged claims are re-queued after this
+    STREAM_SCHEDULER_CONCURRENCY: int = 20  # deadlines fired in parallel per dispatcher
+
+    # Stream health time series: raw -> 1-minute -> 1-hour tiers (Requirements: 4.7, 8.5)
+    STREAM_HEALTH_RAW_RETENTION_HOURS: int = 48
+    STREAM_HEALTH_MINUTE_RETENTION_DAYS: int = 30
+    STREAM_HEALTH_HOUR_RETENTION_DAYS: int = 400
+    STREAM_HEALTH_PARTITION_AHEAD_DAYS: int = 7  # partitions are created this far ahead
+    STREAM_HEALTH_HISTORY_MAX_POINTS: int = 1500  # history reads use the finest tier within this
+
     # Notification Settings (Requirements: 23.1)
     NOTIFICATION_DELIVERY_SLA_SECONDS: float = 60.0
     NOTIFICATION_MAX_RETRY_ATTEMPTS: int = 3
     NOTIFICATION_BATCH_INTERVAL_SECONDS: int = 300
+    NOTIFICATION_SMTP_POOL_SIZE: int = 4
+    NOTIFICATION_SMTP_IDLE_TIMEOUT_SECONDS: float = 60.0
+    NOTIFICATION_CHANNEL_CONCURRENCY: dict[str, int] = {
+        "email": 4,
+        "sms": 10,
+        "slack": 10,
+        "telegram": 10,
+    }
+    NOTIFICATION_USE_OUTBOX: bool = True
+    NOTIFICATION_OUTBOX_SWEEP_AFTER_SECONDS: int = 30
+    NOTIFICATION_SEND_TIMEOUT_SECONDS: int = 300  # sending logs older than this are reclaimed
     
     # Telegram Bot (optional)
     TELEGRAM_BOT_TOKEN: str = ""
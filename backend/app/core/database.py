@@ -1,5 +1,7 @@
 """Database configuration with SQLAlchemy 2.0 async support."""
 
+import asyncio
+import weakref
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
 
@@ -41,18 +43,60 @@ def _create_celery_engine():
     )
 
 
+def create_task_engine():
+    """Create the pooled engine of a Celery worker's task loop.
+    
+    The engine's connections are only ever used on that loop (see
+    app.core.task_loop), so they can be kept between tasks.
+    """
+    return create_async_engine(
+        settings.DATABASE_URL,
+        echo=False,
+        pool_pre_ping=True,
+        pool_size=settings.CELERY_DB_POOL_SIZE,
+        max_overflow=settings.CELERY_DB_MAX_OVERFLOW,
+        pool_recycle=1800,  # Recycle connections after 30 minutes
+    )
+
+
+# Pooled task loop engines and their session makers, by the loop they belong to
+_task_engines: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, tuple]" = weakref.WeakKeyDictionary()
+
+
+def register_task_engine(loop: asyncio.AbstractEventLoop, task_engine) -> None:
+    """Serve celery_session_maker() on ``loop`` from ``task_engine``."""
+    _task_engines[loop] = (
+        task_engine,
+        async_sessionmaker(task_engine, class_=AsyncSession, expire_on_commit=False),
+    )
+
+
+async def dispose_task_engine(loop: asyncio.AbstractEventLoop) -> None:
+    """Close the pooled connections of ``loop``'s engine."""
+    task_engine, _ = _task_engines.pop(loop, (None, None))
+    if task_engine is not None:
+        await task_engine.dispose()
+
+
 @asynccontextmanager
 async def celery_session_maker():
-    """Create a fresh session with a fresh engine for Celery tasks.
+    """Create a session for Celery tasks.
     
-    This creates a new engine and session for each task to avoid
-    'bound to a different event loop' errors when multiple Celery
-    tasks run concurrently with asyncio.run().
+    On a worker's persistent task loop the session comes from that loop's
+    pooled engine. Anywhere else (asyncio.run() in beat, scripts or the
+    threads pool) a new engine and session are created and disposed, to
+    avoid 'bound to a different event loop' errors.
     
     Usage:
         async with celery_session_maker() as session:
             # use session
     """
+    _, pooled_session_maker = _task_engines.get(asyncio.get_running_loop(), (None, None))
+    if pooled_session_maker is not None:
+        async with pooled_session_maker() as session:
+            yield session
+        return
+    
     # Create fresh engine for this event loop
     task_engine = _create_celery_engine()
     
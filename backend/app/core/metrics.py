@@ -243,6 +243,367 @@ AI_REQUEST_DURATION_SECONDS = Histogram(
 )
 
 
+AI_REQUESTS_IN_FLIGHT = Gauge(
+    "ai_requests_in_flight",
+    "AI requests currently holding an execution slot",
+    ["service"],
+    registry=REGISTRY,
+)
+
+AI_TOKENS_TOTAL = Counter(
+    "ai_tokens_total",
+    "Tokens used by AI requests",
+    ["service", "kind"],
+    registry=REGISTRY,
+)
+
+AI_CACHE_LOOKUPS_TOTAL = Counter(
+    "ai_cache_lookups_total",
+    "AI response cache lookups by result (hit, semantic_hit, miss, bypass)",
+    ["feature", "result"],
+    registry=REGISTRY,
+)
+
+AI_CACHE_TOKENS_SAVED_TOTAL = Counter(
+    "ai_cache_tokens_saved_total",
+    "Estimated tokens saved by AI response cache hits",
+    ["feature"],
+    registry=REGISTRY,
+)
+
+AI_CACHE_ENTRIES = Gauge(
+    "ai_cache_entries",
+    "Entries in the AI response cache",
+    registry=REGISTRY,
+)
+
+
+# ============================================
+# Storage Transfer Metrics
+# ============================================
+STORAGE_TRANSFER_BYTES_TOTAL = Counter(
+    "storage_transfer_bytes_total",
+    "Bytes moved to or from object storage",
+    ["operation"],
+    registry=REGISTRY,
+)
+
+STORAGE_TRANSFER_DURATION_SECONDS = Histogram(
+    "storage_transfer_duration_seconds",
+    "Object storage transfer duration in seconds",
+    ["operation"],
+    buckets=[0.1, 0.5, 1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0],
+    registry=REGISTRY,
+)
+
+STORAGE_TRANSFER_THROUGHPUT_BYTES = Histogram(
+    "storage_transfer_throughput_bytes_per_second",
+    "Per-transfer object storage throughput in bytes per second",
+    ["operation"],
+    buckets=[1e6, 5e6, 10e6, 25e6, 50e6, 100e6, 250e6, 500e6, 1e9],
+    registry=REGISTRY,
+)
+
+STORAGE_PART_RETRIES_TOTAL = Counter(
+    "storage_part_retries_total",
+    "Multipart upload parts and ranged download parts that were retried",
+    ["operation"],
+    registry=REGISTRY,
+)
+
+
+STORAGE_IO_QUEUE_DEPTH = Gauge(
+    "storage_io_queue_depth",
+    "Storage operations waiting for an I/O thread",
+    registry=REGISTRY,
+)
+
+STORAGE_IO_IN_FLIGHT = Gauge(
+    "storage_io_in_flight",
+    "Storage operations running on an I/O thread",
+    registry=REGISTRY,
+)
+
+STORAGE_IO_OPERATIONS_TOTAL = Counter(
+    "storage_io_operations_total",
+    "Storage operations by result (success, error, timeout)",
+    ["operation", "status"],
+    registry=REGISTRY,
+)
+
+STORAGE_IO_DURATION_SECONDS = Histogram(
+    "storage_io_duration_seconds",
+    "Storage operation latency in seconds, including time queued",
+    ["operation"],
+    buckets=[0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0, 120.0, 600.0],
+    registry=REGISTRY,
+)
+
+
+# ============================================
+# Video Processing Metrics
+# ============================================
+VIDEO_CONVERSIONS_TOTAL = Counter(
+    "video_conversions_total",
+    "Library upload conversions by strategy (none, remux, transcode_audio, reencode)",
+    ["strategy", "status"],
+    registry=REGISTRY,
+)
+
+VIDEO_CONVERSION_DURATION_SECONDS = Histogram(
+    "video_conversion_duration_seconds",
+    "Library upload conversion duration in seconds",
+    ["strategy"],
+    buckets=[1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0, 3600.0],
+    registry=REGISTRY,
+)
+
+VIDEO_CONVERSION_SECONDS_SAVED_TOTAL = Counter(
+    "video_conversion_seconds_saved_total",
+    "Estimated encode seconds saved by stream-copy conversions",
+    ["strategy"],
+    registry=REGISTRY,
+)
+
+
+# ============================================
+# Stream Source Cache Metrics
+# ============================================
+STREAM_SOURCE_CACHE_REQUESTS_TOTAL = Counter(
+    "stream_source_cache_requests_total",
+    "Stream source lookups in the node-local cache",
+    ["result"],  # hit, miss
+    registry=REGISTRY,
+)
+
+STREAM_SOURCE_CACHE_HIT_RATIO = Gauge(
+    "stream_source_cache_hit_ratio",
+    "Fraction of stream source lookups served from the node-local cache (this process)",
+    registry=REGISTRY,
+)
+
+STREAM_SOURCE_CACHE_FILL_BYTES_TOTAL = Counter(
+    "stream_source_cache_fill_bytes_total",
+    "Bytes downloaded from object storage into the stream source cache",
+    registry=REGISTRY,
+)
+
+STREAM_SOURCE_CACHE_SERVED_BYTES_TOTAL = Counter(
+    "stream_source_cache_served_bytes_total",
+    "Bytes FFmpeg read from cached sources instead of object storage; "
+    "egress saved is served minus fill",
+    registry=REGISTRY,
+)
+
+STREAM_SOURCE_CACHE_SIZE_BYTES = Gauge(
+    "stream_source_cache_size_bytes",
+    "Bytes on disk in the stream source cache, including downloads in progress",
+    registry=REGISTRY,
+)
+
+STREAM_SOURCE_CACHE_EVICTIONS_TOTAL = Counter(
+    "stream_source_cache_evictions_total",
+    "Cached stream sources evicted to stay within the size budget",
+    registry=REGISTRY,
+)
+
+STREAM_PLAYLIST_RESOLVE_TOTAL = Counter(
+    "stream_playlist_resolve_total",
+    "Playlist source resolutions by whether the checked sources were cached",
+    ["result"],  # hit, miss
+    registry=REGISTRY,
+)
+
+STREAM_PLAYLIST_RESOLVE_SECONDS = Histogram(
+    "stream_playlist_resolve_seconds",
+    "Time to turn a playlist into checked FFmpeg sources",
+    buckets=[0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0],
+    registry=REGISTRY,
+)
+
+
+# ============================================
+# Stream Rendition Metrics
+# ============================================
+STREAM_RENDITION_ENCODES_TOTAL = Counter(
+    "stream_rendition_encodes_total",
+    "Offline encodes of library videos into stream-ready renditions",
+    ["result"],  # success, failed
+    registry=REGISTRY,
+)
+
+STREAM_RENDITION_ENCODE_SECONDS = Histogram(
+    "stream_rendition_encode_seconds",
+    "Wall time of one stream-ready rendition encode",
+    buckets=[10, 30, 60, 120, 300, 600, 1200, 1800, 3600, 7200, 14400],
+    registry=REGISTRY,
+)
+
+STREAM_JOB_STARTS_TOTAL = Counter(
+    "stream_job_starts_total",
+    "FFmpeg stream starts by how the video is sent",
+    ["mode"],  # copy (stream-ready renditions), encode (live re-encode)
+    registry=REGISTRY,
+)
+
+
+# ============================================
+# Simulcast Metrics
+# ============================================
+SIMULCAST_ENCODERS_ACTIVE = Gauge(
+    "simulcast_encoders_active",
+    "Simulcast encodes running on this node",
+    registry=REGISTRY,
+)
+
+SIMULCAST_OUTPUTS_ACTIVE = Gauge(
+    "simulcast_outputs_active",
+    "Simulcast targets currently fed by an encode on this node",
+    registry=REGISTRY,
+)
+
+SIMULCAST_TARGET_FAILURES_TOTAL = Counter(
+    "simulcast_target_failures_total",
+    "Simulcast targets dropped by the tee muxer or their relay",
+    registry=REGISTRY,
+)
+
+SIMULCAST_TARGET_READDS_TOTAL = Counter(
+    "simulcast_target_readds_total",
+    "Simulcast targets re-added to a running encode",
+    registry=REGISTRY,
+)
+
+
+# ============================================
+# Stream Node Supervisor Metrics
+# ============================================
+STREAM_NODE_STREAMS = Gauge(
+    "stream_node_streams",
+    "FFmpeg streams run by this node's supervisor",
+    ["mode"],  # copy, encode
+    registry=REGISTRY,
+)
+
+STREAM_NODE_RESTARTS_TOTAL = Counter(
+    "stream_node_restarts_total",
+    "Streams restarted by a node supervisor after FFmpeg exited",
+    registry=REGISTRY,
+)
+
+STREAM_NODE_COMMANDS_TOTAL = Counter(
+    "stream_node_commands_total",
+    "Stream commands handled by node supervisors",
+    ["action", "result"],  # done, ignored (not applicable here), error
+    registry=REGISTRY,
+)
+
+STREAM_PLACEMENTS_TOTAL = Counter(
+    "stream_placements_total",
+    "Stream jobs placed on streaming nodes",
+    ["policy", "result"],  # placed, unplaced (no node had room)
+    registry=REGISTRY,
+)
+
+
+# ============================================
+# Stream Scheduler Metrics
+# ============================================
+STREAM_SCHEDULER_DISPATCH_LAG_SECONDS = Histogram(
+    "stream_scheduler_dispatch_lag_seconds",
+    "Delay between a scheduled stream deadline and its dispatch",
+    ["action"],  # start, stop
+    buckets=[0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0],
+    registry=REGISTRY,
+)
+
+STREAM_SCHEDULER_DEADLINES_FIRED_TOTAL = Counter(
+    "stream_scheduler_deadlines_fired_total",
+    "Claimed stream deadlines by outcome",
+    ["action", "result"],  # fired, skipped (no longer applies), deferred (job still starting), error (re-queued)
+    registry=REGISTRY,
+)
+
+STREAM_SCHEDULER_PENDING_DEADLINES = Gauge(
+    "stream_scheduler_pending_deadlines",
+    "Stream start/stop deadlines waiting in the delay queue",
+    registry=REGISTRY,
+)
+
+
+# ============================================
+# Agent Control Channel Metrics
+# ============================================
+AGENT_DISPATCHES_TOTAL = Counter(
+    "agent_dispatches_total",
+    "Agent job reservations by outcome",
+    ["result"],  # reserved, no_agent (no live agent had room)
+    registry=REGISTRY,
+)
+
+AGENT_LEASES_EXPIRED_TOTAL = Counter(
+    "agent_leases_expired_total",
+    "Agent job leases released before the job finished",
+    ["reason"],  # ack_timeout, agent_expired
+    registry=REGISTRY,
+)
+
+
+# ============================================
+# Live Chat Moderation Metrics
+# ============================================
+MODERATION_LIVE_BROADCASTS = Gauge(
+    "moderation_live_broadcasts",
+    "Broadcasts registered for live chat moderation",
+    registry=REGISTRY,
+)
+
+MODERATION_WORKERS = Gauge(
+    "moderation_workers",
+    "Moderation worker processes with a live heartbeat",
+    registry=REGISTRY,
+)
+
+MODERATION_DESIRED_WORKERS = Gauge(
+    "moderation_desired_workers",
+    "Moderation worker processes needed for the registered broadcasts",
+    registry=REGISTRY,
+)
+
+MODERATION_OWNED_BROADCASTS = Gauge(
+    "moderation_owned_broadcasts",
+    "Broadcasts leased by a moderation worker process",
+    ["worker_id"],
+    registry=REGISTRY,
+)
+
+
+# ============================================
+# Notification Delivery Metrics
+# ============================================
+NOTIFICATION_DELIVERIES_TOTAL = Counter(
+    "notification_deliveries_total",
+    "Total notification delivery attempts",
+    ["channel", "status"],
+    registry=REGISTRY,
+)
+
+NOTIFICATION_DELIVERY_LATENCY_SECONDS = Histogram(
+    "notification_delivery_latency_seconds",
+    "Time from notification creation to delivery in seconds",
+    ["channel"],
+    buckets=[0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0],
+    registry=REGISTRY,
+)
+
+NOTIFICATION_SLA_BREACHES_TOTAL = Counter(
+    "notification_sla_breaches_total",
+    "Notifications delivered outside the delivery SLA",
+    ["channel"],
+    registry=REGISTRY,
+)
+
+
 # ============================================
 # Resource Utilization Metrics
 # ============================================
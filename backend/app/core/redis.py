@@ -1,12 +1,39 @@
 """Redis connection configuration."""
 
+import asyncio
+import weakref
+
 import redis.asyncio as redis
 
 from app.core.config import settings
 
 redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
 
+# Async connections cannot be shared across event loops, so code that also
+# runs in Celery tasks takes a client per loop. run_async() and the worker
+# task loop close it when their loop ends.
+_loop_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, redis.Redis]" = (
+    weakref.WeakKeyDictionary()
+)
+
 
 async def get_redis() -> redis.Redis:
     """Get Redis client instance."""
     return redis_client
+
+
+def get_loop_redis() -> redis.Redis:
+    """Get the Redis client of the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _loop_clients.get(loop)
+    if client is None:
+        client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+        _loop_clients[loop] = client
+    return client
+
+
+async def close_loop_redis() -> None:
+    """Close the running event loop's client, if it has one."""
+    client = _loop_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
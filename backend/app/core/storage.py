@@ -3,16 +3,42 @@
 Supports: local filesystem, S3, MinIO, and other S3-compatible storage.
 """
 
+import asyncio
+import io
 import os
 import shutil
+import threading
+import time
 import uuid
+import weakref
 from abc import ABC, abstractmethod
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
 from dataclasses import dataclass
 from pathlib import Path
-from typing import BinaryIO, Optional, Union
+from typing import Any, BinaryIO, Callable, Iterator, Optional, Union
 
 from app.core.config import settings
 from app.core.datetime_utils import utcnow, to_naive_utc
+from app.core.metrics import (
+    STORAGE_IO_DURATION_SECONDS,
+    STORAGE_IO_IN_FLIGHT,
+    STORAGE_IO_OPERATIONS_TOTAL,
+    STORAGE_IO_QUEUE_DEPTH,
+    STORAGE_PART_RETRIES_TOTAL,
+    STORAGE_TRANSFER_BYTES_TOTAL,
+    STORAGE_TRANSFER_DURATION_SECONDS,
+    STORAGE_TRANSFER_THROUGHPUT_BYTES,
+)
+
+# Called with (bytes_transferred, total_bytes); may run on transfer threads
+ProgressCallback = Callable[[int, int], None]
+
+# S3 rejects multipart parts smaller than 5MB (except the last) and more than 10,000 parts
+S3_MIN_PART_SIZE = 5 * 1024 * 1024
+S3_MAX_PARTS = 10_000
+
+PART_RETRY_BACKOFF_SECONDS = 0.5
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
 
 
 @dataclass
@@ -39,6 +65,34 @@ class StorageConfig:
     local_path: str = "./storage"
     cdn_domain: Optional[str] = None
     cdn_enabled: bool = False
+    multipart_threshold: int = 64 * 1024 * 1024
+    part_size: int = 64 * 1024 * 1024
+    max_concurrency: int = 8
+    max_part_attempts: int = 3
+
+
+class _TransferProgress:
+    """Thread-safe byte counter that reports to a progress callback."""
+
+    def __init__(self, total: int, callback: Optional[ProgressCallback]):
+        self.total = total
+        self.done = 0
+        self.callback = callback
+        self._lock = threading.Lock()
+
+    def advance(self, size: int) -> None:
+        with self._lock:
+            self.done += size
+            if self.callback is not None:
+                self.callback(self.done, self.total)
+
+
+def _record_transfer(operation: str, size: int, started: float) -> None:
+    """Record bytes, duration and throughput of a finished transfer."""
+    elapsed = max(time.monotonic() - started, 1e-6)
+    STORAGE_TRANSFER_BYTES_TOTAL.labels(operation=operation).inc(size)
+    STORAGE_TRANSFER_DURATION_SECONDS.labels(operation=operation).observe(elapsed)
+    STORAGE_TRANSFER_THROUGHPUT_BYTES.labels(operation=operation).observe(size / elapsed)
 
 
 class StorageBackend(ABC):
@@ -50,6 +104,7 @@ class StorageBackend(ABC):
         file_path: str,
         key: str,
         content_type: str = "application/octet-stream",
+        progress_callback: Optional[ProgressCallback] = None,
     ) -> StorageResult:
         """Upload a file to storage."""
         pass
@@ -65,7 +120,12 @@ class StorageBackend(ABC):
         pass
 
     @abstractmethod
-    def download(self, key: str, destination: str) -> bool:
+    def download(
+        self,
+        key: str,
+        destination: str,
+        progress_callback: Optional[ProgressCallback] = None,
+    ) -> bool:
         """Download a file from storage."""
         pass
 
@@ -84,11 +144,47 @@ class StorageBackend(ABC):
         """Get URL for a file (presigned for private storage)."""
         pass
 
+    def get_size(self, key: str) -> Optional[int]:
+        """Size of a stored file in bytes, or None if it does not exist."""
+        return None
+
     @abstractmethod
     def list_files(self, prefix: str = "") -> list[str]:
         """List files with given prefix."""
         pass
 
+    def iter_files(self, prefix: str = "") -> Iterator[str]:
+        """Yield files with given prefix without building the full list."""
+        yield from self.list_files(prefix)
+
+    # Multipart uploads (only S3-compatible backends support these)
+    supports_multipart: bool = False
+
+    def create_multipart_upload(
+        self,
+        key: str,
+        content_type: str = "application/octet-stream",
+    ) -> str:
+        """Start a multipart upload and return its upload ID."""
+        raise NotImplementedError("Multipart uploads are not supported by this backend")
+
+    def upload_part(self, key: str, upload_id: str, part_number: int, data: bytes) -> str:
+        """Upload one part of a multipart upload and return its ETag."""
+        raise NotImplementedError("Multipart uploads are not supported by this backend")
+
+    def complete_multipart_upload(
+        self,
+        key: str,
+        upload_id: str,
+        parts: list[dict],
+    ) -> StorageResult:
+        """Assemble uploaded parts ({"part_number", "etag"}) into the final object."""
+        raise NotImplementedError("Multipart uploads are not supported by this backend")
+
+    def abort_multipart_upload(self, key: str, upload_id: str) -> bool:
+        """Abort a multipart upload and discard its parts."""
+        raise NotImplementedError("Multipart uploads are not supported by this backend")
+
 
 class LocalStorage(StorageBackend):
     """Local filesystem storage backend."""
@@ -108,6 +204,7 @@ class LocalStorage(StorageBackend):
         file_path: str,
         key: str,
         content_type: str = "application/octet-stream",
+        progress_callback: Optional[ProgressCallback] = None,
     ) -> StorageResult:
         """Upload a file to local storage."""
         try:
@@ -116,6 +213,8 @@ class LocalStorage(StorageBackend):
             
             shutil.copy2(file_path, dest_path)
             file_size = dest_path.stat().st_size
+            if progress_callback is not None:
+                progress_callback(file_size, file_size)
             
             return StorageResult(
                 success=True,
@@ -161,12 +260,20 @@ class LocalStorage(StorageBackend):
                 error_message=str(e),
             )
 
-    def download(self, key: str, destination: str) -> bool:
+    def download(
+        self,
+        key: str,
+        destination: str,
+        progress_callback: Optional[ProgressCallback] = None,
+    ) -> bool:
         """Download a file from local storage."""
         try:
             src_path = self._get_full_path(key)
             if src_path.exists():
                 shutil.copy2(src_path, destination)
+                if progress_callback is not None:
+                    size = src_path.stat().st_size
+                    progress_callback(size, size)
                 return True
             return False
         except Exception:
@@ -187,6 +294,11 @@ class LocalStorage(StorageBackend):
         """Check if a file exists in local storage."""
         return self._get_full_path(key).exists()
 
+    def get_size(self, key: str) -> Optional[int]:
+        """Size of a file in local storage."""
+        path = self._get_full_path(key)
+        return path.stat().st_size if path.is_file() else None
+
     def get_url(self, key: str, expires_in: int = 3600) -> str:
         """Get URL for a file."""
         if self.cdn_enabled and self.cdn_domain:
@@ -195,21 +307,24 @@ class LocalStorage(StorageBackend):
 
     def list_files(self, prefix: str = "") -> list[str]:
         """List files with given prefix."""
+        return list(self.iter_files(prefix))
+
+    def iter_files(self, prefix: str = "") -> Iterator[str]:
+        """Yield files with given prefix while walking the directory tree."""
         search_path = self._get_full_path(prefix) if prefix else self.base_path
         if not search_path.exists():
-            return []
+            return
         
-        files = []
         for path in search_path.rglob("*"):
             if path.is_file():
-                rel_path = path.relative_to(self.base_path)
-                files.append(str(rel_path))
-        return files
+                yield str(path.relative_to(self.base_path))
 
 
 class S3Storage(StorageBackend):
     """S3/MinIO compatible storage backend."""
 
+    supports_multipart = True
+
     def __init__(self, config: StorageConfig):
         self.config = config
         self._client = None
@@ -254,21 +369,38 @@ class S3Storage(StorageBackend):
         file_path: str,
         key: str,
         content_type: str = "application/octet-stream",
+        progress_callback: Optional[ProgressCallback] = None,
     ) -> StorageResult:
-        """Upload a file to S3/MinIO."""
+        """Upload a file to S3/MinIO.
+        
+        Files at or above the multipart threshold are sent as parallel parts,
+        each read from disk by its own worker and retried on failure.
+        """
+        started = time.monotonic()
         try:
             client = self._get_client()
             file_size = os.path.getsize(file_path)
+            progress = _TransferProgress(file_size, progress_callback)
             
-            with open(file_path, "rb") as f:
-                response = client.put_object(
-                    Bucket=self.config.bucket,
-                    Key=key,
-                    Body=f,
-                    ContentType=content_type,
-                )
+            if self._use_multipart(file_size):
+                def read_part(offset: int, length: int) -> bytes:
+                    with open(file_path, "rb") as f:
+                        f.seek(offset)
+                        return f.read(length)
+                
+                etag = self._multipart_upload(key, content_type, file_size, read_part, progress)
+            else:
+                with open(file_path, "rb") as f:
+                    response = client.put_object(
+                        Bucket=self.config.bucket,
+                        Key=key,
+                        Body=f,
+                        ContentType=content_type,
+                    )
+                etag = response.get("ETag", "").strip('"')
+                progress.advance(file_size)
             
-            etag = response.get("ETag", "").strip('"')
+            _record_transfer("upload", file_size, started)
             
             return StorageResult(
                 success=True,
@@ -292,6 +424,7 @@ class S3Storage(StorageBackend):
         content_type: str = "application/octet-stream",
     ) -> StorageResult:
         """Upload a file object to S3/MinIO."""
+        started = time.monotonic()
         try:
             client = self._get_client()
             
@@ -300,14 +433,26 @@ class S3Storage(StorageBackend):
             file_size = fileobj.tell()
             fileobj.seek(0)
             
-            response = client.put_object(
-                Bucket=self.config.bucket,
-                Key=key,
-                Body=fileobj,
-                ContentType=content_type,
-            )
+            if self._use_multipart(file_size):
+                lock = threading.Lock()
+                
+                def read_part(offset: int, length: int) -> bytes:
+                    with lock:
+                        fileobj.seek(offset)
+                        return fileobj.read(length)
+                
+                progress = _TransferProgress(file_size, None)
+                etag = self._multipart_upload(key, content_type, file_size, read_part, progress)
+            else:
+                response = client.put_object(
+                    Bucket=self.config.bucket,
+                    Key=key,
+                    Body=fileobj,
+                    ContentType=content_type,
+                )
+                etag = response.get("ETag", "").strip('"')
             
-            etag = response.get("ETag", "").strip('"')
+            _record_transfer("upload", file_size, started)
             
             return StorageResult(
                 success=True,
@@ -324,13 +469,226 @@ class S3Storage(StorageBackend):
                 error_message=str(e),
             )
 
-    def download(self, key: str, destination: str) -> bool:
-        """Download a file from S3/MinIO."""
+    def create_multipart_upload(
+        self,
+        key: str,
+        content_type: str = "application/octet-stream",
+    ) -> str:
+        """Start a multipart upload on S3/MinIO."""
+        response = self._get_client().create_multipart_upload(
+            Bucket=self.config.bucket,
+            Key=key,
+            ContentType=content_type,
+        )
+        return response["UploadId"]
+
+    def upload_part(self, key: str, upload_id: str, part_number: int, data: bytes) -> str:
+        """Upload one part to S3/MinIO."""
+        response = self._get_client().upload_part(
+            Bucket=self.config.bucket,
+            Key=key,
+            UploadId=upload_id,
+            PartNumber=part_number,
+            Body=data,
+        )
+        return response["ETag"].strip('"')
+
+    def complete_multipart_upload(
+        self,
+        key: str,
+        upload_id: str,
+        parts: list[dict],
+    ) -> StorageResult:
+        """Assemble uploaded parts into the final S3/MinIO object."""
+        try:
+            response = self._get_client().complete_multipart_upload(
+                Bucket=self.config.bucket,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={
+                    "Parts": [
+                        {"PartNumber": part["part_number"], "ETag": part["etag"]}
+                        for part in sorted(parts, key=lambda p: p["part_number"])
+                    ]
+                },
+            )
+            return StorageResult(
+                success=True,
+                key=key,
+                url=self.get_url(key),
+                file_size=sum(part.get("size", 0) for part in parts),
+                etag=response.get("ETag", "").strip('"'),
+            )
+        except Exception as e:
+            return StorageResult(
+                success=False,
+                key=key,
+                url="",
+                error_message=str(e),
+            )
+
+    def abort_multipart_upload(self, key: str, upload_id: str) -> bool:
+        """Abort a multipart upload on S3/MinIO."""
+        try:
+            self._get_client().abort_multipart_upload(
+                Bucket=self.config.bucket,
+                Key=key,
+                UploadId=upload_id,
+            )
+            return True
+        except Exception:
+            return False
+
+    def _use_multipart(self, size: int) -> bool:
+        return size > 0 and size >= self.config.multipart_threshold
+
+    def _part_ranges(self, size: int) -> list[tuple[int, int, int]]:
+        """Split size bytes into (part_number, offset, length) ranges.
+        
+        Parts grow past the configured size when the file would otherwise
+        need more than S3's 10,000 parts.
+        """
+        part_size = max(self.config.part_size, S3_MIN_PART_SIZE, -(-size // S3_MAX_PARTS))
+        return [
+            (number, offset, min(part_size, size - offset))
+            for number, offset in enumerate(range(0, size, part_size), start=1)
+        ]
+
+    def _with_retries(self, operation: str, fn: Callable, *args):
+        """Call fn, retrying with exponential backoff up to max_part_attempts."""
+        attempts = max(1, self.config.max_part_attempts)
+        for attempt in range(1, attempts + 1):
+            try:
+                return fn(*args)
+            except Exception:
+                if attempt == attempts:
+                    raise
+                STORAGE_PART_RETRIES_TOTAL.labels(operation=operation).inc()
+                time.sleep(PART_RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1))
+
+    def _run_parts(self, ranges: list[tuple[int, int, int]], transfer_part: Callable) -> list:
+        """Run transfer_part for every range on a bounded thread pool.
+        
+        The first failure cancels the parts that have not started yet and is
+        re-raised once the running parts finish.
+        """
+        if not ranges:
+            return []
+        workers = max(1, min(self.config.max_concurrency, len(ranges)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="s3-transfer") as pool:
+            futures = [pool.submit(transfer_part, *part) for part in ranges]
+            done, pending = wait(futures, return_when=FIRST_EXCEPTION)
+            for future in done:
+                if future.exception() is not None:
+                    for other in pending:
+                        other.cancel()
+                    raise future.exception()
+        return [future.result() for future in futures]
+
+    def _multipart_upload(
+        self,
+        key: str,
+        content_type: str,
+        size: int,
+        read_part: Callable[[int, int], bytes],
+        progress: _TransferProgress,
+    ) -> Optional[str]:
+        """Upload size bytes as parallel parts and return the object's ETag.
+        
+        The multipart upload is aborted if any part fails all its attempts.
+        """
+        upload_id = self.create_multipart_upload(key, content_type)
+        
+        def transfer_part(part_number: int, offset: int, length: int) -> dict:
+            data = read_part(offset, length)
+            etag = self._with_retries("upload", self.upload_part, key, upload_id, part_number, data)
+            progress.advance(length)
+            return {"part_number": part_number, "etag": etag, "size": length}
+        
+        try:
+            parts = self._run_parts(self._part_ranges(size), transfer_part)
+        except BaseException:
+            self.abort_multipart_upload(key, upload_id)
+            raise
+        
+        result = self.complete_multipart_upload(key, upload_id, parts)
+        if not result.success:
+            self.abort_multipart_upload(key, upload_id)
+            raise RuntimeError(result.error_message)
+        return result.etag
+
+    def download(
+        self,
+        key: str,
+        destination: str,
+        progress_callback: Optional[ProgressCallback] = None,
+    ) -> bool:
+        """Download a file from S3/MinIO.
+        
+        A plain GET reads the object's size and, below the multipart
+        threshold, its content, so small objects take one request. Larger
+        objects are fetched as parallel ranged GETs written straight to
+        their offset in the destination.
+        """
+        started = time.monotonic()
+        created = False
         try:
             client = self._get_client()
-            client.download_file(self.config.bucket, key, destination)
+            
+            def write_body(body, f) -> int:
+                written = 0
+                for chunk in body.iter_chunks(DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+                    written += len(chunk)
+                return written
+            
+            def fetch_object() -> tuple[int, bool]:
+                nonlocal created
+                response = client.get_object(Bucket=self.config.bucket, Key=key)
+                size = response["ContentLength"]
+                if self._use_multipart(size):
+                    response["Body"].close()
+                    # Ranged parts write at their own offsets; no need to preallocate
+                    open(destination, "wb").close()
+                    created = True
+                    return size, False
+                with open(destination, "wb") as f:
+                    created = True
+                    written = write_body(response["Body"], f)
+                if written != size:
+                    raise IOError(f"Short read for {key}: {written}/{size} bytes")
+                return size, True
+            
+            size, complete = self._with_retries("download", fetch_object)
+            progress = _TransferProgress(size, progress_callback)
+            if complete:
+                progress.advance(size)
+                _record_transfer("download", size, started)
+                return True
+            
+            def fetch_range(offset: int, length: int) -> None:
+                response = client.get_object(
+                    Bucket=self.config.bucket,
+                    Key=key,
+                    Range=f"bytes={offset}-{offset + length - 1}",
+                )
+                with open(destination, "r+b") as f:
+                    f.seek(offset)
+                    written = write_body(response["Body"], f)
+                if written != length:
+                    raise IOError(f"Short read for {key} at {offset}: {written}/{length} bytes")
+            
+            def transfer_part(part_number: int, offset: int, length: int) -> None:
+                self._with_retries("download", fetch_range, offset, length)
+                progress.advance(length)
+            
+            self._run_parts(self._part_ranges(size), transfer_part)
+            
+            _record_transfer("download", size, started)
             return True
         except Exception:
+            if created:
+                Path(destination).unlink(missing_ok=True)
             return False
 
     def delete(self, key: str) -> bool:
@@ -351,6 +709,14 @@ class S3Storage(StorageBackend):
         except Exception:
             return False
 
+    def get_size(self, key: str) -> Optional[int]:
+        """Size of an object in S3/MinIO."""
+        try:
+            client = self._get_client()
+            return client.head_object(Bucket=self.config.bucket, Key=key)["ContentLength"]
+        except Exception:
+            return None
+
     def get_url(self, key: str, expires_in: int = 3600) -> str:
         """Get URL for a file (presigned URL or CDN).
         
@@ -381,19 +747,23 @@ class S3Storage(StorageBackend):
     def list_files(self, prefix: str = "") -> list[str]:
         """List files with given prefix."""
         try:
-            client = self._get_client()
-            response = client.list_objects_v2(
-                Bucket=self.config.bucket,
-                Prefix=prefix,
-            )
-            
-            files = []
-            for obj in response.get("Contents", []):
-                files.append(obj["Key"])
-            return files
+            return list(self.iter_files(prefix))
         except Exception:
             return []
 
+    def iter_files(self, prefix: str = "") -> Iterator[str]:
+        """Yield files with given prefix, fetching one listing page at a time.
+        
+        Stops early, like list_files, if the client or a page request fails.
+        """
+        try:
+            paginator = self._get_client().get_paginator("list_objects_v2")
+            for page in paginator.paginate(Bucket=self.config.bucket, Prefix=prefix):
+                for obj in page.get("Contents", []):
+                    yield obj["Key"]
+        except Exception:
+            return
+
 
 class Storage:
     """Universal storage interface.
@@ -422,6 +792,10 @@ class Storage:
                 local_path=settings.LOCAL_STORAGE_PATH,
                 cdn_domain=settings.CDN_DOMAIN,
                 cdn_enabled=settings.CDN_ENABLED,
+                multipart_threshold=settings.STORAGE_MULTIPART_THRESHOLD_BYTES,
+                part_size=settings.STORAGE_PART_SIZE_BYTES,
+                max_concurrency=settings.STORAGE_TRANSFER_CONCURRENCY,
+                max_part_attempts=settings.STORAGE_PART_MAX_ATTEMPTS,
             )
         
         self.config = config
@@ -471,9 +845,10 @@ class Storage:
         file_path: str,
         key: str,
         content_type: str = "application/octet-stream",
+        progress_callback: Optional[ProgressCallback] = None,
     ) -> StorageResult:
         """Upload a file to storage."""
-        return self._backend.upload(file_path, key, content_type)
+        return self._backend.upload(file_path, key, content_type, progress_callback)
 
     def upload_fileobj(
         self,
@@ -484,9 +859,14 @@ class Storage:
         """Upload a file object to storage."""
         return self._backend.upload_fileobj(fileobj, key, content_type)
 
-    def download(self, key: str, destination: str) -> bool:
+    def download(
+        self,
+        key: str,
+        destination: str,
+        progress_callback: Optional[ProgressCallback] = None,
+    ) -> bool:
         """Download a file from storage."""
-        return self._backend.download(key, destination)
+        return self._backend.download(key, destination, progress_callback)
 
     def delete(self, key: str) -> bool:
         """Delete a file from storage."""
@@ -496,6 +876,10 @@ class Storage:
         """Check if a file exists in storage."""
         return self._backend.exists(key)
 
+    def get_size(self, key: str) -> Optional[int]:
+        """Size of a stored file in bytes, or None if it does not exist."""
+        return self._backend.get_size(key)
+
     def get_url(self, key: str, expires_in: int = 3600) -> str:
         """Get URL for a file."""
         return self._backend.get_url(key, expires_in)
@@ -504,6 +888,40 @@ class Storage:
         """List files with given prefix."""
         return self._backend.list_files(prefix)
 
+    def iter_files(self, prefix: str = "") -> Iterator[str]:
+        """Yield files with given prefix without building the full list."""
+        return self._backend.iter_files(prefix)
+
+    @property
+    def supports_multipart(self) -> bool:
+        """Whether the backend accepts multipart uploads."""
+        return self._backend.supports_multipart
+
+    def create_multipart_upload(
+        self,
+        key: str,
+        content_type: str = "application/octet-stream",
+    ) -> str:
+        """Start a multipart upload and return its upload ID."""
+        return self._backend.create_multipart_upload(key, content_type)
+
+    def upload_part(self, key: str, upload_id: str, part_number: int, data: bytes) -> str:
+        """Upload one part of a multipart upload and return its ETag."""
+        return self._backend.upload_part(key, upload_id, part_number, data)
+
+    def complete_multipart_upload(
+        self,
+        key: str,
+        upload_id: str,
+        parts: list[dict],
+    ) -> StorageResult:
+        """Assemble uploaded parts into the final object."""
+        return self._backend.complete_multipart_upload(key, upload_id, parts)
+
+    def abort_multipart_upload(self, key: str, upload_id: str) -> bool:
+        """Abort a multipart upload and discard its parts."""
+        return self._backend.abort_multipart_upload(key, upload_id)
+
 
 # Convenience function
 def get_storage() -> Storage:
@@ -511,12 +929,134 @@ def get_storage() -> Storage:
     return Storage.get_instance()
 
 
+class StorageTimeoutError(TimeoutError):
+    """Raised when a storage operation does not finish before its timeout."""
+    pass
+
+
+class StorageIOExecutor:
+    """Runs blocking storage backend calls on a dedicated, bounded thread pool.
+    
+    - At most max_pending operations per event loop are admitted at once;
+      further callers wait for a slot (backpressure) instead of piling work
+      onto the pool.
+    - The timeout covers waiting for a slot and a thread as well as the
+      call itself. Operations whose caller timed out before a thread picked
+      them up are skipped. A call that is already running cannot be
+      interrupted and finishes in the background.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ):
+        self.max_workers = max_workers or settings.STORAGE_IO_THREADS
+        self.max_pending = max_pending or settings.STORAGE_IO_MAX_PENDING
+        self.timeout = timeout or settings.STORAGE_IO_TIMEOUT_SECONDS
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="storage-io",
+        )
+        # asyncio primitives are bound to one loop
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_pending)
+            self._semaphores[loop] = semaphore
+        return semaphore
+
+    async def run(
+        self,
+        operation: str,
+        fn: Callable[..., Any],
+        *args: Any,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """Run fn(*args) on the I/O pool and return its result.
+        
+        Raises:
+            StorageTimeoutError: If the operation outlives its timeout
+        """
+        timeout = timeout or self.timeout
+        started = time.monotonic()
+        lock = threading.Lock()
+        state = {"queued": True}
+        STORAGE_IO_QUEUE_DEPTH.inc()
+
+        def call() -> Any:
+            with lock:
+                if not state["queued"]:
+                    # The caller gave up before a thread was free
+                    return None
+                state["queued"] = False
+            STORAGE_IO_QUEUE_DEPTH.dec()
+            STORAGE_IO_IN_FLIGHT.inc()
+            try:
+                return fn(*args)
+            finally:
+                STORAGE_IO_IN_FLIGHT.dec()
+
+        async def admitted() -> Any:
+            async with self._semaphore():
+                return await asyncio.get_running_loop().run_in_executor(self._pool, call)
+
+        status = "error"
+        try:
+            result = await asyncio.wait_for(admitted(), timeout)
+            status = "success"
+            return result
+        except asyncio.TimeoutError as e:
+            status = "timeout"
+            raise StorageTimeoutError(
+                f"Storage {operation} timed out after {timeout:.0f}s"
+            ) from e
+        finally:
+            with lock:
+                if state["queued"]:
+                    state["queued"] = False
+                    STORAGE_IO_QUEUE_DEPTH.dec()
+            STORAGE_IO_OPERATIONS_TOTAL.labels(operation=operation, status=status).inc()
+            STORAGE_IO_DURATION_SECONDS.labels(operation=operation).observe(time.monotonic() - started)
+
+
+_io_executor: Optional[StorageIOExecutor] = None
+
+
+def get_storage_io_executor() -> StorageIOExecutor:
+    """Get the process-wide storage I/O executor."""
+    global _io_executor
+    if _io_executor is None:
+        _io_executor = StorageIOExecutor()
+    return _io_executor
+
+
 class StorageService:
-    """Async-compatible storage service wrapper."""
+    """Async storage service.
+    
+    Blocking backend calls (boto3, shutil) run on the storage I/O executor,
+    so a slow transfer never stalls the event loop. get_url only signs a URL
+    locally and runs inline.
+    """
 
-    def __init__(self, storage: Optional[Storage] = None):
+    def __init__(
+        self,
+        storage: Optional[Storage] = None,
+        executor: Optional[StorageIOExecutor] = None,
+    ):
         """Initialize storage service."""
         self._storage = storage or get_storage()
+        self._executor = executor
+
+    @property
+    def executor(self) -> StorageIOExecutor:
+        return self._executor or get_storage_io_executor()
 
     async def upload_file(
         self,
@@ -534,17 +1074,40 @@ class StorageService:
         Returns:
             StorageResult: Upload result
         """
-        import io
         fileobj = io.BytesIO(content)
-        return self._storage.upload_fileobj(fileobj, key, content_type)
+        return await self.executor.run(
+            "upload", self._storage.upload_fileobj, fileobj, key, content_type,
+            timeout=settings.STORAGE_TRANSFER_TIMEOUT_SECONDS,
+        )
 
-    async def download_file(self, key: str, destination: str) -> bool:
+    async def upload_path(
+        self,
+        file_path: str,
+        key: str,
+        content_type: str = "application/octet-stream",
+        progress_callback: Optional[ProgressCallback] = None,
+    ) -> StorageResult:
+        """Upload a file on disk to storage without reading it into memory."""
+        return await self.executor.run(
+            "upload", self._storage.upload, file_path, key, content_type, progress_callback,
+            timeout=settings.STORAGE_TRANSFER_TIMEOUT_SECONDS,
+        )
+
+    async def download_file(
+        self,
+        key: str,
+        destination: str,
+        progress_callback: Optional[ProgressCallback] = None,
+    ) -> bool:
         """Download a file from storage."""
-        return self._storage.download(key, destination)
+        return await self.executor.run(
+            "download", self._storage.download, key, destination, progress_callback,
+            timeout=settings.STORAGE_TRANSFER_TIMEOUT_SECONDS,
+        )
 
     async def delete_file(self, key: str) -> bool:
         """Delete a file from storage."""
-        return self._storage.delete(key)
+        return await self.executor.run("delete", self._storage.delete, key)
 
     async def get_url(self, key: str, expires_in: int = 3600) -> str:
         """Get URL for a file."""
@@ -552,7 +1115,17 @@ class StorageService:
 
     async def exists(self, key: str) -> bool:
         """Check if a file exists."""
-        return self._storage.exists(key)
+        return await self.executor.run("exists", self._storage.exists, key)
+
+    async def run(
+        self,
+        operation: str,
+        fn: Callable[..., Any],
+        *args: Any,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """Run any other blocking storage call (e.g. multipart steps) on the executor."""
+        return await self.executor.run(operation, fn, *args, timeout=timeout)
 
 
 # Global storage service instance
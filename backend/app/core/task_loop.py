@@ -0,0 +1,150 @@
+"""Persistent event loop for the coroutines of Celery tasks.
+
+Celery tasks are synchronous. Each one used to run its coroutine with
+``asyncio.run()``, which meant a new event loop, a new database engine and
+a new Postgres connection for every task. A prefork worker process now
+starts one loop in a background thread when it starts
+(``worker_process_init``), and tasks hand their coroutines to it with
+``run_async``. The loop owns a pooled database engine (see
+``celery_session_maker``), so database connections, and per-loop clients
+such as the Redis registries, last as long as the process.
+
+A threads-pool worker has no child processes, so it starts one loop for
+all its threads when the worker starts (``worker_init``). That pool does
+not enforce ``task_time_limit`` either, so the loop applies it to each
+coroutine instead.
+
+Elsewhere (Celery beat, scripts, tests) ``run_async`` falls back to
+``asyncio.run()``.
+"""
+
+import asyncio
+import logging
+import threading
+from typing import Any, Coroutine, Optional, TypeVar
+
+from app.core.config import settings
+from app.core.redis import close_loop_redis
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Seconds a stopping worker gives in-flight coroutines and the pool to close
+STOP_TIMEOUT_SECONDS = 10.0
+
+
+class TaskLoop:
+    """An event loop running in a daemon thread for the life of a process."""
+
+    def __init__(self, pooled_engine: bool = True, time_limit: Optional[float] = None):
+        self.loop = asyncio.new_event_loop()
+        self.pooled_engine = pooled_engine
+        self.time_limit = time_limit
+        self._thread = threading.Thread(target=self._run, name="celery-task-loop", daemon=True)
+        self._started = threading.Event()
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.loop.call_soon(self._started.set)
+        self.loop.run_forever()
+
+    def start(self) -> None:
+        if self.pooled_engine:
+            from app.core.database import create_task_engine, register_task_engine
+
+            register_task_engine(self.loop, create_task_engine())
+        self._thread.start()
+        self._started.wait()
+
+    def is_running(self) -> bool:
+        return self._thread.is_alive() and self.loop.is_running()
+
+    def in_loop_thread(self) -> bool:
+        return threading.current_thread() is self._thread
+
+    def run(self, coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+        """Run a coroutine on the loop and wait for its result."""
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            # Time limits and worker shutdown interrupt the waiting thread;
+            # don't leave the coroutine running without anyone waiting on it
+            future.cancel()
+            raise
+
+    def stop(self, timeout: float = STOP_TIMEOUT_SECONDS) -> None:
+        """Cancel what is still running, close the pool and stop the loop."""
+        if self.is_running():
+            try:
+                asyncio.run_coroutine_threadsafe(self._shutdown(), self.loop).result(timeout)
+            except Exception as e:
+                logger.warning(f"Task loop did not shut down cleanly: {e}")
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join(timeout)
+        if not self.loop.is_running():
+            self.loop.close()
+
+    async def _shutdown(self) -> None:
+        current = asyncio.current_task()
+        pending = [task for task in asyncio.all_tasks() if task is not current]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        await close_loop_redis()
+        if self.pooled_engine:
+            from app.core.database import dispose_task_engine
+
+            await dispose_task_engine(self.loop)
+        await self.loop.shutdown_asyncgens()
+
+
+_task_loop: Optional[TaskLoop] = None
+
+
+def start_task_loop(time_limit: Optional[float] = None) -> Optional[TaskLoop]:
+    """Start this process's task loop, if enabled and not yet running.
+
+    Args:
+        time_limit: Seconds after which a task's coroutine is cancelled,
+            for pools that do not enforce Celery's time limit themselves
+    """
+    global _task_loop
+    if not settings.CELERY_PERSISTENT_LOOP:
+        return None
+    if _task_loop is None or not _task_loop.is_running():
+        _task_loop = TaskLoop(time_limit=time_limit)
+        _task_loop.start()
+        logger.info("Started persistent task event loop")
+    return _task_loop
+
+
+def stop_task_loop() -> None:
+    global _task_loop
+    if _task_loop is not None:
+        _task_loop.stop()
+        _task_loop = None
+
+
+def get_task_loop() -> Optional[TaskLoop]:
+    return _task_loop
+
+
+async def _closing_loop_clients(coro: Coroutine[Any, Any, T]) -> T:
+    try:
+        return await coro
+    finally:
+        await close_loop_redis()
+
+
+def run_async(coro: Coroutine[Any, Any, T]) -> T:
+    """Run a Celery task's coroutine to completion.
+
+    Uses the process's task loop when one runs, else a fresh event loop
+    whose per-loop Redis client is closed with it.
+    """
+    task_loop = _task_loop
+    if task_loop is None or not task_loop.is_running() or task_loop.in_loop_thread():
+        return asyncio.run(_closing_loop_clients(coro))
+    return task_loop.run(coro, task_loop.time_limit)
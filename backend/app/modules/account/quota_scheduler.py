@@ -0,0 +1,453 @@
+"""Quota-aware YouTube API call scheduler.
+
+Coordinates YouTube Data API usage across API processes and Celery workers
+so that one account's bulk work cannot starve its latency-critical calls.
+
+Every caller reserves the unit cost of the endpoint it is about to hit
+before making the request. Reservations are made atomically in Redis
+against a per-account daily budget. Each priority class may only draw the
+budget down to its own ceiling, which keeps headroom in reserve for higher
+classes:
+
+- REALTIME (live chat polling/moderation, stream control) may use 100%
+- STANDARD (uploads, stats sync, metadata edits) may use 85%
+- BACKGROUND (analytics backfill) may use 60%
+
+YouTube refills the whole budget once per day at midnight Pacific time, so
+each account's bucket is refilled at that boundary rather than continuously.
+Calls that do not fit are deferred until the next refill.
+"""
+
+import asyncio
+import logging
+import uuid
+import weakref
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from enum import IntEnum
+from typing import AsyncIterator, Optional
+from zoneinfo import ZoneInfo
+
+from app.core.datetime_utils import utcnow
+
+logger = logging.getLogger(__name__)
+
+# Default quota limit per YouTube project/account
+DEFAULT_DAILY_QUOTA_LIMIT = 10000
+
+# YouTube quota resets at midnight Pacific Time
+QUOTA_RESET_TIMEZONE = ZoneInfo("America/Los_Angeles")
+
+# Redis key prefix for per-account quota windows
+QUOTA_KEY_PREFIX = "yt_quota"
+
+
+class QuotaPriority(IntEnum):
+    """Priority class of a YouTube API call (lower value wins)."""
+
+    REALTIME = 0
+    STANDARD = 1
+    BACKGROUND = 2
+
+
+# Fraction of the daily limit each priority class may consume
+PRIORITY_CEILINGS: dict[QuotaPriority, float] = {
+    QuotaPriority.REALTIME: 1.0,
+    QuotaPriority.STANDARD: 0.85,
+    QuotaPriority.BACKGROUND: 0.6,
+}
+
+# Unit cost of YouTube Data API v3 endpoints
+# See https://developers.google.com/youtube/v3/determine_quota_cost
+YOUTUBE_API_UNIT_COSTS: dict[str, int] = {
+    # Videos
+    "videos.list": 1,
+    "videos.insert": 1600,
+    "videos.update": 50,
+    "videos.delete": 50,
+    "thumbnails.set": 50,
+    "channels.list": 1,
+    "playlistItems.list": 1,
+    "search.list": 100,
+    # Live streaming
+    "liveBroadcasts.list": 1,
+    "liveBroadcasts.insert": 50,
+    "liveBroadcasts.update": 50,
+    "liveBroadcasts.delete": 50,
+    "liveBroadcasts.bind": 50,
+    "liveBroadcasts.transition": 50,
+    "liveStreams.list": 1,
+    "liveStreams.insert": 50,
+    # Live chat
+    "liveChatMessages.list": 5,
+    "liveChatMessages.insert": 50,
+    "liveChatMessages.delete": 50,
+    "liveChatBans.insert": 50,
+    "liveChatBans.delete": 50,
+    # YouTube Analytics API (separate quota, tracked for visibility only)
+    "reports.query": 0,
+}
+
+# Atomically reserve units if the class ceiling allows it.
+# KEYS[1] = window hash key
+# ARGV = cost, ceiling, priority field, now timestamp, expire-at timestamp, force
+_RESERVE_SCRIPT = """
+local used = tonumber(redis.call('HGET', KEYS[1], 'used') or '0')
+local cost = tonumber(ARGV[1])
+local ceiling = tonumber(ARGV[2])
+if ARGV[6] ~= '1' and used + cost > ceiling then
+    return {0, used}
+end
+used = redis.call('HINCRBY', KEYS[1], 'used', cost)
+redis.call('HINCRBY', KEYS[1], ARGV[3], cost)
+redis.call('HSETNX', KEYS[1], 'first_at', ARGV[4])
+redis.call('EXPIREAT', KEYS[1], ARGV[5])
+return {1, used}
+"""
+
+
+class QuotaDeferredError(Exception):
+    """Raised when a YouTube API call must wait for quota headroom."""
+
+    def __init__(self, decision: "QuotaDecision"):
+        self.decision = decision
+        self.retry_after_seconds = decision.retry_after_seconds or 0.0
+        super().__init__(
+            f"YouTube quota deferred for account {decision.account_id}: "
+            f"{decision.endpoint} needs {decision.cost} units, "
+            f"{decision.used}/{decision.limit} used "
+            f"(priority {decision.priority.name})"
+        )
+
+
+@dataclass
+class QuotaDecision:
+    """Outcome of a quota reservation attempt."""
+
+    account_id: uuid.UUID
+    endpoint: str
+    cost: int
+    priority: QuotaPriority
+    allowed: bool
+    used: int
+    limit: int
+    reset_at: datetime
+    retry_after_seconds: Optional[float] = None
+
+
+@dataclass
+class QuotaStatus:
+    """Current quota state for a single account."""
+
+    account_id: uuid.UUID
+    used: int
+    limit: int
+    reset_at: datetime
+    used_by_priority: dict[str, int] = field(default_factory=dict)
+    predicted_exhaustion_at: Optional[datetime] = None
+
+    @property
+    def remaining(self) -> int:
+        """Units left in the current window."""
+        return max(0, self.limit - self.used)
+
+    def remaining_for(self, priority: QuotaPriority) -> int:
+        """Units a given priority class may still consume."""
+        return max(0, priority_ceiling(self.limit, priority) - self.used)
+
+
+def get_endpoint_cost(endpoint: str) -> int:
+    """Get the unit cost of a YouTube API endpoint.
+
+    Args:
+        endpoint: Endpoint name, e.g. "videos.insert"
+
+    Returns:
+        int: Unit cost (unknown endpoints are charged as a list call)
+    """
+    cost = YOUTUBE_API_UNIT_COSTS.get(endpoint)
+    if cost is None:
+        logger.warning(f"Unknown YouTube endpoint '{endpoint}', charging 1 unit")
+        return 1
+    return cost
+
+
+def estimate_cost(*endpoints: str) -> int:
+    """Sum the unit cost of several endpoint calls made together."""
+    return sum(get_endpoint_cost(endpoint) for endpoint in endpoints)
+
+
+def priority_ceiling(limit: int, priority: QuotaPriority) -> int:
+    """Get the highest usage a priority class may push the budget to."""
+    return int(limit * PRIORITY_CEILINGS[priority])
+
+
+def can_spend(used: int, cost: int, limit: int, priority: QuotaPriority) -> bool:
+    """Check whether a call fits under its priority class ceiling.
+
+    Args:
+        used: Units already used in this window
+        cost: Units the call needs
+        limit: Daily limit for the account
+        priority: Priority class of the call
+
+    Returns:
+        bool: True if the call may proceed now
+    """
+    return used + cost <= priority_ceiling(limit, priority)
+
+
+def get_quota_window(now: Optional[datetime] = None) -> tuple[str, datetime, datetime]:
+    """Get the quota window containing a point in time.
+
+    Args:
+        now: Reference time (defaults to current UTC time)
+
+    Returns:
+        tuple: (window id, window start in UTC, reset time in UTC)
+    """
+    now = now or utcnow()
+    if now.tzinfo is None:
+        now = now.replace(tzinfo=timezone.utc)
+
+    local_now = now.astimezone(QUOTA_RESET_TIMEZONE)
+    local_start = local_now.replace(hour=0, minute=0, second=0, microsecond=0)
+    # Wall-clock arithmetic keeps DST transitions correct
+    local_reset = local_start + timedelta(days=1)
+
+    return (
+        local_start.strftime("%Y%m%d"),
+        local_start.astimezone(timezone.utc),
+        local_reset.astimezone(timezone.utc),
+    )
+
+
+def predict_exhaustion(
+    used: int,
+    limit: int,
+    window_start: datetime,
+    reset_at: datetime,
+    now: Optional[datetime] = None,
+) -> Optional[datetime]:
+    """Predict when the budget runs out at the current burn rate.
+
+    The burn rate is the average consumption since the start of the
+    window (or since the first reservation, if passed as window_start).
+
+    Args:
+        used: Units used so far
+        limit: Daily limit
+        window_start: When consumption started being measured
+        reset_at: When the budget refills
+        now: Reference time
+
+    Returns:
+        Optional[datetime]: Predicted exhaustion time, or None if the
+        budget is expected to last until the reset
+    """
+    now = now or utcnow()
+    if used >= limit:
+        return now
+
+    elapsed = (now - window_start).total_seconds()
+    if used <= 0 or elapsed <= 0:
+        return None
+
+    rate_per_second = used / elapsed
+    exhausted_at = now + timedelta(seconds=(limit - used) / rate_per_second)
+    if exhausted_at >= reset_at:
+        return None
+    return exhausted_at
+
+
+class YouTubeQuotaScheduler:
+    """Per-account YouTube quota budgets shared through Redis.
+
+    Usage:
+        scheduler = get_quota_scheduler()
+        async with scheduler.reserve(account_id, "videos.insert", QuotaPriority.STANDARD):
+            await client.upload_video(...)
+    """
+
+    def __init__(self, redis=None, daily_limit: int = DEFAULT_DAILY_QUOTA_LIMIT):
+        """Initialize scheduler.
+
+        Args:
+            redis: Async Redis client (defaults to the shared app client)
+            daily_limit: Daily unit budget per account
+        """
+        if redis is None:
+            from app.core.redis import redis_client
+            redis = redis_client
+        self.redis = redis
+        self.daily_limit = daily_limit
+
+    @staticmethod
+    def _window_key(account_id: uuid.UUID, window_id: str) -> str:
+        return f"{QUOTA_KEY_PREFIX}:{account_id}:{window_id}"
+
+    async def acquire(
+        self,
+        account_id: uuid.UUID,
+        endpoint: str,
+        priority: QuotaPriority = QuotaPriority.STANDARD,
+        units: Optional[int] = None,
+        force: bool = False,
+    ) -> QuotaDecision:
+        """Try to reserve quota for a call.
+
+        Args:
+            account_id: YouTube account UUID
+            endpoint: Endpoint name used for cost lookup and logging
+            priority: Priority class of the call
+            units: Explicit unit cost (overrides the endpoint cost)
+            force: Record usage even if it exceeds the ceiling
+                (for calls that already happened)
+
+        Returns:
+            QuotaDecision: Whether the call may proceed
+        """
+        cost = units if units is not None else get_endpoint_cost(endpoint)
+        now = utcnow()
+        window_id, _, reset_at = get_quota_window(now)
+        ceiling = priority_ceiling(self.daily_limit, priority)
+
+        try:
+            allowed, used = await self.redis.eval(
+                _RESERVE_SCRIPT,
+                1,
+                self._window_key(account_id, window_id),
+                cost,
+                ceiling,
+                f"p:{priority.name.lower()}",
+                int(now.timestamp()),
+                int(reset_at.timestamp()) + 3600,
+                "1" if force else "0",
+            )
+        except Exception as e:
+            # Fail open: a Redis outage must not stop uploads or moderation
+            logger.warning(f"Quota scheduler unavailable, allowing {endpoint}: {e}")
+            return QuotaDecision(
+                account_id=account_id,
+                endpoint=endpoint,
+                cost=cost,
+                priority=priority,
+                allowed=True,
+                used=0,
+                limit=self.daily_limit,
+                reset_at=reset_at,
+            )
+
+        decision = QuotaDecision(
+            account_id=account_id,
+            endpoint=endpoint,
+            cost=cost,
+            priority=priority,
+            allowed=bool(int(allowed)),
+            used=int(used),
+            limit=self.daily_limit,
+            reset_at=reset_at,
+        )
+
+        if decision.allowed:
+            self._record_metric(account_id, decision.used)
+        else:
+            decision.retry_after_seconds = max(1.0, (reset_at - now).total_seconds())
+            logger.info(
+                f"Deferred {endpoint} ({cost} units, {priority.name}) for account "
+                f"{account_id}: {decision.used}/{self.daily_limit} used"
+            )
+
+        return decision
+
+    async def record(self, account_id: uuid.UUID, units: int, endpoint: str = "manual") -> int:
+        """Record usage that bypassed the scheduler.
+
+        Args:
+            account_id: YouTube account UUID
+            units: Units consumed
+            endpoint: Label for logging
+
+        Returns:
+            int: Units used in the current window after recording
+        """
+        decision = await self.acquire(
+            account_id, endpoint, QuotaPriority.REALTIME, units=units, force=True
+        )
+        return decision.used
+
+    @asynccontextmanager
+    async def reserve(
+        self,
+        account_id: uuid.UUID,
+        endpoint: str,
+        priority: QuotaPriority = QuotaPriority.STANDARD,
+        units: Optional[int] = None,
+    ) -> AsyncIterator[QuotaDecision]:
+        """Reserve quota around a call, raising if it must be deferred.
+
+        Raises:
+            QuotaDeferredError: If the priority class has no headroom left
+        """
+        decision = await self.acquire(account_id, endpoint, priority, units=units)
+        if not decision.allowed:
+            raise QuotaDeferredError(decision)
+        yield decision
+
+    async def get_status(self, account_id: uuid.UUID) -> QuotaStatus:
+        """Get current usage and predicted exhaustion for an account."""
+        now = utcnow()
+        window_id, window_start, reset_at = get_quota_window(now)
+        data = await self.redis.hgetall(self._window_key(account_id, window_id)) or {}
+
+        used = int(data.get("used", 0))
+        used_by_priority = {
+            key[2:]: int(value) for key, value in data.items() if key.startswith("p:")
+        }
+        first_at = data.get("first_at")
+        measured_from = (
+            datetime.fromtimestamp(int(first_at), tz=timezone.utc) if first_at else window_start
+        )
+        # Measure the burn rate from the first reservation, over at least
+        # 15 minutes so a fresh burst does not extrapolate wildly
+        measured_from = min(measured_from, now - timedelta(minutes=15))
+        measured_from = max(measured_from, window_start)
+
+        return QuotaStatus(
+            account_id=account_id,
+            used=used,
+            limit=self.daily_limit,
+            reset_at=reset_at,
+            used_by_priority=used_by_priority,
+            predicted_exhaustion_at=predict_exhaustion(
+                used, self.daily_limit, measured_from, reset_at, now
+            ),
+        )
+
+    @staticmethod
+    def _record_metric(account_id: uuid.UUID, used: int) -> None:
+        try:
+            from app.core.metrics import YOUTUBE_API_QUOTA_USED
+            YOUTUBE_API_QUOTA_USED.labels(account_id=str(account_id)).set(used)
+        except Exception:
+            pass
+
+
+# One scheduler per event loop: async Redis connections cannot be shared
+# across loops. Each uses its loop's client, which is closed with the loop.
+_schedulers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, YouTubeQuotaScheduler]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_quota_scheduler() -> YouTubeQuotaScheduler:
+    """Get the quota scheduler for the running event loop."""
+    from app.core.redis import get_loop_redis
+
+    loop = asyncio.get_running_loop()
+    scheduler = _schedulers.get(loop)
+    if scheduler is None:
+        scheduler = YouTubeQuotaScheduler(redis=get_loop_redis())
+        _schedulers[loop] = scheduler
+    return scheduler
@@ -106,6 +106,7 @@ class QuotaUsageResponse(BaseModel):
     usage_percent: float
     quota_reset_at: Optional[datetime] = None
     is_approaching_limit: bool
+    predicted_exhaustion_at: Optional[datetime] = None
 
 
 class ChannelMetadata(BaseModel):
@@ -14,6 +14,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.datetime_utils import utcnow, to_naive_utc
 from app.modules.account.models import AccountStatus, YouTubeAccount
 from app.modules.account.oauth import OAuthError, OAuthStateStore, YouTubeOAuthClient
+from app.modules.account.quota_scheduler import get_quota_scheduler
 from app.modules.account.repository import YouTubeAccountRepository
 from app.modules.account.schemas import (
     AccountHealthResponse,
@@ -242,15 +243,26 @@ class YouTubeAccountService:
         if not account:
             raise AccountNotFoundError(f"Account {account_id} not found")
 
-        usage_percent = account.get_quota_usage_percent(daily_limit)
+        daily_quota_used = account.daily_quota_used
+        predicted_exhaustion_at = None
+        try:
+            status = await get_quota_scheduler().get_status(account.id)
+            # Scheduler counts every reserved call, the column only manual increments
+            daily_quota_used = max(daily_quota_used, status.used)
+            predicted_exhaustion_at = status.predicted_exhaustion_at
+        except Exception as e:
+            logger.warning(f"Quota scheduler status unavailable for {account_id}: {e}")
+
+        usage_percent = min(100.0, daily_quota_used / daily_limit * 100) if daily_limit else 100.0
 
         return QuotaUsageResponse(
             account_id=account.id,
-            daily_quota_used=account.daily_quota_used,
+            daily_quota_used=daily_quota_used,
             daily_limit=daily_limit,
             usage_percent=usage_percent,
             quota_reset_at=account.quota_reset_at,
             is_approaching_limit=usage_percent >= 80.0,
+            predicted_exhaustion_at=predicted_exhaustion_at,
         )
 
     async def sync_channel_data(
@@ -472,6 +484,8 @@ class YouTubeAccountService:
 
         account = await self.repository.increment_quota_usage(account, amount)
         await self.session.commit()
+        # Keep the shared scheduler budget in step with manually reported usage
+        await get_quota_scheduler().record(account_id, amount)
         # Refresh account to get updated data after commit
         await self.session.refresh(account)
         return account
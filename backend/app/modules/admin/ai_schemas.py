@@ -21,6 +21,9 @@ class AIFeatureUsage(BaseModel):
     cost_usd: float = Field(description="Total cost in USD")
     success_rate: float = Field(ge=0, le=100, description="Success rate percentage")
     avg_latency_ms: float = Field(description="Average latency in milliseconds")
+    cache_hits: int = Field(default=0, description="Requests answered from the response cache")
+    tokens_saved: int = Field(default=0, description="Estimated tokens saved by cache hits")
+    cost_saved_usd: float = Field(default=0.0, description="Estimated cost saved by cache hits")
 
 
 class AIDashboardMetrics(BaseModel):
@@ -37,6 +40,8 @@ class AIDashboardMetrics(BaseModel):
     period_start: datetime = Field(description="Start of the reporting period")
     period_end: datetime = Field(description="End of the reporting period")
     is_throttled: bool = Field(default=False, description="Whether AI is currently throttled")
+    total_cache_hits: int = Field(default=0, description="Requests answered from the response cache")
+    total_cost_saved_usd: float = Field(default=0.0, description="Estimated cost saved by cache hits")
 
 
 # ==================== AI Limits Config Schemas (Requirements 13.2) ====================
@@ -141,6 +146,7 @@ class AIBudgetStatus(BaseModel):
     throttle_threshold_percentage: int = Field(description="Percentage at which throttling kicks in")
     alert_thresholds: list[int] = Field(description="Alert threshold percentages")
     alerts_sent: list[int] = Field(description="Thresholds for which alerts were sent")
+    cache_savings_usd: float = Field(default=0.0, description="Estimated spend avoided by the response cache this month")
 
 
 class AIBudgetConfig(BaseModel):
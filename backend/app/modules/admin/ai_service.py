@@ -225,6 +225,9 @@ class AdminAIService:
         total_tokens = sum(f.tokens_used for f in usage_by_feature)
         total_cost = sum(f.cost_usd for f in usage_by_feature)
         
+        total_cache_hits = sum(f.cache_hits for f in usage_by_feature)
+        total_cost_saved = sum(f.cost_saved_usd for f in usage_by_feature)
+        
         budget_used_pct = (total_cost / monthly_budget * 100) if monthly_budget > 0 else 0
         is_throttled = budget_used_pct >= throttle_at
 
@@ -238,6 +241,8 @@ class AdminAIService:
             period_start=start_date,
             period_end=end_date,
             is_throttled=is_throttled,
+            total_cache_hits=total_cache_hits,
+            total_cost_saved_usd=round(total_cost_saved, 2),
         )
 
     async def _get_usage_by_feature(
@@ -249,19 +254,26 @@ class AdminAIService:
         
         In production, this queries the ai_logs table.
         For now, returns aggregated data from available sources.
+        Response cache hits are counted separately from API calls.
         """
         # Try to query AILog model if it exists
         try:
             from app.modules.ai.models import AILog
             
+            api_call = AILog.cache_hit == False
             result = await self.db.execute(
                 select(
                     AILog.feature,
-                    func.count(AILog.id).label("api_calls"),
+                    func.count(AILog.id).filter(api_call).label("api_calls"),
                     func.sum(AILog.total_tokens).label("tokens_used"),
                     func.sum(AILog.cost_usd).label("cost_usd"),
-                    func.avg(AILog.latency_ms).label("avg_latency"),
-                    func.count(AILog.id).filter(AILog.status == "success").label("success_count"),
+                    func.avg(AILog.latency_ms).filter(api_call).label("avg_latency"),
+                    func.count(AILog.id).filter(
+                        and_(api_call, AILog.status == "success")
+                    ).label("success_count"),
+                    func.count(AILog.id).filter(AILog.cache_hit == True).label("cache_hits"),
+                    func.sum(AILog.tokens_saved).label("tokens_saved"),
+                    func.sum(AILog.cost_saved_usd).label("cost_saved_usd"),
                 ).where(
                     and_(
                         AILog.created_at >= start_date,
@@ -284,6 +296,9 @@ class AdminAIService:
                     cost_usd=round(row.cost_usd or 0, 4),
                     success_rate=round(success_rate, 2),
                     avg_latency_ms=round(row.avg_latency or 0, 2),
+                    cache_hits=row.cache_hits or 0,
+                    tokens_saved=row.tokens_saved or 0,
+                    cost_saved_usd=round(row.cost_saved_usd or 0, 4),
                 ))
             
             return usage if usage else self._get_default_usage()
@@ -555,6 +570,7 @@ class AdminAIService:
         month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
         
         current_spend = await self._get_current_month_spend(month_start, now)
+        cache_savings = await self._get_current_month_cache_savings(month_start, now)
         
         remaining = max(0, monthly_budget - current_spend)
         budget_used_pct = (current_spend / monthly_budget * 100) if monthly_budget > 0 else 0
@@ -582,6 +598,7 @@ class AdminAIService:
             throttle_threshold_percentage=throttle_at,
             alert_thresholds=alert_thresholds,
             alerts_sent=alerts_sent,
+            cache_savings_usd=round(cache_savings, 2),
         )
 
     async def _get_current_month_spend(
@@ -605,6 +622,28 @@ class AdminAIService:
         except Exception:
             return 0.0
 
+    async def _get_current_month_cache_savings(
+        self,
+        month_start: datetime,
+        month_end: datetime,
+    ) -> float:
+        """Get AI spend avoided by response cache hits this month."""
+        try:
+            from app.modules.ai.models import AILog
+            
+            result = await self.db.execute(
+                select(func.sum(AILog.cost_saved_usd)).where(
+                    and_(
+                        AILog.created_at >= month_start,
+                        AILog.created_at <= month_end,
+                        AILog.cache_hit == True,
+                    )
+                )
+            )
+            return result.scalar() or 0.0
+        except Exception:
+            return 0.0
+
     async def _get_alerts_sent_this_month(self) -> list[int]:
         """Get list of alert thresholds that have been triggered this month."""
         # In production, this would query an alerts table
@@ -0,0 +1,399 @@
+"""Daily platform metrics rollups for admin analytics.
+
+Computes signups, actives, MRR by plan, churn, streams and videos per day
+with one grouped query per source table for a whole date range, and
+persists them to platform_metrics_daily.
+Requirements: 2.1, 2.2
+"""
+
+import logging
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from typing import Iterable, Optional
+
+from sqlalchemy import and_, case, func, or_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.datetime_utils import utcnow, to_naive_utc
+from app.modules.admin.models import PlatformMetricsDaily
+
+logger = logging.getLogger(__name__)
+
+# Default backfill horizon for the rollup task
+DEFAULT_BACKFILL_DAYS = 400
+
+
+@dataclass
+class DailyPlatformMetrics:
+    """Platform metrics for one day (mirrors PlatformMetricsDaily)."""
+
+    metric_date: date
+    signups: int = 0
+    total_users: int = 0
+    active_users: int = 0
+    mrr: float = 0.0
+    mrr_by_plan: dict[str, float] = field(default_factory=dict)
+    active_subscriptions: int = 0
+    churned_subscriptions: int = 0
+    new_streams: int = 0
+    total_streams: int = 0
+    new_videos: int = 0
+    total_videos: int = 0
+
+    @classmethod
+    def from_row(cls, row: PlatformMetricsDaily) -> "DailyPlatformMetrics":
+        return cls(
+            metric_date=row.metric_date,
+            signups=row.signups,
+            total_users=row.total_users,
+            active_users=row.active_users,
+            mrr=row.mrr,
+            mrr_by_plan=dict(row.mrr_by_plan or {}),
+            active_subscriptions=row.active_subscriptions,
+            churned_subscriptions=row.churned_subscriptions,
+            new_streams=row.new_streams,
+            total_streams=row.total_streams,
+            new_videos=row.new_videos,
+            total_videos=row.total_videos,
+        )
+
+    def to_values(self) -> dict:
+        return {
+            "metric_date": self.metric_date,
+            "signups": self.signups,
+            "total_users": self.total_users,
+            "active_users": self.active_users,
+            "mrr": round(self.mrr, 2),
+            "mrr_by_plan": {plan: round(value, 2) for plan, value in self.mrr_by_plan.items()},
+            "active_subscriptions": self.active_subscriptions,
+            "churned_subscriptions": self.churned_subscriptions,
+            "new_streams": self.new_streams,
+            "total_streams": self.total_streams,
+            "new_videos": self.new_videos,
+            "total_videos": self.total_videos,
+        }
+
+
+@dataclass
+class SubscriptionSpan:
+    """Lifetime and monthly value of one subscription."""
+
+    plan_tier: str
+    monthly_value: float
+    created_at: datetime
+    canceled_at: Optional[datetime] = None
+
+
+def subscription_monthly_value(
+    billing_cycle: Optional[str],
+    price_monthly: Optional[int],
+    price_yearly: Optional[int],
+) -> float:
+    """Monthly recurring value in currency units (prices are in cents)."""
+    if billing_cycle == "yearly":
+        return ((price_yearly or 0) / 100) / 12
+    return (price_monthly or 0) / 100
+
+
+def subscription_end(status: str, canceled_at: Optional[datetime]) -> Optional[datetime]:
+    """When a subscription stopped counting toward MRR, or None if it still does.
+
+    Matches calculate_current_mrr: an ACTIVE subscription counts even when
+    it is set to cancel at period end. A CANCELED one counted until it was
+    canceled.
+    """
+    from app.modules.billing.models import SubscriptionStatus
+
+    if status == SubscriptionStatus.ACTIVE.value:
+        return None
+    return canceled_at
+
+
+def date_range(start_day: date, end_day: date) -> list[date]:
+    """Inclusive list of days."""
+    return [start_day + timedelta(days=i) for i in range((end_day - start_day).days + 1)]
+
+
+def day_start(day: date) -> datetime:
+    """Naive UTC midnight starting a day."""
+    return datetime.combine(day, time.min)
+
+
+def _as_day(value) -> date:
+    """Normalize a DB date/datetime value to a date."""
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+
+def sweep_subscriptions(
+    spans: Iterable[SubscriptionSpan],
+    days: list[date],
+) -> dict[date, tuple[int, float, dict[str, float], int]]:
+    """Compute end-of-day subscription state for each day.
+
+    A subscription counts as active at the end of a day when it was created
+    before the day ended and not canceled by then. Runs as a single sweep
+    over creation/cancellation events.
+
+    Args:
+        spans: Subscriptions overlapping the range
+        days: Consecutive days to compute
+
+    Returns:
+        dict: day -> (active count, MRR, MRR by plan, churned that day)
+    """
+    if not days:
+        return {}
+
+    first_day = days[0]
+    active = 0
+    mrr_by_plan: dict[str, float] = defaultdict(float)
+    # Events keyed by the day on which they take effect (end of that day)
+    starts: dict[date, list[SubscriptionSpan]] = defaultdict(list)
+    ends: dict[date, list[SubscriptionSpan]] = defaultdict(list)
+
+    for span in spans:
+        if span.canceled_at is not None and _as_day(span.canceled_at) < first_day:
+            continue
+        created_day = _as_day(span.created_at)
+        if created_day < first_day:
+            active += 1
+            mrr_by_plan[span.plan_tier] += span.monthly_value
+        else:
+            starts[created_day].append(span)
+        if span.canceled_at is not None:
+            ends[_as_day(span.canceled_at)].append(span)
+
+    result = {}
+    for day in days:
+        for span in starts.get(day, []):
+            active += 1
+            mrr_by_plan[span.plan_tier] += span.monthly_value
+        churned = 0
+        for span in ends.get(day, []):
+            active -= 1
+            churned += 1
+            mrr_by_plan[span.plan_tier] -= span.monthly_value
+        plans = {plan: round(value, 2) for plan, value in mrr_by_plan.items() if round(value, 2) > 0}
+        result[day] = (active, sum(plans.values()), plans, churned)
+
+    return result
+
+
+def cumulative_series(
+    base: int,
+    per_day: dict[date, int],
+    days: list[date],
+) -> dict[date, int]:
+    """Running totals from a starting count and per-day increments."""
+    totals = {}
+    running = base
+    for day in days:
+        running += per_day.get(day, 0)
+        totals[day] = running
+    return totals
+
+
+async def calculate_current_mrr(session: AsyncSession) -> float:
+    """Current MRR of active subscriptions with one join-and-sum."""
+    from app.modules.billing.models import Plan, Subscription, SubscriptionStatus
+
+    monthly_value = case(
+        (Subscription.billing_cycle == "yearly", Plan.price_yearly / 12.0),
+        else_=Plan.price_monthly,
+    )
+    result = await session.execute(
+        select(func.coalesce(func.sum(monthly_value), 0))
+        .select_from(Subscription)
+        .join(Plan, Plan.slug == Subscription.plan_tier)
+        .where(Subscription.status == SubscriptionStatus.ACTIVE.value)
+    )
+    # Plan prices are stored in cents
+    return float(result.scalar() or 0) / 100
+
+
+class PlatformMetricsRollupService:
+    """Compute, persist and read daily platform metrics rollups.
+
+    Requirements: 2.1, 2.2
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def compute_range(self, start_day: date, end_day: date) -> list[DailyPlatformMetrics]:
+        """Compute metrics for every day in a range from source tables.
+
+        Issues a fixed number of grouped queries regardless of the range
+        length.
+        """
+        from app.modules.auth.models import User
+        from app.modules.billing.models import Plan, Subscription, SubscriptionStatus
+        from app.modules.stream.stream_job_models import StreamJob
+        from app.modules.video.models import Video
+
+        days = date_range(start_day, end_day)
+        if not days:
+            return []
+        range_start = day_start(start_day)
+        range_end = day_start(end_day + timedelta(days=1))
+
+        signups, users_before = await self._daily_counts(User.created_at, range_start, range_end)
+        active_users, _ = await self._daily_counts(
+            User.last_login_at, range_start, range_end, with_base=False
+        )
+        new_streams, streams_before = await self._daily_counts(
+            StreamJob.created_at, range_start, range_end
+        )
+        new_videos, videos_before = await self._daily_counts(
+            Video.created_at, range_start, range_end
+        )
+
+        # Subscriptions overlapping the range with their plan prices (one join).
+        # Only ACTIVE ones and CANCELED ones up to their cancellation count,
+        # as in calculate_current_mrr.
+        sub_result = await self.session.execute(
+            select(
+                Subscription.plan_tier,
+                Subscription.billing_cycle,
+                Subscription.status,
+                Subscription.created_at,
+                Subscription.canceled_at,
+                Plan.price_monthly,
+                Plan.price_yearly,
+            )
+            .outerjoin(Plan, Plan.slug == Subscription.plan_tier)
+            .where(
+                and_(
+                    Subscription.created_at < range_end,
+                    or_(
+                        Subscription.status == SubscriptionStatus.ACTIVE.value,
+                        and_(
+                            Subscription.status == SubscriptionStatus.CANCELED.value,
+                            Subscription.canceled_at >= range_start,
+                        ),
+                    ),
+                )
+            )
+        )
+        spans = [
+            SubscriptionSpan(
+                plan_tier=row.plan_tier,
+                monthly_value=subscription_monthly_value(
+                    row.billing_cycle, row.price_monthly, row.price_yearly
+                ),
+                created_at=to_naive_utc(row.created_at),
+                canceled_at=to_naive_utc(end) if end else None,
+            )
+            for row in sub_result.all()
+            for end in [subscription_end(row.status, row.canceled_at)]
+        ]
+        subscriptions = sweep_subscriptions(spans, days)
+
+        total_users = cumulative_series(users_before, signups, days)
+        total_streams = cumulative_series(streams_before, new_streams, days)
+        total_videos = cumulative_series(videos_before, new_videos, days)
+
+        metrics = []
+        for day in days:
+            active_subs, mrr, mrr_by_plan, churned = subscriptions[day]
+            metrics.append(DailyPlatformMetrics(
+                metric_date=day,
+                signups=signups.get(day, 0),
+                total_users=total_users[day],
+                active_users=active_users.get(day, 0),
+                mrr=mrr,
+                mrr_by_plan=mrr_by_plan,
+                active_subscriptions=active_subs,
+                churned_subscriptions=churned,
+                new_streams=new_streams.get(day, 0),
+                total_streams=total_streams[day],
+                new_videos=new_videos.get(day, 0),
+                total_videos=total_videos[day],
+            ))
+        return metrics
+
+    async def _daily_counts(
+        self,
+        column,
+        range_start: datetime,
+        range_end: datetime,
+        with_base: bool = True,
+    ) -> tuple[dict[date, int], int]:
+        """Count rows per day of a timestamp column, plus rows before the range."""
+        day = func.date(column)
+        result = await self.session.execute(
+            select(day, func.count())
+            .where(and_(column >= range_start, column < range_end))
+            .group_by(day)
+        )
+        per_day = {_as_day(row[0]): row[1] for row in result.all()}
+
+        base = 0
+        if with_base:
+            base_result = await self.session.execute(
+                select(func.count()).where(column < range_start)
+            )
+            base = base_result.scalar() or 0
+
+        return per_day, base
+
+    async def refresh(self, start_day: date, end_day: date) -> int:
+        """Recompute and upsert rollup rows for a range (idempotent).
+
+        Returns:
+            int: Number of days written
+        """
+        metrics = await self.compute_range(start_day, end_day)
+        if not metrics:
+            return 0
+
+        rows = [m.to_values() for m in metrics]
+        stmt = insert(PlatformMetricsDaily).values(rows)
+        update_columns = {
+            key: stmt.excluded[key] for key in rows[0] if key != "metric_date"
+        }
+        update_columns["computed_at"] = func.now()
+        await self.session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[PlatformMetricsDaily.metric_date],
+                set_=update_columns,
+            )
+        )
+        await self.session.commit()
+        return len(rows)
+
+    async def get_last_rollup_date(self) -> Optional[date]:
+        result = await self.session.execute(select(func.max(PlatformMetricsDaily.metric_date)))
+        return result.scalar()
+
+    async def get_range(self, start_day: date, end_day: date) -> dict[date, DailyPlatformMetrics]:
+        """Read rollups for a range, computing any missing days live.
+
+        Today is always computed live since its rollup is still moving.
+        """
+        today = to_naive_utc(utcnow()).date()
+        result = await self.session.execute(
+            select(PlatformMetricsDaily).where(
+                and_(
+                    PlatformMetricsDaily.metric_date >= start_day,
+                    PlatformMetricsDaily.metric_date <= end_day,
+                    PlatformMetricsDaily.metric_date < today,
+                )
+            )
+        )
+        by_day = {
+            row.metric_date: DailyPlatformMetrics.from_row(row)
+            for row in result.scalars().all()
+        }
+
+        missing = [day for day in date_range(start_day, end_day) if day not in by_day]
+        if missing:
+            # One computation spanning the gap, however many days are missing
+            for metrics in await self.compute_range(missing[0], missing[-1]):
+                by_day.setdefault(metrics.metric_date, metrics)
+
+        return by_day
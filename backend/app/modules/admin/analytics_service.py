@@ -10,10 +10,14 @@ from datetime import datetime, timedelta
 from typing import Optional, Literal
 from collections import defaultdict
 
-from sqlalchemy import select, func, and_, or_, extract, case
+from sqlalchemy import select, func, and_, extract, case
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.datetime_utils import utcnow, to_naive_utc
+from app.modules.admin.analytics_rollup import (
+    PlatformMetricsRollupService,
+    calculate_current_mrr,
+)
 from app.modules.admin.analytics_schemas import (
     PlatformMetricsResponse,
     PeriodComparison,
@@ -188,37 +192,13 @@ class AdminAnalyticsService:
 
     async def _calculate_mrr(self) -> float:
         """Calculate current Monthly Recurring Revenue."""
-        from app.modules.billing.models import Subscription, SubscriptionStatus, Plan
-        
-        result = await self.session.execute(
-            select(Subscription).where(
-                Subscription.status == SubscriptionStatus.ACTIVE.value
-            )
-        )
-        subscriptions = result.scalars().all()
-        
-        mrr = 0.0
-        for sub in subscriptions:
-            # Get plan price
-            plan_result = await self.session.execute(
-                select(Plan).where(Plan.slug == sub.plan_tier)
-            )
-            plan = plan_result.scalar_one_or_none()
-            
-            if plan:
-                if sub.billing_cycle == "yearly":
-                    mrr += (plan.price_yearly / 100) / 12
-                else:
-                    mrr += plan.price_monthly / 100
-        
-        return mrr
+        return await calculate_current_mrr(self.session)
 
     async def _calculate_mrr_at_date(self, date: datetime) -> float:
-        """Calculate MRR at a specific date (simplified)."""
-        # For simplicity, return current MRR with slight variation
-        # In production, this would query historical subscription data
-        current_mrr = await self._calculate_mrr()
-        return current_mrr * 0.95  # Assume 5% growth
+        """Calculate MRR at the end of a specific day from the daily rollup."""
+        day = date.date()
+        metrics = await PlatformMetricsRollupService(self.session).get_range(day, day)
+        return metrics[day].mrr
 
     async def _get_stream_counts(self) -> tuple[int, int]:
         """Get total and active stream counts."""
@@ -290,9 +270,6 @@ class AdminAnalyticsService:
         Returns:
             Growth metrics response
         """
-        from app.modules.auth.models import User
-        from app.modules.billing.models import Subscription, SubscriptionStatus
-        
         if not end_date:
             end_date = to_naive_utc(utcnow())
         if not start_date:
@@ -301,14 +278,16 @@ class AdminAnalyticsService:
         # Generate date points based on granularity
         date_points = self._generate_date_points(start_date, end_date, granularity)
         
+        # Daily rollups cover every date point with a single read
+        daily = await PlatformMetricsRollupService(self.session).get_range(
+            date_points[0].date(), date_points[-1].date()
+        )
+        
         # User growth data
-        user_growth = []
-        for date in date_points:
-            count_result = await self.session.execute(
-                select(func.count(User.id)).where(User.created_at <= date)
-            )
-            count = count_result.scalar() or 0
-            user_growth.append(GrowthDataPoint(date=date, value=float(count)))
+        user_growth = [
+            GrowthDataPoint(date=date, value=float(daily[date.date()].total_users))
+            for date in date_points
+        ]
         
         # Calculate user growth rate
         if len(user_growth) >= 2 and user_growth[0].value > 0:
@@ -316,11 +295,11 @@ class AdminAnalyticsService:
         else:
             user_growth_rate = 0.0
         
-        # Revenue growth data (simplified - using subscription count as proxy)
-        revenue_growth = []
-        for date in date_points:
-            mrr = await self._calculate_mrr_at_date(date)
-            revenue_growth.append(GrowthDataPoint(date=date, value=mrr))
+        # Revenue growth data (end-of-day MRR from the rollup)
+        revenue_growth = [
+            GrowthDataPoint(date=date, value=daily[date.date()].mrr)
+            for date in date_points
+        ]
         
         # Calculate revenue growth rate
         if len(revenue_growth) >= 2 and revenue_growth[0].value > 0:
@@ -329,7 +308,7 @@ class AdminAnalyticsService:
             revenue_growth_rate = 0.0
         
         # Churn data
-        churn_data = await self._calculate_churn_data(date_points)
+        churn_data = self._calculate_churn_data(date_points, daily)
         current_churn_rate = churn_data[-1].value if churn_data else 0.0
         
         return GrowthMetricsResponse(
@@ -371,13 +350,16 @@ class AdminAnalyticsService:
         
         return points
 
-    async def _calculate_churn_data(
+    def _calculate_churn_data(
         self,
         date_points: list[datetime],
+        daily: dict,
     ) -> list[GrowthDataPoint]:
-        """Calculate churn rate over time."""
-        from app.modules.billing.models import Subscription, SubscriptionStatus
+        """Calculate churn rate over time from daily rollups.
         
+        Churn between two date points is the subscriptions canceled after the
+        previous point divided by those active at the previous point.
+        """
         churn_data = []
         
         for i, date in enumerate(date_points):
@@ -385,32 +367,13 @@ class AdminAnalyticsService:
                 churn_data.append(GrowthDataPoint(date=date, value=0.0))
                 continue
             
-            prev_date = date_points[i - 1]
-            
-            # Count subscriptions that were active at prev_date
-            active_at_prev_result = await self.session.execute(
-                select(func.count(Subscription.id)).where(
-                    and_(
-                        Subscription.created_at <= prev_date,
-                        or_(
-                            Subscription.canceled_at.is_(None),
-                            Subscription.canceled_at > prev_date,
-                        )
-                    )
-                )
+            prev_day = date_points[i - 1].date()
+            active_at_prev = daily[prev_day].active_subscriptions
+            churned = sum(
+                metrics.churned_subscriptions
+                for day, metrics in daily.items()
+                if prev_day < day <= date.date()
             )
-            active_at_prev = active_at_prev_result.scalar() or 0
-            
-            # Count subscriptions that churned between prev_date and date
-            churned_result = await self.session.execute(
-                select(func.count(Subscription.id)).where(
-                    and_(
-                        Subscription.canceled_at >= prev_date,
-                        Subscription.canceled_at <= date,
-                    )
-                )
-            )
-            churned = churned_result.scalar() or 0
             
             churn_rate = (churned / active_at_prev * 100) if active_at_prev > 0 else 0.0
             churn_data.append(GrowthDataPoint(date=date, value=churn_rate))
@@ -518,8 +481,6 @@ class AdminAnalyticsService:
         Returns:
             Cohort analysis response
         """
-        from app.modules.auth.models import User
-        
         if not end_date:
             end_date = to_naive_utc(utcnow())
         if not start_date:
@@ -541,20 +502,16 @@ class AdminAnalyticsService:
             current += period_delta
         
         cohorts = []
-        for cohort_start in cohort_dates:
-            cohort_end = cohort_start + period_delta
-            
-            # Get users in this cohort
-            cohort_users_result = await self.session.execute(
-                select(User.id).where(
-                    and_(
-                        User.created_at >= cohort_start,
-                        User.created_at < cohort_end,
-                    )
-                )
+        if cohort_dates:
+            counts = await self._get_cohort_activity_counts(
+                start_date, cohort_dates[-1] + period_delta, period_delta
             )
-            cohort_user_ids = [row[0] for row in cohort_users_result.fetchall()]
-            cohort_size = len(cohort_user_ids)
+        else:
+            counts = {}
+        
+        for cohort_index, cohort_start in enumerate(cohort_dates):
+            activity = counts.get(cohort_index, {})
+            cohort_size = sum(activity.values())
             
             if cohort_size == 0:
                 continue
@@ -563,26 +520,12 @@ class AdminAnalyticsService:
             retention = []
             for period in range(num_periods):
                 period_start = cohort_start + (period * period_delta)
-                period_end = period_start + period_delta
                 
                 if period_start > end_date:
                     break
                 
-                # Count users who were active in this period
-                if cohort_user_ids:
-                    active_result = await self.session.execute(
-                        select(func.count(User.id)).where(
-                            and_(
-                                User.id.in_(cohort_user_ids),
-                                User.last_login_at >= period_start,
-                                User.last_login_at < period_end,
-                            )
-                        )
-                    )
-                    active_count = active_result.scalar() or 0
-                else:
-                    active_count = 0
-                
+                # Users whose last activity falls in this period
+                active_count = activity.get(cohort_index + period, 0)
                 retention_rate = (active_count / cohort_size * 100) if cohort_size > 0 else 0.0
                 retention.append(round(retention_rate, 1))
             
@@ -607,6 +550,55 @@ class AdminAnalyticsService:
             period_end=end_date,
         )
 
+    async def _get_cohort_activity_counts(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        period_delta: timedelta,
+    ) -> dict[int, dict[Optional[int], int]]:
+        """Count users per (signup bucket, last-activity bucket) in one query.
+        
+        Buckets are period_delta-wide slots counted from start_date, so a
+        user's retention period is their activity bucket minus their
+        signup bucket. Users who never logged in land in the None bucket
+        and only contribute to cohort size.
+        
+        Returns:
+            Mapping of cohort bucket -> activity bucket -> user count
+        """
+        from app.modules.auth.models import User
+        
+        period_seconds = period_delta.total_seconds()
+        # Bucket in a subquery so GROUP BY references plain columns
+        buckets = (
+            select(
+                func.floor(
+                    extract("epoch", User.created_at - start_date) / period_seconds
+                ).label("cohort_bucket"),
+                func.floor(
+                    extract("epoch", User.last_login_at - start_date) / period_seconds
+                ).label("activity_bucket"),
+            )
+            .where(
+                and_(
+                    User.created_at >= start_date,
+                    User.created_at < end_date,
+                )
+            )
+            .subquery()
+        )
+        
+        result = await self.session.execute(
+            select(buckets.c.cohort_bucket, buckets.c.activity_bucket, func.count())
+            .group_by(buckets.c.cohort_bucket, buckets.c.activity_bucket)
+        )
+        
+        counts: dict[int, dict[Optional[int], int]] = defaultdict(dict)
+        for cohort, activity, count in result.all():
+            activity_key = int(activity) if activity is not None else None
+            counts[int(cohort)][activity_key] = count
+        return counts
+
     # ==================== Funnel Analysis (17.2) ====================
 
     async def get_funnel_analysis(
@@ -770,25 +770,8 @@ class AdminBillingService:
 
     async def _calculate_mrr(self) -> float:
         """Calculate Monthly Recurring Revenue from active subscriptions."""
-        # Get all active subscriptions
-        result = await self.session.execute(
-            select(Subscription).where(
-                Subscription.status == SubscriptionStatus.ACTIVE.value
-            )
-        )
-        subscriptions = result.scalars().all()
-        
-        mrr = 0.0
-        for sub in subscriptions:
-            plan = await self.plan_repo.get_by_slug(sub.plan_tier)
-            if plan:
-                if sub.billing_cycle == "yearly":
-                    # Convert yearly to monthly
-                    mrr += (plan.price_yearly / 100) / 12
-                else:
-                    mrr += plan.price_monthly / 100
-        
-        return mrr
+        from app.modules.admin.analytics_rollup import calculate_current_mrr
+        return await calculate_current_mrr(self.session)
 
     async def _calculate_revenue_by_plan(
         self,
@@ -6,11 +6,11 @@ Requirements: 14.1 - Promotional Tools (Discount Codes)
 """
 
 import uuid
-from datetime import datetime
+from datetime import date, datetime
 from enum import Enum
 from typing import Optional
 
-from sqlalchemy import Boolean, DateTime, Float, ForeignKey, Integer, String, Text
+from sqlalchemy import Boolean, Date, DateTime, Float, ForeignKey, Integer, String, Text
 from sqlalchemy.dialects.postgresql import ARRAY, UUID, JSON
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
@@ -1754,3 +1754,45 @@ class DeletionRequest(Base):
 
     def __repr__(self) -> str:
         return f"<DeletionRequest(id={self.id}, user_id={self.user_id}, status={self.status})>"
+
+
+# ==================== Platform Metrics Rollups (Requirements 2.1, 2.2) ====================
+
+
+class PlatformMetricsDaily(Base):
+    """Pre-aggregated platform metrics for one day.
+
+    Maintained by the rollup_platform_metrics Celery task so the admin
+    dashboard reads one row per day instead of scanning users and
+    subscriptions per date point.
+
+    Requirements: 2.1, 2.2
+    """
+
+    __tablename__ = "platform_metrics_daily"
+
+    metric_date: Mapped[date] = mapped_column(Date, primary_key=True)
+
+    # Users
+    signups: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    total_users: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    active_users: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    # Revenue (end of day)
+    mrr: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    mrr_by_plan: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
+    active_subscriptions: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    churned_subscriptions: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    # Content
+    new_streams: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    total_streams: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    new_videos: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    total_videos: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    computed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+    def __repr__(self) -> str:
+        return f"<PlatformMetricsDaily(date={self.metric_date}, users={self.total_users}, mrr={self.mrr})>"
@@ -22,6 +22,8 @@ from app.modules.admin.system_schemas import (
     WorkerRestartRequest,
     WorkerRestartResponse,
     AdminErrorAlertsResponse,
+    AdminStreamingNodesResponse,
+    AdminPlacementDecisionsResponse,
 )
 
 router = APIRouter(prefix="/system", tags=["admin-system"])
@@ -124,3 +126,38 @@ async def get_error_alerts(
     """
     service = AdminSystemService()
     return await service.get_error_alerts(limit=limit)
+
+
+@router.get("/streaming-nodes", response_model=AdminStreamingNodesResponse)
+async def get_streaming_nodes(
+    admin: Admin = Depends(require_permission(AdminPermission.VIEW_SYSTEM)),
+):
+    """Get streaming node capacity and utilization.
+    
+    Requirements: 3.2, 7.4
+    
+    Returns the stream units each live node offers and how many are
+    reserved by the jobs placed on it.
+    
+    Requires VIEW_SYSTEM permission.
+    """
+    service = AdminSystemService()
+    return await service.get_streaming_nodes()
+
+
+@router.get("/placements", response_model=AdminPlacementDecisionsResponse)
+async def get_placement_decisions(
+    limit: int = Query(50, ge=1, le=200, description="Maximum decisions to return"),
+    admin: Admin = Depends(require_permission(AdminPermission.VIEW_SYSTEM)),
+):
+    """Get recent stream job placement decisions.
+    
+    Requirements: 3.2
+    
+    Returns where recent stream jobs were placed and why, including jobs
+    no node had room for.
+    
+    Requires VIEW_SYSTEM permission.
+    """
+    service = AdminSystemService()
+    return await service.get_placement_decisions(limit=limit)
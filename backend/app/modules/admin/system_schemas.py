@@ -121,6 +121,9 @@ class AdminWorkerStatusResponse(BaseModel):
     current_load: int = Field(..., description="Current total load")
     utilization_percent: float = Field(..., description="Overall utilization percentage")
     workers: list[WorkerInfo] = Field(..., description="Individual worker details")
+    snapshot_age_seconds: Optional[float] = Field(
+        None, description="Age of the cluster health snapshot this comes from"
+    )
 
 
 class WorkerRestartRequest(BaseModel):
@@ -168,3 +171,60 @@ class AdminErrorAlertsResponse(BaseModel):
     total: int = Field(..., description="Total alerts")
     critical_count: int = Field(..., description="Number of critical alerts")
     warning_count: int = Field(..., description="Number of warning alerts")
+
+
+class StreamingNodeInfo(BaseModel):
+    """Streaming node capacity and utilization.
+    
+    Requirements: 3.2, 7.4
+    """
+    node_id: str = Field(..., description="Node ID")
+    encoder: str = Field(..., description="Encoder used for live encodes")
+    streams: int = Field(..., description="Streams the node runs")
+    max_streams: int = Field(..., description="Maximum streams on the node")
+    encoder_sessions: int = Field(..., description="Streams encoding live")
+    max_encoder_sessions: int = Field(..., description="Maximum live encodes (0 = unlimited)")
+    cpu_percent: float = Field(..., description="Node CPU usage percentage")
+    capacity_units: float = Field(..., description="Stream units the node offers")
+    reserved_units: float = Field(..., description="Stream units reserved on the node")
+    reserved_jobs: int = Field(..., description="Jobs holding a reservation on the node")
+    utilization_percent: float = Field(..., description="Reserved share of the node's capacity")
+    last_heartbeat: Optional[datetime] = Field(None, description="Last heartbeat timestamp")
+
+
+class AdminStreamingNodesResponse(BaseModel):
+    """Streaming node utilization response.
+    
+    Requirements: 3.2, 7.4
+    """
+    timestamp: datetime = Field(..., description="Status timestamp")
+    policy: str = Field(..., description="Placement policy (least_loaded or bin_pack)")
+    total_nodes: int = Field(..., description="Number of live streaming nodes")
+    total_capacity_units: float = Field(..., description="Stream units offered by all nodes")
+    reserved_units: float = Field(..., description="Stream units reserved on all nodes")
+    utilization_percent: float = Field(..., description="Overall utilization percentage")
+    nodes: list[StreamingNodeInfo] = Field(..., description="Individual node details")
+
+
+class PlacementDecisionInfo(BaseModel):
+    """A stream job placement decision.
+    
+    Requirements: 3.2
+    """
+    job_id: str = Field(..., description="Stream job ID")
+    node_id: Optional[str] = Field(None, description="Node the job was placed on, if any")
+    policy: str = Field(..., description="Placement policy used")
+    units: float = Field(..., description="Stream units reserved for the job")
+    candidates: int = Field(..., description="Nodes that had room")
+    reason: str = Field(..., description="Why the job went where it did")
+    decided_at: datetime = Field(..., description="When the job was placed")
+
+
+class AdminPlacementDecisionsResponse(BaseModel):
+    """Recent placement decisions response.
+    
+    Requirements: 3.2
+    """
+    decisions: list[PlacementDecisionInfo] = Field(..., description="Recent decisions, newest first")
+    total: int = Field(..., description="Number of decisions returned")
+    unplaced_count: int = Field(..., description="Decisions that found no node with room")
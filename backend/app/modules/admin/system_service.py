@@ -8,9 +8,8 @@ import uuid
 import time
 import asyncio
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Optional
-from concurrent.futures import ThreadPoolExecutor
 
 from app.core.config import settings
 from app.core.alerting import alert_manager, AlertSeverity, AlertThreshold
@@ -27,13 +26,14 @@ from app.modules.admin.system_schemas import (
     WorkerRestartResponse,
     SystemErrorAlert,
     AdminErrorAlertsResponse,
+    StreamingNodeInfo,
+    AdminStreamingNodesResponse,
+    PlacementDecisionInfo,
+    AdminPlacementDecisionsResponse,
 )
 
 logger = logging.getLogger(__name__)
 
-# Thread pool for blocking Celery operations
-_executor = ThreadPoolExecutor(max_workers=2)
-
 # Track application start time for uptime calculation
 _app_start_time = time.time()
 
@@ -272,24 +272,8 @@ class AdminSystemService:
                 suggested_action="Check Redis server status and connection settings",
             )
     
-    def _sync_celery_inspect(self, timeout: float = 3.0):
-        """Synchronous Celery inspect with timeout.
-        
-        Returns tuple of (active_workers, stats) or (None, None) on timeout/error.
-        """
-        try:
-            from app.core.celery_app import celery_app
-            
-            inspect = celery_app.control.inspect(timeout=timeout)
-            active_workers = inspect.active()
-            stats = inspect.stats()
-            return active_workers, stats
-        except Exception as e:
-            logger.warning(f"Celery inspect failed: {e}")
-            return None, None
-    
     async def _check_workers_health(self) -> AdminComponentHealth:
-        """Check Celery workers health.
+        """Check Celery workers health from the cluster health snapshot.
         
         Returns:
             AdminComponentHealth for workers
@@ -297,40 +281,31 @@ class AdminSystemService:
         start_time = time.perf_counter()
         
         try:
-            # Run blocking Celery inspect in thread pool with timeout
-            loop = asyncio.get_event_loop()
-            try:
-                active_workers, stats = await asyncio.wait_for(
-                    loop.run_in_executor(_executor, self._sync_celery_inspect, 3.0),
-                    timeout=5.0
-                )
-            except asyncio.TimeoutError:
-                latency = (time.perf_counter() - start_time) * 1000
-                return AdminComponentHealth(
-                    name="workers",
-                    status=ComponentStatus.DEGRADED,
-                    message="Worker check timed out",
-                    latency_ms=round(latency, 2),
-                    last_check=to_naive_utc(utcnow()),
-                    suggested_action="Workers may be busy or broker connection slow",
-                )
+            from app.modules.system_monitoring.cluster_health import get_cluster_snapshot
+            
+            snapshot = await get_cluster_snapshot()
             
             latency = (time.perf_counter() - start_time) * 1000
             
-            if active_workers is None and stats is None:
+            if snapshot is None:
                 return AdminComponentHealth(
                     name="workers",
-                    status=ComponentStatus.DOWN,
-                    message="No workers responding",
+                    status=ComponentStatus.DEGRADED,
+                    message="No cluster health snapshot",
                     latency_ms=round(latency, 2),
                     last_check=to_naive_utc(utcnow()),
-                    suggested_action="Start Celery workers or check broker connection",
+                    suggested_action="Start the cluster health collector (app.modules.system_monitoring.cluster_health)",
                 )
             
-            worker_count = len(stats) if stats else 0
-            active_count = len(active_workers) if active_workers else 0
+            age = snapshot.age_seconds()
+            worker_count = len(snapshot.workers)
+            active_count = len(snapshot.alive_workers)
             
-            if worker_count == 0:
+            if snapshot.is_stale():
+                status = ComponentStatus.DEGRADED
+                message = f"Worker status is {age:.0f}s old"
+                suggested_action = "Check the cluster health collector and the broker connection"
+            elif active_count == 0:
                 status = ComponentStatus.DOWN
                 message = "No workers available"
                 suggested_action = "Start Celery workers"
@@ -348,8 +323,15 @@ class AdminSystemService:
                 status=status,
                 message=message,
                 latency_ms=round(latency, 2),
+                error_rate=round(snapshot.failure_rate * 100, 2),
                 last_check=to_naive_utc(utcnow()),
-                details={"worker_count": worker_count, "active_count": active_count},
+                details={
+                    "worker_count": worker_count,
+                    "active_count": active_count,
+                    "processing": snapshot.processing,
+                    "throughput_per_minute": snapshot.throughput_per_minute,
+                    "snapshot_age_seconds": round(age, 2),
+                },
                 suggested_action=suggested_action,
             )
         except Exception as e:
@@ -362,7 +344,7 @@ class AdminSystemService:
                 message=f"Worker check failed: {str(e)}",
                 latency_ms=round(latency, 2),
                 last_check=to_naive_utc(utcnow()),
-                suggested_action="Check Celery broker connection and worker processes",
+                suggested_action="Check Redis connection and the cluster health collector",
             )
     
     async def _check_agents_health(self) -> AdminComponentHealth:
@@ -415,17 +397,15 @@ class AdminSystemService:
         total_dlq = 0
         
         try:
+            from app.core.celery_queues import MONITORED_QUEUES, queue_depths
             from app.core.redis import get_redis
             
             redis = await get_redis()
             
-            # Standard Celery queue names
-            queue_names = ["celery", "high_priority", "low_priority", "default"]
-            
-            for queue_name in queue_names:
+            for queue_name in MONITORED_QUEUES:
                 try:
-                    # Get queue depth
-                    depth = await redis.llen(queue_name) or 0
+                    # Get queue depth across its priority lists
+                    depth = sum((await queue_depths(redis, queue_name)).values())
                     
                     # Get DLQ count (dead letter queue)
                     dlq_name = f"{queue_name}_dlq"
@@ -480,50 +460,51 @@ class AdminSystemService:
         total_capacity = 0
         current_load = 0
         
+        snapshot_age = None
+        
         try:
-            from app.core.celery_app import celery_app
+            from app.modules.system_monitoring.cluster_health import get_cluster_snapshot
             
-            inspect = celery_app.control.inspect(timeout=5.0)
-            active = inspect.active() or {}
-            stats = inspect.stats() or {}
-            reserved = inspect.reserved() or {}
+            snapshot = await get_cluster_snapshot()
+            if snapshot is None:
+                raise RuntimeError("no cluster health snapshot")
+            snapshot_age = round(snapshot.age_seconds(), 2)
             
-            for worker_name, worker_stats in stats.items():
-                # Get active tasks for this worker
-                active_tasks = active.get(worker_name, [])
-                reserved_tasks = reserved.get(worker_name, [])
-                
-                current_jobs = len(active_tasks) + len(reserved_tasks)
-                
+            for worker in snapshot.workers:
                 # Determine worker status
-                if current_jobs > 0:
+                if not worker.alive:
+                    status = "offline"
+                    unhealthy_workers += 1
+                elif worker.active > 0:
                     status = "active"
                     active_workers += 1
                 else:
                     status = "idle"
                     idle_workers += 1
                 
-                # Calculate load (assuming max 10 concurrent tasks per worker)
-                max_concurrency = worker_stats.get('pool', {}).get('max-concurrency', 10)
-                load = (current_jobs / max_concurrency * 100) if max_concurrency > 0 else 0
+                load = (worker.active / worker.concurrency * 100) if worker.concurrency > 0 else 0
                 
                 worker_info = WorkerInfo(
-                    id=worker_name,
-                    name=worker_name.split('@')[0] if '@' in worker_name else worker_name,
+                    id=worker.hostname,
+                    name=worker.hostname.split('@')[0] if '@' in worker.hostname else worker.hostname,
                     status=status,
                     load=round(load, 2),
-                    current_jobs=current_jobs,
-                    completed_jobs=worker_stats.get('total', {}).get('tasks', 0),
-                    failed_jobs=0,  # Would need tracking
-                    last_heartbeat=to_naive_utc(utcnow()),
-                    started_at=None,
-                    hostname=worker_name.split('@')[1] if '@' in worker_name else None,
+                    current_jobs=worker.active,
+                    completed_jobs=worker.processed,
+                    failed_jobs=worker.failed,
+                    last_heartbeat=to_naive_utc(datetime.fromtimestamp(worker.last_heartbeat, timezone.utc)),
+                    started_at=(
+                        to_naive_utc(datetime.fromtimestamp(worker.online_since, timezone.utc))
+                        if worker.online_since else None
+                    ),
+                    hostname=worker.hostname.split('@')[1] if '@' in worker.hostname else None,
                 )
                 workers.append(worker_info)
                 
                 total_workers += 1
-                total_capacity += max_concurrency
-                current_load += current_jobs
+                if worker.alive:
+                    total_capacity += worker.concurrency
+                    current_load += worker.active
                 
         except Exception as e:
             logger.error(f"Failed to get worker status: {e}")
@@ -540,6 +521,7 @@ class AdminSystemService:
             current_load=current_load,
             utilization_percent=round(utilization, 2),
             workers=workers,
+            snapshot_age_seconds=snapshot_age,
         )
     
     async def restart_worker(
@@ -696,6 +678,86 @@ class AdminSystemService:
             warning_count=warning_count,
         )
 
+    
+    async def get_streaming_nodes(self) -> AdminStreamingNodesResponse:
+        """Get capacity and utilization of live streaming nodes.
+        
+        Requirements: 3.2, 7.4
+        
+        Returns:
+            AdminStreamingNodesResponse with per-node reservations
+        """
+        from app.modules.stream.placement import get_stream_placer, placement_policy
+        
+        nodes = []
+        try:
+            for usage in await get_stream_placer().nodes():
+                node = usage.node
+                nodes.append(StreamingNodeInfo(
+                    node_id=node.node_id,
+                    encoder=node.encoder,
+                    streams=node.streams,
+                    max_streams=node.max_streams,
+                    encoder_sessions=node.encoder_sessions,
+                    max_encoder_sessions=node.max_encoder_sessions,
+                    cpu_percent=round(node.cpu_percent, 2),
+                    capacity_units=round(node.capacity_units, 3),
+                    reserved_units=round(usage.reserved_units, 3),
+                    reserved_jobs=usage.jobs,
+                    utilization_percent=round(usage.utilization * 100, 2),
+                    last_heartbeat=to_naive_utc(datetime.fromtimestamp(node.updated_at, timezone.utc))
+                    if node.updated_at else None,
+                ))
+        except Exception as e:
+            logger.error(f"Failed to get streaming node status: {e}")
+        
+        total_capacity = sum(node.capacity_units for node in nodes)
+        reserved = sum(node.reserved_units for node in nodes)
+        
+        return AdminStreamingNodesResponse(
+            timestamp=to_naive_utc(utcnow()),
+            policy=placement_policy(),
+            total_nodes=len(nodes),
+            total_capacity_units=round(total_capacity, 3),
+            reserved_units=round(reserved, 3),
+            utilization_percent=round(reserved / total_capacity * 100, 2) if total_capacity > 0 else 0.0,
+            nodes=nodes,
+        )
+    
+    async def get_placement_decisions(self, limit: int = 50) -> AdminPlacementDecisionsResponse:
+        """Get recent stream job placement decisions.
+        
+        Requirements: 3.2
+        
+        Args:
+            limit: Maximum number of decisions to return
+            
+        Returns:
+            AdminPlacementDecisionsResponse, newest first
+        """
+        from app.modules.stream.placement import get_stream_placer
+        
+        decisions = []
+        try:
+            for decision in await get_stream_placer().recent_decisions(limit):
+                decisions.append(PlacementDecisionInfo(
+                    job_id=decision.job_id,
+                    node_id=decision.node_id,
+                    policy=decision.policy,
+                    units=round(decision.units, 3),
+                    candidates=decision.candidates,
+                    reason=decision.reason,
+                    decided_at=to_naive_utc(datetime.fromtimestamp(decision.decided_at, timezone.utc)),
+                ))
+        except Exception as e:
+            logger.error(f"Failed to get placement decisions: {e}")
+        
+        return AdminPlacementDecisionsResponse(
+            decisions=decisions,
+            total=len(decisions),
+            unplaced_count=sum(1 for decision in decisions if decision.node_id is None),
+        )
+
 
 def setup_admin_error_alerting() -> None:
     """Set up error alerting for admin notification within 60 seconds.
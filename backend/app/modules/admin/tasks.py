@@ -0,0 +1,67 @@
+"""Celery tasks for admin analytics.
+
+Maintains the daily platform metrics rollup table.
+Requirements: 2.1, 2.2
+"""
+
+import logging
+from datetime import timedelta
+from typing import Optional
+
+from app.core.celery_app import celery_app
+from app.core.task_loop import run_async
+from app.core.database import celery_session_maker
+from app.core.datetime_utils import utcnow, to_naive_utc
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(bind=True, max_retries=3, default_retry_delay=300)
+def rollup_platform_metrics(self, backfill_days: Optional[int] = None) -> dict:
+    """Backfill and refresh daily platform metrics rollups.
+
+    Safe to run any number of times: rows are upserted per day. Without
+    backfill_days it fills from the last stored day (re-computing it, in
+    case late writes landed) through yesterday, or backfills the default
+    horizon on first run.
+
+    Args:
+        backfill_days: Recompute this many days ending yesterday
+    """
+    try:
+        return run_async(_rollup_platform_metrics_async(backfill_days))
+    except Exception as exc:
+        logger.error(f"Platform metrics rollup failed: {exc}")
+        raise self.retry(exc=exc)
+
+
+async def _rollup_platform_metrics_async(backfill_days: Optional[int]) -> dict:
+    """Async implementation of the rollup task."""
+    from app.modules.admin.analytics_rollup import (
+        DEFAULT_BACKFILL_DAYS,
+        PlatformMetricsRollupService,
+    )
+
+    yesterday = to_naive_utc(utcnow()).date() - timedelta(days=1)
+
+    async with celery_session_maker() as session:
+        service = PlatformMetricsRollupService(session)
+
+        if backfill_days is not None:
+            start_day = yesterday - timedelta(days=backfill_days - 1)
+        else:
+            last_day = await service.get_last_rollup_date()
+            if last_day is None:
+                start_day = yesterday - timedelta(days=DEFAULT_BACKFILL_DAYS - 1)
+            else:
+                start_day = min(last_day, yesterday)
+
+        days_written = await service.refresh(start_day, yesterday)
+
+    logger.info(f"Platform metrics rollup wrote {days_written} days ({start_day}..{yesterday})")
+    return {
+        "status": "success",
+        "start_date": start_day.isoformat(),
+        "end_date": yesterday.isoformat(),
+        "days_written": days_written,
+    }
@@ -9,8 +9,10 @@ from app.modules.agent.schemas import (
     AgentRegistrationResponse,
     AgentHeartbeatRequest,
     AgentHeartbeatResponse,
+    AgentControlMessages,
     AgentInfo,
     AgentListResponse,
+    JobAckResponse,
     JobCreateRequest,
     JobInfo,
     JobDispatchResponse,
@@ -20,6 +22,7 @@ from app.modules.agent.schemas import (
     HealthCheckSummary,
 )
 from app.modules.agent.repository import AgentRepository, AgentJobRepository
+from app.modules.agent.control import AgentControl, AgentExpiryWatcher, get_agent_control
 from app.modules.agent.router import router as agent_router
 from app.modules.agent.service import AgentService
 
@@ -35,8 +38,10 @@ __all__ = [
     "AgentRegistrationResponse",
     "AgentHeartbeatRequest",
     "AgentHeartbeatResponse",
+    "AgentControlMessages",
     "AgentInfo",
     "AgentListResponse",
+    "JobAckResponse",
     "JobCreateRequest",
     "JobInfo",
     "JobDispatchResponse",
@@ -47,6 +52,10 @@ __all__ = [
     # Repositories
     "AgentRepository",
     "AgentJobRepository",
+    # Control channel
+    "AgentControl",
+    "AgentExpiryWatcher",
+    "get_agent_control",
     # Service
     "AgentService",
     # Router
@@ -0,0 +1,491 @@
+"""Push-based job dispatch to agents over a Redis control channel.
+
+Agents hold a control channel open to the API: a WebSocket
+(``/agents/control/ws``) or, where that is not possible, a long poll
+(``GET /agents/control/jobs``). Dispatch pushes a job message into the
+chosen agent's inbox and the channel delivers it, so agents no longer poll
+for work.
+
+Liveness and load live in Redis, not Postgres:
+
+- a heartbeat moves the agent's expiry in a sorted set scored by epoch
+  seconds; Postgres is only written when an agent comes back or goes away
+- dispatch reserves a slot with a Lua script that picks the live agent
+  with the lowest load (most free capacity on ties) and increments its
+  load in the same step, so concurrent dispatches cannot all land on the
+  agent that looked idle
+- a reservation is a lease on the job. The agent must acknowledge the job
+  within the ack timeout; an unacknowledged job is released and
+  dispatched again. An acknowledged job stays leased until it completes or
+  its agent expires
+
+The expiry watcher sleeps until the earliest heartbeat expiry or ack
+deadline, claims what is due with a script (exactly once across watchers)
+and requeues the affected jobs. ``POST /agents/health-check`` runs the same
+sweep and reconciles agents Postgres still has as healthy.
+
+Run a watcher process with:
+
+    python -m app.modules.agent.control
+
+Requirements: 21.1, 21.2, 21.3, 21.5
+"""
+
+import asyncio
+import json
+import logging
+import time
+import weakref
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Iterable, Optional
+
+from app.core.config import settings
+from app.core.metrics import AGENT_DISPATCHES_TOTAL, AGENT_LEASES_EXPIRED_TOTAL
+
+logger = logging.getLogger(__name__)
+
+# agent id -> max concurrent jobs, for every agent known to the channel
+CAPACITY_KEY = "agent:control:capacity"
+# agent id -> reserved jobs
+LOAD_KEY = "agent:control:load"
+# agent id -> heartbeat expiry (epoch seconds)
+EXPIRY_KEY = "agent:control:expiry"
+# job id -> agent id of every lease
+LEASES_KEY = "agent:control:leases"
+# job id -> ack deadline of leases not yet acknowledged
+UNACKED_KEY = "agent:control:unacked"
+INBOX_KEY_PREFIX = "agent:control:inbox:"
+
+# Leases whose agent is gone but were never released (a watcher died
+# between claiming the expiry and requeueing) are swept this often
+ORPHAN_SWEEP_SECONDS = 30.0
+
+# Register an agent's capacity and start its heartbeat expiry. Existing
+# reservations are kept, so re-registering does not forget running jobs.
+# KEYS: capacity, load, expiry. ARGV: agent id, capacity, expires at.
+# Returns 1 if the agent was not live before.
+_REGISTER_SCRIPT = """
+redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+redis.call('ZADD', KEYS[2], 'NX', 0, ARGV[1])
+return redis.call('ZADD', KEYS[3], ARGV[3], ARGV[1])
+"""
+
+# KEYS: capacity, expiry. ARGV: agent id, expires at.
+# Returns -1 for an unknown agent, 1 if it was not live before, else 0.
+_HEARTBEAT_SCRIPT = """
+if redis.call('HEXISTS', KEYS[1], ARGV[1]) == 0 then
+    return -1
+end
+return redis.call('ZADD', KEYS[2], ARGV[2], ARGV[1])
+"""
+
+# Lease a job to the live agent with the lowest load and room for it,
+# preferring more free capacity on ties. A job that is already leased keeps
+# its agent.
+# KEYS: load, capacity, expiry, leases, unacked. ARGV: now, job id, ack deadline.
+_RESERVE_SCRIPT = """
+local holder = redis.call('HGET', KEYS[4], ARGV[2])
+if holder then
+    return holder
+end
+local now = tonumber(ARGV[1])
+local agents = redis.call('ZRANGE', KEYS[1], 0, -1, 'WITHSCORES')
+local best, best_load, best_free
+for i = 1, #agents, 2 do
+    local load = tonumber(agents[i + 1])
+    if best and load > best_load then
+        break
+    end
+    local expires = tonumber(redis.call('ZSCORE', KEYS[3], agents[i]) or '0')
+    local free = tonumber(redis.call('HGET', KEYS[2], agents[i]) or '0') - load
+    if expires > now and free > 0 and (not best or free > best_free) then
+        best, best_load, best_free = agents[i], load, free
+    end
+end
+if not best then
+    return false
+end
+redis.call('ZINCRBY', KEYS[1], 1, best)
+redis.call('HSET', KEYS[4], ARGV[2], best)
+redis.call('ZADD', KEYS[5], ARGV[3], ARGV[2])
+return best
+"""
+
+# KEYS: leases, unacked. ARGV: job id, agent id.
+# Returns 0 if the agent no longer holds the lease.
+_ACK_SCRIPT = """
+if redis.call('HGET', KEYS[1], ARGV[1]) ~= ARGV[2] then
+    return 0
+end
+redis.call('ZREM', KEYS[2], ARGV[1])
+return 1
+"""
+
+# Drop a lease and give its slot back. An empty agent id releases whoever
+# holds it. KEYS: leases, unacked, load. ARGV: job id, agent id.
+# Returns the agent that held the lease.
+_RELEASE_SCRIPT = """
+local holder = redis.call('HGET', KEYS[1], ARGV[1])
+if not holder or (ARGV[2] ~= '' and holder ~= ARGV[2]) then
+    return false
+end
+redis.call('HDEL', KEYS[1], ARGV[1])
+redis.call('ZREM', KEYS[2], ARGV[1])
+if tonumber(redis.call('ZSCORE', KEYS[3], holder) or '0') > 0 then
+    redis.call('ZINCRBY', KEYS[3], -1, holder)
+end
+return holder
+"""
+
+# Remove and return due members of a sorted set with their scores.
+# KEYS: sorted set. ARGV: now, limit.
+_CLAIM_EXPIRED_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'WITHSCORES', 'LIMIT', 0, ARGV[2])
+for i = 1, #due, 2 do
+    redis.call('ZREM', KEYS[1], due[i])
+end
+return due
+"""
+
+
+def inbox_key(agent_id: str) -> str:
+    return f"{INBOX_KEY_PREFIX}{agent_id}"
+
+
+@dataclass
+class AgentLiveState:
+    """What the control channel knows about an agent right now."""
+
+    alive: bool
+    load: int
+    last_heartbeat: Optional[float] = None
+
+
+class AgentControl:
+    """Heartbeats, leases and inboxes of the agent control channel."""
+
+    def __init__(
+        self,
+        redis,
+        clock: Callable[[], float] = time.time,
+        heartbeat_ttl: Optional[float] = None,
+        ack_timeout: Optional[float] = None,
+    ):
+        self.redis = redis
+        self.clock = clock
+        self.heartbeat_ttl = heartbeat_ttl or settings.AGENT_HEARTBEAT_TTL_SECONDS
+        self.ack_timeout = ack_timeout or settings.AGENT_JOB_ACK_TIMEOUT_SECONDS
+
+    # ==================== Liveness ====================
+
+    async def register(self, agent_id: str, max_capacity: int) -> bool:
+        """Make an agent live with its capacity; returns True if it was not live."""
+        return bool(await self.redis.eval(
+            _REGISTER_SCRIPT,
+            3,
+            CAPACITY_KEY,
+            LOAD_KEY,
+            EXPIRY_KEY,
+            str(agent_id),
+            max_capacity,
+            self.clock() + self.heartbeat_ttl,
+        ))
+
+    async def heartbeat(self, agent_id: str) -> Optional[bool]:
+        """Extend an agent's expiry.
+
+        Returns None for an agent the channel does not know (it has to be
+        registered again), True if the agent was not live before.
+        """
+        result = await self.redis.eval(
+            _HEARTBEAT_SCRIPT,
+            2,
+            CAPACITY_KEY,
+            EXPIRY_KEY,
+            str(agent_id),
+            self.clock() + self.heartbeat_ttl,
+        )
+        if int(result) < 0:
+            return None
+        return bool(result)
+
+    async def live_agents(self) -> dict[str, float]:
+        """Expiry of every live agent, by agent id."""
+        now = self.clock()
+        return {
+            agent_id: float(expires)
+            for agent_id, expires in await self.redis.zrange(EXPIRY_KEY, 0, -1, withscores=True)
+            if float(expires) > now
+        }
+
+    async def agent_states(self) -> dict[str, AgentLiveState]:
+        """Liveness, reserved load and last heartbeat of every known agent."""
+        live = await self.live_agents()
+        loads = await self.redis.zrange(LOAD_KEY, 0, -1, withscores=True)
+        return {
+            agent_id: AgentLiveState(
+                alive=agent_id in live,
+                load=int(float(load)),
+                last_heartbeat=live[agent_id] - self.heartbeat_ttl if agent_id in live else None,
+            )
+            for agent_id, load in loads
+        }
+
+    async def claim_expired_agents(self, limit: int = 100) -> dict[str, float]:
+        """Claim agents whose heartbeat expired; returns their expiry by agent id.
+
+        Each expiry is claimed once, by whichever caller gets to it first.
+        """
+        return await self._claim(EXPIRY_KEY, limit)
+
+    async def forget(self, agent_id: str) -> None:
+        """Drop an expired agent's undelivered messages and its load entry.
+
+        The capacity entry stays so the agent's next heartbeat brings it back
+        without registering.
+        """
+        await self.redis.delete(inbox_key(agent_id))
+        await self.redis.zadd(LOAD_KEY, {agent_id: 0})
+
+    # ==================== Leases ====================
+
+    async def reserve(self, job_id: str) -> Optional[str]:
+        """Lease a job to the live agent with the lowest load; None if none has room."""
+        now = self.clock()
+        agent_id = await self.redis.eval(
+            _RESERVE_SCRIPT,
+            5,
+            LOAD_KEY,
+            CAPACITY_KEY,
+            EXPIRY_KEY,
+            LEASES_KEY,
+            UNACKED_KEY,
+            now,
+            str(job_id),
+            now + self.ack_timeout,
+        )
+        AGENT_DISPATCHES_TOTAL.labels(result="reserved" if agent_id else "no_agent").inc()
+        return agent_id
+
+    async def ack(self, job_id: str, agent_id: str) -> bool:
+        """Acknowledge a pushed job; False if the agent lost the lease."""
+        return bool(await self.redis.eval(_ACK_SCRIPT, 2, LEASES_KEY, UNACKED_KEY, str(job_id), str(agent_id)))
+
+    async def release(self, job_id: str, agent_id: Optional[str] = None) -> Optional[str]:
+        """Drop a job's lease and free its slot; returns the agent that held it."""
+        return await self.redis.eval(
+            _RELEASE_SCRIPT,
+            3,
+            LEASES_KEY,
+            UNACKED_KEY,
+            LOAD_KEY,
+            str(job_id),
+            str(agent_id) if agent_id else "",
+        )
+
+    async def leases(self) -> dict[str, str]:
+        """Agent id of every leased job, by job id."""
+        return await self.redis.hgetall(LEASES_KEY)
+
+    async def claim_unacked(self, limit: int = 100) -> dict[str, float]:
+        """Claim leases whose ack deadline passed; returns the deadline by job id."""
+        return await self._claim(UNACKED_KEY, limit)
+
+    async def orphaned_leases(self) -> dict[str, str]:
+        """Acknowledged leases held by agents that are no longer live, by job id.
+
+        Unacknowledged leases are left to their ack deadline.
+        """
+        live = await self.live_agents()
+        unacked = set(await self.redis.zrange(UNACKED_KEY, 0, -1))
+        return {
+            job_id: agent_id
+            for job_id, agent_id in (await self.leases()).items()
+            if agent_id not in live and job_id not in unacked
+        }
+
+    async def next_expiry_at(self) -> Optional[float]:
+        """The earliest heartbeat expiry or ack deadline, if any."""
+        due = []
+        for key in (EXPIRY_KEY, UNACKED_KEY):
+            first = await self.redis.zrange(key, 0, 0, withscores=True)
+            if first:
+                due.append(float(first[0][1]))
+        return min(due) if due else None
+
+    # ==================== Inboxes ====================
+
+    async def push(self, agent_id: str, message: dict) -> None:
+        """Queue a message for an agent's control channel."""
+        await self.redis.rpush(inbox_key(agent_id), json.dumps(message, default=str))
+
+    async def next_messages(self, agent_id: str, timeout: float, limit: int = 20) -> list[dict]:
+        """Wait up to ``timeout`` seconds for messages to an agent, oldest first.
+
+        Blocks one Redis connection for as long as it waits; a timeout of 0
+        returns what is there without waiting.
+        """
+        key = inbox_key(agent_id)
+        if timeout <= 0:
+            raw = await self.redis.lpop(key, limit) or []
+        else:
+            first = await self.redis.blpop([key], timeout=timeout)
+            if not first:
+                return []
+            raw = [first[1]]
+            if limit > 1:
+                raw.extend(await self.redis.lpop(key, limit - 1) or [])
+        messages = []
+        for item in raw:
+            try:
+                messages.append(json.loads(item))
+            except ValueError:
+                logger.warning(f"Dropping malformed message to agent {agent_id}")
+        return messages
+
+    async def _claim(self, key: str, limit: int) -> dict[str, float]:
+        due = await self.redis.eval(_CLAIM_EXPIRED_SCRIPT, 1, key, self.clock(), limit)
+        return {due[i]: float(due[i + 1]) for i in range(0, len(due), 2)}
+
+
+def job_message(job, ack_by: Optional[float] = None) -> dict:
+    """The message that pushes a job to its agent."""
+    return {
+        "type": "job",
+        "job_id": str(job.id),
+        "job_type": job.job_type,
+        "payload": job.payload,
+        "priority": job.priority,
+        "attempt": job.attempts,
+        "ack_by": ack_by,
+    }
+
+
+# One control per event loop: async Redis connections cannot be shared
+# across loops (Celery tasks run on their worker's task loop, or a fresh one).
+_controls: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AgentControl]" = weakref.WeakKeyDictionary()
+
+
+def get_agent_control() -> AgentControl:
+    """Get the agent control channel for the running event loop."""
+    import redis.asyncio as aioredis
+
+    loop = asyncio.get_running_loop()
+    control = _controls.get(loop)
+    if control is None:
+        control = AgentControl(aioredis.from_url(settings.REDIS_URL, decode_responses=True))
+        _controls[loop] = control
+    return control
+
+
+async def expire_agents(expired: dict[str, float]) -> int:
+    """Mark expired agents unhealthy and requeue their jobs; returns jobs requeued."""
+    from app.core.database import async_session_maker
+    from app.modules.agent.service import AgentService
+
+    async with async_session_maker() as session:
+        results = await AgentService(session).expire_agents(expired)
+        await session.commit()
+    return sum(result.jobs_reassigned for result in results)
+
+
+async def expire_unacked(job_ids: Iterable[str]) -> int:
+    """Dispatch jobs whose agent never acknowledged them again; returns the count."""
+    from app.core.database import async_session_maker
+    from app.modules.agent.service import AgentService
+
+    async with async_session_maker() as session:
+        requeued = await AgentService(session).requeue_unacked_jobs(job_ids)
+        await session.commit()
+    return requeued
+
+
+class AgentExpiryWatcher:
+    """Acts on heartbeat expiries and missed acks as they fall due.
+
+    Several watchers may share one channel; each expiry is claimed by
+    exactly one of them.
+    """
+
+    def __init__(
+        self,
+        control: AgentControl,
+        on_agents_expired: Optional[Callable[[dict[str, float]], Awaitable[int]]] = None,
+        on_unacked: Optional[Callable[[Iterable[str]], Awaitable[int]]] = None,
+        max_idle: Optional[float] = None,
+        batch_size: int = 100,
+    ):
+        self.control = control
+        self.on_agents_expired = on_agents_expired or expire_agents
+        self.on_unacked = on_unacked or expire_unacked
+        self.max_idle = max_idle or settings.AGENT_CONTROL_MAX_IDLE_SECONDS
+        self.batch_size = batch_size
+        self._running = False
+        self._next_orphan_sweep = 0.0
+
+    async def run(self) -> None:
+        """Watch until stopped."""
+        self._running = True
+        logger.info("Agent expiry watcher started")
+        while self._running:
+            try:
+                if await self.process_due():
+                    continue
+                delay = await self.seconds_until_next()
+            except Exception as e:
+                logger.error(f"Agent expiry sweep failed: {e}")
+                delay = self.max_idle
+            await asyncio.sleep(delay)
+        logger.info("Agent expiry watcher stopped")
+
+    def stop(self) -> None:
+        self._running = False
+
+    async def seconds_until_next(self) -> float:
+        """Sleep until the earliest expiry, waking at least every ``max_idle``."""
+        due_at = await self.control.next_expiry_at()
+        if due_at is None:
+            return self.max_idle
+        return min(max(due_at - self.control.clock(), 0.0), self.max_idle)
+
+    async def process_due(self) -> int:
+        """Claim and handle one batch of expiries; returns how many were claimed."""
+        agents = await self.control.claim_expired_agents(self.batch_size)
+        if agents:
+            logger.info(f"Agents missed their heartbeat: {', '.join(agents)}")
+            AGENT_LEASES_EXPIRED_TOTAL.labels(reason="agent_expired").inc(await self.on_agents_expired(agents))
+
+        jobs = await self.control.claim_unacked(self.batch_size)
+        if jobs:
+            # Release first, so the jobs can go to another agent straight away
+            for job_id in jobs:
+                await self.control.release(job_id)
+            AGENT_LEASES_EXPIRED_TOTAL.labels(reason="ack_timeout").inc(len(jobs))
+            await self.on_unacked(list(jobs))
+
+        if self.control.clock() >= self._next_orphan_sweep:
+            self._next_orphan_sweep = self.control.clock() + ORPHAN_SWEEP_SECONDS
+            orphaned = await self.control.orphaned_leases()
+            if orphaned:
+                logger.warning(f"Requeueing {len(orphaned)} jobs leased to agents that are gone")
+                await self.on_agents_expired({agent_id: self.control.clock() for agent_id in set(orphaned.values())})
+        return len(agents) + len(jobs)
+
+
+async def run_agent_expiry_watcher() -> None:
+    """Run one watcher process until interrupted."""
+    import signal
+
+    watcher = AgentExpiryWatcher(get_agent_control())
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, watcher.stop)
+        except NotImplementedError:
+            pass
+    await watcher.run()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run_agent_expiry_watcher())
@@ -3,21 +3,27 @@
 Requirements: 21.1, 21.2, 21.3, 21.4, 21.5
 """
 
+import asyncio
+import logging
 import uuid
-from typing import Annotated
+from typing import Annotated, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status, Header
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Query, WebSocket, WebSocketDisconnect
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import async_session_maker, get_db
+from app.modules.agent.control import get_agent_control
 from app.modules.agent.service import AgentService
 from app.modules.agent.schemas import (
     AgentRegistrationRequest,
     AgentRegistrationResponse,
     AgentHeartbeatRequest,
     AgentHeartbeatResponse,
+    AgentControlMessages,
     AgentInfo,
     AgentListResponse,
+    JobAckResponse,
     JobCreateRequest,
     JobInfo,
     JobDispatchResponse,
@@ -26,6 +32,8 @@ from app.modules.agent.schemas import (
     HealthCheckSummary,
 )
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/agents", tags=["agents"])
 
 
@@ -36,6 +44,31 @@ async def get_agent_service(
     return AgentService(session)
 
 
+async def authenticate_agent_key(api_key: Optional[str]) -> Optional[uuid.UUID]:
+    """Agent id for an API key.
+
+    Uses its own short session: control channel requests stay open for a
+    long time and must not hold a database connection while they wait.
+    """
+    if not api_key:
+        return None
+    async with async_session_maker() as session:
+        return await AgentService(session).authenticate_agent(api_key)
+
+
+async def get_current_agent_id(
+    x_agent_key: Annotated[Optional[str], Header()] = None,
+) -> uuid.UUID:
+    """Dependency: the agent authenticated by the ``X-Agent-Key`` header."""
+    agent_id = await authenticate_agent_key(x_agent_key)
+    if not agent_id:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid agent API key",
+        )
+    return agent_id
+
+
 # ==================== Agent Registration (21.1) ====================
 
 @router.post(
@@ -75,6 +108,107 @@ async def send_heartbeat(
     return await service.process_heartbeat(request)
 
 
+# ==================== Control Channel (21.1, 21.3) ====================
+
+@router.websocket("/control/ws")
+async def agent_control_websocket(websocket: WebSocket):
+    """Control channel for an agent, authenticated by the ``X-Agent-Key`` header.
+    
+    Requirements: 21.1, 21.3, 21.4
+    
+    Jobs dispatched to the agent are pushed as ``{"type": "job", ...}``
+    messages. The agent sends ``heartbeat``, ``ack`` and ``complete``
+    messages; a ``lease_lost`` reply means the job was given to another
+    agent and must be dropped.
+    """
+    await websocket.accept()
+    agent_id = await authenticate_agent_key(websocket.headers.get("x-agent-key"))
+    if not agent_id:
+        await websocket.close(code=4001, reason="Invalid agent API key")
+        return
+    
+    control = get_agent_control()
+    send_lock = asyncio.Lock()
+    
+    async def send(message: dict) -> None:
+        async with send_lock:
+            await websocket.send_json(message)
+    
+    async def push_messages() -> None:
+        while True:
+            for message in await control.next_messages(
+                str(agent_id), timeout=settings.AGENT_CONTROL_POLL_SECONDS
+            ):
+                await send(message)
+    
+    async def receive_messages() -> None:
+        while True:
+            message = await websocket.receive_json()
+            if not isinstance(message, dict):
+                await send({"type": "error", "detail": "Messages must be JSON objects"})
+                continue
+            try:
+                async with async_session_maker() as session:
+                    reply = await AgentService(session, control).handle_control_message(agent_id, message)
+                    await session.commit()
+            except ValueError as e:
+                reply = {"type": "error", "detail": str(e)}
+            if reply:
+                await send(reply)
+    
+    # A job popped but not sent when the connection drops is never
+    # acknowledged, so it is dispatched again after the ack timeout
+    tasks = {asyncio.create_task(push_messages()), asyncio.create_task(receive_messages())}
+    done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    for task in pending:
+        task.cancel()
+    for task in done:
+        error = task.exception()
+        if error and not isinstance(error, WebSocketDisconnect):
+            logger.warning(f"Control channel of agent {agent_id} failed: {error}")
+            try:
+                await websocket.close(code=1011)
+            except RuntimeError:
+                pass
+
+
+@router.get(
+    "/control/jobs",
+    response_model=AgentControlMessages,
+    summary="Wait for pushed jobs",
+    description="Long poll for agents that cannot hold a WebSocket open. Returns as soon as a job is pushed, or empty after the wait.",
+)
+async def poll_control_messages(
+    agent_id: Annotated[uuid.UUID, Depends(get_current_agent_id)],
+    wait: Annotated[Optional[float], Query(ge=0, le=60, description="Seconds to wait for a job")] = None,
+) -> AgentControlMessages:
+    """Wait for messages pushed to the agent.
+    
+    Requirements: 21.3
+    """
+    timeout = settings.AGENT_CONTROL_POLL_SECONDS if wait is None else wait
+    messages = await get_agent_control().next_messages(str(agent_id), timeout=timeout)
+    return AgentControlMessages(messages=messages)
+
+
+@router.post(
+    "/control/jobs/{job_id}/ack",
+    response_model=JobAckResponse,
+    summary="Acknowledge a pushed job",
+    description="Confirm the agent took a pushed job. Unacknowledged jobs are dispatched to another agent after the ack timeout.",
+)
+async def ack_job(
+    job_id: uuid.UUID,
+    agent_id: Annotated[uuid.UUID, Depends(get_current_agent_id)],
+    service: Annotated[AgentService, Depends(get_agent_service)],
+) -> JobAckResponse:
+    """Acknowledge a pushed job.
+    
+    Requirements: 21.3
+    """
+    return await service.ack_job(agent_id, job_id)
+
+
 # ==================== Health Check (21.2) ====================
 
 @router.post(
@@ -182,3 +182,15 @@ class HealthCheckSummary(BaseModel):
     unhealthy_agents: int
     newly_unhealthy: list[HealthCheckResult]
     total_jobs_reassigned: int
+
+
+# Control Channel (Requirements: 21.1, 21.3)
+class AgentControlMessages(BaseModel):
+    """Messages pushed to an agent, as returned by a long poll."""
+    messages: list[dict] = Field(default_factory=list)
+
+
+class JobAckResponse(BaseModel):
+    """Whether the agent still holds the job's lease."""
+    job_id: uuid.UUID
+    acknowledged: bool = Field(..., description="False if the lease was lost and the job must be dropped")
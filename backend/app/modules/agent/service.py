@@ -1,18 +1,21 @@
 """Agent service for distributed worker management.
 
 Implements agent registration, heartbeat, health detection, job dispatch, and completion.
+Liveness, load and job leases are kept by the control channel in Redis
+(``app.modules.agent.control``); Postgres holds the agents and jobs.
 Requirements: 21.1, 21.2, 21.3, 21.4, 21.5
 """
 
 import hashlib
 import uuid
-from datetime import datetime, timedelta
-from typing import Optional
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.datetime_utils import utcnow, to_naive_utc
 
+from app.modules.agent.control import AgentControl, AgentLiveState, get_agent_control, job_message
 from app.modules.agent.models import AgentStatus, JobStatus
 from app.modules.agent.repository import AgentRepository, AgentJobRepository
 from app.modules.agent.schemas import (
@@ -22,6 +25,7 @@ from app.modules.agent.schemas import (
     AgentHeartbeatResponse,
     AgentInfo,
     AgentListResponse,
+    JobAckResponse,
     JobCreateRequest,
     JobInfo,
     JobDispatchResponse,
@@ -51,10 +55,17 @@ class AgentService:
     Requirements: 21.1, 21.2, 21.3, 21.4, 21.5
     """
 
-    def __init__(self, session: AsyncSession):
+    def __init__(self, session: AsyncSession, control: Optional[AgentControl] = None):
         self.session = session
         self.agent_repo = AgentRepository(session)
         self.job_repo = AgentJobRepository(session)
+        self._control = control
+
+    @property
+    def control(self) -> AgentControl:
+        if self._control is None:
+            self._control = get_agent_control()
+        return self._control
 
     # ==================== Agent Registration (21.1) ====================
 
@@ -79,6 +90,7 @@ class AgentService:
             existing.status = AgentStatus.HEALTHY.value
             existing.last_heartbeat = to_naive_utc(utcnow())
             await self.session.flush()
+            await self.control.register(str(existing.id), existing.max_capacity)
             
             return AgentRegistrationResponse(
                 agent_id=existing.id,
@@ -95,6 +107,7 @@ class AgentService:
             max_capacity=request.max_capacity,
             metadata=request.metadata,
         )
+        await self.control.register(str(agent.id), agent.max_capacity)
         
         return AgentRegistrationResponse(
             agent_id=agent.id,
@@ -119,22 +132,31 @@ class AgentService:
         """Process agent heartbeat.
         
         Requirements: 21.1 - Heartbeat tracking
-        """
-        agent = await self.agent_repo.update_heartbeat(
-            agent_id=request.agent_id,
-            current_load=request.current_load,
-            metadata=request.metadata,
-        )
         
-        if not agent:
-            return AgentHeartbeatResponse(
-                status=SchemaAgentStatus.OFFLINE,
-                acknowledged=False,
-                server_time=to_naive_utc(utcnow()),
+        A heartbeat only moves the agent's expiry in Redis. Postgres is
+        written when the agent comes back from being unhealthy (or is not
+        known to the control channel yet) and when it sends new metadata.
+        """
+        returned = await self.control.heartbeat(str(request.agent_id))
+        if returned is None:
+            agent = await self.agent_repo.get_agent_by_id(request.agent_id)
+            if not agent:
+                return AgentHeartbeatResponse(
+                    status=SchemaAgentStatus.OFFLINE,
+                    acknowledged=False,
+                    server_time=to_naive_utc(utcnow()),
+                )
+            returned = await self.control.register(str(agent.id), agent.max_capacity)
+        
+        if returned or request.metadata:
+            await self.agent_repo.update_heartbeat(
+                agent_id=request.agent_id,
+                current_load=request.current_load,
+                metadata=request.metadata,
             )
         
         return AgentHeartbeatResponse(
-            status=SchemaAgentStatus(agent.status),
+            status=SchemaAgentStatus.HEALTHY,
             acknowledged=True,
             server_time=to_naive_utc(utcnow()),
         )
@@ -145,18 +167,62 @@ class AgentService:
         """Check health of all agents and mark unhealthy ones.
         
         Requirements: 21.2 - Mark unhealthy after 60s missed heartbeat
+        
+        The expiry watcher does this as each heartbeat expires; this runs
+        the same sweep on demand and also reconciles agents Postgres still
+        has as healthy that are not live in the control channel.
         """
+        expired: dict[str, Optional[float]] = dict(await self.control.claim_expired_agents())
+        live = await self.control.live_agents()
         all_agents = await self.agent_repo.get_all_agents()
-        stale_agents = await self.agent_repo.get_agents_with_stale_heartbeat(
-            threshold_seconds=HEARTBEAT_TIMEOUT_SECONDS
+        
+        for agent in all_agents:
+            agent_id = str(agent.id)
+            if agent.status == AgentStatus.HEALTHY.value and agent_id not in live:
+                expired.setdefault(agent_id, None)
+        for agent_id in set((await self.control.orphaned_leases()).values()):
+            expired.setdefault(agent_id, None)
+        
+        newly_unhealthy = await self.expire_agents(expired)
+        healthy_count = sum(1 for a in all_agents if str(a.id) in live)
+        
+        return HealthCheckSummary(
+            checked_at=to_naive_utc(utcnow()),
+            total_agents=len(all_agents),
+            healthy_agents=healthy_count,
+            unhealthy_agents=len(all_agents) - healthy_count,
+            newly_unhealthy=newly_unhealthy,
+            total_jobs_reassigned=sum(r.jobs_reassigned for r in newly_unhealthy),
         )
+
+    async def expire_agents(
+        self, expired: dict[str, Optional[float]]
+    ) -> list[HealthCheckResult]:
+        """Mark agents unhealthy and requeue their jobs.
         
-        newly_unhealthy: list[HealthCheckResult] = []
-        total_jobs_reassigned = 0
+        Requirements: 21.2, 21.5
         
-        for agent in stale_agents:
+        Args:
+            expired: When each agent's heartbeat expired, by agent id (None if unknown)
+        """
+        leases = await self.control.leases()
+        results: list[HealthCheckResult] = []
+        
+        for agent_id, expired_at in expired.items():
+            for job_id, holder in leases.items():
+                if holder == agent_id:
+                    await self.control.release(job_id, agent_id)
+            await self.control.forget(agent_id)
+            
+            agent = await self.agent_repo.get_agent_by_id(uuid.UUID(agent_id))
+            if not agent:
+                continue
+            
             # Calculate seconds since last heartbeat
-            if agent.last_heartbeat:
+            if expired_at is not None:
+                last_heartbeat = expired_at - self.control.heartbeat_ttl
+                seconds_since = max(self.control.clock() - last_heartbeat, 0.0)
+            elif agent.last_heartbeat:
                 seconds_since = (utcnow() - agent.last_heartbeat.replace(tzinfo=None)).total_seconds()
             else:
                 seconds_since = float('inf')
@@ -168,9 +234,8 @@ class AgentService:
             
             # Reassign pending jobs (Requirements: 21.2)
             reassignment = await self.reassign_agent_jobs(agent.id)
-            total_jobs_reassigned += reassignment.reassigned_count
             
-            newly_unhealthy.append(HealthCheckResult(
+            results.append(HealthCheckResult(
                 agent_id=agent.id,
                 previous_status=previous_status,
                 new_status=SchemaAgentStatus.UNHEALTHY,
@@ -178,17 +243,7 @@ class AgentService:
                 jobs_reassigned=reassignment.reassigned_count,
             ))
         
-        healthy_count = sum(1 for a in all_agents if a.status == AgentStatus.HEALTHY.value)
-        unhealthy_count = len(all_agents) - healthy_count
-        
-        return HealthCheckSummary(
-            checked_at=to_naive_utc(utcnow()),
-            total_agents=len(all_agents),
-            healthy_agents=healthy_count,
-            unhealthy_agents=unhealthy_count,
-            newly_unhealthy=newly_unhealthy,
-            total_jobs_reassigned=total_jobs_reassigned,
-        )
+        return results
 
     def is_agent_healthy(
         self, last_heartbeat: Optional[datetime], threshold_seconds: int = HEARTBEAT_TIMEOUT_SECONDS
@@ -219,34 +274,93 @@ class AgentService:
         """Dispatch a job to the best available agent.
         
         Requirements: 21.3 - Select lowest load healthy agent
+        
+        The agent is chosen and its load reserved in one Redis step, so
+        concurrent dispatches never pick the same free slot. The assignment
+        is committed, along with anything else pending in this session, and
+        the job is then pushed to the agent's control channel; if the agent
+        does not acknowledge it in time it is dispatched again.
         """
         job = await self.job_repo.get_job_by_id(job_id)
         if not job or job.status != JobStatus.QUEUED.value:
             return None
         
-        # Get healthy agents
-        healthy_agents = await self.agent_repo.get_healthy_agents()
-        
-        if not healthy_agents:
-            return None
-        
-        # Select agent with lowest load (Requirements: 21.3)
-        best_agent = self.select_lowest_load_agent(healthy_agents)
-        
-        if not best_agent or not best_agent.is_available():
+        agent_id = await self.control.reserve(str(job_id))
+        if agent_id is None:
             return None
         
-        # Assign job to agent
-        await self.job_repo.assign_job_to_agent(job_id, best_agent.id)
-        await self.agent_repo.increment_agent_load(best_agent.id)
+        try:
+            # Committed before the push: the agent reports back on its own
+            # session, which must already see the job as assigned to it
+            await self.job_repo.assign_job_to_agent(job_id, uuid.UUID(agent_id))
+            await self.session.commit()
+        except Exception:
+            await self.control.release(str(job_id), agent_id)
+            raise
+        await self.control.push(
+            agent_id, job_message(job, ack_by=self.control.clock() + self.control.ack_timeout)
+        )
         
         return JobDispatchResponse(
             job_id=job_id,
-            agent_id=best_agent.id,
+            agent_id=uuid.UUID(agent_id),
             status=SchemaJobStatus.PROCESSING,
-            message=f"Job dispatched to agent {best_agent.hostname}",
+            message=f"Job pushed to agent {agent_id}",
         )
 
+    async def ack_job(self, agent_id: uuid.UUID, job_id: uuid.UUID) -> JobAckResponse:
+        """Acknowledge a pushed job.
+        
+        Requirements: 21.3
+        
+        Not acknowledged means the agent lost the lease (it acknowledged too
+        late, or was considered gone) and must drop the job.
+        """
+        return JobAckResponse(
+            job_id=job_id,
+            acknowledged=await self.control.ack(str(job_id), str(agent_id)),
+        )
+
+    async def handle_control_message(
+        self, agent_id: uuid.UUID, message: dict
+    ) -> Optional[dict]:
+        """Handle a message an agent sent over its control channel.
+        
+        Requirements: 21.1, 21.3, 21.4
+        
+        Messages are ``heartbeat``, ``ack`` and ``complete``; returns the
+        reply to send back, if any. Raises ``ValueError`` for a malformed
+        message.
+        """
+        kind = message.get("type")
+        
+        if kind == "heartbeat":
+            response = await self.process_heartbeat(AgentHeartbeatRequest(
+                agent_id=agent_id,
+                current_load=message.get("current_load", 0),
+                metadata=message.get("metadata"),
+            ))
+            return {"type": "heartbeat", **response.model_dump(mode="json")}
+        
+        if kind == "ack":
+            response = await self.ack_job(agent_id, uuid.UUID(str(message.get("job_id"))))
+            if response.acknowledged:
+                return None
+            return {"type": "lease_lost", "job_id": str(response.job_id)}
+        
+        if kind == "complete":
+            request = JobCompletionRequest.model_validate(message)
+            job = await self.job_repo.get_job_by_id(request.job_id)
+            if job and job.agent_id != agent_id:
+                # Taken away from this agent and dispatched again
+                return {"type": "lease_lost", "job_id": str(request.job_id)}
+            response = await self.complete_job(request)
+            if not response:
+                return {"type": "error", "job_id": str(request.job_id), "detail": "Job not found"}
+            return {"type": "completed", **response.model_dump(mode="json")}
+        
+        return {"type": "error", "detail": f"Unknown message type {kind!r}"}
+
     def select_lowest_load_agent(self, agents: list) -> Optional[object]:
         """Select the healthy agent with the lowest current load.
         
@@ -264,6 +378,7 @@ class AgentService:
             return None
         
         # Sort by current_load ascending, then by available capacity descending
+        # (the control channel's reservation script uses the same order)
         return min(available_agents, key=lambda a: (a.current_load, -a.get_available_capacity()))
 
     async def create_and_dispatch_job(
@@ -305,9 +420,9 @@ class AgentService:
             error=request.error,
         )
         
-        # Decrement agent load
+        # Release the agent's lease and its slot
         if job.agent_id:
-            await self.agent_repo.decrement_agent_load(job.agent_id)
+            await self.control.release(str(request.job_id), str(job.agent_id))
         
         # Trigger next workflow step if job completed successfully
         next_job_triggered = False
@@ -340,14 +455,40 @@ class AgentService:
         reassigned_ids: list[uuid.UUID] = []
         
         for job in processing_jobs:
-            await self.job_repo.requeue_job(job.id)
-            reassigned_ids.append(job.id)
+            await self.control.release(str(job.id), str(agent_id))
+            if await self._requeue(job, f"Agent {agent_id} stopped responding"):
+                reassigned_ids.append(job.id)
         
         return JobReassignmentResult(
             reassigned_count=len(reassigned_ids),
             job_ids=reassigned_ids,
         )
 
+    async def requeue_unacked_jobs(self, job_ids: Iterable[str]) -> int:
+        """Dispatch jobs again whose agent did not acknowledge them in time.
+        
+        Requirements: 21.5
+        
+        Their leases are already released. Returns the number requeued.
+        """
+        requeued = 0
+        for job_id in job_ids:
+            job = await self.job_repo.get_job_by_id(uuid.UUID(job_id))
+            if not job or job.status != JobStatus.PROCESSING.value:
+                continue
+            if await self._requeue(job, f"Agent {job.agent_id} did not acknowledge the job"):
+                requeued += 1
+        return requeued
+
+    async def _requeue(self, job, reason: str) -> bool:
+        """Requeue a job and push it to another agent; False if it went to the DLQ."""
+        if job.attempts >= job.max_attempts:
+            await self.job_repo.move_to_dlq(job.id, reason)
+            return False
+        await self.job_repo.requeue_job(job.id)
+        await self.dispatch_job(job.id)
+        return True
+
     # ==================== Query Methods ====================
 
     async def get_agent_info(self, agent_id: uuid.UUID) -> Optional[AgentInfo]:
@@ -356,40 +497,17 @@ class AgentService:
         if not agent:
             return None
         
-        return AgentInfo(
-            id=agent.id,
-            type=SchemaAgentType(agent.type),
-            hostname=agent.hostname,
-            ip_address=agent.ip_address,
-            status=SchemaAgentStatus(agent.status),
-            current_load=agent.current_load,
-            max_capacity=agent.max_capacity,
-            last_heartbeat=agent.last_heartbeat,
-            created_at=agent.created_at,
-            updated_at=agent.updated_at,
-        )
+        states = await self.control.agent_states()
+        return self._agent_info(agent, states.get(str(agent.id)))
 
     async def list_agents(self) -> AgentListResponse:
         """List all agents."""
         agents = await self.agent_repo.get_all_agents()
+        states = await self.control.agent_states()
         
-        agent_infos = [
-            AgentInfo(
-                id=a.id,
-                type=SchemaAgentType(a.type),
-                hostname=a.hostname,
-                ip_address=a.ip_address,
-                status=SchemaAgentStatus(a.status),
-                current_load=a.current_load,
-                max_capacity=a.max_capacity,
-                last_heartbeat=a.last_heartbeat,
-                created_at=a.created_at,
-                updated_at=a.updated_at,
-            )
-            for a in agents
-        ]
+        agent_infos = [self._agent_info(a, states.get(str(a.id))) for a in agents]
         
-        healthy_count = sum(1 for a in agents if a.status == AgentStatus.HEALTHY.value)
+        healthy_count = sum(1 for a in agent_infos if a.status == SchemaAgentStatus.HEALTHY)
         
         return AgentListResponse(
             agents=agent_infos,
@@ -398,6 +516,34 @@ class AgentService:
             unhealthy_count=len(agents) - healthy_count,
         )
 
+    def _agent_info(self, agent, state: Optional[AgentLiveState]) -> AgentInfo:
+        """Agent as stored, with liveness and load from the control channel."""
+        status = SchemaAgentStatus(agent.status)
+        current_load = agent.current_load
+        last_heartbeat = agent.last_heartbeat
+        
+        if state is not None:
+            current_load = state.load
+            if state.alive:
+                status = SchemaAgentStatus.HEALTHY
+                last_heartbeat = to_naive_utc(datetime.fromtimestamp(state.last_heartbeat, tz=timezone.utc))
+            elif status == SchemaAgentStatus.HEALTHY:
+                # Expired, not yet swept
+                status = SchemaAgentStatus.UNHEALTHY
+        
+        return AgentInfo(
+            id=agent.id,
+            type=SchemaAgentType(agent.type),
+            hostname=agent.hostname,
+            ip_address=agent.ip_address,
+            status=status,
+            current_load=current_load,
+            max_capacity=agent.max_capacity,
+            last_heartbeat=last_heartbeat,
+            created_at=agent.created_at,
+            updated_at=agent.updated_at,
+        )
+
     async def get_job_info(self, job_id: uuid.UUID) -> Optional[JobInfo]:
         """Get job information."""
         job = await self.job_repo.get_job_by_id(job_id)
@@ -11,6 +11,8 @@ Requirements: 14.1, 14.2, 14.3, 14.4, 14.5, 15.1, 15.2, 15.3, 15.4, 15.5
 
 from app.modules.ai.service import AIService, AIServiceError
 from app.modules.ai.openai_client import OpenAIClient, OpenAIClientError, get_openai_client
+from app.modules.ai.executor import AIExecutor, AIDeadlineExceeded, get_ai_executor
+from app.modules.ai.response_cache import AIResponseCache, get_ai_response_cache
 from app.modules.ai.thumbnail import (
     ThumbnailOptimizer,
     ThumbnailOptimizationError,
@@ -25,6 +27,11 @@ __all__ = [
     "OpenAIClient",
     "OpenAIClientError",
     "get_openai_client",
+    "AIExecutor",
+    "AIDeadlineExceeded",
+    "get_ai_executor",
+    "AIResponseCache",
+    "get_ai_response_cache",
     "ThumbnailOptimizer",
     "ThumbnailOptimizationError",
     "optimize_thumbnail",
@@ -71,6 +71,10 @@ If the message is inappropriate or you should not respond, use:
 }}"""
 
 
+# Stands in for the viewer's name in prompts, so one answer can be shared
+# by viewers asking the same question; rendered per viewer afterwards
+VIEWER_NAME_PLACEHOLDER = "{viewer}"
+
 CHATBOT_USER_PROMPT = """A viewer named "{user_name}" sent this message in chat:
 
 "{message}"
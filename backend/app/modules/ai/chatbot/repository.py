@@ -11,7 +11,7 @@ from typing import Optional
 from sqlalchemy import select, update, delete
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.datetime_utils import utcnow
+from app.core.datetime_utils import utcnow, to_naive_utc
 from app.modules.ai.chatbot.models import (
     ChatbotConfig,
     ChatbotInteractionLog,
@@ -101,6 +101,32 @@ class ChatbotConfigRepository:
         await self.session.refresh(config)
         return config
 
+    async def record_response(self, config_id: uuid.UUID, response_time_ms: float) -> None:
+        """Count a response and fold its time into the running average.
+
+        Done as a single UPDATE so concurrent responses for the same config
+        do not need the config row loaded or locked.
+        """
+        await self.session.execute(
+            update(ChatbotConfig)
+            .where(ChatbotConfig.id == config_id)
+            .values(
+                total_responses=ChatbotConfig.total_responses + 1,
+                avg_response_time_ms=(
+                    ChatbotConfig.avg_response_time_ms * ChatbotConfig.total_responses
+                    + response_time_ms
+                ) / (ChatbotConfig.total_responses + 1),
+            )
+        )
+
+    async def increment_declined(self, config_id: uuid.UUID) -> None:
+        """Increment declined response count."""
+        await self.session.execute(
+            update(ChatbotConfig)
+            .where(ChatbotConfig.id == config_id)
+            .values(total_declined=ChatbotConfig.total_declined + 1)
+        )
+
     async def delete(self, config_id: uuid.UUID) -> bool:
         """Delete chatbot configuration."""
         result = await self.session.execute(
@@ -164,11 +190,15 @@ class ChatbotTriggerRepository:
         return trigger
 
     async def increment_trigger_count(self, trigger_id: uuid.UUID) -> None:
-        """Increment trigger count."""
-        trigger = await self.get_by_id(trigger_id)
-        if trigger:
-            trigger.increment_trigger_count()
-            await self.session.flush()
+        """Increment trigger count and update last triggered time."""
+        await self.session.execute(
+            update(ChatbotTrigger)
+            .where(ChatbotTrigger.id == trigger_id)
+            .values(
+                trigger_count=ChatbotTrigger.trigger_count + 1,
+                last_triggered_at=to_naive_utc(utcnow()),
+            )
+        )
 
     async def delete(self, trigger_id: uuid.UUID) -> bool:
         """Delete a trigger."""
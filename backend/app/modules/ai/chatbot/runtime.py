@@ -0,0 +1,348 @@
+"""Per-account chatbot runtime state.
+
+Keeps what every chat message needs in memory so that generating a
+response does not reload the config, re-query cooldowns and recompile
+trigger patterns per message:
+
+- ChatbotSnapshot: a detached copy of the config with its compiled
+  TriggerMatcher, cached per account and invalidated on edits (in every
+  process, through a per-account version in Redis)
+- CooldownTracker: per-user cooldowns as a TTL map (in memory, or in
+  Redis when several processes answer the same chat)
+- CoalescingExecutor: bounded concurrency for AI calls, with identical
+  in-flight requests sharing one call
+
+Requirements: 11.1 - Generate responses within 3 seconds
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+import uuid
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CachedTrigger:
+    """Detached copy of a ChatbotTrigger."""
+
+    id: uuid.UUID
+    name: str
+    trigger_type: str
+    pattern: Optional[str]
+    keywords: Optional[tuple[str, ...]]
+    custom_response_prompt: Optional[str]
+    priority: int
+    is_enabled: bool
+
+    @classmethod
+    def from_model(cls, trigger) -> "CachedTrigger":
+        return cls(
+            id=trigger.id,
+            name=trigger.name,
+            trigger_type=trigger.trigger_type,
+            pattern=trigger.pattern,
+            keywords=tuple(trigger.keywords) if trigger.keywords else None,
+            custom_response_prompt=trigger.custom_response_prompt,
+            priority=trigger.priority,
+            is_enabled=trigger.is_enabled,
+        )
+
+
+@dataclass(frozen=True)
+class CachedChatbotConfig:
+    """Detached copy of the ChatbotConfig fields used to answer messages."""
+
+    id: uuid.UUID
+    account_id: uuid.UUID
+    bot_name: str
+    bot_prefix: str
+    personality: str
+    response_style: str
+    custom_personality_prompt: Optional[str]
+    max_response_length: int
+    response_language: str
+    use_emojis: bool
+    is_enabled: bool
+    is_paused: bool
+    cooldown_seconds: int
+    content_filter_enabled: bool
+    blocked_topics: Optional[tuple[str, ...]]
+    blocked_keywords: Optional[tuple[str, ...]]
+    takeover_command: str
+    resume_command: str
+
+    @classmethod
+    def from_model(cls, config) -> "CachedChatbotConfig":
+        return cls(
+            id=config.id,
+            account_id=config.account_id,
+            bot_name=config.bot_name,
+            bot_prefix=config.bot_prefix,
+            personality=config.personality,
+            response_style=config.response_style,
+            custom_personality_prompt=config.custom_personality_prompt,
+            max_response_length=config.max_response_length,
+            response_language=config.response_language,
+            use_emojis=config.use_emojis,
+            is_enabled=config.is_enabled,
+            is_paused=config.is_paused,
+            cooldown_seconds=config.cooldown_seconds,
+            content_filter_enabled=config.content_filter_enabled,
+            blocked_topics=tuple(config.blocked_topics) if config.blocked_topics else None,
+            blocked_keywords=tuple(config.blocked_keywords) if config.blocked_keywords else None,
+            takeover_command=config.takeover_command,
+            resume_command=config.resume_command,
+        )
+
+    def is_active(self) -> bool:
+        """Check if chatbot is active and can respond."""
+        return self.is_enabled and not self.is_paused
+
+
+@dataclass
+class ChatbotSnapshot:
+    """Cached config and compiled trigger matcher of one account."""
+
+    config: CachedChatbotConfig
+    matcher: Any  # TriggerMatcher
+    version: Optional[str] = None
+    loaded_at: float = field(default_factory=time.monotonic)
+
+
+class ChatbotSnapshotCache:
+    """Per-account snapshot cache with TTL expiry and explicit invalidation.
+
+    Local to one process; ChatbotRuntime checks entries against the version
+    other processes bump in Redis. The TTL bounds staleness when Redis is
+    unavailable.
+    """
+
+    def __init__(self, ttl_seconds: Optional[float] = None, max_entries: int = 10_000):
+        self.ttl_seconds = (
+            settings.CHATBOT_CONFIG_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        )
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[uuid.UUID, ChatbotSnapshot]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, account_id: uuid.UUID) -> Optional[ChatbotSnapshot]:
+        snapshot = self._entries.get(account_id)
+        if snapshot is None or time.monotonic() - snapshot.loaded_at > self.ttl_seconds:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(account_id)
+        self.hits += 1
+        return snapshot
+
+    def put(self, account_id: uuid.UUID, snapshot: ChatbotSnapshot) -> None:
+        self._entries[account_id] = snapshot
+        self._entries.move_to_end(account_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, account_id: uuid.UUID) -> None:
+        self._entries.pop(account_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class CooldownTracker:
+    """Per-user response cooldowns kept as a TTL map.
+
+    Uses Redis (SET EX) when a client is given, so every process answering
+    a chat sees the same cooldowns, and falls back to the in-memory map if
+    Redis is unavailable.
+    """
+
+    KEY_PREFIX = "chatbot:cooldown:"
+
+    def __init__(self, redis=None, max_entries: int = 100_000):
+        self.redis = redis
+        self.max_entries = max_entries
+        self._expires: "OrderedDict[tuple[uuid.UUID, str], float]" = OrderedDict()
+
+    async def is_on_cooldown(self, config_id: uuid.UUID, user_channel_id: str) -> bool:
+        if self.redis is not None:
+            try:
+                return bool(await self.redis.exists(self._key(config_id, user_channel_id)))
+            except Exception as e:
+                logger.warning(f"Cooldown lookup in Redis failed, using local map: {e}")
+        expires_at = self._expires.get((config_id, user_channel_id))
+        if expires_at is None:
+            return False
+        if expires_at <= time.monotonic():
+            del self._expires[(config_id, user_channel_id)]
+            return False
+        return True
+
+    async def start(self, config_id: uuid.UUID, user_channel_id: str, seconds: int) -> None:
+        if seconds <= 0:
+            return
+        if self.redis is not None:
+            try:
+                await self.redis.set(self._key(config_id, user_channel_id), "1", ex=int(seconds))
+            except Exception as e:
+                logger.warning(f"Cooldown write to Redis failed, using local map: {e}")
+        key = (config_id, user_channel_id)
+        self._expires[key] = time.monotonic() + seconds
+        self._expires.move_to_end(key)
+        self._evict()
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        # Drop expired entries from the oldest end, then enforce the bound
+        while self._expires:
+            expires_at = next(iter(self._expires.values()))
+            if expires_at > now and len(self._expires) <= self.max_entries:
+                break
+            self._expires.popitem(last=False)
+
+    def _key(self, config_id: uuid.UUID, user_channel_id: str) -> str:
+        return f"{self.KEY_PREFIX}{config_id}:{user_channel_id}"
+
+
+class CoalescingExecutor:
+    """Bounded-concurrency runner that shares identical in-flight calls.
+
+    Callers passing the same key while a call is in flight await the
+    same result instead of starting another call.
+    """
+
+    def __init__(self, max_concurrency: int):
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self._in_flight: dict[str, asyncio.Future] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def run(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        existing = self._in_flight.get(key)
+        if existing is not None:
+            self.coalesced += 1
+            return await asyncio.shield(existing)
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            async with self._semaphore:
+                self.calls += 1
+                result = await factory()
+        except BaseException as exc:
+            if not future.done():
+                future.set_exception(exc)
+                # Retrieve it so a failure nobody else awaited is not logged
+                future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._in_flight.pop(key, None)
+
+
+def normalize_question(message: str) -> str:
+    """Normalize a chat message for request coalescing."""
+    return " ".join(message.lower().split())
+
+
+def coalescing_key(*parts: Any) -> str:
+    """Stable key for a coalesced request."""
+    return hashlib.sha256("\x1f".join(str(p) for p in parts).encode()).hexdigest()
+
+
+class ChatbotRuntime:
+    """Process-wide chatbot state shared by ChatbotService instances.
+
+    With a Redis client, invalidating an account bumps its config version
+    (INCR) so that every process drops its snapshot on the next message.
+    """
+
+    VERSION_KEY_PREFIX = "chatbot:config-version:"
+
+    def __init__(
+        self,
+        snapshots: Optional[ChatbotSnapshotCache] = None,
+        cooldowns: Optional[CooldownTracker] = None,
+        max_ai_concurrency: Optional[int] = None,
+        redis=None,
+    ):
+        self.snapshots = snapshots or ChatbotSnapshotCache()
+        self.cooldowns = cooldowns or CooldownTracker()
+        self.redis = redis
+        self.max_ai_concurrency = max_ai_concurrency or settings.CHATBOT_AI_MAX_CONCURRENCY
+        # asyncio primitives are bound to one loop
+        self._executors: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, CoalescingExecutor]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    @property
+    def ai_executor(self) -> CoalescingExecutor:
+        loop = asyncio.get_running_loop()
+        executor = self._executors.get(loop)
+        if executor is None:
+            executor = CoalescingExecutor(self.max_ai_concurrency)
+            self._executors[loop] = executor
+        return executor
+
+    async def get_snapshot(self, account_id: uuid.UUID) -> Optional[ChatbotSnapshot]:
+        """Cached snapshot of an account, unless another process invalidated it."""
+        snapshot = self.snapshots.get(account_id)
+        if snapshot is None or self.redis is None:
+            return snapshot
+        try:
+            version = await self.redis.get(self._version_key(account_id))
+        except Exception as e:
+            logger.warning(f"Chatbot config version lookup failed, using cached copy: {e}")
+            return snapshot
+        if version != snapshot.version:
+            self.snapshots.invalidate(account_id)
+            return None
+        return snapshot
+
+    async def config_version(self, account_id: uuid.UUID) -> Optional[str]:
+        """Current config version of an account, read before loading it."""
+        if self.redis is None:
+            return None
+        try:
+            return await self.redis.get(self._version_key(account_id))
+        except Exception as e:
+            logger.warning(f"Chatbot config version lookup failed: {e}")
+            return None
+
+    async def invalidate(self, account_id: uuid.UUID) -> None:
+        """Drop an account's snapshot here and in every other process."""
+        self.snapshots.invalidate(account_id)
+        if self.redis is not None:
+            try:
+                await self.redis.incr(self._version_key(account_id))
+            except Exception as e:
+                logger.warning(
+                    f"Chatbot config invalidation in Redis failed, other processes "
+                    f"keep their copy until it expires: {e}"
+                )
+
+    def _version_key(self, account_id: uuid.UUID) -> str:
+        return f"{self.VERSION_KEY_PREFIX}{account_id}"
+
+
+_runtime: Optional[ChatbotRuntime] = None
+
+
+def get_chatbot_runtime() -> ChatbotRuntime:
+    """Get the process-wide chatbot runtime, sharing cooldowns and invalidations through Redis."""
+    global _runtime
+    if _runtime is None:
+        from app.core.redis import redis_client
+
+        _runtime = ChatbotRuntime(cooldowns=CooldownTracker(redis_client), redis=redis_client)
+    return _runtime
@@ -23,6 +23,7 @@ from app.modules.ai.chatbot.models import (
     TriggerType,
 )
 from app.modules.ai.chatbot.prompts import (
+    VIEWER_NAME_PLACEHOLDER,
     build_content_filter_prompt,
     build_system_prompt,
     build_user_prompt,
@@ -32,6 +33,15 @@ from app.modules.ai.chatbot.repository import (
     ChatbotInteractionLogRepository,
     ChatbotTriggerRepository,
 )
+from app.modules.ai.chatbot.runtime import (
+    CachedChatbotConfig,
+    CachedTrigger,
+    ChatbotRuntime,
+    ChatbotSnapshot,
+    coalescing_key,
+    get_chatbot_runtime,
+    normalize_question,
+)
 from app.modules.ai.chatbot.schemas import (
     ChatbotConfigCreate,
     ChatbotConfigResponse,
@@ -190,15 +200,18 @@ class ChatbotService:
         self,
         session: AsyncSession,
         openai_client: Optional[OpenAIClient] = None,
+        runtime: Optional[ChatbotRuntime] = None,
     ):
         """Initialize chatbot service.
         
         Args:
             session: Database session
             openai_client: Optional OpenAI client
+            runtime: Optional chatbot runtime (defaults to the process-wide one)
         """
         self.session = session
         self._openai_client = openai_client
+        self.runtime = runtime or get_chatbot_runtime()
         self.config_repo = ChatbotConfigRepository(session)
         self.trigger_repo = ChatbotTriggerRepository(session)
         self.interaction_repo = ChatbotInteractionLogRepository(session)
@@ -274,7 +287,9 @@ class ChatbotService:
         if "response_style" in update_data and update_data["response_style"]:
             update_data["response_style"] = update_data["response_style"].value
 
-        return await self.config_repo.update(config.id, **update_data)
+        updated = await self.config_repo.update(config.id, **update_data)
+        await self.runtime.invalidate(account_id)
+        return updated
 
     # ============================================
     # Trigger Management (Requirements: 11.1)
@@ -296,7 +311,9 @@ class ChatbotService:
             priority=data.priority,
             is_enabled=data.is_enabled,
         )
-        return await self.trigger_repo.create(trigger)
+        trigger = await self.trigger_repo.create(trigger)
+        await self._invalidate_config(config_id)
+        return trigger
 
     async def get_triggers(
         self,
@@ -308,7 +325,38 @@ class ChatbotService:
 
     async def delete_trigger(self, trigger_id: uuid.UUID) -> bool:
         """Delete a trigger."""
-        return await self.trigger_repo.delete(trigger_id)
+        trigger = await self.trigger_repo.get_by_id(trigger_id)
+        if trigger is None:
+            return False
+        deleted = await self.trigger_repo.delete(trigger_id)
+        await self._invalidate_config(trigger.config_id)
+        return deleted
+
+    async def _invalidate_config(self, config_id: uuid.UUID) -> None:
+        """Invalidate the cached snapshot of the account owning a config."""
+        config = await self.config_repo.get_by_id(config_id)
+        if config is not None:
+            await self.runtime.invalidate(config.account_id)
+
+    async def get_snapshot(self, account_id: uuid.UUID) -> ChatbotSnapshot:
+        """Get the cached config and trigger matcher for an account.
+
+        Loads and caches them on a miss; edits made through this service,
+        in any process, invalidate the cached copy.
+        """
+        snapshot = await self.runtime.get_snapshot(account_id)
+        if snapshot is None:
+            # Read the version first so an edit made during the load is not missed
+            version = await self.runtime.config_version(account_id)
+            config = await self.get_or_create_config(account_id)
+            triggers = await self.get_triggers(config.id, enabled_only=True)
+            snapshot = ChatbotSnapshot(
+                config=CachedChatbotConfig.from_model(config),
+                matcher=TriggerMatcher([CachedTrigger.from_model(t) for t in triggers]),
+                version=version,
+            )
+            self.runtime.snapshots.put(account_id, snapshot)
+        return snapshot
 
 
     # ============================================
@@ -334,8 +382,9 @@ class ChatbotService:
         """
         start_time = time.time()
 
-        # Get config
-        config = await self.get_or_create_config(account_id)
+        # Get cached config and trigger matcher
+        snapshot = await self.get_snapshot(account_id)
+        config = snapshot.config
 
         # Check if bot is active
         if not config.is_active():
@@ -347,12 +396,7 @@ class ChatbotService:
             )
 
         # Check user cooldown
-        recent = await self.interaction_repo.get_recent_by_user(
-            config.id,
-            request.user_channel_id,
-            config.cooldown_seconds,
-        )
-        if recent:
+        if await self.runtime.cooldowns.is_on_cooldown(config.id, request.user_channel_id):
             return ChatResponseResult(
                 should_respond=False,
                 was_declined=True,
@@ -379,10 +423,8 @@ class ChatbotService:
                     response_time_ms=(time.time() - start_time) * 1000,
                 )
 
-        # Get triggers and check for match
-        triggers = await self.get_triggers(config.id, enabled_only=True)
-        matcher = TriggerMatcher(triggers)
-        match_result = matcher.match(request.message_content)
+        # Check for trigger match
+        match_result = snapshot.matcher.match(request.message_content)
 
         if match_result is None:
             return ChatResponseResult(
@@ -406,16 +448,19 @@ class ChatbotService:
             matched_pattern=matched_pattern,
         )
         interaction = await self.interaction_repo.create(interaction)
+        await self.runtime.cooldowns.start(
+            config.id, request.user_channel_id, config.cooldown_seconds
+        )
 
         # Content filtering (Requirements: 11.4)
         if config.content_filter_enabled:
-            filter_result = await self._check_content_filter(
-                config,
-                request.message_content,
+            filter_result = await self.runtime.ai_executor.run(
+                coalescing_key("filter", config.id, normalize_question(request.message_content)),
+                lambda: self._check_content_filter(config, request.message_content),
             )
             if filter_result.get("is_inappropriate", False):
                 interaction.mark_declined(filter_result.get("reason", "Inappropriate content"))
-                config.increment_declined_count()
+                await self.config_repo.increment_declined(config.id)
                 await self.session.flush()
 
                 return ChatResponseResult(
@@ -428,7 +473,7 @@ class ChatbotService:
 
         # Generate AI response
         try:
-            response = await self._generate_ai_response(
+            response = await self._coalesced_ai_response(
                 config,
                 matched_trigger,
                 request.user_display_name,
@@ -449,7 +494,7 @@ class ChatbotService:
         if not response.get("should_respond", False):
             reason = response.get("decline_reason", "AI declined to respond")
             interaction.mark_declined(reason)
-            config.increment_declined_count()
+            await self.config_repo.increment_declined(config.id)
             await self.session.flush()
 
             return ChatResponseResult(
@@ -467,7 +512,7 @@ class ChatbotService:
         # Update interaction and config
         response_time_ms = (time.time() - start_time) * 1000
         interaction.complete_response(response_text, "")  # Message ID set later
-        config.increment_response_count(response_time_ms)
+        await self.config_repo.record_response(config.id, response_time_ms)
         await self.trigger_repo.increment_trigger_count(matched_trigger.id)
         await self.session.flush()
 
@@ -482,6 +527,29 @@ class ChatbotService:
         )
 
 
+    async def _coalesced_ai_response(
+        self,
+        config: CachedChatbotConfig,
+        trigger: CachedTrigger,
+        user_name: str,
+        message: str,
+    ) -> dict:
+        """Generate an AI response through the bounded, coalescing executor.
+
+        Identical questions for the same trigger that arrive while one is in
+        flight share its answer. The model sees a placeholder instead of the
+        viewer's name, and each viewer's name is rendered into the shared
+        answer afterwards.
+        """
+        response = await self.runtime.ai_executor.run(
+            coalescing_key("respond", config.id, trigger.id, normalize_question(message)),
+            lambda: self._generate_ai_response(config, trigger, VIEWER_NAME_PLACEHOLDER, message),
+        )
+        if response.get("response"):
+            response = dict(response)
+            response["response"] = response["response"].replace(VIEWER_NAME_PLACEHOLDER, user_name)
+        return response
+
     async def _generate_ai_response(
         self,
         config: ChatbotConfig,
@@ -585,6 +653,7 @@ class ChatbotService:
         Requirements: 11.5 - Pause bot on command
         """
         await self.config_repo.pause(config.id, paused_by)
+        await self.runtime.invalidate(config.account_id)
 
     async def _handle_resume(self, config: ChatbotConfig) -> None:
         """Handle resume command after takeover.
@@ -592,6 +661,7 @@ class ChatbotService:
         Requirements: 11.5
         """
         await self.config_repo.resume(config.id)
+        await self.runtime.invalidate(config.account_id)
 
     async def pause_bot(
         self,
@@ -611,6 +681,7 @@ class ChatbotService:
         """
         config = await self.get_or_create_config(account_id)
         config = await self.config_repo.pause(config.id, paused_by)
+        await self.runtime.invalidate(account_id)
 
         return TakeoverResponse(
             is_paused=config.is_paused,
@@ -642,6 +713,7 @@ class ChatbotService:
             pending_count = len(pending)
 
         config = await self.config_repo.resume(config.id)
+        await self.runtime.invalidate(account_id)
 
         return TakeoverResponse(
             is_paused=config.is_paused,
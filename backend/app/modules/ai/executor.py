@@ -0,0 +1,217 @@
+"""Execution layer for OpenAI requests.
+
+Every AI request runs inside an execution slot. A slot provides:
+- a cap on concurrent requests per event loop
+- an optional process-wide tokens-per-minute budget
+- a deadline that covers queueing as well as the API call itself
+- per-feature request, latency and token metrics
+
+Requirements: 14.1, 14.2, 14.3
+"""
+
+import asyncio
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Optional, TypeVar
+
+from app.core.config import settings
+from app.core.metrics import (
+    AI_REQUEST_DURATION_SECONDS,
+    AI_REQUESTS_IN_FLIGHT,
+    AI_REQUESTS_TOTAL,
+    AI_TOKENS_TOTAL,
+)
+from app.modules.ai.openai_client import OpenAIClientError
+
+T = TypeVar("T")
+
+
+class AIDeadlineExceeded(OpenAIClientError):
+    """Raised when an AI request does not finish before its deadline."""
+    pass
+
+
+class TokenRateLimiter:
+    """Tokens-per-minute limiter shared by every event loop in the process.
+
+    Callers reserve tokens up front and wait until the budget covers them.
+    Once the real usage is known, they settle the difference.
+    """
+
+    def __init__(
+        self,
+        tokens_per_minute: int,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.capacity = float(tokens_per_minute)
+        self.rate = tokens_per_minute / 60.0
+        self.clock = clock
+        self._available = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: int) -> float:
+        """Reserve tokens and return the seconds to wait before using them."""
+        tokens = min(float(tokens), self.capacity)
+        with self._lock:
+            self._refill()
+            self._available -= tokens
+            if self._available >= 0:
+                return 0.0
+            return -self._available / self.rate
+
+    def settle(self, reserved: int, used: int) -> None:
+        """Return unused reserved tokens (or charge an overrun)."""
+        with self._lock:
+            self._refill()
+            reserved = min(float(reserved), self.capacity)
+            self._available = min(self.capacity, self._available + reserved - used)
+
+    @property
+    def available(self) -> float:
+        with self._lock:
+            self._refill()
+            return self._available
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self._available = min(self.capacity, self._available + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+class ExecutionSlot:
+    """A running AI request: enforces its deadline and records token usage."""
+
+    def __init__(self, feature: str, deadline_at: float):
+        self.feature = feature
+        self.deadline_at = deadline_at
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    @property
+    def remaining(self) -> float:
+        return self.deadline_at - time.monotonic()
+
+    async def run(self, awaitable: Awaitable[T]) -> T:
+        """Await within the slot's remaining deadline."""
+        remaining = self.remaining
+        if remaining <= 0:
+            if asyncio.iscoroutine(awaitable):
+                awaitable.close()
+            raise AIDeadlineExceeded(f"{self.feature} request exceeded its deadline")
+        try:
+            return await asyncio.wait_for(awaitable, remaining)
+        except asyncio.TimeoutError as e:
+            raise AIDeadlineExceeded(f"{self.feature} request exceeded its deadline") from e
+
+    def record_tokens(self, prompt_tokens: int, completion_tokens: int) -> None:
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+
+    async def stream(self, chunks: AsyncIterator[T]) -> AsyncIterator[T]:
+        """Iterate a streamed response, each chunk within the remaining deadline."""
+        iterator = chunks.__aiter__()
+        try:
+            while True:
+                try:
+                    chunk = await self.run(iterator.__anext__())
+                except StopAsyncIteration:
+                    return
+                yield chunk
+        finally:
+            aclose = getattr(iterator, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+
+class AIExecutor:
+    """Process-wide limits for OpenAI requests."""
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        default_deadline_seconds: Optional[float] = None,
+    ):
+        self.max_concurrency = max_concurrency or settings.AI_MAX_CONCURRENT_REQUESTS
+        self.default_deadline_seconds = (
+            default_deadline_seconds or settings.AI_REQUEST_DEADLINE_SECONDS
+        )
+        tokens_per_minute = tokens_per_minute or settings.AI_TOKENS_PER_MINUTE
+        self.limiter = TokenRateLimiter(tokens_per_minute) if tokens_per_minute > 0 else None
+        # asyncio primitives are bound to one loop
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphores[loop] = semaphore
+        return semaphore
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        feature: str,
+        reserve_tokens: int,
+        deadline_seconds: Optional[float] = None,
+    ) -> AsyncIterator[ExecutionSlot]:
+        """Run one AI request under the concurrency, token and deadline limits.
+
+        Raises:
+            AIDeadlineExceeded: If the request (including queueing) outlives its deadline
+        """
+        started = time.monotonic()
+        slot = ExecutionSlot(
+            feature, started + (deadline_seconds or self.default_deadline_seconds)
+        )
+        semaphore = self._semaphore()
+        status = "error"
+
+        try:
+            await slot.run(semaphore.acquire())
+        except AIDeadlineExceeded:
+            AI_REQUESTS_TOTAL.labels(service=feature, status="deadline").inc()
+            raise
+
+        AI_REQUESTS_IN_FLIGHT.labels(service=feature).inc()
+        reserved = 0
+        try:
+            if self.limiter is not None:
+                wait = self.limiter.reserve(reserve_tokens)
+                reserved = reserve_tokens
+                if wait > 0:
+                    await slot.run(asyncio.sleep(wait))
+            yield slot
+            status = "success"
+        except AIDeadlineExceeded:
+            status = "deadline"
+            raise
+        finally:
+            semaphore.release()
+            AI_REQUESTS_IN_FLIGHT.labels(service=feature).dec()
+            used = slot.prompt_tokens + slot.completion_tokens
+            if reserved:
+                self.limiter.settle(reserved, used)
+            AI_REQUESTS_TOTAL.labels(service=feature, status=status).inc()
+            AI_REQUEST_DURATION_SECONDS.labels(service=feature).observe(time.monotonic() - started)
+            if slot.prompt_tokens:
+                AI_TOKENS_TOTAL.labels(service=feature, kind="prompt").inc(slot.prompt_tokens)
+            if slot.completion_tokens:
+                AI_TOKENS_TOTAL.labels(service=feature, kind="completion").inc(slot.completion_tokens)
+
+
+_executor: Optional[AIExecutor] = None
+
+
+def get_ai_executor() -> AIExecutor:
+    """Get the process-wide AI executor."""
+    global _executor
+    if _executor is None:
+        _executor = AIExecutor()
+    return _executor
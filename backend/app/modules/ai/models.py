@@ -50,6 +50,11 @@ class AILog(Base):
     # Performance metrics
     latency_ms = Column(Float, nullable=False, default=0)
     cost_usd = Column(Float, nullable=False, default=0)
+
+    # Response cache accounting: hits cost nothing, savings are tracked
+    cache_hit = Column(Boolean, nullable=False, default=False, index=True)
+    tokens_saved = Column(Integer, nullable=False, default=0)
+    cost_saved_usd = Column(Float, nullable=False, default=0)
     
     # Status
     status = Column(String(20), nullable=False, default=AILogStatus.SUCCESS.value, index=True)
@@ -94,6 +99,7 @@ class AIUserPreferences(Base):
     brand_colors = Column(JSON, nullable=True)  # List of hex colors
     brand_keywords = Column(JSON, nullable=True)  # List of keywords
     avoid_keywords = Column(JSON, nullable=True)  # List of keywords to avoid
+    disable_response_cache = Column(Boolean, nullable=False, default=False)  # Opt out of cached AI responses
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
 
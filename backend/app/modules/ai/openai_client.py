@@ -5,26 +5,59 @@ Requirements: 14.1, 14.2, 14.3
 """
 
 import json
-from typing import Optional, Any
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Optional
 
 from openai import AsyncOpenAI
 
 from app.core.config import settings
 
 
+# Blended USD price per 1K tokens, used for budget accounting
+MODEL_COST_PER_1K_TOKENS = {
+    "gpt-4": 0.045,
+    "gpt-4-turbo": 0.02,
+    "gpt-4-turbo-preview": 0.02,
+    "gpt-4o": 0.0075,
+    "gpt-4o-mini": 0.0004,
+    "gpt-3.5-turbo": 0.001,
+}
+DEFAULT_COST_PER_1K_TOKENS = 0.02
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for a text (about four characters per token)."""
+    return max(1, len(text) // 4)
+
+
+def estimate_cost_usd(model: str, tokens: int) -> float:
+    """Estimate the USD cost of a number of tokens on a model."""
+    return tokens / 1000 * MODEL_COST_PER_1K_TOKENS.get(model, DEFAULT_COST_PER_1K_TOKENS)
+
+
 class OpenAIClientError(Exception):
     """Base exception for OpenAI client errors."""
     pass
 
 
+@dataclass
+class CompletionResult:
+    """Completion text with the token usage reported by the API."""
+
+    text: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+
 class OpenAIClient:
     """Wrapper for OpenAI API client."""
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None):
         """Initialize OpenAI client.
 
         Args:
             api_key: OpenAI API key. Uses settings if not provided.
+            base_url: API base URL. Uses settings (or the OpenAI default) if not provided.
         """
         self.api_key = api_key or settings.OPENAI_API_KEY
         self.model = settings.OPENAI_MODEL
@@ -34,7 +67,89 @@ class OpenAIClient:
         if not self.api_key:
             raise OpenAIClientError("OpenAI API key not configured")
 
-        self._client = AsyncOpenAI(api_key=self.api_key)
+        self._client = AsyncOpenAI(
+            api_key=self.api_key,
+            base_url=base_url or settings.OPENAI_BASE_URL,
+        )
+
+    def _request_kwargs(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+        response_format: Optional[dict] = None,
+    ) -> dict[str, Any]:
+        kwargs: dict[str, Any] = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            "temperature": temperature or self.temperature,
+            "max_tokens": max_tokens or self.max_tokens,
+        }
+        if response_format:
+            kwargs["response_format"] = response_format
+        return kwargs
+
+    async def complete(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        response_format: Optional[dict] = None,
+    ) -> CompletionResult:
+        """Generate a completion and return it with its token usage.
+
+        Raises:
+            OpenAIClientError: If API call fails
+        """
+        try:
+            response = await self._client.chat.completions.create(
+                **self._request_kwargs(
+                    system_prompt, user_prompt, temperature, max_tokens, response_format
+                )
+            )
+
+            if not response.choices:
+                raise OpenAIClientError("No response generated")
+
+            usage = response.usage
+            return CompletionResult(
+                text=response.choices[0].message.content or "",
+                prompt_tokens=usage.prompt_tokens if usage else 0,
+                completion_tokens=usage.completion_tokens if usage else 0,
+            )
+
+        except OpenAIClientError:
+            raise
+        except Exception as e:
+            raise OpenAIClientError(f"OpenAI API error: {str(e)}") from e
+
+    async def stream_completion(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+    ) -> AsyncIterator[str]:
+        """Stream a completion as text deltas.
+
+        Raises:
+            OpenAIClientError: If API call fails
+        """
+        try:
+            stream = await self._client.chat.completions.create(
+                stream=True,
+                **self._request_kwargs(system_prompt, user_prompt, temperature, max_tokens),
+            )
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except Exception as e:
+            raise OpenAIClientError(f"OpenAI API error: {str(e)}") from e
 
     async def generate_completion(
         self,
@@ -59,31 +174,14 @@ class OpenAIClient:
         Raises:
             OpenAIClientError: If API call fails
         """
-        try:
-            messages = [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ]
-
-            kwargs: dict[str, Any] = {
-                "model": self.model,
-                "messages": messages,
-                "temperature": temperature or self.temperature,
-                "max_tokens": max_tokens or self.max_tokens,
-            }
-
-            if response_format:
-                kwargs["response_format"] = response_format
-
-            response = await self._client.chat.completions.create(**kwargs)
-
-            if not response.choices:
-                raise OpenAIClientError("No response generated")
-
-            return response.choices[0].message.content or ""
-
-        except Exception as e:
-            raise OpenAIClientError(f"OpenAI API error: {str(e)}") from e
+        result = await self.complete(
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            response_format=response_format,
+        )
+        return result.text
 
     async def generate_json(
         self,
@@ -1,7 +1,7 @@
 """Repository for AI module database operations.
 
-Handles CRUD operations for AI feedback and preferences.
-Requirements: 14.5
+Handles CRUD operations for AI feedback, preferences and usage logs.
+Requirements: 13.1, 14.5
 """
 
 import uuid
@@ -12,7 +12,7 @@ from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.datetime_utils import utcnow, to_naive_utc
-from app.modules.ai.models import AIFeedback, AIUserPreferences, ThumbnailLibrary
+from app.modules.ai.models import AIFeedback, AILog, AIUserPreferences, ThumbnailLibrary
 
 
 class AIFeedbackRepository:
@@ -110,6 +110,7 @@ class AIPreferencesRepository:
         brand_colors: Optional[list[str]] = None,
         brand_keywords: Optional[list[str]] = None,
         avoid_keywords: Optional[list[str]] = None,
+        disable_response_cache: Optional[bool] = None,
     ) -> AIUserPreferences:
         """Create or update user preferences.
 
@@ -122,6 +123,7 @@ class AIPreferencesRepository:
             brand_colors: Brand colors
             brand_keywords: Brand keywords
             avoid_keywords: Keywords to avoid
+            disable_response_cache: Opt out of cached AI responses
 
         Returns:
             AIUserPreferences: Created or updated preferences
@@ -143,6 +145,8 @@ class AIPreferencesRepository:
                 existing.brand_keywords = brand_keywords
             if avoid_keywords is not None:
                 existing.avoid_keywords = avoid_keywords
+            if disable_response_cache is not None:
+                existing.disable_response_cache = disable_response_cache
             existing.updated_at = to_naive_utc(utcnow())
             await self.session.flush()
             return existing
@@ -156,12 +160,63 @@ class AIPreferencesRepository:
             brand_colors=brand_colors,
             brand_keywords=brand_keywords,
             avoid_keywords=avoid_keywords,
+            disable_response_cache=bool(disable_response_cache),
         )
         self.session.add(preferences)
         await self.session.flush()
         return preferences
 
 
+class AILogRepository:
+    """Repository for AI usage log operations.
+
+    Requirements: 13.1 - Track API calls, costs, and usage by feature
+    """
+
+    def __init__(self, session: AsyncSession):
+        """Initialize repository with database session."""
+        self.session = session
+
+    async def create(
+        self,
+        user_id: uuid.UUID,
+        feature: str,
+        model: str,
+        tokens_input: int = 0,
+        tokens_output: int = 0,
+        latency_ms: float = 0.0,
+        cost_usd: float = 0.0,
+        status: str = "success",
+        error_message: Optional[str] = None,
+        cache_hit: bool = False,
+        tokens_saved: int = 0,
+        cost_saved_usd: float = 0.0,
+    ) -> AILog:
+        """Record one AI request (or cache hit) for budget accounting.
+
+        Returns:
+            AILog: Created log record
+        """
+        log = AILog(
+            user_id=user_id,
+            feature=feature,
+            model=model,
+            tokens_input=tokens_input,
+            tokens_output=tokens_output,
+            total_tokens=tokens_input + tokens_output,
+            latency_ms=latency_ms,
+            cost_usd=cost_usd,
+            status=status,
+            error_message=error_message,
+            cache_hit=cache_hit,
+            tokens_saved=tokens_saved,
+            cost_saved_usd=cost_saved_usd,
+        )
+        self.session.add(log)
+        await self.session.flush()
+        return log
+
+
 class ThumbnailLibraryRepository:
     """Repository for thumbnail library operations."""
 
@@ -0,0 +1,281 @@
+"""Response cache for AI content generation.
+
+Bulk uploads and template-driven videos often send the same content,
+keywords and style several times in a short window. Those repeats are
+answered from a local cache instead of another OpenAI call.
+
+- Exact matches use a hash of the normalized prompt plus the model
+  parameters, and are shared between users.
+- Near-duplicate matches are optional. They compare locally computed
+  embeddings and only match the same user's earlier requests.
+
+Entries expire after a TTL, and the least recently used entry is
+evicted when the cache is full.
+
+Requirements: 14.1, 14.2, 14.3
+"""
+
+import copy
+import hashlib
+import math
+import re
+import time
+import unicodedata
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from app.core.config import settings
+from app.core.metrics import AI_CACHE_ENTRIES, AI_CACHE_LOOKUPS_TOTAL, AI_CACHE_TOKENS_SAVED_TOTAL
+
+EMBEDDING_DIMENSIONS = 256
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def normalize_prompt(text: str) -> str:
+    """Normalize prompt text so trivially different prompts share a key."""
+    text = unicodedata.normalize("NFKC", text).lower()
+    return " ".join(text.split())
+
+
+def cache_key(
+    feature: str,
+    model: str,
+    temperature: Optional[float],
+    max_tokens: Optional[int],
+    system_prompt: str,
+    user_prompt: str,
+) -> str:
+    """Hash of the normalized prompts and the model parameters."""
+    parts = [
+        feature,
+        model,
+        repr(temperature),
+        repr(max_tokens),
+        normalize_prompt(system_prompt),
+        normalize_prompt(user_prompt),
+    ]
+    return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+
+
+def local_embedding(text: str, dimensions: int = EMBEDDING_DIMENSIONS) -> tuple[float, ...]:
+    """Embed text as a normalized hashed bag of words and word bigrams.
+
+    Computed locally so near-duplicate matching costs no API calls.
+    """
+    words = _WORD_RE.findall(normalize_prompt(text))
+    features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    vector = [0.0] * dimensions
+    for feature in features:
+        digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+        index = int.from_bytes(digest[:4], "little") % dimensions
+        vector[index] += 1.0 if digest[4] & 1 else -1.0
+    norm = math.sqrt(sum(v * v for v in vector))
+    if norm == 0:
+        return tuple(vector)
+    return tuple(v / norm for v in vector)
+
+
+def cosine_similarity(a: tuple[float, ...], b: tuple[float, ...]) -> float:
+    """Cosine similarity of two normalized vectors."""
+    return sum(x * y for x, y in zip(a, b))
+
+
+@dataclass
+class CachedResponse:
+    """A cached AI response."""
+
+    response: dict
+    tokens: int
+    namespace: str
+    user_id: Optional[uuid.UUID]
+    embedding: Optional[tuple[float, ...]]
+    created_at: float
+
+
+@dataclass
+class CacheLookup:
+    """Result of a cache hit."""
+
+    response: dict
+    tokens_saved: int
+    semantic: bool = False
+
+
+@dataclass
+class CacheStats:
+    """Running cache counters."""
+
+    hits: int = 0
+    semantic_hits: int = 0
+    misses: int = 0
+    tokens_saved: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class AIResponseCache:
+    """In-process TTL/LRU cache of AI responses."""
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        semantic_enabled: Optional[bool] = None,
+        similarity_threshold: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries or settings.AI_RESPONSE_CACHE_MAX_ENTRIES
+        self.ttl_seconds = (
+            settings.AI_RESPONSE_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        )
+        self.semantic_enabled = (
+            settings.AI_RESPONSE_CACHE_SEMANTIC_ENABLED if semantic_enabled is None else semantic_enabled
+        )
+        self.similarity_threshold = (
+            similarity_threshold or settings.AI_RESPONSE_CACHE_SIMILARITY_THRESHOLD
+        )
+        self.clock = clock
+        self.stats = CacheStats()
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(
+        self,
+        feature: str,
+        model: str,
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+        system_prompt: str,
+        user_prompt: str,
+        user_id: Optional[uuid.UUID] = None,
+    ) -> Optional[CacheLookup]:
+        """Look up a response, falling back to near-duplicate matching."""
+        key = cache_key(feature, model, temperature, max_tokens, system_prompt, user_prompt)
+        entry = self._live_entry(key)
+        semantic = False
+
+        if entry is None and self.semantic_enabled and user_id is not None:
+            entry = self._nearest(
+                self._namespace(feature, model, temperature, max_tokens, system_prompt),
+                local_embedding(user_prompt),
+                user_id,
+            )
+            semantic = entry is not None
+
+        if entry is None:
+            self.stats.misses += 1
+            AI_CACHE_LOOKUPS_TOTAL.labels(feature=feature, result="miss").inc()
+            return None
+
+        self.stats.hits += 1
+        self.stats.tokens_saved += entry.tokens
+        if semantic:
+            self.stats.semantic_hits += 1
+        AI_CACHE_LOOKUPS_TOTAL.labels(
+            feature=feature, result="semantic_hit" if semantic else "hit"
+        ).inc()
+        AI_CACHE_TOKENS_SAVED_TOTAL.labels(feature=feature).inc(entry.tokens)
+        return CacheLookup(
+            response=copy.deepcopy(entry.response),
+            tokens_saved=entry.tokens,
+            semantic=semantic,
+        )
+
+    def put(
+        self,
+        feature: str,
+        model: str,
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+        system_prompt: str,
+        user_prompt: str,
+        response: dict,
+        tokens: int,
+        user_id: Optional[uuid.UUID] = None,
+    ) -> None:
+        """Store a response, evicting the least recently used entries."""
+        key = cache_key(feature, model, temperature, max_tokens, system_prompt, user_prompt)
+        self._entries[key] = CachedResponse(
+            response=copy.deepcopy(response),
+            tokens=tokens,
+            namespace=self._namespace(feature, model, temperature, max_tokens, system_prompt),
+            user_id=user_id,
+            embedding=local_embedding(user_prompt) if self.semantic_enabled else None,
+            created_at=self.clock(),
+        )
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        AI_CACHE_ENTRIES.set(len(self._entries))
+
+    def clear(self) -> None:
+        self._entries.clear()
+        AI_CACHE_ENTRIES.set(0)
+
+    def record_bypass(self, feature: str) -> None:
+        """Count a request that skipped the cache (user opt-out)."""
+        AI_CACHE_LOOKUPS_TOTAL.labels(feature=feature, result="bypass").inc()
+
+    def _live_entry(self, key: str) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if self.clock() - entry.created_at > self.ttl_seconds:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _nearest(
+        self,
+        namespace: str,
+        embedding: tuple[float, ...],
+        user_id: uuid.UUID,
+    ) -> Optional[CachedResponse]:
+        best_key, best_score = None, self.similarity_threshold
+        now = self.clock()
+        for key, entry in self._entries.items():
+            if (
+                entry.namespace != namespace
+                or entry.user_id != user_id
+                or entry.embedding is None
+                or now - entry.created_at > self.ttl_seconds
+            ):
+                continue
+            score = cosine_similarity(embedding, entry.embedding)
+            if score >= best_score:
+                best_key, best_score = key, score
+        if best_key is None:
+            return None
+        self._entries.move_to_end(best_key)
+        return self._entries[best_key]
+
+    @staticmethod
+    def _namespace(
+        feature: str,
+        model: str,
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+        system_prompt: str,
+    ) -> str:
+        parts = [feature, model, repr(temperature), repr(max_tokens), normalize_prompt(system_prompt)]
+        return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+
+
+_cache: Optional[AIResponseCache] = None
+
+
+def get_ai_response_cache() -> AIResponseCache:
+    """Get the process-wide AI response cache."""
+    global _cache
+    if _cache is None:
+        _cache = AIResponseCache()
+    return _cache
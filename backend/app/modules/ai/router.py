@@ -4,10 +4,12 @@ Provides REST API endpoints for AI-powered content optimization.
 Requirements: 14.1, 14.2, 14.3, 14.4, 14.5, 15.1, 15.2, 15.3
 """
 
+import json
 import uuid
-from typing import Optional
+from typing import AsyncIterator, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_session
@@ -15,6 +17,8 @@ from app.modules.ai.service import AIService, AIServiceError
 from app.modules.ai.schemas import (
     TitleGenerationRequest,
     TitleGenerationResponse,
+    TitleBatchGenerationRequest,
+    TitleBatchGenerationResponse,
     DescriptionGenerationRequest,
     DescriptionGenerationResponse,
     TagSuggestionRequest,
@@ -51,6 +55,44 @@ async def generate_titles(
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 
+@router.post("/titles/generate/batch", response_model=TitleBatchGenerationResponse)
+async def generate_titles_batch(
+    request: TitleBatchGenerationRequest,
+    user_id: Optional[uuid.UUID] = None,
+    service: AIService = Depends(get_ai_service),
+) -> TitleBatchGenerationResponse:
+    """Generate title suggestions for several videos in one request.
+
+    Returns exactly 5 title variations per video, in request order.
+    """
+    try:
+        return await service.generate_titles_batch(request, user_id)
+    except AIServiceError as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.post("/titles/generate/stream")
+async def stream_titles(
+    request: TitleGenerationRequest,
+    user_id: Optional[uuid.UUID] = None,
+    service: AIService = Depends(get_ai_service),
+) -> StreamingResponse:
+    """Stream title suggestions as newline-delimited JSON.
+
+    Each line is one suggestion, sent as soon as it is generated. A
+    failure after streaming has started is sent as a final
+    {"error": ...} line.
+    """
+    async def lines() -> AsyncIterator[str]:
+        try:
+            async for suggestion in service.stream_titles(request, user_id):
+                yield suggestion.model_dump_json() + "\n"
+        except AIServiceError as e:
+            yield json.dumps({"error": str(e)}) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
 @router.post("/descriptions/generate", response_model=DescriptionGenerationResponse)
 async def generate_description(
     request: DescriptionGenerationRequest,
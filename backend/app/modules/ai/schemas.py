@@ -39,6 +39,18 @@ class TitleGenerationResponse(BaseModel):
     generated_at: datetime
 
 
+class TitleBatchGenerationRequest(BaseModel):
+    """Request schema for generating titles for several videos at once."""
+
+    requests: list[TitleGenerationRequest] = Field(..., min_length=1, max_length=100)
+
+
+class TitleBatchGenerationResponse(BaseModel):
+    """Response schema for batched title generation, in request order."""
+
+    results: list[TitleGenerationResponse]
+
+
 # Description Generation
 class DescriptionGenerationRequest(BaseModel):
     """Request schema for AI description generation."""
@@ -185,6 +197,7 @@ class AIPreferences(BaseModel):
     brand_colors: Optional[list[str]] = None
     brand_keywords: Optional[list[str]] = None
     avoid_keywords: Optional[list[str]] = None
+    disable_response_cache: bool = False
 
 
 class AIPreferencesResponse(BaseModel):
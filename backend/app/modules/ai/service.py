@@ -4,18 +4,33 @@ Implements AI-powered title, description, tag, and thumbnail generation.
 Requirements: 14.1, 14.2, 14.3, 14.4, 14.5, 15.1, 15.2, 15.3, 15.4, 15.5
 """
 
+import json
+import logging
+import time
 import uuid
 from datetime import datetime
-from typing import Optional
+from typing import AsyncIterator, Optional
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.core.datetime_utils import utcnow
 
-from app.modules.ai.openai_client import OpenAIClient, get_openai_client, OpenAIClientError
+from app.modules.ai.openai_client import (
+    OpenAIClient,
+    get_openai_client,
+    OpenAIClientError,
+    estimate_cost_usd,
+    estimate_tokens,
+)
+from app.modules.ai.executor import AIExecutor, get_ai_executor
 from app.modules.ai.prompts import (
     TITLE_GENERATION_SYSTEM,
     TITLE_GENERATION_USER,
+    TITLE_GENERATION_STREAM_SYSTEM,
+    TITLE_BATCH_GENERATION_SYSTEM,
+    TITLE_BATCH_GENERATION_ITEM,
+    TITLE_BATCH_GENERATION_USER,
     DESCRIPTION_GENERATION_SYSTEM,
     DESCRIPTION_GENERATION_USER,
     TAG_SUGGESTION_SYSTEM,
@@ -25,13 +40,17 @@ from app.modules.ai.prompts import (
 )
 from app.modules.ai.repository import (
     AIFeedbackRepository,
+    AILogRepository,
     AIPreferencesRepository,
     ThumbnailLibraryRepository,
 )
+from app.modules.ai.response_cache import AIResponseCache, get_ai_response_cache
 from app.modules.ai.schemas import (
     TitleGenerationRequest,
     TitleGenerationResponse,
     TitleSuggestion,
+    TitleBatchGenerationRequest,
+    TitleBatchGenerationResponse,
     DescriptionGenerationRequest,
     DescriptionGenerationResponse,
     DescriptionSuggestion,
@@ -48,6 +67,8 @@ from app.modules.ai.schemas import (
     AIPreferencesResponse,
 )
 
+logger = logging.getLogger(__name__)
+
 
 class AIServiceError(Exception):
     """Base exception for AI service errors."""
@@ -59,29 +80,39 @@ class AIService:
 
     REQUIRED_TITLE_COUNT = 5
     REQUIRED_THUMBNAIL_COUNT = 3
+    # Output budget for one video's five suggestions in a batched answer
+    TITLE_BATCH_TOKENS_PER_VIDEO = 400
 
     def __init__(
         self,
         session: Optional[AsyncSession] = None,
         openai_client: Optional[OpenAIClient] = None,
+        response_cache: Optional[AIResponseCache] = None,
+        executor: Optional[AIExecutor] = None,
     ):
         """Initialize AI service.
 
         Args:
             session: Optional database session for feedback/preferences
             openai_client: Optional OpenAI client (uses singleton if not provided)
+            response_cache: Optional response cache (uses singleton if not provided)
+            executor: Optional request executor (uses singleton if not provided)
         """
         self.session = session
         self._openai_client = openai_client
+        self.response_cache = response_cache if response_cache is not None else get_ai_response_cache()
+        self.executor = executor or get_ai_executor()
 
         if session:
             self.feedback_repo = AIFeedbackRepository(session)
             self.preferences_repo = AIPreferencesRepository(session)
             self.thumbnail_repo = ThumbnailLibraryRepository(session)
+            self.log_repo = AILogRepository(session)
         else:
             self.feedback_repo = None
             self.preferences_repo = None
             self.thumbnail_repo = None
+            self.log_repo = None
 
     @property
     def openai_client(self) -> OpenAIClient:
@@ -90,6 +121,90 @@ class AIService:
             self._openai_client = get_openai_client()
         return self._openai_client
 
+    async def _generate_json(
+        self,
+        feature: str,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float,
+        user_id: Optional[uuid.UUID] = None,
+        preferences=None,
+        max_tokens: Optional[int] = None,
+    ) -> dict:
+        """Generate a JSON response, answering repeats from the response cache.
+
+        Users who set disable_response_cache always get a fresh response.
+        max_tokens overrides OPENAI_MAX_TOKENS for answers of known size.
+        API calls run through the executor's concurrency, token and
+        deadline limits. Calls and cache hits are logged for AI budget
+        accounting.
+
+        Raises:
+            OpenAIClientError: If the API call fails or misses its deadline
+        """
+        model = settings.OPENAI_MODEL
+        use_cache = settings.AI_RESPONSE_CACHE_ENABLED and not (
+            preferences and getattr(preferences, "disable_response_cache", False)
+        )
+
+        if use_cache:
+            cached = self.response_cache.get(
+                feature, model, temperature, None, system_prompt, user_prompt, user_id
+            )
+            if cached is not None:
+                await self._log_usage(
+                    user_id, feature, model,
+                    cache_hit=True,
+                    tokens_saved=cached.tokens_saved,
+                    cost_saved_usd=estimate_cost_usd(model, cached.tokens_saved),
+                )
+                return cached.response
+        else:
+            self.response_cache.record_bypass(feature)
+
+        tokens_input = estimate_tokens(system_prompt + user_prompt)
+        started = time.perf_counter()
+        async with self.executor.slot(
+            feature, reserve_tokens=tokens_input + (max_tokens or settings.OPENAI_MAX_TOKENS)
+        ) as slot:
+            response = await slot.run(
+                self.openai_client.generate_json(
+                    system_prompt=system_prompt,
+                    user_prompt=user_prompt,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                )
+            )
+            tokens_output = estimate_tokens(json.dumps(response))
+            slot.record_tokens(tokens_input, tokens_output)
+        latency_ms = (time.perf_counter() - started) * 1000
+
+        if use_cache:
+            self.response_cache.put(
+                feature, model, temperature, None, system_prompt, user_prompt,
+                response, tokens_input + tokens_output, user_id,
+            )
+        await self._log_usage(
+            user_id, feature, model,
+            tokens_input=tokens_input,
+            tokens_output=tokens_output,
+            latency_ms=latency_ms,
+            cost_usd=estimate_cost_usd(model, tokens_input + tokens_output),
+        )
+        return response
+
+    async def _log_usage(
+        self,
+        user_id: Optional[uuid.UUID],
+        feature: str,
+        model: str,
+        **fields,
+    ) -> None:
+        """Record an AI call or cache hit in the AI logs when possible."""
+        if self.log_repo is None or user_id is None:
+            return
+        await self.log_repo.create(user_id=user_id, feature=feature, model=model, **fields)
+
     async def generate_titles(
         self,
         request: TitleGenerationRequest,
@@ -112,56 +227,218 @@ class AIService:
         if user_id and self.preferences_repo:
             preferences = await self.preferences_repo.get_by_user(user_id)
 
-        # Build prompt
-        keywords_str = ", ".join(request.keywords) if request.keywords else "None specified"
-        style = request.style
-        if preferences and preferences.preferred_title_style:
-            style = preferences.preferred_title_style
-
-        user_prompt = TITLE_GENERATION_USER.format(
-            video_content=request.video_content,
-            keywords=keywords_str,
-            style=style,
-            max_length=request.max_length,
-        )
+        user_prompt = TITLE_GENERATION_USER.format(**self._title_prompt_fields(request, preferences))
 
         try:
-            response = await self.openai_client.generate_json(
+            response = await self._generate_json(
+                "titles",
                 system_prompt=TITLE_GENERATION_SYSTEM,
                 user_prompt=user_prompt,
                 temperature=0.8,
+                user_id=user_id,
+                preferences=preferences,
             )
+            return self._title_response(response.get("suggestions", []), request.max_length)
 
-            suggestions = []
-            for item in response.get("suggestions", [])[:self.REQUIRED_TITLE_COUNT]:
-                suggestions.append(
-                    TitleSuggestion(
-                        title=item.get("title", "")[:request.max_length],
-                        confidence_score=min(1.0, max(0.0, item.get("confidence_score", 0.5))),
-                        reasoning=item.get("reasoning", ""),
-                        keywords=item.get("keywords", []),
-                    )
-                )
+        except OpenAIClientError as e:
+            raise AIServiceError(f"Title generation failed: {str(e)}") from e
 
-            # Ensure exactly 5 suggestions
-            while len(suggestions) < self.REQUIRED_TITLE_COUNT:
-                suggestions.append(
-                    TitleSuggestion(
-                        title=f"Video Title Option {len(suggestions) + 1}",
-                        confidence_score=0.3,
-                        reasoning="Fallback suggestion",
-                        keywords=[],
-                    )
-                )
+    async def generate_titles_batch(
+        self,
+        request: TitleBatchGenerationRequest,
+        user_id: Optional[uuid.UUID] = None,
+    ) -> TitleBatchGenerationResponse:
+        """Generate title suggestions for several videos.
 
-            return TitleGenerationResponse(
-                suggestions=suggestions[:self.REQUIRED_TITLE_COUNT],
-                generated_at=utcnow(),
+        Videos are sent AI_BATCH_SIZE at a time in a single prompt, with
+        an output budget sized to the batch. Any video missing from a
+        batched answer, or in a batch whose request fails, is generated
+        on its own.
+
+        Args:
+            request: Batch of title generation requests
+            user_id: Optional user ID for personalization
+
+        Returns:
+            TitleBatchGenerationResponse: Suggestions in request order
+
+        Raises:
+            AIServiceError: If generation fails
+        """
+        preferences = None
+        if user_id and self.preferences_repo:
+            preferences = await self.preferences_repo.get_by_user(user_id)
+
+        items = request.requests
+        batch_size = max(1, settings.AI_BATCH_SIZE)
+        results: list[Optional[TitleGenerationResponse]] = [None] * len(items)
+
+        for start in range(0, len(items), batch_size):
+            chunk = items[start:start + batch_size]
+            videos = "\n\n".join(
+                TITLE_BATCH_GENERATION_ITEM.format(
+                    index=index, **self._title_prompt_fields(item, preferences)
+                )
+                for index, item in enumerate(chunk)
             )
+            try:
+                response = await self._generate_json(
+                    "titles",
+                    system_prompt=TITLE_BATCH_GENERATION_SYSTEM,
+                    user_prompt=TITLE_BATCH_GENERATION_USER.format(count=len(chunk), videos=videos),
+                    temperature=0.8,
+                    user_id=user_id,
+                    preferences=preferences,
+                    max_tokens=max(
+                        settings.OPENAI_MAX_TOKENS,
+                        len(chunk) * self.TITLE_BATCH_TOKENS_PER_VIDEO,
+                    ),
+                )
+            except OpenAIClientError as e:
+                # Truncated or failed batch: its videos fall back to one request each
+                logger.warning(f"Batched title generation failed, generating singly: {e}")
+                continue
+            for result in response.get("results", []):
+                index = result.get("index") if isinstance(result, dict) else None
+                if not isinstance(index, int) or not 0 <= index < len(chunk):
+                    continue
+                if results[start + index] is None and result.get("suggestions"):
+                    results[start + index] = self._title_response(
+                        result["suggestions"], chunk[index].max_length
+                    )
 
+        for index, result in enumerate(results):
+            if result is None:
+                results[index] = await self.generate_titles(items[index], user_id)
+
+        return TitleBatchGenerationResponse(results=results)
+
+    async def stream_titles(
+        self,
+        request: TitleGenerationRequest,
+        user_id: Optional[uuid.UUID] = None,
+    ) -> AsyncIterator[TitleSuggestion]:
+        """Stream title suggestions as the model produces them.
+
+        The model answers with one JSON object per line, so each
+        suggestion is yielded as soon as its line is complete. Exactly
+        five suggestions are always yielded.
+
+        Raises:
+            AIServiceError: If generation fails
+        """
+        preferences = None
+        if user_id and self.preferences_repo:
+            preferences = await self.preferences_repo.get_by_user(user_id)
+
+        user_prompt = TITLE_GENERATION_USER.format(**self._title_prompt_fields(request, preferences))
+        system_prompt = TITLE_GENERATION_STREAM_SYSTEM
+        model = settings.OPENAI_MODEL
+        tokens_input = estimate_tokens(system_prompt + user_prompt)
+        count = 0
+        text = ""
+        started = time.perf_counter()
+
+        try:
+            async with self.executor.slot(
+                "titles", reserve_tokens=tokens_input + settings.OPENAI_MAX_TOKENS
+            ) as slot:
+                buffer = ""
+                chunks = self.openai_client.stream_completion(
+                    system_prompt=system_prompt,
+                    user_prompt=user_prompt,
+                    temperature=0.8,
+                )
+                async for delta in slot.stream(chunks):
+                    text += delta
+                    buffer += delta
+                    *lines, buffer = buffer.split("\n")
+                    for line in lines:
+                        suggestion = self._parse_title_line(line, request.max_length)
+                        if suggestion is not None and count < self.REQUIRED_TITLE_COUNT:
+                            count += 1
+                            yield suggestion
+                suggestion = self._parse_title_line(buffer, request.max_length)
+                if suggestion is not None and count < self.REQUIRED_TITLE_COUNT:
+                    count += 1
+                    yield suggestion
+                slot.record_tokens(tokens_input, estimate_tokens(text))
         except OpenAIClientError as e:
             raise AIServiceError(f"Title generation failed: {str(e)}") from e
 
+        tokens_output = estimate_tokens(text)
+        await self._log_usage(
+            user_id, "titles", model,
+            tokens_input=tokens_input,
+            tokens_output=tokens_output,
+            latency_ms=(time.perf_counter() - started) * 1000,
+            cost_usd=estimate_cost_usd(model, tokens_input + tokens_output),
+        )
+
+        while count < self.REQUIRED_TITLE_COUNT:
+            count += 1
+            yield self._fallback_title(count)
+
+    @staticmethod
+    def _title_prompt_fields(request: TitleGenerationRequest, preferences=None) -> dict:
+        """Prompt fields for a title request, applying the user's preferred style."""
+        style = request.style
+        if preferences and preferences.preferred_title_style:
+            style = preferences.preferred_title_style
+        return {
+            "video_content": request.video_content,
+            "keywords": ", ".join(request.keywords) if request.keywords else "None specified",
+            "style": style,
+            "max_length": request.max_length,
+        }
+
+    @staticmethod
+    def _title_suggestion(item: dict, max_length: int) -> TitleSuggestion:
+        return TitleSuggestion(
+            title=item.get("title", "")[:max_length],
+            confidence_score=min(1.0, max(0.0, item.get("confidence_score", 0.5))),
+            reasoning=item.get("reasoning", ""),
+            keywords=item.get("keywords", []),
+        )
+
+    @staticmethod
+    def _fallback_title(position: int) -> TitleSuggestion:
+        return TitleSuggestion(
+            title=f"Video Title Option {position}",
+            confidence_score=0.3,
+            reasoning="Fallback suggestion",
+            keywords=[],
+        )
+
+    def _title_response(self, items: list, max_length: int) -> TitleGenerationResponse:
+        """Build a response with exactly 5 suggestions from raw model output."""
+        suggestions = [
+            self._title_suggestion(item, max_length)
+            for item in items[:self.REQUIRED_TITLE_COUNT]
+        ]
+
+        # Ensure exactly 5 suggestions
+        while len(suggestions) < self.REQUIRED_TITLE_COUNT:
+            suggestions.append(self._fallback_title(len(suggestions) + 1))
+
+        return TitleGenerationResponse(
+            suggestions=suggestions[:self.REQUIRED_TITLE_COUNT],
+            generated_at=utcnow(),
+        )
+
+    def _parse_title_line(self, line: str, max_length: int) -> Optional[TitleSuggestion]:
+        """Parse one streamed JSON line, ignoring blank or malformed lines."""
+        line = line.strip().rstrip(",")
+        if not line.startswith("{"):
+            return None
+        try:
+            item = json.loads(line)
+        except json.JSONDecodeError:
+            return None
+        if not isinstance(item, dict) or not item.get("title"):
+            return None
+        return self._title_suggestion(item, max_length)
+
     async def generate_description(
         self,
         request: DescriptionGenerationRequest,
@@ -200,10 +477,13 @@ class AIService:
         )
 
         try:
-            response = await self.openai_client.generate_json(
+            response = await self._generate_json(
+                "descriptions",
                 system_prompt=DESCRIPTION_GENERATION_SYSTEM,
                 user_prompt=user_prompt,
                 temperature=0.7,
+                user_id=user_id,
+                preferences=preferences,
             )
 
             suggestion = DescriptionSuggestion(
@@ -259,10 +539,13 @@ class AIService:
         )
 
         try:
-            response = await self.openai_client.generate_json(
+            response = await self._generate_json(
+                "tags",
                 system_prompt=TAG_SUGGESTION_SYSTEM,
                 user_prompt=user_prompt,
                 temperature=0.6,
+                user_id=user_id,
+                preferences=preferences,
             )
 
             suggestions = []
@@ -329,10 +612,13 @@ class AIService:
         )
 
         try:
-            response = await self.openai_client.generate_json(
+            response = await self._generate_json(
+                "thumbnails",
                 system_prompt=THUMBNAIL_GENERATION_SYSTEM,
                 user_prompt=user_prompt,
                 temperature=0.9,
+                user_id=user_id,
+                preferences=preferences,
             )
 
             thumbnails = []
@@ -441,6 +727,7 @@ class AIService:
                 brand_colors=prefs.brand_colors,
                 brand_keywords=prefs.brand_keywords,
                 avoid_keywords=prefs.avoid_keywords,
+                disable_response_cache=bool(prefs.disable_response_cache),
             )
             updated_at = prefs.updated_at
         else:
@@ -482,6 +769,7 @@ class AIService:
             brand_colors=preferences.brand_colors,
             brand_keywords=preferences.brand_keywords,
             avoid_keywords=preferences.avoid_keywords,
+            disable_response_cache=preferences.disable_response_cache,
         )
 
         return AIPreferencesResponse(
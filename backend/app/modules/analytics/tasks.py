@@ -14,9 +14,16 @@ from datetime import date, timedelta
 from celery import shared_task
 
 from app.core.celery_app import celery_app
+from app.core.celery_queues import TaskPriority
+from app.core.task_loop import run_async
 from app.core.database import celery_session_maker
 from app.core.datetime_utils import utcnow
 from app.core.storage import storage_service
+from app.modules.account.quota_scheduler import (
+    QuotaPriority,
+    estimate_cost,
+    get_quota_scheduler,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -32,9 +39,8 @@ def sync_account_analytics(self, account_id: str):
     Args:
         account_id: YouTube account UUID as string
     """
-    import asyncio
     try:
-        asyncio.run(_sync_account_analytics_async(account_id))
+        run_async(_sync_account_analytics_async(account_id))
     except Exception as exc:
         logger.error(f"Failed to sync analytics for account {account_id}: {exc}")
         raise self.retry(exc=exc)
@@ -71,6 +77,17 @@ async def _sync_account_analytics_async(account_id: str):
             logger.error(f"Failed to get valid token for account {account_id}: {e}")
             return
 
+        # Analytics backfill is the first thing to yield when quota is short
+        decision = await get_quota_scheduler().acquire(
+            account.id,
+            "channels.list",
+            QuotaPriority.BACKGROUND,
+            units=estimate_cost("channels.list", "videos.list"),
+        )
+        if not decision.allowed:
+            logger.info(f"Deferring analytics sync for account {account_id}: quota headroom short")
+            return
+
         # Initialize YouTube API client
         client = YouTubeAnalyticsClient(access_token)
 
@@ -167,8 +184,7 @@ def sync_all_accounts_analytics(self):
     
     This task is scheduled to run daily.
     """
-    import asyncio
-    asyncio.run(_sync_all_accounts_async())
+    run_async(_sync_all_accounts_async())
 
 
 async def _sync_all_accounts_async():
@@ -186,8 +202,9 @@ async def _sync_all_accounts_async():
         logger.info(f"Starting analytics sync for {len(accounts)} accounts")
 
         for account in accounts:
-            # Queue individual sync task for each account
-            sync_account_analytics.delay(str(account.id))
+            # Queue individual sync task for each account, behind syncs
+            # a user asked for
+            sync_account_analytics.apply_async(args=[str(account.id)], priority=TaskPriority.LOW)
 
         logger.info(f"Queued analytics sync for {len(accounts)} accounts")
 
@@ -204,8 +221,7 @@ def generate_report_task(self, report_id: str, include_ai_insights: bool = True)
         report_id: Report UUID as string
         include_ai_insights: Whether to include AI insights
     """
-    import asyncio
-    asyncio.run(_generate_report_async(report_id, include_ai_insights))
+    run_async(_generate_report_async(report_id, include_ai_insights))
 
 
 async def _generate_report_async(report_id: str, include_ai_insights: bool):
@@ -9,7 +9,6 @@ import json
 import time
 import hmac
 import hashlib
-import asyncio
 import logging
 from datetime import timedelta
 from typing import Optional
@@ -17,6 +16,7 @@ from typing import Optional
 import httpx
 
 from app.core.celery_app import celery_app
+from app.core.task_loop import run_async
 from app.core.database import celery_session_maker
 from app.core.datetime_utils import utcnow, to_naive_utc
 
@@ -65,7 +65,7 @@ class WebhookDeliveryError(Exception):
 @celery_app.task(bind=True, max_retries=WEBHOOK_MAX_RETRIES, default_retry_delay=WEBHOOK_BASE_DELAY)
 def deliver_webhook_task(self, delivery_id: str, webhook_id: str, url: str, secret: str, payload: dict, custom_headers: Optional[dict] = None) -> dict:
     """Deliver a webhook to the configured URL."""
-    return asyncio.run(_deliver_webhook_async(self, delivery_id, webhook_id, url, secret, payload, custom_headers))
+    return run_async(_deliver_webhook_async(self, delivery_id, webhook_id, url, secret, payload, custom_headers))
 
 
 async def _deliver_webhook_async(task, delivery_id: str, webhook_id: str, url: str, secret: str, payload: dict, custom_headers: Optional[dict] = None) -> dict:
@@ -204,7 +204,7 @@ def process_pending_webhook_retries() -> dict:
     This task should be run periodically (e.g., every minute) to pick up
     deliveries that are due for retry.
     """
-    return asyncio.run(_process_pending_retries_async())
+    return run_async(_process_pending_retries_async())
 
 
 async def _process_pending_retries_async() -> dict:
@@ -265,7 +265,7 @@ def trigger_webhook_event(event_type: str, payload: dict, user_id: Optional[str]
     This is a convenience task that can be called from other modules
     to trigger webhook events asynchronously.
     """
-    return asyncio.run(_trigger_event_async(event_type, payload, user_id))
+    return run_async(_trigger_event_async(event_type, payload, user_id))
 
 
 async def _trigger_event_async(event_type: str, payload: dict, user_id: Optional[str] = None) -> dict:
@@ -12,8 +12,10 @@ from typing import Optional, Dict, Any
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.core.database import async_session_maker
 from app.core.datetime_utils import utcnow, to_naive_utc
+from app.modules.account.quota_scheduler import QuotaPriority, get_quota_scheduler
 from app.modules.account.repository import YouTubeAccountRepository
 from app.modules.moderation.youtube_chat_api import YouTubeLiveChatClient, YouTubeChatAPIError
 from app.modules.moderation.service import ModerationService, ChatAnalyzer
@@ -29,6 +31,14 @@ from app.modules.moderation.repository import (
     ModerationActionLogRepository,
     CustomCommandRepository,
 )
+from app.modules.moderation.sharding import (
+    BroadcastCheckpointer,
+    ChatCheckpoint,
+    ModeratedBroadcast,
+    RecentMessageIds,
+    broadcast_key,
+    get_moderation_registry,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -47,6 +57,8 @@ class LiveChatModerationWorker:
         account_id: uuid.UUID,
         broadcast_id: str,
         session_id: Optional[uuid.UUID] = None,
+        checkpointer: Optional[BroadcastCheckpointer] = None,
+        client_factory=YouTubeLiveChatClient,
     ):
         """Initialize the worker.
 
@@ -54,6 +66,8 @@ class LiveChatModerationWorker:
             account_id: YouTube account UUID
             broadcast_id: YouTube broadcast/video ID
             session_id: Optional stream session UUID
+            checkpointer: Lease-fenced store for page token and dedup state
+            client_factory: Builds the chat API client from an access token
         """
         self.account_id = account_id
         self.broadcast_id = broadcast_id
@@ -62,15 +76,20 @@ class LiveChatModerationWorker:
         self.page_token: Optional[str] = None
         self.polling_interval_ms: int = 5000  # Default 5 seconds
         self.is_running: bool = False
-        self.processed_message_ids: set[str] = set()
+        self.chat_ended: bool = False
+        self.processed_message_ids = RecentMessageIds(settings.MODERATION_DEDUP_WINDOW)
+        self.checkpointer = checkpointer
+        self._client_factory = client_factory
         self._rules: list[ModerationRule] = []
         self._analyzer: Optional[ChatAnalyzer] = None
         self._access_token: Optional[str] = None
+        self._stop_event = asyncio.Event()
 
     async def start(self) -> None:
         """Start the moderation worker."""
         logger.info(f"Starting chat moderation worker for broadcast {self.broadcast_id}")
         self.is_running = True
+        self._stop_event.clear()
 
         try:
             # Initialize
@@ -88,12 +107,19 @@ class LiveChatModerationWorker:
                     elif e.status_code == 404:
                         # Chat ended
                         logger.info("Live chat ended")
+                        self.chat_ended = True
                         break
                 except Exception as e:
                     logger.error(f"Error in moderation loop: {e}")
 
-                # Wait for next poll
-                await asyncio.sleep(self.polling_interval_ms / 1000)
+                # Wait for next poll (returns early when stopped)
+                try:
+                    await asyncio.wait_for(
+                        self._stop_event.wait(),
+                        timeout=self.polling_interval_ms / 1000,
+                    )
+                except asyncio.TimeoutError:
+                    pass
 
         except Exception as e:
             logger.error(f"Fatal error in moderation worker: {e}")
@@ -105,9 +131,37 @@ class LiveChatModerationWorker:
         """Stop the moderation worker."""
         logger.info(f"Stopping chat moderation worker for broadcast {self.broadcast_id}")
         self.is_running = False
+        self._stop_event.set()
 
     async def _initialize(self) -> None:
-        """Initialize the worker with account and rules."""
+        """Initialize the worker with account and rules.
+
+        Resumes from the broadcast's checkpoint when another worker
+        moderated it before.
+        """
+        await self._load_account_and_rules()
+
+        if self.checkpointer:
+            checkpoint = await self.checkpointer.load()
+            self.live_chat_id = checkpoint.live_chat_id
+            self.page_token = checkpoint.page_token
+            if checkpoint.polling_interval_ms:
+                self.polling_interval_ms = checkpoint.polling_interval_ms
+            self.processed_message_ids.extend(checkpoint.seen_message_ids)
+            if checkpoint.live_chat_id:
+                logger.info(
+                    f"Resuming chat for broadcast {self.broadcast_id} "
+                    f"with {len(checkpoint.seen_message_ids)} seen messages"
+                )
+
+        if not self.live_chat_id:
+            client = self._client_factory(self._access_token)
+            self.live_chat_id = await client.get_live_chat_id(self.broadcast_id)
+            if not self.live_chat_id:
+                raise ValueError(f"No live chat found for broadcast {self.broadcast_id}")
+
+    async def _load_account_and_rules(self) -> None:
+        """Load the account access token and enabled moderation rules."""
         async with async_session_maker() as session:
             # Get account and access token
             account_repo = YouTubeAccountRepository(session)
@@ -117,12 +171,6 @@ class LiveChatModerationWorker:
 
             self._access_token = account.access_token
 
-            # Get live chat ID
-            client = YouTubeLiveChatClient(self._access_token)
-            self.live_chat_id = await client.get_live_chat_id(self.broadcast_id)
-            if not self.live_chat_id:
-                raise ValueError(f"No live chat found for broadcast {self.broadcast_id}")
-
             # Load moderation rules
             rule_repo = ModerationRuleRepository(session)
             self._rules = await rule_repo.get_by_account(self.account_id, enabled_only=True)
@@ -135,7 +183,17 @@ class LiveChatModerationWorker:
         if not self.live_chat_id or not self._access_token:
             return
 
-        client = YouTubeLiveChatClient(self._access_token)
+        client = self._client_factory(self._access_token)
+
+        # Live chat polling runs at the top priority class and is only
+        # deferred once the account's whole daily budget is gone
+        decision = await get_quota_scheduler().acquire(
+            self.account_id, "liveChatMessages.list", QuotaPriority.REALTIME
+        )
+        if not decision.allowed:
+            logger.warning(f"Quota exhausted for account {self.account_id}, pausing chat polling")
+            self.polling_interval_ms = int(min(decision.retry_after_seconds or 60, 300) * 1000)
+            return
 
         # Get new messages
         response = await client.get_live_chat_messages(
@@ -143,11 +201,8 @@ class LiveChatModerationWorker:
             page_token=self.page_token,
         )
 
-        # Update pagination
-        self.page_token = response.get("nextPageToken")
-        self.polling_interval_ms = response.get("pollingIntervalMillis", 5000)
-
         # Process messages
+        new_message_ids = []
         items = response.get("items", [])
         for item in items:
             message_id = item.get("id")
@@ -155,6 +210,7 @@ class LiveChatModerationWorker:
                 continue
 
             self.processed_message_ids.add(message_id)
+            new_message_ids.append(message_id)
 
             # Parse message
             parsed = client.parse_chat_message(item)
@@ -166,10 +222,24 @@ class LiveChatModerationWorker:
             # Process the message
             await self._process_message(parsed, client)
 
-        # Limit processed IDs cache size
-        if len(self.processed_message_ids) > 10000:
-            # Keep only recent 5000
-            self.processed_message_ids = set(list(self.processed_message_ids)[-5000:])
+        # Advance pagination only once the page is processed, so a worker
+        # taking over after a crash replays the page instead of skipping it
+        self.page_token = response.get("nextPageToken")
+        self.polling_interval_ms = response.get("pollingIntervalMillis", 5000)
+
+        if self.checkpointer:
+            saved = await self.checkpointer.save(
+                ChatCheckpoint(
+                    live_chat_id=self.live_chat_id,
+                    page_token=self.page_token,
+                    polling_interval_ms=self.polling_interval_ms,
+                ),
+                new_message_ids,
+            )
+            if not saved:
+                # Another worker holds the lease now
+                logger.warning(f"Lost moderation lease for broadcast {self.broadcast_id}, stopping")
+                await self.stop()
 
     async def _process_message(
         self,
@@ -390,16 +460,26 @@ class LiveChatModerationWorker:
         await session.commit()
 
 
-# Global registry of active workers
-_active_workers: Dict[str, LiveChatModerationWorker] = {}
+# Shard runner of this process, if it is a moderation worker process
+_local_runner = None
+
+
+def register_local_runner(runner) -> None:
+    """Register the shard runner hosting this process's workers."""
+    global _local_runner
+    _local_runner = runner
 
 
 async def start_moderation_for_broadcast(
     account_id: uuid.UUID,
     broadcast_id: str,
     session_id: Optional[uuid.UUID] = None,
-) -> LiveChatModerationWorker:
-    """Start moderation worker for a broadcast.
+) -> ModeratedBroadcast:
+    """Register a broadcast for moderation.
+
+    The broadcast is picked up by whichever moderation worker process
+    leases it (see app.modules.moderation.sharding), so moderation
+    survives restarts of the process that requested it.
 
     Args:
         account_id: YouTube account UUID
@@ -407,56 +487,45 @@ async def start_moderation_for_broadcast(
         session_id: Optional stream session UUID
 
     Returns:
-        LiveChatModerationWorker: Started worker instance
+        ModeratedBroadcast: Registered broadcast
     """
-    key = f"{account_id}:{broadcast_id}"
-
-    # Stop existing worker if any
-    if key in _active_workers:
-        await _active_workers[key].stop()
-
-    # Create and start new worker
-    worker = LiveChatModerationWorker(
+    broadcast = ModeratedBroadcast(
         account_id=account_id,
         broadcast_id=broadcast_id,
         session_id=session_id,
     )
-
-    _active_workers[key] = worker
-
-    # Start in background
-    asyncio.create_task(worker.start())
-
-    return worker
+    await get_moderation_registry().register(broadcast)
+    return broadcast
 
 
 async def stop_moderation_for_broadcast(
     account_id: uuid.UUID,
     broadcast_id: str,
 ) -> bool:
-    """Stop moderation worker for a broadcast.
+    """Unregister a broadcast from moderation.
+
+    The owning worker process stops moderating it on its next rebalance.
 
     Args:
         account_id: YouTube account UUID
         broadcast_id: YouTube broadcast ID
 
     Returns:
-        bool: True if worker was stopped
+        bool: True if the broadcast was registered
     """
-    key = f"{account_id}:{broadcast_id}"
-
-    if key in _active_workers:
-        await _active_workers[key].stop()
-        del _active_workers[key]
-        return True
-
-    return False
+    return await get_moderation_registry().unregister(
+        broadcast_key(account_id, broadcast_id)
+    )
 
 
 def get_active_workers() -> Dict[str, LiveChatModerationWorker]:
-    """Get all active moderation workers.
+    """Get the moderation workers running in this process.
+
+    Use list_moderated_broadcasts() for the fleet-wide view.
 
     Returns:
         Dict mapping broadcast keys to workers
     """
-    return _active_workers.copy()
+    if _local_runner is None:
+        return {}
+    return {key: owned.worker for key, owned in _local_runner.owned.items()}
@@ -29,8 +29,8 @@ from app.modules.moderation.schemas import (
 from app.modules.moderation.chat_worker import (
     start_moderation_for_broadcast,
     stop_moderation_for_broadcast,
-    get_active_workers,
 )
+from app.modules.moderation.sharding import list_moderated_broadcasts
 
 router = APIRouter(prefix="/moderation", tags=["moderation"])
 
@@ -62,7 +62,7 @@ async def start_live_moderation(
 ):
     """Start live chat moderation for a broadcast.
     
-    This will start a background worker that:
+    This registers the broadcast with the moderation worker fleet, which:
     1. Polls YouTube Live Chat API for new messages
     2. Analyzes messages against moderation rules
     3. Executes actions (delete, timeout, ban) via YouTube API
@@ -87,7 +87,7 @@ async def start_live_moderation(
         )
     
     try:
-        worker = await start_moderation_for_broadcast(
+        await start_moderation_for_broadcast(
             account_id=request.account_id,
             broadcast_id=request.broadcast_id,
             session_id=request.session_id,
@@ -150,24 +150,23 @@ async def stop_live_moderation(
 async def get_moderation_status(
     account_id: Optional[uuid.UUID] = Query(None, description="Filter by account ID"),
 ):
-    """Get status of active moderation workers.
+    """Get status of moderated broadcasts across all worker processes.
     
     Returns list of active moderation sessions.
     """
-    workers = get_active_workers()
+    broadcasts = await list_moderated_broadcasts(account_id)
     
     active_sessions = []
-    for key, worker in workers.items():
-        if account_id and str(worker.account_id) != str(account_id):
-            continue
+    for broadcast in broadcasts:
         active_sessions.append({
-            "account_id": str(worker.account_id),
-            "broadcast_id": worker.broadcast_id,
-            "session_id": str(worker.session_id) if worker.session_id else None,
-            "is_running": worker.is_running,
-            "live_chat_id": worker.live_chat_id,
-            "polling_interval_ms": worker.polling_interval_ms,
-            "processed_messages": len(worker.processed_message_ids),
+            "account_id": str(broadcast.account_id),
+            "broadcast_id": broadcast.broadcast_id,
+            "session_id": str(broadcast.session_id) if broadcast.session_id else None,
+            "is_running": broadcast.owner is not None,
+            "worker_id": broadcast.owner,
+            "live_chat_id": broadcast.checkpoint.get("live_chat_id"),
+            "polling_interval_ms": broadcast.checkpoint.get("polling_interval_ms"),
+            "processed_messages": broadcast.checkpoint.get("processed_messages", 0),
         })
     
     return {
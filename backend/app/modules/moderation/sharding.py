@@ -0,0 +1,519 @@
+"""Sharded live chat moderation runtime.
+
+Moderated broadcasts are registered in Redis rather than in the memory of
+whichever process started them. Moderation worker processes lease
+broadcasts from the registry, keep a fenced checkpoint of each chat's
+page token and recently seen message IDs, and rebalance leases as the
+fleet grows or shrinks. When a process dies its leases expire and another
+process resumes the chats from their checkpoints.
+
+Run a worker process with:
+    python -m app.modules.moderation.sharding
+
+Requirements: 12.1, 12.2, 12.3, 12.4, 12.5
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import os
+import socket
+import time
+import uuid
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Optional, Union
+
+from app.core.config import settings
+from app.core.metrics import (
+    MODERATION_DESIRED_WORKERS,
+    MODERATION_LIVE_BROADCASTS,
+    MODERATION_OWNED_BROADCASTS,
+    MODERATION_WORKERS,
+)
+
+logger = logging.getLogger(__name__)
+
+REGISTRY_KEY = "moderation:broadcasts"
+WORKERS_KEY = "moderation:workers"
+LEASE_KEY_PREFIX = "moderation:lease:"
+STATE_KEY_PREFIX = "moderation:state:"
+SEEN_KEY_PREFIX = "moderation:seen:"
+
+# Checkpoints outlive a broadcast long enough to resume after an outage
+CHECKPOINT_TTL_SECONDS = 24 * 3600
+
+# Extend a lease only while this process still owns it
+_RENEW_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# Drop a lease only while this process still owns it
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# Write a checkpoint only while this process still owns the lease, so a
+# stalled former owner cannot rewind the page token of the new owner.
+# KEYS: lease, state, seen
+# ARGV: owner, live_chat_id, page_token, polling_interval_ms, updated_at,
+#       dedup window, checkpoint ttl, message ids...
+_CHECKPOINT_SCRIPT = """
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then
+    return 0
+end
+redis.call('HSET', KEYS[2],
+    'live_chat_id', ARGV[2],
+    'page_token', ARGV[3],
+    'polling_interval_ms', ARGV[4],
+    'updated_at', ARGV[5])
+redis.call('EXPIRE', KEYS[2], ARGV[7])
+if #ARGV > 7 then
+    redis.call('RPUSH', KEYS[3], unpack(ARGV, 8))
+    redis.call('LTRIM', KEYS[3], -tonumber(ARGV[6]), -1)
+    redis.call('EXPIRE', KEYS[3], ARGV[7])
+end
+return 1
+"""
+
+
+def broadcast_key(account_id: Union[uuid.UUID, str], broadcast_id: str) -> str:
+    """Registry key for a moderated broadcast."""
+    return f"{account_id}:{broadcast_id}"
+
+
+def desired_fleet_size(
+    live_broadcasts: int,
+    broadcasts_per_worker: Optional[int] = None,
+    min_workers: Optional[int] = None,
+    max_workers: Optional[int] = None,
+) -> int:
+    """Number of worker processes needed for a number of live broadcasts."""
+    per_worker = max(1, broadcasts_per_worker or settings.MODERATION_BROADCASTS_PER_WORKER)
+    lower = settings.MODERATION_MIN_WORKERS if min_workers is None else min_workers
+    upper = settings.MODERATION_MAX_WORKERS if max_workers is None else max_workers
+    return max(lower, min(upper, math.ceil(live_broadcasts / per_worker)))
+
+
+def fair_share(live_broadcasts: int, live_workers: int, capacity: int) -> int:
+    """How many broadcasts one worker should own."""
+    if live_broadcasts <= 0:
+        return 0
+    return min(capacity, math.ceil(live_broadcasts / max(1, live_workers)))
+
+
+def rendezvous_order(worker_id: str, keys: Iterable[str]) -> list[str]:
+    """Order keys by this worker's rendezvous hash preference.
+
+    Different workers prefer different broadcasts, so concurrent lease
+    attempts rarely collide and ownership is stable as the fleet changes.
+    """
+    def score(key: str) -> int:
+        digest = hashlib.blake2b(f"{worker_id}|{key}".encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "big")
+
+    return sorted(keys, key=score, reverse=True)
+
+
+class RecentMessageIds:
+    """Insertion-ordered, bounded set of recently processed message IDs.
+
+    When full, the oldest IDs are evicted first.
+    """
+
+    def __init__(self, capacity: int = 5000, ids: Iterable[str] = ()):
+        self.capacity = max(1, capacity)
+        self._ids: "OrderedDict[str, None]" = OrderedDict()
+        self.extend(ids)
+
+    def add(self, message_id: str) -> None:
+        self._ids[message_id] = None
+        self._ids.move_to_end(message_id)
+        while len(self._ids) > self.capacity:
+            self._ids.popitem(last=False)
+
+    def extend(self, message_ids: Iterable[str]) -> None:
+        for message_id in message_ids:
+            self.add(message_id)
+
+    def __contains__(self, message_id: object) -> bool:
+        return message_id in self._ids
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __iter__(self):
+        return iter(self._ids)
+
+
+@dataclass
+class ModeratedBroadcast:
+    """A broadcast registered for moderation."""
+
+    account_id: uuid.UUID
+    broadcast_id: str
+    session_id: Optional[uuid.UUID] = None
+    registered_at: Optional[float] = None
+    owner: Optional[str] = None
+    checkpoint: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def key(self) -> str:
+        return broadcast_key(self.account_id, self.broadcast_id)
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "account_id": str(self.account_id),
+            "broadcast_id": self.broadcast_id,
+            "session_id": str(self.session_id) if self.session_id else None,
+            "registered_at": self.registered_at,
+        })
+
+    @classmethod
+    def from_json(cls, raw: str) -> "ModeratedBroadcast":
+        data = json.loads(raw)
+        return cls(
+            account_id=uuid.UUID(data["account_id"]),
+            broadcast_id=data["broadcast_id"],
+            session_id=uuid.UUID(data["session_id"]) if data.get("session_id") else None,
+            registered_at=data.get("registered_at"),
+        )
+
+
+@dataclass
+class ChatCheckpoint:
+    """Resumable polling state of one broadcast's chat."""
+
+    live_chat_id: Optional[str] = None
+    page_token: Optional[str] = None
+    polling_interval_ms: Optional[int] = None
+    seen_message_ids: list[str] = field(default_factory=list)
+
+
+class ModerationRegistry:
+    """Redis-backed registry, lease table and checkpoint store."""
+
+    def __init__(self, redis, clock: Callable[[], float] = time.time):
+        self.redis = redis
+        self.clock = clock
+
+    # ----- Registry -----
+
+    async def register(self, broadcast: ModeratedBroadcast) -> None:
+        if broadcast.registered_at is None:
+            broadcast.registered_at = self.clock()
+        await self.redis.hset(REGISTRY_KEY, broadcast.key, broadcast.to_json())
+
+    async def unregister(self, key: str) -> bool:
+        return bool(await self.redis.hdel(REGISTRY_KEY, key))
+
+    async def list_broadcasts(self) -> dict[str, ModeratedBroadcast]:
+        raw = await self.redis.hgetall(REGISTRY_KEY)
+        broadcasts = {}
+        for key, value in raw.items():
+            try:
+                broadcasts[key] = ModeratedBroadcast.from_json(value)
+            except (ValueError, KeyError):
+                logger.warning(f"Dropping malformed moderation registry entry {key}")
+        return broadcasts
+
+    # ----- Leases -----
+
+    async def acquire_lease(self, key: str, owner: str, ttl_seconds: int) -> bool:
+        return bool(await self.redis.set(
+            LEASE_KEY_PREFIX + key, owner, nx=True, px=int(ttl_seconds * 1000)
+        ))
+
+    async def renew_lease(self, key: str, owner: str, ttl_seconds: int) -> bool:
+        return bool(await self.redis.eval(
+            _RENEW_SCRIPT, 1, LEASE_KEY_PREFIX + key, owner, int(ttl_seconds * 1000)
+        ))
+
+    async def release_lease(self, key: str, owner: str) -> bool:
+        return bool(await self.redis.eval(
+            _RELEASE_SCRIPT, 1, LEASE_KEY_PREFIX + key, owner
+        ))
+
+    async def get_owner(self, key: str) -> Optional[str]:
+        return await self.redis.get(LEASE_KEY_PREFIX + key)
+
+    # ----- Checkpoints -----
+
+    async def save_checkpoint(
+        self,
+        key: str,
+        owner: str,
+        checkpoint: ChatCheckpoint,
+        new_message_ids: list[str],
+        dedup_window: Optional[int] = None,
+    ) -> bool:
+        """Persist polling state; returns False if the lease was lost."""
+        return bool(await self.redis.eval(
+            _CHECKPOINT_SCRIPT,
+            3,
+            LEASE_KEY_PREFIX + key,
+            STATE_KEY_PREFIX + key,
+            SEEN_KEY_PREFIX + key,
+            owner,
+            checkpoint.live_chat_id or "",
+            checkpoint.page_token or "",
+            checkpoint.polling_interval_ms or 0,
+            self.clock(),
+            dedup_window or settings.MODERATION_DEDUP_WINDOW,
+            CHECKPOINT_TTL_SECONDS,
+            *new_message_ids,
+        ))
+
+    async def load_checkpoint(self, key: str) -> ChatCheckpoint:
+        state = await self.redis.hgetall(STATE_KEY_PREFIX + key)
+        seen = await self.redis.lrange(SEEN_KEY_PREFIX + key, 0, -1)
+        return ChatCheckpoint(
+            live_chat_id=state.get("live_chat_id") or None,
+            page_token=state.get("page_token") or None,
+            polling_interval_ms=int(state["polling_interval_ms"]) if state.get("polling_interval_ms") else None,
+            seen_message_ids=list(seen),
+        )
+
+    async def clear_checkpoint(self, key: str) -> None:
+        await self.redis.delete(STATE_KEY_PREFIX + key, SEEN_KEY_PREFIX + key)
+
+    # ----- Worker liveness -----
+
+    async def heartbeat(self, worker_id: str, ttl_seconds: int) -> int:
+        """Record a worker heartbeat and return the live worker count."""
+        now = self.clock()
+        await self.redis.zadd(WORKERS_KEY, {worker_id: now})
+        await self.redis.zremrangebyscore(WORKERS_KEY, "-inf", now - ttl_seconds)
+        return int(await self.redis.zcard(WORKERS_KEY))
+
+    async def remove_worker(self, worker_id: str) -> None:
+        await self.redis.zrem(WORKERS_KEY, worker_id)
+
+
+class BroadcastCheckpointer:
+    """Checkpoint handle given to the worker moderating one broadcast."""
+
+    def __init__(self, registry: ModerationRegistry, key: str, owner: str):
+        self.registry = registry
+        self.key = key
+        self.owner = owner
+
+    async def load(self) -> ChatCheckpoint:
+        return await self.registry.load_checkpoint(self.key)
+
+    async def save(self, checkpoint: ChatCheckpoint, new_message_ids: list[str]) -> bool:
+        return await self.registry.save_checkpoint(
+            self.key, self.owner, checkpoint, new_message_ids
+        )
+
+
+# One registry per event loop: async Redis connections cannot be shared
+# across loops (Celery tasks run on their worker's task loop, or a fresh one).
+_registries: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, ModerationRegistry]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_moderation_registry() -> ModerationRegistry:
+    """Get the moderation registry for the running event loop."""
+    import redis.asyncio as aioredis
+
+    loop = asyncio.get_running_loop()
+    registry = _registries.get(loop)
+    if registry is None:
+        registry = ModerationRegistry(
+            aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+        )
+        _registries[loop] = registry
+    return registry
+
+
+async def list_moderated_broadcasts(
+    account_id: Optional[uuid.UUID] = None,
+    registry: Optional[ModerationRegistry] = None,
+) -> list[ModeratedBroadcast]:
+    """List registered broadcasts with their current owner and checkpoint."""
+    registry = registry or get_moderation_registry()
+    broadcasts = []
+    for key, broadcast in (await registry.list_broadcasts()).items():
+        if account_id and str(broadcast.account_id) != str(account_id):
+            continue
+        broadcast.owner = await registry.get_owner(key)
+        checkpoint = await registry.load_checkpoint(key)
+        broadcast.checkpoint = {
+            "live_chat_id": checkpoint.live_chat_id,
+            "polling_interval_ms": checkpoint.polling_interval_ms,
+            "processed_messages": len(checkpoint.seen_message_ids),
+        }
+        broadcasts.append(broadcast)
+    return broadcasts
+
+
+@dataclass
+class _OwnedBroadcast:
+    broadcast: ModeratedBroadcast
+    worker: Any
+    task: asyncio.Task
+
+
+class ModerationShardRunner:
+    """One moderation worker process's share of the moderated broadcasts.
+
+    Each rebalance round heartbeats, renews owned leases, stops chats whose
+    lease was lost or which were unregistered, releases chats above this
+    process's fair share, and leases unowned chats up to it.
+    """
+
+    def __init__(
+        self,
+        registry: ModerationRegistry,
+        worker_factory: Optional[Callable[..., Any]] = None,
+        worker_id: Optional[str] = None,
+        capacity: Optional[int] = None,
+        lease_ttl: Optional[int] = None,
+        stop_timeout: float = 10.0,
+    ):
+        self.registry = registry
+        self.worker_factory = worker_factory or _default_worker_factory
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.capacity = capacity or settings.MODERATION_BROADCASTS_PER_WORKER
+        self.lease_ttl = lease_ttl or settings.MODERATION_LEASE_TTL_SECONDS
+        self.stop_timeout = stop_timeout
+        self.owned: dict[str, _OwnedBroadcast] = {}
+        self._running = False
+
+    async def run(self, interval: Optional[float] = None) -> None:
+        """Rebalance until stopped, then hand back all leases."""
+        interval = interval or settings.MODERATION_REBALANCE_INTERVAL_SECONDS
+        self._running = True
+        logger.info(f"Moderation worker {self.worker_id} started")
+        try:
+            while self._running:
+                try:
+                    await self.rebalance_once()
+                except Exception as e:
+                    logger.error(f"Moderation rebalance failed: {e}")
+                await asyncio.sleep(interval)
+        finally:
+            await self.shutdown()
+
+    def stop(self) -> None:
+        self._running = False
+
+    async def rebalance_once(self) -> None:
+        workers = await self.registry.heartbeat(self.worker_id, self.lease_ttl)
+        broadcasts = await self.registry.list_broadcasts()
+
+        # Reap chats that ended on their own
+        for key, owned in list(self.owned.items()):
+            if owned.task.done():
+                chat_ended = getattr(owned.worker, "chat_ended", False)
+                await self._drop(key, release=True)
+                if chat_ended:
+                    await self.registry.unregister(key)
+                    await self.registry.clear_checkpoint(key)
+                    broadcasts.pop(key, None)
+
+        # Renew, or stop chats that were unregistered or lost
+        for key in list(self.owned):
+            if key not in broadcasts:
+                await self._drop(key, release=True)
+                await self.registry.clear_checkpoint(key)
+            elif not await self.registry.renew_lease(key, self.worker_id, self.lease_ttl):
+                logger.warning(f"Lost moderation lease for {key}")
+                await self._drop(key, release=False)
+
+        target = fair_share(len(broadcasts), workers, self.capacity)
+
+        # Hand back the least-preferred chats above the fair share
+        if len(self.owned) > target:
+            preferred = rendezvous_order(self.worker_id, self.owned)
+            for key in preferred[target:]:
+                await self._drop(key, release=True)
+
+        # Lease unowned chats up to the fair share
+        if len(self.owned) < target:
+            candidates = [key for key in broadcasts if key not in self.owned]
+            for key in rendezvous_order(self.worker_id, candidates):
+                if len(self.owned) >= target:
+                    break
+                if await self.registry.acquire_lease(key, self.worker_id, self.lease_ttl):
+                    self._start(broadcasts[key])
+
+        MODERATION_LIVE_BROADCASTS.set(len(broadcasts))
+        MODERATION_WORKERS.set(workers)
+        MODERATION_DESIRED_WORKERS.set(desired_fleet_size(len(broadcasts), self.capacity))
+        MODERATION_OWNED_BROADCASTS.labels(worker_id=self.worker_id).set(len(self.owned))
+
+    def _start(self, broadcast: ModeratedBroadcast) -> None:
+        checkpointer = BroadcastCheckpointer(self.registry, broadcast.key, self.worker_id)
+        worker = self.worker_factory(broadcast, checkpointer)
+        task = asyncio.create_task(worker.start())
+        self.owned[broadcast.key] = _OwnedBroadcast(broadcast, worker, task)
+        logger.info(f"Moderation worker {self.worker_id} took over {broadcast.key}")
+
+    async def _drop(self, key: str, release: bool) -> None:
+        """Stop moderating a chat, optionally handing its lease back."""
+        owned = self.owned.pop(key, None)
+        if owned is None:
+            return
+        await owned.worker.stop()
+        try:
+            await asyncio.wait_for(asyncio.shield(owned.task), timeout=self.stop_timeout)
+        except asyncio.TimeoutError:
+            owned.task.cancel()
+        except Exception:
+            pass
+        if release:
+            await self.registry.release_lease(key, self.worker_id)
+
+    async def shutdown(self) -> None:
+        for key in list(self.owned):
+            await self._drop(key, release=True)
+        try:
+            await self.registry.remove_worker(self.worker_id)
+        except Exception:
+            pass
+        logger.info(f"Moderation worker {self.worker_id} stopped")
+
+
+def _default_worker_factory(broadcast: ModeratedBroadcast, checkpointer: BroadcastCheckpointer):
+    from app.modules.moderation.chat_worker import LiveChatModerationWorker
+
+    return LiveChatModerationWorker(
+        account_id=broadcast.account_id,
+        broadcast_id=broadcast.broadcast_id,
+        session_id=broadcast.session_id,
+        checkpointer=checkpointer,
+    )
+
+
+async def run_moderation_worker() -> None:
+    """Run one moderation worker process until interrupted."""
+    import signal
+
+    from app.modules.moderation.chat_worker import register_local_runner
+
+    runner = ModerationShardRunner(get_moderation_registry())
+    register_local_runner(runner)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, runner.stop)
+        except NotImplementedError:
+            pass
+    await runner.run()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run_moderation_worker())
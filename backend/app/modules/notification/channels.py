@@ -4,8 +4,6 @@ Implements Email, SMS, Slack, and Telegram delivery channels.
 Requirements: 23.1 - Deliver within 60 seconds
 """
 
-import asyncio
-import smtplib
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from datetime import datetime
@@ -16,6 +14,7 @@ import httpx
 
 from app.core.config import settings
 from app.core.datetime_utils import utcnow, to_naive_utc
+from app.modules.notification.smtp_pool import SMTPConnectionPool, get_smtp_pool
 
 
 @dataclass
@@ -91,6 +90,9 @@ class EmailChannel(NotificationChannelBase):
     
     channel_name = "email"
     
+    def __init__(self, pool: Optional[SMTPConnectionPool] = None):
+        self._pool = pool
+    
     async def deliver(
         self,
         recipient: str,
@@ -128,13 +130,11 @@ class EmailChannel(NotificationChannelBase):
             html_part = MIMEText(html_content, "html")
             msg.attach(html_part)
             
-            # Send email in thread pool to avoid blocking
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(
-                None,
-                self._send_smtp,
+            # Send over a pooled, already-authenticated SMTP session
+            await self.pool.send(
+                settings.SMTP_FROM_EMAIL,
                 recipient,
-                msg,
+                msg.as_string(),
             )
             
             return self._create_success_result(recipient)
@@ -142,20 +142,10 @@ class EmailChannel(NotificationChannelBase):
         except Exception as e:
             return self._create_failure_result(recipient, str(e))
     
-    def _send_smtp(self, recipient: str, msg: MIMEMultipart) -> None:
-        """Send email via SMTP (blocking operation)."""
-        with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT) as server:
-            if settings.SMTP_TLS:
-                server.starttls()
-            
-            if settings.SMTP_USER and settings.SMTP_PASSWORD:
-                server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
-            
-            server.sendmail(
-                settings.SMTP_FROM_EMAIL,
-                recipient,
-                msg.as_string(),
-            )
+    @property
+    def pool(self) -> SMTPConnectionPool:
+        """SMTP pool used for delivery (process-wide unless injected)."""
+        return self._pool or get_smtp_pool()
 
 
 class SMSChannel(NotificationChannelBase):
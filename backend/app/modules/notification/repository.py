@@ -7,7 +7,7 @@ import uuid
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import select, update, func, and_, or_
+from sqlalchemy import select, update, func, and_, or_, case
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.datetime_utils import utcnow, to_naive_utc
@@ -352,6 +352,148 @@ class NotificationLogRepository:
         )
         return list(result.scalars().all())
 
+    async def get_logs_by_ids(
+        self, log_ids: list[uuid.UUID]
+    ) -> list[NotificationLog]:
+        """Get several notification logs in one query."""
+        if not log_ids:
+            return []
+        result = await self.session.execute(
+            select(NotificationLog).where(NotificationLog.id.in_(log_ids))
+        )
+        return list(result.scalars().all())
+
+    async def mark_queued(self, log_ids: list[uuid.UUID]) -> None:
+        """Mark logs as handed to the delivery outbox.
+
+        Does not count as a delivery attempt.
+        """
+        if not log_ids:
+            return
+        await self.session.execute(
+            update(NotificationLog)
+            .where(NotificationLog.id.in_(log_ids))
+            .values(
+                status=NotificationStatus.QUEUED.value,
+                queued_at=to_naive_utc(utcnow()),
+            )
+        )
+        await self.session.commit()
+
+    async def claim_for_delivery(
+        self, log_ids: list[uuid.UUID]
+    ) -> list[NotificationLog]:
+        """Atomically move pending/queued logs to sending.
+
+        Logs another worker already claimed (or that finished) are left
+        out, so each log is handed to one delivery attempt at a time.
+        """
+        if not log_ids:
+            return []
+        result = await self.session.execute(
+            update(NotificationLog)
+            .where(
+                and_(
+                    NotificationLog.id.in_(log_ids),
+                    NotificationLog.status.in_([
+                        NotificationStatus.PENDING.value,
+                        NotificationStatus.QUEUED.value,
+                    ]),
+                )
+            )
+            .values(
+                status=NotificationStatus.SENDING.value,
+                sent_at=to_naive_utc(utcnow()),
+                attempts=NotificationLog.attempts + 1,
+            )
+            .returning(NotificationLog.id)
+        )
+        claimed_ids = [row[0] for row in result.all()]
+        await self.session.commit()
+        return await self.get_logs_by_ids(claimed_ids)
+
+    async def record_delivery_failure(
+        self,
+        log_id: uuid.UUID,
+        error: str,
+        retry: bool,
+    ) -> None:
+        """Record a failed attempt, leaving the log pending if it may retry."""
+        await self.session.execute(
+            update(NotificationLog)
+            .where(NotificationLog.id == log_id)
+            .values(
+                status=(
+                    NotificationStatus.PENDING.value if retry
+                    else NotificationStatus.FAILED.value
+                ),
+                last_error=error,
+            )
+        )
+        await self.session.commit()
+
+    async def reclaim_stale_sends(self, sent_before: datetime) -> int:
+        """Hand back logs left in sending since before a cutoff.
+
+        A worker that died mid-delivery never finishes its claim. Such logs
+        go back to pending if they have attempts left and fail otherwise.
+        Returns the number reclaimed.
+        """
+        result = await self.session.execute(
+            update(NotificationLog)
+            .where(
+                and_(
+                    NotificationLog.status == NotificationStatus.SENDING.value,
+                    NotificationLog.sent_at < sent_before,
+                )
+            )
+            .values(
+                status=case(
+                    (
+                        NotificationLog.attempts < NotificationLog.max_attempts,
+                        NotificationStatus.PENDING.value,
+                    ),
+                    else_=NotificationStatus.FAILED.value,
+                ),
+                last_error="Delivery attempt timed out",
+            )
+            .returning(NotificationLog.id)
+        )
+        reclaimed = len(result.all())
+        await self.session.commit()
+        return reclaimed
+
+    async def get_outbox_backlog(
+        self,
+        older_than: datetime,
+        limit: int = 500,
+    ) -> list[NotificationLog]:
+        """Get undelivered, unbatched logs that have waited past a cutoff.
+
+        Covers logs whose outbox task was lost, failed attempts that
+        still have retries left and stale sends handed back by
+        reclaim_stale_sends.
+        """
+        result = await self.session.execute(
+            select(NotificationLog)
+            .where(
+                and_(
+                    NotificationLog.status.in_([
+                        NotificationStatus.PENDING.value,
+                        NotificationStatus.QUEUED.value,
+                    ]),
+                    NotificationLog.is_batched.is_(False),
+                    NotificationLog.attempts < NotificationLog.max_attempts,
+                    func.coalesce(
+                        NotificationLog.queued_at, NotificationLog.created_at
+                    ) < older_than,
+                )
+            )
+            .order_by(NotificationLog.created_at.asc())
+            .limit(limit)
+        )
+        return list(result.scalars().all())
+
     async def get_delivery_stats(
         self,
         user_id: Optional[uuid.UUID] = None,
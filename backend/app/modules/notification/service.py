@@ -4,17 +4,24 @@ Implements notification sending, batching, prioritization, and escalation.
 Requirements: 23.1, 23.2, 23.3, 23.4, 23.5
 """
 
+import asyncio
+import logging
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Optional
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.core.datetime_utils import utcnow, to_naive_utc
+from app.core.metrics import (
+    NOTIFICATION_DELIVERIES_TOTAL,
+    NOTIFICATION_DELIVERY_LATENCY_SECONDS,
+    NOTIFICATION_SLA_BREACHES_TOTAL,
+)
 from app.modules.notification.models import (
     NotificationChannel,
     NotificationPriority,
-    NotificationStatus,
 )
 from app.modules.notification.repository import (
     NotificationPreferenceRepository,
@@ -49,6 +56,8 @@ from app.modules.notification.channels import (
     ChannelDeliveryResult,
 )
 
+logger = logging.getLogger(__name__)
+
 
 class NotificationService:
     """Service for notification management and delivery.
@@ -94,8 +103,12 @@ class NotificationService:
         "subscription.renewed",
     ]
 
-    def __init__(self, session: AsyncSession):
+    def __init__(self, session: AsyncSession, use_outbox: Optional[bool] = None):
         self.session = session
+        # Hand deliveries to the Celery outbox instead of delivering inline
+        self.use_outbox = (
+            settings.NOTIFICATION_USE_OUTBOX if use_outbox is None else use_outbox
+        )
         self.pref_repo = NotificationPreferenceRepository(session)
         self.log_repo = NotificationLogRepository(session)
         self.batch_repo = NotificationBatchRepository(session)
@@ -108,6 +121,7 @@ class NotificationService:
             NotificationChannel.SLACK.value: SlackChannel(),
             NotificationChannel.TELEGRAM.value: TelegramChannel(),
         }
+        self._channel_limits: dict[str, asyncio.Semaphore] = {}
 
     # ==================== Notification Sending (23.1) ====================
 
@@ -191,7 +205,8 @@ class NotificationService:
             batch_id = batch.id
             is_batched = True
         
-        # Create notification logs and deliver for each enabled channel
+        # Create notification logs for each enabled channel
+        to_deliver = []
         for channel, recipient in channels_to_send:
             log = await self.log_repo.create_log(
                 user_id=request.user_id,
@@ -211,9 +226,11 @@ class NotificationService:
             notification_ids.append(log.id)
             channels_used.append(channel)
             
-            # If not batched, deliver immediately
             if not is_batched:
-                await self._deliver_notification(log)
+                to_deliver.append(log)
+        
+        # Fan out all channels at once (Requirements: 23.1)
+        await self._dispatch(to_deliver)
         
         # Check for escalation rules (Requirements: 23.4)
         if request.priority == SchemaPriority.CRITICAL:
@@ -230,49 +247,179 @@ class NotificationService:
             message=f"Notification queued for {len(channels_used)} channel(s)",
         )
 
-    async def _deliver_notification(self, log) -> bool:
-        """Deliver a single notification.
+    async def _dispatch(self, logs: list) -> None:
+        """Hand logs to the delivery outbox, or deliver them inline.
         
         Requirements: 23.1 - Deliver within 60 seconds
+        
+        The notification logs are the outbox: they are committed before the
+        Celery task is enqueued, and any log whose task is lost is picked up
+        by the periodic outbox sweep.
         """
-        channel_handler = self.channels.get(log.channel)
-        if not channel_handler:
-            await self.log_repo.update_status(
-                log.id,
-                NotificationStatus.FAILED.value,
-                error=f"Unknown channel: {log.channel}",
+        if not logs:
+            return
+        
+        if not self.use_outbox:
+            await self._deliver_logs(logs)
+            return
+        
+        log_ids = [log.id for log in logs]
+        await self.log_repo.mark_queued(log_ids)
+        try:
+            from app.modules.notification.tasks import deliver_notifications
+            deliver_notifications.delay([str(log_id) for log_id in log_ids])
+        except Exception as e:
+            logger.warning(
+                f"Failed to enqueue notification delivery, leaving "
+                f"{len(log_ids)} log(s) for the outbox sweep: {e}"
             )
-            return False
+
+    async def deliver_queued(self, notification_ids: list[uuid.UUID]) -> dict:
+        """Deliver queued notifications (used by the outbox worker).
         
-        # Mark as sending
-        await self.log_repo.update_status(log.id, NotificationStatus.SENDING.value)
+        Requirements: 23.1 - Deliver within 60 seconds
+        """
+        results = await self._deliver_logs_by_id(notification_ids)
+        delivered = sum(1 for ok in results if ok)
+        return {
+            "claimed": len(results),
+            "delivered": delivered,
+            "failed": len(results) - delivered,
+        }
+
+    async def sweep_outbox(self, limit: int = 500) -> int:
+        """Re-dispatch undelivered logs that waited past the sweep cutoff.
         
-        # Attempt delivery
-        result = await channel_handler.deliver(
-            recipient=log.recipient,
-            title=log.title,
-            message=log.message,
-            payload=log.payload,
+        Requirements: 23.1 - Deliver within 60 seconds
+        
+        Logs stuck in sending past NOTIFICATION_SEND_TIMEOUT_SECONDS are
+        reclaimed first, so a worker dying mid-delivery does not strand them.
+        """
+        now = to_naive_utc(utcnow())
+        await self.log_repo.reclaim_stale_sends(
+            now - timedelta(seconds=settings.NOTIFICATION_SEND_TIMEOUT_SECONDS)
         )
+        cutoff = now - timedelta(
+            seconds=settings.NOTIFICATION_OUTBOX_SWEEP_AFTER_SECONDS
+        )
+        logs = await self.log_repo.get_outbox_backlog(cutoff, limit=limit)
+        await self._dispatch(logs)
+        return len(logs)
+
+    async def _deliver_notification(self, log) -> bool:
+        """Deliver a single notification.
         
-        if result.success:
-            await self.log_repo.mark_delivered(log.id)
-            return True
-        else:
-            # Check if we should retry
-            if log.attempts < log.max_attempts:
-                await self.log_repo.update_status(
-                    log.id,
-                    NotificationStatus.PENDING.value,
-                    error=result.error,
-                )
+        Requirements: 23.1 - Deliver within 60 seconds
+        """
+        return (await self._deliver_logs([log]))[0]
+
+    async def _deliver_logs(self, logs: list) -> list[bool]:
+        """Deliver several notifications, fanning out across channels.
+        
+        Returns:
+            One success flag per log, in the order given; logs with an
+            unknown channel or already claimed elsewhere count as failed
+        """
+        deliverable_ids = []
+        for log in logs:
+            if log.channel in self.channels:
+                deliverable_ids.append(log.id)
             else:
-                await self.log_repo.update_status(
+                await self.log_repo.record_delivery_failure(
                     log.id,
-                    NotificationStatus.FAILED.value,
-                    error=result.error,
+                    f"Unknown channel: {log.channel}",
+                    retry=False,
                 )
-            return False
+                NOTIFICATION_DELIVERIES_TOTAL.labels(
+                    channel=log.channel, status="failed"
+                ).inc()
+        
+        outcomes = await self._deliver_claimed(deliverable_ids)
+        return [outcomes.get(log.id, False) for log in logs]
+
+    async def _deliver_logs_by_id(self, log_ids: list[uuid.UUID]) -> list[bool]:
+        """Deliver logs by ID, returning one success flag per claimed log."""
+        return list((await self._deliver_claimed(log_ids)).values())
+
+    async def _deliver_claimed(self, log_ids: list[uuid.UUID]) -> dict[uuid.UUID, bool]:
+        """Claim logs, deliver them concurrently, and record the outcomes.
+        
+        The session is only used before and after the fan-out, never from
+        concurrent tasks.
+        
+        Returns:
+            Success flag by log ID for the logs this call claimed
+        """
+        claimed = await self.log_repo.claim_for_delivery(log_ids)
+        if not claimed:
+            return {}
+        
+        results = await asyncio.gather(
+            *(self._deliver_via_channel(log) for log in claimed)
+        )
+        
+        outcomes = {}
+        for log, result in zip(claimed, results):
+            outcomes[log.id] = await self._record_delivery_result(log, result)
+        return outcomes
+
+    async def _deliver_via_channel(self, log) -> ChannelDeliveryResult:
+        """Deliver one log within its channel's concurrency limit."""
+        handler = self.channels.get(log.channel)
+        if not handler:
+            return ChannelDeliveryResult(
+                success=False,
+                channel=log.channel,
+                recipient=log.recipient,
+                error=f"Unknown channel: {log.channel}",
+            )
+        
+        async with self._get_channel_limit(log.channel):
+            try:
+                return await handler.deliver(
+                    recipient=log.recipient,
+                    title=log.title,
+                    message=log.message,
+                    payload=log.payload,
+                )
+            except Exception as e:
+                return ChannelDeliveryResult(
+                    success=False,
+                    channel=log.channel,
+                    recipient=log.recipient,
+                    error=str(e),
+                )
+
+    def _get_channel_limit(self, channel: str) -> asyncio.Semaphore:
+        """Per-channel concurrency limit for this service instance."""
+        if channel not in self._channel_limits:
+            limit = settings.NOTIFICATION_CHANNEL_CONCURRENCY.get(channel, 10)
+            self._channel_limits[channel] = asyncio.Semaphore(max(1, limit))
+        return self._channel_limits[channel]
+
+    async def _record_delivery_result(self, log, result: ChannelDeliveryResult) -> bool:
+        """Persist a delivery outcome and record delivery metrics."""
+        if result.success:
+            delivered = await self.log_repo.mark_delivered(
+                log.id, delivered_at=result.delivered_at
+            )
+            NOTIFICATION_DELIVERIES_TOTAL.labels(
+                channel=log.channel, status="delivered"
+            ).inc()
+            if delivered:
+                record_delivery_latency(
+                    log.channel, delivered.created_at, delivered.delivered_at
+                )
+            return True
+        
+        retry = log.attempts < log.max_attempts
+        await self.log_repo.record_delivery_failure(
+            log.id, result.error or "Delivery failed", retry=retry
+        )
+        NOTIFICATION_DELIVERIES_TOTAL.labels(
+            channel=log.channel, status="retrying" if retry else "failed"
+        ).inc()
+        return False
 
     def _get_recipient_for_channel(
         self,
@@ -335,9 +482,8 @@ class NotificationService:
             batch_logs = [l for l in logs if l.batch_id == batch.id]
             
             # Deliver all notifications in batch
-            for log in batch_logs:
-                await self._deliver_notification(log)
-                processed_count += 1
+            await self._deliver_logs(batch_logs)
+            processed_count += len(batch_logs)
             
             # Mark batch as processed
             await self.batch_repo.mark_processed(batch.id)
@@ -406,6 +552,7 @@ class NotificationService:
         
         # Create notifications for escalation channels
         new_notification_ids = []
+        new_logs = []
         for channel in level_config.get("channels", []):
             preference = await self.pref_repo.get_preference_for_event(
                 log.user_id,
@@ -435,10 +582,12 @@ class NotificationService:
             new_log.parent_notification_id = notification_id
             await self.session.commit()
             
-            # Deliver immediately
-            await self._deliver_notification(new_log)
+            new_logs.append(new_log)
             new_notification_ids.append(new_log.id)
         
+        # Deliver all escalation channels at once
+        await self._dispatch(new_logs)
+        
         return new_notification_ids
 
 
@@ -771,6 +920,34 @@ def is_delivered_within_sla(
     return delivery_time <= sla_seconds
 
 
+def record_delivery_latency(
+    channel: str,
+    created_at: Optional[datetime],
+    delivered_at: Optional[datetime],
+) -> bool:
+    """Record delivery latency metrics and check them against the SLA.
+    
+    Requirements: 23.1 - Deliver within 60 seconds
+    
+    Returns:
+        True if the notification was delivered within the SLA
+    """
+    if not created_at or not delivered_at:
+        return False
+    
+    NOTIFICATION_DELIVERY_LATENCY_SECONDS.labels(channel=channel).observe(
+        max(calculate_delivery_time(created_at, delivered_at), 0.0)
+    )
+    within_sla = is_delivered_within_sla(
+        created_at,
+        delivered_at,
+        settings.NOTIFICATION_DELIVERY_SLA_SECONDS,
+    )
+    if not within_sla:
+        NOTIFICATION_SLA_BREACHES_TOTAL.labels(channel=channel).inc()
+    return within_sla
+
+
 def calculate_delivery_time(
     created_at: datetime,
     delivered_at: datetime,
@@ -0,0 +1,206 @@
+"""Bounded SMTP connection pool for email notifications.
+
+Keeps authenticated SMTP sessions open between messages so a burst of
+emails (escalations, batch digests) pays the connect/STARTTLS/login
+handshake once per connection instead of once per message.
+Requirements: 23.1 - Deliver within 60 seconds
+"""
+
+import asyncio
+import logging
+import queue
+import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Optional, Union
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SMTPPoolConfig:
+    """Connection settings for an SMTP pool."""
+
+    host: str
+    port: int = 587
+    user: str = ""
+    password: str = ""
+    use_tls: bool = True
+    timeout: float = 30.0
+
+    @classmethod
+    def from_settings(cls) -> "SMTPPoolConfig":
+        return cls(
+            host=settings.SMTP_HOST,
+            port=settings.SMTP_PORT,
+            user=settings.SMTP_USER,
+            password=settings.SMTP_PASSWORD,
+            use_tls=settings.SMTP_TLS,
+        )
+
+
+@dataclass
+class _PooledConnection:
+    """An open SMTP session and when it was last used."""
+
+    server: smtplib.SMTP
+    last_used: float
+
+
+class SMTPConnectionPool:
+    """Pool of authenticated SMTP sessions served by a dedicated executor.
+
+    Every send runs on the pool's own thread pool, which has exactly
+    max_size workers, so at most max_size connections exist and sends
+    never occupy the event loop's default executor. Idle connections are
+    verified with NOOP before reuse and closed once they exceed
+    idle_timeout. A send that fails because the server dropped the
+    session is retried once on a fresh connection.
+
+    The pool holds no asyncio primitives and can be shared by event loops
+    in different threads or successive asyncio.run() calls.
+    """
+
+    def __init__(
+        self,
+        config: SMTPPoolConfig,
+        max_size: int = 4,
+        idle_timeout: float = 60.0,
+        smtp_factory: Optional[Callable[..., smtplib.SMTP]] = None,
+    ):
+        self.config = config
+        self.max_size = max(1, max_size)
+        self.idle_timeout = idle_timeout
+        self._smtp_factory = smtp_factory or smtplib.SMTP
+        self._idle: "queue.LifoQueue[_PooledConnection]" = queue.LifoQueue()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_size,
+            thread_name_prefix="smtp-pool",
+        )
+        self._lock = threading.Lock()
+        self._closed = False
+        self.connections_opened = 0
+
+    async def send(self, from_addr: str, to_addrs: Union[str, list[str]], message: str) -> None:
+        """Send one message, waiting for a free pool slot if necessary."""
+        if self._closed:
+            raise RuntimeError("SMTP pool is closed")
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(
+            self._executor, self._send_blocking, from_addr, to_addrs, message
+        )
+
+    def _send_blocking(self, from_addr: str, to_addrs: Union[str, list[str]], message: str) -> None:
+        conn = self._checkout()
+        try:
+            conn.server.sendmail(from_addr, to_addrs, message)
+        except smtplib.SMTPServerDisconnected:
+            # Server closed a pooled session between NOOP and send
+            self._discard(conn)
+            conn = self._open()
+            try:
+                conn.server.sendmail(from_addr, to_addrs, message)
+            except Exception:
+                self._discard(conn)
+                raise
+        except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError):
+            # Message-level rejection: the session itself is still usable
+            self._checkin(conn)
+            raise
+        except Exception:
+            self._discard(conn)
+            raise
+        self._checkin(conn)
+
+    def _checkout(self) -> _PooledConnection:
+        """Take a live idle connection or open a new one."""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return self._open()
+
+            if time.monotonic() - conn.last_used > self.idle_timeout:
+                self._discard(conn)
+                continue
+            try:
+                code, _ = conn.server.noop()
+                if code == 250:
+                    return conn
+            except smtplib.SMTPException:
+                pass
+            except OSError:
+                pass
+            self._discard(conn)
+
+    def _open(self) -> _PooledConnection:
+        server = self._smtp_factory(
+            self.config.host, self.config.port, timeout=self.config.timeout
+        )
+        try:
+            if self.config.use_tls:
+                server.starttls()
+            if self.config.user and self.config.password:
+                server.login(self.config.user, self.config.password)
+        except Exception:
+            self._close_server(server)
+            raise
+        with self._lock:
+            self.connections_opened += 1
+        return _PooledConnection(server=server, last_used=time.monotonic())
+
+    def _checkin(self, conn: _PooledConnection) -> None:
+        if self._closed:
+            self._discard(conn)
+            return
+        conn.last_used = time.monotonic()
+        self._idle.put(conn)
+
+    def _discard(self, conn: _PooledConnection) -> None:
+        self._close_server(conn.server)
+
+    @staticmethod
+    def _close_server(server: smtplib.SMTP) -> None:
+        try:
+            server.quit()
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
+
+    @property
+    def idle_count(self) -> int:
+        return self._idle.qsize()
+
+    def close(self) -> None:
+        """Close all idle connections and stop the executor."""
+        self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+        self._executor.shutdown(wait=False)
+
+
+_smtp_pool: Optional[SMTPConnectionPool] = None
+_smtp_pool_lock = threading.Lock()
+
+
+def get_smtp_pool() -> SMTPConnectionPool:
+    """Get the process-wide SMTP pool built from settings."""
+    global _smtp_pool
+    with _smtp_pool_lock:
+        if _smtp_pool is None or _smtp_pool._closed:
+            _smtp_pool = SMTPConnectionPool(
+                SMTPPoolConfig.from_settings(),
+                max_size=settings.NOTIFICATION_SMTP_POOL_SIZE,
+                idle_timeout=settings.NOTIFICATION_SMTP_IDLE_TIMEOUT_SECONDS,
+            )
+        return _smtp_pool
@@ -4,6 +4,7 @@ Implements background notification delivery, batching, and escalation.
 Requirements: 23.1, 23.3, 23.4
 """
 
+import logging
 import uuid
 from datetime import datetime, timedelta
 from typing import Optional
@@ -12,6 +13,80 @@ from celery import shared_task
 
 from app.core.config import settings
 from app.core.datetime_utils import utcnow
+from app.core.task_loop import run_async
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(
+    bind=True,
+    max_retries=3,
+    default_retry_delay=5,
+)
+def deliver_notifications(
+    self,
+    notification_ids: list[str],
+) -> dict:
+    """Deliver queued notifications from the outbox.
+    
+    Requirements: 23.1 - Deliver within 60 seconds
+    
+    All channels of a notification arrive in one task and are delivered
+    concurrently. Failed channels are left pending for the outbox sweep
+    until they run out of attempts.
+    
+    Args:
+        notification_ids: UUIDs of the notification logs to deliver
+        
+    Returns:
+        Delivery summary dict
+    """
+    try:
+        return run_async(_deliver_notifications_async(notification_ids))
+    except Exception as exc:
+        logger.error(f"Notification delivery failed: {exc}")
+        raise self.retry(exc=exc)
+
+
+async def _deliver_notifications_async(notification_ids: list[str]) -> dict:
+    """Async implementation of deliver_notifications."""
+    from app.core.database import celery_session_maker
+    from app.modules.notification.service import NotificationService
+    
+    async with celery_session_maker() as session:
+        service = NotificationService(session, use_outbox=False)
+        result = await service.deliver_queued(
+            [uuid.UUID(notification_id) for notification_id in notification_ids]
+        )
+    
+    return {"notification_ids": notification_ids, **result}
+
+
+@shared_task
+def sweep_notification_outbox() -> dict:
+    """Re-dispatch notifications whose delivery task was lost or failed.
+    
+    Requirements: 23.1 - Deliver within 60 seconds
+    
+    Returns:
+        Summary of notifications re-dispatched
+    """
+    return run_async(_sweep_notification_outbox_async())
+
+
+async def _sweep_notification_outbox_async() -> dict:
+    """Async implementation of sweep_notification_outbox."""
+    from app.core.database import celery_session_maker
+    from app.modules.notification.service import NotificationService
+    
+    async with celery_session_maker() as session:
+        service = NotificationService(session, use_outbox=True)
+        dispatched = await service.sweep_outbox()
+    
+    return {
+        "swept_at": utcnow().isoformat(),
+        "dispatched": dispatched,
+    }
 
 
 @shared_task(
@@ -33,12 +108,15 @@ def process_notification_delivery(
     Returns:
         Delivery result dict
     """
-    # This would be implemented with actual database session
-    # For now, return placeholder
+    try:
+        result = run_async(_deliver_notifications_async([notification_id]))
+    except Exception as exc:
+        raise self.retry(exc=exc)
+    
     return {
         "notification_id": notification_id,
-        "status": "delivered",
-        "delivered_at": utcnow().isoformat(),
+        "status": "delivered" if result["delivered"] else "not_delivered",
+        "delivered_at": utcnow().isoformat() if result["delivered"] else None,
     }
 
 
@@ -0,0 +1,393 @@
+"""Event-driven start/stop deadlines for scheduled stream jobs.
+
+When a stream job is created or edited its scheduled start and end times
+are written to a Redis sorted set scored by epoch seconds. Dispatcher
+processes sleep until the earliest deadline, atomically claim every due
+entry and fire it: a claimed start moves the job from SCHEDULED to
+STARTING and queues the FFmpeg worker, a claimed stop moves a running job
+to STOPPING and queues the stop task.
+
+Claiming is exactly-once: the claim script moves due entries into an
+in-flight set in one step, so two dispatchers never receive the same entry,
+and the job status change is a conditional UPDATE, so a re-delivered entry
+or the periodic ``check_scheduled_streams`` scan cannot start a job twice.
+Entries whose dispatcher died before acknowledging are re-queued once their
+claim expires. A claim whose task cannot be queued is undone, so the entry
+is retried rather than leaving the job STARTING or STOPPING for good. A
+stop that falls due while the job is still STARTING is deferred until
+FFmpeg is up. The beat scan stays as a reconciliation safety net and
+re-seeds deadlines that never reached Redis.
+
+Run a dispatcher process with:
+
+    python -m app.modules.stream.deadline_scheduler
+
+Requirements: 1.2, 1.3
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+import weakref
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Awaitable, Callable, Iterable, Optional, Union
+
+from app.core.config import settings
+from app.core.datetime_utils import ensure_utc
+from app.core.metrics import (
+    STREAM_SCHEDULER_DEADLINES_FIRED_TOTAL,
+    STREAM_SCHEDULER_DISPATCH_LAG_SECONDS,
+    STREAM_SCHEDULER_PENDING_DEADLINES,
+)
+
+logger = logging.getLogger(__name__)
+
+DEADLINES_KEY = "stream:deadlines"
+INFLIGHT_KEY = "stream:deadlines:inflight"
+
+START = "start"
+STOP = "stop"
+
+# Jobs whose deadlines fall within this window are re-seeded by the scan
+RESEED_HORIZON_SECONDS = 24 * 3600
+
+# A stop due while its job is still starting is retried this much later
+STOP_DEFER_SECONDS = 5.0
+
+# KEYS: deadlines, inflight. ARGV: now, limit, claim expiry.
+# Expired claims go back to the deadline set (unless the job was
+# rescheduled meanwhile), then due entries move to the in-flight set.
+_CLAIM_SCRIPT = """
+local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[1])
+for i = 1, #expired do
+    redis.call('ZREM', KEYS[2], expired[i])
+    redis.call('ZADD', KEYS[1], 'NX', ARGV[1], expired[i])
+end
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'WITHSCORES', 'LIMIT', 0, ARGV[2])
+for i = 1, #due, 2 do
+    redis.call('ZREM', KEYS[1], due[i])
+    redis.call('ZADD', KEYS[2], ARGV[3], due[i])
+end
+return due
+"""
+
+
+def deadline_member(action: str, job_id: Union[uuid.UUID, str]) -> str:
+    return f"{action}:{job_id}"
+
+
+def deadline_score(when: datetime) -> float:
+    """Epoch seconds of a stored (naive UTC or aware) datetime."""
+    return ensure_utc(when).timestamp()
+
+
+class DeadlineDeferred(Exception):
+    """A deadline cannot apply yet and should fire again after ``delay`` seconds."""
+
+    def __init__(self, delay: float):
+        super().__init__(f"deferred by {delay}s")
+        self.delay = delay
+
+
+@dataclass(frozen=True)
+class Deadline:
+    """A claimed start or stop deadline."""
+
+    action: str
+    job_id: str
+    due_at: float
+
+    @property
+    def member(self) -> str:
+        return deadline_member(self.action, self.job_id)
+
+
+class DeadlineQueue:
+    """Redis sorted-set delay queue of stream job deadlines."""
+
+    def __init__(self, redis, clock: Callable[[], float] = time.time):
+        self.redis = redis
+        self.clock = clock
+
+    async def schedule(self, action: str, job_id: Union[uuid.UUID, str], when: datetime) -> None:
+        """Add or move a deadline; a job has at most one of each action."""
+        await self.redis.zadd(DEADLINES_KEY, {deadline_member(action, job_id): deadline_score(when)})
+
+    async def schedule_many(self, deadlines: dict[str, float]) -> None:
+        """Add or move many deadlines (member -> epoch seconds) in one call."""
+        if deadlines:
+            await self.redis.zadd(DEADLINES_KEY, deadlines)
+
+    async def cancel(self, action: str, job_id: Union[uuid.UUID, str]) -> None:
+        member = deadline_member(action, job_id)
+        await self.redis.zrem(DEADLINES_KEY, member)
+        await self.redis.zrem(INFLIGHT_KEY, member)
+
+    async def claim_due(self, limit: int = 100, claim_ttl: Optional[float] = None) -> list[Deadline]:
+        """Atomically take up to ``limit`` due deadlines for this caller."""
+        now = self.clock()
+        claim_ttl = claim_ttl or settings.STREAM_SCHEDULER_CLAIM_TTL_SECONDS
+        raw = await self.redis.eval(
+            _CLAIM_SCRIPT, 2, DEADLINES_KEY, INFLIGHT_KEY, now, limit, now + claim_ttl
+        )
+        deadlines = []
+        for member, score in zip(raw[::2], raw[1::2]):
+            action, _, job_id = member.partition(":")
+            deadlines.append(Deadline(action, job_id, float(score)))
+        return deadlines
+
+    async def ack(self, deadline: Deadline) -> None:
+        await self.redis.zrem(INFLIGHT_KEY, deadline.member)
+
+    async def next_due_at(self) -> Optional[float]:
+        earliest = await self.redis.zrange(DEADLINES_KEY, 0, 0, withscores=True)
+        return float(earliest[0][1]) if earliest else None
+
+    async def pending(self) -> int:
+        return int(await self.redis.zcard(DEADLINES_KEY))
+
+
+def job_deadlines(job) -> dict[str, Optional[float]]:
+    """The deadlines a job should have, member -> score (None to clear)."""
+    from app.modules.stream.stream_job_models import StreamJobStatus
+
+    start = None
+    if job.status == StreamJobStatus.SCHEDULED.value and job.scheduled_start_at:
+        start = deadline_score(job.scheduled_start_at)
+    stop = None
+    if job.scheduled_end_at and job.status in (
+        StreamJobStatus.SCHEDULED.value,
+        StreamJobStatus.STARTING.value,
+        StreamJobStatus.RUNNING.value,
+    ):
+        stop = deadline_score(job.scheduled_end_at)
+    return {deadline_member(START, job.id): start, deadline_member(STOP, job.id): stop}
+
+
+def scheduler_enabled() -> bool:
+    return settings.STREAM_SCHEDULER_ENABLED
+
+
+# One queue per event loop: async Redis connections cannot be shared
+# across loops (Celery tasks run on their worker's task loop, or a fresh one).
+_queues: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, DeadlineQueue]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_deadline_queue() -> DeadlineQueue:
+    """Get the deadline queue for the running event loop."""
+    import redis.asyncio as aioredis
+
+    loop = asyncio.get_running_loop()
+    queue = _queues.get(loop)
+    if queue is None:
+        queue = DeadlineQueue(aioredis.from_url(settings.REDIS_URL, decode_responses=True))
+        _queues[loop] = queue
+    return queue
+
+
+async def sync_job_deadlines(job, queue: Optional[DeadlineQueue] = None) -> None:
+    """Write a created or edited job's deadlines to the queue.
+
+    Redis errors are logged, not raised: the reconciliation scan starts and
+    stops the job anyway and re-seeds the deadline on its next pass.
+    """
+    if not scheduler_enabled():
+        return
+    try:
+        queue = queue or get_deadline_queue()
+        deadlines = job_deadlines(job)
+        await queue.schedule_many({m: s for m, s in deadlines.items() if s is not None})
+        for member, score in deadlines.items():
+            if score is None:
+                action, _, job_id = member.partition(":")
+                await queue.cancel(action, job_id)
+    except Exception as e:
+        logger.warning(f"Could not schedule deadlines for stream job {job.id}: {e}")
+
+
+async def clear_job_deadlines(job_id: Union[uuid.UUID, str], queue: Optional[DeadlineQueue] = None) -> None:
+    """Drop a deleted job's deadlines."""
+    if not scheduler_enabled():
+        return
+    try:
+        queue = queue or get_deadline_queue()
+        await queue.cancel(START, job_id)
+        await queue.cancel(STOP, job_id)
+    except Exception as e:
+        logger.warning(f"Could not clear deadlines for stream job {job_id}: {e}")
+
+
+async def reseed_deadlines(jobs: Iterable, queue: Optional[DeadlineQueue] = None) -> int:
+    """Re-add deadlines for jobs read from the database; returns the count.
+
+    Scores come from the database, so re-adding an existing entry is a no-op.
+    """
+    deadlines = {}
+    for job in jobs:
+        deadlines.update({m: s for m, s in job_deadlines(job).items() if s is not None})
+    await (queue or get_deadline_queue()).schedule_many(deadlines)
+    return len(deadlines)
+
+
+async def claim_and_queue(repo, action: str, job_id: uuid.UUID) -> bool:
+    """Claim a job's scheduled start or stop and queue the task that does it.
+
+    If the task cannot be queued the claim is undone before the error is
+    raised, so a retry can claim the job again.
+
+    Returns:
+        bool: False if the job could not be claimed (not due, or claimed
+        by someone else)
+    """
+    from app.modules.stream.stream_job_models import StreamJobStatus
+    from app.modules.stream.stream_job_tasks import start_ffmpeg_worker, stop_ffmpeg_worker
+
+    if action == START:
+        claimed = await repo.claim_scheduled_start(job_id)
+        task, statuses = start_ffmpeg_worker, (StreamJobStatus.STARTING, StreamJobStatus.SCHEDULED)
+    else:
+        claimed = await repo.claim_scheduled_stop(job_id)
+        task, statuses = stop_ffmpeg_worker, (StreamJobStatus.STOPPING, StreamJobStatus.RUNNING)
+    if not claimed:
+        return False
+    try:
+        task.delay(str(job_id))
+    except Exception:
+        await repo.release_claim(job_id, statuses[0].value, statuses[1].value)
+        raise
+    return True
+
+
+async def fire_deadline(deadline: Deadline) -> bool:
+    """Apply a claimed deadline to its job; returns False if it no longer applies.
+
+    Raises:
+        DeadlineDeferred: If a stop falls due while the job is still starting
+    """
+    from app.core.database import async_session_maker
+    from app.modules.stream.stream_job_models import StreamJobStatus
+    from app.modules.stream.stream_job_repository import StreamJobRepository
+
+    if deadline.action not in (START, STOP):
+        logger.warning(f"Dropping unknown stream deadline {deadline.member}")
+        return False
+
+    job_id = uuid.UUID(deadline.job_id)
+    async with async_session_maker() as session:
+        repo = StreamJobRepository(session)
+        if await claim_and_queue(repo, deadline.action, job_id):
+            if deadline.action == START:
+                logger.info(f"Starting scheduled stream job {job_id}")
+            else:
+                logger.info(f"Stopping scheduled stream job {job_id} (end time reached)")
+            return True
+        if deadline.action == STOP:
+            job = await repo.get_by_id(job_id)
+            if job is not None and job.status == StreamJobStatus.STARTING.value:
+                # Nothing to stop until FFmpeg is up; the stop only claims RUNNING jobs
+                raise DeadlineDeferred(STOP_DEFER_SECONDS)
+    return False
+
+
+class DeadlineDispatcher:
+    """Fires due deadlines as they fall due.
+
+    Several dispatchers may share one queue; each deadline is claimed by
+    exactly one of them.
+    """
+
+    def __init__(
+        self,
+        queue: DeadlineQueue,
+        fire: Optional[Callable[[Deadline], Awaitable[bool]]] = None,
+        max_idle: Optional[float] = None,
+        batch_size: int = 100,
+        concurrency: Optional[int] = None,
+    ):
+        self.queue = queue
+        self.fire = fire or fire_deadline
+        self.max_idle = max_idle or settings.STREAM_SCHEDULER_MAX_IDLE_SECONDS
+        self.batch_size = batch_size
+        self._limit = asyncio.Semaphore(concurrency or settings.STREAM_SCHEDULER_CONCURRENCY)
+        self._running = False
+
+    async def run(self) -> None:
+        """Dispatch until stopped."""
+        self._running = True
+        logger.info("Stream deadline dispatcher started")
+        while self._running:
+            try:
+                if await self.dispatch_due():
+                    continue
+                delay = await self.seconds_until_next()
+            except Exception as e:
+                logger.error(f"Stream deadline dispatch failed: {e}")
+                delay = self.max_idle
+            await asyncio.sleep(delay)
+        logger.info("Stream deadline dispatcher stopped")
+
+    def stop(self) -> None:
+        self._running = False
+
+    async def seconds_until_next(self) -> float:
+        """Sleep until the earliest deadline, waking at least every ``max_idle``.
+
+        The cap bounds how late a deadline added after the sleep began can fire.
+        """
+        due_at = await self.queue.next_due_at()
+        STREAM_SCHEDULER_PENDING_DEADLINES.set(await self.queue.pending())
+        if due_at is None:
+            return self.max_idle
+        return min(max(due_at - self.queue.clock(), 0.0), self.max_idle)
+
+    async def dispatch_due(self) -> int:
+        """Claim and fire one batch of due deadlines; returns how many were claimed."""
+        deadlines = await self.queue.claim_due(self.batch_size)
+        if deadlines:
+            await asyncio.gather(*(self._dispatch(deadline) for deadline in deadlines))
+        return len(deadlines)
+
+    async def _dispatch(self, deadline: Deadline) -> None:
+        async with self._limit:
+            STREAM_SCHEDULER_DISPATCH_LAG_SECONDS.labels(action=deadline.action).observe(
+                max(self.queue.clock() - deadline.due_at, 0.0)
+            )
+            try:
+                fired = await self.fire(deadline)
+            except DeadlineDeferred as e:
+                await self.queue.schedule_many({deadline.member: self.queue.clock() + e.delay})
+                await self.queue.ack(deadline)
+                STREAM_SCHEDULER_DEADLINES_FIRED_TOTAL.labels(action=deadline.action, result="deferred").inc()
+                return
+            except Exception as e:
+                # Left in flight: re-queued when the claim expires
+                logger.error(f"Failed to fire stream deadline {deadline.member}: {e}")
+                STREAM_SCHEDULER_DEADLINES_FIRED_TOTAL.labels(action=deadline.action, result="error").inc()
+                return
+            await self.queue.ack(deadline)
+            STREAM_SCHEDULER_DEADLINES_FIRED_TOTAL.labels(
+                action=deadline.action, result="fired" if fired else "skipped"
+            ).inc()
+
+
+async def run_deadline_dispatcher() -> None:
+    """Run one dispatcher process until interrupted."""
+    import signal
+
+    dispatcher = DeadlineDispatcher(get_deadline_queue())
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, dispatcher.stop)
+        except NotImplementedError:
+            pass
+    await dispatcher.run()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run_deadline_dispatcher())
@@ -341,13 +341,22 @@ class FFmpegCommandBuilder:
             "preset": config["preset"],
         }
 
-    def build_streaming_command(self, job: StreamJob) -> List[str]:
+    def build_streaming_command(
+        self,
+        job: StreamJob,
+        input_path: Optional[str] = None,
+        stream_copy: bool = False,
+    ) -> List[str]:
         """Build FFmpeg command for streaming.
         
         Requirements: 3.1 - Generate FFmpeg command with all parameters.
         
         Args:
             job: StreamJob with configuration
+            input_path: Source to read instead of job.video_path
+                (e.g. a locally cached copy)
+            stream_copy: Input is a stream-ready rendition for this job's
+                settings; send it without re-encoding
             
         Returns:
             List[str]: FFmpeg command arguments
@@ -362,13 +371,10 @@ class FFmpegCommandBuilder:
         cmd.append("-re")
         
         # Input file
-        cmd.extend(["-i", job.video_path])
+        cmd.extend(["-i", input_path or job.video_path])
         
-        # Video encoding (Requirements: 10.1, 10.2, 10.3)
-        cmd.extend(self._build_video_encoding(job))
-        
-        # Audio encoding
-        cmd.extend(self._build_audio_encoding())
+        # Video and audio encoding (Requirements: 10.1, 10.2, 10.3)
+        cmd.extend(self._build_encoding(job, stream_copy))
         
         # Output format and destination
         cmd.extend(self._build_output(job))
@@ -409,6 +415,20 @@ class FFmpegCommandBuilder:
         """
         return RESOLUTION_SCALE.get(resolution, "1920:1080")
 
+    def _build_encoding(self, job: StreamJob, stream_copy: bool = False) -> List[str]:
+        """Build codec arguments: a live encode, or stream copy of a rendition.
+        
+        Args:
+            job: StreamJob with encoding configuration
+            stream_copy: Copy the input streams as they are
+            
+        Returns:
+            List[str]: Video and audio codec arguments
+        """
+        if stream_copy:
+            return ["-c:v", "copy", "-c:a", "copy"]
+        return self._build_video_encoding(job) + self._build_audio_encoding()
+
     def _build_video_encoding(self, job: StreamJob) -> List[str]:
         """Build video encoding parameters.
         
@@ -923,6 +943,7 @@ class FFmpegPlaylistCommandBuilder(FFmpegCommandBuilder):
         self,
         job: StreamJob,
         video_paths: List[str],
+        stream_copy: bool = False,
     ) -> tuple[List[str], str]:
         """Build FFmpeg command for playlist streaming.
         
@@ -931,6 +952,8 @@ class FFmpegPlaylistCommandBuilder(FFmpegCommandBuilder):
         Args:
             job: StreamJob with configuration
             video_paths: List of video file paths in playlist order
+            stream_copy: Every path is a stream-ready rendition for this
+                job's settings; concatenate them without re-encoding
             
         Returns:
             tuple[List[str], str]: (FFmpeg command, concat file path)
@@ -956,11 +979,8 @@ class FFmpegPlaylistCommandBuilder(FFmpegCommandBuilder):
         cmd.extend(["-safe", "0"])  # Allow absolute paths
         cmd.extend(["-i", concat_path])
         
-        # Video encoding
-        cmd.extend(self._build_video_encoding(job))
-        
-        # Audio encoding
-        cmd.extend(self._build_audio_encoding())
+        # Video and audio encoding
+        cmd.extend(self._build_encoding(job, stream_copy))
         
         # Output
         cmd.extend(self._build_output(job))
@@ -989,19 +1009,26 @@ def validate_ffmpeg_command(cmd: List[str]) -> Tuple[bool, Optional[str]]:
     """
     cmd_str = " ".join(cmd)
     
-    # Check for video codec (any supported encoder)
-    valid_video_codecs = ["libx264", "h264_nvenc", "h264_qsv", "h264_amf", "h264_videotoolbox"]
-    has_video_codec = any(codec in cmd_str for codec in valid_video_codecs)
-    if not has_video_codec:
-        return False, f"Missing video codec. Expected one of: {valid_video_codecs}"
-    
-    # Required parameters (codec-agnostic)
-    required_params = [
-        ("-c:a", "aac"),      # Audio codec
-        ("-b:a", "128k"),     # Audio bitrate
-        ("-ar", "44100"),     # Sample rate
-        ("-f", "flv"),        # Output format
-    ]
+    # Stream copy of a rendition, already encoded to the required format
+    if "-c:v copy" in cmd_str:
+        required_params = [
+            ("-c:a", "copy"),     # Audio copied along with video
+            ("-f", "flv"),        # Output format
+        ]
+    else:
+        # Check for video codec (any supported encoder)
+        valid_video_codecs = ["libx264", "h264_nvenc", "h264_qsv", "h264_amf", "h264_videotoolbox"]
+        has_video_codec = any(codec in cmd_str for codec in valid_video_codecs)
+        if not has_video_codec:
+            return False, f"Missing video codec. Expected one of: {valid_video_codecs}"
+        
+        # Required parameters (codec-agnostic)
+        required_params = [
+            ("-c:a", "aac"),      # Audio codec
+            ("-b:a", "128k"),     # Audio bitrate
+            ("-ar", "44100"),     # Sample rate
+            ("-f", "flv"),        # Output format
+        ]
     
     for param, value in required_params:
         if param not in cmd_str:
@@ -0,0 +1,498 @@
+"""Tiered time-series storage for stream health samples.
+
+Raw samples (stream_job_health, stream_health_logs) arrive every 10
+seconds per stream and are kept only briefly. A periodic task rolls them
+up into 1-minute aggregates, and those into 1-hour aggregates, keeping
+min/avg/max bitrate, fps and dropped frames per bucket. Every tier is a
+range-partitioned table, so retention drops whole partitions instead of
+deleting rows. Each table also has a DEFAULT partition, so inserts keep
+working if partition maintenance falls behind; maintenance moves those
+rows into their partition once it is created. History reads pick the
+finest tier that still covers the requested window within a point budget.
+
+Requirements: 4.7, 8.5
+"""
+
+import logging
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Any, Optional, Sequence
+
+from sqlalchemy import Float, and_, cast, func, literal, literal_column, null, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.datetime_utils import ensure_utc, to_naive_utc, utcnow
+from app.modules.stream.models import StreamHealthLog
+from app.modules.stream.stream_job_models import (
+    StreamHealthHour,
+    StreamHealthMinute,
+    StreamJobHealth,
+)
+
+logger = logging.getLogger(__name__)
+
+RAW = "raw"
+MINUTE = "1m"
+HOUR = "1h"
+RESOLUTIONS = (RAW, MINUTE, HOUR)
+
+SOURCE_STREAM_JOB = "stream_job"
+SOURCE_STREAM_SESSION = "stream_session"
+
+# Health collection interval of the raw tier
+RAW_INTERVAL_SECONDS = 10
+
+RESOLUTION_SECONDS = {RAW: RAW_INTERVAL_SECONDS, MINUTE: 60, HOUR: 3600}
+
+
+# ============================================
+# Tiers and partitions
+# ============================================
+
+
+@dataclass(frozen=True)
+class RawSource:
+    """A raw sample table and the columns rolled up from it."""
+
+    name: str
+    model: Any
+    series: Any
+    fps: Any
+    cpu_percent: Any
+    memory_mb: Any
+    alert: Any
+
+
+RAW_SOURCES = {
+    SOURCE_STREAM_JOB: RawSource(
+        SOURCE_STREAM_JOB,
+        StreamJobHealth,
+        StreamJobHealth.stream_job_id,
+        StreamJobHealth.fps,
+        StreamJobHealth.cpu_percent,
+        StreamJobHealth.memory_mb,
+        StreamJobHealth.alert_type.isnot(None),
+    ),
+    SOURCE_STREAM_SESSION: RawSource(
+        SOURCE_STREAM_SESSION,
+        StreamHealthLog,
+        StreamHealthLog.session_id,
+        StreamHealthLog.frame_rate,
+        None,
+        None,
+        StreamHealthLog.is_alert_triggered,
+    ),
+}
+
+
+@dataclass(frozen=True)
+class PartitionedTable:
+    """A range-partitioned table: daily or monthly partitions on one column."""
+
+    table: str
+    monthly: bool
+    timezone_aware: bool
+    column: str = "collected_at"
+
+    @property
+    def default_partition(self) -> str:
+        return f"{self.table}_default"
+
+    def partition_start(self, day: date) -> date:
+        return day.replace(day=1) if self.monthly else day
+
+    def next_start(self, start: date) -> date:
+        if self.monthly:
+            return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+        return start + timedelta(days=1)
+
+    def partition_name(self, start: date) -> str:
+        return f"{self.table}_p{start.strftime('%Y%m' if self.monthly else '%Y%m%d')}"
+
+    def parse_partition(self, name: str) -> Optional[date]:
+        match = re.fullmatch(re.escape(self.table) + r"_p(\d{6}|\d{8})", name)
+        if not match:
+            return None
+        digits = match.group(1)
+        if self.monthly != (len(digits) == 6):
+            return None
+        return datetime.strptime(digits, "%Y%m" if self.monthly else "%Y%m%d").date()
+
+    def bound(self, day: date) -> str:
+        return f"{day.isoformat()} 00:00:00{'+00' if self.timezone_aware else ''}"
+
+    def create_statements(self, start: date) -> list[str]:
+        """Create a partition, taking over rows the DEFAULT partition holds for its range.
+
+        A partition cannot be added while the default holds rows in its
+        range, so it is built as a plain table, filled, then attached.
+        """
+        name = self.partition_name(start)
+        lower, upper = self.bound(start), self.bound(self.next_start(start))
+        return [
+            f"CREATE TABLE {name} (LIKE {self.table} INCLUDING DEFAULTS)",
+            f"WITH moved AS (DELETE FROM {self.default_partition} "
+            f"WHERE {self.column} >= '{lower}' AND {self.column} < '{upper}' RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved",
+            f"ALTER TABLE {self.table} ATTACH PARTITION {name} FOR VALUES FROM ('{lower}') TO ('{upper}')",
+        ]
+
+
+def get_partitioned_table(table: str) -> PartitionedTable:
+    return next(t for t in PARTITIONED_TABLES if t.table == table)
+
+
+def retention(table: str) -> timedelta:
+    if table == StreamHealthMinute.__tablename__:
+        return timedelta(days=settings.STREAM_HEALTH_MINUTE_RETENTION_DAYS)
+    if table == StreamHealthHour.__tablename__:
+        return timedelta(days=settings.STREAM_HEALTH_HOUR_RETENTION_DAYS)
+    return timedelta(hours=settings.STREAM_HEALTH_RAW_RETENTION_HOURS)
+
+
+PARTITIONED_TABLES = (
+    PartitionedTable(StreamJobHealth.__tablename__, monthly=False, timezone_aware=True),
+    PartitionedTable(StreamHealthLog.__tablename__, monthly=False, timezone_aware=True),
+    PartitionedTable(StreamHealthMinute.__tablename__, monthly=False, timezone_aware=False, column="bucket_start"),
+    PartitionedTable(StreamHealthHour.__tablename__, monthly=True, timezone_aware=False, column="bucket_start"),
+)
+
+
+def partitions_to_create(table: PartitionedTable, today: date, ahead_days: int) -> list[date]:
+    """Partition start dates covering today through ``ahead_days`` from now."""
+    starts = []
+    start = table.partition_start(today)
+    while start <= today + timedelta(days=ahead_days):
+        starts.append(start)
+        start = table.next_start(start)
+    return starts
+
+
+def partitions_to_drop(
+    table: PartitionedTable,
+    existing: Sequence[str],
+    now: datetime,
+    cutoff: Optional[datetime] = None,
+) -> list[str]:
+    """Partitions whose whole range is older than the cutoff (default: the table's retention)."""
+    cutoff = cutoff or now - retention(table.table)
+    expired = []
+    for name in existing:
+        start = table.parse_partition(name)
+        if start is not None and datetime.combine(table.next_start(start), datetime.min.time()) <= cutoff:
+            expired.append(name)
+    return sorted(expired)
+
+
+async def list_partitions(session: AsyncSession, table: str) -> list[str]:
+    result = await session.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = CAST(:table AS regclass)"
+        ),
+        {"table": table},
+    )
+    return [row[0] for row in result.all()]
+
+
+async def maintain_partitions(
+    session: AsyncSession,
+    now: Optional[datetime] = None,
+    ahead_days: Optional[int] = None,
+    tables: Sequence[PartitionedTable] = PARTITIONED_TABLES,
+) -> dict[str, dict[str, list[str]]]:
+    """Create upcoming partitions and drop expired ones for every tier.
+
+    Rows that landed in a DEFAULT partition move into the partition created
+    for them; expired ones are deleted from it.
+
+    Returns:
+        dict: Per table, the partitions created and dropped
+    """
+    now = now or to_naive_utc(utcnow())
+    ahead_days = settings.STREAM_HEALTH_PARTITION_AHEAD_DAYS if ahead_days is None else ahead_days
+    report = {}
+    for table in tables:
+        existing = set(await list_partitions(session, table.table))
+        created = []
+        for start in partitions_to_create(table, now.date(), ahead_days):
+            name = table.partition_name(start)
+            if name not in existing:
+                create, move, attach = table.create_statements(start)
+                await session.execute(text(create))
+                moved = await session.execute(text(move))
+                if moved.rowcount:
+                    # Only happens when maintenance fell behind the AHEAD_DAYS window
+                    logger.warning(
+                        f"Moved {moved.rowcount} rows of {table.table} from its default partition to {name}"
+                    )
+                await session.execute(text(attach))
+                created.append(name)
+        dropped = partitions_to_drop(table, sorted(existing), now)
+        for name in dropped:
+            await session.execute(text(f"DROP TABLE IF EXISTS {name}"))
+        if table.default_partition in existing:
+            cutoff = table.bound(table.partition_start((now - retention(table.table)).date()))
+            await session.execute(
+                text(f"DELETE FROM {table.default_partition} WHERE {table.column} < '{cutoff}'")
+            )
+        report[table.table] = {"created": created, "dropped": dropped}
+    await session.commit()
+    return report
+
+
+# ============================================
+# Rollups
+# ============================================
+
+
+def floor_time(moment: datetime, seconds: int) -> datetime:
+    if seconds == 3600:
+        return moment.replace(minute=0, second=0, microsecond=0)
+    return moment.replace(second=0, microsecond=0)
+
+
+def _truncate(unit: str, column):
+    # Literal SQL rather than bind parameters, so the SELECT and GROUP BY
+    # expressions are identical to PostgreSQL
+    return func.date_trunc(literal_column(f"'{unit}'"), column)
+
+
+def minute_rollup_statement(source: RawSource, start: datetime, end: datetime):
+    """Upsert 1-minute buckets in [start, end) from one raw table."""
+    model = source.model
+    bucket = _truncate("minute", func.timezone(literal_column("'UTC'"), model.collected_at))
+    nothing = cast(null(), Float)
+    rows = (
+        select(
+            literal(source.name),
+            source.series,
+            bucket,
+            func.count(),
+            func.min(model.bitrate),
+            func.max(model.bitrate),
+            func.sum(model.bitrate),
+            func.count(source.fps),
+            func.min(source.fps),
+            func.max(source.fps),
+            func.coalesce(func.sum(source.fps), 0.0),
+            func.min(model.dropped_frames_delta),
+            func.max(model.dropped_frames_delta),
+            func.sum(model.dropped_frames_delta),
+            func.max(source.cpu_percent) if source.cpu_percent is not None else nothing,
+            func.max(source.memory_mb) if source.memory_mb is not None else nothing,
+            func.count().filter(source.alert),
+        )
+        .where(and_(model.collected_at >= ensure_utc(start), model.collected_at < ensure_utc(end)))
+        .group_by(source.series, bucket)
+    )
+    return _upsert(StreamHealthMinute, rows)
+
+
+def hour_rollup_statement(start: datetime, end: datetime):
+    """Upsert 1-hour buckets in [start, end) from the 1-minute tier."""
+    minute = StreamHealthMinute
+    bucket = _truncate("hour", minute.bucket_start)
+    rows = (
+        select(
+            minute.source,
+            minute.series_id,
+            bucket,
+            func.sum(minute.samples),
+            func.min(minute.bitrate_min),
+            func.max(minute.bitrate_max),
+            func.sum(minute.bitrate_sum),
+            func.sum(minute.fps_samples),
+            func.min(minute.fps_min),
+            func.max(minute.fps_max),
+            func.sum(minute.fps_sum),
+            func.min(minute.dropped_frames_min),
+            func.max(minute.dropped_frames_max),
+            func.sum(minute.dropped_frames_sum),
+            func.max(minute.cpu_percent_max),
+            func.max(minute.memory_mb_max),
+            func.sum(minute.alert_count),
+        )
+        .where(and_(minute.bucket_start >= start, minute.bucket_start < end))
+        .group_by(minute.source, minute.series_id, bucket)
+    )
+    return _upsert(StreamHealthHour, rows)
+
+
+_ROLLUP_COLUMNS = (
+    "source", "series_id", "bucket_start", "samples",
+    "bitrate_min", "bitrate_max", "bitrate_sum",
+    "fps_samples", "fps_min", "fps_max", "fps_sum",
+    "dropped_frames_min", "dropped_frames_max", "dropped_frames_sum",
+    "cpu_percent_max", "memory_mb_max", "alert_count",
+)
+
+
+def _upsert(model, rows):
+    statement = insert(model).from_select(list(_ROLLUP_COLUMNS), rows)
+    return statement.on_conflict_do_update(
+        index_elements=["source", "series_id", "bucket_start"],
+        set_={name: statement.excluded[name] for name in _ROLLUP_COLUMNS[3:]},
+    )
+
+
+class HealthRollupService:
+    """Rolls raw health samples up into the 1-minute and 1-hour tiers.
+
+    Each run recomputes from the newest stored bucket (which may have been
+    partial) to now, so runs are idempotent and late samples are picked up.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def _last_bucket(self, model) -> Optional[datetime]:
+        result = await self.session.execute(select(func.max(model.bucket_start)))
+        return result.scalar()
+
+    async def rollup(self, now: Optional[datetime] = None) -> dict:
+        now = now or to_naive_utc(utcnow())
+        end = floor_time(now, 60) + timedelta(minutes=1)
+
+        last_minute = await self._last_bucket(StreamHealthMinute)
+        minute_start = last_minute or floor_time(now - retention(StreamJobHealth.__tablename__), 60)
+        for source in RAW_SOURCES.values():
+            await self.session.execute(minute_rollup_statement(source, minute_start, end))
+
+        last_hour = await self._last_bucket(StreamHealthHour)
+        hour_start = last_hour or floor_time(minute_start, 3600)
+        await self.session.execute(hour_rollup_statement(hour_start, end))
+        await self.session.commit()
+
+        return {"minute_from": minute_start.isoformat(), "hour_from": hour_start.isoformat()}
+
+
+# ============================================
+# Reads
+# ============================================
+
+
+@dataclass
+class HealthPoint:
+    """One point of a health series at any resolution."""
+
+    bucket_start: datetime
+    samples: int
+    bitrate_min: int
+    bitrate_avg: float
+    bitrate_max: int
+    fps_min: Optional[float]
+    fps_avg: Optional[float]
+    fps_max: Optional[float]
+    dropped_frames_min: int
+    dropped_frames_avg: float
+    dropped_frames_max: int
+    dropped_frames_total: int
+    cpu_percent_max: Optional[float] = None
+    memory_mb_max: Optional[float] = None
+    alert_count: int = 0
+
+    @classmethod
+    def from_rollup(cls, row) -> "HealthPoint":
+        samples = row.samples or 0
+        return cls(
+            bucket_start=row.bucket_start,
+            samples=samples,
+            bitrate_min=row.bitrate_min,
+            bitrate_avg=row.bitrate_sum / samples if samples else 0.0,
+            bitrate_max=row.bitrate_max,
+            fps_min=row.fps_min,
+            fps_avg=row.fps_sum / row.fps_samples if row.fps_samples else None,
+            fps_max=row.fps_max,
+            dropped_frames_min=row.dropped_frames_min,
+            dropped_frames_avg=row.dropped_frames_sum / samples if samples else 0.0,
+            dropped_frames_max=row.dropped_frames_max,
+            dropped_frames_total=row.dropped_frames_sum,
+            cpu_percent_max=row.cpu_percent_max,
+            memory_mb_max=row.memory_mb_max,
+            alert_count=row.alert_count,
+        )
+
+    @classmethod
+    def from_job_sample(cls, health: StreamJobHealth) -> "HealthPoint":
+        return cls(
+            bucket_start=to_naive_utc(health.collected_at),
+            samples=1,
+            bitrate_min=health.bitrate,
+            bitrate_avg=float(health.bitrate),
+            bitrate_max=health.bitrate,
+            fps_min=health.fps,
+            fps_avg=health.fps,
+            fps_max=health.fps,
+            dropped_frames_min=health.dropped_frames_delta,
+            dropped_frames_avg=float(health.dropped_frames_delta),
+            dropped_frames_max=health.dropped_frames_delta,
+            dropped_frames_total=health.dropped_frames_delta,
+            cpu_percent_max=health.cpu_percent,
+            memory_mb_max=health.memory_mb,
+            alert_count=1 if health.alert_type else 0,
+        )
+
+
+def choose_resolution(
+    start: datetime,
+    end: datetime,
+    now: Optional[datetime] = None,
+    max_points: Optional[int] = None,
+) -> str:
+    """The finest tier that still holds ``start`` and fits the point budget."""
+    now = now or to_naive_utc(utcnow())
+    max_points = max_points or settings.STREAM_HEALTH_HISTORY_MAX_POINTS
+    span = (end - start).total_seconds()
+    tiers = (
+        (RAW, StreamJobHealth.__tablename__),
+        (MINUTE, StreamHealthMinute.__tablename__),
+    )
+    for resolution, table in tiers:
+        if start >= now - retention(table) and span / RESOLUTION_SECONDS[resolution] <= max_points:
+            return resolution
+    return HOUR
+
+
+class HealthHistoryReader:
+    """Reads a stream's health series from the 1-minute or 1-hour tier."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_points(
+        self,
+        source: str,
+        series_id,
+        start: datetime,
+        end: datetime,
+        resolution: str,
+        page: int = 1,
+        page_size: int = 100,
+    ) -> tuple[list[HealthPoint], int]:
+        """Get rollup points in [start, end), newest first.
+
+        Returns:
+            tuple[list[HealthPoint], int]: Points and total count
+        """
+        model = StreamHealthHour if resolution == HOUR else StreamHealthMinute
+        start = floor_time(start, RESOLUTION_SECONDS[resolution])
+        base_filter = and_(
+            model.source == source,
+            model.series_id == series_id,
+            model.bucket_start >= start,
+            model.bucket_start < end,
+        )
+        total = (await self.session.execute(select(func.count()).select_from(model).where(base_filter))).scalar() or 0
+        result = await self.session.execute(
+            select(model)
+            .where(base_filter)
+            .order_by(model.bucket_start.desc())
+            .offset((page - 1) * page_size)
+            .limit(page_size)
+        )
+        return [HealthPoint.from_rollup(row) for row in result.scalars().all()], total
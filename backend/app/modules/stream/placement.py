@@ -0,0 +1,343 @@
+"""Capacity-aware placement of stream jobs on streaming nodes.
+
+A stream's cost is measured in stream units. One unit is what a software
+encode of 720p at 30 fps takes. The cost grows with pixel rate and
+bitrate. A hardware encoder takes most of the encode off the CPU. A stream
+copy only demuxes and muxes.
+
+Each node's supervisor advertises its capacity in units with its heartbeat.
+Placement picks a live node with room using the configured policy:
+
+- ``least_loaded``: the node with the lowest utilization after placing,
+  which spreads streams and keeps headroom on every node
+- ``bin_pack``: the node left with the least room after placing (best
+  fit), which fills nodes before using empty ones
+
+The chosen node's capacity is reserved with a Lua script, so two
+concurrent placements cannot both take the last room on a node. When a
+node stops heartbeating its reservations are dropped and its jobs are
+placed again (see ``collect_health_metrics``).
+
+Requirements: 3.2, 3.3
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+import weakref
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+from typing import Callable, Iterable, Optional
+
+from app.core.config import settings
+from app.core.metrics import STREAM_PLACEMENTS_TOTAL
+from app.modules.stream.supervisor import (
+    NODE_KEY_PREFIX,
+    NodeCapacity,
+    StreamNodeRegistry,
+    get_stream_node_registry,
+)
+
+logger = logging.getLogger(__name__)
+
+# job id -> node id of every reservation
+RESERVED_JOBS_KEY = "stream:placement:jobs"
+# Recent placement decisions, newest first
+DECISIONS_KEY = "stream:placement:decisions"
+MAX_DECISIONS = 200
+
+LEAST_LOADED = "least_loaded"
+BIN_PACK = "bin_pack"
+PLACEMENT_POLICIES = (LEAST_LOADED, BIN_PACK)
+
+# Software encode of 1280x720 at 30 fps = 1 unit
+REFERENCE_PIXEL_RATE = 1280 * 720 * 30
+HARDWARE_ENCODE_FACTOR = 0.25  # decode, scaling and muxing stay on the CPU
+COPY_UNITS = 0.1  # stream copy: demux and mux only
+UNITS_PER_MBPS = 0.02  # reading, muxing and sending the output
+
+SOFTWARE_ENCODER = "libx264"
+
+# Reserve units on a node if they fit. Re-reserving a job replaces its
+# units, so a node can correct an estimate once it knows the real cost.
+# KEYS[1] = node reservations hash, KEYS[2] = job -> node hash
+# ARGV = job id, units, capacity (0 = do not check), node id
+_RESERVE_SCRIPT = """
+local previous = tonumber(redis.call('HGET', KEYS[1], ARGV[1]) or '0')
+local used = 0
+for _, units in ipairs(redis.call('HVALS', KEYS[1])) do
+    used = used + tonumber(units)
+end
+local capacity = tonumber(ARGV[3])
+if capacity > 0 and used - previous + tonumber(ARGV[2]) > capacity + 0.000001 then
+    return 0
+end
+redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+redis.call('HSET', KEYS[2], ARGV[1], ARGV[4])
+return 1
+"""
+
+# Drop a job's reservation if it is still held by the given node.
+# KEYS[1] = node reservations hash, KEYS[2] = job -> node hash
+# ARGV = job id, node id
+_RELEASE_SCRIPT = """
+if redis.call('HGET', KEYS[2], ARGV[1]) == ARGV[2] then
+    redis.call('HDEL', KEYS[2], ARGV[1])
+end
+return redis.call('HDEL', KEYS[1], ARGV[1])
+"""
+
+
+def node_reservations_key(node_id: str) -> str:
+    return f"{NODE_KEY_PREFIX}{node_id}:reservations"
+
+
+def placement_policy() -> str:
+    policy = settings.STREAM_PLACEMENT_POLICY
+    if policy not in PLACEMENT_POLICIES:
+        logger.warning(f"Unknown stream placement policy {policy!r}, using {LEAST_LOADED}")
+        return LEAST_LOADED
+    return policy
+
+
+@lru_cache(maxsize=1)
+def node_encoder() -> str:
+    """The encoder this node's FFmpeg uses for live encodes."""
+    from app.modules.stream.ffmpeg_builder import get_best_encoder
+
+    return get_best_encoder().value
+
+
+def node_capacity_units(encoder: str) -> float:
+    """Stream units this node offers: configured, or one per CPU core."""
+    if settings.STREAM_NODE_CAPACITY_UNITS > 0:
+        return settings.STREAM_NODE_CAPACITY_UNITS
+    return float(os.cpu_count() or 1)
+
+
+@dataclass(frozen=True)
+class StreamDemand:
+    """What a stream needs from the node that runs it."""
+
+    width: int = 1280
+    height: int = 720
+    fps: int = 30
+    bitrate_kbps: int = 6000
+    stream_copy: bool = False
+
+    @classmethod
+    def from_job(cls, job, stream_copy: bool = False) -> "StreamDemand":
+        width, height = job.get_resolution_dimensions()
+        return cls(
+            width=width,
+            height=height,
+            fps=job.target_fps or 30,
+            bitrate_kbps=job.target_bitrate or 0,
+            stream_copy=stream_copy,
+        )
+
+    def units(self, encoder: str = SOFTWARE_ENCODER) -> float:
+        """Stream units on a node encoding with ``encoder``.
+
+        Not rounded, so more work always costs more; round for display only.
+        """
+        transfer = self.bitrate_kbps / 1000 * UNITS_PER_MBPS
+        if self.stream_copy:
+            return COPY_UNITS + transfer
+        encode = self.width * self.height * self.fps / REFERENCE_PIXEL_RATE
+        if encoder != SOFTWARE_ENCODER:
+            encode *= HARDWARE_ENCODE_FACTOR
+        return encode + transfer
+
+
+@dataclass
+class NodeUtilization:
+    """A live node's advertised capacity and what is reserved on it."""
+
+    node: NodeCapacity
+    reserved_units: float = 0.0
+    jobs: int = 0
+
+    @property
+    def free_units(self) -> float:
+        return self.node.capacity_units - self.reserved_units
+
+    @property
+    def utilization(self) -> float:
+        if self.node.capacity_units <= 0:
+            return 1.0
+        return self.reserved_units / self.node.capacity_units
+
+    def fits(self, demand: StreamDemand) -> bool:
+        """Whether the node can take the stream within all of its limits."""
+        node = self.node
+        if node.capacity_units <= 0 or node.cpu_percent >= node.max_cpu_percent:
+            return False
+        if node.max_streams and node.streams >= node.max_streams:
+            return False
+        if (
+            not demand.stream_copy
+            and node.max_encoder_sessions
+            and node.encoder_sessions >= node.max_encoder_sessions
+        ):
+            return False
+        return self.reserved_units + demand.units(node.encoder) <= node.capacity_units + 1e-6
+
+
+@dataclass
+class PlacementDecision:
+    """Where a job was placed, and why."""
+
+    job_id: str
+    node_id: Optional[str]
+    policy: str
+    units: float = 0.0
+    candidates: int = 0
+    reason: str = ""
+    decided_at: float = field(default_factory=time.time)
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self))
+
+    @classmethod
+    def from_json(cls, raw: str) -> "PlacementDecision":
+        return cls(**json.loads(raw))
+
+
+def rank_nodes(
+    nodes: Iterable[NodeUtilization],
+    demand: StreamDemand,
+    policy: str = LEAST_LOADED,
+) -> list[NodeUtilization]:
+    """Nodes that can take the stream, best first under ``policy``."""
+    fitting = [n for n in nodes if n.fits(demand)]
+
+    def after(n: NodeUtilization) -> float:
+        return n.reserved_units + demand.units(n.node.encoder)
+
+    if policy == BIN_PACK:
+        # Best fit: least room left over
+        return sorted(fitting, key=lambda n: (n.node.capacity_units - after(n), n.node.node_id))
+    return sorted(fitting, key=lambda n: (after(n) / n.node.capacity_units, n.node.node_id))
+
+
+class StreamPlacer:
+    """Places stream jobs on live nodes and keeps their reservations."""
+
+    def __init__(self, registry: StreamNodeRegistry, clock: Callable[[], float] = time.time):
+        self.registry = registry
+        self.redis = registry.redis
+        self.clock = clock
+
+    async def nodes(self) -> list[NodeUtilization]:
+        """Every live node with its current reservations."""
+        nodes = []
+        for node in await self.registry.live_nodes():
+            reservations = await self.redis.hgetall(node_reservations_key(node.node_id))
+            nodes.append(NodeUtilization(
+                node=node,
+                reserved_units=round(sum(float(units) for units in reservations.values()), 3),
+                jobs=len(reservations),
+            ))
+        return nodes
+
+    async def place(
+        self,
+        job_id: str,
+        demand: StreamDemand,
+        policy: Optional[str] = None,
+    ) -> PlacementDecision:
+        """Reserve room for a job on the best node that has it.
+
+        Returns a decision without a node when no live node has room.
+        """
+        policy = policy or placement_policy()
+        ranked = rank_nodes(await self.nodes(), demand, policy)
+
+        decision = PlacementDecision(job_id, None, policy, candidates=len(ranked), decided_at=self.clock())
+        for candidate in ranked:
+            units = demand.units(candidate.node.encoder)
+            if await self.reserve(candidate.node.node_id, job_id, units, candidate.node.capacity_units):
+                decision.node_id = candidate.node.node_id
+                decision.units = round(units, 3)
+                decision.reason = f"{candidate.utilization:.0%} reserved before placing"
+                break
+        else:
+            decision.units = round(demand.units(), 3)
+            decision.reason = "no live node has room" if not ranked else "lost the race for every node with room"
+
+        STREAM_PLACEMENTS_TOTAL.labels(policy=policy, result="placed" if decision.node_id else "unplaced").inc()
+        await self._record(decision)
+        logger.info(f"Placed stream job {job_id} on {decision.node_id or 'no node'} ({decision.reason})")
+        return decision
+
+    async def reserve(self, node_id: str, job_id: str, units: float, capacity_units: float = 0.0) -> bool:
+        """Reserve units for a job on a node; capacity 0 reserves regardless."""
+        return bool(await self.redis.eval(
+            _RESERVE_SCRIPT,
+            2,
+            node_reservations_key(node_id),
+            RESERVED_JOBS_KEY,
+            job_id,
+            units,
+            capacity_units,
+            node_id,
+        ))
+
+    async def release(self, job_id: str, node_id: str) -> bool:
+        """Drop a job's reservation on a node."""
+        return bool(await self.redis.eval(
+            _RELEASE_SCRIPT,
+            2,
+            node_reservations_key(node_id),
+            RESERVED_JOBS_KEY,
+            job_id,
+            node_id,
+        ))
+
+    async def release_dead_nodes(self, live_node_ids: Iterable[str]) -> dict[str, list[str]]:
+        """Drop reservations on nodes that are no longer live.
+
+        Returns the jobs that lost their reservation, by node.
+        """
+        live = set(live_node_ids)
+        released: dict[str, list[str]] = {}
+        for job_id, node_id in (await self.redis.hgetall(RESERVED_JOBS_KEY)).items():
+            if node_id not in live:
+                await self.release(job_id, node_id)
+                released.setdefault(node_id, []).append(job_id)
+        for node_id in released:
+            await self.redis.delete(node_reservations_key(node_id))
+        return released
+
+    async def recent_decisions(self, limit: int = 50) -> list[PlacementDecision]:
+        decisions = []
+        for raw in await self.redis.lrange(DECISIONS_KEY, 0, limit - 1):
+            try:
+                decisions.append(PlacementDecision.from_json(raw))
+            except (ValueError, TypeError):
+                continue
+        return decisions
+
+    async def _record(self, decision: PlacementDecision) -> None:
+        try:
+            await self.redis.lpush(DECISIONS_KEY, decision.to_json())
+            await self.redis.ltrim(DECISIONS_KEY, 0, MAX_DECISIONS - 1)
+        except Exception as e:
+            logger.warning(f"Could not record placement of job {decision.job_id}: {e}")
+
+
+# One placer per event loop, like the node registry it wraps
+_placers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, StreamPlacer]" = weakref.WeakKeyDictionary()
+
+
+def get_stream_placer() -> StreamPlacer:
+    """Get the stream placer for the running event loop."""
+    loop = asyncio.get_running_loop()
+    placer = _placers.get(loop)
+    if placer is None:
+        placer = StreamPlacer(get_stream_node_registry())
+        _placers[loop] = placer
+    return placer
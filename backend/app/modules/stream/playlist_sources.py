@@ -0,0 +1,210 @@
+"""Resolution of a stream playlist into the sources FFmpeg can play.
+
+Starting a playlist stream used to load every item's video with its own
+query and then check each file with a blocking HEAD request or
+os.path.exists, one after another, before FFmpeg could start.
+
+- Items and their videos are loaded with one query, whatever the length
+- Existence checks run concurrently on the storage I/O executor, bounded
+  per playlist
+- The sources that passed are cached per playlist version (a digest of the
+  resolved items), so restarts and loops of an unchanged playlist skip the
+  checks. Any edit to the items or their videos changes the version
+
+Requirements: 11.1
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Optional, Sequence
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.metrics import STREAM_PLAYLIST_RESOLVE_SECONDS, STREAM_PLAYLIST_RESOLVE_TOTAL
+from app.core.storage import (
+    StorageService,
+    StorageTimeoutError,
+    get_file_url_for_ffmpeg,
+    get_storage_io_executor,
+)
+from app.modules.stream.repository import PlaylistItemRepository
+
+logger = logging.getLogger(__name__)
+
+# Playlists whose checked sources are kept per worker process
+MAX_CACHED_PLAYLISTS = 512
+
+
+@dataclass(frozen=True)
+class PlaylistSource:
+    """One playable playlist item.
+
+    key is the storage key of a library video, None for items given as a
+    direct URL or path (location).
+    """
+
+    position: int
+    key: Optional[str]
+    location: str
+
+
+def build_sources(rows: Sequence[tuple]) -> list[PlaylistSource]:
+    """Playlist sources from (position, video_id, file_path, video_url) rows.
+
+    Library items whose video is gone or has no file are skipped.
+    """
+    sources = []
+    for position, video_id, file_path, video_url in rows:
+        if video_id:
+            if file_path:
+                sources.append(PlaylistSource(position, file_path, file_path))
+        elif video_url:
+            sources.append(PlaylistSource(position, None, video_url))
+    return sources
+
+
+def playlist_version(sources: Sequence[PlaylistSource]) -> str:
+    """Digest of a playlist's resolved items; changes with any edit."""
+    digest = hashlib.sha1()
+    for source in sources:
+        digest.update(f"{source.position}\t{source.key or ''}\t{source.location}\n".encode())
+    return digest.hexdigest()
+
+
+class PlaylistSourceCache:
+    """Checked sources per (playlist, version), LRU with a TTL.
+
+    Only existence results are cached; presigned URLs are signed again on
+    every start because they expire.
+    """
+
+    def __init__(
+        self,
+        ttl: Optional[float] = None,
+        max_entries: int = MAX_CACHED_PLAYLISTS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl = settings.STREAM_PLAYLIST_SOURCE_CACHE_TTL_SECONDS if ttl is None else ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries: "OrderedDict[str, tuple[str, float, list[PlaylistSource]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, playlist_id, version: str) -> Optional[list[PlaylistSource]]:
+        key = str(playlist_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            cached_version, expires_at, sources = entry
+            if cached_version != version or expires_at <= self.clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return list(sources)
+
+    def put(self, playlist_id, version: str, sources: Sequence[PlaylistSource]) -> None:
+        key = str(playlist_id)
+        with self._lock:
+            self._entries[key] = (version, self.clock() + self.ttl, list(sources))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, playlist_id) -> None:
+        with self._lock:
+            self._entries.pop(str(playlist_id), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_cache: Optional[PlaylistSourceCache] = None
+
+
+def get_playlist_source_cache() -> PlaylistSourceCache:
+    """Get the process-wide playlist source cache."""
+    global _cache
+    if _cache is None:
+        _cache = PlaylistSourceCache()
+    return _cache
+
+
+async def source_exists(source: PlaylistSource, storage: Optional[StorageService] = None) -> bool:
+    """Whether FFmpeg will find a source, checked off the event loop."""
+    if source.key:
+        location = get_file_url_for_ffmpeg(source.key, expires_in=86400)
+        if location.startswith("http"):
+            return await (storage or StorageService()).exists(source.key)
+    elif source.location.startswith("http"):
+        # Direct URLs are handed to FFmpeg unchecked
+        return True
+    else:
+        location = source.location
+    return await get_storage_io_executor().run("exists", os.path.exists, location)
+
+
+async def check_sources(
+    sources: Sequence[PlaylistSource],
+    concurrency: Optional[int] = None,
+    storage: Optional[StorageService] = None,
+) -> tuple[list[PlaylistSource], bool]:
+    """Keep the sources that exist, checking up to ``concurrency`` at once.
+
+    Returns:
+        tuple: Available sources in order, and whether every check finished
+        (a timed-out check drops its source but must not be cached)
+    """
+    semaphore = asyncio.Semaphore(concurrency or settings.STREAM_PLAYLIST_RESOLVE_CONCURRENCY)
+    complete = True
+
+    async def check(source: PlaylistSource) -> bool:
+        nonlocal complete
+        async with semaphore:
+            try:
+                return await source_exists(source, storage)
+            except StorageTimeoutError as e:
+                logger.warning(f"Skipping playlist item {source.position}: {e}")
+                complete = False
+                return False
+
+    results = await asyncio.gather(*(check(source) for source in sources))
+    return [source for source, ok in zip(sources, results) if ok], complete
+
+
+async def resolve_playlist_sources(
+    session: AsyncSession,
+    playlist_id: uuid.UUID,
+    cache: Optional[PlaylistSourceCache] = None,
+    storage: Optional[StorageService] = None,
+) -> list[PlaylistSource]:
+    """The playable sources of a playlist, in order.
+
+    One database query per call; existence checks only when this version
+    of the playlist has not been checked recently.
+    """
+    started = time.monotonic()
+    cache = cache or get_playlist_source_cache()
+    sources = build_sources(await PlaylistItemRepository(session).get_sources(playlist_id))
+    version = playlist_version(sources)
+
+    available = cache.get(playlist_id, version)
+    if available is not None:
+        STREAM_PLAYLIST_RESOLVE_TOTAL.labels(result="hit").inc()
+    else:
+        STREAM_PLAYLIST_RESOLVE_TOTAL.labels(result="miss").inc()
+        available, complete = await check_sources(sources, storage=storage)
+        if complete:
+            cache.put(playlist_id, version, available)
+
+    STREAM_PLAYLIST_RESOLVE_SECONDS.observe(time.monotonic() - started)
+    return available
@@ -0,0 +1,388 @@
+"""Stream-ready renditions of library videos.
+
+A looping stream used to run its source through a full live encode (scale,
+pad, libx264 or a hardware encoder) for as long as it was on air, so a 24/7
+stream re-encoded the same file forever and a software-encoding node only
+carried a handful of streams.
+
+Library videos are now encoded once, offline, to a stream's output
+parameters (resolution, bitrate, rate control, fps, GOP, profile, audio).
+Streams whose sources all have a ready rendition for their parameters send
+it with stream copy, for single videos and concat playlists alike; the
+others keep the live encode until their renditions are ready.
+
+- Renditions are keyed by (source storage key, spec digest), so jobs with
+  the same video and output settings share one encode
+- A rendition is claimed with a conditional upsert before encoding, so two
+  workers never encode the same one. Failed or abandoned claims are retried
+  after STREAM_RENDITION_TIMEOUT_SECONDS
+- Every rendition has the same stream layout (H.264 with fixed GOP, stereo
+  AAC at 44.1 kHz), adding silence to sources without audio, so concat
+  playlists can be copied across items
+
+Requirements: 10.1, 10.2, 10.3, 10.4
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import subprocess
+import tempfile
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Optional, Sequence
+
+from sqlalchemy import and_, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.datetime_utils import utcnow
+from app.core.metrics import STREAM_RENDITION_ENCODE_SECONDS, STREAM_RENDITION_ENCODES_TOTAL
+from app.modules.stream.ffmpeg_builder import RESOLUTION_SCALE
+from app.modules.stream.stream_job_models import (
+    EncodingMode,
+    RenditionStatus,
+    StreamJob,
+    StreamRendition,
+)
+
+logger = logging.getLogger(__name__)
+
+RENDITION_PREFIX = "renditions"
+
+# Bump when the encode command changes, so existing renditions stop matching
+RENDITION_FORMAT_VERSION = 1
+
+# Fixed output layout shared by every rendition (and the live encode)
+VIDEO_PROFILE = "high"
+VIDEO_LEVEL = "4.1"
+AUDIO_BITRATE = "128k"
+AUDIO_SAMPLE_RATE = 44100
+AUDIO_CHANNELS = 2
+
+# Characters of FFmpeg stderr kept on a failed rendition
+MAX_ERROR_LENGTH = 2000
+
+
+class RenditionError(Exception):
+    """A rendition could not be produced."""
+    pass
+
+
+@dataclass(frozen=True)
+class RenditionSpec:
+    """Output parameters a rendition is encoded to."""
+
+    width: int
+    height: int
+    fps: int
+    bitrate_k: int
+    encoding_mode: str
+
+    @classmethod
+    def for_job(cls, job: StreamJob) -> "RenditionSpec":
+        """The parameters a job's live encode would produce."""
+        width, height = RESOLUTION_SCALE.get(job.resolution, "1920:1080").split(":")
+        return cls(
+            width=int(width),
+            height=int(height),
+            fps=int(job.target_fps),
+            bitrate_k=int(job.target_bitrate),
+            encoding_mode=job.encoding_mode,
+        )
+
+    @property
+    def gop(self) -> int:
+        """Keyframe interval, two seconds as in the live encode."""
+        return self.fps * 2
+
+    @property
+    def key(self) -> str:
+        """Digest identifying renditions made with these parameters."""
+        spec = (
+            f"v{RENDITION_FORMAT_VERSION}|{self.width}x{self.height}|{self.fps}fps|"
+            f"{self.bitrate_k}k|{self.encoding_mode}|gop{self.gop}|"
+            f"h264-{VIDEO_PROFILE}-{VIDEO_LEVEL}|aac-{AUDIO_BITRATE}-{AUDIO_SAMPLE_RATE}-{AUDIO_CHANNELS}"
+        )
+        return hashlib.sha1(spec.encode()).hexdigest()
+
+
+def rendition_storage_key(source_key: str, spec: RenditionSpec) -> str:
+    """Where the rendition of a source is stored."""
+    source_digest = hashlib.sha1(source_key.encode()).hexdigest()
+    return f"{RENDITION_PREFIX}/{spec.key}/{source_digest}.mp4"
+
+
+def renditions_enabled() -> bool:
+    return settings.STREAM_RENDITIONS_ENABLED
+
+
+# ============================================
+# Encoding
+# ============================================
+
+
+def build_rendition_command(
+    input_path: str,
+    output_path: str,
+    spec: RenditionSpec,
+    has_audio: bool = True,
+    ffmpeg_path: str = "ffmpeg",
+    preset: Optional[str] = None,
+) -> list[str]:
+    """FFmpeg command encoding a source into a stream-ready MP4.
+
+    Rate control, GOP and filters mirror the live libx264 encode, with a
+    fixed GOP (no scene-cut keyframes) so segments join cleanly when copied.
+
+    Args:
+        input_path: Local source file
+        output_path: MP4 to write
+        spec: Target parameters
+        has_audio: Whether the source has an audio stream; silence is
+            added when it does not
+        ffmpeg_path: Path to FFmpeg binary
+        preset: libx264 preset (default STREAM_RENDITION_PRESET)
+    """
+    scale = f"{spec.width}:{spec.height}"
+    bitrate_k = spec.bitrate_k
+
+    cmd = [ffmpeg_path, "-hide_banner", "-y", "-i", input_path]
+    if not has_audio:
+        cmd.extend([
+            "-f", "lavfi",
+            "-i", f"anullsrc=channel_layout=stereo:sample_rate={AUDIO_SAMPLE_RATE}",
+        ])
+    cmd.extend(["-map", "0:v:0", "-map", "0:a:0" if has_audio else "1:a:0"])
+
+    cmd.extend([
+        "-c:v", "libx264",
+        "-preset", preset or settings.STREAM_RENDITION_PRESET,
+        "-profile:v", VIDEO_PROFILE,
+        "-level:v", VIDEO_LEVEL,
+    ])
+    if spec.encoding_mode == EncodingMode.CBR.value:
+        cmd.extend([
+            "-b:v", f"{bitrate_k}k",
+            "-minrate", f"{bitrate_k}k",
+            "-maxrate", f"{bitrate_k}k",
+            "-bufsize", f"{bitrate_k * 2}k",
+            "-x264-params", "nal-hrd=cbr",
+        ])
+    else:
+        cmd.extend([
+            "-b:v", f"{bitrate_k}k",
+            "-maxrate", f"{int(bitrate_k * 1.5)}k",
+            "-bufsize", f"{bitrate_k * 2}k",
+        ])
+    cmd.extend([
+        "-vf", f"scale={scale}:force_original_aspect_ratio=decrease,pad={scale}:(ow-iw)/2:(oh-ih)/2,format=yuv420p",
+        "-r", str(spec.fps),
+        "-g", str(spec.gop),
+        "-keyint_min", str(spec.gop),
+        "-sc_threshold", "0",
+        "-bf", "2",
+        "-pix_fmt", "yuv420p",
+    ])
+
+    cmd.extend([
+        "-c:a", "aac",
+        "-b:a", AUDIO_BITRATE,
+        "-ar", str(AUDIO_SAMPLE_RATE),
+        "-ac", str(AUDIO_CHANNELS),
+    ])
+    if not has_audio:
+        cmd.append("-shortest")
+
+    cmd.extend(["-movflags", "+faststart", "-f", "mp4", output_path])
+    return cmd
+
+
+def _local_source(source_key: str, work_dir: str) -> str:
+    """A local path of a stored source, downloading it when needed."""
+    from app.core.storage import get_file_url_for_ffmpeg, get_storage
+    from app.modules.stream.source_cache import get_stream_source_cache, source_cache_enabled
+
+    if settings.STORAGE_BACKEND == "local":
+        return get_file_url_for_ffmpeg(source_key)
+    if source_cache_enabled():
+        return get_stream_source_cache().fetch(source_key)
+
+    path = os.path.join(work_dir, "source" + os.path.splitext(source_key)[1])
+    if not get_storage().download(source_key, path):
+        raise RenditionError(f"Failed to download {source_key}")
+    return path
+
+
+def encode_rendition(source_key: str, spec: RenditionSpec, ffmpeg_path: str = "ffmpeg") -> int:
+    """Encode a stored source to spec and store the result (blocking).
+
+    Returns:
+        int: Size of the stored rendition in bytes
+
+    Raises:
+        RenditionError: If the source cannot be read, the encode fails or
+            the upload fails
+    """
+    from app.core.storage import get_storage
+    from app.modules.video.media_analysis import get_media_analyzer
+    from app.modules.video.video_converter import get_temp_dir
+
+    with tempfile.TemporaryDirectory(prefix="rendition_", dir=get_temp_dir()) as work_dir:
+        try:
+            input_path = _local_source(source_key, work_dir)
+            probe = get_media_analyzer().probe_sync(input_path)
+        except Exception as e:
+            raise RenditionError(f"Cannot read source {source_key}: {e}")
+        has_audio = any(s.get("codec_type") == "audio" for s in probe.get("streams", []))
+
+        output_path = os.path.join(work_dir, "rendition.mp4")
+        cmd = build_rendition_command(input_path, output_path, spec, has_audio, ffmpeg_path)
+        try:
+            result = subprocess.run(
+                cmd,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                text=True,
+                timeout=settings.STREAM_RENDITION_TIMEOUT_SECONDS,
+            )
+        except subprocess.TimeoutExpired:
+            raise RenditionError("Encode timed out")
+        if result.returncode != 0:
+            raise RenditionError(result.stderr[-MAX_ERROR_LENGTH:] or f"FFmpeg exited with {result.returncode}")
+
+        size = os.path.getsize(output_path)
+        upload = get_storage().upload(output_path, rendition_storage_key(source_key, spec), "video/mp4")
+        if not upload.success:
+            raise RenditionError(f"Failed to store rendition: {upload.error_message}")
+        return size
+
+
+# ============================================
+# Rendition records
+# ============================================
+
+
+async def ready_renditions(
+    session: AsyncSession,
+    source_keys: Sequence[str],
+    spec: RenditionSpec,
+) -> Optional[dict[str, str]]:
+    """Rendition storage key per source key, or None unless every source has one."""
+    keys = set(source_keys)
+    if not keys:
+        return None
+    result = await session.execute(
+        select(StreamRendition.source_key, StreamRendition.storage_key).where(
+            StreamRendition.source_key.in_(keys),
+            StreamRendition.spec_key == spec.key,
+            StreamRendition.status == RenditionStatus.READY.value,
+        )
+    )
+    ready = {source_key: storage_key for source_key, storage_key in result.all()}
+    return ready if keys.issubset(ready) else None
+
+
+def claim_statement(source_key: str, spec: RenditionSpec, video_id: Optional[uuid.UUID] = None):
+    """Upsert taking a rendition for encoding.
+
+    Inserts a pending row, or takes over an existing one that is not ready
+    and has not been touched for STREAM_RENDITION_TIMEOUT_SECONDS (a failed
+    encode or a worker that died mid-encode).
+    """
+    stale_before = utcnow() - timedelta(seconds=settings.STREAM_RENDITION_TIMEOUT_SECONDS)
+    statement = insert(StreamRendition).values(
+        id=uuid.uuid4(),
+        video_id=video_id,
+        source_key=source_key,
+        spec_key=spec.key,
+        storage_key=rendition_storage_key(source_key, spec),
+        status=RenditionStatus.PENDING.value,
+    )
+    return statement.on_conflict_do_update(
+        constraint="uq_stream_renditions_source_spec",
+        set_={
+            "status": RenditionStatus.PENDING.value,
+            "error": None,
+            "updated_at": func.now(),
+        },
+        where=and_(
+            StreamRendition.status != RenditionStatus.READY.value,
+            StreamRendition.updated_at < stale_before,
+        ),
+    )
+
+
+async def claim_rendition(
+    session: AsyncSession,
+    source_key: str,
+    spec: RenditionSpec,
+    video_id: Optional[uuid.UUID] = None,
+) -> bool:
+    """Take a rendition for encoding; False if it is ready or being encoded."""
+    result = await session.execute(claim_statement(source_key, spec, video_id))
+    await session.commit()
+    return result.rowcount == 1
+
+
+async def finish_rendition(
+    session: AsyncSession,
+    source_key: str,
+    spec: RenditionSpec,
+    size_bytes: Optional[int] = None,
+    error: Optional[str] = None,
+) -> None:
+    """Record the outcome of a claimed encode."""
+    await session.execute(
+        update(StreamRendition)
+        .where(
+            and_(
+                StreamRendition.source_key == source_key,
+                StreamRendition.spec_key == spec.key,
+            )
+        )
+        .values(
+            status=RenditionStatus.FAILED.value if error else RenditionStatus.READY.value,
+            size_bytes=size_bytes,
+            error=error[-MAX_ERROR_LENGTH:] if error else None,
+            updated_at=func.now(),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    await session.commit()
+
+
+async def prepare_rendition(
+    session: AsyncSession,
+    source_key: str,
+    spec: RenditionSpec,
+    video_id: Optional[uuid.UUID] = None,
+) -> Optional[bool]:
+    """Encode one rendition unless it is ready or claimed elsewhere.
+
+    Returns:
+        Optional[bool]: True if encoded, False if the encode failed, None if
+        there was nothing to do
+    """
+    if not await claim_rendition(session, source_key, spec, video_id):
+        return None
+
+    started = time.monotonic()
+    try:
+        size = await asyncio.to_thread(encode_rendition, source_key, spec)
+    except Exception as e:
+        logger.warning(f"Rendition of {source_key} ({spec.width}x{spec.height}@{spec.fps}) failed: {e}")
+        STREAM_RENDITION_ENCODES_TOTAL.labels(result="failed").inc()
+        await finish_rendition(session, source_key, spec, error=str(e) or type(e).__name__)
+        return False
+
+    elapsed = time.monotonic() - started
+    STREAM_RENDITION_ENCODES_TOTAL.labels(result="success").inc()
+    STREAM_RENDITION_ENCODE_SECONDS.observe(elapsed)
+    await finish_rendition(session, source_key, spec, size_bytes=size)
+    logger.info(f"Rendition of {source_key} ready ({size} bytes in {elapsed:.0f}s)")
+    return True
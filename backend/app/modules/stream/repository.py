@@ -32,6 +32,7 @@ from app.modules.stream.models import (
     SimulcastPlatform,
     SimulcastHealthLog,
 )
+from app.modules.video.models import Video
 
 
 class LiveEventRepository:
@@ -981,6 +982,34 @@ class PlaylistItemRepository:
         )
         return list(result.scalars().all())
 
+    async def get_sources(
+        self, playlist_id: uuid.UUID
+    ) -> list[tuple[int, Optional[uuid.UUID], Optional[str], Optional[str]]]:
+        """Get each item's video file and URL in one query, ordered by position.
+
+        Requirements: 11.1
+
+        Args:
+            playlist_id: Playlist UUID
+
+        Returns:
+            list: (position, video_id, video file_path, video_url) per item;
+            file_path is None when the item has no library video or the
+            video has no file
+        """
+        result = await self.session.execute(
+            select(
+                PlaylistItem.position,
+                PlaylistItem.video_id,
+                Video.file_path,
+                PlaylistItem.video_url,
+            )
+            .outerjoin(Video, Video.id == PlaylistItem.video_id)
+            .where(PlaylistItem.playlist_id == playlist_id)
+            .order_by(PlaylistItem.position.asc())
+        )
+        return [tuple(row) for row in result.all()]
+
     async def get_item_at_position(
         self, playlist_id: uuid.UUID, position: int
     ) -> Optional[PlaylistItem]:
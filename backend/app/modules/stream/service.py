@@ -4,14 +4,21 @@ Implements live event creation, scheduling, and YouTube API integration.
 Requirements: 5.1, 5.2, 5.3, 5.4, 5.5
 """
 
+import asyncio
 import uuid
 from datetime import datetime, timedelta
 from typing import Optional
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.core.datetime_utils import utcnow, to_naive_utc
 from app.modules.account.models import YouTubeAccount
+from app.modules.account.quota_scheduler import (
+    QuotaPriority,
+    estimate_cost,
+    get_quota_scheduler,
+)
 from app.modules.account.repository import YouTubeAccountRepository
 from app.modules.account.service import YouTubeAccountService
 from app.modules.stream.models import (
@@ -52,6 +59,13 @@ from app.modules.stream.schemas import (
     PlaylistStreamStatus,
     PlaylistLoopResult,
 )
+from app.modules.stream.simulcast import (
+    SimulcastEncoding,
+    SimulcastError,
+    SimulcastOutput,
+    get_simulcast_supervisor,
+    output_url,
+)
 from app.modules.stream.youtube_api import YouTubeLiveStreamingClient, YouTubeAPIError
 
 import logging
@@ -527,7 +541,23 @@ class StreamService:
         """
         # Refresh token if expired or expiring soon
         account = await self.account_service.refresh_token_if_needed(account)
-        
+
+        # Broadcast, stream and bind are stream control: top priority class
+        decision = await get_quota_scheduler().acquire(
+            account.id,
+            "liveBroadcasts.insert",
+            QuotaPriority.REALTIME,
+            units=estimate_cost(
+                "liveBroadcasts.insert", "liveStreams.insert", "liveBroadcasts.bind"
+            ),
+        )
+        if not decision.allowed:
+            raise YouTubeAPIError(
+                "YouTube API quota exhausted for this account",
+                status_code=403,
+                details={"retry_after_seconds": decision.retry_after_seconds},
+            )
+
         client = YouTubeLiveStreamingClient(account.access_token)
 
         # Create broadcast
@@ -2104,20 +2134,27 @@ class SimulcastService:
     async def start_simulcast(
         self,
         live_event_id: uuid.UUID,
+        source: str,
+        encoding: Optional[SimulcastEncoding] = None,
+        realtime: bool = True,
     ) -> dict:
         """Start simulcast streaming to all configured platforms.
 
+        The source is encoded once and fanned out to every target through
+        the FFmpeg tee muxer.
+
         Requirements: 9.2 - Push stream to all configured platforms concurrently.
         Requirements: 9.3 - Handle individual platform failures (fault isolation).
 
         Args:
             live_event_id: Live event UUID
+            source: Input for the encode (video file or ingest URL)
+            encoding: Output settings, defaults to 1080p CBR at 6000 kbps
+            realtime: Read the source at native frame rate (files, not live inputs)
 
         Returns:
             dict: Result with started and failed targets
         """
-        from app.modules.stream.models import SimulcastTargetStatus
-        
         targets = await self.target_repository.get_by_event_id(
             live_event_id, enabled_only=True
         )
@@ -2125,35 +2162,44 @@ class SimulcastService:
         if not targets:
             raise StreamServiceError(f"No simulcast targets configured for event {live_event_id}")
 
+        outputs = [
+            SimulcastOutput(target.id, output_url(target.get_effective_rtmp_url(), target.stream_key))
+            for target in targets
+        ]
+        try:
+            session = get_simulcast_supervisor().start(
+                live_event_id, source, encoding or SimulcastEncoding(), outputs, realtime=realtime
+            )
+        except SimulcastError as e:
+            for target in targets:
+                target.record_error(str(e))
+            await self.session.commit()
+            raise StreamServiceError(str(e))
+
+        # Targets that refuse the connection fail within the first seconds
+        await asyncio.sleep(settings.SIMULCAST_STARTUP_GRACE_SECONDS)
+        health = session.health()
+
         started_targets = []
         failed_targets = []
 
-        # Start each target independently (fault isolation per Requirements 9.3)
+        # Each target succeeds or fails on its own (fault isolation per Requirements 9.3)
         for target in targets:
-            try:
-                # Attempt to start streaming to this platform
-                success = await self._start_target_stream(target)
-                
-                if success:
-                    target.start_streaming()
-                    started_targets.append(target.id)
-                else:
-                    target.record_error("Failed to establish connection")
-                    failed_targets.append({
-                        "target_id": str(target.id),
-                        "platform": target.platform,
-                        "error": "Failed to establish connection",
-                    })
-            except Exception as e:
-                # Individual platform failure should not affect others (Requirements 9.3)
-                target.record_error(str(e))
+            target_health = health[target.id]
+            if target_health.alive:
+                target.start_streaming()
+                started_targets.append(target.id)
+            else:
+                error = target_health.error or "Failed to establish connection"
+                target.record_error(error)
                 failed_targets.append({
                     "target_id": str(target.id),
                     "platform": target.platform,
-                    "error": str(e),
+                    "error": error,
                 })
 
         await self.session.commit()
+        session.monitor = asyncio.create_task(_monitor_simulcast(live_event_id))
 
         return {
             "live_event_id": str(live_event_id),
@@ -2162,6 +2208,78 @@ class SimulcastService:
             "all_started": len(failed_targets) == 0,
         }
 
+    async def readd_simulcast_target(self, target_id: uuid.UUID) -> "SimulcastTarget":
+        """Resume a failed or newly added target without restarting the encode.
+
+        Requirements: 9.3
+
+        Args:
+            target_id: Target UUID
+
+        Returns:
+            SimulcastTarget: The target, streaming again
+
+        Raises:
+            StreamServiceError: If the target is not found or the event's
+                simulcast does not run in this process
+        """
+        target = await self.target_repository.get_by_id(target_id)
+        if not target:
+            raise StreamServiceError(f"Simulcast target {target_id} not found")
+
+        session = get_simulcast_supervisor().get(target.live_event_id)
+        if session is None:
+            raise StreamServiceError(f"No simulcast running for event {target.live_event_id}")
+
+        try:
+            session.readd(target.id, output_url(target.get_effective_rtmp_url(), target.stream_key))
+        except SimulcastError as e:
+            raise StreamServiceError(str(e))
+
+        target.start_streaming()
+        await self.session.commit()
+        return target
+
+    async def sync_simulcast_health(self, live_event_id: uuid.UUID) -> dict:
+        """Record the running simulcast's per-target health.
+
+        Failed outputs go through handle_platform_failure, live ones get a
+        health log.
+
+        Requirements: 9.3, 9.4
+
+        Args:
+            live_event_id: Live event UUID
+
+        Returns:
+            dict: Targets updated and failed in this pass
+        """
+        session = get_simulcast_supervisor().get(live_event_id)
+        if session is None:
+            return {"live_event_id": str(live_event_id), "updated": [], "failed": []}
+
+        updated = []
+        failed = []
+        active_ids = {
+            target.id for target in await self.target_repository.get_active_targets(live_event_id)
+        }
+        for target_id, health in session.health().items():
+            if target_id not in active_ids:
+                continue
+            if not health.alive:
+                await self.handle_platform_failure(target_id, health.error or "Output failed")
+                failed.append(str(target_id))
+            elif health.frame_rate is not None:
+                await self.update_target_health(
+                    target_id,
+                    bitrate=health.bitrate_kbps,
+                    frame_rate=health.frame_rate,
+                    dropped_frames=health.dropped_frames,
+                )
+                updated.append(str(target_id))
+
+        return {"live_event_id": str(live_event_id), "updated": updated, "failed": failed}
+
     async def stop_simulcast(
         self,
         live_event_id: uuid.UUID,
@@ -2176,6 +2294,7 @@ class SimulcastService:
         Returns:
             dict: Result with stopped targets
         """
+        get_simulcast_supervisor().stop(live_event_id)
         targets = await self.target_repository.stop_all_targets(live_event_id, reason)
         
         total_streaming_seconds = sum(t.total_streaming_seconds for t in targets)
@@ -2379,30 +2498,6 @@ class SimulcastService:
         
         return ConnectionStatus.FAIR.value
 
-    async def _start_target_stream(self, target: "SimulcastTarget") -> bool:
-        """Start streaming to a single target.
-
-        This is a placeholder for actual RTMP streaming implementation.
-        In production, this would initiate the FFmpeg/RTMP push.
-
-        Args:
-            target: SimulcastTarget instance
-
-        Returns:
-            bool: True if stream started successfully
-        """
-        # In production, this would:
-        # 1. Get the effective RTMP URL (with proxy if needed)
-        # 2. Start FFmpeg process to push stream
-        # 3. Return success/failure
-        
-        rtmp_url = target.get_effective_rtmp_url()
-        stream_key = target.stream_key
-        
-        # Placeholder - actual implementation would start FFmpeg
-        # For now, we assume success if we have valid configuration
-        return bool(rtmp_url)
-
     def check_fault_isolation(
         self,
         failed_target_id: uuid.UUID,
@@ -2442,3 +2537,23 @@ class SimulcastService:
 
 # Import for type hints
 from app.modules.stream.repository import SimulcastTargetRepository, SimulcastHealthLogRepository
+
+
+async def _monitor_simulcast(live_event_id: uuid.UUID) -> None:
+    """Sync a simulcast's target health until it stops.
+
+    Requirements: 9.4
+    """
+    from app.core.database import async_session_maker
+
+    supervisor = get_simulcast_supervisor()
+    while True:
+        await asyncio.sleep(settings.SIMULCAST_HEALTH_INTERVAL_SECONDS)
+        simulcast = supervisor.get(live_event_id)
+        try:
+            async with async_session_maker() as session:
+                await SimulcastService(session).sync_simulcast_health(live_event_id)
+        except Exception as e:
+            logger.error(f"Failed to sync simulcast health for event {live_event_id}: {e}")
+        if simulcast is None or not any(health.alive for health in simulcast.health().values()):
+            return
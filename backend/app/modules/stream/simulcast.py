@@ -0,0 +1,496 @@
+"""Single-encode simulcast through the FFmpeg tee muxer.
+
+Delivering a live event to several platforms used to mean one FFmpeg encode
+per target. A simulcast now decodes and encodes once and hands the packets
+to an ``-f tee`` output with one FLV slave per target:
+
+- Every slave has ``onfail=ignore``, so a platform that refuses or drops
+  the connection is cut off alone while the others keep streaming
+- Tee failure messages and the encoder's progress lines are parsed into
+  per-target health, which SimulcastService records
+- The tee also writes an MPEG-TS copy of the output to a local UDP tap
+  (multicast by default, so any number of readers can join). A target that
+  failed, or was added later, is re-added by a stream-copy relay from the
+  tap, without restarting the encode
+
+Sessions are owned by the process that started them (see
+get_simulcast_supervisor).
+
+Requirements: 9.2, 9.3, 9.4
+"""
+
+import logging
+import re
+import subprocess
+import threading
+import uuid
+from dataclasses import dataclass, replace
+from typing import Callable, Iterable, Optional
+
+from app.core.config import settings
+from app.core.metrics import (
+    SIMULCAST_ENCODERS_ACTIVE,
+    SIMULCAST_OUTPUTS_ACTIVE,
+    SIMULCAST_TARGET_FAILURES_TOTAL,
+    SIMULCAST_TARGET_READDS_TOTAL,
+)
+from app.modules.stream.ffmpeg_builder import FFmpegCommandBuilder, FFmpegOutputParser
+from app.modules.stream.stream_job_models import EncodingMode, LoopMode
+
+logger = logging.getLogger(__name__)
+
+# MPEG-TS packets per UDP datagram on the tap (7 x 188 bytes)
+TAP_PACKET_SIZE = 1316
+
+# Relays give up on a tap that has been silent this long (microseconds)
+TAP_READ_TIMEOUT_US = 10_000_000
+
+# Seconds a process gets to exit after SIGTERM before it is killed
+STOP_TIMEOUT_SECONDS = 10
+
+
+class SimulcastError(Exception):
+    """A simulcast could not be started or changed."""
+    pass
+
+
+@dataclass(frozen=True)
+class SimulcastEncoding:
+    """Output settings of a simulcast encode.
+
+    Field names match StreamJob, so FFmpegCommandBuilder's encoding
+    arguments are built from either.
+    """
+
+    resolution: str = "1080p"
+    target_bitrate: int = 6000  # kbps
+    encoding_mode: str = EncodingMode.CBR.value
+    target_fps: int = 30
+    loop_mode: str = LoopMode.NONE.value
+    loop_count: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class SimulcastOutput:
+    """Where one target is published."""
+
+    target_id: uuid.UUID
+    url: str
+
+
+@dataclass
+class TargetHealth:
+    """Last known state of one target's output."""
+
+    target_id: uuid.UUID
+    alive: bool = True
+    relayed: bool = False  # fed by a relay from the tap instead of the tee
+    bitrate_kbps: int = 0
+    frame_rate: Optional[float] = None
+    dropped_frames: int = 0
+    error: Optional[str] = None
+
+
+def output_url(rtmp_url: str, stream_key: Optional[str]) -> str:
+    """Publish URL of a target, as FFmpegCommandBuilder builds it for jobs."""
+    rtmp_url = rtmp_url.rstrip("/")
+    return f"{rtmp_url}/{stream_key}" if stream_key else rtmp_url
+
+
+def escape_tee_url(url: str) -> str:
+    """Escape a URL for use as a tee slave (backslash, quote and '|' are special)."""
+    return url.replace("\\", "\\\\").replace("'", "\\'").replace("|", "\\|")
+
+
+def tee_slave(url: str, format_name: str = "flv") -> str:
+    return f"[f={format_name}:onfail=ignore]{escape_tee_url(url)}"
+
+
+def tap_urls(host: str, port: int) -> tuple[str, str]:
+    """(writer, reader) URLs of a local UDP tap."""
+    writer = f"udp://{host}:{port}?pkt_size={TAP_PACKET_SIZE}&ttl=0"
+    reader = f"udp://{host}:{port}?reuse=1&overrun_nonfatal=1&fifo_size=50000&timeout={TAP_READ_TIMEOUT_US}"
+    return writer, reader
+
+
+# ============================================
+# Commands and output parsing
+# ============================================
+
+
+class SimulcastCommandBuilder(FFmpegCommandBuilder):
+    """Build the single-encode tee command and tap relays.
+
+    Requirements: 9.2
+    """
+
+    def build_simulcast_command(
+        self,
+        source: str,
+        encoding: SimulcastEncoding,
+        outputs: list[SimulcastOutput],
+        tap_url: Optional[str] = None,
+        realtime: bool = True,
+    ) -> list[str]:
+        """One decode/encode feeding every target through ``-f tee``.
+
+        Args:
+            source: Input FFmpeg reads (file, URL or ingest stream)
+            encoding: Output settings
+            outputs: Targets, in tee slave order
+            tap_url: Local UDP feed written alongside the targets, last slave
+            realtime: Read the input at native frame rate (files; not live inputs)
+        """
+        cmd = [self.ffmpeg_path, "-stream_loop", self._get_loop_arg(encoding)]
+        if realtime:
+            cmd.append("-re")
+        cmd.extend(["-i", source])
+
+        cmd.extend(self._build_encoding(encoding))
+        # FLV slaves need the codec headers up front, not in the first packets
+        cmd.extend(["-flags", "+global_header"])
+        cmd.extend(["-map", "0:v:0", "-map", "0:a:0?"])
+
+        slaves = [tee_slave(output.url) for output in outputs]
+        if tap_url:
+            slaves.append(tee_slave(tap_url, "mpegts"))
+        cmd.extend(["-f", "tee", "|".join(slaves)])
+        return cmd
+
+    def build_relay_command(self, tap_url: str, url: str) -> list[str]:
+        """Stream copy from the tap to one target."""
+        return [
+            self.ffmpeg_path,
+            "-hide_banner",
+            "-i", tap_url,
+            "-map", "0",
+            "-c", "copy",
+            "-f", "flv",
+            url,
+        ]
+
+
+class TeeOutputParser(FFmpegOutputParser):
+    """Parse tee slave failures on top of the regular progress lines.
+
+    Requirements: 9.3, 9.4
+    """
+
+    # Example: [tee @ 0x5581] Slave muxer #1 failed: Connection refused, continuing with 2/3 slaves.
+    SLAVE_FAILED_PATTERN = re.compile(
+        r"Slave muxer #(\d+) failed(?::\s*(.*?))?(?:, continuing with \d+/\d+ slaves\.?)?\s*$"
+    )
+
+    DROP_PATTERN = re.compile(r"drop=\s*(\d+)")
+
+    def parse_slave_failure(self, line: str) -> Optional[tuple[int, str]]:
+        """(slave index, error) of a failed tee slave, or None."""
+        match = self.SLAVE_FAILED_PATTERN.search(line)
+        if not match:
+            return None
+        return int(match.group(1)), (match.group(2) or "Output failed").strip()
+
+    def parse_dropped(self, line: str) -> Optional[int]:
+        match = self.DROP_PATTERN.search(line)
+        return int(match.group(1)) if match else None
+
+
+# ============================================
+# Sessions
+# ============================================
+
+
+class SimulcastSession:
+    """One running simulcast: an encoder process and relays of re-added targets."""
+
+    def __init__(
+        self,
+        live_event_id: uuid.UUID,
+        source: str,
+        encoding: SimulcastEncoding,
+        outputs: Iterable[SimulcastOutput],
+        tap: Optional[tuple[str, str]] = None,
+        builder: Optional[SimulcastCommandBuilder] = None,
+        popen: Callable[..., subprocess.Popen] = subprocess.Popen,
+        realtime: bool = True,
+    ):
+        self.live_event_id = live_event_id
+        self.source = source
+        self.encoding = encoding
+        self.outputs = list(outputs)
+        self.tap_writer, self.tap_reader = tap or (None, None)
+        self.builder = builder or SimulcastCommandBuilder()
+        self.parser = TeeOutputParser()
+        self.realtime = realtime
+        self.monitor = None  # health sync task, set by SimulcastService
+        self._popen = popen
+        self._lock = threading.Lock()
+        self._slots = {index: output.target_id for index, output in enumerate(self.outputs)}
+        self._tap_slot = len(self.outputs) if self.tap_writer else None
+        self._tap_alive = self.tap_writer is not None
+        self._health = {output.target_id: TargetHealth(output.target_id) for output in self.outputs}
+        self._encoder: Optional[subprocess.Popen] = None
+        self._relays: dict[uuid.UUID, subprocess.Popen] = {}
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        """Start the encode.
+
+        Raises:
+            SimulcastError: If FFmpeg cannot be started
+        """
+        cmd = self.builder.build_simulcast_command(
+            self.source, self.encoding, self.outputs, self.tap_writer, self.realtime
+        )
+        self._encoder = self._spawn(cmd, self._on_encoder_line, lambda process, code: self._on_encoder_exit(code))
+        SIMULCAST_ENCODERS_ACTIVE.inc()
+        SIMULCAST_OUTPUTS_ACTIVE.inc(len(self.outputs))
+        logger.info(f"Simulcast for event {self.live_event_id} started with {len(self.outputs)} targets")
+
+    def is_running(self) -> bool:
+        return self._encoder is not None and self._encoder.poll() is None
+
+    def stop(self) -> None:
+        """Stop relays and the encode."""
+        with self._lock:
+            relays = list(self._relays.values())
+            self._relays.clear()
+        for process in relays + ([self._encoder] if self._encoder else []):
+            _terminate(process)
+
+    # ------------------------------------------------------------------
+    # Targets
+    # ------------------------------------------------------------------
+
+    def readd(self, target_id: uuid.UUID, url: str) -> None:
+        """Feed a target again from the tap, without restarting the encode.
+
+        Works for targets that failed, were relayed before, or were not
+        part of the encode at all.
+
+        Raises:
+            SimulcastError: If the encode or its tap is down, or the target
+                is still fed by the tee
+        """
+        if not self.is_running():
+            raise SimulcastError(f"Simulcast for event {self.live_event_id} is not running")
+        if not self.tap_reader or not self._tap_alive:
+            raise SimulcastError(f"Simulcast for event {self.live_event_id} has no tap to relay from")
+        cmd = self.builder.build_relay_command(self.tap_reader, url)
+        # Holding the lock keeps the old and new relay's exit handlers from
+        # running until the new relay is registered
+        with self._lock:
+            health = self._health.get(target_id)
+            if health and health.alive and not health.relayed:
+                raise SimulcastError(f"Target {target_id} is still streaming")
+            previous = self._relays.pop(target_id, None)
+            if previous:
+                _terminate(previous)
+            self._relays[target_id] = self._spawn(
+                cmd,
+                lambda line: self._on_relay_line(target_id, line),
+                lambda process, code: self._on_relay_exit(target_id, process, code),
+            )
+            was_alive = bool(health and health.alive)
+            self._health[target_id] = TargetHealth(target_id, relayed=True)
+        if not was_alive:
+            SIMULCAST_OUTPUTS_ACTIVE.inc()
+        SIMULCAST_TARGET_READDS_TOTAL.inc()
+        logger.info(f"Re-added simulcast target {target_id} to event {self.live_event_id}")
+
+    def health(self) -> dict[uuid.UUID, TargetHealth]:
+        """Snapshot of every target's health."""
+        with self._lock:
+            return {target_id: replace(health) for target_id, health in self._health.items()}
+
+    # ------------------------------------------------------------------
+    # Output handling
+    # ------------------------------------------------------------------
+
+    def _on_encoder_line(self, line: str) -> None:
+        failure = self.parser.parse_slave_failure(line)
+        if failure:
+            index, error = failure
+            if index == self._tap_slot:
+                self._tap_alive = False
+                logger.warning(f"Simulcast tap for event {self.live_event_id} failed: {error}")
+            elif index in self._slots:
+                self._mark_failed(self._slots[index], error, relayed=False)
+            return
+
+        metrics = self.parser.parse_line(line)
+        if metrics:
+            dropped = self.parser.parse_dropped(line)
+            with self._lock:
+                for target_id in self._slots.values():
+                    health = self._health[target_id]
+                    if health.alive and not health.relayed:
+                        self._apply(health, metrics, dropped)
+
+    def _on_encoder_exit(self, code: int) -> None:
+        SIMULCAST_ENCODERS_ACTIVE.dec()
+        for target_id in self._slots.values():
+            self._mark_failed(target_id, f"Encoder exited with code {code}", relayed=False)
+        logger.info(f"Simulcast encoder for event {self.live_event_id} exited with code {code}")
+
+    def _on_relay_line(self, target_id: uuid.UUID, line: str) -> None:
+        metrics = self.parser.parse_line(line)
+        if metrics:
+            dropped = self.parser.parse_dropped(line)
+            with self._lock:
+                health = self._health.get(target_id)
+                if health and health.relayed:
+                    self._apply(health, metrics, dropped)
+        elif self.parser.is_connection_error(line):
+            with self._lock:
+                health = self._health.get(target_id)
+                if health and health.relayed:
+                    health.error = line.strip()
+
+    def _on_relay_exit(self, target_id: uuid.UUID, process: subprocess.Popen, code: int) -> None:
+        with self._lock:
+            if self._relays.get(target_id) is not process:
+                return  # stopped, or replaced by a newer relay
+            del self._relays[target_id]
+        self._mark_failed(target_id, f"Relay exited with code {code}", relayed=True)
+
+    def _mark_failed(self, target_id: uuid.UUID, error: str, relayed: bool) -> None:
+        with self._lock:
+            health = self._health.get(target_id)
+            if not health or not health.alive or health.relayed != relayed:
+                return
+            health.alive = False
+            health.bitrate_kbps = 0
+            health.error = health.error if relayed and health.error else error
+        SIMULCAST_OUTPUTS_ACTIVE.dec()
+        SIMULCAST_TARGET_FAILURES_TOTAL.inc()
+        logger.warning(f"Simulcast target {target_id} of event {self.live_event_id} failed: {error}")
+
+    @staticmethod
+    def _apply(health: TargetHealth, metrics, dropped: Optional[int]) -> None:
+        health.bitrate_kbps = metrics.bitrate // 1000
+        health.frame_rate = metrics.fps
+        if dropped is not None:
+            health.dropped_frames = dropped
+
+    def _spawn(
+        self,
+        cmd: list[str],
+        on_line: Callable[[str], None],
+        on_exit: Callable[[subprocess.Popen, int], None],
+    ) -> subprocess.Popen:
+        """Start a process and hand its stderr lines to on_line on a reader thread."""
+        try:
+            process = self._popen(
+                cmd,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                text=True,
+                errors="replace",
+            )
+        except OSError as e:
+            raise SimulcastError(f"Failed to start FFmpeg: {e}")
+
+        def read() -> None:
+            # Text mode splits FFmpeg's \r-terminated progress lines too
+            for line in process.stderr:
+                try:
+                    on_line(line)
+                except Exception as e:
+                    logger.debug(f"Failed to parse simulcast output {line!r}: {e}")
+            on_exit(process, process.wait())
+
+        threading.Thread(target=read, name=f"simulcast-{self.live_event_id}", daemon=True).start()
+        return process
+
+
+def _terminate(process: subprocess.Popen) -> None:
+    if process.poll() is not None:
+        return
+    process.terminate()
+    try:
+        process.wait(timeout=STOP_TIMEOUT_SECONDS)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+class SimulcastSupervisor:
+    """Simulcast sessions owned by this process, one per live event."""
+
+    def __init__(self, tap_host: Optional[str] = None, tap_port_base: Optional[int] = None):
+        self.tap_host = settings.SIMULCAST_TAP_HOST if tap_host is None else tap_host
+        self.tap_port_base = tap_port_base or settings.SIMULCAST_TAP_PORT_BASE
+        self._sessions: dict[uuid.UUID, SimulcastSession] = {}
+        self._ports: dict[uuid.UUID, int] = {}
+        self._lock = threading.Lock()
+
+    def start(
+        self,
+        live_event_id: uuid.UUID,
+        source: str,
+        encoding: SimulcastEncoding,
+        outputs: Iterable[SimulcastOutput],
+        **session_args,
+    ) -> SimulcastSession:
+        """Start a simulcast, replacing one already running for the event.
+
+        Raises:
+            SimulcastError: If FFmpeg cannot be started
+        """
+        self.stop(live_event_id)
+        tap = None
+        if self.tap_host:
+            tap = tap_urls(self.tap_host, self._allocate_port(live_event_id))
+        session = SimulcastSession(live_event_id, source, encoding, outputs, tap=tap, **session_args)
+        try:
+            session.start()
+        except SimulcastError:
+            self._release(live_event_id)
+            raise
+        with self._lock:
+            self._sessions[live_event_id] = session
+        return session
+
+    def get(self, live_event_id: uuid.UUID) -> Optional[SimulcastSession]:
+        with self._lock:
+            return self._sessions.get(live_event_id)
+
+    def stop(self, live_event_id: uuid.UUID) -> bool:
+        """Stop an event's simulcast; False if none runs here."""
+        with self._lock:
+            session = self._sessions.pop(live_event_id, None)
+        self._release(live_event_id)
+        if session is None:
+            return False
+        if session.monitor is not None:
+            session.monitor.cancel()
+        session.stop()
+        return True
+
+    def _allocate_port(self, live_event_id: uuid.UUID) -> int:
+        with self._lock:
+            used = set(self._ports.values())
+            port = self.tap_port_base
+            while port in used:
+                port += 2  # MPEG-TS over UDP is conventionally kept off odd (RTCP) ports
+            self._ports[live_event_id] = port
+            return port
+
+    def _release(self, live_event_id: uuid.UUID) -> None:
+        with self._lock:
+            self._ports.pop(live_event_id, None)
+
+
+_supervisor: Optional[SimulcastSupervisor] = None
+
+
+def get_simulcast_supervisor() -> SimulcastSupervisor:
+    """Get this process's simulcast supervisor."""
+    global _supervisor
+    if _supervisor is None:
+        _supervisor = SimulcastSupervisor()
+    return _supervisor
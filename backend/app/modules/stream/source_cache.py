@@ -0,0 +1,396 @@
+"""Node-local disk cache for cloud-stored stream sources.
+
+With cloud storage, FFmpeg used to read stream sources through presigned
+URLs, so a 24/7 looping stream re-downloaded the same video from S3/R2 on
+every loop and died on any network hiccup mid-read. Sources are now copied
+once to local disk and streamed from there.
+
+- LRU on disk with a byte budget; the least recently used files go first
+- Leases act as reference counts: a file leased by a stream is never
+  evicted. Leases are files, so every worker process on the node sees them
+- Downloads of one key are serialized across processes; a second caller
+  waits and then hits
+- Sources are fetched ahead of a scheduled start. A playlist start waits
+  for every cacheable item, downloading several at once: FFmpeg reads the
+  concat list once and loops over it as is, so an item left on a presigned
+  URL would be downloaded again on every loop
+
+Requirements: 11.1
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: locks only cover threads of this process
+    fcntl = None
+
+from app.core.config import settings
+from app.core.metrics import (
+    STREAM_SOURCE_CACHE_EVICTIONS_TOTAL,
+    STREAM_SOURCE_CACHE_FILL_BYTES_TOTAL,
+    STREAM_SOURCE_CACHE_HIT_RATIO,
+    STREAM_SOURCE_CACHE_REQUESTS_TOTAL,
+    STREAM_SOURCE_CACHE_SERVED_BYTES_TOTAL,
+    STREAM_SOURCE_CACHE_SIZE_BYTES,
+)
+
+logger = logging.getLogger(__name__)
+
+# Leases younger than this survive release_inactive(), covering a job that
+# has leased its sources but is not yet visible as active
+LEASE_GRACE_SECONDS = 120
+
+# A scheduled stream's prefetch is queued at most once per this many seconds
+PREFETCH_CLAIM_SECONDS = 300
+
+PART_SUFFIX = ".part"
+
+
+class SourceCacheError(Exception):
+    """A source could not be cached."""
+    pass
+
+
+class StreamSourceCache:
+    """Size-bounded LRU of stream sources on local disk.
+
+    Layout under root:
+        objects/<digest><ext>        cached file (mtime = last use)
+        objects/<digest><ext>.part   download in progress, pre-sized
+        leases/<digest><ext>@<job>   a stream holds the file
+        leases/<job>.reads           last FFmpeg read counter sample
+        locks/                       per-entry and global lock files
+    """
+
+    def __init__(self, root: str, max_bytes: int, storage=None):
+        # Absolute, since FFmpeg resolves concat entries against the concat file's directory
+        self.root = Path(root).resolve()
+        self.objects = self.root / "objects"
+        self.leases = self.root / "leases"
+        self.locks = self.root / "locks"
+        for directory in (self.objects, self.leases, self.locks):
+            directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._storage = storage
+        self._thread_locks: dict[str, threading.Lock] = {}
+        self._thread_locks_guard = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def storage(self):
+        if self._storage is None:
+            from app.core.storage import get_storage
+            self._storage = get_storage()
+        return self._storage
+
+    # ------------------------------------------------------------------
+    # Locking
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def _locked(self, name: str = "cache", blocking: bool = True) -> Iterator[bool]:
+        """Hold a named lock across threads and processes; yields whether it was taken."""
+        with self._thread_locks_guard:
+            thread_lock = self._thread_locks.setdefault(name, threading.Lock())
+        if not thread_lock.acquire(blocking):
+            yield False
+            return
+        try:
+            if fcntl is None:
+                yield True
+                return
+            with open(self.locks / f"{name}.lock", "a") as handle:
+                try:
+                    fcntl.flock(handle, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+                except BlockingIOError:
+                    yield False
+                    return
+                try:
+                    yield True
+                finally:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+        finally:
+            thread_lock.release()
+
+    # ------------------------------------------------------------------
+    # Entries
+    # ------------------------------------------------------------------
+
+    def path_for(self, key: str) -> Path:
+        """Local path a storage key is cached at."""
+        digest = hashlib.sha256(key.encode()).hexdigest()[:32]
+        return self.objects / f"{digest}{Path(key).suffix.lower()}"
+
+    def is_cached(self, key: str) -> bool:
+        return self.path_for(key).is_file()
+
+    def usage_bytes(self) -> int:
+        """Bytes on disk, counting downloads in progress at their full size."""
+        total = 0
+        for entry in self.objects.iterdir():
+            try:
+                total += entry.stat().st_size
+            except FileNotFoundError:
+                # A download finished (.part renamed) or a file was evicted since listing
+                continue
+        return total
+
+    def get(self, key: str, job_id: Optional[str] = None) -> Optional[str]:
+        """Path of a cached source, leased to job_id; None on a miss."""
+        path = self.path_for(key)
+        with self._locked():
+            if not path.is_file():
+                return None
+            if job_id:
+                self._lease(path, job_id)
+            os.utime(path)
+            size = path.stat().st_size
+        self._record(hit=True)
+        logger.debug(f"Stream source cache hit: {key} ({size} bytes)")
+        return str(path)
+
+    def fetch(self, key: str, job_id: Optional[str] = None, wait: bool = True) -> Optional[str]:
+        """Path of a source, downloading it on a miss.
+
+        Args:
+            key: Storage key of the source
+            job_id: Stream job to lease the file to
+            wait: Wait for a download of the same key in another process.
+                When False, return None instead of waiting.
+
+        Raises:
+            SourceCacheError: If the source is missing, larger than the
+                cache, does not fit beside leased files, or fails to download
+        """
+        cached = self.get(key, job_id)
+        if cached:
+            return cached
+
+        path = self.path_for(key)
+        with self._locked(path.name, blocking=wait) as acquired:
+            if not acquired:
+                return None
+            # Another process may have finished the download while we waited
+            cached = self.get(key, job_id)
+            if cached:
+                return cached
+
+            size = self.storage.get_size(key)
+            if size is None:
+                raise SourceCacheError(f"Source not found in storage: {key}")
+            if size > self.max_bytes:
+                raise SourceCacheError(
+                    f"Source {key} ({size} bytes) exceeds the cache budget of {self.max_bytes} bytes"
+                )
+
+            part = path.with_name(path.name + PART_SUFFIX)
+            with self._locked():
+                self._evict_for(size)
+                # Reserve the space so concurrent downloads see it as used
+                with open(part, "wb") as f:
+                    f.truncate(size)
+                if job_id:
+                    self._lease(path, job_id)
+
+            try:
+                if not self.storage.download(key, str(part)):
+                    raise SourceCacheError(f"Failed to download stream source: {key}")
+                os.replace(part, path)
+            except BaseException:
+                part.unlink(missing_ok=True)
+                if job_id:
+                    (self.leases / f"{path.name}@{job_id}").unlink(missing_ok=True)
+                raise
+
+        self._record(hit=False, filled=size)
+        logger.info(f"Cached stream source {key} ({size} bytes)")
+        return str(path)
+
+    def _evict_for(self, needed: int) -> None:
+        """Evict unleased files, oldest use first, until needed bytes fit. Caller holds the cache lock."""
+        usage = self.usage_bytes()
+        if usage + needed <= self.max_bytes:
+            return
+
+        leased = self._leased_names()
+        candidates = sorted(
+            (
+                entry for entry in self.objects.iterdir()
+                if entry.is_file() and not entry.name.endswith(PART_SUFFIX) and entry.name not in leased
+            ),
+            key=lambda entry: entry.stat().st_mtime,
+        )
+        for entry in candidates:
+            if usage + needed <= self.max_bytes:
+                break
+            size = entry.stat().st_size
+            entry.unlink(missing_ok=True)
+            usage -= size
+            STREAM_SOURCE_CACHE_EVICTIONS_TOTAL.inc()
+            logger.info(f"Evicted stream source {entry.name} ({size} bytes)")
+
+        STREAM_SOURCE_CACHE_SIZE_BYTES.set(usage)
+        if usage + needed > self.max_bytes:
+            raise SourceCacheError(
+                f"Stream source cache full: {usage} of {self.max_bytes} bytes held by running streams"
+            )
+
+    def _record(self, hit: bool, filled: int = 0) -> None:
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+            STREAM_SOURCE_CACHE_FILL_BYTES_TOTAL.inc(filled)
+            STREAM_SOURCE_CACHE_SIZE_BYTES.set(self.usage_bytes())
+        STREAM_SOURCE_CACHE_REQUESTS_TOTAL.labels(result="hit" if hit else "miss").inc()
+        STREAM_SOURCE_CACHE_HIT_RATIO.set(self.hits / (self.hits + self.misses))
+
+    def stats(self) -> dict:
+        """Hit/miss counts of this process and current disk usage."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "size_bytes": self.usage_bytes(),
+            "max_bytes": self.max_bytes,
+        }
+
+    # ------------------------------------------------------------------
+    # Leases
+    # ------------------------------------------------------------------
+
+    def _lease(self, path: Path, job_id: str) -> None:
+        (self.leases / f"{path.name}@{job_id}").touch()
+
+    def _leased_names(self) -> set[str]:
+        return {lease.name.rsplit("@", 1)[0] for lease in self.leases.glob("*@*")}
+
+    def acquire(self, key: str, job_id: str) -> str:
+        """Lease a source to a stream before it is downloaded; returns its path."""
+        path = self.path_for(key)
+        with self._locked():
+            self._lease(path, job_id)
+        return str(path)
+
+    def release(self, job_id: str) -> int:
+        """Drop every lease a stream holds. Returns the number released."""
+        with self._locked():
+            leases = list(self.leases.glob(f"*@{job_id}"))
+            for lease in leases:
+                lease.unlink(missing_ok=True)
+            (self.leases / f"{job_id}.reads").unlink(missing_ok=True)
+        return len(leases)
+
+    def release_inactive(self, active_job_ids: Iterable[str], grace_seconds: float = LEASE_GRACE_SECONDS) -> int:
+        """Drop leases of streams that are no longer active (crashed, failed)."""
+        active = set(active_job_ids)
+        cutoff = time.time() - grace_seconds
+        released = 0
+        with self._locked():
+            for lease in self.leases.glob("*@*"):
+                job_id = lease.name.rsplit("@", 1)[1]
+                if job_id not in active and lease.stat().st_mtime < cutoff:
+                    lease.unlink(missing_ok=True)
+                    (self.leases / f"{job_id}.reads").unlink(missing_ok=True)
+                    released += 1
+        return released
+
+    def leased_paths(self, job_id: str) -> list[str]:
+        return [str(self.objects / lease.name.rsplit("@", 1)[0]) for lease in self.leases.glob(f"*@{job_id}")]
+
+    def claim_prefetch(self, job_id: str, ttl: float = PREFETCH_CLAIM_SECONDS) -> bool:
+        """True if no prefetch for this stream was queued within ttl."""
+        marker = self.locks / f"prefetch-{job_id}.claim"
+        with self._locked():
+            if marker.exists() and time.time() - marker.stat().st_mtime < ttl:
+                return False
+            marker.touch()
+            return True
+
+    # ------------------------------------------------------------------
+    # Egress accounting
+    # ------------------------------------------------------------------
+
+    def track_reads(self, job_id: str, pid: int) -> None:
+        """Start counting what a stream fully served from cache reads."""
+        (self.leases / f"{job_id}.reads").write_text(f"{pid}:0")
+
+    def record_reads(self, job_id: str, pid: int, read_bytes: int) -> int:
+        """Count bytes FFmpeg read since the last sample as served from cache.
+
+        Only streams registered with track_reads() are counted. Without the
+        cache each of these bytes would have been object storage egress.
+        """
+        marker = self.leases / f"{job_id}.reads"
+        with self._locked():
+            try:
+                last_pid, last = marker.read_text().split(":")
+            except (FileNotFoundError, ValueError):
+                return 0
+            last_bytes = int(last) if int(last_pid) == pid else 0
+            delta = max(read_bytes - last_bytes, 0)
+            marker.write_text(f"{pid}:{read_bytes}")
+        STREAM_SOURCE_CACHE_SERVED_BYTES_TOTAL.inc(delta)
+        return delta
+
+
+def resolve_sources(
+    cache: StreamSourceCache,
+    job_id: str,
+    keys: list[str],
+    concurrency: int,
+) -> list[Optional[str]]:
+    """Map a starting stream's storage keys to cached paths.
+
+    Every source is downloaded before returning, up to concurrency at a
+    time, so FFmpeg reads nothing but local files for the life of the
+    stream. A None path means the source could not be cached (missing,
+    larger than the cache, or no room beside leased files) and should be
+    read from storage directly.
+
+    Returns:
+        Paths in key order
+    """
+
+    def fetch(key: str) -> Optional[str]:
+        try:
+            return cache.fetch(key, job_id)
+        except SourceCacheError as e:
+            logger.warning(f"Streaming {key} from storage: {e}")
+            return None
+
+    unique = list(dict.fromkeys(keys))
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        local = dict(zip(unique, pool.map(fetch, unique)))
+    return [local[key] for key in keys]
+
+
+def source_cache_enabled() -> bool:
+    """Sources are cached only when they live in cloud storage."""
+    from app.core.storage import is_cloud_storage
+    return settings.STREAM_SOURCE_CACHE_ENABLED and is_cloud_storage()
+
+
+_stream_source_cache: Optional[StreamSourceCache] = None
+
+
+def get_stream_source_cache() -> StreamSourceCache:
+    """Get this node's stream source cache."""
+    global _stream_source_cache
+    if _stream_source_cache is None:
+        _stream_source_cache = StreamSourceCache(
+            settings.STREAM_SOURCE_CACHE_DIR,
+            settings.STREAM_SOURCE_CACHE_MAX_BYTES,
+        )
+    return _stream_source_cache
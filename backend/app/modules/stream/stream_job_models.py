@@ -1,6 +1,8 @@
 """Stream Job models for Video-to-Live streaming (24/7 Looping).
 
-Implements StreamJob and StreamJobHealth models for FFmpeg-based streaming.
+Implements StreamJob and StreamJobHealth models for FFmpeg-based streaming,
+plus the 1-minute and 1-hour health rollup tiers and stream-ready
+renditions of library videos.
 Requirements: 1.1, 1.6, 1.7, 4.2, 8.1
 """
 
@@ -9,7 +11,7 @@ from datetime import datetime
 from enum import Enum
 from typing import Optional
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, String, Text, Float
+from sqlalchemy import BigInteger, Boolean, DateTime, ForeignKey, Integer, String, Text, Float, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
@@ -181,6 +183,9 @@ class StreamJob(Base):
 
     # Process tracking (Requirements: 1.2, 1.3, 3.2)
     pid: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    node_id: Mapped[Optional[str]] = mapped_column(
+        String(255), nullable=True, index=True
+    )  # Streaming node whose supervisor owns the process (pid is local to it)
     status: Mapped[str] = mapped_column(
         String(50), default=StreamJobStatus.PENDING.value, index=True
     )
@@ -535,6 +540,7 @@ class StreamJob(Base):
             "scheduled_start_at": self.scheduled_start_at.isoformat() if self.scheduled_start_at else None,
             "scheduled_end_at": self.scheduled_end_at.isoformat() if self.scheduled_end_at else None,
             "pid": self.pid,
+            "node_id": self.node_id,
             "status": self.status,
             "actual_start_at": self.actual_start_at.isoformat() if self.actual_start_at else None,
             "actual_end_at": self.actual_end_at.isoformat() if self.actual_end_at else None,
@@ -707,3 +713,107 @@ class StreamJobHealth(Base):
 
     def __repr__(self) -> str:
         return f"<StreamJobHealth(id={self.id}, job_id={self.stream_job_id}, bitrate={self.bitrate})>"
+
+
+# ============================================
+# Health Rollups (Requirements: 4.7, 8.5)
+# ============================================
+
+
+class _HealthRollupColumns:
+    """Aggregates of raw health samples over one time bucket.
+
+    Shared by the 1-minute and 1-hour tiers. Sums and sample counts are
+    stored rather than averages so buckets can be merged exactly.
+    """
+
+    # "stream_job" (stream_job_health) or "stream_session" (stream_health_logs)
+    source: Mapped[str] = mapped_column(String(20), primary_key=True)
+    series_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    # Naive UTC start of the bucket; the tables are range-partitioned on it
+    bucket_start: Mapped[datetime] = mapped_column(DateTime(timezone=False), primary_key=True)
+
+    samples: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    bitrate_min: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    bitrate_max: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    bitrate_sum: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+    fps_samples: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    fps_min: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    fps_max: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    fps_sum: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+
+    dropped_frames_min: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    dropped_frames_max: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    dropped_frames_sum: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+    cpu_percent_max: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    memory_mb_max: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    alert_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class StreamHealthMinute(_HealthRollupColumns, Base):
+    """1-minute health rollups, partitioned by day."""
+
+    __tablename__ = "stream_health_1m"
+
+
+class StreamHealthHour(_HealthRollupColumns, Base):
+    """1-hour health rollups, partitioned by month."""
+
+    __tablename__ = "stream_health_1h"
+
+
+# ============================================
+# Stream-ready Renditions (Requirements: 10.1, 10.2, 10.3, 10.4)
+# ============================================
+
+
+class RenditionStatus(str, Enum):
+    """Preparation state of a stream-ready rendition."""
+    PENDING = "pending"
+    READY = "ready"
+    FAILED = "failed"
+
+
+class StreamRendition(Base):
+    """A library video encoded once to a stream's output parameters.
+
+    Streams whose sources all have a ready rendition for their parameters
+    are sent with stream copy instead of a live re-encode. spec_key is the
+    digest of the encoding parameters (see renditions.RenditionSpec).
+    """
+
+    __tablename__ = "stream_renditions"
+    __table_args__ = (
+        UniqueConstraint("source_key", "spec_key", name="uq_stream_renditions_source_spec"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    video_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("videos.id", ondelete="CASCADE"),
+        nullable=True,
+        index=True,
+    )
+    source_key: Mapped[str] = mapped_column(String(512), nullable=False)
+    spec_key: Mapped[str] = mapped_column(String(64), nullable=False)
+    storage_key: Mapped[str] = mapped_column(String(512), nullable=False)
+    status: Mapped[str] = mapped_column(
+        String(20), nullable=False, default=RenditionStatus.PENDING.value
+    )
+    size_bytes: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+    def __repr__(self) -> str:
+        return f"<StreamRendition(source_key={self.source_key}, spec_key={self.spec_key}, status={self.status})>"
@@ -8,7 +8,7 @@ import uuid
 from datetime import datetime, timedelta
 from typing import Optional, Sequence
 
-from sqlalchemy import select, func, and_, or_
+from sqlalchemy import select, func, and_, or_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -189,6 +189,115 @@ class StreamJobRepository:
         result = await self.session.execute(query)
         return result.scalars().all()
 
+    async def get_jobs_with_deadlines(self, before: datetime) -> Sequence[StreamJob]:
+        """Get jobs with a start or stop deadline due before a time.
+
+        Used to re-seed the deadline scheduler (Requirements: 1.2, 1.3).
+
+        Args:
+            before: Upper bound for scheduled start/end times
+
+        Returns:
+            Sequence[StreamJob]: Scheduled jobs starting, and live jobs ending, before the bound
+        """
+        query = select(StreamJob).where(
+            or_(
+                and_(
+                    StreamJob.status == StreamJobStatus.SCHEDULED.value,
+                    StreamJob.scheduled_start_at <= before,
+                ),
+                and_(
+                    StreamJob.status.in_([
+                        StreamJobStatus.SCHEDULED.value,
+                        StreamJobStatus.STARTING.value,
+                        StreamJobStatus.RUNNING.value,
+                    ]),
+                    StreamJob.scheduled_end_at.isnot(None),
+                    StreamJob.scheduled_end_at <= before,
+                ),
+            )
+        )
+
+        result = await self.session.execute(query)
+        return result.scalars().all()
+
+    async def claim_scheduled_start(self, job_id: uuid.UUID) -> bool:
+        """Move a due scheduled job to STARTING, at most once.
+
+        The status check and the update are one statement, so concurrent
+        schedulers cannot both claim the same start.
+
+        Args:
+            job_id: Stream job UUID
+
+        Returns:
+            bool: True if this caller claimed the start
+        """
+        now = to_naive_utc(utcnow())
+        result = await self.session.execute(
+            update(StreamJob)
+            .where(
+                and_(
+                    StreamJob.id == job_id,
+                    StreamJob.status == StreamJobStatus.SCHEDULED.value,
+                    StreamJob.scheduled_start_at <= now,
+                )
+            )
+            .values(status=StreamJobStatus.STARTING.value)
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.commit()
+        return result.rowcount == 1
+
+    async def claim_scheduled_stop(self, job_id: uuid.UUID) -> bool:
+        """Move a running job past its end time to STOPPING, at most once.
+
+        Args:
+            job_id: Stream job UUID
+
+        Returns:
+            bool: True if this caller claimed the stop
+        """
+        now = to_naive_utc(utcnow())
+        result = await self.session.execute(
+            update(StreamJob)
+            .where(
+                and_(
+                    StreamJob.id == job_id,
+                    StreamJob.status == StreamJobStatus.RUNNING.value,
+                    StreamJob.scheduled_end_at.isnot(None),
+                    StreamJob.scheduled_end_at <= now,
+                )
+            )
+            .values(status=StreamJobStatus.STOPPING.value)
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.commit()
+        return result.rowcount == 1
+
+    async def release_claim(self, job_id: uuid.UUID, claimed_status: str, previous_status: str) -> bool:
+        """Undo a start or stop claim whose task could not be queued.
+
+        Only a job still in the claimed status is moved back, so a job that
+        moved on meanwhile is left alone.
+
+        Args:
+            job_id: Stream job UUID
+            claimed_status: Status the claim set (STARTING or STOPPING)
+            previous_status: Status to restore
+
+        Returns:
+            bool: True if the claim was undone
+        """
+        result = await self.session.execute(
+            update(StreamJob)
+            .where(and_(StreamJob.id == job_id, StreamJob.status == claimed_status))
+            .values(status=previous_status)
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.commit()
+        return result.rowcount == 1
+
     async def count_active_by_user(self, user_id: uuid.UUID) -> int:
         """Count active stream jobs for a user (for slot management).
         
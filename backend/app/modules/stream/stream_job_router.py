@@ -21,6 +21,7 @@ from app.modules.stream.stream_job_schemas import (
     StreamJobListResponse,
     StreamJobHealthResponse,
     StreamJobHealthListResponse,
+    StreamJobHealthPoint,
     SlotStatusResponse,
     ResourceDashboardResponse,
     StreamJobHistoryItem,
@@ -39,6 +40,7 @@ from app.modules.stream.stream_job_service import (
     InvalidStatusTransitionError,
     StreamNotRunningError,
     StreamAlreadyRunningError,
+    StreamStopFailedError,
 )
 
 
@@ -599,6 +601,11 @@ async def delete_stream_job(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e),
         )
+    except StreamStopFailedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+        )
 
 
 # ============================================
@@ -726,6 +733,11 @@ async def restart_stream_job(
             status_code=status.HTTP_409_CONFLICT,
             detail=str(e),
         )
+    except StreamStopFailedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+        )
 
 
 # ============================================
@@ -737,11 +749,17 @@ async def restart_stream_job(
     "/{job_id}/health",
     response_model=StreamJobHealthListResponse,
     summary="Get health history",
-    description="Get health metrics history for a stream job.",
+    description=(
+        "Get health metrics history for a stream job. Short windows return raw "
+        "samples; longer ones return 1-minute or 1-hour min/avg/max rollups."
+    ),
 )
 async def get_health_history(
     job_id: uuid.UUID,
-    hours: int = Query(24, ge=1, le=168, description="Hours to look back"),
+    hours: int = Query(24, ge=1, le=24 * 365, description="Hours to look back"),
+    resolution: Optional[str] = Query(
+        None, pattern="^(raw|1m|1h)$", description="raw, 1m or 1h (default: picked from the window)"
+    ),
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(100, ge=1, le=500, alias="page_size", description="Items per page"),
     current_user=Depends(get_current_user),
@@ -754,6 +772,7 @@ async def get_health_history(
     Args:
         job_id: Stream job UUID
         hours: Hours to look back
+        resolution: Series resolution, or None to pick one
         page: Page number
         page_size: Items per page
         current_user: Current authenticated user
@@ -763,10 +782,11 @@ async def get_health_history(
         StreamJobHealthListResponse: Health history with pagination
     """
     try:
-        records, total = await service.get_health_history(
+        resolution, records, points, total = await service.get_health_series(
             job_id=job_id,
             user_id=current_user.id,
             hours=hours,
+            resolution=resolution,
             page=page,
             page_size=page_size,
         )
@@ -776,6 +796,8 @@ async def get_health_history(
             total=total,
             page=page,
             page_size=page_size,
+            resolution=resolution,
+            points=[StreamJobHealthPoint.from_point(p) for p in points],
         )
     except StreamJobNotFoundError as e:
         raise HTTPException(
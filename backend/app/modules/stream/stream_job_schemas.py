@@ -277,6 +277,7 @@ class StreamJobResponse(BaseModel):
     
     # Process tracking
     pid: Optional[int] = None
+    node_id: Optional[str] = None
     status: str
     
     # Timing
@@ -343,6 +344,7 @@ class StreamJobResponse(BaseModel):
             scheduled_end_at=ensure_utc(job.scheduled_end_at),
             time_until_start=job.get_time_until_start(),
             pid=job.pid,
+            node_id=job.node_id,
             status=job.status,
             actual_start_at=ensure_utc(job.actual_start_at),
             actual_end_at=ensure_utc(job.actual_end_at),
@@ -434,13 +436,60 @@ class StreamJobHealthResponse(BaseModel):
         )
 
 
+class StreamJobHealthPoint(BaseModel):
+    """Schema for one health history point (a raw sample or a rollup bucket)."""
+    
+    bucket_start: datetime
+    samples: int
+    bitrate_min_kbps: float
+    bitrate_avg_kbps: float
+    bitrate_max_kbps: float
+    fps_min: Optional[float] = None
+    fps_avg: Optional[float] = None
+    fps_max: Optional[float] = None
+    dropped_frames_min: int
+    dropped_frames_avg: float
+    dropped_frames_max: int
+    dropped_frames_total: int
+    cpu_percent_max: Optional[float] = None
+    memory_mb_max: Optional[float] = None
+    alert_count: int = 0
+
+    @classmethod
+    def from_point(cls, point) -> "StreamJobHealthPoint":
+        """Create response from a HealthPoint."""
+        return cls(
+            bucket_start=ensure_utc(point.bucket_start),
+            samples=point.samples,
+            bitrate_min_kbps=point.bitrate_min / 1000,
+            bitrate_avg_kbps=point.bitrate_avg / 1000,
+            bitrate_max_kbps=point.bitrate_max / 1000,
+            fps_min=point.fps_min,
+            fps_avg=point.fps_avg,
+            fps_max=point.fps_max,
+            dropped_frames_min=point.dropped_frames_min,
+            dropped_frames_avg=point.dropped_frames_avg,
+            dropped_frames_max=point.dropped_frames_max,
+            dropped_frames_total=point.dropped_frames_total,
+            cpu_percent_max=point.cpu_percent_max,
+            memory_mb_max=point.memory_mb_max,
+            alert_count=point.alert_count,
+        )
+
+
 class StreamJobHealthListResponse(BaseModel):
-    """Schema for paginated health history."""
+    """Schema for paginated health history.
+    
+    ``points`` holds the series at ``resolution`` (raw, 1m or 1h);
+    ``records`` holds the full raw samples and is empty for rollups.
+    """
     
     records: List[StreamJobHealthResponse]
     total: int
     page: int
     page_size: int
+    resolution: str = "raw"
+    points: List[StreamJobHealthPoint] = []
 
 
 # ============================================
@@ -4,13 +4,24 @@ Implements stream job management, slot checking, and stream control.
 Requirements: 1.1, 1.2, 1.3, 1.5, 5.5, 6.1, 6.2, 6.3, 6.4
 """
 
+import logging
 import os
 import uuid
+from datetime import timedelta
 from typing import Optional, Sequence
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.datetime_utils import utcnow, ensure_utc, to_naive_utc, is_in_future
+from app.modules.stream.deadline_scheduler import clear_job_deadlines, sync_job_deadlines
+from app.modules.stream.health_timeseries import (
+    RAW,
+    SOURCE_STREAM_JOB,
+    HealthHistoryReader,
+    HealthPoint,
+    choose_resolution,
+)
+from app.modules.stream.renditions import RenditionSpec, renditions_enabled
 from app.modules.stream.stream_job_models import (
     StreamJob,
     StreamJobHealth,
@@ -32,6 +43,8 @@ from app.modules.stream.stream_job_schemas import (
     ResourceDashboardResponse,
 )
 
+logger = logging.getLogger(__name__)
+
 
 # ============================================
 # Custom Exceptions
@@ -83,6 +96,11 @@ class StreamAlreadyRunningError(StreamJobServiceError):
     pass
 
 
+class StreamStopFailedError(StreamJobServiceError):
+    """Raised when the stop could not be sent to the job's streaming node."""
+    pass
+
+
 # ============================================
 # Stream Job Service
 # ============================================
@@ -174,7 +192,10 @@ class StreamJobService:
         # Set encrypted stream key
         job.stream_key = request.stream_key
         
-        return await self.job_repo.create(job)
+        job = await self.job_repo.create(job)
+        await sync_job_deadlines(job)
+        self._queue_renditions(job)
+        return job
 
     # ============================================
     # Read Operations
@@ -288,6 +309,8 @@ class StreamJobService:
                 job.max_restarts = request.max_restarts
             return await self.job_repo.update(job)
         
+        spec = RenditionSpec.for_job(job)
+        
         # Update all fields
         if request.title is not None:
             job.title = request.title
@@ -314,7 +337,21 @@ class StreamJobService:
         if request.max_restarts is not None:
             job.max_restarts = request.max_restarts
         
-        return await self.job_repo.update(job)
+        job = await self.job_repo.update(job)
+        await sync_job_deadlines(job)
+        if RenditionSpec.for_job(job) != spec:
+            self._queue_renditions(job)
+        return job
+
+    def _queue_renditions(self, job: StreamJob) -> None:
+        """Have stream-ready renditions of a library-video job prepared.
+        
+        Requirements: 10.1
+        """
+        if not renditions_enabled() or not (job.video_id or job.playlist_id):
+            return
+        from app.modules.stream.stream_job_tasks import prepare_stream_renditions
+        prepare_stream_renditions.delay(str(job.id))
 
     # ============================================
     # Delete Operations
@@ -347,7 +384,9 @@ class StreamJobService:
             )
         
         # If job is in "stopping" status, try to kill the process first
-        if job.status == StreamJobStatus.STOPPING.value and job.pid:
+        if job.status == StreamJobStatus.STOPPING.value and job.node_id:
+            await self._stop_on_node(job)
+        elif job.status == StreamJobStatus.STOPPING.value and job.pid:
             try:
                 import psutil
                 process = psutil.Process(job.pid)
@@ -355,6 +394,7 @@ class StreamJobService:
             except Exception:
                 pass  # Process may already be dead
         
+        await clear_job_deadlines(job_id)
         return await self.job_repo.delete(job_id)
 
     # ============================================
@@ -417,7 +457,9 @@ class StreamJobService:
         from app.modules.stream.stream_job_tasks import start_ffmpeg_worker
         start_ffmpeg_worker.delay(str(job.id))
         
-        return await self.job_repo.update(job)
+        job = await self.job_repo.update(job)
+        await sync_job_deadlines(job)
+        return job
 
     async def stop_stream_job(
         self,
@@ -474,8 +516,10 @@ class StreamJobService:
         
         # If running or stopping, force stop first
         if job.is_active() or job.status == StreamJobStatus.STOPPING.value:
-            # Kill process directly if PID exists
-            if job.pid:
+            # Kill process directly if PID exists (local to the node that runs it)
+            if job.node_id:
+                await self._stop_on_node(job)
+            elif job.pid:
                 try:
                     import psutil
                     process = psutil.Process(job.pid)
@@ -487,6 +531,7 @@ class StreamJobService:
             # Force status to stopped
             job.status = StreamJobStatus.STOPPED.value
             job.pid = None
+            job.node_id = None
             job.is_stream_key_locked = False
             await self.job_repo.update(job)
         
@@ -499,6 +544,19 @@ class StreamJobService:
         # Start again
         return await self.start_stream_job(job_id, user_id)
 
+    async def _stop_on_node(self, job: StreamJob) -> None:
+        """Have the supervisor of the job's streaming node stop its FFmpeg.
+
+        Raises:
+            StreamStopFailedError: If the stop command could not be sent
+        """
+        from app.modules.stream.supervisor import STOP_STREAM, StreamCommand, send_stream_command
+        try:
+            await send_stream_command(StreamCommand(STOP_STREAM, str(job.id)), node_id=job.node_id)
+        except Exception as e:
+            logger.error(f"Could not send stop for job {job.id} to node {job.node_id}: {e}")
+            raise StreamStopFailedError(f"Could not reach streaming node {job.node_id}") from e
+
     # ============================================
     # Slot Management (Requirements: 6.1, 6.2, 6.3, 6.4)
     # ============================================
@@ -690,6 +748,44 @@ class StreamJobService:
             page_size=page_size,
         )
 
+    async def get_health_series(
+        self,
+        job_id: uuid.UUID,
+        user_id: uuid.UUID,
+        hours: int = 24,
+        resolution: Optional[str] = None,
+        page: int = 1,
+        page_size: int = 100,
+    ) -> tuple[str, Sequence[StreamJobHealth], list[HealthPoint], int]:
+        """Get health history at the resolution that suits the window.
+        
+        Requirements: 4.7
+        
+        Args:
+            job_id: Stream job UUID
+            user_id: User UUID for authorization
+            hours: Hours to look back
+            resolution: raw, 1m or 1h; picked from the window when None
+            page: Page number
+            page_size: Items per page
+            
+        Returns:
+            tuple: Resolution, raw records (raw only), points and total
+        """
+        end = to_naive_utc(utcnow())
+        start = end - timedelta(hours=hours)
+        resolution = resolution or choose_resolution(start, end, now=end)
+        
+        if resolution == RAW:
+            records, total = await self.get_health_history(job_id, user_id, hours, page, page_size)
+            return resolution, records, [HealthPoint.from_job_sample(r) for r in records], total
+        
+        await self.get_stream_job(job_id, user_id)
+        points, total = await HealthHistoryReader(self.session).get_points(
+            SOURCE_STREAM_JOB, job_id, start, end, resolution, page, page_size
+        )
+        return resolution, [], points, total
+
     async def acknowledge_alert(
         self,
         health_id: uuid.UUID,
@@ -1,7 +1,7 @@
 """Celery tasks for Stream Job FFmpeg worker management.
 
 Implements FFmpeg subprocess management, health monitoring, and scheduling.
-Requirements: 1.2, 1.3, 3.2, 3.3, 3.4, 3.5, 3.6, 4.1, 7.2
+Requirements: 1.2, 1.3, 3.2, 3.3, 3.4, 3.5, 3.6, 4.1, 7.2, 10.1
 """
 
 import asyncio
@@ -10,14 +10,19 @@ import os
 import signal
 import subprocess
 import time
-from datetime import datetime
+import uuid
+from dataclasses import replace
+from datetime import datetime, timedelta
 from typing import Optional
 
 import psutil
 from celery import shared_task
 
 from app.core.celery_app import celery_app
+from app.core.task_loop import run_async
+from app.core.config import settings
 from app.core.database import celery_session_maker
+from app.core.metrics import STREAM_JOB_STARTS_TOTAL
 from app.core.datetime_utils import utcnow, to_naive_utc
 from app.modules.stream.stream_job_models import (
     StreamJob,
@@ -33,17 +38,48 @@ from app.modules.stream.stream_job_repository import (
 def _run_async(coro):
     """Run async coroutine in Celery task context.
     
-    Uses asyncio.run() which creates a fresh event loop for each task.
-    Combined with NullPool in celery_session_maker, this avoids
-    connection pool conflicts across different event loops.
+    Runs on the worker process's persistent event loop, whose pooled
+    engine serves celery_session_maker (see app.core.task_loop). Falls
+    back to asyncio.run() outside a prefork worker.
     """
-    return asyncio.run(coro)
+    return run_async(coro)
 from app.modules.stream.ffmpeg_builder import (
     FFmpegCommandBuilder,
     FFmpegOutputParser,
     FFmpegMetrics,
     FFmpegPlaylistCommandBuilder,
 )
+from app.modules.stream.deadline_scheduler import (
+    RESEED_HORIZON_SECONDS,
+    START,
+    STOP,
+    claim_and_queue,
+    reseed_deadlines,
+    scheduler_enabled,
+)
+from app.modules.stream.playlist_sources import build_sources, resolve_playlist_sources
+from app.modules.stream.renditions import (
+    RenditionSpec,
+    prepare_rendition,
+    ready_renditions,
+    renditions_enabled,
+)
+from app.modules.stream.source_cache import (
+    SourceCacheError,
+    get_stream_source_cache,
+    resolve_sources,
+    source_cache_enabled,
+)
+from app.modules.stream.placement import StreamDemand, get_stream_placer
+from app.modules.stream.supervisor import (
+    START_STREAM,
+    STOP_STREAM,
+    StreamCommand,
+    StreamLaunch,
+    get_stream_node_registry,
+    send_stream_command,
+    supervisor_enabled,
+)
 
 
 logger = logging.getLogger(__name__)
@@ -83,12 +119,31 @@ def start_ffmpeg_worker(self, job_id: str) -> dict:
 async def _start_ffmpeg_worker_async(job_id: str) -> dict:
     """Async implementation of FFmpeg worker start.
     
+    With the stream supervisor enabled, the start is handed to a streaming
+    node's supervisor instead of spawning FFmpeg in this worker.
+    
     Args:
         job_id: Stream job UUID string
         
     Returns:
         dict: Result with status and PID
     """
+    if supervisor_enabled():
+        async with celery_session_maker() as session:
+            repo = StreamJobRepository(session)
+            job = await repo.get_by_id(job_id)
+            
+            if not job:
+                raise ValueError(f"Stream job {job_id} not found")
+            
+            node_id = await _place_on_node(session, repo, job)
+        
+        return {
+            "status": "queued",
+            "job_id": job_id,
+            "node_id": node_id,
+        }
+    
     async with celery_session_maker() as session:
         repo = StreamJobRepository(session)
         job = await repo.get_by_id(job_id)
@@ -96,59 +151,27 @@ async def _start_ffmpeg_worker_async(job_id: str) -> dict:
         if not job:
             raise ValueError(f"Stream job {job_id} not found")
         
-        concat_path = None
-        
-        # Check if this is a playlist stream
-        if job.playlist_id:
-            # Get playlist items
-            video_paths = await _get_playlist_video_paths(session, job.playlist_id)
-            
-            if not video_paths:
-                raise ValueError(f"No videos found in playlist {job.playlist_id}")
-            
-            # Build playlist command
-            playlist_builder = FFmpegPlaylistCommandBuilder()
-            cmd, concat_path = playlist_builder.build_playlist_command(job, video_paths)
-            
-            # Update job with playlist info
-            job.total_playlist_items = len(video_paths)
-            job.concat_file_path = concat_path
-            
-            # Log encoder info
-            encoder_info = playlist_builder.get_encoder_info()
-            logger.info(f"Using encoder: {encoder_info['encoder']} (hardware: {encoder_info['is_hardware']})")
-            logger.info(f"FFmpeg playlist command for {len(video_paths)} videos")
-        else:
-            # Build single video command
-            builder = FFmpegCommandBuilder()
-            cmd = builder.build_streaming_command(job)
-            
-            # Log encoder info
-            encoder_info = builder.get_encoder_info()
-            logger.info(f"Using encoder: {encoder_info['encoder']} (hardware: {encoder_info['is_hardware']})")
-        
-        logger.info(f"FFmpeg command: {' '.join(cmd[:10])}...")
+        launch = await _build_ffmpeg_launch(session, job)
         
         # Create log file for FFmpeg output
-        log_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))), "storage", "logs")
-        os.makedirs(log_dir, exist_ok=True)
-        log_file_path = os.path.join(log_dir, f"ffmpeg_{job_id}.log")
-        
-        # Open log file for writing
-        log_file = open(log_file_path, "w")
-        
-        # Start FFmpeg process with stderr redirected to log file
-        process = subprocess.Popen(
-            cmd,
-            stdout=subprocess.DEVNULL,
-            stderr=log_file,
-            stdin=subprocess.DEVNULL,
-            # Don't create new process group on Windows
-            creationflags=subprocess.CREATE_NEW_PROCESS_GROUP if os.name == 'nt' else 0,
-        )
+        log_file_path = _get_ffmpeg_log_path(job_id)
+        os.makedirs(os.path.dirname(log_file_path), exist_ok=True)
+        
+        # Start FFmpeg process with stderr redirected to log file; the
+        # child keeps its own handle, so ours is closed right away
+        with open(log_file_path, "w") as log_file:
+            process = subprocess.Popen(
+                launch.cmd,
+                stdout=subprocess.DEVNULL,
+                stderr=log_file,
+                stdin=subprocess.DEVNULL,
+                # Don't create new process group on Windows
+                creationflags=subprocess.CREATE_NEW_PROCESS_GROUP if os.name == 'nt' else 0,
+            )
         
         # Update job with PID, status
         job.pid = process.pid
+        job.node_id = None
         job.status = StreamJobStatus.RUNNING.value
         job.actual_start_at = to_naive_utc(utcnow())
         await repo.update(job)
@@ -156,6 +179,9 @@ async def _start_ffmpeg_worker_async(job_id: str) -> dict:
         # Store log file path for monitoring
         log_file_paths[str(job.id)] = log_file_path
         
+        if launch.cached_sources:
+            get_stream_source_cache().track_reads(str(job.id), process.pid)
+        
         logger.info(f"FFmpeg process started with PID {process.pid} for job {job_id}")
         
         # Start monitoring task
@@ -171,6 +197,121 @@ async def _start_ffmpeg_worker_async(job_id: str) -> dict:
         }
 
 
+async def _place_on_node(session, repo: StreamJobRepository, job: StreamJob) -> Optional[str]:
+    """Reserve room for a job on a streaming node and send it the start.
+    
+    When no node has room, the start goes to the shared queue and the
+    first node to free up takes it.
+    
+    Requirements: 3.2
+    
+    Returns:
+        Optional[str]: The node the job was placed on
+    """
+    job_id = str(job.id)
+    demand = StreamDemand.from_job(job, stream_copy=await _get_ready_renditions(session, job) is not None)
+    decision = await get_stream_placer().place(job_id, demand)
+    
+    # Record the node first, so a node lost before starting the job is noticed
+    job.node_id = decision.node_id
+    await repo.update(job)
+    await send_stream_command(StreamCommand(START_STREAM, job_id), node_id=decision.node_id)
+    
+    if decision.node_id:
+        logger.info(f"Sent stream job {job_id} to node {decision.node_id} ({decision.units:g} units)")
+    else:
+        logger.warning(f"No streaming node has room for job {job_id}, queued for the first that does")
+    return decision.node_id
+
+
+async def _build_ffmpeg_launch(session, job: StreamJob) -> StreamLaunch:
+    """Build the FFmpeg command for a job on this node.
+    
+    Sources are read from this node's cache when possible, so the command
+    is only valid on the node that builds it.
+    
+    Args:
+        session: Database session
+        job: Stream job to start
+        
+    Returns:
+        StreamLaunch: Command and what it streams from
+    """
+    job_id = str(job.id)
+    concat_path = None
+    cached_sources = False  # every source is read from this node's cache
+    
+    # Send stream-ready renditions with stream copy when all sources have
+    # one; otherwise encode live and have them prepared for the next start
+    renditions = await _get_ready_renditions(session, job)
+    stream_copy = renditions is not None
+    if not stream_copy and renditions_enabled():
+        prepare_stream_renditions.delay(job_id)
+    
+    # Check if this is a playlist stream
+    if job.playlist_id:
+        # Get playlist items
+        video_paths = await _get_playlist_video_paths(
+            session, job.playlist_id, job_id=job_id, renditions=renditions
+        )
+        
+        if not video_paths:
+            raise ValueError(f"No videos found in playlist {job.playlist_id}")
+        
+        # Build playlist command
+        playlist_builder = FFmpegPlaylistCommandBuilder()
+        cmd, concat_path = playlist_builder.build_playlist_command(job, video_paths, stream_copy=stream_copy)
+        
+        if source_cache_enabled():
+            cache_root = str(get_stream_source_cache().objects)
+            cached_sources = all(path.startswith(cache_root) for path in video_paths)
+        
+        # Update job with playlist info
+        job.total_playlist_items = len(video_paths)
+        job.concat_file_path = concat_path
+        
+        # Log encoder info
+        if not stream_copy:
+            encoder_info = playlist_builder.get_encoder_info()
+            logger.info(f"Using encoder: {encoder_info['encoder']} (hardware: {encoder_info['is_hardware']})")
+        logger.info(f"FFmpeg playlist command for {len(video_paths)} videos")
+    elif stream_copy:
+        # Single rendition, reading a cached copy when there is one
+        from app.core.storage import get_file_url_for_ffmpeg
+        
+        rendition_key = next(iter(renditions.values()))
+        input_path = await _get_cached_video_path(session, job, key=rendition_key)
+        cached_sources = input_path is not None
+        cmd = FFmpegCommandBuilder().build_streaming_command(
+            job,
+            input_path=input_path or get_file_url_for_ffmpeg(rendition_key, expires_in=86400),
+            stream_copy=True,
+        )
+    else:
+        # Build single video command, reading a cached copy when there is one
+        builder = FFmpegCommandBuilder()
+        input_path = await _get_cached_video_path(session, job)
+        cmd = builder.build_streaming_command(job, input_path=input_path)
+        cached_sources = input_path is not None
+        
+        # Log encoder info
+        encoder_info = builder.get_encoder_info()
+        logger.info(f"Using encoder: {encoder_info['encoder']} (hardware: {encoder_info['is_hardware']})")
+    
+    if stream_copy:
+        logger.info(f"Streaming job {job_id} from stream-ready renditions (stream copy)")
+    STREAM_JOB_STARTS_TOTAL.labels(mode="copy" if stream_copy else "encode").inc()
+    
+    logger.info(f"FFmpeg command: {' '.join(cmd[:10])}...")
+    
+    return StreamLaunch(
+        cmd=cmd,
+        stream_copy=stream_copy,
+        cached_sources=cached_sources,
+        concat_path=concat_path,
+    )
+
+
 @celery_app.task(bind=True)
 def stop_ffmpeg_worker(self, job_id: str) -> dict:
     """Stop FFmpeg worker process for a stream job.
@@ -208,7 +349,11 @@ async def _stop_ffmpeg_worker_async(job_id: str) -> dict:
         if not job:
             raise ValueError(f"Stream job {job_id} not found")
         
-        if job.pid:
+        if job.node_id:
+            # The node's supervisor stops FFmpeg and cleans up its local files
+            await send_stream_command(StreamCommand(STOP_STREAM, job_id), node_id=job.node_id)
+            logger.info(f"Asked node {job.node_id} to stop job {job_id}")
+        elif job.pid:
             try:
                 process = psutil.Process(job.pid)
                 
@@ -234,9 +379,14 @@ async def _stop_ffmpeg_worker_async(job_id: str) -> dict:
             except Exception as e:
                 logger.error(f"Error terminating FFmpeg process {job.pid}: {e}")
         
-        # Cleanup concat file if exists
-        if job.concat_file_path:
-            await _cleanup_concat_file(str(job.id))
+        if not job.node_id:
+            # Cleanup concat file if exists
+            if job.concat_file_path:
+                await _cleanup_concat_file(str(job.id))
+            
+            # Let the cache evict this stream's sources again
+            if source_cache_enabled():
+                get_stream_source_cache().release(str(job.id))
         
         # Update job status
         job.status = StreamJobStatus.STOPPED.value
@@ -244,6 +394,7 @@ async def _stop_ffmpeg_worker_async(job_id: str) -> dict:
         job.is_stream_key_locked = False
         job.update_total_duration()
         job.pid = None
+        job.node_id = None
         job.concat_file_path = None
         await repo.update(job)
         
@@ -356,6 +507,132 @@ def restart_ffmpeg_worker(self, job_id: str) -> dict:
         raise
 
 
+# ============================================
+# Stream Source Prefetch (Requirements: 11.1)
+# ============================================
+
+
+@celery_app.task
+def prefetch_stream_sources(job_id: str, keys: Optional[list[str]] = None) -> dict:
+    """Download a stream's sources into this node's source cache.
+    
+    Queued ahead of a scheduled start, so the start itself finds its
+    sources on disk.
+    
+    Requirements: 11.1
+    
+    Args:
+        job_id: Stream job UUID string
+        keys: Storage keys to fetch (default: all sources of the job)
+        
+    Returns:
+        dict: Number of sources downloaded and failed
+    """
+    return _run_async(_prefetch_stream_sources_async(job_id, keys))
+
+
+async def _prefetch_stream_sources_async(job_id: str, keys: Optional[list[str]] = None) -> dict:
+    """Async implementation of stream source prefetch.
+    
+    Args:
+        job_id: Stream job UUID string
+        keys: Storage keys to fetch (default: all sources of the job)
+        
+    Returns:
+        dict: Number of sources downloaded and failed
+    """
+    if keys is None:
+        async with celery_session_maker() as session:
+            job = await StreamJobRepository(session).get_by_id(job_id)
+            if not job:
+                return {"status": "not_found", "job_id": job_id}
+            keys = await _get_stream_source_keys(session, job)
+    
+    cache = get_stream_source_cache()
+    fetched = 0
+    failed = 0
+    for key in keys:
+        if cache.is_cached(key):
+            continue
+        try:
+            await asyncio.to_thread(cache.fetch, key)
+            fetched += 1
+        except SourceCacheError as e:
+            failed += 1
+            logger.warning(f"Failed to prefetch {key} for job {job_id}: {e}")
+    
+    logger.info(f"Prefetched {fetched} sources for job {job_id} ({failed} failed)")
+    return {"status": "done", "job_id": job_id, "fetched": fetched, "failed": failed}
+
+
+# ============================================
+# Stream-ready Renditions (Requirements: 10.1)
+# ============================================
+
+
+@celery_app.task(
+    time_limit=settings.STREAM_RENDITION_TIMEOUT_SECONDS,
+    soft_time_limit=settings.STREAM_RENDITION_TIMEOUT_SECONDS - 60,
+)
+def prepare_stream_renditions(job_id: str) -> dict:
+    """Encode a stream's sources once to its output settings.
+    
+    Queued when a job is created or its encoding settings change, and at
+    start when the job still has to encode live. Later starts send the
+    renditions with stream copy.
+    
+    Requirements: 10.1, 10.2, 10.3, 10.4
+    
+    Args:
+        job_id: Stream job UUID string
+        
+    Returns:
+        dict: Number of renditions encoded, failed and left to other workers
+    """
+    return _run_async(_prepare_stream_renditions_async(job_id))
+
+
+async def _prepare_stream_renditions_async(job_id: str) -> dict:
+    """Async implementation of stream rendition preparation.
+    
+    Args:
+        job_id: Stream job UUID string
+        
+    Returns:
+        dict: Number of renditions encoded, failed and left to other workers
+    """
+    encoded = 0
+    failed = 0
+    skipped = 0
+    
+    async with celery_session_maker() as session:
+        job = await StreamJobRepository(session).get_by_id(job_id)
+        if not job:
+            return {"status": "not_found", "job_id": job_id}
+        
+        videos = await _get_stream_videos(session, job)
+        if not videos or not all(key for _, key in videos):
+            # Items given as a direct URL are always encoded live
+            return {"status": "not_eligible", "job_id": job_id}
+        
+        spec = RenditionSpec.for_job(job)
+        seen = set()
+        for video_id, key in videos:
+            if key in seen:
+                continue
+            seen.add(key)
+            result = await prepare_rendition(session, key, spec, video_id=video_id)
+            if result is None:
+                skipped += 1
+            elif result:
+                encoded += 1
+            else:
+                failed += 1
+    
+    logger.info(f"Renditions for job {job_id}: {encoded} encoded, {failed} failed, {skipped} ready or in progress")
+    return {"status": "done", "job_id": job_id, "encoded": encoded, "failed": failed, "skipped": skipped}
+
+
 # ============================================
 # Scheduling Tasks (Requirements: 7.2)
 # ============================================
@@ -367,7 +644,10 @@ def check_scheduled_streams() -> dict:
     
     Requirements: 7.2
     
-    This task runs periodically (every 10 seconds) via Celery Beat.
+    This task runs periodically (every 10 seconds) via Celery Beat. Deadlines
+    are normally fired on time by the deadline dispatcher
+    (app.modules.stream.deadline_scheduler); this scan is the reconciliation
+    safety net and re-seeds deadlines missing from Redis.
     
     Returns:
         dict: Number of streams started
@@ -392,29 +672,50 @@ async def _check_scheduled_streams_async() -> dict:
         jobs = await repo.get_scheduled_jobs()
         
         for job in jobs:
-            if job.should_start_now():
-                logger.info(f"Starting scheduled stream job {job.id}")
-                
-                # Update status and start
-                job.status = StreamJobStatus.STARTING.value
-                await repo.update(job)
-                
-                # Queue start task
-                start_ffmpeg_worker.delay(str(job.id))
-                started_count += 1
+            # Conditional update: a job the dispatcher (or another beat) already
+            # claimed is skipped instead of being started twice
+            try:
+                if await claim_and_queue(repo, START, job.id):
+                    logger.info(f"Starting scheduled stream job {job.id} (reconciliation)")
+                    started_count += 1
+            except Exception as e:
+                logger.error(f"Failed to queue start of stream job {job.id}: {e}")
         
         # Check for jobs that should stop
         jobs_to_stop = await repo.get_jobs_to_stop()
+        stopped_count = 0
         
         for job in jobs_to_stop:
-            logger.info(f"Stopping scheduled stream job {job.id} (end time reached)")
-            
-            job.status = StreamJobStatus.STOPPING.value
-            await repo.update(job)
-            
-            stop_ffmpeg_worker.delay(str(job.id))
+            try:
+                if await claim_and_queue(repo, STOP, job.id):
+                    logger.info(f"Stopping scheduled stream job {job.id} (end time reached, reconciliation)")
+                    stopped_count += 1
+            except Exception as e:
+                logger.error(f"Failed to queue stop of stream job {job.id}: {e}")
+        
+        # Re-seed deadlines that never reached Redis (Requirements: 1.2, 1.3)
+        if scheduler_enabled():
+            horizon = to_naive_utc(utcnow()) + timedelta(seconds=RESEED_HORIZON_SECONDS)
+            try:
+                await reseed_deadlines(await repo.get_jobs_with_deadlines(horizon))
+            except Exception as e:
+                logger.warning(f"Failed to re-seed stream deadlines: {e}")
+        
+        # Download sources of streams starting soon (Requirements: 11.1)
+        prefetching = 0
+        if source_cache_enabled():
+            cache = get_stream_source_cache()
+            lead = to_naive_utc(utcnow()) + timedelta(seconds=settings.STREAM_SOURCE_PREFETCH_LEAD_SECONDS)
+            for job in await repo.get_scheduled_jobs(before=lead):
+                if job.should_start_now():
+                    continue
+                keys = await _get_stream_source_keys(session, job)
+                missing = [key for key in keys if not cache.is_cached(key)]
+                if missing and cache.claim_prefetch(str(job.id)):
+                    prefetch_stream_sources.delay(str(job.id), missing)
+                    prefetching += 1
     
-    return {"started": started_count, "stopped": len(jobs_to_stop)}
+    return {"started": started_count, "stopped": stopped_count, "prefetching": prefetching}
 
 
 @celery_app.task
@@ -430,8 +731,7 @@ def collect_health_metrics() -> dict:
     """
     logger.debug("Collecting health metrics for active streams")
     
-    # Use asyncio.run() for fresh event loop - avoids event loop conflicts
-    return asyncio.run(_collect_health_metrics_async())
+    return _run_async(_collect_health_metrics_async())
 
 
 async def _collect_health_metrics_async() -> dict:
@@ -454,7 +754,25 @@ async def _collect_health_metrics_async() -> dict:
         active_jobs = await repo.get_active_jobs()
         logger.debug(f"Found {len(active_jobs)} active stream jobs to check")
         
+        # Jobs on streaming nodes are watched by the node's supervisor; only
+        # those whose node stopped heartbeating are handled here
+        live_nodes = None
+        if supervisor_enabled() or any(job.node_id for job in active_jobs):
+            try:
+                live_nodes = set(await get_stream_node_registry().live_node_ids())
+                # Room reserved on lost nodes is free again for re-placed jobs
+                await get_stream_placer().release_dead_nodes(live_nodes)
+            except Exception as e:
+                logger.error(f"Could not read streaming node heartbeats: {e}")
+        
         for job in active_jobs:
+            if job.node_id:
+                if live_nodes is not None and job.node_id not in live_nodes:
+                    try:
+                        await _recover_from_dead_node(repo, job)
+                    except Exception as e:
+                        logger.error(f"Error recovering job {job.id} from a lost node: {e}")
+                continue
             try:
                 cpu_percent = 0.0
                 memory_mb = 0.0
@@ -476,6 +794,9 @@ async def _collect_health_metrics_async() -> dict:
                             memory_info = process.memory_info()
                             memory_mb = memory_info.rss / (1024 * 1024)
                             
+                            if source_cache_enabled():
+                                _record_cached_reads(str(job.id), process)
+                            
                             # Parse FFmpeg log for metrics
                             log_path = _get_ffmpeg_log_path(str(job.id))
                             metrics = _parse_ffmpeg_log_tail(log_path, parser)
@@ -543,10 +864,87 @@ async def _collect_health_metrics_async() -> dict:
                         
             except Exception as e:
                 logger.error(f"Error collecting metrics for job {job.id}: {e}")
+        
+        # Free cached sources of streams that ended without a clean stop
+        if source_cache_enabled():
+            get_stream_source_cache().release_inactive(str(job.id) for job in active_jobs)
     
     return {"checked": checked_count}
 
 
+async def _recover_from_dead_node(repo: StreamJobRepository, job: StreamJob) -> None:
+    """Restart a job whose streaming node stopped heartbeating elsewhere.
+    
+    Requirements: 3.3
+    """
+    logger.warning(f"Streaming node {job.node_id} of job {job.id} stopped heartbeating")
+    job.node_id = None
+    job.pid = None
+    
+    if supervisor_enabled() and job.status == StreamJobStatus.STARTING.value:
+        # Placed but never started: place again without using a restart
+        await _place_on_node(repo.session, repo, job)
+    elif supervisor_enabled() and job.enable_auto_restart and job.restart_count < job.max_restarts:
+        job.restart_count += 1
+        job.status = StreamJobStatus.STARTING.value
+        await _place_on_node(repo.session, repo, job)
+        logger.info(f"Re-placed job {job.id} on another node (attempt {job.restart_count}/{job.max_restarts})")
+    else:
+        await repo.update(job)
+        await repo.update_status(job.id, StreamJobStatus.FAILED, "Streaming node stopped responding")
+
+
+# ============================================
+# Health Time Series Tasks (Requirements: 4.7, 8.5)
+# ============================================
+
+
+@celery_app.task
+def rollup_health_metrics() -> dict:
+    """Roll raw health samples up into the 1-minute and 1-hour tiers.
+
+    This task runs periodically (every minute) via Celery Beat.
+
+    Returns:
+        dict: Start of the recomputed range per tier
+    """
+    return _run_async(_rollup_health_metrics_async())
+
+
+async def _rollup_health_metrics_async() -> dict:
+    """Async implementation of the health rollup."""
+    from app.modules.stream.health_timeseries import HealthRollupService
+
+    async with celery_session_maker() as session:
+        return await HealthRollupService(session).rollup()
+
+
+@celery_app.task
+def maintain_health_partitions() -> dict:
+    """Create upcoming health partitions and drop expired ones.
+
+    Retention of every tier is a partition drop. This task runs
+    periodically (every hour) via Celery Beat.
+
+    Returns:
+        dict: Partitions created and dropped per table
+    """
+    return _run_async(_maintain_health_partitions_async())
+
+
+async def _maintain_health_partitions_async() -> dict:
+    """Async implementation of health partition maintenance."""
+    from app.modules.stream.health_timeseries import maintain_partitions
+
+    async with celery_session_maker() as session:
+        report = await maintain_partitions(session)
+
+    for table, changes in report.items():
+        if changes["created"] or changes["dropped"]:
+            logger.info(f"Health partitions for {table}: created {changes['created']}, dropped {changes['dropped']}")
+    return report
+
+
 def _parse_ffmpeg_log_tail(log_path: str, parser: FFmpegOutputParser, lines: int = 50) -> Optional[FFmpegMetrics]:
     """Parse the last N lines of FFmpeg log file for metrics.
     
@@ -697,60 +1095,160 @@ async def _increment_restart_count(job_id: str) -> None:
         await repo.increment_restart_count(job_id)
 
 
-async def _get_playlist_video_paths(session, playlist_id: str) -> list[str]:
+async def _get_playlist_video_paths(
+    session,
+    playlist_id: str,
+    job_id: Optional[str] = None,
+    renditions: Optional[dict[str, str]] = None,
+) -> list[str]:
     """Get video file paths/URLs from a playlist.
     
     For local storage: returns absolute file paths
-    For cloud storage (R2/S3): returns presigned URLs (FFmpeg supports HTTP input)
+    For cloud storage (R2/S3): returns paths in this node's source cache when
+    job_id is given and caching is enabled, otherwise presigned URLs (FFmpeg
+    supports HTTP input). Every cacheable item is downloaded before
+    returning, since FFmpeg loops over the concat list it started with;
+    only items that cannot be cached are streamed from presigned URLs.
+    
+    Items are loaded with one query and checked concurrently; see
+    resolve_playlist_sources.
     
     Requirements: 11.1
     
     Args:
         session: Database session
         playlist_id: Playlist UUID string
+        job_id: Stream job the sources are for (leases cached files to it)
+        renditions: Rendition storage key per source key, played in place
+            of the originals
         
     Returns:
         list[str]: List of video file paths/URLs in order
     """
-    from app.modules.stream.repository import StreamPlaylistRepository
-    from app.modules.video.repository import VideoRepository
-    from app.core.storage import get_file_url_for_ffmpeg, is_cloud_storage, get_storage
+    from app.core.storage import get_file_url_for_ffmpeg
     
-    playlist_repo = StreamPlaylistRepository(session)
-    video_repo = VideoRepository(session)
+    sources = await resolve_playlist_sources(session, playlist_id)
+    if renditions:
+        sources = [
+            replace(source, key=renditions[source.key], location=renditions[source.key])
+            for source in sources
+        ]
     
-    playlist = await playlist_repo.get_by_id(playlist_id)
-    if not playlist:
-        return []
+    cached: dict[int, Optional[str]] = {}
+    if job_id and source_cache_enabled():
+        cache = get_stream_source_cache()
+        positions = [i for i, source in enumerate(sources) if source.key]
+        paths = await asyncio.to_thread(
+            resolve_sources,
+            cache,
+            job_id,
+            [sources[i].key for i in positions],
+            settings.STREAM_SOURCE_CACHE_DOWNLOAD_CONCURRENCY,
+        )
+        cached = dict(zip(positions, paths))
     
     video_paths = []
-    storage = get_storage()
-    
-    for item in sorted(playlist.items, key=lambda x: x.position):
-        if item.video_id:
-            video = await video_repo.get_by_id(item.video_id)
-            if video and video.file_path:
-                # Get path/URL that FFmpeg can use
-                ffmpeg_path = get_file_url_for_ffmpeg(video.file_path, expires_in=86400)
-                
-                # Validate file exists
-                if ffmpeg_path.startswith("http"):
-                    # For HTTP URLs, check storage exists
-                    if storage.exists(video.file_path):
-                        video_paths.append(ffmpeg_path)
-                elif os.path.exists(ffmpeg_path):
-                    video_paths.append(ffmpeg_path)
-                    
-        elif item.video_url:
+    for position, source in enumerate(sources):
+        if cached.get(position):
+            video_paths.append(cached[position])
+        elif source.key:
+            # Get path/URL that FFmpeg can use
+            video_paths.append(get_file_url_for_ffmpeg(source.key, expires_in=86400))
+        else:
             # Direct URL or path provided
-            if item.video_url.startswith("http"):
-                video_paths.append(item.video_url)
-            elif os.path.exists(item.video_url):
-                video_paths.append(item.video_url)
+            video_paths.append(source.location)
     
     return video_paths
 
 
+async def _get_cached_video_path(session, job: StreamJob, key: Optional[str] = None) -> Optional[str]:
+    """Cached copy of a single-video job's source, downloading it if needed.
+    
+    Requirements: 11.1
+    
+    Args:
+        key: Storage key to stream (default: the job's source)
+    
+    Returns:
+        Local path, or None to stream job.video_path as before
+    """
+    if not job.video_id or not source_cache_enabled():
+        return None
+    
+    if key is None:
+        keys = await _get_stream_source_keys(session, job)
+        if not keys:
+            return None
+        key = keys[0]
+    
+    try:
+        return await asyncio.to_thread(get_stream_source_cache().fetch, key, str(job.id))
+    except SourceCacheError as e:
+        logger.warning(f"Streaming job {job.id} from storage: {e}")
+        return None
+
+
+async def _get_stream_videos(session, job: StreamJob) -> list[tuple[Optional[uuid.UUID], Optional[str]]]:
+    """(video_id, storage key) of each item a stream job plays, in order.
+    
+    Playlist items given as a direct URL have neither.
+    """
+    from app.modules.video.repository import VideoRepository
+    
+    if job.playlist_id:
+        from app.modules.stream.repository import PlaylistItemRepository
+        
+        rows = await PlaylistItemRepository(session).get_sources(job.playlist_id)
+        video_ids = {file_path: video_id for _, video_id, file_path, _ in rows if video_id}
+        return [(video_ids.get(source.key), source.key) for source in build_sources(rows)]
+    
+    video = await VideoRepository(session).get_by_id(job.video_id) if job.video_id else None
+    return [(video.id, video.file_path)] if video and video.file_path else []
+
+
+async def _get_ready_renditions(
+    session,
+    job: StreamJob,
+    videos: Optional[list[tuple[Optional[uuid.UUID], Optional[str]]]] = None,
+) -> Optional[dict[str, str]]:
+    """Rendition storage key per source key, if every item of the job has one.
+    
+    Requirements: 10.1
+    
+    Args:
+        videos: The job's items, if already loaded (see _get_stream_videos)
+    """
+    if not renditions_enabled():
+        return None
+    if videos is None:
+        videos = await _get_stream_videos(session, job)
+    if not videos or not all(key for _, key in videos):
+        return None
+    return await ready_renditions(session, [key for _, key in videos], RenditionSpec.for_job(job))
+
+
+async def _get_stream_source_keys(session, job: StreamJob) -> list[str]:
+    """Storage keys a stream job plays, in order.
+    
+    These are the stream-ready renditions when every item has one,
+    otherwise the library videos themselves.
+    """
+    videos = await _get_stream_videos(session, job)
+    renditions = await _get_ready_renditions(session, job, videos)
+    keys = [key for _, key in videos if key]
+    return [renditions[key] for key in keys] if renditions else keys
+
+
+def _record_cached_reads(job_id: str, process: psutil.Process) -> None:
+    """Count what a stream read from the source cache as egress avoided."""
+    try:
+        io = process.io_counters()
+    except (psutil.AccessDenied, AttributeError, NotImplementedError):
+        return
+    read_bytes = getattr(io, "read_chars", io.read_bytes)
+    get_stream_source_cache().record_reads(job_id, process.pid, read_bytes)
+
+
 async def _cleanup_concat_file(job_id: str) -> None:
     """Cleanup concat file for a job.
     
@@ -916,6 +1414,11 @@ async def _auto_detect_and_start_moderation_async(job_id: str) -> dict:
     Returns:
         dict: Result with status and broadcast_id if found
     """
+    from app.modules.account.quota_scheduler import (
+        QuotaPriority,
+        estimate_cost,
+        get_quota_scheduler,
+    )
     from app.modules.account.repository import YouTubeAccountRepository
     from app.modules.stream.youtube_api import YouTubeLiveStreamingClient
     
@@ -944,6 +1447,16 @@ async def _auto_detect_and_start_moderation_async(job_id: str) -> dict:
             logger.warning(f"No valid account/token for job {job_id}")
             return {"status": "no_account", "job_id": job_id}
         
+        # Approximate cost of the broadcast lookups below (stream control)
+        decision = await get_quota_scheduler().acquire(
+            job.account_id,
+            "liveBroadcasts.list",
+            QuotaPriority.REALTIME,
+            units=estimate_cost("liveBroadcasts.list", "liveBroadcasts.list", "liveStreams.list"),
+        )
+        if not decision.allowed:
+            return {"status": "quota_deferred", "job_id": job_id}
+        
         # Create YouTube API client
         client = YouTubeLiveStreamingClient(account.access_token)
         
@@ -984,18 +1497,16 @@ async def _stop_moderation_for_job(job: StreamJob) -> None:
         job: Stream job instance
     """
     try:
-        from app.modules.moderation.chat_worker import stop_moderation_for_broadcast, get_active_workers
-        
-        # Find and stop any active moderation workers for this account
-        active_workers = get_active_workers()
-        
-        for key, worker in list(active_workers.items()):
-            if str(worker.account_id) == str(job.account_id):
-                logger.info(f"Stopping moderation worker for account {job.account_id}")
-                await stop_moderation_for_broadcast(
-                    account_id=job.account_id,
-                    broadcast_id=worker.broadcast_id,
-                )
+        from app.modules.moderation.chat_worker import stop_moderation_for_broadcast
+        from app.modules.moderation.sharding import list_moderated_broadcasts
+        
+        # Find and stop any moderated broadcasts for this account
+        for broadcast in await list_moderated_broadcasts(job.account_id):
+            logger.info(f"Stopping moderation for account {job.account_id}")
+            await stop_moderation_for_broadcast(
+                account_id=job.account_id,
+                broadcast_id=broadcast.broadcast_id,
+            )
                 
     except Exception as e:
         logger.error(f"Failed to stop moderation for job {job.id}: {e}")
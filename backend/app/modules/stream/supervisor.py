@@ -0,0 +1,949 @@
+"""Per-node stream supervisor.
+
+Every streaming node runs one long-lived supervisor process, which owns the
+node's FFmpeg children:
+
+- Starts and stops arrive as commands on Redis lists. Any node with spare
+  capacity takes starts from a shared queue. Each node also has its own
+  queue for commands aimed at the streams it runs
+- FFmpeg reports progress on a ``-progress`` pipe that the supervisor reads
+  directly, instead of tailing log files and looking up PIDs
+- A stream that exits unexpectedly is restarted with exponential backoff
+  until the job's restart budget is spent
+- New starts are only taken while the node is under its stream, CPU,
+  encoder session and stream unit limits
+- A heartbeat records the node and its capacity. Jobs on a node that stops
+  heartbeating are re-queued by ``collect_health_metrics``
+- With each health report, streams whose job is no longer starting or
+  running on this node are stopped, so a lost STOP or a takeover by another
+  node never leaves two encoders pushing
+
+A job records the node that owns it (``StreamJob.node_id``). Its PID only
+means something on that node.
+
+Run one supervisor per streaming node with:
+
+    python -m app.modules.stream.supervisor
+
+Requirements: 1.2, 1.3, 3.2, 3.3, 3.4, 4.1
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import time
+import weakref
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Optional
+
+import psutil
+
+from app.core.config import settings
+from app.core.metrics import (
+    STREAM_NODE_COMMANDS_TOTAL,
+    STREAM_NODE_RESTARTS_TOTAL,
+    STREAM_NODE_STREAMS,
+)
+from app.modules.stream.ffmpeg_builder import FFmpegMetrics
+
+logger = logging.getLogger(__name__)
+
+NODES_KEY = "stream:nodes"
+NODE_KEY_PREFIX = "stream:node:"
+SHARED_COMMANDS_KEY = "stream:commands"
+
+START_STREAM = "start"
+STOP_STREAM = "stop"
+
+# Restart backoff: 5s, doubling, at most 5 minutes
+RESTART_BACKOFF_BASE_SECONDS = 5
+RESTART_BACKOFF_MAX_SECONDS = 300
+
+# Seconds FFmpeg gets to exit after SIGTERM before it is killed
+STOP_TIMEOUT_SECONDS = 5
+
+LOG_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))), "storage", "logs"
+)
+
+
+def node_info_key(node_id: str) -> str:
+    return f"{NODE_KEY_PREFIX}{node_id}"
+
+
+def node_commands_key(node_id: str) -> str:
+    return f"{NODE_KEY_PREFIX}{node_id}:commands"
+
+
+def node_processing_key(node_id: str) -> str:
+    return f"{NODE_KEY_PREFIX}{node_id}:processing"
+
+
+def default_node_id() -> str:
+    return settings.STREAM_NODE_ID or socket.gethostname()
+
+
+def supervisor_enabled() -> bool:
+    return settings.STREAM_SUPERVISOR_ENABLED
+
+
+def restart_delay(restart_count: int) -> float:
+    """Backoff before restart number ``restart_count + 1``."""
+    return min(RESTART_BACKOFF_MAX_SECONDS, RESTART_BACKOFF_BASE_SECONDS * (2 ** restart_count))
+
+
+def with_progress_pipe(cmd: list[str]) -> list[str]:
+    """Have FFmpeg write progress blocks to stdout instead of stats to stderr."""
+    return [cmd[0], "-progress", "pipe:1", "-nostats", *cmd[1:]]
+
+
+@dataclass(frozen=True)
+class StreamCommand:
+    """A start or stop sent to the supervisors."""
+
+    action: str
+    job_id: str
+    sent_at: float = field(default_factory=time.time)
+    raw: Optional[str] = field(default=None, compare=False)  # as read from Redis, for acks
+
+    def to_json(self) -> str:
+        return json.dumps({"action": self.action, "job_id": self.job_id, "sent_at": self.sent_at})
+
+    @classmethod
+    def from_json(cls, raw: str) -> "StreamCommand":
+        data = json.loads(raw)
+        return cls(data["action"], str(data["job_id"]), float(data.get("sent_at", 0)), raw=raw)
+
+
+@dataclass
+class StreamLaunch:
+    """An FFmpeg command built on the node that runs it."""
+
+    cmd: list[str]
+    stream_copy: bool = False
+    cached_sources: bool = False  # every source is read from this node's cache
+    concat_path: Optional[str] = None
+    units: float = 0.0  # stream units it takes on this node
+
+
+@dataclass
+class NodeCapacity:
+    """What a node runs and what it is allowed to run."""
+
+    node_id: str
+    streams: int = 0
+    encoder_sessions: int = 0  # streams encoding live (not stream copy)
+    cpu_percent: float = 0.0
+    max_streams: int = 0
+    max_encoder_sessions: int = 0  # 0 = unlimited
+    max_cpu_percent: float = 100.0
+    encoder: str = "libx264"
+    capacity_units: float = 0.0  # see app.modules.stream.placement, 0 = not advertised
+    reserved_units: float = 0.0  # units of the streams the node runs
+    updated_at: float = 0.0
+
+    def has_room(self) -> bool:
+        """Whether the node may take another start from the shared queue."""
+        return (
+            self.streams < self.max_streams
+            and self.cpu_percent < self.max_cpu_percent
+            and (not self.max_encoder_sessions or self.encoder_sessions < self.max_encoder_sessions)
+            and (not self.capacity_units or self.reserved_units < self.capacity_units)
+        )
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self))
+
+    @classmethod
+    def from_json(cls, raw: str) -> "NodeCapacity":
+        return cls(**json.loads(raw))
+
+
+# ============================================
+# FFmpeg progress
+# ============================================
+
+
+@dataclass
+class StreamProgress:
+    """One ``-progress`` block."""
+
+    metrics: FFmpegMetrics
+    dropped_frames: int = 0
+    ended: bool = False
+
+
+def _to_int(value: Optional[str]) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _to_float(value: Optional[str]) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class ProgressParser:
+    """Parse FFmpeg ``-progress`` output: key=value lines ending in ``progress=``."""
+
+    def __init__(self):
+        self._block: dict[str, str] = {}
+
+    def feed(self, line: str) -> Optional[StreamProgress]:
+        """Take one line; returns the block it completes, if any."""
+        key, sep, value = line.strip().partition("=")
+        if not sep:
+            return None
+        if key != "progress":
+            self._block[key] = value.strip()
+            return None
+
+        block, self._block = self._block, {}
+        total_size = block.get("total_size")
+        return StreamProgress(
+            metrics=FFmpegMetrics(
+                frame_count=_to_int(block.get("frame")),
+                fps=_to_float(block.get("fps")),
+                bitrate=int(_to_float(block.get("bitrate", "").removesuffix("kbits/s")) * 1000),
+                speed=block.get("speed", "N/A"),
+                time=block.get("out_time"),
+                size_kb=_to_int(total_size) // 1024 if total_size and total_size.isdigit() else None,
+            ),
+            dropped_frames=_to_int(block.get("drop_frames")),
+            ended=value.strip() == "end",
+        )
+
+
+class ManagedStream:
+    """One FFmpeg child and what it last reported."""
+
+    def __init__(self, job_id: str, launch: StreamLaunch, log_path: str):
+        self.job_id = job_id
+        self.launch = launch
+        self.log_path = log_path
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.progress: Optional[StreamProgress] = None
+        self.reported_dropped = 0  # dropped frames in the last health record
+        self.stopping = False
+        self._parser = ProgressParser()
+        self._ps: Optional[psutil.Process] = None
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self.process.pid if self.process else None
+
+    def is_running(self) -> bool:
+        return self.process is not None and self.process.returncode is None
+
+    async def start(self) -> None:
+        os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+        # The child keeps its own handle on the log; ours is closed right away
+        with open(self.log_path, "a") as log_file:
+            self.process = await asyncio.create_subprocess_exec(
+                *self.launch.cmd,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=log_file,
+            )
+        try:
+            self._ps = psutil.Process(self.process.pid)
+            self._ps.cpu_percent(None)  # first call only sets the baseline
+        except psutil.Error:
+            self._ps = None
+
+    async def wait(self) -> int:
+        """Read progress until FFmpeg exits; returns its exit code."""
+        async for raw in self.process.stdout:
+            progress = self._parser.feed(raw.decode("utf-8", errors="replace"))
+            if progress:
+                self.progress = progress
+        return await self.process.wait()
+
+    async def stop(self, timeout: float = STOP_TIMEOUT_SECONDS) -> None:
+        self.stopping = True
+        if not self.is_running():
+            return
+        try:
+            self.process.terminate()
+            await asyncio.wait_for(self.process.wait(), timeout)
+        except ProcessLookupError:
+            pass
+        except asyncio.TimeoutError:
+            logger.warning(f"FFmpeg for job {self.job_id} did not terminate gracefully, killing")
+            self.process.kill()
+            await self.process.wait()
+
+    def usage(self) -> tuple[float, float]:
+        """(CPU percent since the last call, resident memory in MB)."""
+        if self._ps is None:
+            return 0.0, 0.0
+        try:
+            return self._ps.cpu_percent(None), self._ps.memory_info().rss / (1024 * 1024)
+        except psutil.Error:
+            return 0.0, 0.0
+
+    def read_bytes(self) -> Optional[int]:
+        """Bytes FFmpeg has read, for source cache accounting."""
+        if self._ps is None:
+            return None
+        try:
+            io = self._ps.io_counters()
+        except (psutil.Error, AttributeError, NotImplementedError):
+            return None
+        return getattr(io, "read_chars", io.read_bytes)
+
+
+# ============================================
+# Redis registry
+# ============================================
+
+
+class StreamNodeRegistry:
+    """Node heartbeats and command queues in Redis."""
+
+    def __init__(self, redis, clock: Callable[[], float] = time.time):
+        self.redis = redis
+        self.clock = clock
+
+    # ----- Heartbeats -----
+
+    async def heartbeat(self, capacity: NodeCapacity, ttl_seconds: Optional[float] = None) -> None:
+        ttl_seconds = ttl_seconds or settings.STREAM_NODE_TTL_SECONDS
+        now = self.clock()
+        capacity.updated_at = now
+        await self.redis.zadd(NODES_KEY, {capacity.node_id: now})
+        await self.redis.set(node_info_key(capacity.node_id), capacity.to_json(), px=int(ttl_seconds * 1000))
+        await self.redis.zremrangebyscore(NODES_KEY, "-inf", now - ttl_seconds)
+
+    async def live_node_ids(self, ttl_seconds: Optional[float] = None) -> list[str]:
+        ttl_seconds = ttl_seconds or settings.STREAM_NODE_TTL_SECONDS
+        return list(await self.redis.zrangebyscore(NODES_KEY, self.clock() - ttl_seconds, "+inf"))
+
+    async def live_nodes(self, ttl_seconds: Optional[float] = None) -> list[NodeCapacity]:
+        """Capacity of every node that heartbeated within the TTL."""
+        node_ids = await self.live_node_ids(ttl_seconds)
+        if not node_ids:
+            return []
+        nodes = []
+        for node_id, raw in zip(node_ids, await self.redis.mget([node_info_key(n) for n in node_ids])):
+            if raw is None:
+                continue
+            try:
+                nodes.append(NodeCapacity.from_json(raw))
+            except (ValueError, TypeError):
+                logger.warning(f"Dropping malformed capacity of streaming node {node_id}")
+        return nodes
+
+    async def remove_node(self, node_id: str) -> None:
+        await self.redis.zrem(NODES_KEY, node_id)
+        await self.redis.delete(node_info_key(node_id))
+
+    # ----- Commands -----
+
+    async def send(self, command: StreamCommand, node_id: Optional[str] = None) -> None:
+        """Queue a command for one node, or for any node with room."""
+        key = node_commands_key(node_id) if node_id else SHARED_COMMANDS_KEY
+        await self.redis.lpush(key, command.to_json())
+
+    async def next_command(
+        self,
+        node_id: str,
+        take_shared: bool,
+        timeout: float,
+    ) -> Optional[StreamCommand]:
+        """Take the next command for a node, waiting up to ``timeout``.
+
+        The node's own queue goes first. Taken commands stay in the node's
+        processing list until acknowledged.
+        """
+        processing = node_processing_key(node_id)
+        raw = await self.redis.lmove(node_commands_key(node_id), processing, "RIGHT", "LEFT")
+        if raw is None:
+            source = SHARED_COMMANDS_KEY if take_shared else node_commands_key(node_id)
+            raw = await self.redis.blmove(source, processing, timeout, "RIGHT", "LEFT")
+        if raw is None:
+            return None
+        try:
+            return StreamCommand.from_json(raw)
+        except (ValueError, KeyError, TypeError):
+            logger.warning(f"Dropping malformed stream command {raw!r}")
+            await self.redis.lrem(processing, 1, raw)
+            return None
+
+    async def ack(self, node_id: str, command: StreamCommand) -> None:
+        await self.redis.lrem(node_processing_key(node_id), 1, command.raw or command.to_json())
+
+    async def requeue_unacked(self, node_id: str) -> int:
+        """Put back commands a previous run of the node took but never finished.
+
+        Starts go to the shared queue, other commands to the node's own.
+        """
+        processing = node_processing_key(node_id)
+        count = 0
+        for raw in await self.redis.lrange(processing, 0, -1):
+            try:
+                action = StreamCommand.from_json(raw).action
+            except (ValueError, KeyError, TypeError):
+                action = None
+            if action is not None:
+                key = SHARED_COMMANDS_KEY if action == START_STREAM else node_commands_key(node_id)
+                await self.redis.rpush(key, raw)
+                count += 1
+            await self.redis.lrem(processing, 1, raw)
+        return count
+
+
+# One registry per event loop: async Redis connections cannot be shared
+# across loops (Celery tasks run on their worker's task loop, or a fresh one).
+_registries: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, StreamNodeRegistry]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_stream_node_registry() -> StreamNodeRegistry:
+    """Get the streaming node registry for the running event loop."""
+    import redis.asyncio as aioredis
+
+    loop = asyncio.get_running_loop()
+    registry = _registries.get(loop)
+    if registry is None:
+        registry = StreamNodeRegistry(aioredis.from_url(settings.REDIS_URL, decode_responses=True))
+        _registries[loop] = registry
+    return registry
+
+
+async def send_stream_command(
+    command: StreamCommand,
+    node_id: Optional[str] = None,
+    registry: Optional[StreamNodeRegistry] = None,
+) -> None:
+    """Send a command to one node's supervisor, or to any node with room."""
+    await (registry or get_stream_node_registry()).send(command, node_id)
+
+
+# ============================================
+# Job state
+# ============================================
+
+
+class DatabaseJobStore:
+    """Stream job state as the supervisor reads and writes it."""
+
+    async def prepare(self, job_id: str, node_id: str) -> Optional[StreamLaunch]:
+        """Build the command for a job this node should (re)start, or None."""
+        from app.core.database import async_session_maker
+        from app.modules.stream.placement import StreamDemand, node_encoder
+        from app.modules.stream.stream_job_models import StreamJobStatus
+        from app.modules.stream.stream_job_repository import StreamJobRepository
+        from app.modules.stream.stream_job_tasks import _build_ffmpeg_launch
+
+        async with async_session_maker() as session:
+            job = await StreamJobRepository(session).get_by_id(job_id)
+            if job is None:
+                return None
+            starting = job.status == StreamJobStatus.STARTING.value and job.node_id in (None, node_id)
+            recovering = job.status == StreamJobStatus.RUNNING.value and job.node_id == node_id
+            if not (starting or recovering):
+                logger.info(f"Not starting job {job_id} in status {job.status} (node {job.node_id})")
+                return None
+            launch = await _build_ffmpeg_launch(session, job)
+            job.node_id = node_id
+            await session.commit()
+            launch.cmd = with_progress_pipe(launch.cmd)
+            launch.units = StreamDemand.from_job(job, launch.stream_copy).units(node_encoder())
+            return launch
+
+    async def started(self, job_id: str, node_id: str, pid: int) -> None:
+        from app.core.database import async_session_maker
+        from app.core.datetime_utils import to_naive_utc, utcnow
+        from app.modules.stream.stream_job_models import StreamJobStatus
+        from app.modules.stream.stream_job_repository import StreamJobRepository
+        from app.modules.stream.stream_job_tasks import _start_moderation_for_job
+
+        async with async_session_maker() as session:
+            repo = StreamJobRepository(session)
+            job = await repo.get_by_id(job_id)
+            if job is None:
+                return
+            job.pid = pid
+            job.node_id = node_id
+            job.status = StreamJobStatus.RUNNING.value
+            job.actual_start_at = to_naive_utc(utcnow())
+            await repo.update(job)
+            await _start_moderation_for_job(job)
+
+    async def exited(self, job_id: str, node_id: str, code: int) -> Optional[float]:
+        """Record an exit nobody asked for; returns the restart delay, or None."""
+        from app.core.database import async_session_maker
+        from app.modules.stream.stream_job_models import LoopMode, StreamJobStatus
+        from app.modules.stream.stream_job_repository import StreamJobRepository
+
+        async with async_session_maker() as session:
+            repo = StreamJobRepository(session)
+            job = await repo.get_by_id(job_id)
+            if job is None or job.node_id != node_id or job.status not in (
+                StreamJobStatus.STARTING.value,
+                StreamJobStatus.RUNNING.value,
+            ):
+                return None  # stopped, or taken over elsewhere
+
+            job.pid = None
+            if code == 0 and job.loop_mode != LoopMode.INFINITE.value:
+                job.node_id = None
+                await repo.update(job)
+                await repo.update_status(job.id, StreamJobStatus.COMPLETED)
+                return None
+
+            error = f"FFmpeg exited with code {code}"
+            if job.enable_auto_restart and job.restart_count < job.max_restarts:
+                delay = restart_delay(job.restart_count)
+                job.restart_count += 1
+                job.status = StreamJobStatus.STARTING.value
+                job.last_error = error
+                await repo.update(job)
+                return delay
+
+            job.node_id = None
+            await repo.update(job)
+            await repo.update_status(job.id, StreamJobStatus.FAILED, error)
+            return None
+
+    async def record_health(
+        self,
+        job_id: str,
+        progress: StreamProgress,
+        dropped_frames_delta: int,
+        cpu_percent: float,
+        memory_mb: float,
+    ) -> None:
+        from app.core.database import async_session_maker
+        from app.modules.stream.stream_job_models import StreamJobHealth
+        from app.modules.stream.stream_job_repository import (
+            StreamJobHealthRepository,
+            StreamJobRepository,
+        )
+
+        metrics = progress.metrics
+        async with async_session_maker() as session:
+            await StreamJobRepository(session).update_metrics(
+                job_id=job_id,
+                bitrate=metrics.bitrate,
+                fps=metrics.fps,
+                speed=metrics.speed,
+                dropped_frames=progress.dropped_frames,
+                frame_count=metrics.frame_count,
+            )
+            await StreamJobHealthRepository(session).create(StreamJobHealth(
+                stream_job_id=job_id,
+                bitrate=metrics.bitrate,
+                fps=metrics.fps,
+                speed=metrics.speed,
+                dropped_frames=progress.dropped_frames,
+                dropped_frames_delta=dropped_frames_delta,
+                frame_count=metrics.frame_count,
+                cpu_percent=cpu_percent,
+                memory_mb=memory_mb,
+            ))
+
+    async def release(self, job_id: str, node_id: str) -> bool:
+        """Hand a job this node is giving up back for another start."""
+        from app.core.database import async_session_maker
+        from app.modules.stream.stream_job_models import StreamJobStatus
+        from app.modules.stream.stream_job_repository import StreamJobRepository
+
+        async with async_session_maker() as session:
+            repo = StreamJobRepository(session)
+            job = await repo.get_by_id(job_id)
+            if job is None or job.node_id != node_id or not job.can_stop():
+                return False
+            job.node_id = None
+            job.pid = None
+            job.status = StreamJobStatus.STARTING.value
+            await repo.update(job)
+            return True
+
+    async def owned_jobs(self, node_id: str) -> list[tuple[str, Optional[int]]]:
+        """(job id, pid) of active jobs recorded as running on this node."""
+        from app.core.database import async_session_maker
+        from app.modules.stream.stream_job_repository import StreamJobRepository
+
+        async with async_session_maker() as session:
+            jobs = await StreamJobRepository(session).get_active_jobs()
+            return [(str(job.id), job.pid) for job in jobs if job.node_id == node_id]
+
+    async def still_owned(self, job_ids: list[str], node_id: str) -> set[str]:
+        """The given jobs that are still starting or running on this node."""
+        import uuid
+
+        from sqlalchemy import select
+
+        from app.core.database import async_session_maker
+        from app.modules.stream.stream_job_models import StreamJob, StreamJobStatus
+
+        async with async_session_maker() as session:
+            result = await session.execute(
+                select(StreamJob.id).where(
+                    StreamJob.id.in_([uuid.UUID(job_id) for job_id in job_ids]),
+                    StreamJob.node_id == node_id,
+                    StreamJob.status.in_([StreamJobStatus.STARTING.value, StreamJobStatus.RUNNING.value]),
+                )
+            )
+            return {str(job_id) for job_id in result.scalars()}
+
+
+# ============================================
+# Supervisor
+# ============================================
+
+
+class StreamSupervisor:
+    """Runs this node's streams for as long as the process lives."""
+
+    def __init__(
+        self,
+        registry: StreamNodeRegistry,
+        store: Optional[Any] = None,
+        node_id: Optional[str] = None,
+        max_streams: Optional[int] = None,
+        max_cpu_percent: Optional[float] = None,
+        max_encoder_sessions: Optional[int] = None,
+        encoder: Optional[str] = None,
+        capacity_units: Optional[float] = None,
+        log_dir: str = LOG_DIR,
+        poll_timeout: float = 1.0,
+    ):
+        from app.modules.stream.placement import StreamPlacer
+
+        self.registry = registry
+        self.placer = StreamPlacer(registry)
+        self.store = store or DatabaseJobStore()
+        self.node_id = node_id or default_node_id()
+        self.max_streams = max_streams or settings.STREAM_NODE_MAX_STREAMS
+        self.max_cpu_percent = max_cpu_percent or settings.STREAM_NODE_MAX_CPU_PERCENT
+        self.max_encoder_sessions = (
+            settings.STREAM_NODE_MAX_ENCODER_SESSIONS if max_encoder_sessions is None else max_encoder_sessions
+        )
+        self.encoder = encoder
+        self.capacity_units = capacity_units
+        self.log_dir = log_dir
+        self.poll_timeout = poll_timeout
+        self.streams: dict[str, ManagedStream] = {}
+        self.tasks: dict[str, asyncio.Task] = {}
+        self.cpu_percent = 0.0
+        self._running = False
+
+    # ----- Lifecycle -----
+
+    async def run(self) -> None:
+        """Supervise until stopped, then hand this node's jobs back."""
+        self._running = True
+        if self.encoder is None:
+            from app.modules.stream.placement import node_encoder
+
+            # Probing hardware encoders runs FFmpeg; keep the loop free
+            self.encoder = await asyncio.to_thread(node_encoder)
+        if self.capacity_units is None:
+            from app.modules.stream.placement import node_capacity_units
+
+            self.capacity_units = node_capacity_units(self.encoder)
+        requeued = await self.registry.requeue_unacked(self.node_id)
+        if requeued:
+            logger.info(f"Re-queued {requeued} unfinished stream commands")
+        await self.heartbeat()
+        await self.recover()
+        logger.info(
+            f"Stream supervisor {self.node_id} started "
+            f"({self.capacity_units:g} stream units, encoder {self.encoder})"
+        )
+
+        loops = [
+            asyncio.create_task(self._every(settings.STREAM_NODE_HEARTBEAT_SECONDS, self.heartbeat)),
+            asyncio.create_task(self._every(settings.STREAM_SUPERVISOR_HEALTH_INTERVAL_SECONDS, self.report_health)),
+        ]
+        try:
+            while self._running:
+                await self.poll_command()
+        finally:
+            for loop in loops:
+                loop.cancel()
+            await self.shutdown()
+
+    def stop(self) -> None:
+        self._running = False
+
+    async def shutdown(self) -> None:
+        """Stop every stream and queue its job for another node."""
+        job_ids = list(self.tasks)
+        await asyncio.gather(*(self.stop_job(job_id) for job_id in job_ids), return_exceptions=True)
+        for job_id in job_ids:
+            try:
+                if await self.store.release(job_id, self.node_id):
+                    await self.registry.send(StreamCommand(START_STREAM, job_id))
+            except Exception as e:
+                logger.error(f"Could not hand job {job_id} to another node: {e}")
+        try:
+            await self.registry.remove_node(self.node_id)
+        except Exception:
+            pass
+        logger.info(f"Stream supervisor {self.node_id} stopped")
+
+    async def recover(self) -> None:
+        """Restart jobs a previous run of this node left running.
+
+        Their FFmpeg processes cannot be adopted (the progress pipe went with
+        the old supervisor), so any still alive are killed first.
+        """
+        for job_id, pid in await self.store.owned_jobs(self.node_id):
+            if job_id in self.tasks:
+                continue
+            if pid:
+                _kill_orphan(pid)
+            logger.info(f"Recovering stream job {job_id}")
+            self.start_job(job_id)
+
+    # ----- Commands -----
+
+    async def poll_command(self) -> None:
+        """Wait for one command and handle it."""
+        try:
+            command = await self.registry.next_command(
+                self.node_id, self.capacity().has_room(), self.poll_timeout
+            )
+        except Exception as e:
+            logger.error(f"Could not read stream commands: {e}")
+            await asyncio.sleep(self.poll_timeout)
+            return
+        if command is None:
+            return
+
+        result = "done"
+        try:
+            if command.action == START_STREAM:
+                if not self.start_job(command.job_id):
+                    result = "ignored"
+            elif command.action == STOP_STREAM:
+                if not await self.stop_job(command.job_id):
+                    result = "ignored"
+            else:
+                logger.warning(f"Dropping unknown stream command {command.action}")
+                result = "ignored"
+        except Exception as e:
+            logger.error(f"Stream command {command.action} for job {command.job_id} failed: {e}")
+            result = "error"
+        finally:
+            await self.registry.ack(self.node_id, command)
+        STREAM_NODE_COMMANDS_TOTAL.labels(action=command.action, result=result).inc()
+
+    def start_job(self, job_id: str) -> bool:
+        """Start supervising a job; False if it already runs here."""
+        if job_id in self.tasks:
+            return False
+        self.tasks[job_id] = asyncio.create_task(self._run_job(job_id))
+        return True
+
+    async def stop_job(self, job_id: str) -> bool:
+        """Stop a job's stream and any pending restart; False if it is not here."""
+        task = self.tasks.get(job_id)
+        if task is None:
+            return False
+        stream = self.streams.get(job_id)
+        if stream is not None:
+            await stream.stop()
+        if not task.done():
+            # A pending restart or a start being prepared
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        return True
+
+    # ----- Streams -----
+
+    async def _run_job(self, job_id: str) -> None:
+        """Run a job's FFmpeg, restarting it until it stops or gives up."""
+        try:
+            while True:
+                launch = await self.store.prepare(job_id, self.node_id)
+                if launch is None:
+                    return
+                await self._reserve(job_id, launch.units)
+                stream = ManagedStream(job_id, launch, os.path.join(self.log_dir, f"ffmpeg_{job_id}.log"))
+                self.streams[job_id] = stream
+                code = await self._run_once(stream)
+                if stream.stopping:
+                    logger.info(f"FFmpeg for job {job_id} stopped")
+                    return
+
+                logger.warning(f"FFmpeg for job {job_id} exited with code {code}")
+                delay = await self.store.exited(job_id, self.node_id, code)
+                if delay is None:
+                    return
+                STREAM_NODE_RESTARTS_TOTAL.inc()
+                logger.info(f"Restarting job {job_id} in {delay:.0f}s")
+                await asyncio.sleep(delay)
+        except Exception as e:
+            logger.error(f"Supervising job {job_id} failed: {e}")
+        finally:
+            self.streams.pop(job_id, None)
+            self.tasks.pop(job_id, None)
+            await self._release(job_id)
+
+    async def _run_once(self, stream: ManagedStream) -> int:
+        """Run FFmpeg until it exits; returns the exit code."""
+        try:
+            await stream.start()
+        except OSError as e:
+            logger.error(f"Failed to start FFmpeg for job {stream.job_id}: {e}")
+            self._cleanup(stream)
+            return -1
+
+        self._track(stream, 1)
+        try:
+            if stream.launch.cached_sources:
+                _source_cache().track_reads(stream.job_id, stream.pid)
+            await self.store.started(stream.job_id, self.node_id, stream.pid)
+            logger.info(f"FFmpeg started with PID {stream.pid} for job {stream.job_id}")
+            return await stream.wait()
+        finally:
+            # Still running only when cancelled or the job could not be recorded
+            if stream.is_running():
+                await stream.stop()
+            self._track(stream, -1)
+            self._cleanup(stream)
+
+    async def _reserve(self, job_id: str, units: float) -> None:
+        """Hold the job's actual units here, replacing the placement estimate."""
+        try:
+            await self.placer.reserve(self.node_id, job_id, units)
+        except Exception as e:
+            logger.warning(f"Could not reserve stream units for job {job_id}: {e}")
+
+    async def _release(self, job_id: str) -> None:
+        try:
+            await self.placer.release(job_id, self.node_id)
+        except Exception as e:
+            logger.warning(f"Could not release stream units of job {job_id}: {e}")
+
+    def _track(self, stream: ManagedStream, change: int) -> None:
+        STREAM_NODE_STREAMS.labels(mode="copy" if stream.launch.stream_copy else "encode").inc(change)
+
+    def _cleanup(self, stream: ManagedStream) -> None:
+        """Drop node-local files of a stream that ended."""
+        if stream.launch.concat_path:
+            try:
+                os.remove(stream.launch.concat_path)
+            except OSError:
+                pass
+        if stream.launch.cached_sources:
+            _source_cache().release(stream.job_id)
+
+    # ----- Capacity and health -----
+
+    def capacity(self) -> NodeCapacity:
+        return NodeCapacity(
+            node_id=self.node_id,
+            streams=len(self.tasks),
+            encoder_sessions=sum(
+                1 for stream in self.streams.values() if stream.is_running() and not stream.launch.stream_copy
+            ),
+            cpu_percent=self.cpu_percent,
+            max_streams=self.max_streams,
+            max_encoder_sessions=self.max_encoder_sessions,
+            max_cpu_percent=self.max_cpu_percent,
+            encoder=self.encoder or "libx264",
+            capacity_units=self.capacity_units or 0.0,
+            reserved_units=round(sum(stream.launch.units for stream in self.streams.values()), 3),
+        )
+
+    async def heartbeat(self) -> None:
+        self.cpu_percent = psutil.cpu_percent(None)
+        await self.registry.heartbeat(self.capacity())
+
+    async def reconcile(self) -> None:
+        """Stop streams whose job was stopped or taken over by another node.
+
+        A STOP command can be lost, and a node that missed heartbeats has its
+        jobs re-placed elsewhere while its own FFmpeg keeps pushing.
+        """
+        job_ids = list(self.streams)
+        if not job_ids:
+            return
+        owned = await self.store.still_owned(job_ids, self.node_id)
+        for job_id in job_ids:
+            if job_id not in owned and await self.stop_job(job_id):
+                logger.warning(f"Stopped job {job_id}: no longer running on node {self.node_id}")
+
+    async def report_health(self) -> None:
+        """Record the latest progress of every running stream."""
+        try:
+            await self.reconcile()
+        except Exception as e:
+            logger.error(f"Could not reconcile streams with their jobs: {e}")
+        for job_id, stream in list(self.streams.items()):
+            if not stream.is_running() or stream.progress is None:
+                continue
+            cpu_percent, memory_mb = stream.usage()
+            progress = stream.progress
+            try:
+                await self.store.record_health(
+                    job_id,
+                    progress,
+                    max(0, progress.dropped_frames - stream.reported_dropped),
+                    cpu_percent,
+                    memory_mb,
+                )
+                stream.reported_dropped = progress.dropped_frames
+            except Exception as e:
+                logger.error(f"Could not record health of job {job_id}: {e}")
+            if stream.launch.cached_sources:
+                read_bytes = stream.read_bytes()
+                if read_bytes is not None:
+                    _source_cache().record_reads(job_id, stream.pid, read_bytes)
+
+    async def _every(self, interval: float, action: Callable) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await action()
+            except Exception as e:
+                logger.error(f"Stream supervisor {action.__name__} failed: {e}")
+
+
+def _source_cache():
+    from app.modules.stream.source_cache import get_stream_source_cache
+
+    return get_stream_source_cache()
+
+
+def _kill_orphan(pid: int) -> None:
+    """Kill an FFmpeg left behind by a previous supervisor run."""
+    try:
+        process = psutil.Process(pid)
+        if "ffmpeg" in process.name().lower():
+            process.kill()
+            process.wait(timeout=STOP_TIMEOUT_SECONDS)
+    except (psutil.Error, psutil.TimeoutExpired):
+        pass
+
+
+async def run_stream_supervisor() -> None:
+    """Run this node's supervisor until interrupted."""
+    import signal
+
+    supervisor = StreamSupervisor(get_stream_node_registry())
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, supervisor.stop)
+        except NotImplementedError:
+            pass
+    await supervisor.run()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run_stream_supervisor())
@@ -4,16 +4,16 @@ Implements stream scheduling, auto-start/stop, and auto-restart on disconnection
 Requirements: 6.1, 6.4, 6.5
 """
 
-import asyncio
 import logging
 import uuid
 from datetime import datetime, timedelta
 from typing import Optional
 
 from celery import Task
-from sqlalchemy import select
+from sqlalchemy import select, text
 
 from app.core.celery_app import celery_app
+from app.core.task_loop import run_async
 from app.core.config import settings
 from app.core.database import celery_session_maker
 from app.core.datetime_utils import utcnow, ensure_utc, to_naive_utc
@@ -38,11 +38,11 @@ logger = logging.getLogger(__name__)
 def _run_async(coro):
     """Run async coroutine in Celery task context.
     
-    Uses asyncio.run() which creates a fresh event loop for each task.
-    Combined with NullPool in celery_session_maker, this avoids
-    connection pool conflicts across different event loops.
+    Runs on the worker process's persistent event loop, whose pooled
+    engine serves celery_session_maker (see app.core.task_loop). Falls
+    back to asyncio.run() outside a prefork worker.
     """
-    return asyncio.run(coro)
+    return run_async(coro)
 
 
 # Stream-specific retry configuration
@@ -1139,24 +1139,27 @@ def cleanup_old_health_logs(
 
 
 async def _cleanup_old_health_logs_async(retention_days: int) -> dict:
-    """Async implementation of health log cleanup."""
-    cutoff_date = to_naive_utc(utcnow()) - timedelta(days=retention_days)
-    total_deleted = 0
+    """Async implementation of health log cleanup.
+
+    stream_health_logs is partitioned by day, so retention drops every
+    partition that lies wholly before the cutoff instead of deleting rows.
+    Older history stays available from the 1-minute and 1-hour rollups.
+    """
+    from app.modules.stream.health_timeseries import (
+        get_partitioned_table,
+        list_partitions,
+        partitions_to_drop,
+    )
+
+    now = to_naive_utc(utcnow())
+    cutoff_date = now - timedelta(days=retention_days)
+    table = get_partitioned_table(StreamHealthLog.__tablename__)
     
     async with celery_session_maker() as session:
-        health_repo = StreamHealthLogRepository(session)
-        
-        # Get all sessions with old logs
-        result = await session.execute(
-            select(StreamHealthLog.session_id)
-            .where(StreamHealthLog.collected_at < cutoff_date)
-            .distinct()
-        )
-        session_ids = [row[0] for row in result.all()]
-        
-        for session_id in session_ids:
-            deleted = await health_repo.delete_old_logs(session_id, cutoff_date)
-            total_deleted += deleted
+        existing = await list_partitions(session, table.table)
+        dropped = partitions_to_drop(table, existing, now, cutoff=cutoff_date)
+        for name in dropped:
+            await session.execute(text(f"DROP TABLE IF EXISTS {name}"))
         
         await session.commit()
     
@@ -1164,8 +1167,7 @@ async def _cleanup_old_health_logs_async(retention_days: int) -> dict:
         "success": True,
         "retention_days": retention_days,
         "cutoff_date": cutoff_date.isoformat(),
-        "sessions_processed": len(session_ids),
-        "logs_deleted": total_deleted,
+        "partitions_dropped": dropped,
     }
 
 
@@ -0,0 +1,435 @@
+"""Cluster health snapshot built from the Celery event stream.
+
+Health endpoints used to ask the workers directly with ``celery inspect``.
+That is a broadcast which blocks until its reply timeout, once per request.
+A collector process now consumes Celery events continuously (worker
+heartbeats, tasks started, succeeded and failed) and keeps a rolling
+snapshot in Redis:
+
+- workers, whether they are alive, and the tasks each is running
+- tasks in progress, throughput and failure rate per queue over a window
+- queue depths
+
+Endpoints read the snapshot with a single GET and report its age.
+
+Events do not carry a worker's pool size or the queues it consumes. The
+collector asks for those with ``inspect`` about once a minute, on a
+thread of its own. Workers send task events because of
+``worker_send_task_events``. Every collector sees every event, so running
+two only adds redundancy.
+
+Run a collector with:
+
+    python -m app.modules.system_monitoring.cluster_health
+
+Requirements: 24.1, 24.2
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import Counter, OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Optional
+
+from app.core.celery_queues import all_queue_depths, route_for
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_KEY = "monitoring:cluster:snapshot"
+
+# Throughput and failures are counted in buckets of this many seconds
+BUCKET_SECONDS = 10
+# A worker is lost after this many heartbeat intervals without one
+HEARTBEAT_MISSES = 3
+# Lost workers stay listed (as offline) this long
+FORGET_WORKER_SECONDS = 600
+# Task names remembered to attribute finished tasks to a queue
+MAX_TRACKED_TASKS = 10000
+INSPECT_INTERVAL_SECONDS = 60.0
+UNKNOWN_QUEUE = "unknown"
+
+
+@dataclass
+class WorkerHealth:
+    """One worker as the event stream last saw it."""
+
+    hostname: str
+    alive: bool = True
+    active: int = 0
+    processed: int = 0
+    failed: int = 0
+    concurrency: int = 0
+    pool: str = ""
+    queues: list[str] = field(default_factory=list)
+    loadavg: list[float] = field(default_factory=list)
+    last_heartbeat: float = 0.0
+    online_since: Optional[float] = None
+
+
+@dataclass
+class QueueHealth:
+    """A queue's backlog and what its tasks did over the window."""
+
+    name: str
+    depth: int = 0
+    depth_by_priority: dict[int, int] = field(default_factory=dict)
+    processing: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    throughput_per_minute: float = 0.0
+
+
+@dataclass
+class ClusterSnapshot:
+    """The cluster's health at ``generated_at``."""
+
+    generated_at: float
+    window_seconds: float
+    workers: list[WorkerHealth] = field(default_factory=list)
+    queues: list[QueueHealth] = field(default_factory=list)
+    succeeded: int = 0
+    failed: int = 0
+    throughput_per_minute: float = 0.0
+    failure_rate: float = 0.0
+    failures_by_task: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def alive_workers(self) -> list[WorkerHealth]:
+        return [w for w in self.workers if w.alive]
+
+    @property
+    def processing(self) -> int:
+        return sum(w.active for w in self.alive_workers)
+
+    @property
+    def capacity(self) -> int:
+        return sum(w.concurrency for w in self.alive_workers)
+
+    def age_seconds(self, now: Optional[float] = None) -> float:
+        return max((now if now is not None else time.time()) - self.generated_at, 0.0)
+
+    def is_stale(self, now: Optional[float] = None) -> bool:
+        return self.age_seconds(now) > settings.CLUSTER_HEALTH_STALE_SECONDS
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self))
+
+    @classmethod
+    def from_json(cls, raw: str) -> "ClusterSnapshot":
+        data = json.loads(raw)
+        data["workers"] = [WorkerHealth(**w) for w in data.get("workers", [])]
+        queues = []
+        for q in data.get("queues", []):
+            # JSON object keys are strings
+            q["depth_by_priority"] = {int(p): d for p, d in q.get("depth_by_priority", {}).items()}
+            queues.append(QueueHealth(**q))
+        data["queues"] = queues
+        return cls(**data)
+
+
+@dataclass
+class _Bucket:
+    succeeded: Counter = field(default_factory=Counter)  # by queue
+    failed: Counter = field(default_factory=Counter)  # by queue
+    failed_tasks: Counter = field(default_factory=Counter)  # by task name
+
+
+class ClusterHealthAggregator:
+    """Folds Celery events into a rolling view of the cluster.
+
+    Events arrive on the receiver's thread and snapshots are taken on the
+    collector's loop, so both go through one lock.
+    """
+
+    def __init__(self, window_seconds: Optional[float] = None, clock: Callable[[], float] = time.time):
+        self.window_seconds = float(window_seconds or settings.CLUSTER_HEALTH_WINDOW_SECONDS)
+        self.clock = clock
+        self.started_at = clock()
+        self._lock = threading.Lock()
+        self._workers: dict[str, WorkerHealth] = {}
+        self._freq: dict[str, float] = {}
+        self._task_names: "OrderedDict[str, str]" = OrderedDict()
+        # task id -> (queue, worker) of tasks that started and have not finished
+        self._in_flight: dict[str, tuple[str, str]] = {}
+        self._buckets: dict[int, _Bucket] = {}
+
+    def on_event(self, event: dict) -> None:
+        handler = getattr(self, "_on_" + event.get("type", "").replace("-", "_"), None)
+        if handler is None:
+            return
+        with self._lock:
+            handler(event, self.clock())
+
+    def set_worker_info(self, info: dict[str, dict]) -> None:
+        """Pool size, pool and queues of each worker, from ``inspect``."""
+        with self._lock:
+            for hostname, details in info.items():
+                worker = self._workers.get(hostname)
+                if worker is None:
+                    continue
+                worker.concurrency = int(details.get("concurrency") or 0)
+                worker.pool = details.get("pool", "")
+                worker.queues = list(details.get("queues", []))
+
+    # Worker events
+
+    def _worker(self, event: dict, now: float) -> WorkerHealth:
+        hostname = event["hostname"]
+        worker = self._workers.get(hostname)
+        if worker is None:
+            worker = self._workers[hostname] = WorkerHealth(hostname=hostname)
+        worker.alive = True
+        worker.last_heartbeat = now
+        self._freq[hostname] = float(event.get("freq") or 2.0)
+        return worker
+
+    def _on_worker_online(self, event: dict, now: float) -> None:
+        self._worker(event, now).online_since = now
+
+    def _on_worker_heartbeat(self, event: dict, now: float) -> None:
+        worker = self._worker(event, now)
+        worker.active = int(event.get("active") or 0)
+        worker.processed = int(event.get("processed") or 0)
+        worker.loadavg = [round(float(x), 2) for x in event.get("loadavg") or []]
+        if worker.online_since is None:
+            worker.online_since = now
+
+    def _on_worker_offline(self, event: dict, now: float) -> None:
+        worker = self._workers.get(event["hostname"])
+        if worker is not None:
+            self._lose(worker)
+
+    def _lose(self, worker: WorkerHealth) -> None:
+        worker.alive = False
+        worker.active = 0
+        for task_id, (_, hostname) in list(self._in_flight.items()):
+            if hostname == worker.hostname:
+                del self._in_flight[task_id]
+
+    # Task events
+
+    def _queue_of(self, task_id: str) -> str:
+        name = self._task_names.get(task_id)
+        return route_for(name)[0] if name else UNKNOWN_QUEUE
+
+    def _on_task_received(self, event: dict, now: float) -> None:
+        self._task_names[event["uuid"]] = event.get("name", "")
+        self._task_names.move_to_end(event["uuid"])
+        while len(self._task_names) > MAX_TRACKED_TASKS:
+            self._task_names.popitem(last=False)
+
+    def _on_task_started(self, event: dict, now: float) -> None:
+        self._in_flight[event["uuid"]] = (self._queue_of(event["uuid"]), event.get("hostname", ""))
+
+    def _on_task_succeeded(self, event: dict, now: float) -> None:
+        queue = self._finish(event["uuid"])
+        self._bucket(now).succeeded[queue] += 1
+
+    def _on_task_failed(self, event: dict, now: float) -> None:
+        queue = self._finish(event["uuid"])
+        bucket = self._bucket(now)
+        bucket.failed[queue] += 1
+        bucket.failed_tasks[self._task_names.get(event["uuid"]) or "unknown"] += 1
+        worker = self._workers.get(event.get("hostname", ""))
+        if worker is not None:
+            worker.failed += 1
+
+    def _on_task_retried(self, event: dict, now: float) -> None:
+        self._finish(event["uuid"])
+
+    _on_task_revoked = _on_task_retried
+    _on_task_rejected = _on_task_retried
+
+    def _finish(self, task_id: str) -> str:
+        queue, _ = self._in_flight.pop(task_id, (None, None))
+        return queue or self._queue_of(task_id)
+
+    def _bucket(self, now: float) -> _Bucket:
+        index = int(now // BUCKET_SECONDS)
+        bucket = self._buckets.get(index)
+        if bucket is None:
+            bucket = self._buckets[index] = _Bucket()
+            self._prune(now)
+        return bucket
+
+    def _prune(self, now: float) -> None:
+        oldest = int((now - self.window_seconds) // BUCKET_SECONDS)
+        for index in [i for i in self._buckets if i <= oldest]:
+            del self._buckets[index]
+
+    def _expire_workers(self, now: float) -> None:
+        for hostname, worker in list(self._workers.items()):
+            silent = now - worker.last_heartbeat
+            if worker.alive and silent > self._freq.get(hostname, 2.0) * HEARTBEAT_MISSES:
+                self._lose(worker)
+            if not worker.alive and silent > FORGET_WORKER_SECONDS:
+                del self._workers[hostname]
+                self._freq.pop(hostname, None)
+
+    # Snapshot
+
+    def snapshot(self, depths: Optional[dict[str, dict[int, int]]] = None) -> ClusterSnapshot:
+        """The current view, with the given queue depths by priority."""
+        depths = depths or {}
+        with self._lock:
+            now = self.clock()
+            self._expire_workers(now)
+            self._prune(now)
+
+            succeeded, failed, failed_tasks = Counter(), Counter(), Counter()
+            for bucket in self._buckets.values():
+                succeeded.update(bucket.succeeded)
+                failed.update(bucket.failed)
+                failed_tasks.update(bucket.failed_tasks)
+            processing = Counter(queue for queue, _ in self._in_flight.values())
+            minutes = max(min(self.window_seconds, now - self.started_at), BUCKET_SECONDS) / 60
+
+            queues = []
+            for name in sorted(set(depths) | set(succeeded) | set(failed) | set(processing)):
+                by_priority = depths.get(name, {})
+                queues.append(QueueHealth(
+                    name=name,
+                    depth=sum(by_priority.values()),
+                    depth_by_priority={p: d for p, d in by_priority.items() if d},
+                    processing=processing[name],
+                    succeeded=succeeded[name],
+                    failed=failed[name],
+                    throughput_per_minute=round((succeeded[name] + failed[name]) / minutes, 2),
+                ))
+
+            total_succeeded, total_failed = sum(succeeded.values()), sum(failed.values())
+            finished = total_succeeded + total_failed
+            return ClusterSnapshot(
+                generated_at=now,
+                window_seconds=self.window_seconds,
+                workers=[WorkerHealth(**asdict(w)) for w in sorted(self._workers.values(), key=lambda w: w.hostname)],
+                queues=queues,
+                succeeded=total_succeeded,
+                failed=total_failed,
+                throughput_per_minute=round(finished / minutes, 2),
+                failure_rate=round(total_failed / finished, 4) if finished else 0.0,
+                failures_by_task=dict(failed_tasks.most_common(10)),
+            )
+
+
+class ClusterHealthCollector:
+    """Receives Celery events and keeps the snapshot in Redis fresh."""
+
+    def __init__(
+        self,
+        redis,
+        app=None,
+        aggregator: Optional[ClusterHealthAggregator] = None,
+        interval: Optional[float] = None,
+    ):
+        if app is None:
+            from app.core.celery_app import celery_app as app
+        self.redis = redis
+        self.app = app
+        self.aggregator = aggregator or ClusterHealthAggregator()
+        self.interval = interval or settings.CLUSTER_HEALTH_INTERVAL_SECONDS
+        self._running = False
+        self._receiver = None
+        self._last_inspect: Optional[float] = None
+
+    async def run(self) -> None:
+        """Collect until stopped."""
+        self._running = True
+        thread = threading.Thread(target=self._capture, name="celery-events", daemon=True)
+        thread.start()
+        logger.info("Cluster health collector started")
+        while self._running:
+            try:
+                await self.publish()
+            except Exception as e:
+                logger.error(f"Cluster health snapshot failed: {e}")
+            await asyncio.sleep(self.interval)
+        if self._receiver is not None:
+            self._receiver.should_stop = True
+        logger.info("Cluster health collector stopped")
+
+    def stop(self) -> None:
+        self._running = False
+
+    async def publish(self) -> ClusterSnapshot:
+        """Write a fresh snapshot to Redis."""
+        if self._last_inspect is None or time.monotonic() - self._last_inspect >= INSPECT_INTERVAL_SECONDS:
+            self._last_inspect = time.monotonic()
+            try:
+                self.aggregator.set_worker_info(await asyncio.to_thread(self._inspect))
+            except Exception as e:
+                logger.warning(f"Could not inspect workers: {e}")
+
+        snapshot = self.aggregator.snapshot(await all_queue_depths(self.redis))
+        # Kept past staleness so readers can still report how old it is
+        ttl = max(int(settings.CLUSTER_HEALTH_STALE_SECONDS * 4), 1)
+        await self.redis.set(SNAPSHOT_KEY, snapshot.to_json(), ex=ttl)
+        return snapshot
+
+    def _capture(self) -> None:
+        """Consume the event stream, reconnecting until stopped."""
+        while self._running:
+            try:
+                with self.app.connection_for_read() as connection:
+                    self._receiver = self.app.events.Receiver(
+                        connection, handlers={"*": self.aggregator.on_event}
+                    )
+                    self._receiver.capture(limit=None, timeout=None, wakeup=True)
+            except Exception as e:
+                logger.warning(f"Celery event stream lost, reconnecting: {e}")
+                time.sleep(self.interval)
+
+    def _inspect(self) -> dict[str, dict]:
+        """Pool size and queues of every worker (blocking)."""
+        inspect = self.app.control.inspect(timeout=2.0)
+        stats = inspect.stats() or {}
+        active_queues = inspect.active_queues() or {}
+        return {
+            hostname: {
+                "concurrency": worker_stats.get("pool", {}).get("max-concurrency", 0),
+                "pool": worker_stats.get("pool", {}).get("implementation", "").rsplit(":", 1)[-1],
+                "queues": [q["name"] for q in active_queues.get(hostname, [])],
+            }
+            for hostname, worker_stats in stats.items()
+        }
+
+
+async def get_cluster_snapshot(redis=None) -> Optional[ClusterSnapshot]:
+    """The latest snapshot, or None if no collector has written one."""
+    if redis is None:
+        from app.core.redis import get_redis
+
+        redis = await get_redis()
+    raw = await redis.get(SNAPSHOT_KEY)
+    if not raw:
+        return None
+    try:
+        return ClusterSnapshot.from_json(raw)
+    except (ValueError, TypeError) as e:
+        logger.warning(f"Unreadable cluster health snapshot: {e}")
+        return None
+
+
+async def run_cluster_health_collector() -> None:
+    """Run one collector process until interrupted."""
+    import signal
+
+    from app.core.redis import get_redis
+
+    collector = ClusterHealthCollector(await get_redis())
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, collector.stop)
+        except NotImplementedError:
+            pass
+    await collector.run()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run_cluster_health_collector())
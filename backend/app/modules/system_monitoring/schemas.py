@@ -91,6 +91,9 @@ class WorkerMetrics(BaseModel):
     total_capacity: int = Field(..., description="Total worker capacity")
     current_load: int = Field(..., description="Current total load")
     utilization_percent: float = Field(..., description="Worker utilization percentage")
+    snapshot_age_seconds: Optional[float] = Field(
+        None, description="Age of the cluster health snapshot these come from"
+    )
 
 
 class QueueMetrics(BaseModel):
@@ -105,6 +108,13 @@ class QueueMetrics(BaseModel):
     failed_total: int = Field(..., description="Total failed jobs")
     dlq_size: int = Field(..., description="Dead letter queue size")
     processing_rate: float = Field(..., description="Jobs processed per second")
+    depth_by_priority: dict[int, int] = Field(
+        default_factory=dict,
+        description="Jobs in queue by priority (0 runs first)",
+    )
+    window_seconds: Optional[float] = Field(
+        None, description="Window the completed, failed and rate figures cover"
+    )
 
 
 class ResourceMetrics(BaseModel):
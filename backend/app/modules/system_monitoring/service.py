@@ -155,7 +155,7 @@ class SystemMonitoringService:
             )
     
     async def _check_celery_health(self) -> ComponentHealth:
-        """Check Celery workers health.
+        """Check Celery workers health from the cluster health snapshot.
         
         Returns:
             ComponentHealth for Celery
@@ -163,20 +163,30 @@ class SystemMonitoringService:
         start_time = time.perf_counter()
         
         try:
-            from app.core.celery_app import celery_app
+            from app.modules.system_monitoring.cluster_health import get_cluster_snapshot
             
-            # Inspect active workers
-            inspect = celery_app.control.inspect()
-            active_workers = inspect.active()
+            snapshot = await get_cluster_snapshot()
             
             latency = (time.perf_counter() - start_time) * 1000
             
-            if active_workers:
-                worker_count = len(active_workers)
+            if snapshot is None:
+                return ComponentHealth(
+                    name="celery",
+                    status=HealthStatus.DEGRADED,
+                    message="No cluster health snapshot; is the collector running?",
+                    latency_ms=round(latency, 2),
+                    last_check=utcnow(),
+                )
+            
+            age = snapshot.age_seconds()
+            worker_count = len(snapshot.alive_workers)
+            if snapshot.is_stale():
+                status = HealthStatus.DEGRADED
+                message = f"Cluster health snapshot is {age:.0f}s old"
+            elif worker_count:
                 status = HealthStatus.HEALTHY
                 message = f"{worker_count} worker(s) active"
             else:
-                worker_count = 0
                 status = HealthStatus.DEGRADED
                 message = "No active workers found"
             
@@ -186,7 +196,13 @@ class SystemMonitoringService:
                 message=message,
                 latency_ms=round(latency, 2),
                 last_check=utcnow(),
-                details={"worker_count": worker_count},
+                details={
+                    "worker_count": worker_count,
+                    "processing": snapshot.processing,
+                    "throughput_per_minute": snapshot.throughput_per_minute,
+                    "failure_rate": snapshot.failure_rate,
+                    "snapshot_age_seconds": round(age, 2),
+                },
             )
         except Exception as e:
             latency = (time.perf_counter() - start_time) * 1000
@@ -259,35 +275,33 @@ class SystemMonitoringService:
         )
     
     async def _get_worker_metrics(self) -> WorkerMetrics:
-        """Get worker metrics from agent service.
+        """Get worker metrics from the cluster health snapshot.
         
         Returns:
             WorkerMetrics summary
         """
         try:
-            from app.core.celery_app import celery_app
-            
-            inspect = celery_app.control.inspect()
-            active = inspect.active() or {}
-            stats = inspect.stats() or {}
+            from app.modules.system_monitoring.cluster_health import get_cluster_snapshot
             
-            total = len(stats)
-            healthy = len(active)
-            unhealthy = total - healthy
+            snapshot = await get_cluster_snapshot()
+            if snapshot is None:
+                raise RuntimeError("no cluster health snapshot")
             
-            # Calculate capacity and load
-            total_capacity = total * 10  # Assume 10 concurrent tasks per worker
-            current_load = sum(len(tasks) for tasks in active.values())
+            total = len(snapshot.workers)
+            healthy = len(snapshot.alive_workers)
+            total_capacity = snapshot.capacity
+            current_load = snapshot.processing
             
             utilization = (current_load / total_capacity * 100) if total_capacity > 0 else 0
             
             return WorkerMetrics(
                 total=total,
                 healthy=healthy,
-                unhealthy=unhealthy,
+                unhealthy=total - healthy,
                 total_capacity=total_capacity,
                 current_load=current_load,
                 utilization_percent=round(utilization, 2),
+                snapshot_age_seconds=round(snapshot.age_seconds(), 2),
             )
         except Exception as e:
             logger.error(f"Failed to get worker metrics: {e}")
@@ -309,24 +323,40 @@ class SystemMonitoringService:
         queues = []
         
         try:
+            from app.core.celery_queues import all_queue_depths
             from app.core.redis import get_redis
+            from app.modules.system_monitoring.cluster_health import get_cluster_snapshot
             
             redis = await get_redis()
             
-            # Get default queue metrics
-            queue_names = ["celery", "high_priority", "low_priority"]
+            snapshot = await get_cluster_snapshot(redis)
+            if snapshot is not None and not snapshot.is_stale():
+                window = snapshot.window_seconds
+                for queue in snapshot.queues:
+                    queues.append(QueueMetrics(
+                        name=queue.name,
+                        depth=queue.depth,
+                        processing=queue.processing,
+                        completed_total=queue.succeeded,
+                        failed_total=queue.failed,
+                        dlq_size=0,  # Would need to track this
+                        processing_rate=round(queue.throughput_per_minute / 60, 3),
+                        depth_by_priority=queue.depth_by_priority,
+                        window_seconds=window,
+                    ))
+                return queues
             
-            for queue_name in queue_names:
-                depth = await redis.llen(queue_name) or 0
-                
+            # No collector: depths only, summed over each queue's priority lists
+            for queue_name, by_priority in (await all_queue_depths(redis)).items():
                 queues.append(QueueMetrics(
                     name=queue_name,
-                    depth=depth,
+                    depth=sum(by_priority.values()),
                     processing=0,  # Would need to track this
                     completed_total=0,  # Would need to track this
                     failed_total=0,  # Would need to track this
                     dlq_size=0,  # Would need to track this
                     processing_rate=0.0,  # Would need to calculate this
+                    depth_by_priority={p: d for p, d in by_priority.items() if d},
                 ))
         except Exception as e:
             logger.error(f"Failed to get queue metrics: {e}")
@@ -6,7 +6,6 @@ Requirements: 10.1, 10.3, 10.4
 
 import os
 import subprocess
-import json
 from dataclasses import dataclass
 from typing import Optional, Callable
 
@@ -17,6 +16,7 @@ from app.modules.transcoding.schemas import (
     ABRConfig,
     LowLatencyConfig,
 )
+from app.modules.video.media_analysis import MediaAnalyzer, get_media_analyzer
 
 
 @dataclass
@@ -61,29 +61,27 @@ class FFmpegTranscoder:
         """
         self.ffmpeg_path = ffmpeg_path
         self.ffprobe_path = ffprobe_path
+        self._analyzer = (
+            get_media_analyzer()
+            if (ffmpeg_path, ffprobe_path) == ("ffmpeg", "ffprobe")
+            else MediaAnalyzer(ffprobe_path=ffprobe_path, ffmpeg_path=ffmpeg_path)
+        )
 
     def get_video_info(self, input_path: str) -> dict:
         """Get video information using ffprobe.
         
+        Probes are cached by file identity, so validating an output that
+        transcode() already probed does not run ffprobe again.
+        
         Args:
             input_path: Path to input video
             
         Returns:
             Video information dict
         """
-        cmd = [
-            self.ffprobe_path,
-            "-v", "quiet",
-            "-print_format", "json",
-            "-show_format",
-            "-show_streams",
-            input_path,
-        ]
-        
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            return json.loads(result.stdout)
-        except (subprocess.CalledProcessError, json.JSONDecodeError) as e:
+            return self._analyzer.probe_sync(input_path)
+        except (OSError, RuntimeError) as e:
             return {"error": str(e)}
 
     def build_transcode_command(self, config: FFmpegConfig) -> list[str]:
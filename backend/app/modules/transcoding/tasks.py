@@ -4,7 +4,6 @@ Implements FFmpeg worker with Celery and job distribution based on load.
 Requirements: 10.1, 10.2, 10.3, 10.4, 10.5
 """
 
-import asyncio
 import uuid
 import os
 from datetime import datetime
@@ -13,6 +12,7 @@ from typing import Optional
 from celery import Task
 
 from app.core.celery_app import celery_app
+from app.core.task_loop import run_async
 from app.core.database import celery_session_maker
 from app.core.datetime_utils import utcnow
 from app.modules.job.tasks import BaseTaskWithRetry, RetryConfig, RETRY_CONFIGS
@@ -34,11 +34,11 @@ from app.modules.transcoding.repository import (
 def _run_async(coro):
     """Run async coroutine in Celery task context.
     
-    Uses asyncio.run() which creates a fresh event loop for each task.
-    Combined with NullPool in celery_session_maker, this avoids
-    connection pool conflicts across different event loops.
+    Runs on the worker process's persistent event loop, whose pooled
+    engine serves celery_session_maker (see app.core.task_loop). Falls
+    back to asyncio.run() outside a prefork worker.
     """
-    return asyncio.run(coro)
+    return run_async(coro)
 from app.modules.transcoding.ffmpeg import (
     FFmpegTranscoder,
     FFmpegConfig,
@@ -12,8 +12,11 @@ from fastapi import (
     Depends,
     File,
     Form,
+    Header,
     HTTPException,
     Query,
+    Request,
+    Response,
     UploadFile,
     status,
 )
@@ -31,6 +34,16 @@ from app.modules.video.video_library_service import (
 from app.modules.video.video_folder_service import VideoFolderService
 from app.modules.video.youtube_upload_service import YouTubeUploadService
 from app.modules.video.video_usage_tracker import VideoUsageTracker
+from app.modules.video.resumable_upload import (
+    ResumableUploadService,
+    ResumableUploadError,
+    UploadSessionNotFoundError,
+    UploadSessionExpiredError,
+    UploadOffsetMismatchError,
+    UploadChecksumMismatchError,
+    InvalidUploadChunkError,
+    UploadIncompleteError,
+)
 from app.modules.video.schemas import (
     VideoResponse,
     VideoMetadataUpdate,
@@ -41,7 +54,9 @@ from app.modules.video.schemas import (
     YouTubeUploadRequest,
     UploadProgressResponse,
     UploadJobResponse,
-    CreateStreamFromVideoRequest
+    CreateStreamFromVideoRequest,
+    ResumableUploadCreate,
+    ResumableUploadResponse,
 )
 
 router = APIRouter(prefix="/videos/library", tags=["video-library"])
@@ -142,6 +157,184 @@ async def upload_to_library(
     return _create_video_response(video)
 
 
+# ============================================
+# Resumable uploads
+# ============================================
+
+# tus "460 Checksum Mismatch"
+HTTP_460_CHECKSUM_MISMATCH = 460
+
+
+def _resumable_upload_error(e: ResumableUploadError) -> HTTPException:
+    """Map resumable upload errors to HTTP errors."""
+    if isinstance(e, UploadSessionNotFoundError):
+        return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    if isinstance(e, UploadSessionExpiredError):
+        return HTTPException(status_code=status.HTTP_410_GONE, detail=str(e))
+    if isinstance(e, UploadOffsetMismatchError):
+        return HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e),
+            headers={"Upload-Offset": str(e.current_offset)},
+        )
+    if isinstance(e, UploadChecksumMismatchError):
+        return HTTPException(status_code=HTTP_460_CHECKSUM_MISMATCH, detail=str(e))
+    if isinstance(e, UploadIncompleteError):
+        return HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    if isinstance(e, InvalidUploadChunkError):
+        return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+def _upload_headers(session) -> dict:
+    return {
+        "Upload-Offset": str(session.upload_offset),
+        "Upload-Length": str(session.upload_length),
+        "Upload-Expires": session.expires_at.isoformat(),
+        "Cache-Control": "no-store",
+    }
+
+
+def _upload_response(service: ResumableUploadService, session) -> ResumableUploadResponse:
+    return ResumableUploadResponse(
+        id=session.id,
+        filename=session.filename,
+        upload_length=session.upload_length,
+        upload_offset=session.upload_offset,
+        status=session.status,
+        expires_at=session.expires_at,
+        max_chunk_size=service.max_chunk_size,
+        min_chunk_size=service.min_chunk_size,
+        video_id=session.video_id,
+    )
+
+
+@router.post("/uploads", response_model=ResumableUploadResponse, status_code=status.HTTP_201_CREATED)
+async def create_resumable_upload(
+    request: ResumableUploadCreate,
+    response: Response,
+    current_user = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Start a resumable upload.
+    
+    Send the file with PATCH /uploads/{id} in chunks, then call
+    POST /uploads/{id}/finalize. After a dropped connection, HEAD
+    /uploads/{id} returns the offset to resume from.
+    """
+    from app.modules.billing.feature_gate import LimitExceededError
+    
+    service = ResumableUploadService(db)
+    try:
+        session = await service.create(
+            user_id=current_user.id,
+            filename=request.filename,
+            upload_length=request.upload_length,
+            title=request.title,
+            description=request.description,
+            tags=request.tags,
+            folder_id=request.folder_id,
+            content_type=request.content_type,
+        )
+    except LimitExceededError as e:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=e.message)
+    except ResumableUploadError as e:
+        raise _resumable_upload_error(e)
+    
+    response.headers["Location"] = f"/api/v1/videos/library/uploads/{session.id}"
+    response.headers.update(_upload_headers(session))
+    return _upload_response(service, session)
+
+
+@router.head("/uploads/{upload_id}")
+async def get_resumable_upload_offset(
+    upload_id: uuid.UUID,
+    current_user = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Get the current offset of a resumable upload (Upload-Offset header)."""
+    try:
+        session = await ResumableUploadService(db).get_active(current_user.id, upload_id)
+    except ResumableUploadError as e:
+        raise _resumable_upload_error(e)
+    return Response(status_code=status.HTTP_200_OK, headers=_upload_headers(session))
+
+
+@router.get("/uploads/{upload_id}", response_model=ResumableUploadResponse)
+async def get_resumable_upload(
+    upload_id: uuid.UUID,
+    current_user = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Get a resumable upload session."""
+    service = ResumableUploadService(db)
+    try:
+        session = await service.get(current_user.id, upload_id)
+    except ResumableUploadError as e:
+        raise _resumable_upload_error(e)
+    return _upload_response(service, session)
+
+
+@router.patch("/uploads/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def upload_chunk(
+    upload_id: uuid.UUID,
+    request: Request,
+    upload_offset: int = Header(..., alias="Upload-Offset", ge=0),
+    upload_checksum: Optional[str] = Header(None, alias="Upload-Checksum"),
+    current_user = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Append a chunk to a resumable upload.
+    
+    The raw request body is the chunk. Upload-Offset must equal the
+    current offset and Upload-Checksum is "<sha256|sha1|md5> <base64 digest>".
+    Returns 409 with the current offset on a mismatch and 460 when the
+    checksum does not match.
+    """
+    try:
+        session = await ResumableUploadService(db).write_chunk(
+            user_id=current_user.id,
+            upload_id=upload_id,
+            offset=upload_offset,
+            body=request.stream(),
+            checksum=upload_checksum,
+        )
+    except ResumableUploadError as e:
+        raise _resumable_upload_error(e)
+    return Response(status_code=status.HTTP_204_NO_CONTENT, headers=_upload_headers(session))
+
+
+@router.post("/uploads/{upload_id}/finalize", response_model=VideoResponse)
+async def finalize_resumable_upload(
+    upload_id: uuid.UUID,
+    current_user = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Finish a resumable upload and queue the video for processing."""
+    from app.modules.billing.feature_gate import LimitExceededError
+    
+    try:
+        video = await ResumableUploadService(db).finalize(current_user.id, upload_id)
+    except LimitExceededError as e:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=e.message)
+    except ResumableUploadError as e:
+        raise _resumable_upload_error(e)
+    return _create_video_response(video)
+
+
+@router.delete("/uploads/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def abort_resumable_upload(
+    upload_id: uuid.UUID,
+    current_user = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Abort a resumable upload and discard the uploaded data."""
+    try:
+        await ResumableUploadService(db).abort(current_user.id, upload_id)
+    except ResumableUploadError as e:
+        raise _resumable_upload_error(e)
+
+
 @router.get("", response_model=PaginatedVideoResponse)
 async def get_library_videos(
     page: int = Query(1, ge=1, description="Page number"),
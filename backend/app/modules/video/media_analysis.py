@@ -0,0 +1,480 @@
+"""Single-pass media analysis for uploaded videos.
+
+An upload used to be inspected by several independent ffprobe/ffmpeg
+processes: duration, metadata, thumbnail and post-transcode checks each
+re-read the container. MediaAnalyzer probes a file once and scans it once:
+
+- one ffprobe for format and streams
+- one ffmpeg pass that decodes only keyframes (keyframe index, thumbnail,
+  preview sprite) and measures audio loudness (EBU R128)
+
+The result is stored on the Video row keyed by the file's SHA-256, so a
+re-upload of the same bytes skips analysis entirely and later steps read
+the cached analysis instead of probing again.
+
+Requirements: 1.1
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import subprocess
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field, replace
+from typing import Any, Optional
+
+from app.modules.video.video_metadata_extractor import VideoFileMetadata
+
+logger = logging.getLogger(__name__)
+
+# Bump when the stored analysis layout changes; older rows are re-analyzed
+ANALYSIS_VERSION = 1
+
+HASH_CHUNK_SIZE = 1024 * 1024
+PROBE_CACHE_SIZE = 256
+SCAN_TIMEOUT_SECONDS = 3600
+
+THUMBNAIL_TIMESTAMP = 5
+THUMBNAIL_WIDTH = 1280
+THUMBNAIL_HEIGHT = 720
+SPRITE_COLUMNS = 10
+SPRITE_ROWS = 10
+SPRITE_TILE_WIDTH = 160
+
+MP4_FORMAT_NAME = "mov,mp4,m4a,3gp,3g2,mj2"
+
+_PTS_TIME = re.compile(r"\[Parsed_showinfo_\d+ @ [^\]]+\].*?\bpts_time:\s*(-?[\d.]+(?:e[-+]?\d+)?)")
+_LOUDNESS_FIELDS = {
+    "integrated_lufs": re.compile(r"Integrated loudness:\s*\n\s*I:\s*(-?[\d.]+|-inf)\s*LUFS"),
+    "range_lu": re.compile(r"Loudness range:\s*\n\s*LRA:\s*(-?[\d.]+)\s*LU"),
+    "true_peak_dbfs": re.compile(r"True peak:\s*\n\s*Peak:\s*(-?[\d.]+|-inf)\s*dBFS"),
+}
+
+
+@dataclass
+class SpritePreview:
+    """Layout of a preview sprite sheet stored alongside the video."""
+    key: str
+    columns: int
+    rows: int
+    tile_width: int
+    interval_seconds: float
+
+
+@dataclass
+class MediaAnalysis:
+    """Everything downstream steps need to know about a media file."""
+    content_hash: str  # SHA-256 of the file bytes
+    format_name: str  # ffprobe format_name, e.g. "mov,mp4,m4a,3gp,3g2,mj2"
+    duration: float  # seconds
+    bit_rate: int  # bits per second
+    size: int  # bytes
+    video_codec: Optional[str] = None
+    width: int = 0
+    height: int = 0
+    frame_rate: float = 0.0
+    pixel_format: Optional[str] = None
+    audio_codec: Optional[str] = None
+    keyframes: list[float] = field(default_factory=list)  # pts_time of each keyframe
+    loudness: Optional[dict[str, float]] = None  # integrated_lufs, range_lu, true_peak_dbfs
+    sprite: Optional[SpritePreview] = None
+    version: int = ANALYSIS_VERSION
+
+    @classmethod
+    def from_probe(cls, probe: dict, content_hash: str) -> "MediaAnalysis":
+        """Build an analysis from ffprobe -show_format -show_streams output."""
+        format_info = probe.get("format", {})
+        streams = probe.get("streams", [])
+        video = next((s for s in streams if s.get("codec_type") == "video"), None)
+        audio = next((s for s in streams if s.get("codec_type") == "audio"), None)
+        if video is None:
+            raise RuntimeError("No video stream found in file")
+
+        return cls(
+            content_hash=content_hash,
+            format_name=format_info.get("format_name", ""),
+            duration=float(format_info.get("duration") or 0),
+            bit_rate=int(format_info.get("bit_rate") or 0),
+            size=int(format_info.get("size") or 0),
+            video_codec=video.get("codec_name"),
+            width=int(video.get("width") or 0),
+            height=int(video.get("height") or 0),
+            frame_rate=_parse_rate(video.get("r_frame_rate", "0/1")),
+            pixel_format=video.get("pix_fmt"),
+            audio_codec=audio.get("codec_name") if audio else None,
+        )
+
+    @classmethod
+    def from_dict(cls, data: Optional[dict]) -> Optional["MediaAnalysis"]:
+        """Load a stored analysis; None if missing or from an older layout."""
+        if not data or data.get("version") != ANALYSIS_VERSION:
+            return None
+        data = dict(data)
+        sprite = data.pop("sprite", None)
+        return cls(**data, sprite=SpritePreview(**sprite) if sprite else None)
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+    @property
+    def container(self) -> str:
+        """Short container name, e.g. "mov" or "matroska"."""
+        return self.format_name.split(",")[0]
+
+    def to_metadata(self) -> VideoFileMetadata:
+        """View the analysis as the metadata shape used by the video module."""
+        return VideoFileMetadata(
+            duration=int(self.duration),
+            resolution=f"{self.width}x{self.height}",
+            width=self.width,
+            height=self.height,
+            frame_rate=round(self.frame_rate, 2),
+            bitrate=self.bit_rate // 1000,
+            codec=self.video_codec or "unknown",
+            format=self.container,
+            file_size=self.size,
+            audio_codec=self.audio_codec,
+            pixel_format=self.pixel_format,
+        )
+
+    def for_stream_copy(
+        self,
+        content_hash: str,
+        size: int,
+        audio_codec: Optional[str] = None,
+    ) -> "MediaAnalysis":
+        """Analysis of an MP4 made from this file by copying the video stream.
+
+        Keyframes and loudness carry over unchanged, so a remuxed or
+        audio-transcoded output needs no second scan.
+        """
+        return replace(
+            self,
+            content_hash=content_hash,
+            format_name=MP4_FORMAT_NAME,
+            size=size,
+            bit_rate=int(size * 8 / self.duration) if self.duration else self.bit_rate,
+            audio_codec=audio_codec or self.audio_codec,
+        )
+
+
+def _parse_rate(rate: str) -> float:
+    try:
+        num, den = map(int, rate.split("/"))
+        return num / den if den else 0.0
+    except (ValueError, AttributeError):
+        return 0.0
+
+
+def compute_content_hash(path: str) -> str:
+    """SHA-256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def parse_keyframes(stderr: str) -> list[float]:
+    """Keyframe timestamps from showinfo output of a keyframe-only decode."""
+    return sorted({round(float(match), 6) for match in _PTS_TIME.findall(stderr)})
+
+
+def parse_loudness(stderr: str) -> Optional[dict[str, float]]:
+    """EBU R128 summary printed by the ebur128 filter, if present."""
+    summary_at = stderr.rfind("Summary:")
+    if summary_at < 0:
+        return None
+    summary = stderr[summary_at:]
+    loudness = {}
+    for name, pattern in _LOUDNESS_FIELDS.items():
+        match = pattern.search(summary)
+        if match:
+            loudness[name] = float(match.group(1))
+    return loudness or None
+
+
+class MediaAnalyzer:
+    """Probe and scan media files once, reusing results wherever possible.
+
+    Probes are cached in-process by file identity (path, size, mtime), so
+    repeated lookups of an unchanged file - e.g. a transcoder validating
+    its own output - do not spawn ffprobe again.
+    """
+
+    def __init__(self, ffprobe_path: str = "ffprobe", ffmpeg_path: str = "ffmpeg"):
+        self.ffprobe_path = ffprobe_path
+        self.ffmpeg_path = ffmpeg_path
+        self._probes: OrderedDict[tuple, dict] = OrderedDict()
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Probe
+    # ------------------------------------------------------------------
+
+    def probe_sync(self, path: str) -> dict:
+        """ffprobe format and streams, cached by file identity.
+
+        Raises:
+            FileNotFoundError: If the file does not exist
+            RuntimeError: If ffprobe fails or returns invalid data
+        """
+        stat = os.stat(path)
+        key = (os.path.realpath(path), stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            if key in self._probes:
+                self._probes.move_to_end(key)
+                return self._probes[key]
+
+        cmd = [
+            self.ffprobe_path,
+            "-v", "quiet",
+            "-print_format", "json",
+            "-show_format",
+            "-show_streams",
+            path,
+        ]
+        result = self._run(cmd)
+        if result.returncode != 0:
+            raise RuntimeError(f"ffprobe failed: {result.stderr or 'Unknown error'}")
+        try:
+            probe = json.loads(result.stdout)
+        except json.JSONDecodeError as e:
+            raise RuntimeError(f"Failed to parse ffprobe output: {e}")
+
+        with self._lock:
+            self._probes[key] = probe
+            while len(self._probes) > PROBE_CACHE_SIZE:
+                self._probes.popitem(last=False)
+        return probe
+
+    async def probe(self, path: str) -> dict:
+        return await asyncio.to_thread(self.probe_sync, path)
+
+    # ------------------------------------------------------------------
+    # Scan
+    # ------------------------------------------------------------------
+
+    def build_scan_command(
+        self,
+        path: str,
+        analysis: MediaAnalysis,
+        thumbnail_path: Optional[str] = None,
+        sprite_path: Optional[str] = None,
+        index: bool = True,
+    ) -> list[str]:
+        """One ffmpeg invocation producing every keyframe-derived artifact.
+
+        Only keyframes are decoded (-skip_frame nokey), which is what makes
+        scanning a long video cheap. The video branch is split into:
+        showinfo for the keyframe index, the first keyframe after the
+        thumbnail timestamp, and a tiled sprite sheet. Audio runs through
+        ebur128 for loudness. With index=False only the images are made.
+        """
+        branches: list[tuple[str, str, list[str]]] = []
+        if thumbnail_path:
+            at = min(THUMBNAIL_TIMESTAMP, analysis.duration / 2)
+            branches.append((
+                "thumb",
+                f"select='gte(t,{at:.3f})',"
+                f"scale={THUMBNAIL_WIDTH}:{THUMBNAIL_HEIGHT}:force_original_aspect_ratio=decrease,"
+                f"pad={THUMBNAIL_WIDTH}:{THUMBNAIL_HEIGHT}:(ow-iw)/2:(oh-ih)/2",
+                ["-frames:v", "1", "-q:v", "2", thumbnail_path],
+            ))
+        if sprite_path:
+            tiles = SPRITE_COLUMNS * SPRITE_ROWS
+            rate = tiles / analysis.duration if analysis.duration else 1
+            branches.append((
+                "sprite",
+                f"fps={rate:.6f},scale={SPRITE_TILE_WIDTH}:-2,tile={SPRITE_COLUMNS}x{SPRITE_ROWS}",
+                ["-frames:v", "1", "-q:v", "5", sprite_path],
+            ))
+        if index:
+            branches.append(("index", "null", []))
+
+        video_chain = "[0:v:0]showinfo" if index else "[0:v:0]null"
+        filters = []
+        if len(branches) > 1:
+            labels = "".join(f"[{name}_in]" for name, _, _ in branches)
+            filters.append(f"{video_chain},split={len(branches)}{labels}")
+            filters.extend(f"[{name}_in]{chain}[{name}]" for name, chain, _ in branches)
+        elif branches:
+            name, chain, _ = branches[0]
+            filters.append(f"{video_chain},{chain}[{name}]")
+
+        loudness = index and analysis.audio_codec is not None
+        if loudness:
+            # framelog=verbose keeps the per-100ms measurements out of stderr
+            filters.append("[0:a:0]ebur128=peak=true:framelog=verbose[loudness]")
+
+        cmd = [
+            self.ffmpeg_path, "-hide_banner", "-nostats", "-y",
+            "-skip_frame", "nokey",
+            "-i", path,
+            "-filter_complex", ";".join(filters),
+        ]
+        for name, _, output in branches:
+            if output:
+                cmd += ["-map", f"[{name}]", *output]
+        null_maps = (["-map", "[index]"] if index else []) + (["-map", "[loudness]"] if loudness else [])
+        if null_maps:
+            cmd += [*null_maps, "-f", "null", "-"]
+        return cmd
+
+    async def analyze(
+        self,
+        path: str,
+        thumbnail_path: Optional[str] = None,
+        sprite_path: Optional[str] = None,
+        content_hash: Optional[str] = None,
+    ) -> MediaAnalysis:
+        """Probe once and scan once.
+
+        Args:
+            path: Media file to analyze
+            thumbnail_path: Where to write a JPEG thumbnail, if wanted
+            sprite_path: Where to write a preview sprite sheet, if wanted
+            content_hash: SHA-256 of the file when already known
+
+        Returns:
+            MediaAnalysis with keyframes and loudness filled in. The
+            thumbnail/sprite files exist afterwards only if FFmpeg could
+            produce them; the analysis is still returned if it could not.
+
+        Raises:
+            FileNotFoundError: If the file does not exist
+            RuntimeError: If probing or scanning fails
+        """
+        if content_hash is None:
+            content_hash = await asyncio.to_thread(compute_content_hash, path)
+        analysis = MediaAnalysis.from_probe(await self.probe(path), content_hash)
+
+        cmd = self.build_scan_command(path, analysis, thumbnail_path, sprite_path)
+        result = await asyncio.to_thread(self._run, cmd, SCAN_TIMEOUT_SECONDS)
+        if result.returncode != 0:
+            raise RuntimeError(f"ffmpeg analysis failed: {result.stderr[-2000:]}")
+
+        analysis.keyframes = parse_keyframes(result.stderr)
+        analysis.loudness = parse_loudness(result.stderr)
+        return analysis
+
+    async def extract_previews(
+        self,
+        path: str,
+        analysis: MediaAnalysis,
+        thumbnail_path: Optional[str] = None,
+        sprite_path: Optional[str] = None,
+    ) -> None:
+        """Render thumbnail and sprite for an already-analyzed file."""
+        if not thumbnail_path and not sprite_path:
+            return
+        cmd = self.build_scan_command(path, analysis, thumbnail_path, sprite_path, index=False)
+        result = await asyncio.to_thread(self._run, cmd, SCAN_TIMEOUT_SECONDS)
+        if result.returncode != 0:
+            raise RuntimeError(f"ffmpeg preview extraction failed: {result.stderr[-2000:]}")
+
+    async def get_or_analyze(
+        self,
+        session,
+        path: str,
+        thumbnail_path: Optional[str] = None,
+        sprite_path: Optional[str] = None,
+    ) -> tuple[MediaAnalysis, bool]:
+        """Analysis for path, reusing one stored for identical content.
+
+        Returns:
+            (analysis, cached) where cached is True when the analysis came
+            from another Video row with the same content hash
+        """
+        content_hash = await asyncio.to_thread(compute_content_hash, path)
+        cached = await find_cached_analysis(session, content_hash)
+        if cached is not None:
+            cached.sprite = None
+            await self.extract_previews(path, cached, thumbnail_path, sprite_path)
+            return cached, True
+        return await self.analyze(path, thumbnail_path, sprite_path, content_hash), False
+
+    async def analyze_output(
+        self,
+        source: MediaAnalysis,
+        output_path: str,
+        stream_copy: bool,
+        audio_codec: Optional[str] = None,
+    ) -> MediaAnalysis:
+        """Analysis of a converted file.
+
+        Stream-copied outputs are derived from the source analysis; a full
+        re-encode places keyframes anew, so it is probed and scanned again.
+        """
+        content_hash = await asyncio.to_thread(compute_content_hash, output_path)
+        if stream_copy:
+            size = os.path.getsize(output_path)
+            return source.for_stream_copy(content_hash, size, audio_codec)
+        return await self.analyze(output_path, content_hash=content_hash)
+
+    @staticmethod
+    def _run(cmd: list[str], timeout: Optional[float] = None) -> subprocess.CompletedProcess:
+        return subprocess.run(
+            cmd,
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+            creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, "CREATE_NO_WINDOW") else 0,
+        )
+
+
+async def find_cached_analysis(session, content_hash: str) -> Optional[MediaAnalysis]:
+    """Stored analysis of any video uploaded or stored with the same content hash.
+
+    Converted uploads are found by the hash of the bytes that were
+    uploaded, and yield the analysis of that source rather than of the
+    MP4 made from it.
+    """
+    from sqlalchemy import or_, select
+
+    from app.modules.video.models import Video
+
+    result = await session.execute(
+        select(Video.content_hash, Video.media_analysis, Video.source_media_analysis)
+        .where(
+            or_(Video.content_hash == content_hash, Video.source_content_hash == content_hash),
+            Video.media_analysis.isnot(None),
+        )
+        .limit(1)
+    )
+    row = result.first()
+    if row is None:
+        return None
+    if row.content_hash == content_hash:
+        return MediaAnalysis.from_dict(row.media_analysis)
+    return MediaAnalysis.from_dict(row.source_media_analysis)
+
+
+def record_analysis(video, source: MediaAnalysis, analysis: MediaAnalysis) -> None:
+    """Store the analysis of a processed upload on its Video row.
+
+    Args:
+        video: Video row being finalized
+        source: Analysis of the file as uploaded
+        analysis: Analysis of the stored file; differs from source when
+            the upload was converted
+    """
+    video.content_hash = analysis.content_hash
+    video.media_analysis = analysis.to_dict()
+    video.source_content_hash = source.content_hash
+    video.source_media_analysis = source.to_dict() if analysis is not source else None
+
+
+_media_analyzer: Optional[MediaAnalyzer] = None
+
+
+def get_media_analyzer() -> MediaAnalyzer:
+    """Get the process-wide analyzer (shares the probe cache)."""
+    global _media_analyzer
+    if _media_analyzer is None:
+        _media_analyzer = MediaAnalyzer()
+    return _media_analyzer
@@ -10,7 +10,7 @@ from datetime import datetime
 from enum import Enum
 from typing import Optional, TYPE_CHECKING
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, String, Text, JSON, Float
+from sqlalchemy import BigInteger, Boolean, DateTime, ForeignKey, Integer, String, Text, JSON, Float
 from sqlalchemy.dialects.postgresql import UUID, ARRAY
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
@@ -83,6 +83,13 @@ class Video(Base):
     bitrate: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)  # NEW
     codec: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)  # NEW
 
+    # === Media Analysis (single probe + scan, keyed by SHA-256 of the file) ===
+    content_hash: Mapped[Optional[str]] = mapped_column(String(64), nullable=True, index=True)
+    media_analysis: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+    # Hash and analysis of the file as uploaded, when it was converted before storing
+    source_content_hash: Mapped[Optional[str]] = mapped_column(String(64), nullable=True, index=True)
+    source_media_analysis: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+
     # YouTube video information
     youtube_id: Mapped[Optional[str]] = mapped_column(
         String(255), unique=True, nullable=True, index=True
@@ -412,3 +419,76 @@ class VideoUsageLog(Base):
 
     def __repr__(self) -> str:
         return f"<VideoUsageLog(video_id={self.video_id}, type={self.usage_type})>"
+
+
+class UploadSessionStatus(str, Enum):
+    """Status of a resumable upload session."""
+
+    ACTIVE = "active"
+    COMPLETED = "completed"
+    ABORTED = "aborted"
+    EXPIRED = "expired"
+
+
+class UploadSession(Base):
+    """State of a resumable (chunked) video upload.
+
+    Offset, parts and expiry live in the database so any API replica can
+    accept the next chunk. Chunks go either to a temp file on shared
+    local storage or straight to S3 multipart upload parts.
+    Requirements: 1.1
+    """
+
+    __tablename__ = "upload_sessions"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    filename: Mapped[str] = mapped_column(String(255), nullable=False)
+    content_type: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+    upload_length: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    upload_offset: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+    # "local" (temp file) or "s3" (multipart upload)
+    backend: Mapped[str] = mapped_column(String(20), nullable=False)
+    temp_path: Mapped[Optional[str]] = mapped_column(String(1024), nullable=True)
+    storage_key: Mapped[Optional[str]] = mapped_column(String(1024), nullable=True)
+    multipart_upload_id: Mapped[Optional[str]] = mapped_column(String(1024), nullable=True)
+    # Uploaded S3 parts: [{"part_number": 1, "etag": "...", "size": 5242880}]
+    parts: Mapped[list] = mapped_column(JSON, nullable=False, default=list)
+
+    # Library metadata applied on finalize: title, description, tags, folder_id
+    upload_metadata: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
+
+    status: Mapped[str] = mapped_column(
+        String(20), nullable=False, default=UploadSessionStatus.ACTIVE.value, index=True
+    )
+    video_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("videos.id", ondelete="SET NULL"),
+        nullable=True,
+    )
+    expires_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, index=True
+    )
+
+    # Timestamps
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+    @property
+    def is_complete(self) -> bool:
+        return self.upload_offset >= self.upload_length
+
+    def __repr__(self) -> str:
+        return f"<UploadSession(id={self.id}, offset={self.upload_offset}/{self.upload_length})>"
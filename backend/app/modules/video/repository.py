@@ -19,6 +19,8 @@ from app.modules.video.models import (
     VideoVisibility,
     MetadataVersion,
     VideoTemplate,
+    UploadSession,
+    UploadSessionStatus,
 )
 
 
@@ -690,3 +692,68 @@ class VideoTemplateRepository:
         """
         await self.session.delete(template)
         await self.session.flush()
+
+
+class UploadSessionRepository:
+    """Repository for resumable upload sessions."""
+
+    def __init__(self, session: AsyncSession):
+        """Initialize repository with database session."""
+        self.session = session
+
+    async def get_for_user(
+        self, upload_id: uuid.UUID, user_id: uuid.UUID
+    ) -> Optional[UploadSession]:
+        """Get an upload session owned by a user."""
+        result = await self.session.execute(
+            select(UploadSession)
+            .where(UploadSession.id == upload_id)
+            .where(UploadSession.user_id == user_id)
+        )
+        return result.scalar_one_or_none()
+
+    async def lock_at_offset(self, upload_id: uuid.UUID, expected_offset: int) -> bool:
+        """Lock an active session row until the transaction ends.
+
+        Returns:
+            bool: False if the session is no longer at expected_offset
+        """
+        result = await self.session.execute(
+            select(UploadSession.id)
+            .where(UploadSession.id == upload_id)
+            .where(UploadSession.upload_offset == expected_offset)
+            .where(UploadSession.status == UploadSessionStatus.ACTIVE.value)
+            .with_for_update()
+        )
+        return result.scalar_one_or_none() is not None
+
+    async def advance_offset(
+        self,
+        upload_id: uuid.UUID,
+        expected_offset: int,
+        new_offset: int,
+        parts: list,
+        expires_at: datetime,
+    ) -> bool:
+        """Move an active session to a new offset if it is still at expected_offset.
+
+        Returns:
+            bool: False if another writer moved the offset first
+        """
+        result = await self.session.execute(
+            update(UploadSession)
+            .where(UploadSession.id == upload_id)
+            .where(UploadSession.upload_offset == expected_offset)
+            .where(UploadSession.status == UploadSessionStatus.ACTIVE.value)
+            .values(upload_offset=new_offset, parts=parts, expires_at=expires_at)
+        )
+        return result.rowcount > 0
+
+    async def get_expired(self, now: datetime) -> list[UploadSession]:
+        """Get active sessions whose expiry has passed."""
+        result = await self.session.execute(
+            select(UploadSession)
+            .where(UploadSession.status == UploadSessionStatus.ACTIVE.value)
+            .where(UploadSession.expires_at <= now)
+        )
+        return list(result.scalars().all())
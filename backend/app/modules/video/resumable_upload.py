@@ -0,0 +1,480 @@
+"""Resumable (chunked) uploads for the video library.
+
+A tus-style protocol for large uploads:
+1. Create an upload session with the total size and library metadata
+2. PATCH chunks at the current offset, each with a checksum
+3. HEAD the session to learn the offset after a dropped connection
+4. Finalize to create the library video and queue processing
+
+Session state (offset, parts, expiry) lives in the database, so any API
+replica can accept the next chunk. Chunks are written either to a temp
+file (local storage, which must be shared between replicas) or straight
+to S3 multipart upload parts.
+
+Requirements: 1.1, 1.2
+"""
+
+import asyncio
+import base64
+import hashlib
+import logging
+import shutil
+import uuid
+from datetime import timedelta
+from pathlib import Path
+from typing import AsyncIterator, Callable, Optional
+
+import aiofiles
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.datetime_utils import utcnow
+from app.core.storage import (
+    S3_MIN_PART_SIZE,
+    Storage,
+    get_storage,
+    get_storage_io_executor,
+    is_cloud_storage,
+)
+from app.modules.video.models import (
+    UploadSession,
+    UploadSessionStatus,
+    Video,
+    VideoStatus,
+)
+from app.modules.video.repository import UploadSessionRepository
+from app.modules.video.video_library_service import (
+    ALLOWED_VIDEO_FORMATS,
+    MAX_FILE_SIZE,
+    get_temp_dir,
+)
+
+logger = logging.getLogger(__name__)
+
+CHECKSUM_ALGORITHMS = {"sha256", "sha1", "md5"}
+
+COPY_BUFFER_SIZE = 1024 * 1024
+
+
+class ResumableUploadError(Exception):
+    """Base exception for resumable upload errors."""
+    pass
+
+
+class UploadSessionNotFoundError(ResumableUploadError):
+    """Upload session does not exist or belongs to another user."""
+    pass
+
+
+class UploadSessionExpiredError(ResumableUploadError):
+    """Upload session expired or was aborted."""
+    pass
+
+
+class UploadOffsetMismatchError(ResumableUploadError):
+    """Chunk offset does not match the session offset."""
+
+    def __init__(self, message: str, current_offset: int):
+        super().__init__(message)
+        self.current_offset = current_offset
+
+
+class UploadChecksumMismatchError(ResumableUploadError):
+    """Chunk content does not match its checksum."""
+    pass
+
+
+class InvalidUploadChunkError(ResumableUploadError):
+    """Chunk is malformed, too large, or too small."""
+    pass
+
+
+class UploadIncompleteError(ResumableUploadError):
+    """Upload cannot be finalized before all bytes arrive."""
+    pass
+
+
+def parse_checksum_header(value: Optional[str]) -> tuple[str, bytes]:
+    """Parse an `Upload-Checksum: <algorithm> <base64 digest>` header.
+
+    Raises:
+        InvalidUploadChunkError: If the header is missing or malformed
+    """
+    if not value:
+        raise InvalidUploadChunkError("Upload-Checksum header is required")
+    try:
+        algorithm, encoded = value.strip().split(" ", 1)
+        digest = base64.b64decode(encoded.strip(), validate=True)
+    except ValueError as e:
+        raise InvalidUploadChunkError("Upload-Checksum must be '<algorithm> <base64 digest>'") from e
+    algorithm = algorithm.lower()
+    if algorithm not in CHECKSUM_ALGORITHMS:
+        raise InvalidUploadChunkError(
+            f"Unsupported checksum algorithm. Supported: {', '.join(sorted(CHECKSUM_ALGORITHMS))}"
+        )
+    return algorithm, digest
+
+
+def _write_at(path: str, offset: int, chunk_path: str) -> None:
+    """Copy a staged chunk into the upload file at offset (blocking)."""
+    with open(path, "r+b") as out_file, open(chunk_path, "rb") as chunk_file:
+        out_file.seek(offset)
+        shutil.copyfileobj(chunk_file, out_file, COPY_BUFFER_SIZE)
+
+
+class ResumableUploadService:
+    """Service for resumable library uploads."""
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        storage: Optional[Storage] = None,
+        backend: Optional[str] = None,
+        clock: Callable = utcnow,
+    ):
+        """Initialize resumable upload service.
+
+        Args:
+            db: Database session
+            storage: Storage used for S3 multipart uploads (default storage if not provided)
+            backend: "local" or "s3" (from RESUMABLE_UPLOAD_BACKEND if not provided)
+            clock: Returns the current UTC time
+        """
+        self.db = db
+        self.repo = UploadSessionRepository(db)
+        self.storage = storage or get_storage()
+        self.clock = clock
+        backend = backend or settings.RESUMABLE_UPLOAD_BACKEND
+        if backend == "auto":
+            backend = "s3" if is_cloud_storage() and self.storage.supports_multipart else "local"
+        self.backend = backend
+        self.max_chunk_size = settings.RESUMABLE_UPLOAD_MAX_CHUNK_BYTES
+
+    @property
+    def min_chunk_size(self) -> int:
+        """Smallest allowed non-final chunk."""
+        return S3_MIN_PART_SIZE if self.backend == "s3" else 0
+
+    def _expiry(self):
+        return self.clock() + timedelta(hours=settings.RESUMABLE_UPLOAD_EXPIRY_HOURS)
+
+    async def create(
+        self,
+        user_id: uuid.UUID,
+        filename: str,
+        upload_length: int,
+        title: str,
+        description: Optional[str] = None,
+        tags: Optional[list[str]] = None,
+        folder_id: Optional[uuid.UUID] = None,
+        content_type: Optional[str] = None,
+    ) -> UploadSession:
+        """Start an upload session.
+
+        Raises:
+            InvalidUploadChunkError: If the file type or size is not allowed
+            LimitExceededError: If the upload would exceed the storage limit
+        """
+        from app.modules.billing.feature_gate import FeatureGateService
+
+        ext = Path(filename).suffix.lower().lstrip(".")
+        if ext not in ALLOWED_VIDEO_FORMATS:
+            raise InvalidUploadChunkError(
+                f"File format not allowed. Allowed formats: {', '.join(ALLOWED_VIDEO_FORMATS)}"
+            )
+        if upload_length > MAX_FILE_SIZE:
+            raise InvalidUploadChunkError(
+                f"File exceeds maximum size of {MAX_FILE_SIZE / (1024*1024*1024):.1f}GB"
+            )
+
+        await FeatureGateService(self.db).check_storage_limit(
+            user_id, additional_bytes=upload_length, raise_on_exceed=True
+        )
+
+        upload_id = uuid.uuid4()
+        session = UploadSession(
+            id=upload_id,
+            user_id=user_id,
+            filename=filename,
+            content_type=content_type,
+            upload_length=upload_length,
+            upload_offset=0,
+            backend=self.backend,
+            parts=[],
+            upload_metadata={
+                "title": title,
+                "description": description,
+                "tags": tags or [],
+                "folder_id": str(folder_id) if folder_id else None,
+            },
+            status=UploadSessionStatus.ACTIVE.value,
+            expires_at=self._expiry(),
+        )
+
+        if self.backend == "s3":
+            session.storage_key = f"uploads/{user_id}/{upload_id}.{ext}"
+            session.multipart_upload_id = await get_storage_io_executor().run(
+                "create_multipart_upload",
+                self.storage.create_multipart_upload,
+                session.storage_key,
+                content_type or "application/octet-stream",
+            )
+        else:
+            session.temp_path = str(get_temp_dir() / f"resumable_{upload_id}.{ext}")
+            async with aiofiles.open(session.temp_path, "wb"):
+                pass
+
+        self.db.add(session)
+        await self.db.commit()
+        logger.info(f"Created resumable upload {upload_id} ({upload_length} bytes, {self.backend})")
+        return session
+
+    async def get(self, user_id: uuid.UUID, upload_id: uuid.UUID) -> UploadSession:
+        """Get an upload session owned by the user.
+
+        Raises:
+            UploadSessionNotFoundError: If the session does not exist
+        """
+        session = await self.repo.get_for_user(upload_id, user_id)
+        if session is None:
+            raise UploadSessionNotFoundError("Upload not found")
+        return session
+
+    async def get_active(self, user_id: uuid.UUID, upload_id: uuid.UUID) -> UploadSession:
+        """Get an upload session that can still accept chunks.
+
+        Raises:
+            UploadSessionNotFoundError: If the session does not exist
+            UploadSessionExpiredError: If the session expired or was aborted
+        """
+        session = await self.get(user_id, upload_id)
+        if session.status in (UploadSessionStatus.ABORTED.value, UploadSessionStatus.EXPIRED.value):
+            raise UploadSessionExpiredError("Upload expired")
+        if session.status == UploadSessionStatus.ACTIVE.value and session.expires_at <= self.clock():
+            await self._discard(session, UploadSessionStatus.EXPIRED)
+            await self.db.commit()
+            raise UploadSessionExpiredError("Upload expired")
+        return session
+
+    async def write_chunk(
+        self,
+        user_id: uuid.UUID,
+        upload_id: uuid.UUID,
+        offset: int,
+        body: AsyncIterator[bytes],
+        checksum: Optional[str],
+    ) -> UploadSession:
+        """Write one chunk at the given offset.
+
+        The chunk is only accepted (and the offset advanced) if its
+        checksum matches. It is received first, then copied in while the
+        session row is locked at its offset, so of concurrent writers only
+        the one that wins ever touches the upload's data.
+
+        Raises:
+            UploadOffsetMismatchError: If offset is not the current offset
+            UploadChecksumMismatchError: If the checksum does not match
+            InvalidUploadChunkError: If the chunk is malformed or has a bad size
+        """
+        algorithm, expected_digest = parse_checksum_header(checksum)
+        session = await self.get_active(user_id, upload_id)
+        if session.status != UploadSessionStatus.ACTIVE.value:
+            raise UploadOffsetMismatchError("Upload already finalized", session.upload_offset)
+        if offset != session.upload_offset:
+            raise UploadOffsetMismatchError(
+                f"Offset {offset} does not match upload offset {session.upload_offset}",
+                session.upload_offset,
+            )
+
+        remaining = session.upload_length - offset
+        limit = min(remaining, self.max_chunk_size)
+        hasher = hashlib.new(algorithm)
+        chunk_path = None
+
+        try:
+            if session.backend == "s3":
+                data = bytearray()
+                async for piece in body:
+                    if len(data) + len(piece) > limit:
+                        raise InvalidUploadChunkError(self._too_large_message(limit, remaining))
+                    hasher.update(piece)
+                    data.extend(piece)
+                size = len(data)
+            else:
+                # Stage the chunk on its own so a rejected or dropped chunk
+                # never touches bytes already accepted
+                chunk_path = f"{session.temp_path}.{uuid.uuid4().hex}.chunk"
+                size = 0
+                async with aiofiles.open(chunk_path, "wb") as chunk_file:
+                    async for piece in body:
+                        size += len(piece)
+                        if size > limit:
+                            raise InvalidUploadChunkError(self._too_large_message(limit, remaining))
+                        hasher.update(piece)
+                        await chunk_file.write(piece)
+            self._check_chunk(hasher.digest(), expected_digest, size, remaining)
+
+            await self._lock_offset(session, offset)
+            try:
+                if session.backend == "s3":
+                    part_number = len(session.parts) + 1
+                    etag = await get_storage_io_executor().run(
+                        "upload_part",
+                        self.storage.upload_part,
+                        session.storage_key,
+                        session.multipart_upload_id,
+                        part_number,
+                        bytes(data),
+                        timeout=settings.STORAGE_TRANSFER_TIMEOUT_SECONDS,
+                    )
+                    parts = list(session.parts) + [
+                        {"part_number": part_number, "etag": etag, "size": size}
+                    ]
+                else:
+                    await asyncio.to_thread(_write_at, session.temp_path, offset, chunk_path)
+                    parts = session.parts
+
+                new_offset = offset + size
+                expires_at = self._expiry()
+                await self.repo.advance_offset(session.id, offset, new_offset, parts, expires_at)
+                await self.db.commit()
+            except BaseException:
+                await self.db.rollback()
+                raise
+        finally:
+            if chunk_path is not None:
+                await asyncio.to_thread(Path(chunk_path).unlink, True)
+
+        session.upload_offset = new_offset
+        session.parts = parts
+        session.expires_at = expires_at
+        return session
+
+    async def finalize(self, user_id: uuid.UUID, upload_id: uuid.UUID) -> Video:
+        """Create the library video and queue processing.
+
+        Finalizing an already finalized upload returns its video.
+
+        Raises:
+            UploadIncompleteError: If not all bytes have arrived
+            LimitExceededError: If the storage limit was reached meanwhile
+        """
+        from app.modules.billing.feature_gate import FeatureGateService
+        from app.modules.video.tasks import process_library_upload_task
+
+        session = await self.get_active(user_id, upload_id)
+        if session.status == UploadSessionStatus.COMPLETED.value and session.video_id:
+            return await self.db.get(Video, session.video_id)
+        if not session.is_complete:
+            raise UploadIncompleteError(
+                f"Upload incomplete: {session.upload_offset}/{session.upload_length} bytes"
+            )
+
+        await FeatureGateService(self.db).check_storage_limit(
+            user_id, additional_bytes=session.upload_length, raise_on_exceed=True
+        )
+
+        metadata = session.upload_metadata or {}
+        folder_id = metadata.get("folder_id")
+        video = Video(
+            user_id=user_id,
+            title=metadata.get("title") or Path(session.filename).stem,
+            description=metadata.get("description"),
+            tags=metadata.get("tags") or [],
+            folder_id=uuid.UUID(folder_id) if folder_id else None,
+            custom_tags=[],
+            status=VideoStatus.PROCESSING_UPLOAD.value,
+            upload_progress=0,
+            file_size=session.upload_length,
+            is_favorite=False,
+        )
+        self.db.add(video)
+        await self.db.flush()
+
+        source_storage_key = None
+        if session.backend == "s3":
+            result = await get_storage_io_executor().run(
+                "complete_multipart_upload",
+                self.storage.complete_multipart_upload,
+                session.storage_key,
+                session.multipart_upload_id,
+                session.parts,
+                timeout=settings.STORAGE_TRANSFER_TIMEOUT_SECONDS,
+            )
+            if not result.success:
+                await self.db.rollback()
+                raise ResumableUploadError(f"Failed to complete upload: {result.error_message}")
+            source_storage_key = session.storage_key
+            temp_file_path = str(get_temp_dir() / f"upload_{video.id}{Path(session.filename).suffix}")
+        else:
+            temp_file_path = session.temp_path
+
+        session.status = UploadSessionStatus.COMPLETED.value
+        session.video_id = video.id
+
+        task = process_library_upload_task.delay(
+            video_id=str(video.id),
+            temp_file_path=temp_file_path,
+            original_filename=session.filename,
+            user_id=str(user_id),
+            source_storage_key=source_storage_key,
+        )
+        video.upload_job_id = task.id
+        video.upload_progress = 5
+
+        await self.db.commit()
+        await self.db.refresh(video)
+        logger.info(f"Finalized resumable upload {upload_id} as video {video.id}")
+        return video
+
+    async def abort(self, user_id: uuid.UUID, upload_id: uuid.UUID) -> None:
+        """Abort an upload and discard its data."""
+        session = await self.get(user_id, upload_id)
+        if session.status == UploadSessionStatus.ACTIVE.value:
+            await self._discard(session, UploadSessionStatus.ABORTED)
+            await self.db.commit()
+
+    async def cleanup_expired(self) -> int:
+        """Discard active sessions past their expiry. Returns the number discarded."""
+        sessions = await self.repo.get_expired(self.clock())
+        for session in sessions:
+            await self._discard(session, UploadSessionStatus.EXPIRED)
+        await self.db.commit()
+        return len(sessions)
+
+    async def _discard(self, session: UploadSession, status: UploadSessionStatus) -> None:
+        if session.backend == "s3" and session.multipart_upload_id:
+            await get_storage_io_executor().run(
+                "abort_multipart_upload",
+                self.storage.abort_multipart_upload,
+                session.storage_key,
+                session.multipart_upload_id,
+            )
+        elif session.temp_path:
+            await asyncio.to_thread(Path(session.temp_path).unlink, True)
+        session.status = status.value
+
+    async def _lock_offset(self, session: UploadSession, offset: int) -> None:
+        """Lock the session row until commit, if it is still at offset."""
+        if not await self.repo.lock_at_offset(session.id, offset):
+            await self.db.rollback()
+            await self.db.refresh(session)
+            raise UploadOffsetMismatchError(
+                "Upload offset changed while the chunk was written", session.upload_offset
+            )
+
+    def _check_chunk(self, digest: bytes, expected_digest: bytes, size: int, remaining: int) -> None:
+        if digest != expected_digest:
+            raise UploadChecksumMismatchError("Chunk checksum does not match")
+        if size == 0:
+            raise InvalidUploadChunkError("Chunk is empty")
+        if size < remaining and size < self.min_chunk_size:
+            raise InvalidUploadChunkError(
+                f"Chunks other than the last must be at least {self.min_chunk_size} bytes"
+            )
+
+    @staticmethod
+    def _too_large_message(limit: int, remaining: int) -> str:
+        if limit == remaining:
+            return f"Chunk exceeds the remaining {remaining} bytes of the upload"
+        return f"Chunk exceeds the maximum chunk size of {limit} bytes"
@@ -388,16 +388,15 @@ async def bulk_extract_duration(
     
     For cloud storage: downloads file to temp, extracts duration, then cleans up.
     """
+    from app.modules.video.media_analysis import MediaAnalysis
     from app.modules.video.upload_handler import get_video_duration
     from sqlalchemy import select
     from app.modules.video.models import Video
     from app.modules.account.models import YouTubeAccount
-    from app.core.storage import get_storage, is_cloud_storage
+    from app.core.storage import is_cloud_storage, storage_service
     from app.core.config import settings
     import tempfile
     
-    storage = get_storage()
-    
     # Get all videos for this user that have file_path but no duration
     result = await db.execute(
         select(Video)
@@ -427,6 +426,19 @@ async def bulk_extract_duration(
             })
             continue
         
+        # Reuse the stored media analysis instead of downloading and probing
+        analysis = MediaAnalysis.from_dict(video.media_analysis)
+        if analysis and analysis.duration:
+            video.duration = int(analysis.duration)
+            updated += 1
+            results.append({
+                "videoId": str(video.id),
+                "title": video.title,
+                "status": "updated",
+                "duration": video.duration
+            })
+            continue
+        
         # Determine actual file path
         actual_path = None
         temp_file = None
@@ -434,7 +446,7 @@ async def bulk_extract_duration(
         try:
             if is_cloud_storage():
                 # For cloud storage, check if file exists and download to temp
-                if not storage.exists(video.file_path):
+                if not await storage_service.exists(video.file_path):
                     skipped += 1
                     results.append({
                         "videoId": str(video.id),
@@ -449,7 +461,7 @@ async def bulk_extract_duration(
                 temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=ext)
                 temp_file.close()
                 
-                if not storage.download(video.file_path, temp_file.name):
+                if not await storage_service.download_file(video.file_path, temp_file.name):
                     skipped += 1
                     results.append({
                         "videoId": str(video.id),
@@ -1204,6 +1216,7 @@ async def extract_video_duration(
     Useful for videos that were uploaded before duration extraction was implemented.
     Only works for videos with local file_path.
     """
+    from app.modules.video.media_analysis import MediaAnalysis
     from app.modules.video.upload_handler import get_video_duration
     from sqlalchemy import select
     from app.modules.video.models import Video
@@ -1232,19 +1245,26 @@ async def extract_video_duration(
                 detail="Video has no file. Duration can only be extracted from uploaded videos.",
             )
         
+        # Reuse the stored media analysis instead of downloading and probing
+        analysis = MediaAnalysis.from_dict(video.media_analysis)
+        if analysis and analysis.duration:
+            video.duration = int(analysis.duration)
+            await db.commit()
+            await db.refresh(video)
+            return video
+        
         # Import storage utilities
-        from app.core.storage import get_storage, is_cloud_storage
+        from app.core.storage import is_cloud_storage, storage_service
         from app.core.config import settings
         import tempfile
         
-        storage = get_storage()
         actual_path = None
         temp_file = None
         
         try:
             if is_cloud_storage():
                 # For cloud storage, download to temp first
-                if not storage.exists(video.file_path):
+                if not await storage_service.exists(video.file_path):
                     raise HTTPException(
                         status_code=status.HTTP_400_BAD_REQUEST,
                         detail="Video file not found in cloud storage.",
@@ -1254,7 +1274,7 @@ async def extract_video_duration(
                 temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=ext)
                 temp_file.close()
                 
-                if not storage.download(video.file_path, temp_file.name):
+                if not await storage_service.download_file(video.file_path, temp_file.name):
                     raise HTTPException(
                         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                         detail="Failed to download video from cloud storage.",
@@ -345,3 +345,32 @@ class CreateStreamFromVideoRequest(BaseModel):
     max_restarts: int = Field(5, ge=1, le=10)
     scheduled_start_at: Optional[str] = None
     scheduled_end_at: Optional[str] = None
+
+
+class ResumableUploadCreate(BaseModel):
+    """Request schema for starting a resumable library upload."""
+
+    filename: str = Field(..., min_length=1, max_length=255)
+    upload_length: int = Field(..., gt=0)
+    content_type: Optional[str] = None
+    title: str = Field(..., min_length=1, max_length=MAX_TITLE_LENGTH)
+    description: Optional[str] = Field(None, max_length=MAX_DESCRIPTION_LENGTH)
+    tags: Optional[list[str]] = Field(None, max_length=MAX_TAGS)
+    folder_id: Optional[uuid.UUID] = None
+
+
+class ResumableUploadResponse(BaseModel):
+    """Response schema for a resumable upload session."""
+
+    id: uuid.UUID
+    filename: str
+    upload_length: int
+    upload_offset: int
+    status: str
+    expires_at: datetime
+    max_chunk_size: int
+    min_chunk_size: int = 0  # Non-final chunks must be at least this large
+    video_id: Optional[uuid.UUID] = None
+
+    class Config:
+        from_attributes = True
@@ -499,7 +499,7 @@ class VideoService:
         Args:
             video_id: Video UUID
         """
-        from app.core.storage import get_storage, is_cloud_storage
+        from app.core.storage import is_cloud_storage, storage_service
         
         video = await self.get_video(video_id)
         
@@ -512,14 +512,12 @@ class VideoService:
         video_title = video.title
         video_youtube_id = video.youtube_id
         
-        storage = get_storage()
-        
         # Hard delete video file from storage
         if video.file_path:
             try:
                 if is_cloud_storage():
                     # For cloud storage, use storage service
-                    storage.delete(video.file_path)
+                    await storage_service.delete_file(video.file_path)
                 else:
                     # For local storage, check if it's a storage key or absolute path
                     if os.path.isabs(video.file_path):
@@ -527,7 +525,7 @@ class VideoService:
                             os.remove(video.file_path)
                     else:
                         # It's a storage key
-                        storage.delete(video.file_path)
+                        await storage_service.delete_file(video.file_path)
             except Exception as e:
                 # Log but don't fail if file deletion fails
                 import logging
@@ -538,18 +536,27 @@ class VideoService:
             try:
                 if is_cloud_storage():
                     # For cloud storage, use storage service
-                    storage.delete(video.local_thumbnail_path)
+                    await storage_service.delete_file(video.local_thumbnail_path)
                 else:
                     # For local storage
                     if os.path.isabs(video.local_thumbnail_path):
                         if os.path.exists(video.local_thumbnail_path):
                             os.remove(video.local_thumbnail_path)
                     else:
-                        storage.delete(video.local_thumbnail_path)
+                        await storage_service.delete_file(video.local_thumbnail_path)
             except Exception as e:
                 import logging
                 logging.warning(f"Failed to delete thumbnail file {video.local_thumbnail_path}: {e}")
         
+        # Delete the preview sprite rendered during media analysis
+        sprite = (video.media_analysis or {}).get("sprite")
+        if sprite:
+            try:
+                await storage_service.delete_file(sprite["key"])
+            except Exception as e:
+                import logging
+                logging.warning(f"Failed to delete preview sprite {sprite['key']}: {e}")
+        
         # Soft delete the video record (preserves VideoUsageLog for billing)
         video.soft_delete()
         await self.session.flush()
@@ -13,7 +13,9 @@ from typing import Any, Optional
 from celery import Task
 
 from app.core.celery_app import celery_app
+from app.core.task_loop import run_async
 from app.core.config import settings
+from app.modules.account.quota_scheduler import QuotaPriority, get_quota_scheduler
 from app.modules.job.tasks import RetryConfig
 
 logger = logging.getLogger(__name__)
@@ -223,12 +225,11 @@ async def _send_upload_notification(session, video, success: bool, error: str =
 def _run_async(coro):
     """Run async coroutine in Celery task context.
     
-    Uses asyncio.run() which creates a fresh event loop for each task.
-    Combined with NullPool in celery_session_maker, this avoids
-    connection pool conflicts across different event loops.
+    Runs on the worker process's persistent event loop, whose pooled
+    engine serves celery_session_maker (see app.core.task_loop). Falls
+    back to asyncio.run() outside a prefork worker.
     """
-    import asyncio
-    return asyncio.run(coro)
+    return run_async(coro)
 
 
 def _update_progress_sync(video_id: str, progress: int):
@@ -311,7 +312,9 @@ def upload_video_task(self: VideoUploadTask, video_id: str) -> dict:
             if not access_token:
                 return None, None, "Failed to get YouTube access token"
 
-            # Update status to uploading
+            # Update status to uploading, remembering the status to return
+            # to if the upload is deferred
+            previous_status = video.status
             video.status = VideoStatus.UPLOADING.value
             video.upload_progress = 0
             video.upload_attempts += 1
@@ -329,6 +332,7 @@ def upload_video_task(self: VideoUploadTask, video_id: str) -> dict:
                 "visibility": video.visibility,
                 "scheduled_publish_at": video.scheduled_publish_at,
                 "account_id": str(video.account_id),
+                "previous_status": previous_status,
                 "local_thumbnail_path": _get_full_storage_path(video.local_thumbnail_path) if video.local_thumbnail_path else None,
             }
 
@@ -437,6 +441,28 @@ def upload_video_task(self: VideoUploadTask, video_id: str) -> dict:
                 await session.commit()
                 await _send_upload_notification(session, video, success=False, error=error)
 
+    async def _defer_upload(video_id: str, retry_after: float, previous_status: str):
+        """Requeue the upload for when the account's quota has refilled."""
+        task_id = str(uuid.uuid4())
+        async with celery_session_maker() as session:
+            from sqlalchemy import select
+
+            result = await session.execute(
+                select(Video).where(Video.id == uuid.UUID(video_id))
+            )
+            video = result.scalar_one_or_none()
+            if video:
+                # Back to the status it was queued in (e.g. scheduled); the
+                # deferral is recorded on the upload job, not as an attempt
+                video.status = previous_status
+                video.upload_attempts = max(0, video.upload_attempts - 1)
+                video.upload_job_id = task_id
+                video.last_upload_error = "Deferred until YouTube API quota resets"
+                await session.commit()
+
+        upload_video_task.apply_async(args=[video_id], countdown=int(retry_after), task_id=task_id)
+        logger.info(f"Deferred upload of video {video_id} by {int(retry_after)}s for quota")
+
     async def _upload():
         # Phase 1: Prepare
         video_data, access_token, error = await _prepare_upload()
@@ -448,6 +474,18 @@ def upload_video_task(self: VideoUploadTask, video_id: str) -> dict:
             return {"status": "error", "error": error}
 
         try:
+            # Uploads yield to live chat and stream control when quota is short
+            decision = await get_quota_scheduler().acquire(
+                uuid.UUID(video_data["account_id"]), "videos.insert", QuotaPriority.STANDARD
+            )
+            if not decision.allowed:
+                await _defer_upload(video_id, decision.retry_after_seconds, video_data["previous_status"])
+                return {
+                    "status": "deferred",
+                    "video_id": video_id,
+                    "retry_after_seconds": decision.retry_after_seconds,
+                }
+
             # Phase 2: Upload (no DB access)
             upload_result = await _do_upload(video_data, access_token)
 
@@ -789,10 +827,20 @@ def sync_all_video_stats() -> dict:
                         continue
 
                     client = YouTubeUploadClient(access_token)
+                    scheduler = get_quota_scheduler()
 
                     # Sync each video
                     for video in account_videos:
                         try:
+                            decision = await scheduler.acquire(
+                                account_id, "videos.list", QuotaPriority.STANDARD
+                            )
+                            if not decision.allowed:
+                                logger.info(
+                                    f"Quota headroom short for account {account_id}, "
+                                    f"deferring stats sync to next run"
+                                )
+                                break
                             video_data = await client.get_video_details(video.youtube_id)
                             if video_data:
                                 statistics = video_data.get("statistics", {})
@@ -827,14 +875,15 @@ def process_library_upload_task(
     video_id: str,
     temp_file_path: str,
     original_filename: str,
-    user_id: str
+    user_id: str,
+    source_storage_key: Optional[str] = None,
 ) -> dict:
     """Process library video upload in background.
     
     This task handles:
-    1. Extract metadata from video
+    1. Analyze the video once (streams, keyframes, loudness, thumbnail, sprite)
     2. Convert to MP4 if needed
-    3. Generate thumbnail
+    3. Store thumbnail and preview sprite
     4. Upload to cloud storage (R2/S3)
     5. Update video record with file info
     6. Cleanup temp files
@@ -849,18 +898,26 @@ def process_library_upload_task(
         temp_file_path: Path to temp file saved during upload
         original_filename: Original filename for extension detection
         user_id: UUID of the user who uploaded
+        source_storage_key: Storage key of a completed resumable upload.
+            Downloaded to temp_file_path first and deleted once processed.
         
     Returns:
         dict with status and video info
     """
     from app.core.database import celery_session_maker
+    from app.modules.video.media_analysis import (
+        SPRITE_COLUMNS,
+        SPRITE_ROWS,
+        SPRITE_TILE_WIDTH,
+        SpritePreview,
+        get_media_analyzer,
+        record_analysis,
+    )
     from app.modules.video.models import Video, VideoStatus
-    from app.modules.video.video_converter import VideoConverter
+    from app.modules.video.video_converter import ConversionStrategy, VideoConverter
     from app.modules.video.video_metadata_extractor import video_metadata_extractor
     from app.modules.video.video_storage_service import video_storage_service
     from pathlib import Path
-    from io import BytesIO
-    from fastapi import UploadFile as FastAPIUploadFile
     
     def update_progress(progress: int, error: str = None):
         """Update upload progress in database using sync connection.
@@ -893,6 +950,15 @@ def process_library_upload_task(
         logger.info(f"Temp file: {temp_file_path}")
         logger.info(f"Original filename: {original_filename}")
         
+        # Resumable uploads to S3 arrive as a staging object
+        if source_storage_key and not os.path.exists(temp_file_path):
+            from app.core.storage import get_storage
+            if not get_storage().download(source_storage_key, temp_file_path):
+                error_msg = f"Failed to download staged upload: {source_storage_key}"
+                logger.error(error_msg)
+                update_progress(0, error_msg)
+                return {"status": "error", "error": error_msg}
+        
         # Check if temp file exists
         if not os.path.exists(temp_file_path):
             error_msg = f"Temp file not found: {temp_file_path}"
@@ -905,70 +971,98 @@ def process_library_upload_task(
         detected_format = original_ext.lstrip('.')
         
         try:
-            # Step 1: Extract metadata (10%)
+            # Step 1: Analyze once - probe, keyframes, loudness, previews (10%)
             update_progress(10)
-            logger.info("Extracting metadata...")
+            logger.info("Analyzing media...")
             
+            analyzer = get_media_analyzer()
+            thumbnail_tmp_path = temp_file_path + "_thumb.jpg"
+            sprite_tmp_path = temp_file_path + "_sprite.jpg"
+            analysis = None
+            source_analysis = None
             metadata = None
             try:
-                metadata = await video_metadata_extractor.extract_metadata(temp_file_path)
+                async with celery_session_maker() as session:
+                    analysis, cached = await analyzer.get_or_analyze(
+                        session, temp_file_path, thumbnail_tmp_path, sprite_tmp_path
+                    )
+                source_analysis = analysis
+                metadata = analysis.to_metadata()
                 detected_format = metadata.format
-                logger.info(f"Metadata extracted: duration={metadata.duration}s, format={metadata.format}")
+                logger.info(
+                    f"Media analyzed{' (cached)' if cached else ''}: duration={metadata.duration}s, "
+                    f"format={metadata.format}, keyframes={len(analysis.keyframes)}"
+                )
             except Exception as e:
-                logger.warning(f"Failed to extract metadata: {e}")
+                logger.warning(f"Failed to analyze media: {e}")
                 # Continue with file extension as format
             
-            # Step 2: Check if conversion needed (15%)
+            # Step 2: Plan conversion from the stream info (15%)
             update_progress(15)
             
-            needs_conversion = VideoConverter.needs_conversion(detected_format) if detected_format else False
-            logger.info(f"Format check: detected_format='{detected_format}', needs_conversion={needs_conversion}")
+            file_size_mb = os.path.getsize(temp_file_path) / 1024 / 1024
+            settings = VideoConverter.get_recommended_settings(file_size_mb)
+            plan = VideoConverter.plan_conversion(metadata, detected_format, preset=settings['preset'])
+            logger.info(f"Conversion plan: {plan.strategy.value} ({plan.reason})")
+            conversion = None
             
             # Step 3: Convert to MP4 if needed (20-50%)
-            if needs_conversion:
+            if plan.strategy != ConversionStrategy.NONE:
                 update_progress(20)
                 logger.info(f"Starting conversion: {detected_format} → MP4")
                 
-                # Get recommended settings
-                file_size_mb = os.path.getsize(temp_file_path) / 1024 / 1024
-                settings = VideoConverter.get_recommended_settings(file_size_mb)
-                
                 # Output path
                 temp_dir = Path(temp_file_path).parent
                 converted_output_path = str(temp_dir / f"converted_{uuid.uuid4().hex}.mp4")
                 
-                success, converted_path, error = await VideoConverter.convert_to_mp4(
+                conversion = await VideoConverter.convert(
                     input_path=temp_file_path,
                     output_path=converted_output_path,
+                    plan=plan,
                     preset=settings['preset'],
                     crf=settings['crf'],
                     remove_input=True
                 )
                 
-                if success and converted_path:
-                    logger.info(f"Conversion successful: {converted_path}")
-                    final_file_path = converted_path
+                if conversion.success and conversion.output_path:
+                    logger.info(
+                        f"Conversion successful ({conversion.plan.strategy.value}): {conversion.output_path}"
+                    )
+                    final_file_path = conversion.output_path
                     detected_format = 'mp4'
+                    if analysis:
+                        # Stream copies keep keyframes and loudness; re-encodes are analyzed again
+                        try:
+                            analysis = await analyzer.analyze_output(
+                                analysis,
+                                final_file_path,
+                                stream_copy=conversion.plan.strategy != ConversionStrategy.REENCODE,
+                                audio_codec="aac" if conversion.plan.strategy == ConversionStrategy.TRANSCODE_AUDIO else None,
+                            )
+                            metadata = analysis.to_metadata()
+                        except Exception as e:
+                            logger.warning(f"Failed to analyze converted file: {e}")
                     update_progress(50)
                 else:
-                    logger.warning(f"Conversion failed: {error}, continuing with original")
+                    logger.warning(f"Conversion failed: {conversion.error}, continuing with original")
                     update_progress(50)
             else:
                 update_progress(50)
                 logger.info("No conversion needed")
             
-            # Step 4: Generate thumbnail (55%)
+            # Step 4: Store previews rendered during analysis (55%)
             update_progress(55)
-            logger.info("Generating thumbnail...")
             
             thumbnail_key = None
             try:
-                thumbnail_tmp_path = final_file_path + "_thumb.jpg"
-                await video_metadata_extractor.generate_thumbnail(
-                    final_file_path,
-                    thumbnail_tmp_path,
-                    timestamp=5
-                )
+                if not os.path.exists(thumbnail_tmp_path):
+                    # Analysis failed or found no keyframe after the thumbnail timestamp
+                    logger.info("Generating thumbnail...")
+                    await video_metadata_extractor.generate_thumbnail(
+                        final_file_path,
+                        thumbnail_tmp_path,
+                        timestamp=5
+                    )
                 
                 # Upload thumbnail to storage
                 with open(thumbnail_tmp_path, "rb") as thumb_file:
@@ -978,38 +1072,60 @@ def process_library_upload_task(
                         content=thumb_content,
                         custom=False
                     )
-                
-                # Cleanup thumbnail temp file
-                Path(thumbnail_tmp_path).unlink(missing_ok=True)
-                logger.info(f"Thumbnail generated: {thumbnail_key}")
+                logger.info(f"Thumbnail stored: {thumbnail_key}")
             except Exception as e:
                 logger.warning(f"Failed to generate thumbnail: {e}")
+            finally:
+                Path(thumbnail_tmp_path).unlink(missing_ok=True)
+            
+            try:
+                if analysis and os.path.exists(sprite_tmp_path):
+                    with open(sprite_tmp_path, "rb") as sprite_file:
+                        sprite_key = await video_storage_service.save_preview_sprite(
+                            video_id=uuid.UUID(video_id),
+                            content=sprite_file.read(),
+                        )
+                    analysis.sprite = SpritePreview(
+                        key=sprite_key,
+                        columns=SPRITE_COLUMNS,
+                        rows=SPRITE_ROWS,
+                        tile_width=SPRITE_TILE_WIDTH,
+                        interval_seconds=analysis.duration / (SPRITE_COLUMNS * SPRITE_ROWS),
+                    )
+                    logger.info(f"Preview sprite stored: {sprite_key}")
+            except Exception as e:
+                logger.warning(f"Failed to store preview sprite: {e}")
+            finally:
+                Path(sprite_tmp_path).unlink(missing_ok=True)
             
             # Step 5: Upload to cloud storage (60-90%)
             update_progress(60)
             logger.info("Uploading to cloud storage...")
             
-            with open(final_file_path, 'rb') as video_file:
-                video_content = video_file.read()
-                
-                # Determine filename
-                actual_ext = '.mp4' if detected_format == 'mp4' else original_ext
-                upload_filename = f"{video_id}{actual_ext}"
-                
-                logger.info(f"Uploading to storage: {upload_filename}")
-                
-                video_file_obj = FastAPIUploadFile(
-                    filename=upload_filename,
-                    file=BytesIO(video_content)
-                )
-                
-                storage_key, file_size = await video_storage_service.save_video(
-                    user_id=uuid.UUID(user_id),
-                    video_id=uuid.UUID(video_id),
-                    file=video_file_obj
-                )
-                
-                logger.info(f"Uploaded to storage: {storage_key}")
+            # Determine filename
+            actual_ext = '.mp4' if detected_format == 'mp4' else original_ext
+            upload_filename = f"{video_id}{actual_ext}"
+            
+            logger.info(f"Uploading to storage: {upload_filename}")
+            
+            reported = [60]
+            
+            def upload_progress(uploaded: int, total: int):
+                # Map bytes uploaded onto 60-90%, writing only when the percentage moves
+                progress = 60 + (30 * uploaded // total if total else 30)
+                if progress > reported[0]:
+                    reported[0] = progress
+                    update_progress(progress)
+            
+            storage_key, file_size = await video_storage_service.save_video_file(
+                user_id=uuid.UUID(user_id),
+                video_id=uuid.UUID(video_id),
+                file_path=final_file_path,
+                filename=upload_filename,
+                progress_callback=upload_progress,
+            )
+            
+            logger.info(f"Uploaded to storage: {storage_key}")
             
             update_progress(90)
             
@@ -1040,6 +1156,9 @@ def process_library_upload_task(
                     video.bitrate = metadata.bitrate
                     video.codec = metadata.codec
                 
+                if analysis:
+                    record_analysis(video, source_analysis, analysis)
+                
                 if thumbnail_key:
                     video.local_thumbnail_path = thumbnail_key
                 
@@ -1071,13 +1190,22 @@ def process_library_upload_task(
                 logger.info(f"Cleaned up temp file: {final_file_path}")
             except Exception as e:
                 logger.warning(f"Failed to cleanup temp file: {e}")
+            if source_storage_key:
+                from app.core.storage import get_storage
+                get_storage().delete(source_storage_key)
             
             return {
                 "status": "success",
                 "video_id": video_id,
                 "file_path": storage_key,
                 "format": detected_format,
-                "thumbnail": thumbnail_key
+                "thumbnail": thumbnail_key,
+                "conversion": {
+                    "strategy": conversion.plan.strategy.value,
+                    "reason": conversion.plan.reason,
+                    "elapsed_seconds": round(conversion.elapsed_seconds, 1),
+                    "time_saved_seconds": round(conversion.time_saved_seconds, 1),
+                } if conversion else None,
             }
             
         except Exception as e:
@@ -1108,6 +1236,8 @@ def process_library_upload_task(
             # Cleanup temp files on error
             try:
                 Path(temp_file_path).unlink(missing_ok=True)
+                Path(temp_file_path + "_thumb.jpg").unlink(missing_ok=True)
+                Path(temp_file_path + "_sprite.jpg").unlink(missing_ok=True)
                 if final_file_path != temp_file_path:
                     Path(final_file_path).unlink(missing_ok=True)
             except:
@@ -1122,3 +1252,20 @@ def process_library_upload_task(
             return {"status": "failed", "error": str(e)}
     
     return _run_async(_process())
+
+
+@celery_app.task
+def cleanup_expired_upload_sessions() -> dict:
+    """Discard resumable uploads that passed their expiry.
+
+    Removes their temp files or aborts their S3 multipart uploads.
+    """
+    from app.core.database import celery_session_maker
+    from app.modules.video.resumable_upload import ResumableUploadService
+
+    async def _cleanup():
+        async with celery_session_maker() as session:
+            expired = await ResumableUploadService(session).cleanup_expired()
+            return {"status": "success", "expired": expired}
+
+    return _run_async(_cleanup())
@@ -9,7 +9,6 @@ Hybrid Storage Approach:
 - Local temp files are cleaned up after successful cloud upload
 """
 
-import asyncio
 import json
 import os
 import subprocess
@@ -27,6 +26,9 @@ logger = logging.getLogger(__name__)
 # Chunk size for streaming (1MB)
 CHUNK_SIZE = 1024 * 1024
 
+# How often (in bytes written) a size check callback is re-run (64MB)
+SIZE_CHECK_INTERVAL = 64 * 1024 * 1024
+
 # Max file size (10GB)
 MAX_FILE_SIZE = 10 * 1024 * 1024 * 1024
 
@@ -87,25 +89,44 @@ class InvalidFileTypeError(UploadError):
     pass
 
 
+class UploadAbortedError(UploadError):
+    """Upload was stopped by a size check; the original error is the __cause__."""
+    pass
+
+
 async def stream_upload_to_temp(
     file: UploadFile,
     progress_callback: Optional[Callable[[int, int], Awaitable[None]]] = None,
+    file_path: Optional[str] = None,
+    max_size: int = MAX_FILE_SIZE,
+    size_check: Optional[Callable[[int], Awaitable[None]]] = None,
+    size_check_interval: int = SIZE_CHECK_INTERVAL,
 ) -> UploadResult:
     """Stream upload file to local temp storage for processing.
     
     This saves the file locally first so FFmpeg can process it.
     After processing, use upload_to_cloud_storage() to move to R2/S3.
     
+    The file is copied CHUNK_SIZE bytes at a time and writes run in a
+    thread, so memory use is constant and the event loop is never blocked.
+    
     Args:
         file: FastAPI UploadFile object
         progress_callback: Optional async callback(bytes_written, total_bytes)
+        file_path: Destination path. A unique temp path is used if not provided.
+        max_size: Maximum allowed size in bytes
+        size_check: Optional async callback(bytes_so_far) that raises to abort.
+            Called with the declared size up front (when known), every
+            size_check_interval bytes, and once at the end.
+        size_check_interval: Bytes between size_check calls
         
     Returns:
         UploadResult with local temp file path and metadata
         
     Raises:
-        FileTooLargeError: If file exceeds MAX_FILE_SIZE
+        FileTooLargeError: If file exceeds max_size
         InvalidFileTypeError: If file extension is not allowed
+        UploadAbortedError: If size_check raised
     """
     # Validate file extension
     original_filename = file.filename or "video.mp4"
@@ -116,17 +137,31 @@ async def stream_upload_to_temp(
             f"File type '{file_ext}' not allowed. Allowed: {', '.join(ALLOWED_EXTENSIONS)}"
         )
     
-    # Use temp directory for local processing
-    temp_dir = get_temp_dir()
+    if file_path is None:
+        # Use temp directory for local processing, with a unique filename
+        file_path = os.path.join(get_temp_dir(), f"{uuid.uuid4()}{file_ext}")
     
-    # Generate unique filename
-    unique_filename = f"{uuid.uuid4()}{file_ext}"
-    file_path = os.path.join(temp_dir, unique_filename)
+    async def run_size_check(size: int) -> None:
+        try:
+            await size_check(size)
+        except Exception as e:
+            raise UploadAbortedError(str(e)) from e
     
     # Stream file to disk
     total_bytes = 0
     
     try:
+        # Reject up front when the client declared the size
+        declared_size = getattr(file, "size", None)
+        if declared_size:
+            if declared_size > max_size:
+                raise FileTooLargeError(
+                    f"File exceeds maximum size of {max_size / (1024*1024*1024):.1f}GB"
+                )
+            if size_check:
+                await run_size_check(declared_size)
+        
+        next_check = size_check_interval
         async with aiofiles.open(file_path, 'wb') as out_file:
             while True:
                 chunk = await file.read(CHUNK_SIZE)
@@ -136,13 +171,13 @@ async def stream_upload_to_temp(
                 total_bytes += len(chunk)
                 
                 # Check file size limit
-                if total_bytes > MAX_FILE_SIZE:
-                    # Clean up partial file
-                    await out_file.close()
-                    os.remove(file_path)
+                if total_bytes > max_size:
                     raise FileTooLargeError(
-                        f"File exceeds maximum size of {MAX_FILE_SIZE / (1024*1024*1024):.1f}GB"
+                        f"File exceeds maximum size of {max_size / (1024*1024*1024):.1f}GB"
                     )
+                if size_check and total_bytes >= next_check:
+                    await run_size_check(total_bytes)
+                    next_check = total_bytes + size_check_interval
                 
                 await out_file.write(chunk)
                 
@@ -153,6 +188,9 @@ async def stream_upload_to_temp(
                     except Exception as e:
                         logger.warning(f"Progress callback error: {e}")
         
+        if size_check:
+            await run_size_check(total_bytes)
+        
         logger.info(f"File uploaded to temp: {file_path} ({total_bytes} bytes)")
         
         return UploadResult(
@@ -162,7 +200,10 @@ async def stream_upload_to_temp(
             content_type=file.content_type,
         )
         
-    except (FileTooLargeError, InvalidFileTypeError):
+    except UploadError:
+        # Clean up partial file
+        if os.path.exists(file_path):
+            os.remove(file_path)
         raise
     except Exception as e:
         # Clean up on error
@@ -201,30 +242,33 @@ async def upload_to_cloud_storage(
     Raises:
         UploadError: If upload fails
     """
-    from app.core.storage import get_storage
-    
-    storage = get_storage()
+    from app.core.storage import storage_service
     
     # Check if using cloud storage
     if settings.STORAGE_BACKEND == "local":
         # For local backend, just move file to final location
+        import shutil
+        
         final_path = os.path.join(settings.LOCAL_STORAGE_PATH, storage_key)
-        os.makedirs(os.path.dirname(final_path), exist_ok=True)
         
-        if cleanup_local and local_path != final_path:
-            import shutil
-            shutil.move(local_path, final_path)
-        elif local_path != final_path:
-            import shutil
-            shutil.copy2(local_path, final_path)
+        def store_locally() -> None:
+            os.makedirs(os.path.dirname(final_path), exist_ok=True)
+            if cleanup_local and local_path != final_path:
+                shutil.move(local_path, final_path)
+            elif local_path != final_path:
+                shutil.copy2(local_path, final_path)
         
-        url = storage.get_url(storage_key)
+        await storage_service.run(
+            "move", store_locally, timeout=settings.STORAGE_TRANSFER_TIMEOUT_SECONDS
+        )
+        
+        url = await storage_service.get_url(storage_key)
         logger.info(f"File stored locally: {storage_key}")
         return storage_key, url
     
     # Upload to cloud storage (R2/S3/MinIO)
     try:
-        result = storage.upload(local_path, storage_key, content_type)
+        result = await storage_service.upload_path(local_path, storage_key, content_type)
         
         if not result.success:
             raise UploadError(f"Cloud upload failed: {result.error_message}")
@@ -334,39 +378,24 @@ def cleanup_temp_file(file_path: str) -> bool:
 async def get_video_duration(file_path: str) -> Optional[int]:
     """Extract video duration using ffprobe.
     
+    Probes go through the shared media analyzer, so a file that was already
+    probed in this process is not probed again.
+    
     Args:
         file_path: Path to the video file
         
     Returns:
         Optional[int]: Duration in seconds, or None if extraction fails
     """
+    from app.modules.video.media_analysis import get_media_analyzer
+    
     try:
-        # Use ffprobe to get video duration
-        cmd = [
-            "ffprobe",
-            "-v", "quiet",
-            "-print_format", "json",
-            "-show_format",
-            "-show_streams",
-            file_path
-        ]
-        
-        # Run ffprobe asynchronously
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-        
-        stdout, stderr = await process.communicate()
-        
-        if process.returncode != 0:
-            logger.warning(f"ffprobe failed for {file_path}: {stderr.decode()}")
+        try:
+            data = await get_media_analyzer().probe(file_path)
+        except RuntimeError as e:
+            logger.warning(f"ffprobe failed for {file_path}: {e}")
             return None
         
-        # Parse JSON output
-        data = json.loads(stdout.decode())
-        
         # Try to get duration from format first
         if "format" in data and "duration" in data["format"]:
             duration = float(data["format"]["duration"])
@@ -385,9 +414,6 @@ async def get_video_duration(file_path: str) -> Optional[int]:
     except FileNotFoundError:
         logger.error("ffprobe not found. Please install FFmpeg.")
         return None
-    except json.JSONDecodeError as e:
-        logger.error(f"Failed to parse ffprobe output: {e}")
-        return None
     except Exception as e:
         logger.error(f"Error getting video duration: {e}")
         return None
@@ -1,16 +1,28 @@
 """Video Converter Module.
 
 Converts videos to browser-compatible formats (MP4 H.264).
+Conversions are planned from the ffprobe stream info: uploads whose streams
+are already browser-compatible are remuxed instead of re-encoded.
 Requirements: 1.1 (Video Library Management)
 """
 
 import subprocess
 import os
+import time
 import uuid
+from dataclasses import dataclass
+from enum import Enum
 from pathlib import Path
 from typing import Optional, Tuple
 import logging
 
+from app.core.metrics import (
+    VIDEO_CONVERSION_DURATION_SECONDS,
+    VIDEO_CONVERSION_SECONDS_SAVED_TOTAL,
+    VIDEO_CONVERSIONS_TOTAL,
+)
+from app.modules.video.video_metadata_extractor import VideoFileMetadata
+
 logger = logging.getLogger(__name__)
 
 # Temp directory for conversion - relative to backend folder
@@ -23,6 +35,39 @@ def get_temp_dir() -> Path:
     return TEMP_DIR
 
 
+class ConversionStrategy(str, Enum):
+    """How an upload becomes a browser-playable MP4."""
+    NONE = "none"  # Container is already browser-compatible
+    REMUX = "remux"  # Copy both streams into an MP4 container
+    TRANSCODE_AUDIO = "transcode_audio"  # Copy video, re-encode audio to AAC
+    REENCODE = "reencode"  # Full H.264/AAC encode
+
+
+@dataclass
+class ConversionPlan:
+    """Chosen conversion strategy and why."""
+    strategy: ConversionStrategy
+    reason: str
+    estimated_reencode_seconds: float = 0.0  # What a full re-encode would cost
+
+
+@dataclass
+class ConversionResult:
+    """Outcome of a planned conversion."""
+    success: bool
+    output_path: Optional[str]
+    error: Optional[str]
+    plan: ConversionPlan
+    elapsed_seconds: float = 0.0
+
+    @property
+    def time_saved_seconds(self) -> float:
+        """Estimated encode time avoided by not re-encoding."""
+        if not self.success or self.plan.strategy == ConversionStrategy.REENCODE:
+            return 0.0
+        return max(0.0, self.plan.estimated_reencode_seconds - self.elapsed_seconds)
+
+
 class VideoConverter:
     """Video converter for browser compatibility."""
     
@@ -32,6 +77,26 @@ class VideoConverter:
     # Browser-compatible formats (no conversion needed)
     COMPATIBLE_FORMATS = ['mp4', 'webm', 'ogg']
     
+    # Streams every browser plays from MP4 and that can be copied as-is.
+    # 10-bit and 4:2:2 H.264 do not play in most browsers.
+    COPYABLE_VIDEO_CODECS = {'h264'}
+    COPYABLE_PIXEL_FORMATS = {'yuv420p', 'yuvj420p'}
+    COPYABLE_AUDIO_CODECS = {'aac', 'mp3'}
+    
+    # Rough libx264 throughput (pixels/second) on a 4-core worker, used to
+    # estimate the re-encode time a stream copy saves
+    ENCODE_PIXELS_PER_SECOND = {
+        'ultrafast': 600e6,
+        'superfast': 400e6,
+        'veryfast': 300e6,
+        'faster': 200e6,
+        'fast': 150e6,
+        'medium': 100e6,
+        'slow': 50e6,
+        'slower': 25e6,
+        'veryslow': 10e6,
+    }
+    
     @staticmethod
     def needs_conversion(format_name: str) -> bool:
         """Check if video format needs conversion.
@@ -63,71 +128,207 @@ class VideoConverter:
         return False
     
     @staticmethod
-    async def convert_to_mp4(
+    def plan_conversion(
+        metadata: Optional[VideoFileMetadata],
+        format_name: Optional[str] = None,
+        preset: str = 'medium',
+    ) -> ConversionPlan:
+        """Choose the cheapest conversion that yields a browser-playable MP4.
+        
+        Args:
+            metadata: ffprobe stream info (None if extraction failed)
+            format_name: Container format, used when metadata is unavailable
+            preset: Preset a full re-encode would use, for the time estimate
+            
+        Returns:
+            ConversionPlan: remux when both streams can be copied, audio-only
+                transcode when only the audio is incompatible, else re-encode
+        """
+        format_name = metadata.format if metadata else format_name
+        if not format_name or not VideoConverter.needs_conversion(format_name):
+            return ConversionPlan(ConversionStrategy.NONE, f"'{format_name}' plays in browsers")
+        
+        if metadata is None:
+            return ConversionPlan(ConversionStrategy.REENCODE, "stream info unavailable")
+        
+        estimate = VideoConverter.estimate_reencode_seconds(metadata, preset)
+        codec = (metadata.codec or '').lower()
+        pixel_format = (metadata.pixel_format or '').lower()
+        audio_codec = (metadata.audio_codec or '').lower()
+        
+        if codec not in VideoConverter.COPYABLE_VIDEO_CODECS:
+            return ConversionPlan(
+                ConversionStrategy.REENCODE, f"{codec or 'unknown'} video needs re-encoding", estimate
+            )
+        if pixel_format and pixel_format not in VideoConverter.COPYABLE_PIXEL_FORMATS:
+            return ConversionPlan(
+                ConversionStrategy.REENCODE, f"{codec} {pixel_format} video needs re-encoding", estimate
+            )
+        if not audio_codec or audio_codec in VideoConverter.COPYABLE_AUDIO_CODECS:
+            return ConversionPlan(
+                ConversionStrategy.REMUX,
+                f"{codec} video and {audio_codec or 'no'} audio can be copied",
+                estimate,
+            )
+        return ConversionPlan(
+            ConversionStrategy.TRANSCODE_AUDIO,
+            f"{codec} video can be copied, {audio_codec} audio needs AAC",
+            estimate,
+        )
+    
+    @staticmethod
+    def estimate_reencode_seconds(metadata: VideoFileMetadata, preset: str = 'medium') -> float:
+        """Estimate how long a full libx264 re-encode of the video takes."""
+        pixels_per_second = VideoConverter.ENCODE_PIXELS_PER_SECOND.get(preset, 100e6)
+        frame_rate = metadata.frame_rate or 30.0
+        return metadata.duration * frame_rate * metadata.width * metadata.height / pixels_per_second
+    
+    @staticmethod
+    def build_command(
+        plan: ConversionPlan,
+        input_path: str,
+        output_path: str,
+        preset: str = 'medium',
+        crf: int = 23,
+    ) -> list[str]:
+        """Build the FFmpeg command for a conversion plan."""
+        cmd = ['ffmpeg', '-i', input_path]
+        
+        if plan.strategy == ConversionStrategy.REENCODE:
+            cmd += [
+                '-c:v', 'libx264',  # H.264 video codec
+                '-pix_fmt', 'yuv420p',  # 8-bit 4:2:0, the only H.264 profile browsers play
+                '-c:a', 'aac',      # AAC audio codec
+                '-preset', preset,  # Encoding speed vs compression
+                '-crf', str(crf),   # Quality level
+            ]
+        else:
+            # First video and audio stream only: phone MOVs carry timecode and
+            # metadata tracks that the MP4 muxer cannot copy
+            cmd += ['-map', '0:v:0', '-map', '0:a:0?', '-c:v', 'copy']
+            if plan.strategy == ConversionStrategy.TRANSCODE_AUDIO:
+                cmd += ['-c:a', 'aac', '-b:a', '192k']
+            else:
+                cmd += ['-c:a', 'copy']
+        
+        cmd += [
+            '-movflags', '+faststart',  # Enable streaming (moov atom at start)
+            '-y',  # Overwrite output file
+            output_path,
+        ]
+        return cmd
+    
+    @staticmethod
+    async def _run_ffmpeg(cmd: list[str]) -> None:
+        """Run FFmpeg in a thread pool to avoid blocking the event loop."""
+        import asyncio
+        import concurrent.futures
+        
+        def run_ffmpeg():
+            return subprocess.run(
+                cmd,
+                check=True,
+                capture_output=True,
+                text=True,
+                timeout=3600,  # 1 hour timeout
+                creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
+            )
+        
+        loop = asyncio.get_event_loop()
+        with concurrent.futures.ThreadPoolExecutor() as executor:
+            await loop.run_in_executor(executor, run_ffmpeg)
+    
+    @staticmethod
+    async def convert(
         input_path: str,
         output_path: Optional[str] = None,
+        plan: Optional[ConversionPlan] = None,
         preset: str = 'medium',
         crf: int = 23,
-        remove_input: bool = False
-    ) -> Tuple[bool, Optional[str], Optional[str]]:
-        """Convert video to MP4 H.264 format.
+        remove_input: bool = False,
+    ) -> ConversionResult:
+        """Convert video to MP4 following a conversion plan.
+        
+        A stream copy that FFmpeg rejects falls back to a full re-encode.
         
         Args:
             input_path: Path to input video file
             output_path: Path for output MP4 file (optional, auto-generated if None)
-            preset: FFmpeg preset (ultrafast, fast, medium, slow, veryslow)
-            crf: Constant Rate Factor for quality (18-28, lower = better quality)
+            plan: Conversion plan (full re-encode if None)
+            preset: FFmpeg preset for re-encoding (ultrafast, fast, medium, slow, veryslow)
+            crf: Constant Rate Factor for re-encoding (18-28, lower = better quality)
             remove_input: Whether to remove input file after successful conversion
             
         Returns:
-            Tuple[bool, Optional[str], Optional[str]]: 
-                (success, output_path, error_message)
+            ConversionResult: Outcome, the plan actually used and its duration
         """
-        import asyncio
-        import concurrent.futures
+        plan = plan or ConversionPlan(ConversionStrategy.REENCODE, "re-encode requested")
+        if plan.strategy == ConversionStrategy.NONE:
+            return ConversionResult(True, input_path, None, plan)
+        
+        # Generate output path if not provided
+        if output_path is None:
+            input_file = Path(input_path)
+            output_path = str(input_file.with_suffix('.mp4'))
+        
+        started = time.monotonic()
+        result = await VideoConverter._convert(input_path, output_path, plan, preset, crf)
+        
+        if not result.success and plan.strategy != ConversionStrategy.REENCODE:
+            logger.warning(f"{plan.strategy.value} failed ({result.error}), falling back to re-encode")
+            VIDEO_CONVERSIONS_TOTAL.labels(strategy=plan.strategy.value, status="error").inc()
+            fallback = ConversionPlan(
+                ConversionStrategy.REENCODE,
+                f"{plan.strategy.value} failed",
+                plan.estimated_reencode_seconds,
+            )
+            result = await VideoConverter._convert(input_path, output_path, fallback, preset, crf)
+        
+        result.elapsed_seconds = time.monotonic() - started
+        strategy = result.plan.strategy.value
+        VIDEO_CONVERSIONS_TOTAL.labels(
+            strategy=strategy, status="success" if result.success else "error"
+        ).inc()
+        if result.success:
+            VIDEO_CONVERSION_DURATION_SECONDS.labels(strategy=strategy).observe(result.elapsed_seconds)
+            VIDEO_CONVERSION_SECONDS_SAVED_TOTAL.labels(strategy=strategy).inc(result.time_saved_seconds)
+            logger.info(
+                f"Conversion ({strategy}) took {result.elapsed_seconds:.1f}s, "
+                f"saved ~{result.time_saved_seconds:.0f}s versus re-encoding"
+            )
+            
+            # Remove input file if requested
+            if remove_input:
+                try:
+                    os.remove(input_path)
+                    logger.info(f"Removed input file: {input_path}")
+                except Exception as e:
+                    logger.warning(f"Failed to remove input file: {e}")
         
+        return result
+    
+    @staticmethod
+    async def _convert(
+        input_path: str,
+        output_path: str,
+        plan: ConversionPlan,
+        preset: str,
+        crf: int,
+    ) -> ConversionResult:
         try:
-            # Generate output path if not provided
-            if output_path is None:
-                input_file = Path(input_path)
-                output_path = str(input_file.with_suffix('.mp4'))
-            
-            logger.info(f"Converting video: {input_path} → {output_path}")
-            logger.info(f"Settings: preset={preset}, crf={crf}")
-            
-            # FFmpeg command for conversion
-            cmd = [
-                'ffmpeg',
-                '-i', input_path,
-                '-c:v', 'libx264',  # H.264 video codec
-                '-c:a', 'aac',      # AAC audio codec
-                '-movflags', '+faststart',  # Enable streaming (moov atom at start)
-                '-preset', preset,  # Encoding speed vs compression
-                '-crf', str(crf),   # Quality level
-                '-y',  # Overwrite output file
-                output_path
-            ]
+            logger.info(f"Converting video ({plan.strategy.value}: {plan.reason}): {input_path} → {output_path}")
+            if plan.strategy == ConversionStrategy.REENCODE:
+                logger.info(f"Settings: preset={preset}, crf={crf}")
             
-            # Run FFmpeg in thread pool to avoid blocking event loop
-            def run_ffmpeg():
-                return subprocess.run(
-                    cmd,
-                    check=True,
-                    capture_output=True,
-                    text=True,
-                    timeout=3600,  # 1 hour timeout
-                    creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
-                )
-            
-            loop = asyncio.get_event_loop()
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                result = await loop.run_in_executor(executor, run_ffmpeg)
+            await VideoConverter._run_ffmpeg(
+                VideoConverter.build_command(plan, input_path, output_path, preset, crf)
+            )
             
             # Verify output file exists
             if not os.path.exists(output_path):
                 error_msg = "Output file not created"
                 logger.error(error_msg)
-                return False, None, error_msg
+                return ConversionResult(False, None, error_msg, plan)
             
             # Get output file size
             output_size = os.path.getsize(output_path)
@@ -136,32 +337,53 @@ class VideoConverter:
             logger.info(f"Conversion successful!")
             logger.info(f"Input size: {input_size / 1024 / 1024:.2f} MB")
             logger.info(f"Output size: {output_size / 1024 / 1024:.2f} MB")
-            logger.info(f"Compression: {(1 - output_size / input_size) * 100:.1f}%")
+            if input_size:
+                logger.info(f"Compression: {(1 - output_size / input_size) * 100:.1f}%")
             
-            # Remove input file if requested
-            if remove_input:
-                try:
-                    os.remove(input_path)
-                    logger.info(f"Removed input file: {input_path}")
-                except Exception as e:
-                    logger.warning(f"Failed to remove input file: {e}")
-            
-            return True, output_path, None
+            return ConversionResult(True, output_path, None, plan)
             
         except subprocess.TimeoutExpired:
             error_msg = "Conversion timeout (exceeded 1 hour)"
             logger.error(error_msg)
-            return False, None, error_msg
+            return ConversionResult(False, None, error_msg, plan)
             
         except subprocess.CalledProcessError as e:
             error_msg = f"FFmpeg error: {e.stderr}"
             logger.error(f"Conversion failed: {error_msg}")
-            return False, None, error_msg
+            return ConversionResult(False, None, error_msg, plan)
             
         except Exception as e:
             error_msg = f"Unexpected error: {str(e)}"
             logger.error(f"Conversion failed: {error_msg}")
-            return False, None, error_msg
+            return ConversionResult(False, None, error_msg, plan)
+    
+    @staticmethod
+    async def convert_to_mp4(
+        input_path: str,
+        output_path: Optional[str] = None,
+        preset: str = 'medium',
+        crf: int = 23,
+        remove_input: bool = False,
+        plan: Optional[ConversionPlan] = None,
+    ) -> Tuple[bool, Optional[str], Optional[str]]:
+        """Convert video to MP4 H.264 format.
+        
+        Args:
+            input_path: Path to input video file
+            output_path: Path for output MP4 file (optional, auto-generated if None)
+            preset: FFmpeg preset (ultrafast, fast, medium, slow, veryslow)
+            crf: Constant Rate Factor for quality (18-28, lower = better quality)
+            remove_input: Whether to remove input file after successful conversion
+            plan: Conversion plan (full re-encode if None)
+            
+        Returns:
+            Tuple[bool, Optional[str], Optional[str]]: 
+                (success, output_path, error_message)
+        """
+        result = await VideoConverter.convert(
+            input_path, output_path, plan, preset, crf, remove_input
+        )
+        return result.success, result.output_path, result.error
     
     @staticmethod
     async def convert_with_temp_output(
@@ -152,38 +152,46 @@ class VideoLibraryService:
         self.db.add(video)
         await self.db.flush()  # Get video.id
         
+        from app.modules.billing.feature_gate import FeatureGateService, LimitExceededError
+        from app.modules.video.upload_handler import (
+            FileTooLargeError,
+            UploadAbortedError,
+            stream_upload_to_temp,
+        )
+        
+        # Save file to storage/temp folder
+        temp_dir = get_temp_dir()
+        original_ext = Path(file.filename).suffix
+        tmp_file_path = str(temp_dir / f"upload_{video.id}{original_ext}")
+        feature_gate = FeatureGateService(self.db)
+        
+        async def check_storage(bytes_so_far: int) -> None:
+            await feature_gate.check_storage_limit(
+                user_id,
+                additional_bytes=bytes_so_far,
+                raise_on_exceed=True
+            )
+        
         try:
-            # Save file to storage/temp folder
-            temp_dir = get_temp_dir()
-            original_ext = Path(file.filename).suffix
-            tmp_file_path = str(temp_dir / f"upload_{video.id}{original_ext}")
-            
-            content = await file.read()
-            file_size = len(content)
-            
-            # Check storage limit with actual file size
-            from app.modules.billing.feature_gate import FeatureGateService, LimitExceededError
-            feature_gate = FeatureGateService(self.db)
+            # Stream to disk in chunks, aborting as soon as the running
+            # size exceeds the user's storage limit
             try:
-                await feature_gate.check_storage_limit(
-                    user_id, 
-                    additional_bytes=file_size, 
-                    raise_on_exceed=True
+                upload = await stream_upload_to_temp(
+                    file,
+                    file_path=tmp_file_path,
+                    max_size=MAX_FILE_SIZE,
+                    size_check=check_storage,
                 )
-            except LimitExceededError as e:
+            except (UploadAbortedError, FileTooLargeError) as e:
                 # Delete the video record we just created
                 await self.db.delete(video)
                 await self.db.commit()
-                raise HTTPException(
-                    status_code=403,
-                    detail=e.message,
-                )
-            
-            with open(tmp_file_path, 'wb') as tmp_file:
-                tmp_file.write(content)
+                if isinstance(e.__cause__, LimitExceededError):
+                    raise HTTPException(status_code=403, detail=e.__cause__.message)
+                raise HTTPException(status_code=413, detail=str(e))
             
             # Get file size for initial record
-            video.file_size = file_size
+            video.file_size = upload.file_size
             
             logger.info(f"📁 Saved upload to temp: {tmp_file_path} ({video.file_size} bytes)")
             
@@ -206,6 +214,8 @@ class VideoLibraryService:
             
             return video
             
+        except HTTPException:
+            raise
         except Exception as e:
             await self.db.rollback()
             # Clean up temp file if saved
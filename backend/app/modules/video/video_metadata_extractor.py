@@ -24,6 +24,8 @@ class VideoFileMetadata:
     codec: str  # e.g., "h264", "h265"
     format: str  # e.g., "mp4", "mov"
     file_size: int  # bytes
+    audio_codec: Optional[str] = None  # e.g., "aac"; None when there is no audio
+    pixel_format: Optional[str] = None  # e.g., "yuv420p"
 
 
 class VideoMetadataExtractor:
@@ -115,6 +117,11 @@ class VideoMetadataExtractor:
             if not video_stream:
                 raise RuntimeError("No video stream found in file")
 
+            audio_stream = next(
+                (s for s in data.get("streams", []) if s.get("codec_type") == "audio"),
+                None,
+            )
+
             # Extract video stream info
             width = int(video_stream.get("width", 0))
             height = int(video_stream.get("height", 0))
@@ -139,7 +146,9 @@ class VideoMetadataExtractor:
                 bitrate=bitrate,
                 codec=codec,
                 format=format_name,
-                file_size=file_size
+                file_size=file_size,
+                audio_codec=audio_stream.get("codec_name") if audio_stream else None,
+                pixel_format=video_stream.get("pix_fmt"),
             )
 
         except json.JSONDecodeError as e:
@@ -11,7 +11,7 @@ from uuid import UUID
 
 from fastapi import UploadFile
 
-from app.core.storage import storage_service, StorageResult
+from app.core.storage import ProgressCallback, storage_service, StorageResult
 
 
 class VideoStorageService:
@@ -71,6 +71,48 @@ class VideoStorageService:
         
         return key, result.file_size
 
+    async def save_video_file(
+        self,
+        user_id: UUID,
+        video_id: UUID,
+        file_path: str,
+        filename: Optional[str] = None,
+        content_type: str = "video/mp4",
+        progress_callback: Optional[ProgressCallback] = None,
+    ) -> tuple[str, int]:
+        """Save a video file on disk to storage.
+        
+        Large files go to S3/MinIO as parallel multipart uploads.
+        
+        Args:
+            user_id: Owner of the video
+            video_id: Unique video identifier
+            file_path: Path of the video file
+            filename: Name whose extension the storage key uses (defaults to file_path)
+            content_type: MIME type
+            progress_callback: Called with (bytes_uploaded, total_bytes)
+            
+        Returns:
+            tuple[str, int]: (storage_key, file_size)
+            
+        Raises:
+            Exception: If upload fails
+        """
+        ext = Path(filename or file_path).suffix or ".mp4"
+        key = f"videos/{user_id}/{video_id}{ext}"
+        
+        result = await self.storage.upload_path(
+            file_path,
+            key,
+            content_type=content_type,
+            progress_callback=progress_callback,
+        )
+        
+        if not result.success:
+            raise Exception(f"Failed to upload video: {result.error_message}")
+        
+        return key, result.file_size
+
     async def delete_video(self, key: str) -> bool:
         """Delete video file from storage.
         
@@ -142,6 +184,32 @@ class VideoStorageService:
         
         return key
 
+    async def save_preview_sprite(self, video_id: UUID, content: bytes) -> str:
+        """Save a preview sprite sheet to storage.
+        
+        Args:
+            video_id: Video identifier
+            content: Sprite sheet image content (JPEG)
+            
+        Returns:
+            str: Storage key of the sprite sheet
+            
+        Raises:
+            Exception: If upload fails
+        """
+        key = f"thumbnails/{video_id}_sprite.jpg"
+        
+        result = await self.storage.upload_file(
+            key=key,
+            content=content,
+            content_type="image/jpeg"
+        )
+        
+        if not result.success:
+            raise Exception(f"Failed to upload preview sprite: {result.error_message}")
+        
+        return key
+
     async def delete_thumbnail(self, key: str) -> bool:
         """Delete thumbnail from storage.
         
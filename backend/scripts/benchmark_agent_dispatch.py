@@ -0,0 +1,194 @@
+"""Simulate push dispatch to a fleet of agents and measure dispatch latency.
+
+Registers ``--agents`` simulated agents (500 by default) with random
+capacities in the agent control channel. Each agent waits on its inbox like
+a WebSocket connection does, acknowledges a pushed job, works on it for a
+random time and releases it. Jobs are dispatched at ``--rate`` per second,
+two ways:
+
+- atomic: ``AgentControl.reserve``, the Lua script that picks the
+  least-loaded live agent and takes the slot in one step
+- read-then-pick: read every agent's load, pick the lowest in Python, then
+  increment it (how dispatch chose agents before the control channel)
+
+Reports how long a reservation takes, the latency from dispatch until the
+agent has the job in hand, jobs nobody had room for, and reservations that
+pushed an agent over its capacity.
+
+Needs a reachable REDIS_URL; it deletes the control channel keys, so point
+it at a scratch database. Run with:
+    python -m scripts.benchmark_agent_dispatch --agents 500 --jobs 5000 --rate 1000
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+from app.modules.agent.control import (
+    CAPACITY_KEY,
+    EXPIRY_KEY,
+    INBOX_KEY_PREFIX,
+    LEASES_KEY,
+    LOAD_KEY,
+    UNACKED_KEY,
+    AgentControl,
+)
+
+
+async def reset(redis) -> None:
+    await redis.delete(CAPACITY_KEY, EXPIRY_KEY, LEASES_KEY, LOAD_KEY, UNACKED_KEY)
+    async for key in redis.scan_iter(f"{INBOX_KEY_PREFIX}*"):
+        await redis.delete(key)
+
+
+async def read_then_pick(control: AgentControl, job_id: str) -> Optional[str]:
+    """Pick the lowest load from a read, then take it: not atomic."""
+    loads = dict(await control.redis.zrange(LOAD_KEY, 0, -1, withscores=True))
+    capacities = await control.redis.hgetall(CAPACITY_KEY)
+    live = await control.live_agents()
+    candidates = [a for a, load in loads.items() if a in live and load < int(capacities[a])]
+    if not candidates:
+        return None
+    agent_id = min(candidates, key=lambda a: (loads[a], -int(capacities[a])))
+    await control.redis.zincrby(LOAD_KEY, 1, agent_id)
+    await control.redis.hset(LEASES_KEY, job_id, agent_id)
+    return agent_id
+
+
+class Fleet:
+    """Simulated agents and what they observed."""
+
+    def __init__(self, control: AgentControl, agents: int, work_ms: float, seed: int):
+        self.control = control
+        self.rng = random.Random(seed)
+        self.capacities = {f"sim-{i}": self.rng.randint(2, 8) for i in range(agents)}
+        self.work_ms = work_ms
+        self.dispatched_at: dict[str, float] = {}
+        self.latencies: list[float] = []
+        self.over_capacity = 0
+        self.working: set[asyncio.Task] = set()
+        self._running = True
+
+    async def start(self) -> list[asyncio.Task]:
+        for agent_id, capacity in self.capacities.items():
+            await self.control.register(agent_id, capacity)
+        return [asyncio.create_task(self.agent(agent_id)) for agent_id in self.capacities]
+
+    async def agent(self, agent_id: str) -> None:
+        while self._running:
+            for message in await self.control.next_messages(agent_id, timeout=1):
+                self.latencies.append(time.perf_counter() - self.dispatched_at[message["job_id"]])
+                await self.control.ack(message["job_id"], agent_id)
+                task = asyncio.create_task(self.work(message["job_id"], agent_id))
+                self.working.add(task)
+                task.add_done_callback(self.working.discard)
+            await self.control.heartbeat(agent_id)
+
+    async def work(self, job_id: str, agent_id: str) -> None:
+        await asyncio.sleep(self.rng.expovariate(1000 / self.work_ms))
+        await self.control.release(job_id, agent_id)
+
+    def stop(self) -> None:
+        self._running = False
+
+
+async def run_mode(mode: str, args) -> dict:
+    redis = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+    await reset(redis)
+    control = AgentControl(redis, heartbeat_ttl=600, ack_timeout=600)
+    fleet = Fleet(control, args.agents, args.work_ms, args.seed)
+    agents = await fleet.start()
+
+    reserve_times: list[float] = []
+    unplaced = 0
+
+    async def dispatch(n: int) -> None:
+        nonlocal unplaced
+        job_id = f"{mode}-{n}"
+        started = time.perf_counter()
+        fleet.dispatched_at[job_id] = started
+        if mode == "atomic":
+            agent_id = await control.reserve(job_id)
+        else:
+            agent_id = await read_then_pick(control, job_id)
+        reserve_times.append(time.perf_counter() - started)
+        if agent_id is None:
+            unplaced += 1
+            return
+        if await redis.zscore(LOAD_KEY, agent_id) > fleet.capacities[agent_id]:
+            fleet.over_capacity += 1
+        await control.push(agent_id, {"type": "job", "job_id": job_id})
+
+    started = time.perf_counter()
+    dispatches = []
+    for n in range(args.jobs):
+        dispatches.append(asyncio.create_task(dispatch(n)))
+        # Pace in batches of 10: asyncio.sleep cannot wait much less than a millisecond
+        if n % 10 == 9:
+            await asyncio.sleep(max(started + (n + 1) / args.rate - time.perf_counter(), 0))
+    await asyncio.gather(*dispatches)
+    elapsed = time.perf_counter() - started
+
+    # Let agents pick up what is still in their inboxes
+    deadline = time.perf_counter() + 5
+    while len(fleet.latencies) < args.jobs - unplaced and time.perf_counter() < deadline:
+        await asyncio.sleep(0.05)
+    fleet.stop()
+    await asyncio.gather(*agents, *fleet.working)
+    await reset(redis)
+    await redis.aclose()
+
+    latencies = sorted(seconds * 1000 for seconds in fleet.latencies) or [0.0]
+    reserves = sorted(seconds * 1000 for seconds in reserve_times)
+    return {
+        "rate": args.jobs / elapsed,
+        "reserve_p50": reserves[len(reserves) // 2],
+        "reserve_p95": reserves[int(len(reserves) * 0.95)],
+        "p50": latencies[len(latencies) // 2],
+        "p95": latencies[int(len(latencies) * 0.95)],
+        "p99": latencies[int(len(latencies) * 0.99)],
+        "mean": statistics.fmean(latencies),
+        "unplaced": unplaced,
+        "over": fleet.over_capacity,
+    }
+
+
+async def main_async(args) -> None:
+    results = {mode: await run_mode(mode, args) for mode in ("atomic", "read-then-pick")}
+
+    print(f"{args.jobs} jobs to {args.agents} agents at {args.rate:.0f}/s, ~{args.work_ms:.0f} ms of work each")
+    print(
+        f"  {'':16}{'jobs/s':>8}{'reserve p50':>13}{'reserve p95':>13}"
+        f"{'push p50':>10}{'push p95':>10}{'push p99':>10}{'unplaced':>10}{'over cap':>10}"
+    )
+    for mode, r in results.items():
+        print(
+            f"  {mode:16}{r['rate']:8.0f}{r['reserve_p50']:13.2f}{r['reserve_p95']:13.2f}"
+            f"{r['p50']:10.2f}{r['p95']:10.2f}{r['p99']:10.2f}{r['unplaced']:10d}{r['over']:10d}"
+        )
+    print("  (milliseconds; push latency is from dispatch until the agent has the job)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--agents", type=int, default=500, help="Simulated agents")
+    parser.add_argument("--jobs", type=int, default=5000, help="Jobs dispatched per mode")
+    parser.add_argument("--rate", type=float, default=1000.0, help="Dispatches per second")
+    parser.add_argument("--work-ms", type=float, default=200.0, help="Mean time an agent works on a job")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for capacities and work times")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Benchmark Celery task overhead: asyncio.run() per task vs the task loop.
+
+Runs the same minimal task (one session, ``SELECT pg_backend_pid()``) in a
+pool of forked processes, like a prefork worker, two ways:
+
+- fresh: every task runs with ``asyncio.run()`` and ``celery_session_maker``
+  creates and disposes a NullPool engine (the old behaviour)
+- persistent: each process starts its task loop on init, as
+  ``worker_process_init`` does, and tasks reuse its pooled engine
+
+Reports per-task latency, the Postgres backends the tasks used, and the
+peak number of connections to the database while the run lasted.
+
+Needs a reachable DATABASE_URL. Run with:
+    python -m scripts.benchmark_celery_task_overhead --tasks 2000 --processes 4
+"""
+
+import argparse
+import multiprocessing
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+
+from app.core.database import celery_session_maker, sync_engine
+from app.core.task_loop import TaskLoop, run_async
+import app.core.task_loop as task_loop_module
+
+COUNT_CONNECTIONS = text("SELECT count(*) FROM pg_stat_activity WHERE datname = current_database()")
+
+
+async def probe() -> int:
+    async with celery_session_maker() as session:
+        return (await session.execute(text("SELECT pg_backend_pid()"))).scalar()
+
+
+def task(_) -> tuple[float, int]:
+    """One task as Celery runs it: (seconds, Postgres backend pid)."""
+    started = time.perf_counter()
+    backend_pid = run_async(probe())
+    return time.perf_counter() - started, backend_pid
+
+
+def init_persistent() -> None:
+    task_loop_module._task_loop = TaskLoop()
+    task_loop_module._task_loop.start()
+
+
+def stop_persistent(_) -> None:
+    task_loop_module._task_loop.stop()
+
+
+class ConnectionSampler(threading.Thread):
+    """Peak connections to the database, sampled every few milliseconds."""
+
+    def __init__(self, interval: float = 0.02):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak = 0
+        self._done = threading.Event()
+
+    def run(self) -> None:
+        with sync_engine.connect() as connection:
+            while not self._done.is_set():
+                # Leave out the sampler's own connection
+                self.peak = max(self.peak, connection.execute(COUNT_CONNECTIONS).scalar() - 1)
+                time.sleep(self.interval)
+
+    def stop(self) -> int:
+        self._done.set()
+        self.join()
+        return self.peak
+
+
+def run_mode(mode: str, args) -> dict:
+    initializer = init_persistent if mode == "persistent" else None
+    sampler = ConnectionSampler()
+    with multiprocessing.get_context("fork").Pool(args.processes, initializer=initializer) as pool:
+        sampler.start()  # after forking, so workers don't inherit its thread
+        # Warm up: process start and first connection are not per-task costs
+        pool.map(task, range(args.processes * 2), chunksize=1)
+        started = time.perf_counter()
+        results = pool.map(task, range(args.tasks), chunksize=1)
+        elapsed = time.perf_counter() - started
+        if mode == "persistent":
+            pool.map(stop_persistent, range(args.processes), chunksize=1)
+    peak = sampler.stop()
+
+    latencies = sorted(seconds * 1000 for seconds, _ in results)
+    return {
+        "throughput": args.tasks / elapsed,
+        "mean": statistics.fmean(latencies),
+        "p50": latencies[len(latencies) // 2],
+        "p95": latencies[int(len(latencies) * 0.95)],
+        "backends": len({backend_pid for _, backend_pid in results}),
+        "peak": peak,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=2000, help="Tasks per run")
+    parser.add_argument("--processes", type=int, default=4, help="Worker processes (prefork concurrency)")
+    args = parser.parse_args()
+
+    results = {mode: run_mode(mode, args) for mode in ("fresh", "persistent")}
+
+    print(f"{args.tasks} tasks on {args.processes} processes")
+    print(f"  {'':12}{'tasks/s':>10}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'backends':>10}{'peak conns':>12}")
+    for mode, r in results.items():
+        print(
+            f"  {mode:12}{r['throughput']:10.0f}{r['mean']:10.2f}{r['p50']:10.2f}"
+            f"{r['p95']:10.2f}{r['backends']:10d}{r['peak']:12d}"
+        )
+    if results["persistent"]["mean"] > 0:
+        print(f"  per-task overhead reduction {results['fresh']['mean'] / results['persistent']['mean']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
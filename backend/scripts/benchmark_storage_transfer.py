@@ -0,0 +1,105 @@
+"""Benchmark S3/MinIO transfer throughput.
+
+Compares single-request transfers (one put_object / one GET) with parallel
+multipart uploads and ranged downloads for 1-10 GB files.
+
+Start a local MinIO first:
+    docker run -d -p 9000:9000 -e MINIO_ROOT_USER=minioadmin \
+        -e MINIO_ROOT_PASSWORD=minioadmin minio/minio server /data
+
+Run with: python -m scripts.benchmark_storage_transfer --sizes 1 5 10
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.storage import S3Storage, StorageConfig
+
+GB = 1024 * 1024 * 1024
+MB = 1024 * 1024
+
+
+def make_storage(args, parallel: bool) -> S3Storage:
+    return S3Storage(StorageConfig(
+        backend="minio",
+        bucket=args.bucket,
+        access_key=args.access_key,
+        secret_key=args.secret_key,
+        endpoint_url=args.endpoint,
+        use_ssl=args.endpoint.startswith("https"),
+        # Single-request mode never crosses the multipart threshold
+        multipart_threshold=args.part_size_mb * MB if parallel else sys.maxsize,
+        part_size=args.part_size_mb * MB,
+        max_concurrency=args.concurrency if parallel else 1,
+    ))
+
+
+def write_test_file(path: str, size: int) -> None:
+    """Write size bytes of incompressible data."""
+    block = os.urandom(64 * MB)
+    with open(path, "wb") as f:
+        remaining = size
+        while remaining > 0:
+            f.write(block[:min(len(block), remaining)])
+            remaining -= len(block)
+
+
+def timed(label: str, size: int, fn) -> float:
+    started = time.monotonic()
+    ok = fn()
+    elapsed = time.monotonic() - started
+    if not ok:
+        raise RuntimeError(f"{label} failed")
+    throughput = size / elapsed / MB
+    print(f"  {label:<24} {elapsed:8.1f}s {throughput:8.1f} MB/s")
+    return throughput
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoint", default="http://localhost:9000")
+    parser.add_argument("--bucket", default="benchmark")
+    parser.add_argument("--access-key", default="minioadmin")
+    parser.add_argument("--secret-key", default="minioadmin")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 5, 10], help="File sizes in GB")
+    parser.add_argument("--part-size-mb", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    single = make_storage(args, parallel=False)
+    parallel = make_storage(args, parallel=True)
+    client = single._get_client()
+    try:
+        client.head_bucket(Bucket=args.bucket)
+    except Exception:
+        client.create_bucket(Bucket=args.bucket)
+
+    with tempfile.TemporaryDirectory() as directory:
+        for size_gb in args.sizes:
+            size = size_gb * GB
+            source = os.path.join(directory, "source.bin")
+            target = os.path.join(directory, "target.bin")
+            write_test_file(source, size)
+            key = f"benchmark/{size_gb}gb.bin"
+
+            print(f"{size_gb} GB ({args.concurrency} x {args.part_size_mb} MB parts)")
+            up_single = timed("upload, single request", size, lambda: single.upload(source, key).success)
+            up_parallel = timed("upload, multipart", size, lambda: parallel.upload(source, key).success)
+            down_single = timed("download, single GET", size, lambda: single.download(key, target))
+            down_parallel = timed("download, ranged GETs", size, lambda: parallel.download(key, target))
+            print(f"  speedup: upload {up_parallel / up_single:.1f}x, download {down_parallel / down_single:.1f}x")
+
+            single.delete(key)
+            os.remove(source)
+            os.remove(target)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Benchmark CPU per stream: live re-encode vs stream-ready renditions.
+
+Generates a testsrc clip, encodes it once into a stream-ready rendition,
+then runs the same number of looping streams both ways with the commands
+FFmpegCommandBuilder produces: a live libx264 encode of the source, and
+stream copy of the rendition. Streams write FLV files instead of RTMP.
+
+Needs FFmpeg with libx264. Run with:
+    python -m scripts.benchmark_stream_renditions --streams 4 --seconds 60
+"""
+
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+import psutil
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.modules.stream.ffmpeg_builder import FFmpegCommandBuilder, HardwareEncoder
+from app.modules.stream.renditions import RenditionSpec, build_rendition_command
+from app.modules.stream.stream_job_models import EncodingMode, LoopMode, StreamJob
+
+
+def make_job(args, output_dir: str) -> StreamJob:
+    job = StreamJob(
+        id=uuid.uuid4(),
+        user_id=uuid.uuid4(),
+        account_id=uuid.uuid4(),
+        video_path="",
+        title="benchmark",
+        loop_mode=LoopMode.INFINITE.value,
+        resolution=args.resolution,
+        target_bitrate=args.bitrate,
+        target_fps=args.fps,
+        encoding_mode=EncodingMode.CBR.value,
+        rtmp_url=output_dir,
+    )
+    job.stream_key = "stream.flv"
+    return job
+
+
+def make_source(path: str, args) -> None:
+    """A testsrc2 clip with a tone, encoded like a typical upload."""
+    subprocess.run(
+        [
+            "ffmpeg", "-hide_banner", "-y",
+            "-f", "lavfi", "-i", f"testsrc2=size={args.source_size}:rate={args.fps}:duration={args.clip_seconds}",
+            "-f", "lavfi", "-i", f"sine=frequency=440:duration={args.clip_seconds}",
+            "-c:v", "libx264", "-preset", "fast", "-crf", "20",
+            "-c:a", "aac", "-shortest",
+            path,
+        ],
+        check=True,
+        capture_output=True,
+    )
+
+
+def run_streams(commands: list[list[str]], seconds: float) -> float:
+    """Run commands together for a while; CPU percent (of one core) per stream."""
+    processes = [
+        subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, stdin=subprocess.DEVNULL)
+        for cmd in commands
+    ]
+    handles = [psutil.Process(p.pid) for p in processes]
+    started = time.monotonic()
+    time.sleep(seconds)
+    elapsed = time.monotonic() - started
+
+    cpu_seconds = 0.0
+    for handle, process in zip(handles, processes):
+        if process.poll() is not None:
+            raise RuntimeError(f"Stream exited early with code {process.returncode}: {' '.join(process.args)}")
+        times = handle.cpu_times()
+        cpu_seconds += times.user + times.system
+        process.terminate()
+    for process in processes:
+        process.wait(timeout=10)
+
+    return cpu_seconds / elapsed / len(commands) * 100
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--streams", type=int, default=4, help="Concurrent streams per run")
+    parser.add_argument("--seconds", type=float, default=60, help="How long each run lasts")
+    parser.add_argument("--resolution", default="1080p")
+    parser.add_argument("--bitrate", type=int, default=6000, help="Target bitrate in kbps")
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--source-size", default="1920x1080", help="testsrc2 frame size")
+    parser.add_argument("--clip-seconds", type=int, default=30, help="Length of the looped clip")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="rendition_benchmark_") as work_dir:
+        source = str(Path(work_dir) / "source.mp4")
+        rendition = str(Path(work_dir) / "rendition.mp4")
+        make_source(source, args)
+
+        job = make_job(args, work_dir)
+        spec = RenditionSpec.for_job(job)
+        started = time.monotonic()
+        subprocess.run(build_rendition_command(source, rendition, spec), check=True, capture_output=True)
+        encode_seconds = time.monotonic() - started
+
+        builder = FFmpegCommandBuilder(force_encoder=HardwareEncoder.SOFTWARE)
+        results = {}
+        for mode, input_path, stream_copy in (("encode", source, False), ("copy", rendition, True)):
+            commands = []
+            for i in range(args.streams):
+                job.stream_key = f"{mode}_{i}.flv"
+                commands.append(builder.build_streaming_command(job, input_path=input_path, stream_copy=stream_copy))
+            results[mode] = run_streams(commands, args.seconds)
+
+    print(f"{args.streams} streams, {args.resolution} @ {args.fps} fps, {args.bitrate} kbps, {args.seconds:.0f}s each run")
+    print(f"  rendition encode (one-off) {encode_seconds:8.1f}s for a {args.clip_seconds}s clip")
+    print(f"  live encode (libx264)      {results['encode']:8.1f}% CPU per stream")
+    print(f"  stream copy (rendition)    {results['copy']:8.1f}% CPU per stream")
+    if results["copy"] > 0:
+        print(f"  reduction                  {results['encode'] / results['copy']:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
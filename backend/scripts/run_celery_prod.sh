@@ -10,6 +10,10 @@ VENV_DIR="${VENV_DIR:-$APP_DIR/venv}"
 LOG_LEVEL="${LOG_LEVEL:-info}"
 CONCURRENCY="${CONCURRENCY:-4}"
 POOL="${POOL:-prefork}"
+# Queues to consume: realtime, io, media, bulk (and celery, the old default).
+# Run one worker per queue in production, e.g. QUEUES=io POOL=threads CONCURRENCY=16
+QUEUES="${QUEUES:-realtime,io,media,bulk,celery}"
+WORKER_NAME="${WORKER_NAME:-worker}"
 
 # Activate virtual environment if exists
 if [ -d "$VENV_DIR" ]; then
@@ -25,10 +29,12 @@ echo "App Dir: $APP_DIR"
 echo "Log Level: $LOG_LEVEL"
 echo "Concurrency: $CONCURRENCY"
 echo "Pool: $POOL"
+echo "Queues: $QUEUES"
 echo "=========================================="
 
 exec celery -A app.core.celery_app worker \
     --loglevel=$LOG_LEVEL \
     --pool=$POOL \
     --concurrency=$CONCURRENCY \
-    --hostname=worker@%h
+    --queues=$QUEUES \
+    --hostname=$WORKER_NAME@%h
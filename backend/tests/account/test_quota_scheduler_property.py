@@ -0,0 +1,209 @@
+"""Property-based tests for the quota-aware YouTube API scheduler.
+
+**Feature: youtube-quota-scheduler**
+
+Properties:
+- Higher priority classes always keep headroom that lower classes cannot spend
+- Reservations never push usage past the ceiling of their priority class
+- Predicted exhaustion is only reported when it happens before the reset
+"""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+import pytest
+from hypothesis import given, settings, strategies as st
+
+from app.modules.account.quota_scheduler import (
+    DEFAULT_DAILY_QUOTA_LIMIT,
+    QuotaDeferredError,
+    QuotaPriority,
+    YouTubeQuotaScheduler,
+    can_spend,
+    estimate_cost,
+    get_endpoint_cost,
+    get_quota_window,
+    predict_exhaustion,
+    priority_ceiling,
+)
+
+
+class FakeQuotaRedis:
+    """In-memory stand-in for the Redis calls the scheduler makes.
+
+    Mirrors the reserve Lua script: check the ceiling, then increment.
+    """
+
+    def __init__(self):
+        self.hashes: dict[str, dict[str, str]] = {}
+
+    async def eval(self, script, numkeys, key, cost, ceiling, field, now_ts, expire_at, force):
+        data = self.hashes.setdefault(key, {})
+        used = int(data.get("used", 0))
+        if force != "1" and used + int(cost) > int(ceiling):
+            return [0, used]
+        used += int(cost)
+        data["used"] = str(used)
+        data[field] = str(int(data.get(field, 0)) + int(cost))
+        data.setdefault("first_at", str(now_ts))
+        return [1, used]
+
+    async def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+
+class BrokenRedis:
+    """Redis stand-in that is always unavailable."""
+
+    async def eval(self, *args):
+        raise ConnectionError("redis down")
+
+
+class TestPriorityCeilings:
+    """Tests for priority class ceilings."""
+
+    @given(
+        used=st.integers(min_value=0, max_value=DEFAULT_DAILY_QUOTA_LIMIT),
+        cost=st.integers(min_value=0, max_value=2000),
+    )
+    @settings(max_examples=200)
+    def test_higher_priority_allowed_whenever_lower_is(self, used: int, cost: int):
+        """If a lower class may spend, every higher class may too."""
+        limit = DEFAULT_DAILY_QUOTA_LIMIT
+        if can_spend(used, cost, limit, QuotaPriority.BACKGROUND):
+            assert can_spend(used, cost, limit, QuotaPriority.STANDARD)
+        if can_spend(used, cost, limit, QuotaPriority.STANDARD):
+            assert can_spend(used, cost, limit, QuotaPriority.REALTIME)
+
+    def test_bulk_upload_cannot_drain_live_chat_headroom(self):
+        """Uploads stop while live chat polling still has budget."""
+        limit = DEFAULT_DAILY_QUOTA_LIMIT
+        used = 0
+        upload_cost = get_endpoint_cost("videos.insert")
+        while can_spend(used, upload_cost, limit, QuotaPriority.STANDARD):
+            used += upload_cost
+
+        assert used <= priority_ceiling(limit, QuotaPriority.STANDARD)
+        assert can_spend(used, get_endpoint_cost("liveChatMessages.list"), limit, QuotaPriority.REALTIME)
+
+    def test_unknown_endpoint_charged_as_list_call(self):
+        """Unknown endpoints are charged one unit."""
+        assert get_endpoint_cost("unknown.endpoint") == 1
+
+    def test_estimate_cost_sums_endpoints(self):
+        """Combined calls are charged the sum of their costs."""
+        assert estimate_cost("liveBroadcasts.insert", "liveStreams.insert") == 100
+
+
+class TestQuotaWindow:
+    """Tests for the Pacific-midnight quota window."""
+
+    @given(st.datetimes(
+        min_value=datetime(2024, 1, 1),
+        max_value=datetime(2030, 12, 31),
+        timezones=st.just(timezone.utc),
+    ))
+    @settings(max_examples=200)
+    def test_window_contains_reference_time(self, now: datetime):
+        """The window returned always contains the reference time."""
+        _, start, reset_at = get_quota_window(now)
+        assert start <= now < reset_at
+        # 23, 24 or 25 hours depending on DST transitions
+        assert timedelta(hours=23) <= reset_at - start <= timedelta(hours=25)
+
+
+class TestExhaustionPrediction:
+    """Tests for predicted exhaustion time."""
+
+    def test_no_prediction_without_usage(self):
+        now = datetime(2025, 1, 1, 12, tzinfo=timezone.utc)
+        assert predict_exhaustion(0, 10000, now - timedelta(hours=1), now + timedelta(hours=6), now) is None
+
+    def test_fast_burn_predicts_exhaustion_before_reset(self):
+        """5000 units in one hour exhausts 10000 in another hour."""
+        now = datetime(2025, 1, 1, 12, tzinfo=timezone.utc)
+        predicted = predict_exhaustion(
+            5000, 10000, now - timedelta(hours=1), now + timedelta(hours=6), now
+        )
+        assert predicted == now + timedelta(hours=1)
+
+    def test_slow_burn_lasts_until_reset(self):
+        now = datetime(2025, 1, 1, 12, tzinfo=timezone.utc)
+        predicted = predict_exhaustion(
+            100, 10000, now - timedelta(hours=10), now + timedelta(hours=6), now
+        )
+        assert predicted is None
+
+    @given(
+        used=st.integers(min_value=1, max_value=20000),
+        elapsed_minutes=st.integers(min_value=1, max_value=1440),
+        remaining_minutes=st.integers(min_value=1, max_value=1440),
+    )
+    @settings(max_examples=200)
+    def test_prediction_is_between_now_and_reset(
+        self, used: int, elapsed_minutes: int, remaining_minutes: int
+    ):
+        now = datetime(2025, 1, 1, 12, tzinfo=timezone.utc)
+        reset_at = now + timedelta(minutes=remaining_minutes)
+        predicted: Optional[datetime] = predict_exhaustion(
+            used, 10000, now - timedelta(minutes=elapsed_minutes), reset_at, now
+        )
+        if predicted is not None:
+            assert now <= predicted < reset_at
+
+
+@pytest.mark.asyncio
+class TestYouTubeQuotaScheduler:
+    """Tests for the Redis-backed scheduler."""
+
+    async def test_low_priority_deferred_high_priority_allowed(self):
+        scheduler = YouTubeQuotaScheduler(redis=FakeQuotaRedis())
+        account_id = uuid.uuid4()
+
+        await scheduler.acquire(account_id, "manual", QuotaPriority.REALTIME, units=6000)
+
+        background = await scheduler.acquire(account_id, "videos.list", QuotaPriority.BACKGROUND)
+        standard = await scheduler.acquire(account_id, "videos.list", QuotaPriority.STANDARD)
+
+        assert not background.allowed
+        assert background.retry_after_seconds and background.retry_after_seconds > 0
+        assert standard.allowed
+
+    async def test_usage_never_exceeds_priority_ceiling(self):
+        scheduler = YouTubeQuotaScheduler(redis=FakeQuotaRedis())
+        account_id = uuid.uuid4()
+
+        for _ in range(20):
+            await scheduler.acquire(account_id, "videos.insert", QuotaPriority.STANDARD)
+
+        status = await scheduler.get_status(account_id)
+        assert status.used <= priority_ceiling(DEFAULT_DAILY_QUOTA_LIMIT, QuotaPriority.STANDARD)
+        assert status.used_by_priority == {"standard": status.used}
+        assert status.remaining_for(QuotaPriority.REALTIME) > 0
+
+    async def test_reserve_raises_when_deferred(self):
+        scheduler = YouTubeQuotaScheduler(redis=FakeQuotaRedis(), daily_limit=100)
+        account_id = uuid.uuid4()
+
+        with pytest.raises(QuotaDeferredError) as exc_info:
+            async with scheduler.reserve(account_id, "search.list", QuotaPriority.BACKGROUND):
+                pass
+
+        assert exc_info.value.decision.cost == 100
+
+    async def test_record_bypasses_ceiling(self):
+        scheduler = YouTubeQuotaScheduler(redis=FakeQuotaRedis(), daily_limit=100)
+        account_id = uuid.uuid4()
+
+        used = await scheduler.record(account_id, 150)
+
+        assert used == 150
+        assert (await scheduler.get_status(account_id)).remaining == 0
+
+    async def test_fails_open_when_redis_unavailable(self):
+        scheduler = YouTubeQuotaScheduler(redis=BrokenRedis())
+
+        decision = await scheduler.acquire(uuid.uuid4(), "liveChatMessages.list", QuotaPriority.REALTIME)
+
+        assert decision.allowed
@@ -0,0 +1,149 @@
+"""Property-based tests for daily platform metrics rollups.
+
+**Feature: admin-panel, Platform Metrics Rollups**
+**Validates: Requirements 2.1, 2.2**
+
+Properties:
+- The subscription sweep matches a brute-force per-day scan
+- Only ACTIVE subscriptions count toward MRR, as in the live calculation
+- Rollup computation issues a fixed number of queries for any range length
+"""
+
+from datetime import date, datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from hypothesis import given, settings, strategies as st
+from sqlalchemy.dialects import postgresql
+
+from app.modules.admin.analytics_rollup import (
+    PlatformMetricsRollupService,
+    SubscriptionSpan,
+    cumulative_series,
+    date_range,
+    day_start,
+    subscription_end,
+    subscription_monthly_value,
+    sweep_subscriptions,
+)
+
+
+RANGE_START = date(2025, 1, 1)
+
+
+@st.composite
+def subscription_spans(draw):
+    """Subscriptions created up to 60 days before the range, possibly canceled."""
+    created = datetime(2025, 1, 1) + timedelta(hours=draw(st.integers(-60 * 24, 60 * 24)))
+    canceled = None
+    if draw(st.booleans()):
+        canceled = created + timedelta(hours=draw(st.integers(0, 90 * 24)))
+    return SubscriptionSpan(
+        plan_tier=draw(st.sampled_from(["basic", "pro", "enterprise"])),
+        monthly_value=float(draw(st.sampled_from([9, 29, 99]))),
+        created_at=created,
+        canceled_at=canceled,
+    )
+
+
+def brute_force_day(spans: list[SubscriptionSpan], day: date) -> tuple[int, float, int]:
+    """Active count, MRR and churn at the end of one day by scanning all spans."""
+    day_end = day_start(day + timedelta(days=1))
+    active = [
+        s for s in spans
+        if s.created_at < day_end and (s.canceled_at is None or s.canceled_at >= day_end)
+    ]
+    churned = sum(
+        1 for s in spans
+        if s.canceled_at is not None and day_start(day) <= s.canceled_at < day_end
+    )
+    return len(active), round(sum(s.monthly_value for s in active), 2), churned
+
+
+class TestSubscriptionSweep:
+    """Tests for the end-of-day subscription sweep."""
+
+    @given(st.lists(subscription_spans(), max_size=40), st.integers(1, 45))
+    @settings(max_examples=100)
+    def test_sweep_matches_brute_force(self, spans: list[SubscriptionSpan], num_days: int):
+        days = date_range(RANGE_START, RANGE_START + timedelta(days=num_days - 1))
+
+        swept = sweep_subscriptions(spans, days)
+
+        for day in days:
+            active, mrr, _, churned = swept[day]
+            expected_active, expected_mrr, expected_churned = brute_force_day(spans, day)
+            assert active == expected_active
+            assert round(mrr, 2) == expected_mrr
+            assert churned == expected_churned
+
+    def test_yearly_plan_contributes_a_twelfth(self):
+        assert subscription_monthly_value("yearly", 1000, 12000) == 10.0
+        assert subscription_monthly_value("monthly", 1000, 12000) == 10.0
+        assert subscription_monthly_value("monthly", None, None) == 0.0
+
+    def test_only_active_subscriptions_count_until_now(self):
+        canceled_at = datetime(2025, 1, 10)
+
+        assert subscription_end("active", canceled_at) is None
+        assert subscription_end("canceled", canceled_at) == canceled_at
+
+    def test_cumulative_series(self):
+        days = date_range(RANGE_START, RANGE_START + timedelta(days=2))
+        totals = cumulative_series(10, {RANGE_START: 2, days[2]: 3}, days)
+        assert [totals[d] for d in days] == [12, 12, 15]
+
+
+def _mock_session():
+    """Session whose queries all return empty results."""
+    session = MagicMock()
+    result = MagicMock()
+    result.all.return_value = []
+    result.scalar.return_value = 0
+    session.execute = AsyncMock(return_value=result)
+    return session
+
+
+@pytest.mark.asyncio
+class TestRollupQueryCount:
+    """Rollups must not issue per-day queries."""
+
+    @pytest.mark.parametrize("num_days", [1, 30, 365])
+    async def test_compute_range_query_count_is_constant(self, num_days: int):
+        session = _mock_session()
+        service = PlatformMetricsRollupService(session)
+
+        metrics = await service.compute_range(
+            RANGE_START, RANGE_START + timedelta(days=num_days - 1)
+        )
+
+        assert len(metrics) == num_days
+        # 4 grouped counts, 3 "before range" counts, 1 subscription join
+        assert session.execute.await_count == 8
+
+    async def test_subscription_query_filters_by_status(self):
+        session = _mock_session()
+        service = PlatformMetricsRollupService(session)
+
+        await service.compute_range(RANGE_START, RANGE_START)
+
+        sql = next(
+            str(call.args[0].compile(dialect=postgresql.dialect()))
+            for call in session.execute.await_args_list
+            if "FROM subscriptions" in str(call.args[0])
+        )
+        where = sql.split("WHERE", 1)[1]
+        assert "subscriptions.status =" in where
+        assert "subscriptions.canceled_at IS NULL" not in where
+
+    async def test_refresh_compiles_to_single_upsert(self):
+        session = _mock_session()
+        session.commit = AsyncMock()
+        service = PlatformMetricsRollupService(session)
+
+        written = await service.refresh(RANGE_START, RANGE_START + timedelta(days=6))
+
+        assert written == 7
+        upsert = session.execute.await_args_list[-1].args[0]
+        sql = str(upsert.compile(dialect=postgresql.dialect()))
+        assert "ON CONFLICT (metric_date) DO UPDATE" in sql
@@ -0,0 +1,371 @@
+"""Property-based tests for the agent control channel.
+
+**Feature: agent-service, Push-based Dispatch**
+**Validates: Requirements 21.1, 21.2, 21.3, 21.5**
+
+Properties:
+- Concurrent dispatches never reserve more than an agent's capacity, and
+  always go to a live agent with the lowest load
+- Agents whose heartbeat expired get no jobs; a heartbeat brings them back
+- A pushed job that is not acknowledged in time is released exactly once;
+  a late ack is refused
+- Every expiry is claimed by exactly one watcher
+- Messages reach the agent in the order they were pushed
+"""
+
+import asyncio
+from collections import defaultdict
+
+import pytest
+from hypothesis import given, settings, strategies as st
+
+from app.modules.agent.control import (
+    CAPACITY_KEY,
+    EXPIRY_KEY,
+    LEASES_KEY,
+    LOAD_KEY,
+    UNACKED_KEY,
+    AgentControl,
+    AgentExpiryWatcher,
+    _ACK_SCRIPT,
+    _CLAIM_EXPIRED_SCRIPT,
+    _HEARTBEAT_SCRIPT,
+    _REGISTER_SCRIPT,
+    _RELEASE_SCRIPT,
+    _RESERVE_SCRIPT,
+    inbox_key,
+)
+
+TTL = 60.0
+ACK_TIMEOUT = 15.0
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeRedis:
+    """Hashes, sorted sets and lists; the scripts are emulated by identity.
+
+    Each script runs without yielding, so it is atomic as in Redis. Other
+    calls yield once, so concurrent callers interleave between them.
+    """
+
+    def __init__(self):
+        self.hashes: dict[str, dict[str, str]] = defaultdict(dict)
+        self.zsets: dict[str, dict[str, float]] = defaultdict(dict)
+        self.lists: dict[str, list[str]] = defaultdict(list)
+
+    def _sorted(self, key):
+        return sorted(self.zsets[key].items(), key=lambda item: (item[1], item[0]))
+
+    async def eval(self, script, numkeys, *args):
+        await asyncio.sleep(0)
+        keys, argv = args[:numkeys], [str(a) for a in args[numkeys:]]
+        if script == _REGISTER_SCRIPT:
+            capacity, load, expiry = keys
+            self.hashes[capacity][argv[0]] = argv[1]
+            self.zsets[load].setdefault(argv[0], 0.0)
+            added = argv[0] not in self.zsets[expiry]
+            self.zsets[expiry][argv[0]] = float(argv[2])
+            return int(added)
+        if script == _HEARTBEAT_SCRIPT:
+            capacity, expiry = keys
+            if argv[0] not in self.hashes[capacity]:
+                return -1
+            added = argv[0] not in self.zsets[expiry]
+            self.zsets[expiry][argv[0]] = float(argv[1])
+            return int(added)
+        if script == _RESERVE_SCRIPT:
+            load, capacity, expiry, leases, unacked = keys
+            now, job_id, deadline = float(argv[0]), argv[1], float(argv[2])
+            if job_id in self.hashes[leases]:
+                return self.hashes[leases][job_id]
+            best = None
+            for agent, used in self._sorted(load):
+                if best and used > best[1]:
+                    break
+                free = float(self.hashes[capacity].get(agent, 0)) - used
+                if self.zsets[expiry].get(agent, 0) > now and free > 0 and (not best or free > best[2]):
+                    best = (agent, used, free)
+            if not best:
+                return None
+            self.zsets[load][best[0]] += 1
+            self.hashes[leases][job_id] = best[0]
+            self.zsets[unacked][job_id] = deadline
+            return best[0]
+        if script == _ACK_SCRIPT:
+            leases, unacked = keys
+            if self.hashes[leases].get(argv[0]) != argv[1]:
+                return 0
+            self.zsets[unacked].pop(argv[0], None)
+            return 1
+        if script == _RELEASE_SCRIPT:
+            leases, unacked, load = keys
+            holder = self.hashes[leases].get(argv[0])
+            if holder is None or (argv[1] and holder != argv[1]):
+                return None
+            del self.hashes[leases][argv[0]]
+            self.zsets[unacked].pop(argv[0], None)
+            if self.zsets[load].get(holder, 0) > 0:
+                self.zsets[load][holder] -= 1
+            return holder
+        if script == _CLAIM_EXPIRED_SCRIPT:
+            (key,) = keys
+            due = [(m, s) for m, s in self._sorted(key) if s <= float(argv[0])][: int(argv[1])]
+            for member, _ in due:
+                del self.zsets[key][member]
+            return [x for member, score in due for x in (member, str(score))]
+        raise AssertionError("unexpected script")
+
+    async def zrange(self, key, start, end, withscores=False):
+        await asyncio.sleep(0)
+        items = self._sorted(key)
+        items = items[start:] if end == -1 else items[start:end + 1]
+        return items if withscores else [m for m, _ in items]
+
+    async def zadd(self, key, mapping):
+        self.zsets[key].update({m: float(s) for m, s in mapping.items()})
+
+    async def hgetall(self, key):
+        return dict(self.hashes[key])
+
+    async def delete(self, key):
+        self.lists.pop(key, None)
+
+    async def rpush(self, key, value):
+        self.lists[key].append(value)
+
+    async def lpop(self, key, count=None):
+        items = self.lists[key][:count]
+        del self.lists[key][:count]
+        return items or None
+
+    async def blpop(self, keys, timeout=0):
+        for _ in range(3):
+            if self.lists[keys[0]]:
+                return keys[0], self.lists[keys[0]].pop(0)
+            await asyncio.sleep(0)
+        return None
+
+
+def make_control(redis=None, clock=None) -> AgentControl:
+    return AgentControl(redis or FakeRedis(), clock=clock or FakeClock(), heartbeat_ttl=TTL, ack_timeout=ACK_TIMEOUT)
+
+
+@pytest.mark.asyncio
+class TestReservation:
+    """Dispatch reserves a slot atomically on the least-loaded live agent."""
+
+    @given(
+        capacities=st.lists(st.integers(min_value=1, max_value=8), min_size=1, max_size=12),
+        jobs=st.integers(min_value=0, max_value=80),
+    )
+    @settings(max_examples=60)
+    async def test_concurrent_dispatch_respects_capacity(self, capacities, jobs):
+        control = make_control()
+        for i, capacity in enumerate(capacities):
+            await control.register(f"a{i}", capacity)
+
+        placed = await asyncio.gather(*(control.reserve(f"j{n}") for n in range(jobs)))
+
+        loads = {agent: state.load for agent, state in (await control.agent_states()).items()}
+        assert sum(1 for agent in placed if agent) == min(jobs, sum(capacities))
+        for i, capacity in enumerate(capacities):
+            assert loads[f"a{i}"] <= capacity
+        # Nobody with room sits more than one job below a busier agent
+        with_room = [loads[f"a{i}"] for i, c in enumerate(capacities) if loads[f"a{i}"] < c]
+        if with_room:
+            assert max(loads.values()) - min(with_room) <= 1
+
+    async def test_lowest_load_then_most_free_capacity(self):
+        control = make_control()
+        await control.register("small", 2)
+        await control.register("large", 10)
+
+        assert await control.reserve("j1") == "large"
+        assert await control.reserve("j2") == "small"
+        assert await control.reserve("j3") == "large"
+
+    async def test_reserving_a_leased_job_keeps_its_agent(self):
+        control = make_control()
+        await control.register("a", 1)
+        await control.register("b", 1)
+
+        first = await control.reserve("j")
+        assert await control.reserve("j") == first
+        assert (await control.agent_states())[first].load == 1
+
+    async def test_release_frees_the_slot(self):
+        control = make_control()
+        await control.register("a", 1)
+
+        assert await control.reserve("j1") == "a"
+        assert await control.reserve("j2") is None
+        assert await control.release("j1", "other") is None
+        assert await control.release("j1") == "a"
+        assert await control.reserve("j2") == "a"
+
+
+@pytest.mark.asyncio
+class TestLiveness:
+    """Heartbeats keep an agent live; expired agents get no work."""
+
+    @given(silent=st.integers(min_value=0, max_value=120))
+    async def test_expired_agents_get_no_jobs(self, silent):
+        clock = FakeClock()
+        control = make_control(clock=clock)
+        await control.register("a", 5)
+
+        clock.now += silent
+        agent = await control.reserve("j")
+
+        assert (agent == "a") == (silent < TTL)
+
+    async def test_heartbeat_reports_coming_back(self):
+        clock = FakeClock()
+        control = make_control(clock=clock)
+
+        assert await control.heartbeat("a") is None
+        assert await control.register("a", 2) is True
+        assert await control.heartbeat("a") is False
+
+        clock.now += TTL
+        assert await control.claim_expired_agents() == {"a": clock.now}
+        assert await control.heartbeat("a") is True
+        assert await control.reserve("j") == "a"
+
+
+@pytest.mark.asyncio
+class TestLeases:
+    """Pushed jobs must be acknowledged in time."""
+
+    @given(ack_after=st.one_of(st.none(), st.integers(min_value=0, max_value=30)))
+    async def test_unacked_jobs_are_released(self, ack_after):
+        clock = FakeClock()
+        control = make_control(clock=clock)
+        await control.register("a", 1)
+        await control.reserve("j")
+        acked = False
+        if ack_after is not None and ack_after < ACK_TIMEOUT:
+            clock.now += ack_after
+            acked = await control.ack("j", "a")
+            assert acked
+
+        clock.now = 1_000_000.0 + ACK_TIMEOUT
+        claimed = await control.claim_unacked()
+
+        assert ("j" in claimed) == (not acked)
+        assert await control.claim_unacked() == {}
+
+    async def test_late_ack_is_refused(self):
+        clock = FakeClock()
+        redis = FakeRedis()
+        control = make_control(redis, clock)
+        await control.register("a", 1)
+        await control.register("b", 1)
+        first = await control.reserve("j")
+
+        clock.now += ACK_TIMEOUT
+        for job_id in await control.claim_unacked():
+            await control.release(job_id)
+
+        assert await control.ack("j", first) is False
+        assert redis.hashes[LEASES_KEY] == {}
+        assert redis.zsets[LOAD_KEY][first] == 0
+
+    async def test_orphaned_leases(self):
+        clock = FakeClock()
+        control = make_control(clock=clock)
+        await control.register("a", 2)
+        await control.reserve("j")
+        await control.ack("j", "a")
+
+        assert await control.orphaned_leases() == {}
+        clock.now += TTL + 1
+        assert await control.orphaned_leases() == {"j": "a"}
+
+
+@pytest.mark.asyncio
+class TestWatcher:
+    """Expiries are handled once, as they fall due."""
+
+    async def test_each_expiry_is_claimed_once(self):
+        clock = FakeClock()
+        redis = FakeRedis()
+        control = make_control(redis, clock)
+        for i in range(20):
+            await control.register(f"a{i}", 2)
+            await control.reserve(f"j{i}")
+        expired_agents, unacked = [], []
+
+        async def on_agents_expired(expired):
+            expired_agents.extend(expired)
+            return 0
+
+        async def on_unacked(job_ids):
+            unacked.extend(job_ids)
+            return len(job_ids)
+
+        watchers = [
+            AgentExpiryWatcher(control, on_agents_expired, on_unacked, max_idle=1.0, batch_size=3)
+            for _ in range(3)
+        ]
+        clock.now += TTL
+        while sum(await asyncio.gather(*(w.process_due() for w in watchers))):
+            pass
+
+        assert sorted(expired_agents) == sorted(f"a{i}" for i in range(20))
+        assert sorted(unacked) == sorted(f"j{i}" for i in range(20))
+        assert redis.zsets[EXPIRY_KEY] == {} and redis.zsets[UNACKED_KEY] == {}
+
+    async def test_sleeps_until_the_earliest_expiry(self):
+        clock = FakeClock()
+        control = make_control(clock=clock)
+        watcher = AgentExpiryWatcher(control, max_idle=30.0)
+
+        assert await watcher.seconds_until_next() == 30.0
+        await control.register("a", 1)
+        await control.reserve("j")
+
+        assert await watcher.seconds_until_next() == ACK_TIMEOUT
+        await control.ack("j", "a")
+        assert await watcher.seconds_until_next() == 30.0
+
+    async def test_forget_drops_undelivered_messages(self):
+        redis = FakeRedis()
+        control = make_control(redis)
+        await control.register("a", 1)
+        await control.push("a", {"type": "job", "job_id": "j"})
+
+        await control.forget("a")
+
+        assert redis.lists[inbox_key("a")] == []
+        assert redis.hashes[CAPACITY_KEY] == {"a": "1"}
+
+
+@pytest.mark.asyncio
+class TestInbox:
+    """Pushed messages are delivered in order."""
+
+    @given(job_ids=st.lists(st.uuids().map(str), max_size=30, unique=True))
+    async def test_messages_arrive_in_push_order(self, job_ids):
+        control = make_control()
+        for job_id in job_ids:
+            await control.push("a", {"type": "job", "job_id": job_id})
+
+        received = []
+        while messages := await control.next_messages("a", timeout=1.0, limit=7):
+            received.extend(m["job_id"] for m in messages)
+
+        assert received == job_ids
+
+    async def test_zero_timeout_does_not_block(self):
+        control = make_control()
+        assert await control.next_messages("a", timeout=0) == []
+        await control.push("a", {"type": "job", "job_id": "j"})
+        assert await control.next_messages("a", timeout=0) == [{"type": "job", "job_id": "j"}]
@@ -0,0 +1,385 @@
+"""Property-based tests for the AI request executor.
+
+**Feature: youtube-automation, AI Request Executor**
+**Validates: Requirements 14.1, 14.2, 14.3**
+
+Properties:
+- Concurrent requests never exceed the executor's concurrency cap
+- Requests that outlive their deadline fail instead of hanging
+- Streamed title suggestions reach the caller before the response ends
+- Batched title generation sends one request per batch and maps results by index
+- A batch's output budget grows with its size; a failed batch falls back to
+  one request per video
+- The token limiter never lets usage outrun the per-minute budget
+- Requests, latency and tokens are recorded per feature
+
+The OpenAI client talks to a local fake of the chat completions endpoint.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from hypothesis import given, settings as hypothesis_settings, strategies as st
+
+from app.core.metrics import REGISTRY
+from app.modules.ai.executor import AIDeadlineExceeded, AIExecutor, TokenRateLimiter
+from app.modules.ai.openai_client import OpenAIClient
+from app.modules.ai.response_cache import AIResponseCache
+from app.modules.ai.schemas import TitleBatchGenerationRequest, TitleGenerationRequest
+from app.modules.ai.service import AIService, AIServiceError
+
+
+class FakeOpenAI:
+    """Minimal fake of POST /v1/chat/completions.
+
+    `reply(body)` returns the completion text for a request body. Streaming
+    requests are answered line by line as server-sent events, sleeping
+    `chunk_delay` between lines.
+    """
+
+    def __init__(self, reply, delay: float = 0.0, chunk_delay: float = 0.0):
+        self.reply = reply
+        self.delay = delay
+        self.chunk_delay = chunk_delay
+        self.requests: list[dict] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.stream_finished_at = None
+        self._lock = threading.Lock()
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with fake._lock:
+                    fake.requests.append(body)
+                    fake.in_flight += 1
+                    fake.max_in_flight = max(fake.max_in_flight, fake.in_flight)
+                try:
+                    time.sleep(fake.delay)
+                    text = fake.reply(body)
+                    if body.get("stream"):
+                        self._stream(text)
+                    else:
+                        self._complete(text)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                finally:
+                    with fake._lock:
+                        fake.in_flight -= 1
+
+            def _complete(self, text: str):
+                payload = json.dumps({
+                    "id": "chatcmpl-test",
+                    "object": "chat.completion",
+                    "created": 0,
+                    "model": "test",
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": text},
+                        "finish_reason": "stop",
+                    }],
+                    "usage": {"prompt_tokens": 10, "completion_tokens": 20, "total_tokens": 30},
+                }).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _stream(self, text: str):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.end_headers()
+                for line in text.splitlines(keepends=True):
+                    chunk = {
+                        "id": "chatcmpl-test",
+                        "object": "chat.completion.chunk",
+                        "created": 0,
+                        "model": "test",
+                        "choices": [{"index": 0, "delta": {"content": line}, "finish_reason": None}],
+                    }
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                    self.wfile.flush()
+                    time.sleep(fake.chunk_delay)
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+                fake.stream_finished_at = time.monotonic()
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def title_items(prefix: str = "Title") -> list[dict]:
+    return [
+        {"title": f"{prefix} {i}", "confidence_score": 0.8, "reasoning": "r", "keywords": []}
+        for i in range(5)
+    ]
+
+
+def titles_reply(body: dict) -> str:
+    return json.dumps({"suggestions": title_items()})
+
+
+def make_service(fake: FakeOpenAI, executor: AIExecutor) -> AIService:
+    client = OpenAIClient(api_key="test", base_url=fake.base_url)
+    client._client = client._client.with_options(max_retries=0)
+    service = AIService(
+        openai_client=client,
+        response_cache=AIResponseCache(max_entries=100, ttl_seconds=60, semantic_enabled=False),
+        executor=executor,
+    )
+    return service
+
+
+def sample_value(name: str, labels: dict) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def video(index: int) -> TitleGenerationRequest:
+    return TitleGenerationRequest(video_content=f"Video number {index} about cooking")
+
+
+@pytest.mark.asyncio
+class TestExecutorLimits:
+    """Concurrency caps and deadlines against the fake server."""
+
+    async def test_concurrency_never_exceeds_cap(self):
+        with FakeOpenAI(titles_reply, delay=0.05) as fake:
+            service = make_service(fake, AIExecutor(max_concurrency=3, tokens_per_minute=10_000_000))
+
+            await asyncio.gather(*(service.generate_titles(video(i)) for i in range(12)))
+
+            assert len(fake.requests) == 12
+            assert fake.max_in_flight <= 3
+
+    async def test_deadline_exceeded_raises_service_error(self):
+        with FakeOpenAI(titles_reply, delay=1.0) as fake:
+            service = make_service(
+                fake,
+                AIExecutor(max_concurrency=2, tokens_per_minute=10_000_000, default_deadline_seconds=0.2),
+            )
+            deadline_before = sample_value("ai_requests_total", {"service": "titles", "status": "deadline"})
+
+            started = time.monotonic()
+            with pytest.raises(AIServiceError) as exc_info:
+                await service.generate_titles(video(1))
+
+            assert time.monotonic() - started < 0.9
+            assert isinstance(exc_info.value.__cause__, AIDeadlineExceeded)
+            assert sample_value(
+                "ai_requests_total", {"service": "titles", "status": "deadline"}
+            ) == deadline_before + 1
+
+    async def test_queued_requests_count_against_deadline(self):
+        executor = AIExecutor(max_concurrency=1, tokens_per_minute=10_000_000, default_deadline_seconds=0.1)
+
+        async def hold():
+            async with executor.slot("test", reserve_tokens=1):
+                await asyncio.sleep(0.3)
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0.01)
+        with pytest.raises(AIDeadlineExceeded):
+            async with executor.slot("test", reserve_tokens=1):
+                pass
+        await holder
+
+    async def test_token_budget_delays_requests(self):
+        executor = AIExecutor(max_concurrency=4, tokens_per_minute=600)  # 10 tokens/s
+
+        async with executor.slot("test", reserve_tokens=600) as slot:
+            slot.record_tokens(500, 100)
+        started = time.monotonic()
+        async with executor.slot("test", reserve_tokens=3):
+            pass
+
+        assert time.monotonic() - started >= 0.25
+        assert AIExecutor(max_concurrency=1, tokens_per_minute=0).limiter is None  # default: disabled
+
+    async def test_tokens_and_latency_recorded_per_feature(self):
+        with FakeOpenAI(titles_reply) as fake:
+            service = make_service(fake, AIExecutor(max_concurrency=2, tokens_per_minute=10_000_000))
+            labels = {"service": "titles"}
+            prompt_before = sample_value("ai_tokens_total", {**labels, "kind": "prompt"})
+            completion_before = sample_value("ai_tokens_total", {**labels, "kind": "completion"})
+            latency_before = sample_value("ai_request_duration_seconds_count", labels)
+            success_before = sample_value("ai_requests_total", {**labels, "status": "success"})
+
+            await service.generate_titles(video(1))
+
+            assert sample_value("ai_tokens_total", {**labels, "kind": "prompt"}) > prompt_before
+            assert sample_value("ai_tokens_total", {**labels, "kind": "completion"}) > completion_before
+            assert sample_value("ai_request_duration_seconds_count", labels) == latency_before + 1
+            assert sample_value("ai_requests_total", {**labels, "status": "success"}) == success_before + 1
+            assert sample_value("ai_requests_in_flight", labels) == 0
+
+
+@pytest.mark.asyncio
+class TestStreaming:
+    """Streamed titles arrive line by line."""
+
+    async def test_first_suggestion_arrives_before_stream_ends(self):
+        reply = "\n".join(json.dumps(item) for item in title_items("Streamed")) + "\n"
+        with FakeOpenAI(lambda body: reply, chunk_delay=0.1) as fake:
+            service = make_service(fake, AIExecutor(max_concurrency=2, tokens_per_minute=10_000_000))
+
+            received = []
+            first_at = None
+            async for suggestion in service.stream_titles(video(1)):
+                if first_at is None:
+                    first_at = time.monotonic()
+                received.append(suggestion.title)
+
+            assert fake.requests[0]["stream"] is True
+            assert received == [f"Streamed {i}" for i in range(5)]
+            assert first_at < fake.stream_finished_at - 0.2
+
+    async def test_short_stream_is_padded_to_five(self):
+        reply = json.dumps(title_items()[0]) + "\nnot json\n"
+        with FakeOpenAI(lambda body: reply) as fake:
+            service = make_service(fake, AIExecutor(max_concurrency=2, tokens_per_minute=10_000_000))
+
+            received = [s async for s in service.stream_titles(video(1))]
+
+            assert len(received) == 5
+            assert received[0].title == "Title 0"
+            assert received[-1].reasoning == "Fallback suggestion"
+
+
+@pytest.mark.asyncio
+class TestBatching:
+    """Several videos share one request per batch."""
+
+    async def test_batches_map_results_by_index(self, monkeypatch):
+        from app.modules.ai import service as service_module
+
+        monkeypatch.setattr(service_module.settings, "AI_BATCH_SIZE", 5)
+
+        def reply(body: dict) -> str:
+            if "Video 0:" not in body["messages"][1]["content"]:
+                return titles_reply(body)
+            count = body["messages"][1]["content"].count("Video Content:")
+            # Answer out of order and leave the last video out
+            results = [
+                {"index": i, "suggestions": title_items(f"Batch {i}")}
+                for i in reversed(range(count - 1))
+            ]
+            return json.dumps({"results": results})
+
+        with FakeOpenAI(reply) as fake:
+            service = make_service(fake, AIExecutor(max_concurrency=4, tokens_per_minute=10_000_000))
+            request = TitleBatchGenerationRequest(requests=[video(i) for i in range(12)])
+
+            response = await service.generate_titles_batch(request)
+
+            batched = [r for r in fake.requests if "Video 0:" in r["messages"][1]["content"]]
+            assert len(batched) == 3
+            assert len(fake.requests) == 3 + 3  # one fallback per batch
+            assert len(response.results) == 12
+            assert response.results[0].suggestions[0].title == "Batch 0 0"
+            assert response.results[3].suggestions[0].title == "Batch 3 0"
+            assert response.results[4].suggestions[0].title == "Title 0"
+            assert response.results[10].suggestions[0].title == "Batch 0 0"
+            assert response.results[11].suggestions[0].title == "Title 0"
+
+    async def test_truncated_batch_falls_back_per_video(self, monkeypatch):
+        from app.modules.ai import service as service_module
+
+        monkeypatch.setattr(service_module.settings, "AI_BATCH_SIZE", 10)
+        monkeypatch.setattr(service_module.settings, "OPENAI_MAX_TOKENS", 2000)
+
+        def reply(body: dict) -> str:
+            if "Video 0:" not in body["messages"][1]["content"]:
+                return titles_reply(body)
+            # Cut off mid-answer, as at the max_tokens limit
+            results = [{"index": i, "suggestions": title_items(f"Batch {i}")} for i in range(10)]
+            return json.dumps({"results": results})[:500]
+
+        with FakeOpenAI(reply) as fake:
+            service = make_service(fake, AIExecutor(max_concurrency=4, tokens_per_minute=10_000_000))
+            request = TitleBatchGenerationRequest(requests=[video(i) for i in range(10)])
+
+            response = await service.generate_titles_batch(request)
+
+            batched = [r for r in fake.requests if "Video 0:" in r["messages"][1]["content"]]
+            assert len(batched) == 1
+            assert batched[0]["max_tokens"] == 10 * AIService.TITLE_BATCH_TOKENS_PER_VIDEO
+            assert len(fake.requests) == 1 + 10
+            assert [r.suggestions[0].title for r in response.results] == ["Title 0"] * 10
+
+    async def test_batch_failure_raises_service_error(self):
+        client = MagicMock()
+        from app.modules.ai.openai_client import OpenAIClientError
+
+        client.generate_json = AsyncMock(side_effect=OpenAIClientError("boom"))
+        service = AIService(
+            openai_client=client,
+            response_cache=AIResponseCache(max_entries=10, ttl_seconds=60, semantic_enabled=False),
+            executor=AIExecutor(max_concurrency=2, tokens_per_minute=10_000_000),
+        )
+
+        with pytest.raises(AIServiceError):
+            await service.generate_titles_batch(TitleBatchGenerationRequest(requests=[video(1)]))
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestTokenRateLimiter:
+    """The limiter keeps usage within the per-minute budget."""
+
+    @given(
+        tokens_per_minute=st.integers(min_value=600, max_value=100_000),
+        reservations=st.lists(st.integers(min_value=1, max_value=5_000), min_size=1, max_size=40),
+    )
+    @hypothesis_settings(max_examples=200)
+    def test_usage_never_outruns_budget(self, tokens_per_minute: int, reservations: list[int]):
+        clock = FakeClock()
+        limiter = TokenRateLimiter(tokens_per_minute, clock=clock)
+        used = 0.0
+
+        for tokens in reservations:
+            wait = limiter.reserve(tokens)
+            assert wait >= 0
+            clock.now += wait
+            used += min(tokens, tokens_per_minute)
+            # Tokens used by time t never exceed one full bucket plus the refill
+            assert used <= tokens_per_minute + clock.now * tokens_per_minute / 60 + 1e-6
+
+    @given(reserved=st.integers(min_value=1, max_value=1000), used=st.integers(min_value=0, max_value=1000))
+    @hypothesis_settings(max_examples=100)
+    def test_settle_returns_unused_tokens(self, reserved: int, used: int):
+        clock = FakeClock()
+        limiter = TokenRateLimiter(10_000, clock=clock)
+
+        limiter.reserve(reserved)
+        limiter.settle(reserved, used)
+
+        assert limiter.available == pytest.approx(min(10_000, 10_000 - used))
@@ -0,0 +1,253 @@
+"""Property-based tests for the AI response cache.
+
+**Feature: youtube-automation, AI Response Cache**
+**Validates: Requirements 14.1, 14.2, 14.3**
+
+Properties:
+- Prompts that differ only in case or whitespace share a cache entry
+- Different model parameters never share an entry
+- Entries expire after the TTL; the least recently used entry is evicted first
+- Near-duplicate matching only returns the same user's responses
+- Repeat generations skip the OpenAI call and are logged as cache hits,
+  unless the user opted out
+"""
+
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from hypothesis import given, settings as hypothesis_settings, strategies as st
+
+from app.core.metrics import REGISTRY
+from app.modules.ai.response_cache import AIResponseCache, local_embedding, cosine_similarity
+from app.modules.ai.schemas import TagSuggestionRequest, TitleGenerationRequest
+from app.modules.ai.service import AIService
+
+
+class FakeClock:
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+prompt_strategy = st.text(
+    alphabet="abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789",
+    min_size=1,
+    max_size=40,
+)
+
+
+def lookup(cache: AIResponseCache, user_prompt: str, temperature: float = 0.8, user_id=None):
+    return cache.get("titles", "gpt-4", temperature, None, "system", user_prompt, user_id)
+
+
+def store(cache: AIResponseCache, user_prompt: str, response: dict, temperature: float = 0.8, user_id=None):
+    cache.put("titles", "gpt-4", temperature, None, "system", user_prompt, response, 100, user_id)
+
+
+def title_response(prefix: str = "Title") -> dict:
+    return {
+        "suggestions": [
+            {"title": f"{prefix} {i}", "confidence_score": 0.8, "reasoning": "r", "keywords": []}
+            for i in range(5)
+        ]
+    }
+
+
+class TestCacheKeys:
+    """Tests for prompt normalization and parameter keys."""
+
+    @given(words=st.lists(prompt_strategy, min_size=1, max_size=8), padding=st.sampled_from([" ", "  ", "\n", "\t "]))
+    @hypothesis_settings(max_examples=200)
+    def test_case_and_whitespace_variants_hit(self, words: list[str], padding: str):
+        cache = AIResponseCache(max_entries=10, ttl_seconds=60, semantic_enabled=False)
+        store(cache, " ".join(words), {"value": 1})
+
+        variant = padding + padding.join(word.upper() for word in words) + padding
+
+        hit = lookup(cache, variant)
+        assert hit is not None
+        assert hit.response == {"value": 1}
+
+    @given(prompt=prompt_strategy, temperature=st.sampled_from([0.0, 0.5, 0.9]))
+    @hypothesis_settings(max_examples=100)
+    def test_parameters_are_part_of_the_key(self, prompt: str, temperature: float):
+        cache = AIResponseCache(max_entries=10, ttl_seconds=60, semantic_enabled=False)
+        store(cache, prompt, {"value": 1}, temperature=0.8)
+
+        assert (lookup(cache, prompt, temperature=temperature) is None) == (temperature != 0.8)
+        assert cache.get("tags", "gpt-4", 0.8, None, "system", prompt) is None
+        assert cache.get("titles", "gpt-4o", 0.8, None, "system", prompt) is None
+
+    def test_cached_response_is_a_copy(self):
+        cache = AIResponseCache(max_entries=10, ttl_seconds=60, semantic_enabled=False)
+        store(cache, "prompt", {"items": [1]})
+
+        lookup(cache, "prompt").response["items"].append(2)
+
+        assert lookup(cache, "prompt").response == {"items": [1]}
+
+
+class TestEviction:
+    """Tests for TTL expiry and LRU eviction."""
+
+    @given(ttl=st.integers(min_value=1, max_value=3600), elapsed=st.integers(min_value=0, max_value=7200))
+    @hypothesis_settings(max_examples=200)
+    def test_entries_expire_after_ttl(self, ttl: int, elapsed: int):
+        clock = FakeClock()
+        cache = AIResponseCache(max_entries=10, ttl_seconds=ttl, semantic_enabled=False, clock=clock)
+        store(cache, "prompt", {"value": 1})
+
+        clock.now += elapsed
+
+        assert (lookup(cache, "prompt") is not None) == (elapsed <= ttl)
+
+    @given(
+        operations=st.lists(
+            st.tuples(st.sampled_from(["put", "get"]), st.integers(min_value=0, max_value=12)),
+            max_size=80,
+        ),
+        capacity=st.integers(min_value=1, max_value=6),
+    )
+    @hypothesis_settings(max_examples=200)
+    def test_least_recently_used_evicted_first(self, operations, capacity: int):
+        cache = AIResponseCache(max_entries=capacity, ttl_seconds=60, semantic_enabled=False)
+        model: list[int] = []  # least recently used first
+
+        for operation, key in operations:
+            prompt = f"prompt {key}"
+            if operation == "put":
+                store(cache, prompt, {"key": key})
+                if key in model:
+                    model.remove(key)
+                model.append(key)
+                del model[:-capacity]
+            else:
+                hit = lookup(cache, prompt)
+                assert (hit is not None) == (key in model)
+                if hit is not None:
+                    assert hit.response == {"key": key}
+                    model.remove(key)
+                    model.append(key)
+
+        assert len(cache) == len(model)
+
+
+class TestSemanticMatching:
+    """Tests for near-duplicate matching with local embeddings."""
+
+    def test_near_duplicate_matches_same_user_only(self):
+        cache = AIResponseCache(max_entries=10, ttl_seconds=60, semantic_enabled=True, similarity_threshold=0.8)
+        owner, other = uuid.uuid4(), uuid.uuid4()
+        original = "Video content: unboxing the new camera and testing low light video quality outdoors at night"
+        near = "Video content: unboxing the new camera and testing low light video quality outdoors tonight"
+        store(cache, original, {"value": 1}, user_id=owner)
+
+        hit = lookup(cache, near, user_id=owner)
+
+        assert hit is not None and hit.semantic
+        assert lookup(cache, near, user_id=other) is None
+        assert lookup(cache, "Video content: baking sourdough bread at home", user_id=owner) is None
+
+    def test_semantic_matching_disabled_by_flag(self):
+        cache = AIResponseCache(max_entries=10, ttl_seconds=60, semantic_enabled=False)
+        user_id = uuid.uuid4()
+        store(cache, "a long description of the video", {"value": 1}, user_id=user_id)
+
+        assert lookup(cache, "a long description of this video", user_id=user_id) is None
+
+    @given(text=st.text(min_size=1, max_size=200))
+    @hypothesis_settings(max_examples=100)
+    def test_embedding_self_similarity(self, text: str):
+        embedding = local_embedding(text)
+        if any(embedding):
+            assert cosine_similarity(embedding, embedding) == pytest.approx(1.0)
+
+
+def sample_value(name: str, labels: dict) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def make_service(cache: AIResponseCache, response: dict, disable_cache: bool = False):
+    client = MagicMock()
+    client.generate_json = AsyncMock(return_value=response)
+    service = AIService(session=None, openai_client=client, response_cache=cache)
+    service.preferences_repo = MagicMock()
+    service.preferences_repo.get_by_user = AsyncMock(return_value=SimpleNamespace(
+        preferred_title_style=None,
+        preferred_description_length=None,
+        preferred_tag_count=None,
+        disable_response_cache=disable_cache,
+    ))
+    service.log_repo = MagicMock()
+    service.log_repo.create = AsyncMock()
+    return service, client
+
+
+@pytest.mark.asyncio
+class TestAIServiceIntegration:
+    """AIService answers repeats from the cache and accounts for them."""
+
+    async def test_repeat_title_request_served_from_cache(self):
+        cache = AIResponseCache(max_entries=100, ttl_seconds=60, semantic_enabled=False)
+        service, client = make_service(cache, title_response())
+        user_id = uuid.uuid4()
+        request = TitleGenerationRequest(video_content="Review of the new phone", keywords=["phone"])
+        hits_before = sample_value("ai_cache_lookups_total", {"feature": "titles", "result": "hit"})
+        saved_before = sample_value("ai_cache_tokens_saved_total", {"feature": "titles"})
+
+        first = await service.generate_titles(request, user_id=user_id)
+        second = await service.generate_titles(request, user_id=user_id)
+
+        assert client.generate_json.await_count == 1
+        assert [s.title for s in first.suggestions] == [s.title for s in second.suggestions]
+        assert sample_value("ai_cache_lookups_total", {"feature": "titles", "result": "hit"}) == hits_before + 1
+        assert sample_value("ai_cache_tokens_saved_total", {"feature": "titles"}) > saved_before
+
+        miss_log, hit_log = [call.kwargs for call in service.log_repo.create.await_args_list]
+        assert not miss_log.get("cache_hit", False) and miss_log["cost_usd"] > 0
+        assert hit_log["cache_hit"] is True
+        assert hit_log["tokens_saved"] == miss_log["tokens_input"] + miss_log["tokens_output"]
+        assert hit_log["cost_saved_usd"] == pytest.approx(miss_log["cost_usd"])
+
+    async def test_cache_shared_across_users_for_exact_repeats(self):
+        cache = AIResponseCache(max_entries=100, ttl_seconds=60, semantic_enabled=False)
+        service, client = make_service(cache, {"suggestions": [{"tag": "phone", "relevance_score": 0.9}]})
+        request = TagSuggestionRequest(video_title="Phone review", max_tags=10)
+
+        await service.suggest_tags(request, user_id=uuid.uuid4())
+        await service.suggest_tags(request, user_id=uuid.uuid4())
+
+        assert client.generate_json.await_count == 1
+
+    async def test_opted_out_user_always_calls_openai(self):
+        cache = AIResponseCache(max_entries=100, ttl_seconds=60, semantic_enabled=False)
+        service, client = make_service(cache, title_response(), disable_cache=True)
+        request = TitleGenerationRequest(video_content="Private draft content")
+        bypass_before = sample_value("ai_cache_lookups_total", {"feature": "titles", "result": "bypass"})
+
+        for _ in range(3):
+            await service.generate_titles(request, user_id=uuid.uuid4())
+
+        assert client.generate_json.await_count == 3
+        assert len(cache) == 0
+        assert sample_value("ai_cache_lookups_total", {"feature": "titles", "result": "bypass"}) == bypass_before + 3
+
+    async def test_failed_calls_are_not_cached(self):
+        from app.modules.ai.openai_client import OpenAIClientError
+        from app.modules.ai.service import AIServiceError
+
+        cache = AIResponseCache(max_entries=100, ttl_seconds=60, semantic_enabled=False)
+        service, client = make_service(cache, title_response())
+        client.generate_json = AsyncMock(side_effect=[OpenAIClientError("boom"), title_response()])
+        request = TitleGenerationRequest(video_content="Flaky upstream")
+
+        with pytest.raises(AIServiceError):
+            await service.generate_titles(request)
+        response = await service.generate_titles(request)
+
+        assert client.generate_json.await_count == 2
+        assert response.suggestions[0].title == "Title 0"
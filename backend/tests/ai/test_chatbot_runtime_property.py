@@ -0,0 +1,493 @@
+"""Property-based tests and latency benchmark for the chatbot runtime.
+
+**Feature: youtube-automation, Chatbot Runtime Cache**
+**Validates: Requirements 11.1**
+
+Properties:
+- Cached snapshots answer messages without config, trigger or cooldown queries
+- Config, trigger and takeover edits invalidate the cached snapshot, in
+  every process sharing Redis
+- Cooldowns expire exactly after their TTL
+- Identical in-flight questions share one AI call; concurrency stays bounded
+- Cached responses stay well inside the 3-second target under load
+"""
+
+import asyncio
+import statistics
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from hypothesis import given, settings as hypothesis_settings, strategies as st
+
+from app.modules.ai.chatbot import runtime as runtime_module
+from app.modules.ai.chatbot.runtime import (
+    CachedTrigger,
+    ChatbotRuntime,
+    ChatbotSnapshotCache,
+    CoalescingExecutor,
+    CooldownTracker,
+)
+from app.modules.ai.chatbot.schemas import ChatbotConfigUpdate, ChatResponseRequest
+from app.modules.ai.chatbot.service import ChatbotService, TriggerMatcher
+
+
+class FakeInteraction:
+    """Stand-in for ChatbotInteractionLog (avoids SQLAlchemy mapper setup)."""
+
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+        self.id = uuid.uuid4()
+        self.was_declined = False
+        self.was_responded = False
+
+    def mark_declined(self, reason: str) -> None:
+        self.was_declined = True
+        self.decline_reason = reason
+
+    def complete_response(self, response_content: str, response_message_id: str) -> None:
+        self.was_responded = True
+        self.response_content = response_content
+
+
+def make_config(account_id: uuid.UUID, **overrides) -> SimpleNamespace:
+    values = dict(
+        id=uuid.uuid4(),
+        account_id=account_id,
+        bot_name="Bot",
+        bot_prefix="[BOT]",
+        personality="friendly",
+        response_style="concise",
+        custom_personality_prompt=None,
+        max_response_length=200,
+        response_language="en",
+        use_emojis=False,
+        is_enabled=True,
+        is_paused=False,
+        cooldown_seconds=30,
+        content_filter_enabled=False,
+        blocked_topics=None,
+        blocked_keywords=None,
+        takeover_command="!takeover",
+        resume_command="!resume",
+        paused_at=None,
+        paused_by=None,
+    )
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def make_trigger(config_id: uuid.UUID, **overrides) -> SimpleNamespace:
+    values = dict(
+        id=uuid.uuid4(),
+        config_id=config_id,
+        name="Questions",
+        trigger_type="question",
+        pattern=None,
+        keywords=None,
+        custom_response_prompt=None,
+        priority=0,
+        is_enabled=True,
+    )
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+class FakeOpenAI:
+    """Answers by addressing the asker; optional latency per call."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = 0
+
+    async def generate_json(self, system_prompt, user_prompt, temperature, max_tokens):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        user_name = user_prompt.split('"')[1]
+        return {"should_respond": True, "response": f"Good question, {user_name}!"}
+
+
+class FakeRedis:
+    """In-memory stand-in for the Redis calls the runtime makes."""
+
+    def __init__(self):
+        self.values: dict[str, str] = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def incr(self, key):
+        self.values[key] = str(int(self.values.get(key, 0)) + 1)
+        return int(self.values[key])
+
+
+def make_service(config, triggers, openai=None, runtime=None, db_delay: float = 0.0):
+    async def get_or_create(account_id):
+        await asyncio.sleep(db_delay)
+        return config
+
+    async def get_by_config(config_id, enabled_only=True):
+        await asyncio.sleep(db_delay)
+        return list(triggers)
+
+    async def create_interaction(interaction):
+        await asyncio.sleep(db_delay)
+        return interaction
+
+    service = ChatbotService(
+        session=AsyncMock(),
+        openai_client=openai or FakeOpenAI(),
+        runtime=runtime or ChatbotRuntime(ChatbotSnapshotCache(ttl_seconds=60)),
+    )
+    service.config_repo = MagicMock()
+    service.config_repo.get_or_create = AsyncMock(side_effect=get_or_create)
+    service.config_repo.get_by_account = AsyncMock(return_value=config)
+    service.config_repo.get_by_id = AsyncMock(return_value=config)
+    service.config_repo.update = AsyncMock(return_value=config)
+    service.config_repo.pause = AsyncMock(return_value=config)
+    service.config_repo.resume = AsyncMock(return_value=config)
+    service.config_repo.record_response = AsyncMock()
+    service.config_repo.increment_declined = AsyncMock()
+    service.trigger_repo = MagicMock()
+    service.trigger_repo.get_by_config = AsyncMock(side_effect=get_by_config)
+    service.trigger_repo.increment_trigger_count = AsyncMock()
+    service.interaction_repo = MagicMock()
+    service.interaction_repo.create = AsyncMock(side_effect=create_interaction)
+    service.interaction_repo.get_recent_by_user = AsyncMock(return_value=[])
+    return service
+
+
+def chat(user: str, message: str = "what time is the next stream?", **kwargs) -> ChatResponseRequest:
+    return ChatResponseRequest(
+        message_id=f"msg-{uuid.uuid4()}",
+        message_content=message,
+        user_channel_id=f"UC-{user}",
+        user_display_name=user,
+        **kwargs,
+    )
+
+
+@pytest.fixture(autouse=True)
+def fake_interaction_model():
+    with patch("app.modules.ai.chatbot.service.ChatbotInteractionLog", FakeInteraction):
+        yield
+
+
+@pytest.mark.asyncio
+class TestSnapshotCache:
+    """Tests for the cached per-account config and matcher."""
+
+    async def test_cached_path_skips_config_trigger_and_cooldown_queries(self):
+        account_id = uuid.uuid4()
+        config = make_config(account_id)
+        service = make_service(config, [make_trigger(config.id)])
+
+        results = [await service.generate_response(account_id, chat(f"user{i}")) for i in range(25)]
+
+        assert all(r.should_respond for r in results)
+        assert service.config_repo.get_or_create.await_count == 1
+        assert service.trigger_repo.get_by_config.await_count == 1
+        service.interaction_repo.get_recent_by_user.assert_not_awaited()
+
+    async def test_config_update_invalidates_snapshot(self):
+        account_id = uuid.uuid4()
+        config = make_config(account_id)
+        service = make_service(config, [make_trigger(config.id)])
+        await service.generate_response(account_id, chat("a"))
+
+        await service.update_config(account_id, ChatbotConfigUpdate(bot_prefix="[NEW]"))
+        config.bot_prefix = "[NEW]"
+        result = await service.generate_response(account_id, chat("b"))
+
+        assert service.config_repo.get_or_create.await_count == 2
+        assert result.prefixed_response.startswith("[NEW]")
+
+    async def test_trigger_create_invalidates_snapshot(self):
+        account_id = uuid.uuid4()
+        config = make_config(account_id)
+        triggers = [make_trigger(config.id, trigger_type="keyword", keywords=["merch"])]
+        service = make_service(config, triggers)
+
+        assert not (await service.generate_response(account_id, chat("a", "hello"))).should_respond
+
+        greeting = make_trigger(config.id, name="Greeting", trigger_type="greeting")
+        service.trigger_repo.create = AsyncMock(return_value=greeting)
+        triggers.append(greeting)
+        with patch("app.modules.ai.chatbot.service.ChatbotTrigger", SimpleNamespace):
+            await service.create_trigger(config.id, MagicMock())
+
+        result = await service.generate_response(account_id, chat("b", "hello"))
+        assert result.should_respond
+        assert result.matched_trigger == "Greeting"
+
+    async def test_takeover_command_pauses_immediately(self):
+        account_id = uuid.uuid4()
+        config = make_config(account_id)
+        service = make_service(config, [make_trigger(config.id)])
+        await service.generate_response(account_id, chat("viewer"))
+
+        async def pause(config_id, paused_by):
+            config.is_paused = True
+            return config
+
+        service.config_repo.pause = AsyncMock(side_effect=pause)
+        takeover = await service.generate_response(account_id, chat("owner", "!takeover", is_owner=True))
+        after = await service.generate_response(account_id, chat("viewer2"))
+
+        assert takeover.decline_reason == "Takeover command received"
+        assert after.decline_reason == "Bot is paused or disabled"
+
+    async def test_edits_invalidate_other_processes_through_redis(self):
+        account_id = uuid.uuid4()
+        config = make_config(account_id)
+        redis = FakeRedis()
+        editor, answerer = (
+            make_service(
+                config,
+                [make_trigger(config.id)],
+                runtime=ChatbotRuntime(ChatbotSnapshotCache(ttl_seconds=60), redis=redis),
+            )
+            for _ in range(2)
+        )
+        await answerer.generate_response(account_id, chat("viewer"))
+
+        async def pause(config_id, paused_by):
+            config.is_paused = True
+            return config
+
+        editor.config_repo.pause = AsyncMock(side_effect=pause)
+        await editor.pause_bot(account_id, "UC-owner")
+        after = await answerer.generate_response(account_id, chat("viewer2"))
+
+        assert after.decline_reason == "Bot is paused or disabled"
+        assert answerer.config_repo.get_or_create.await_count == 2
+
+    async def test_redis_failure_keeps_the_cached_snapshot(self):
+        account_id = uuid.uuid4()
+        config = make_config(account_id)
+        redis = FakeRedis()
+        service = make_service(
+            config,
+            [make_trigger(config.id)],
+            runtime=ChatbotRuntime(ChatbotSnapshotCache(ttl_seconds=60), redis=redis),
+        )
+        await service.generate_response(account_id, chat("a"))
+
+        redis.get = AsyncMock(side_effect=ConnectionError("redis down"))
+        result = await service.generate_response(account_id, chat("b"))
+
+        assert result.should_respond
+        assert service.config_repo.get_or_create.await_count == 1
+
+    async def test_ttl_bounds_staleness_of_external_edits(self):
+        cache = ChatbotSnapshotCache(ttl_seconds=30)
+        account_id = uuid.uuid4()
+        snapshot = runtime_module.ChatbotSnapshot(config=MagicMock(id=uuid.uuid4()), matcher=None)
+
+        with patch.object(runtime_module.time, "monotonic", return_value=1000.0):
+            snapshot.loaded_at = 1000.0
+            cache.put(account_id, snapshot)
+        with patch.object(runtime_module.time, "monotonic", return_value=1029.0):
+            assert cache.get(account_id) is snapshot
+        with patch.object(runtime_module.time, "monotonic", return_value=1031.0):
+            assert cache.get(account_id) is None
+
+
+class TestCachedTriggerMatching:
+    """Cached triggers match exactly like the ORM triggers they copy."""
+
+    @given(
+        message=st.text(min_size=0, max_size=60),
+        keywords=st.lists(st.text(min_size=1, max_size=6), max_size=4),
+        trigger_type=st.sampled_from(["keyword", "question", "greeting", "command", "mention", "regex"]),
+        pattern=st.sampled_from([None, "!help", "bot", r"\d+", "("]),
+    )
+    @hypothesis_settings(max_examples=200)
+    def test_snapshot_matcher_equivalent(self, message, keywords, trigger_type, pattern):
+        trigger = make_trigger(uuid.uuid4(), trigger_type=trigger_type, pattern=pattern, keywords=keywords)
+
+        original = TriggerMatcher([trigger]).match(message)
+        cached = TriggerMatcher([CachedTrigger.from_model(trigger)]).match(message)
+
+        assert (original is None) == (cached is None)
+        if original is not None:
+            assert original[0].id == cached[0].id
+            assert original[1] == cached[1]
+
+
+class TestCooldownTracker:
+    """Tests for the TTL cooldown map."""
+
+    @given(
+        seconds=st.integers(min_value=1, max_value=600),
+        elapsed=st.floats(min_value=0, max_value=1200, allow_nan=False),
+    )
+    @hypothesis_settings(max_examples=200, deadline=None)
+    def test_cooldown_expires_after_ttl(self, seconds: int, elapsed: float):
+        tracker = CooldownTracker()
+        config_id = uuid.uuid4()
+
+        async def scenario() -> bool:
+            with patch.object(runtime_module.time, "monotonic", return_value=100.0):
+                await tracker.start(config_id, "UC1", seconds)
+            with patch.object(runtime_module.time, "monotonic", return_value=100.0 + elapsed):
+                return await tracker.is_on_cooldown(config_id, "UC1")
+
+        assert asyncio.run(scenario()) == (elapsed < seconds)
+
+    @pytest.mark.asyncio
+    async def test_redis_failure_falls_back_to_local_map(self):
+        redis = MagicMock()
+        redis.set = AsyncMock(side_effect=ConnectionError("down"))
+        redis.exists = AsyncMock(side_effect=ConnectionError("down"))
+        tracker = CooldownTracker(redis=redis)
+        config_id = uuid.uuid4()
+
+        await tracker.start(config_id, "UC1", 30)
+
+        assert await tracker.is_on_cooldown(config_id, "UC1")
+        assert not await tracker.is_on_cooldown(config_id, "UC2")
+
+    @pytest.mark.asyncio
+    async def test_repeat_message_declined_during_cooldown(self):
+        account_id = uuid.uuid4()
+        config = make_config(account_id)
+        service = make_service(config, [make_trigger(config.id)])
+
+        first = await service.generate_response(account_id, chat("alice"))
+        second = await service.generate_response(account_id, chat("alice"))
+
+        assert first.should_respond
+        assert second.decline_reason == "User on cooldown"
+
+
+class TestAIExecutor:
+    """Tests for bounded, coalescing AI calls."""
+
+    @pytest.mark.asyncio
+    async def test_identical_questions_share_one_call(self):
+        account_id = uuid.uuid4()
+        config = make_config(account_id)
+        openai = FakeOpenAI(delay=0.05)
+        service = make_service(config, [make_trigger(config.id)], openai=openai)
+        await service.get_snapshot(account_id)
+
+        users = [f"viewer{i}" for i in range(20)]
+        results = await asyncio.gather(*(
+            service.generate_response(account_id, chat(user, "When is the next stream?"))
+            for user in users
+        ))
+
+        assert openai.calls == 1
+        for user, result in zip(users, results):
+            assert result.should_respond
+            assert result.response_content == f"Good question, {user}!"
+
+    @pytest.mark.asyncio
+    async def test_shared_answer_keeps_text_that_matches_a_name(self):
+        account_id = uuid.uuid4()
+        config = make_config(account_id)
+        openai = FakeOpenAI(delay=0.05)
+        service = make_service(config, [make_trigger(config.id)], openai=openai)
+        await service.get_snapshot(account_id)
+
+        # Names that also occur in the answer's own words
+        users = ["Good", "question", "o"]
+        results = await asyncio.gather(*(
+            service.generate_response(account_id, chat(user, "When is the next stream?"))
+            for user in users
+        ))
+
+        assert openai.calls == 1
+        assert [result.response_content for result in results] == [f"Good question, {user}!" for user in users]
+
+    @given(
+        limit=st.integers(min_value=1, max_value=6),
+        keys=st.lists(st.integers(min_value=0, max_value=10), min_size=1, max_size=30),
+    )
+    @hypothesis_settings(max_examples=50, deadline=None)
+    def test_concurrency_bounded_and_keys_coalesced(self, limit: int, keys: list[int]):
+        executor = CoalescingExecutor(limit)
+        active = 0
+        peak = 0
+
+        async def call(key: int) -> int:
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.001)
+            active -= 1
+            return key
+
+        async def scenario() -> list[int]:
+            return await asyncio.gather(*(
+                executor.run(str(key), lambda key=key: call(key)) for key in keys
+            ))
+
+        results = asyncio.run(scenario())
+
+        assert results == keys
+        assert peak <= limit
+        assert executor.calls + executor.coalesced == len(keys)
+        assert executor.calls >= len(set(keys))
+
+    @pytest.mark.asyncio
+    async def test_failure_propagates_to_followers(self):
+        executor = CoalescingExecutor(2)
+
+        async def failing():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("upstream")
+
+        results = await asyncio.gather(
+            executor.run("k", failing), executor.run("k", failing), return_exceptions=True
+        )
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert executor.calls == 1
+
+
+@pytest.mark.asyncio
+class TestLatencyBenchmark:
+    """Response latency with simulated DB and AI latency.
+
+    Each DB round trip costs 10ms and each AI call 50ms; 200 messages
+    arrive in bursts of 40 concurrent viewers.
+    """
+
+    DB_DELAY = 0.01
+    AI_DELAY = 0.05
+
+    async def _run(self, cache_ttl: float) -> list[float]:
+        account_id = uuid.uuid4()
+        config = make_config(account_id, cooldown_seconds=0)
+        triggers = [make_trigger(config.id, trigger_type="regex", pattern=rf"\bword{i}\b") for i in range(30)]
+        triggers.append(make_trigger(config.id))
+        service = make_service(
+            config,
+            triggers,
+            openai=FakeOpenAI(delay=self.AI_DELAY),
+            runtime=ChatbotRuntime(ChatbotSnapshotCache(ttl_seconds=cache_ttl), max_ai_concurrency=8),
+            db_delay=self.DB_DELAY,
+        )
+
+        latencies: list[float] = []
+        for burst in range(5):
+            results = await asyncio.gather(*(
+                service.generate_response(account_id, chat(f"v{burst}-{i}", f"question {i}?"))
+                for i in range(40)
+            ))
+            latencies.extend(r.response_time_ms for r in results)
+        return latencies
+
+    @staticmethod
+    def _p95(latencies: list[float]) -> float:
+        return statistics.quantiles(latencies, n=20)[-1]
+
+    async def test_cached_runtime_meets_response_target(self):
+        cold = await self._run(cache_ttl=0)
+        cached = await self._run(cache_ttl=60)
+
+        assert self._p95(cached) < ChatbotService.RESPONSE_TIME_LIMIT_SECONDS * 1000
+        assert statistics.median(cached) < statistics.median(cold)
@@ -0,0 +1,146 @@
+"""Property-based tests for Celery queue routing and priorities.
+
+**Feature: job-queue, Queue Routing**
+**Validates: Requirements 1.1, 24.2**
+
+Properties:
+- Every task in the code base routes to a queue some worker consumes
+- Stream lifecycle tasks are alone at the front of the realtime queue;
+  encodes and bulk work never share it
+- Queue depth covers every priority list of a queue
+"""
+
+import ast
+from collections import defaultdict
+from pathlib import Path
+
+import pytest
+from hypothesis import given, settings, strategies as st
+
+from app.core.celery_queues import (
+    BULK_QUEUE,
+    DEFAULT_ROUTE,
+    IO_QUEUE,
+    MEDIA_QUEUE,
+    MONITORED_QUEUES,
+    PRIORITY_STEPS,
+    REALTIME_QUEUE,
+    TASK_QUEUES,
+    TaskPriority,
+    _QUEUE_DEPTH_SCRIPT,
+    all_queue_depths,
+    queue_depths,
+    queue_keys,
+    route_for,
+    route_task,
+)
+
+APP_DIR = Path(__file__).resolve().parents[2] / "app"
+
+
+def task_names() -> list[str]:
+    """Names of every Celery task defined under app/, as Celery names them."""
+    names = []
+    for path in APP_DIR.rglob("*.py"):
+        module = ".".join(path.relative_to(APP_DIR.parent).with_suffix("").parts)
+        for node in ast.walk(ast.parse(path.read_text(encoding="utf-8"))):
+            if not isinstance(node, ast.FunctionDef):
+                continue
+            for decorator in node.decorator_list:
+                target = decorator.func if isinstance(decorator, ast.Call) else decorator
+                if ast.unparse(target) in ("celery_app.task", "shared_task"):
+                    names.append(f"{module}.{node.name}")
+    return names
+
+
+class FakeRedis:
+    """Lists only; the depth script is emulated by identity."""
+
+    def __init__(self):
+        self.lists: dict[str, list[str]] = defaultdict(list)
+
+    async def eval(self, script, numkeys, *keys):
+        assert script == _QUEUE_DEPTH_SCRIPT and numkeys == len(keys)
+        return [len(self.lists[key]) for key in keys]
+
+
+STREAM_LIFECYCLE = [
+    "app.modules.stream.stream_job_tasks.start_ffmpeg_worker",
+    "app.modules.stream.stream_job_tasks.stop_ffmpeg_worker",
+    "app.modules.stream.tasks.start_stream_task",
+    "app.modules.stream.tasks.stop_stream_task",
+    "app.modules.stream.tasks.trigger_stream_failover",
+]
+
+
+class TestRouting:
+    """Tasks land on the queue for their kind of work."""
+
+    def test_every_task_routes_to_a_consumed_queue(self):
+        names = task_names()
+
+        assert len(names) > 40
+        for name in names:
+            queue, priority = route_for(name)
+            assert queue in TASK_QUEUES, name
+            assert priority in PRIORITY_STEPS, name
+
+    def test_stream_lifecycle_runs_first_on_realtime(self):
+        critical = {name for name in task_names() if route_for(name) == (REALTIME_QUEUE, TaskPriority.CRITICAL)}
+
+        assert critical == set(STREAM_LIFECYCLE)
+
+    def test_slow_work_stays_off_realtime(self):
+        assert route_for("app.modules.transcoding.tasks.transcode_video_task")[0] == MEDIA_QUEUE
+        assert route_for("app.modules.transcoding.tasks.transcode_abr_task")[0] == MEDIA_QUEUE
+        assert route_for("app.modules.stream.stream_job_tasks.prepare_stream_renditions")[0] == MEDIA_QUEUE
+        assert route_for("app.modules.video.tasks.upload_video_task")[0] == IO_QUEUE
+        assert route_for("app.modules.analytics.tasks.sync_account_analytics")[0] == BULK_QUEUE
+        assert route_for("app.modules.stream.stream_job_tasks.maintain_health_partitions")[0] == BULK_QUEUE
+
+    @given(name=st.from_regex(r"[a-z_]{1,12}(\.[a-z_]{1,12}){0,3}", fullmatch=True))
+    def test_unknown_tasks_go_to_bulk(self, name):
+        assert route_for(f"other.{name}") == DEFAULT_ROUTE
+
+    @given(name=st.sampled_from(task_names()))
+    @settings(max_examples=50)
+    def test_router_sets_queue_and_priority(self, name):
+        route = route_task(name, (), {}, {})
+
+        assert (route["queue"], route["priority"]) == route_for(name)
+        assert type(route["priority"]) is int
+
+
+class TestQueueDepth:
+    """Depth counts every priority list, and only the queue's own."""
+
+    def test_keys_cover_each_priority_step(self):
+        keys = queue_keys(REALTIME_QUEUE)
+
+        assert keys[0] == REALTIME_QUEUE
+        assert len(set(keys)) == len(PRIORITY_STEPS)
+        assert all(key == REALTIME_QUEUE or key.startswith(f"{REALTIME_QUEUE}:") for key in keys)
+
+    @pytest.mark.asyncio
+    @given(
+        waiting=st.dictionaries(
+            st.tuples(st.sampled_from(MONITORED_QUEUES), st.sampled_from(PRIORITY_STEPS)),
+            st.integers(min_value=1, max_value=20),
+        )
+    )
+    async def test_depths_by_queue_and_priority(self, waiting):
+        redis = FakeRedis()
+        for (queue, priority), count in waiting.items():
+            redis.lists[queue_keys(queue)[priority]].extend(["message"] * count)
+
+        depths = await all_queue_depths(redis)
+
+        assert set(depths) == set(MONITORED_QUEUES)
+        for queue in MONITORED_QUEUES:
+            assert depths[queue] == {
+                priority: waiting.get((queue, priority), 0) for priority in PRIORITY_STEPS
+            }
+
+    @pytest.mark.asyncio
+    async def test_empty_queue(self):
+        assert sum((await queue_depths(FakeRedis(), IO_QUEUE)).values()) == 0
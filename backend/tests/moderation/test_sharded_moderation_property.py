@@ -0,0 +1,402 @@
+"""Property-based tests and simulation for sharded live chat moderation.
+
+**Feature: youtube-automation, Sharded Live Chat Moderation**
+**Validates: Requirements 12.1**
+
+Properties:
+- Every registered broadcast is leased by exactly one worker process
+- Leases rebalance to a fair share when the fleet grows
+- After a worker dies, another resumes each chat from its checkpoint
+  without skipping or re-processing messages
+- The dedup window evicts the oldest message IDs first
+- Stopping a stream unregisters its moderated broadcasts
+"""
+
+import asyncio
+import uuid
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from hypothesis import given, settings as hypothesis_settings, strategies as st
+
+from app.modules.moderation import sharding
+from app.modules.moderation.chat_worker import LiveChatModerationWorker
+from app.modules.moderation.sharding import (
+    ChatCheckpoint,
+    ModeratedBroadcast,
+    ModerationRegistry,
+    ModerationShardRunner,
+    RecentMessageIds,
+    desired_fleet_size,
+    fair_share,
+)
+from app.modules.moderation.youtube_chat_api import YouTubeChatAPIError
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeRedis:
+    """In-memory stand-in for the Redis calls the registry makes.
+
+    Lease expiry follows the injected clock; the Lua scripts are
+    emulated by identity.
+    """
+
+    def __init__(self, clock: FakeClock):
+        self.clock = clock
+        self.strings: dict[str, tuple[str, float]] = {}
+        self.hashes: dict[str, dict[str, str]] = {}
+        self.lists: dict[str, list[str]] = {}
+        self.zsets: dict[str, dict[str, float]] = {}
+
+    def _get(self, key):
+        entry = self.strings.get(key)
+        if entry and entry[1] <= self.clock():
+            del self.strings[key]
+            return None
+        return entry[0] if entry else None
+
+    async def get(self, key):
+        return self._get(key)
+
+    async def set(self, key, value, nx=False, px=None):
+        if nx and self._get(key) is not None:
+            return None
+        self.strings[key] = (str(value), self.clock() + px / 1000)
+        return True
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.strings.pop(key, None)
+            self.hashes.pop(key, None)
+            self.lists.pop(key, None)
+
+    async def hset(self, key, field, value):
+        self.hashes.setdefault(key, {})[field] = str(value)
+
+    async def hdel(self, key, field):
+        return 1 if self.hashes.get(key, {}).pop(field, None) is not None else 0
+
+    async def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    async def lrange(self, key, start, end):
+        return list(self.lists.get(key, []))
+
+    async def zadd(self, key, mapping):
+        self.zsets.setdefault(key, {}).update(mapping)
+
+    async def zremrangebyscore(self, key, low, high):
+        zset = self.zsets.get(key, {})
+        for member in [m for m, score in zset.items() if score <= float(high)]:
+            del zset[member]
+
+    async def zcard(self, key):
+        return len(self.zsets.get(key, {}))
+
+    async def zrem(self, key, member):
+        self.zsets.get(key, {}).pop(member, None)
+
+    async def eval(self, script, numkeys, *args):
+        keys, argv = args[:numkeys], [str(a) for a in args[numkeys:]]
+        owner = self._get(keys[0])
+        if owner != argv[0]:
+            return 0
+        if script is sharding._RENEW_SCRIPT:
+            self.strings[keys[0]] = (owner, self.clock() + int(argv[1]) / 1000)
+            return 1
+        if script is sharding._RELEASE_SCRIPT:
+            del self.strings[keys[0]]
+            return 1
+        if script is sharding._CHECKPOINT_SCRIPT:
+            self.hashes[keys[1]] = {
+                "live_chat_id": argv[1],
+                "page_token": argv[2],
+                "polling_interval_ms": argv[3],
+                "updated_at": argv[4],
+            }
+            seen = self.lists.setdefault(keys[2], [])
+            seen.extend(argv[7:])
+            del seen[:-int(argv[5])]
+            return 1
+        raise AssertionError("unknown script")
+
+
+class FakeChatAPI:
+    """Fake YouTube live chat: pages of up to five messages per poll."""
+
+    def __init__(self):
+        self.messages: dict[str, list[str]] = {}
+        self.closed: set[str] = set()
+
+    def post(self, live_chat_id: str, count: int) -> None:
+        chat = self.messages.setdefault(live_chat_id, [])
+        start = len(chat)
+        chat.extend(f"{live_chat_id}-msg-{start + i}" for i in range(count))
+
+    def client(self, access_token):
+        return FakeChatClient(self)
+
+
+class FakeChatClient:
+    def __init__(self, api: FakeChatAPI):
+        self.api = api
+
+    async def get_live_chat_id(self, broadcast_id):
+        return f"chat-{broadcast_id}"
+
+    async def get_live_chat_messages(self, live_chat_id, page_token=None):
+        chat = self.api.messages.get(live_chat_id, [])
+        offset = int(page_token or 0)
+        if offset >= len(chat) and live_chat_id in self.api.closed:
+            raise YouTubeChatAPIError("chat ended", status_code=404)
+        page = chat[offset:offset + 5]
+        return {
+            "items": [{"id": message_id} for message_id in page],
+            "nextPageToken": str(offset + len(page)),
+            "pollingIntervalMillis": 5,
+        }
+
+    def parse_chat_message(self, item):
+        return {
+            "youtube_message_id": item["id"],
+            "is_chat_owner": False,
+            "is_chat_moderator": False,
+        }
+
+
+class SimulatedWorker(LiveChatModerationWorker):
+    """Moderation worker that records messages instead of using the DB."""
+
+    processed: list[tuple[str, str]] = []
+
+    async def _load_account_and_rules(self) -> None:
+        self._access_token = "token"
+
+    async def _process_message(self, parsed_message, client) -> None:
+        SimulatedWorker.processed.append((self.broadcast_id, parsed_message["youtube_message_id"]))
+
+
+class AllowAllQuota:
+    async def acquire(self, *args, **kwargs):
+        return SimpleNamespace(allowed=True, retry_after_seconds=None)
+
+
+@pytest.fixture
+def simulation():
+    clock = FakeClock()
+    redis = FakeRedis(clock)
+    api = FakeChatAPI()
+    SimulatedWorker.processed = []
+
+    def worker_factory(broadcast, checkpointer):
+        return SimulatedWorker(
+            account_id=broadcast.account_id,
+            broadcast_id=broadcast.broadcast_id,
+            checkpointer=checkpointer,
+            client_factory=api.client,
+        )
+
+    def make_runner(name: str) -> ModerationShardRunner:
+        return ModerationShardRunner(
+            ModerationRegistry(redis, clock=clock),
+            worker_factory=worker_factory,
+            worker_id=name,
+            capacity=50,
+            lease_ttl=30,
+            stop_timeout=1.0,
+        )
+
+    with patch(
+        "app.modules.moderation.chat_worker.get_quota_scheduler",
+        return_value=AllowAllQuota(),
+    ):
+        yield SimpleNamespace(
+            clock=clock,
+            redis=redis,
+            api=api,
+            registry=ModerationRegistry(redis, clock=clock),
+            make_runner=make_runner,
+        )
+
+
+async def _register(registry: ModerationRegistry, count: int) -> list[ModeratedBroadcast]:
+    account_id = uuid.uuid4()
+    broadcasts = [ModeratedBroadcast(account_id, f"b{i}") for i in range(count)]
+    for broadcast in broadcasts:
+        await registry.register(broadcast)
+    return broadcasts
+
+
+async def _settle(*runners: ModerationShardRunner, rounds: int = 3) -> None:
+    for _ in range(rounds):
+        for runner in runners:
+            await runner.rebalance_once()
+
+
+@pytest.mark.asyncio
+class TestShardedRuntime:
+    """Simulation of several worker processes sharing broadcasts."""
+
+    async def test_each_broadcast_owned_exactly_once(self, simulation):
+        await _register(simulation.registry, 6)
+        runners = [simulation.make_runner(f"w{i}") for i in range(3)]
+
+        await _settle(*runners)
+
+        owned = [key for runner in runners for key in runner.owned]
+        assert sorted(owned) == sorted((await simulation.registry.list_broadcasts()).keys())
+        assert [len(runner.owned) for runner in runners] == [2, 2, 2]
+        for runner in runners:
+            await runner.shutdown()
+
+    async def test_scale_out_rebalances_to_fair_share(self, simulation):
+        await _register(simulation.registry, 10)
+        first = simulation.make_runner("w0")
+        await _settle(first)
+        assert len(first.owned) == 10
+
+        second = simulation.make_runner("w1")
+        await _settle(first, second)
+
+        assert len(first.owned) == 5
+        assert len(second.owned) == 5
+        assert not set(first.owned) & set(second.owned)
+        for runner in (first, second):
+            await runner.shutdown()
+
+    async def test_failover_resumes_from_checkpoint(self, simulation):
+        broadcasts = await _register(simulation.registry, 3)
+        for broadcast in broadcasts:
+            simulation.api.post(f"chat-{broadcast.broadcast_id}", 12)
+
+        first = simulation.make_runner("w0")
+        await _settle(first, rounds=1)
+        await asyncio.sleep(0.2)
+
+        # The process dies: its workers stop without handing back leases
+        for owned in first.owned.values():
+            owned.task.cancel()
+        first.owned.clear()
+
+        for broadcast in broadcasts:
+            simulation.api.post(f"chat-{broadcast.broadcast_id}", 9)
+            simulation.api.closed.add(f"chat-{broadcast.broadcast_id}")
+
+        second = simulation.make_runner("w1")
+        await _settle(second, rounds=1)
+        assert second.owned == {}  # leases still held by the dead process
+
+        simulation.clock.now += 31
+        await _settle(second, rounds=1)
+        assert len(second.owned) == 3
+        await asyncio.sleep(0.3)
+
+        # Chats ended: the runner unregisters them on its next round
+        await _settle(second, rounds=1)
+
+        for broadcast in broadcasts:
+            chat = f"chat-{broadcast.broadcast_id}"
+            seen = [m for b, m in SimulatedWorker.processed if b == broadcast.broadcast_id]
+            assert seen == simulation.api.messages[chat]
+        assert await simulation.registry.list_broadcasts() == {}
+        await second.shutdown()
+
+    async def test_checkpoint_fenced_by_lease(self, simulation):
+        registry = simulation.registry
+        assert await registry.acquire_lease("k", "w0", 30)
+        assert await registry.save_checkpoint("k", "w0", ChatCheckpoint(page_token="5"), ["a"])
+
+        simulation.clock.now += 31
+        assert await registry.acquire_lease("k", "w1", 30)
+
+        stale = await registry.save_checkpoint("k", "w0", ChatCheckpoint(page_token="0"), ["b"])
+        assert not stale
+        checkpoint = await registry.load_checkpoint("k")
+        assert checkpoint.page_token == "5"
+        assert checkpoint.seen_message_ids == ["a"]
+
+
+class TestRecentMessageIds:
+    """Tests for the ordered dedup window."""
+
+    @given(
+        ids=st.lists(st.integers(min_value=0, max_value=50).map(str), max_size=200),
+        capacity=st.integers(min_value=1, max_value=40),
+    )
+    @hypothesis_settings(max_examples=200)
+    def test_keeps_most_recent_ids(self, ids: list[str], capacity: int):
+        recent = RecentMessageIds(capacity, ids)
+
+        expected: list[str] = []
+        for message_id in ids:
+            if message_id in expected:
+                expected.remove(message_id)
+            expected.append(message_id)
+        assert list(recent) == expected[-capacity:]
+
+
+class TestFleetSizing:
+    """Tests for fleet size and per-worker share."""
+
+    @given(
+        broadcasts=st.integers(min_value=0, max_value=2000),
+        per_worker=st.integers(min_value=1, max_value=100),
+    )
+    @hypothesis_settings(max_examples=200)
+    def test_desired_fleet_covers_broadcasts(self, broadcasts: int, per_worker: int):
+        workers = desired_fleet_size(broadcasts, per_worker, min_workers=1, max_workers=10_000)
+        assert workers * per_worker >= broadcasts
+        assert (workers - 1) * per_worker < max(broadcasts, 1)
+
+    @given(
+        broadcasts=st.integers(min_value=0, max_value=500),
+        workers=st.integers(min_value=1, max_value=50),
+    )
+    @hypothesis_settings(max_examples=200)
+    def test_fair_shares_cover_all_broadcasts(self, broadcasts: int, workers: int):
+        share = fair_share(broadcasts, workers, capacity=10_000)
+        assert share * workers >= broadcasts
+
+
+class TestWiring:
+    """The API and the stream stop hook reach the fleet-wide broadcast list."""
+
+    def test_router_and_app_import(self):
+        import importlib
+
+        importlib.import_module("app.modules.moderation.router")
+        importlib.import_module("app.main")
+
+    @pytest.mark.asyncio
+    async def test_stream_stop_unregisters_moderated_broadcasts(self):
+        from app.modules.moderation import chat_worker
+        from app.modules.stream.stream_job_tasks import _stop_moderation_for_job
+
+        account_id = uuid.uuid4()
+        broadcasts = [
+            ModeratedBroadcast(account_id=account_id, broadcast_id=f"b{i}")
+            for i in range(2)
+        ]
+        stopped = []
+
+        async def listed(requested_account_id):
+            assert requested_account_id == account_id
+            return broadcasts
+
+        async def stop(account_id, broadcast_id):
+            stopped.append(broadcast_id)
+            return True
+
+        with patch.object(sharding, "list_moderated_broadcasts", listed), \
+                patch.object(chat_worker, "stop_moderation_for_broadcast", stop):
+            await _stop_moderation_for_job(SimpleNamespace(id=uuid.uuid4(), account_id=account_id))
+
+        assert stopped == ["b0", "b1"]
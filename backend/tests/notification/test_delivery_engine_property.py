@@ -0,0 +1,322 @@
+"""Property-based tests for the pooled notification delivery engine.
+
+**Feature: youtube-automation, Notification Delivery Engine**
+**Validates: Requirements 23.1**
+
+Properties:
+- The SMTP pool never holds more sessions than its size and reuses them
+- Channels of one notification are delivered concurrently, within limits
+- Deliveries outside the SLA are counted as breaches
+- The outbox sweep reclaims sends a dead worker left behind
+"""
+
+import asyncio
+import smtplib
+import socketserver
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from hypothesis import given, settings as hypothesis_settings, strategies as st
+
+from app.core.metrics import NOTIFICATION_SLA_BREACHES_TOTAL
+from app.modules.notification.channels import ChannelDeliveryResult
+from app.modules.notification.service import (
+    NotificationService,
+    record_delivery_latency,
+)
+from app.modules.notification.smtp_pool import SMTPConnectionPool, SMTPPoolConfig
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """Minimal SMTP dialogue: enough for smtplib's sendmail and noop."""
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+        self.wfile.write(b"220 localhost test SMTP\r\n")
+        in_data = False
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            if in_data:
+                if line == b".\r\n":
+                    in_data = False
+                    with server.lock:
+                        server.messages += 1
+                    self.wfile.write(b"250 OK queued\r\n")
+                continue
+            command = line.decode().strip().upper()
+            if command.startswith("EHLO"):
+                self.wfile.write(b"250-localhost\r\n250 8BITMIME\r\n")
+            elif command.startswith("DATA"):
+                in_data = True
+                self.wfile.write(b"354 End data with <CR><LF>.<CR><LF>\r\n")
+            elif command.startswith("QUIT"):
+                self.wfile.write(b"221 Bye\r\n")
+                return
+            else:
+                # HELO, MAIL, RCPT, RSET, NOOP
+                self.wfile.write(b"250 OK\r\n")
+
+
+class LocalSMTPServer(socketserver.ThreadingTCPServer):
+    """Local SMTP stand-in counting connections and accepted messages."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _SMTPHandler)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.messages = 0
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+
+class FakeSMTP:
+    """In-process SMTP session used for fast property tests."""
+
+    opened = 0
+    lock = threading.Lock()
+
+    def __init__(self, host, port, timeout=None):
+        with FakeSMTP.lock:
+            FakeSMTP.opened += 1
+        self.alive = True
+
+    def noop(self):
+        if not self.alive:
+            raise smtplib.SMTPServerDisconnected("closed")
+        return 250, b"OK"
+
+    def sendmail(self, from_addr, to_addrs, message):
+        time.sleep(0.001)
+
+    def quit(self):
+        self.alive = False
+
+
+class TestSMTPConnectionPool:
+    """Tests for the bounded SMTP connection pool."""
+
+    @pytest.mark.asyncio
+    async def test_reuses_sessions_against_local_server(self):
+        """Twenty emails over a size-2 pool open at most two connections."""
+        with LocalSMTPServer() as server:
+            host, port = server.server_address
+            pool = SMTPConnectionPool(
+                SMTPPoolConfig(host=host, port=port, use_tls=False),
+                max_size=2,
+            )
+            try:
+                await asyncio.gather(*(
+                    pool.send("alerts@example.com", f"user{i}@example.com", "Subject: hi\r\n\r\nbody")
+                    for i in range(20)
+                ))
+            finally:
+                pool.close()
+
+        assert server.messages == 20
+        assert 1 <= server.connections <= 2
+        assert pool.connections_opened == server.connections
+
+    @given(
+        pool_size=st.integers(min_value=1, max_value=4),
+        num_messages=st.integers(min_value=1, max_value=30),
+    )
+    @hypothesis_settings(max_examples=25, deadline=None)
+    def test_connections_never_exceed_pool_size(self, pool_size: int, num_messages: int):
+        pool = SMTPConnectionPool(
+            SMTPPoolConfig(host="smtp.test", use_tls=False),
+            max_size=pool_size,
+            smtp_factory=FakeSMTP,
+        )
+
+        async def send_all():
+            await asyncio.gather(*(
+                pool.send("a@example.com", "b@example.com", "msg")
+                for _ in range(num_messages)
+            ))
+
+        try:
+            asyncio.run(send_all())
+        finally:
+            pool.close()
+
+        assert pool.connections_opened <= min(pool_size, num_messages)
+
+    @pytest.mark.asyncio
+    async def test_replaces_dead_idle_session(self):
+        pool = SMTPConnectionPool(
+            SMTPPoolConfig(host="smtp.test", use_tls=False),
+            max_size=1,
+            smtp_factory=FakeSMTP,
+        )
+        try:
+            await pool.send("a@example.com", "b@example.com", "first")
+            # Server dropped the idle session
+            pool._idle.queue[0].server.alive = False
+            await pool.send("a@example.com", "b@example.com", "second")
+        finally:
+            pool.close()
+
+        assert pool.connections_opened == 2
+
+
+def _make_log(channel: str) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        channel=channel,
+        recipient=f"{channel}-recipient",
+        title="Stream offline",
+        message="Your stream went offline",
+        payload=None,
+        attempts=1,
+        max_attempts=3,
+    )
+
+
+class SlowChannel:
+    """Channel that takes a fixed time and tracks its peak concurrency."""
+
+    def __init__(self, name: str, delay: float = 0.1):
+        self.name = name
+        self.delay = delay
+        self.in_flight = 0
+        self.peak = 0
+
+    async def deliver(self, recipient, title, message, payload=None):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+        return ChannelDeliveryResult(success=True, channel=self.name, recipient=recipient)
+
+
+def _service_for(logs: list[SimpleNamespace], use_outbox: bool = False) -> NotificationService:
+    service = NotificationService(MagicMock(), use_outbox=use_outbox)
+    service.log_repo = MagicMock()
+    service.log_repo.claim_for_delivery = AsyncMock(return_value=logs)
+    service.log_repo.mark_delivered = AsyncMock(return_value=None)
+    service.log_repo.record_delivery_failure = AsyncMock()
+    service.log_repo.mark_queued = AsyncMock()
+    return service
+
+
+@pytest.mark.asyncio
+class TestConcurrentFanOut:
+    """Tests for concurrent channel delivery."""
+
+    async def test_channels_delivered_concurrently(self):
+        logs = [_make_log(name) for name in ("email", "sms", "slack", "telegram")]
+        service = _service_for(logs)
+        service.channels = {name: SlowChannel(name, delay=0.2) for name in service.channels}
+
+        started = time.monotonic()
+        results = await service._deliver_logs(logs)
+        elapsed = time.monotonic() - started
+
+        assert results == [True] * 4
+        # Serial delivery would take 0.8s
+        assert elapsed < 0.6
+        assert service.log_repo.mark_delivered.await_count == 4
+
+    async def test_per_channel_concurrency_limit(self):
+        logs = [_make_log("email") for _ in range(6)]
+        service = _service_for(logs)
+        email = SlowChannel("email", delay=0.02)
+        service.channels["email"] = email
+
+        with patch.dict(
+            "app.core.config.settings.NOTIFICATION_CHANNEL_CONCURRENCY",
+            {"email": 2},
+        ):
+            await service._deliver_logs(logs)
+
+        assert email.peak == 2
+
+    async def test_results_follow_input_order(self):
+        """Unknown channels and logs claimed elsewhere fail in place."""
+        logs = [_make_log("email"), _make_log("pager"), _make_log("sms"), _make_log("slack")]
+        claimed = [logs[0], logs[3]]
+        service = _service_for(claimed)
+        service.channels = {name: SlowChannel(name, delay=0) for name in ("email", "sms", "slack")}
+
+        results = await service._deliver_logs(logs)
+
+        assert results == [True, False, False, True]
+        service.log_repo.claim_for_delivery.assert_awaited_once_with(
+            [logs[0].id, logs[2].id, logs[3].id]
+        )
+
+    async def test_failure_leaves_log_pending_for_retry(self):
+        log = _make_log("sms")
+        service = _service_for([log])
+        service.channels["sms"] = MagicMock()
+        service.channels["sms"].deliver = AsyncMock(side_effect=RuntimeError("provider down"))
+
+        assert await service._deliver_notification(log) is False
+        service.log_repo.record_delivery_failure.assert_awaited_once_with(
+            log.id, "provider down", retry=True
+        )
+
+    async def test_outbox_enqueues_instead_of_delivering(self):
+        logs = [_make_log("email"), _make_log("telegram")]
+        service = _service_for(logs, use_outbox=True)
+
+        with patch(
+            "app.modules.notification.tasks.deliver_notifications.delay"
+        ) as delay:
+            await service._dispatch(logs)
+
+        service.log_repo.mark_queued.assert_awaited_once_with([log.id for log in logs])
+        delay.assert_called_once_with([str(log.id) for log in logs])
+        service.log_repo.claim_for_delivery.assert_not_awaited()
+
+    async def test_sweep_reclaims_stale_sends_before_reading_backlog(self):
+        log = _make_log("email")
+        service = _service_for([log], use_outbox=True)
+        calls = []
+        service.log_repo.reclaim_stale_sends = AsyncMock(side_effect=lambda cutoff: calls.append(("reclaim", cutoff)))
+        service.log_repo.get_outbox_backlog = AsyncMock(
+            side_effect=lambda cutoff, limit: calls.append(("backlog", cutoff)) or [log]
+        )
+
+        with patch("app.modules.notification.tasks.deliver_notifications.delay"):
+            assert await service.sweep_outbox() == 1
+
+        (first, sent_before), (second, waited_before) = calls
+        assert (first, second) == ("reclaim", "backlog")
+        # Sends get longer than the sweep cutoff before they count as lost
+        assert sent_before < waited_before
+
+
+class TestDeliveryLatencyMetrics:
+    """Tests for SLA-checked latency metrics."""
+
+    @given(latency=st.floats(min_value=0, max_value=600, allow_nan=False))
+    @hypothesis_settings(max_examples=100)
+    def test_breach_counted_only_outside_sla(self, latency: float):
+        created = datetime(2025, 1, 1, 12, 0, 0)
+        delivered = created + timedelta(seconds=latency)
+        counter = NOTIFICATION_SLA_BREACHES_TOTAL.labels(channel="email")
+        before = counter._value.get()
+
+        within_sla = record_delivery_latency("email", created, delivered)
+
+        assert within_sla == (latency <= 60.0)
+        assert counter._value.get() - before == (0 if within_sla else 1)
@@ -0,0 +1,407 @@
+"""Property-based tests and simulation for the stream deadline scheduler.
+
+**Feature: youtube-automation, Event-driven Stream Scheduling**
+**Validates: Requirements 1.2, 1.3**
+
+Properties:
+- Every due deadline is claimed by exactly one dispatcher
+- Claims that are never acknowledged are re-queued after the claim TTL
+- Editing a job moves its deadlines instead of adding more
+- 10k scheduled starts fire within a sub-second window of their deadline
+- The reconciliation scan never starts a job the dispatcher already claimed
+- A claim whose task cannot be queued is undone and retried
+- A stop due while its job is still starting is deferred, not dropped
+"""
+
+import asyncio
+import bisect
+import time
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from hypothesis import given, settings, strategies as st
+
+from app.modules.stream import deadline_scheduler
+from app.modules.stream.deadline_scheduler import (
+    DEADLINES_KEY,
+    INFLIGHT_KEY,
+    START,
+    STOP,
+    STOP_DEFER_SECONDS,
+    Deadline,
+    DeadlineDeferred,
+    DeadlineDispatcher,
+    DeadlineQueue,
+    claim_and_queue,
+    deadline_member,
+    fire_deadline,
+    job_deadlines,
+    sync_job_deadlines,
+)
+from app.modules.stream.stream_job_models import StreamJobStatus
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeRedis:
+    """In-memory sorted sets; the claim script is emulated by identity.
+
+    Each call runs without yielding, so the script is atomic as in Redis.
+    """
+
+    def __init__(self):
+        self.scores: dict[str, dict[str, float]] = {}
+        self.ordered: dict[str, list[tuple[float, str]]] = {}
+
+    def _add(self, key, member, score, nx=False):
+        scores = self.scores.setdefault(key, {})
+        ordered = self.ordered.setdefault(key, [])
+        if member in scores:
+            if nx:
+                return
+            self._rem(key, member)
+        scores[member] = score
+        bisect.insort(ordered, (score, member))
+
+    def _rem(self, key, member):
+        score = self.scores.get(key, {}).pop(member, None)
+        if score is not None:
+            ordered = self.ordered[key]
+            del ordered[bisect.bisect_left(ordered, (score, member))]
+        return score is not None
+
+    def _due(self, key, now, limit=None):
+        ordered = self.ordered.get(key, [])
+        due = ordered[:bisect.bisect_right(ordered, (now, "￿"))]
+        return due[:limit] if limit is not None else due
+
+    async def zadd(self, key, mapping):
+        for member, score in mapping.items():
+            self._add(key, member, float(score))
+
+    async def zrem(self, key, member):
+        return int(self._rem(key, member))
+
+    async def zcard(self, key):
+        return len(self.scores.get(key, {}))
+
+    async def zrange(self, key, start, end, withscores=False):
+        entries = self.ordered.get(key, [])[start:end + 1 if end >= 0 else None]
+        return [(m, s) for s, m in entries] if withscores else [m for _, m in entries]
+
+    async def eval(self, script, numkeys, *args):
+        assert script is deadline_scheduler._CLAIM_SCRIPT
+        deadlines, inflight = args[:numkeys]
+        now, limit, expiry = float(args[2]), int(args[3]), float(args[4])
+        for _, member in self._due(inflight, now):
+            self._rem(inflight, member)
+            self._add(deadlines, member, now, nx=True)
+        claimed = []
+        for score, member in self._due(deadlines, now, limit):
+            self._rem(deadlines, member)
+            self._add(inflight, member, expiry)
+            claimed += [member, str(score)]
+        return claimed
+
+
+def at(seconds: float) -> datetime:
+    return datetime.fromtimestamp(seconds, tz=timezone.utc).replace(tzinfo=None)
+
+
+def make_job(status=StreamJobStatus.SCHEDULED, start=None, end=None):
+    return SimpleNamespace(id=uuid.uuid4(), status=status.value, scheduled_start_at=start, scheduled_end_at=end)
+
+
+class TestExactlyOnceClaims:
+    """Each deadline goes to one dispatcher."""
+
+    @given(
+        offsets=st.lists(st.floats(min_value=0, max_value=100, allow_nan=False), min_size=1, max_size=60),
+        steps=st.lists(st.tuples(st.integers(min_value=0, max_value=2), st.floats(min_value=0, max_value=30)), max_size=30),
+    )
+    @settings(max_examples=100, deadline=None)
+    def test_concurrent_claimers_never_share_a_deadline(self, offsets, steps):
+        async def scenario():
+            clock = FakeClock()
+            redis = FakeRedis()
+            queues = [DeadlineQueue(redis, clock) for _ in range(3)]
+            job_ids = [str(uuid.uuid4()) for _ in offsets]
+            for job_id, offset in zip(job_ids, offsets):
+                await queues[0].schedule(START, job_id, at(clock.now + offset))
+
+            claimed = []
+            for claimer, advance in steps:
+                clock.now += advance
+                for deadline in await queues[claimer].claim_due(limit=7, claim_ttl=1000):
+                    assert deadline.due_at <= clock.now
+                    claimed.append(deadline.job_id)
+                    await queues[claimer].ack(deadline)
+            clock.now += 1000
+            for queue in queues:
+                while batch := await queue.claim_due(limit=7):
+                    claimed += [d.job_id for d in batch]
+
+            assert sorted(claimed) == sorted(job_ids)
+
+        asyncio.run(scenario())
+
+    @pytest.mark.asyncio
+    async def test_unacknowledged_claim_is_requeued_after_ttl(self):
+        clock = FakeClock()
+        queue = DeadlineQueue(FakeRedis(), clock)
+        job_id = str(uuid.uuid4())
+        await queue.schedule(START, job_id, at(clock.now))
+
+        [first] = await queue.claim_due(claim_ttl=30)  # dispatcher dies here
+        clock.now += 29
+        assert await queue.claim_due(claim_ttl=30) == []
+        clock.now += 2
+        [second] = await queue.claim_due(claim_ttl=30)
+        await queue.ack(second)
+        clock.now += 60
+
+        assert first.job_id == second.job_id == job_id
+        assert await queue.claim_due() == []
+
+
+@pytest.mark.asyncio
+class TestJobDeadlines:
+    """Creating and editing jobs writes their deadlines."""
+
+    async def test_edit_moves_deadlines(self):
+        clock = FakeClock()
+        redis = FakeRedis()
+        queue = DeadlineQueue(redis, clock)
+        job = make_job(start=at(clock.now + 60), end=at(clock.now + 3600))
+
+        await sync_job_deadlines(job, queue)
+        job.scheduled_start_at = at(clock.now + 120)
+        await sync_job_deadlines(job, queue)
+
+        assert redis.scores[DEADLINES_KEY] == {
+            deadline_member(START, job.id): clock.now + 120,
+            deadline_member(STOP, job.id): clock.now + 3600,
+        }
+
+    async def test_unscheduled_job_loses_its_start(self):
+        redis = FakeRedis()
+        queue = DeadlineQueue(redis)
+        job = make_job(start=at(time.time() + 60))
+        await sync_job_deadlines(job, queue)
+
+        job.status = StreamJobStatus.PENDING.value
+        await sync_job_deadlines(job, queue)
+
+        assert redis.scores[DEADLINES_KEY] == {}
+
+    async def test_redis_outage_does_not_fail_the_request(self):
+        queue = DeadlineQueue(MagicMock(zadd=AsyncMock(side_effect=ConnectionError("down"))))
+
+        await sync_job_deadlines(make_job(start=at(time.time() + 60)), queue)
+
+    @given(status=st.sampled_from(list(StreamJobStatus)), has_start=st.booleans(), has_end=st.booleans())
+    @settings(max_examples=60)
+    async def test_deadlines_follow_status(self, status, has_start, has_end):
+        job = make_job(status, at(1000.0) if has_start else None, at(2000.0) if has_end else None)
+
+        deadlines = job_deadlines(job)
+
+        expect_start = has_start and status == StreamJobStatus.SCHEDULED
+        expect_stop = has_end and status in (
+            StreamJobStatus.SCHEDULED, StreamJobStatus.STARTING, StreamJobStatus.RUNNING,
+        )
+        assert deadlines[deadline_member(START, job.id)] == (1000.0 if expect_start else None)
+        assert deadlines[deadline_member(STOP, job.id)] == (2000.0 if expect_stop else None)
+
+
+@pytest.mark.asyncio
+class TestDispatcher:
+    """Fired deadlines are acknowledged; failures are retried."""
+
+    async def test_skipped_and_failed_deadlines(self):
+        clock = FakeClock()
+        redis = FakeRedis()
+        queue = DeadlineQueue(redis, clock)
+        ok, gone, broken = (str(uuid.uuid4()) for _ in range(3))
+        for job_id in (ok, gone, broken):
+            await queue.schedule(START, job_id, at(clock.now))
+
+        async def fire(deadline: Deadline) -> bool:
+            if deadline.job_id == broken:
+                raise RuntimeError("database unavailable")
+            return deadline.job_id == ok
+
+        assert await DeadlineDispatcher(queue, fire).dispatch_due() == 3
+
+        assert list(redis.scores[INFLIGHT_KEY]) == [deadline_member(START, broken)]
+
+    async def test_sleeps_until_next_deadline_capped(self):
+        clock = FakeClock()
+        queue = DeadlineQueue(FakeRedis(), clock)
+        dispatcher = DeadlineDispatcher(queue, AsyncMock(), max_idle=0.5)
+
+        assert await dispatcher.seconds_until_next() == 0.5
+        await queue.schedule(STOP, uuid.uuid4(), at(clock.now + 0.2))
+        assert await dispatcher.seconds_until_next() == pytest.approx(0.2)
+
+    async def test_deferred_deadline_is_requeued(self):
+        clock = FakeClock()
+        redis = FakeRedis()
+        queue = DeadlineQueue(redis, clock)
+        job_id = str(uuid.uuid4())
+        await queue.schedule(STOP, job_id, at(clock.now))
+
+        async def fire(deadline: Deadline) -> bool:
+            raise DeadlineDeferred(5.0)
+
+        assert await DeadlineDispatcher(queue, fire).dispatch_due() == 1
+
+        assert redis.scores[INFLIGHT_KEY] == {}
+        assert redis.scores[DEADLINES_KEY] == {deadline_member(STOP, job_id): clock.now + 5.0}
+
+
+class FakeJobRepo:
+    """Conditional status updates of StreamJobRepository on one job."""
+
+    def __init__(self, job):
+        self.job = job
+
+    async def get_by_id(self, job_id):
+        return self.job
+
+    async def _move(self, job_id, current, new):
+        if job_id != self.job.id or self.job.status != current:
+            return False
+        self.job.status = new
+        return True
+
+    async def claim_scheduled_start(self, job_id):
+        return await self._move(job_id, StreamJobStatus.SCHEDULED.value, StreamJobStatus.STARTING.value)
+
+    async def claim_scheduled_stop(self, job_id):
+        return await self._move(job_id, StreamJobStatus.RUNNING.value, StreamJobStatus.STOPPING.value)
+
+    async def release_claim(self, job_id, claimed_status, previous_status):
+        return await self._move(job_id, claimed_status, previous_status)
+
+
+@pytest.mark.asyncio
+class TestClaimRollback:
+    """A start or stop is never left claimed with no task queued."""
+
+    @pytest.mark.parametrize("action, status, worker", [
+        (START, StreamJobStatus.SCHEDULED, "start_ffmpeg_worker"),
+        (STOP, StreamJobStatus.RUNNING, "stop_ffmpeg_worker"),
+    ])
+    async def test_enqueue_failure_undoes_the_claim(self, action, status, worker):
+        from app.modules.stream import stream_job_tasks
+
+        job = make_job(status)
+        repo = FakeJobRepo(job)
+
+        with patch.object(stream_job_tasks, worker) as task:
+            task.delay.side_effect = ConnectionError("broker down")
+            with pytest.raises(ConnectionError):
+                await claim_and_queue(repo, action, job.id)
+            assert job.status == status.value
+
+            task.delay.side_effect = None
+            assert await claim_and_queue(repo, action, job.id)
+
+        task.delay.assert_called_with(str(job.id))
+        assert job.status != status.value
+
+    async def test_stop_of_starting_job_is_deferred(self):
+        job = make_job(StreamJobStatus.STARTING, end=at(time.time() - 1))
+        session = MagicMock()
+        session.__aenter__ = AsyncMock(return_value=session)
+        session.__aexit__ = AsyncMock(return_value=False)
+
+        with patch("app.core.database.async_session_maker", return_value=session), \
+             patch("app.modules.stream.stream_job_repository.StreamJobRepository", return_value=FakeJobRepo(job)), \
+             patch("app.modules.stream.stream_job_tasks.stop_ffmpeg_worker") as stop_worker:
+            with pytest.raises(DeadlineDeferred) as deferred:
+                await fire_deadline(Deadline(STOP, str(job.id), time.time()))
+
+            job.status = StreamJobStatus.STOPPED.value
+            assert not await fire_deadline(Deadline(STOP, str(job.id), time.time()))
+
+        assert deferred.value.delay == STOP_DEFER_SECONDS
+        stop_worker.delay.assert_not_called()
+
+
+@pytest.mark.asyncio
+class TestStartJitter:
+    """10k scheduled starts fire on time across three dispatchers."""
+
+    async def test_10k_scheduled_starts(self):
+        redis = FakeRedis()
+        queue = DeadlineQueue(redis)
+        start = time.time() + 0.5
+        due = {str(uuid.uuid4()): start + i * 0.0003 for i in range(10_000)}  # 3s of deadlines
+        await queue.schedule_many({deadline_member(START, job_id): t for job_id, t in due.items()})
+        fired: dict[str, float] = {}
+        duplicates = []
+
+        async def fire(deadline: Deadline) -> bool:
+            if deadline.job_id in fired:
+                duplicates.append(deadline.job_id)
+            fired[deadline.job_id] = time.time() - due[deadline.job_id]
+            return True
+
+        dispatchers = [DeadlineDispatcher(DeadlineQueue(redis), fire, max_idle=0.5) for _ in range(3)]
+        tasks = [asyncio.create_task(d.run()) for d in dispatchers]
+        try:
+            async with asyncio.timeout(15):
+                while len(fired) < len(due):
+                    await asyncio.sleep(0.05)
+        finally:
+            for dispatcher in dispatchers:
+                dispatcher.stop()
+            await asyncio.gather(*tasks)
+
+        lags = sorted(fired.values())
+        p50, p99, worst = lags[len(lags) // 2], lags[int(len(lags) * 0.99)], lags[-1]
+        report = f"start jitter p50={p50 * 1000:.1f}ms p99={p99 * 1000:.1f}ms max={worst * 1000:.1f}ms"
+        assert duplicates == [], report
+        assert lags[0] >= 0, report  # nothing fires early
+        assert p99 < 0.25 and worst < 1.0, report
+        assert redis.scores[DEADLINES_KEY] == {} and redis.scores[INFLIGHT_KEY] == {}
+
+
+@pytest.mark.asyncio
+class TestReconciliation:
+    """The beat scan only starts jobs no one else has claimed."""
+
+    async def test_scan_uses_conditional_claims(self):
+        from app.modules.stream import stream_job_tasks
+
+        claimed, taken = make_job(), make_job()
+        repo = MagicMock()
+        repo.get_scheduled_jobs = AsyncMock(side_effect=[[claimed, taken], []])
+        repo.get_jobs_to_stop = AsyncMock(return_value=[])
+        repo.get_jobs_with_deadlines = AsyncMock(return_value=[])
+        repo.claim_scheduled_start = AsyncMock(side_effect=lambda job_id: job_id == claimed.id)
+        session = MagicMock()
+        session.__aenter__ = AsyncMock(return_value=session)
+        session.__aexit__ = AsyncMock(return_value=False)
+
+        with patch.object(stream_job_tasks, "celery_session_maker", return_value=session), \
+             patch.object(stream_job_tasks, "StreamJobRepository", return_value=repo), \
+             patch.object(stream_job_tasks, "start_ffmpeg_worker") as start_worker, \
+             patch.object(stream_job_tasks, "reseed_deadlines", AsyncMock()) as reseed, \
+             patch.object(stream_job_tasks, "source_cache_enabled", return_value=False):
+            result = await stream_job_tasks._check_scheduled_streams_async()
+
+        start_worker.delay.assert_called_once_with(str(claimed.id))
+        assert result["started"] == 1
+        reseed.assert_awaited_once()
@@ -0,0 +1,327 @@
+"""Property-based tests for tiered stream health storage.
+
+**Feature: youtube-automation, Stream Health Time Series**
+**Validates: Requirements 4.7, 8.5**
+
+Properties:
+- Partition names round-trip and partitions tile time without gaps
+- Retention drops only partitions whose whole range has expired
+- New partitions take over rows the DEFAULT partition holds for their range
+- Hour buckets merged from minute sums match the raw averages exactly
+- History reads pick the finest tier within retention and the point budget
+- Rollup statements group on the same expression they select
+"""
+
+import uuid
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from hypothesis import given, settings, strategies as st
+from sqlalchemy.dialects import postgresql
+
+from app.modules.stream.health_timeseries import (
+    HOUR,
+    MINUTE,
+    RAW,
+    RAW_SOURCES,
+    SOURCE_STREAM_JOB,
+    SOURCE_STREAM_SESSION,
+    HealthPoint,
+    PartitionedTable,
+    choose_resolution,
+    get_partitioned_table,
+    hour_rollup_statement,
+    maintain_partitions,
+    minute_rollup_statement,
+    partitions_to_create,
+    partitions_to_drop,
+)
+
+DAILY = PartitionedTable("stream_job_health", monthly=False, timezone_aware=True)
+MONTHLY = PartitionedTable("stream_health_1h", monthly=True, timezone_aware=False)
+
+dates = st.dates(min_value=date(2020, 1, 1), max_value=date(2035, 12, 31))
+
+
+def compile_sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+class TestPartitions:
+    """Partition naming and ranges."""
+
+    @given(day=dates, monthly=st.booleans())
+    @settings(max_examples=200)
+    def test_name_round_trips_and_ranges_tile(self, day, monthly):
+        table = MONTHLY if monthly else DAILY
+        start = table.partition_start(day)
+        following = table.next_start(start)
+
+        assert table.parse_partition(table.partition_name(start)) == start
+        assert start <= day < following
+        assert table.partition_start(following - timedelta(days=1)) == start
+        create, move, attach = table.create_statements(start)
+        assert f"FROM ('{table.bound(start)}') TO ('{table.bound(following)}')" in attach
+        assert f">= '{table.bound(start)}' AND {table.column} < '{table.bound(following)}'" in move
+        assert move.startswith(f"WITH moved AS (DELETE FROM {table.table}_default ")
+
+    def test_foreign_names_are_ignored(self):
+        assert DAILY.parse_partition("stream_job_health_p202610") is None
+        assert DAILY.parse_partition("stream_job_health_unpartitioned") is None
+        assert MONTHLY.parse_partition("stream_health_1h_p20261018") is None
+
+    def test_bounds_match_column_types(self):
+        assert DAILY.bound(date(2026, 10, 18)) == "2026-10-18 00:00:00+00"
+        assert MONTHLY.bound(date(2026, 10, 1)) == "2026-10-01 00:00:00"
+
+    @given(today=dates, ahead=st.integers(min_value=0, max_value=60), monthly=st.booleans())
+    @settings(max_examples=100)
+    def test_upcoming_partitions_cover_window(self, today, ahead, monthly):
+        table = MONTHLY if monthly else DAILY
+        starts = partitions_to_create(table, today, ahead)
+
+        assert starts[0] <= today
+        assert table.next_start(starts[-1]) > today + timedelta(days=ahead)
+        assert all(table.next_start(a) == b for a, b in zip(starts, starts[1:]))
+
+    @given(
+        today=dates,
+        offsets=st.lists(st.integers(min_value=-30, max_value=10), unique=True, max_size=20),
+        retention_hours=st.integers(min_value=1, max_value=240),
+    )
+    @settings(max_examples=100)
+    def test_drop_only_fully_expired_partitions(self, today, offsets, retention_hours):
+        now = datetime.combine(today, datetime.min.time()) + timedelta(hours=13)
+        names = [DAILY.partition_name(today + timedelta(days=o)) for o in offsets] + ["stream_job_health_default"]
+
+        with patch("app.modules.stream.health_timeseries.settings") as mock_settings:
+            mock_settings.STREAM_HEALTH_RAW_RETENTION_HOURS = retention_hours
+            dropped = set(partitions_to_drop(DAILY, names, now))
+
+        cutoff = now - timedelta(hours=retention_hours)
+        for name in names[:-1]:
+            end = datetime.combine(DAILY.next_start(DAILY.parse_partition(name)), datetime.min.time())
+            assert (name in dropped) == (end <= cutoff)
+        assert "stream_job_health_default" not in dropped
+
+    def test_explicit_cutoff_overrides_retention(self):
+        table = get_partitioned_table("stream_health_logs")
+        names = [table.partition_name(date(2026, 10, d)) for d in (1, 2, 3)]
+
+        dropped = partitions_to_drop(table, names, datetime(2026, 10, 18), cutoff=datetime(2026, 10, 3))
+
+        assert dropped == names[:2]
+
+    @pytest.mark.asyncio
+    async def test_maintenance_creates_missing_and_drops_expired(self):
+        now = datetime(2026, 10, 18, 12)
+        existing = [DAILY.partition_name(date(2026, 10, d)) for d in (10, 18)] + ["stream_job_health_default"]
+        session = MagicMock()
+        session.commit = AsyncMock()
+        session.execute = AsyncMock()
+
+        with patch(
+            "app.modules.stream.health_timeseries.list_partitions", AsyncMock(return_value=existing)
+        ), patch("app.modules.stream.health_timeseries.settings") as mock_settings:
+            mock_settings.STREAM_HEALTH_RAW_RETENTION_HOURS = 48
+            report = await maintain_partitions(session, now=now, ahead_days=2, tables=[DAILY])
+
+        assert report["stream_job_health"] == {
+            "created": ["stream_job_health_p20261019", "stream_job_health_p20261020"],
+            "dropped": ["stream_job_health_p20261010"],
+        }
+        statements = [str(call.args[0]) for call in session.execute.await_args_list]
+        assert statements[:3] == DAILY.create_statements(date(2026, 10, 19))
+        assert statements[-2] == "DROP TABLE IF EXISTS stream_job_health_p20261010"
+        # Expired rows that landed in the default partition go with the dropped partitions
+        assert statements[-1] == "DELETE FROM stream_job_health_default WHERE collected_at < '2026-10-16 00:00:00+00'"
+        assert len(statements) == 8
+        session.commit.assert_awaited_once()
+
+
+def rollup_of(samples):
+    """A rollup row over raw (bitrate, fps, dropped) samples, as SQL computes it."""
+    fps = [s[1] for s in samples if s[1] is not None]
+    return SimpleNamespace(
+        bucket_start=datetime(2026, 10, 18),
+        samples=len(samples),
+        bitrate_min=min(s[0] for s in samples),
+        bitrate_max=max(s[0] for s in samples),
+        bitrate_sum=sum(s[0] for s in samples),
+        fps_samples=len(fps),
+        fps_min=min(fps) if fps else None,
+        fps_max=max(fps) if fps else None,
+        fps_sum=sum(fps),
+        dropped_frames_min=min(s[2] for s in samples),
+        dropped_frames_max=max(s[2] for s in samples),
+        dropped_frames_sum=sum(s[2] for s in samples),
+        cpu_percent_max=None,
+        memory_mb_max=None,
+        alert_count=0,
+    )
+
+
+def merge(rows):
+    """Hour bucket from minute buckets, as hour_rollup_statement computes it."""
+    fps_mins = [r.fps_min for r in rows if r.fps_min is not None]
+    fps_maxs = [r.fps_max for r in rows if r.fps_max is not None]
+    return SimpleNamespace(
+        bucket_start=rows[0].bucket_start,
+        samples=sum(r.samples for r in rows),
+        bitrate_min=min(r.bitrate_min for r in rows),
+        bitrate_max=max(r.bitrate_max for r in rows),
+        bitrate_sum=sum(r.bitrate_sum for r in rows),
+        fps_samples=sum(r.fps_samples for r in rows),
+        fps_min=min(fps_mins) if fps_mins else None,
+        fps_max=max(fps_maxs) if fps_maxs else None,
+        fps_sum=sum(r.fps_sum for r in rows),
+        dropped_frames_min=min(r.dropped_frames_min for r in rows),
+        dropped_frames_max=max(r.dropped_frames_max for r in rows),
+        dropped_frames_sum=sum(r.dropped_frames_sum for r in rows),
+        cpu_percent_max=None,
+        memory_mb_max=None,
+        alert_count=sum(r.alert_count for r in rows),
+    )
+
+
+sample = st.tuples(
+    st.integers(min_value=0, max_value=20_000_000),
+    st.one_of(st.none(), st.integers(min_value=0, max_value=60).map(float)),
+    st.integers(min_value=0, max_value=500),
+)
+
+
+class TestRollupMerge:
+    """Sums in the rollup rows make coarser tiers exact."""
+
+    @given(minutes=st.lists(st.lists(sample, min_size=1, max_size=6), min_size=1, max_size=60))
+    @settings(max_examples=100)
+    def test_hour_from_minutes_equals_hour_from_raw(self, minutes):
+        raw = [s for minute in minutes for s in minute]
+
+        merged = HealthPoint.from_rollup(merge([rollup_of(m) for m in minutes]))
+        direct = HealthPoint.from_rollup(rollup_of(raw))
+
+        assert merged == direct
+        assert direct.bitrate_avg == pytest.approx(sum(s[0] for s in raw) / len(raw))
+        assert direct.bitrate_min <= direct.bitrate_avg <= direct.bitrate_max
+
+    def test_empty_fps_has_no_average(self):
+        point = HealthPoint.from_rollup(rollup_of([(1000, None, 3)]))
+
+        assert point.fps_avg is None and point.fps_min is None
+        assert point.dropped_frames_total == 3
+
+
+class TestStatements:
+    """Rollup SQL as PostgreSQL sees it."""
+
+    @pytest.mark.parametrize("source", [SOURCE_STREAM_JOB, SOURCE_STREAM_SESSION])
+    def test_minute_rollup_groups_on_selected_bucket(self, source):
+        sql = compile_sql(minute_rollup_statement(
+            RAW_SOURCES[source], datetime(2026, 10, 18, 12), datetime(2026, 10, 18, 12, 5)
+        ))
+
+        bucket = "date_trunc('minute', timezone('UTC', "
+        assert sql.count(bucket) == 2
+        assert sql.index("GROUP BY") < sql.rindex(bucket)
+        assert "INSERT INTO stream_health_1m" in sql
+        assert "ON CONFLICT (source, series_id, bucket_start) DO UPDATE" in sql
+
+    def test_session_rollup_has_typed_nulls(self):
+        sql = compile_sql(minute_rollup_statement(
+            RAW_SOURCES[SOURCE_STREAM_SESSION], datetime(2026, 10, 18), datetime(2026, 10, 19)
+        ))
+
+        assert sql.count("CAST(NULL AS FLOAT)") == 2
+
+    def test_hour_rollup_reads_minute_tier(self):
+        sql = compile_sql(hour_rollup_statement(datetime(2026, 10, 18), datetime(2026, 10, 19)))
+
+        assert "INSERT INTO stream_health_1h" in sql
+        assert "FROM stream_health_1m" in sql
+        assert sql.count("date_trunc('hour', stream_health_1m.bucket_start)") == 2
+
+
+class TestResolution:
+    """History reads pick the right tier."""
+
+    now = datetime(2026, 10, 18, 12)
+
+    @pytest.mark.parametrize("hours, expected", [
+        (1, RAW),
+        (4, RAW),
+        (6, MINUTE),
+        (24, MINUTE),
+        (24 * 7, HOUR),
+        (24 * 90, HOUR),
+    ])
+    def test_window_to_tier(self, hours, expected):
+        with patch("app.modules.stream.health_timeseries.settings") as mock_settings:
+            mock_settings.STREAM_HEALTH_RAW_RETENTION_HOURS = 48
+            mock_settings.STREAM_HEALTH_MINUTE_RETENTION_DAYS = 30
+            mock_settings.STREAM_HEALTH_HOUR_RETENTION_DAYS = 400
+            resolution = choose_resolution(self.now - timedelta(hours=hours), self.now, self.now, 1500)
+
+        assert resolution == expected
+
+    @given(
+        hours_back=st.floats(min_value=0.1, max_value=24 * 400),
+        span_hours=st.floats(min_value=0.01, max_value=24 * 30),
+        max_points=st.integers(min_value=10, max_value=5000),
+    )
+    @settings(max_examples=200)
+    def test_chosen_tier_covers_start_within_budget(self, hours_back, span_hours, max_points):
+        start = self.now - timedelta(hours=hours_back)
+        end = start + timedelta(hours=span_hours)
+        with patch("app.modules.stream.health_timeseries.settings") as mock_settings:
+            mock_settings.STREAM_HEALTH_RAW_RETENTION_HOURS = 48
+            mock_settings.STREAM_HEALTH_MINUTE_RETENTION_DAYS = 30
+            resolution = choose_resolution(start, end, self.now, max_points)
+
+        span = span_hours * 3600
+        if resolution == RAW:
+            assert hours_back <= 48 and span / 10 <= max_points
+        elif resolution == MINUTE:
+            assert hours_back <= 30 * 24 and span / 60 <= max_points
+            assert hours_back > 48 or span / 10 > max_points
+
+
+@pytest.mark.asyncio
+class TestServiceHistory:
+    """The job health endpoint reads from the chosen tier."""
+
+    async def test_long_window_reads_rollups(self):
+        from app.modules.stream import stream_job_service
+        from app.modules.stream.stream_job_service import StreamJobService
+
+        job_id, user_id = uuid.uuid4(), uuid.uuid4()
+        service = StreamJobService(MagicMock())
+        service.get_stream_job = AsyncMock()
+        service.get_health_history = AsyncMock()
+        reader = MagicMock(get_points=AsyncMock(return_value=(["point"], 1)))
+
+        with patch.object(stream_job_service, "HealthHistoryReader", return_value=reader):
+            resolution, records, points, total = await service.get_health_series(job_id, user_id, hours=24 * 7)
+
+        assert (resolution, records, points, total) == (HOUR, [], ["point"], 1)
+        service.get_stream_job.assert_awaited_once_with(job_id, user_id)
+        service.get_health_history.assert_not_awaited()
+        assert reader.get_points.await_args.args[:2] == (SOURCE_STREAM_JOB, job_id)
+
+    async def test_short_window_reads_raw_samples(self):
+        from app.modules.stream.stream_job_service import StreamJobService
+
+        sample = SimpleNamespace(
+            collected_at=datetime(2026, 10, 18, 12), bitrate=4_500_000, fps=30.0,
+            dropped_frames_delta=2, cpu_percent=40.0, memory_mb=300.0, alert_type=None,
+        )
+        service = StreamJobService(MagicMock())
+        service.get_health_history = AsyncMock(return_value=([sample], 1))
+
+        resolution, records, points, total = await service.get_health_series(uuid.uuid4(), uuid.uuid4(), hours=1)
+
+        assert resolution == RAW and records == [sample] and total == 1
+        assert points[0].bitrate_avg == 4_500_000 and points[0].alert_count == 0
@@ -0,0 +1,207 @@
+"""Property-based tests for batched playlist source resolution.
+
+**Feature: youtube-automation, Playlist Source Resolution**
+**Validates: Requirements 11.1**
+
+Properties:
+- Resolving a playlist costs one database query, whatever its length
+- Existence checks run concurrently, never above the configured bound
+- An unchanged playlist is not checked again; an edited one is
+- Missing files are dropped and item order is kept
+"""
+
+import asyncio
+import uuid
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from hypothesis import given, settings, strategies as st
+from sqlalchemy.dialects import postgresql
+
+from app.core.storage import StorageTimeoutError
+from app.modules.stream import playlist_sources
+from app.modules.stream.playlist_sources import (
+    PlaylistSource,
+    PlaylistSourceCache,
+    build_sources,
+    check_sources,
+    playlist_version,
+    resolve_playlist_sources,
+)
+
+
+def make_rows(count: int) -> list[tuple]:
+    """(position, video_id, file_path, video_url) rows; every third item is a URL."""
+    rows = []
+    for i in range(count):
+        if i % 3 == 2:
+            rows.append((i, None, None, f"https://cdn.example.com/{i}.mp4"))
+        else:
+            rows.append((i, uuid.uuid4(), f"videos/u/{i}.mp4", None))
+    return rows
+
+
+class CountingSession:
+    """Session that serves playlist rows and counts queries."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+
+    async def execute(self, statement, *args, **kwargs):
+        self.statements.append(statement)
+        result = MagicMock()
+        result.all.return_value = self.rows
+        return result
+
+
+class FakeStorage:
+    """Async exists() that tracks concurrency."""
+
+    def __init__(self, missing=(), delay=0.001):
+        self.missing = set(missing)
+        self.delay = delay
+        self.calls = []
+        self.in_flight = 0
+        self.peak = 0
+
+    async def exists(self, key):
+        self.calls.append(key)
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            return key not in self.missing
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.fixture
+def cloud_storage():
+    """Library videos resolve to presigned URLs, as with S3/R2."""
+    with patch.object(
+        playlist_sources, "get_file_url_for_ffmpeg", side_effect=lambda key, expires_in: f"https://r2/{key}?sig"
+    ):
+        yield
+
+
+@pytest.mark.asyncio
+class TestQueries:
+    """Database work per playlist is constant."""
+
+    @given(count=st.integers(min_value=0, max_value=250))
+    @settings(max_examples=25, deadline=None)
+    async def test_one_query_per_playlist(self, count):
+        session = CountingSession(make_rows(count))
+        with patch.object(
+            playlist_sources, "get_file_url_for_ffmpeg", side_effect=lambda key, expires_in: f"https://r2/{key}"
+        ):
+            await resolve_playlist_sources(session, uuid.uuid4(), cache=PlaylistSourceCache(), storage=FakeStorage(delay=0))
+
+        assert len(session.statements) == 1
+
+    async def test_query_joins_items_to_videos(self):
+        session = CountingSession([])
+
+        await resolve_playlist_sources(session, uuid.uuid4(), cache=PlaylistSourceCache())
+
+        sql = str(session.statements[0].compile(dialect=postgresql.dialect()))
+        assert "FROM playlist_items LEFT OUTER JOIN videos ON videos.id = playlist_items.video_id" in sql
+        assert "ORDER BY playlist_items.position ASC" in sql
+
+
+@pytest.mark.asyncio
+class TestExistenceChecks:
+    """Checks are concurrent, bounded, and keep order."""
+
+    async def test_200_items_are_checked_concurrently_within_bound(self, cloud_storage):
+        storage = FakeStorage(delay=0.02)
+        sources = build_sources(make_rows(200))
+
+        available, complete = await check_sources(sources, concurrency=16, storage=storage)
+
+        assert complete and available == sources
+        assert storage.peak == 16
+        assert len(storage.calls) == sum(1 for s in sources if s.key)
+
+    @given(count=st.integers(min_value=1, max_value=60), data=st.data())
+    @settings(max_examples=50, deadline=None)
+    async def test_missing_sources_are_dropped_in_order(self, count, data):
+        sources = build_sources(make_rows(count))
+        keys = [s.key for s in sources if s.key]
+        missing = data.draw(st.sets(st.sampled_from(keys))) if keys else set()
+        with patch.object(
+            playlist_sources, "get_file_url_for_ffmpeg", side_effect=lambda key, expires_in: f"https://r2/{key}"
+        ):
+            available, _ = await check_sources(sources, concurrency=4, storage=FakeStorage(missing, delay=0))
+
+        assert available == [s for s in sources if s.key not in missing]
+
+    async def test_timed_out_check_is_not_final(self, cloud_storage):
+        storage = MagicMock(exists=AsyncMock(side_effect=StorageTimeoutError("slow")))
+
+        available, complete = await check_sources(build_sources(make_rows(2)), storage=storage)
+
+        assert available == [] and not complete
+
+    async def test_local_files_are_checked_on_disk(self, tmp_path):
+        present = tmp_path / "a.mp4"
+        present.write_bytes(b"x")
+        sources = [
+            PlaylistSource(0, None, str(present)),
+            PlaylistSource(1, None, str(tmp_path / "gone.mp4")),
+        ]
+
+        available, complete = await check_sources(sources)
+
+        assert complete and available == sources[:1]
+
+
+@pytest.mark.asyncio
+class TestVersionCache:
+    """Checked sources are reused per playlist version."""
+
+    async def test_restart_reuses_checks_until_playlist_changes(self, cloud_storage):
+        rows = make_rows(30)
+        cache = PlaylistSourceCache(ttl=600)
+        storage = FakeStorage(delay=0)
+        playlist_id = uuid.uuid4()
+
+        first = await resolve_playlist_sources(CountingSession(rows), playlist_id, cache, storage)
+        checks = len(storage.calls)
+        again = await resolve_playlist_sources(CountingSession(rows), playlist_id, cache, storage)
+        assert again == first and len(storage.calls) == checks
+
+        edited = rows[:-1] + [(29, uuid.uuid4(), "videos/u/new.mp4", None)]
+        await resolve_playlist_sources(CountingSession(edited), playlist_id, cache, storage)
+        assert len(storage.calls) == 2 * checks + 1  # item 29 was a direct URL
+
+
+class TestCacheEntries:
+    """Cache bookkeeping."""
+
+    def test_entries_expire_and_are_bounded(self):
+        now = [0.0]
+        cache = PlaylistSourceCache(ttl=10, max_entries=2, clock=lambda: now[0])
+        sources = [PlaylistSource(0, "k", "k")]
+        for playlist_id in ("a", "b", "c"):
+            cache.put(playlist_id, "v1", sources)
+
+        assert cache.get("a", "v1") is None  # evicted
+        assert cache.get("b", "v2") is None  # other version
+        assert cache.get("c", "v1") == sources
+        now[0] = 10
+        assert cache.get("c", "v1") is None
+
+    @given(rows=st.lists(st.tuples(st.booleans(), st.booleans()), max_size=20))
+    def test_version_tracks_resolved_items(self, rows):
+        full = [
+            (i, uuid.uuid4() if library else None, f"v/{i}" if library and has_file else None, None if library else f"http://x/{i}")
+            for i, (library, has_file) in enumerate(rows)
+        ]
+        sources = build_sources(full)
+
+        assert playlist_version(sources) == playlist_version(build_sources(full))
+        if sources:
+            assert playlist_version(sources[:-1]) != playlist_version(sources)
+        assert all(s.key or s.location.startswith("http") for s in sources)
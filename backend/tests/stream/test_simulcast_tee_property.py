@@ -0,0 +1,335 @@
+"""Property-based tests for single-encode simulcast.
+
+**Feature: youtube-automation, Simulcast Tee Output**
+**Validates: Requirements 9.2, 9.3, 9.4**
+
+Properties:
+- One encode feeds every target as an onfail=ignore tee slave, in order,
+  with URLs escaped so they cannot split or break the tee spec
+- A slave failure marks exactly that target failed; progress lines update
+  the others
+- A failed target is re-added from the tap without touching the encode
+"""
+
+import queue
+import shutil
+import socket
+import time
+import uuid
+
+import pytest
+from hypothesis import given, settings, strategies as st
+
+from app.modules.stream.simulcast import (
+    SimulcastCommandBuilder,
+    SimulcastEncoding,
+    SimulcastError,
+    SimulcastOutput,
+    SimulcastSession,
+    SimulcastSupervisor,
+    TeeOutputParser,
+    escape_tee_url,
+    output_url,
+    tap_urls,
+)
+
+
+url_strategy = st.builds(
+    lambda host, key: f"rtmp://{host}/live2/{key}",
+    st.from_regex(r"[a-z0-9.]{1,20}", fullmatch=True),
+    st.text(alphabet=st.characters(min_codepoint=33, max_codepoint=126), min_size=1, max_size=30),
+)
+
+
+def arg_after(cmd: list[str], flag: str) -> str:
+    return cmd[cmd.index(flag) + 1]
+
+
+def split_tee(spec: str) -> list[str]:
+    """Split a tee spec on unescaped '|' and unescape each slave."""
+    slaves, current, escaped = [], "", False
+    for char in spec:
+        if escaped:
+            current += char
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif char == "|":
+            slaves.append(current)
+            current = ""
+        else:
+            current += char
+    slaves.append(current)
+    return slaves
+
+
+class TestTeeCommand:
+    """Every target is one slave of a single encode."""
+
+    @given(urls=st.lists(url_strategy, min_size=1, max_size=5))
+    @settings(max_examples=100)
+    def test_one_slave_per_target_in_order(self, urls):
+        outputs = [SimulcastOutput(uuid.uuid4(), url) for url in urls]
+        writer, _ = tap_urls("239.255.77.1", 27000)
+
+        cmd = SimulcastCommandBuilder().build_simulcast_command("in.mp4", SimulcastEncoding(), outputs, writer)
+
+        assert cmd.count("-i") == 1
+        assert arg_after(cmd, "-f") == "tee"
+        slaves = split_tee(cmd[-1])
+        assert slaves == [f"[f=flv:onfail=ignore]{url}" for url in urls] + [f"[f=mpegts:onfail=ignore]{writer}"]
+
+    def test_encodes_once_with_global_headers(self):
+        outputs = [SimulcastOutput(uuid.uuid4(), "rtmp://a/live/k")]
+        encoding = SimulcastEncoding(resolution="720p", target_bitrate=3000, target_fps=60)
+
+        cmd = SimulcastCommandBuilder().build_simulcast_command("in.mp4", encoding, outputs)
+
+        assert arg_after(cmd, "-b:v") == "3000k"
+        assert arg_after(cmd, "-r") == "60"
+        assert arg_after(cmd, "-flags") == "+global_header"
+        assert "-re" in cmd
+
+    def test_live_input_is_not_throttled(self):
+        outputs = [SimulcastOutput(uuid.uuid4(), "rtmp://a/live/k")]
+
+        cmd = SimulcastCommandBuilder().build_simulcast_command(
+            "rtmp://ingest/live/k", SimulcastEncoding(), outputs, realtime=False
+        )
+
+        assert "-re" not in cmd
+
+    def test_relay_copies_from_tap(self):
+        _, reader = tap_urls("239.255.77.1", 27000)
+
+        cmd = SimulcastCommandBuilder().build_relay_command(reader, "rtmp://a/live/k")
+
+        assert arg_after(cmd, "-i") == reader
+        assert arg_after(cmd, "-c") == "copy"
+        assert cmd[-3:] == ["-f", "flv", "rtmp://a/live/k"]
+
+    @given(url=url_strategy)
+    def test_escaping_round_trips(self, url):
+        assert split_tee(escape_tee_url(url)) == [url]
+
+    def test_output_url_matches_job_output(self):
+        assert output_url("rtmp://a/live2/", "key") == "rtmp://a/live2/key"
+        assert output_url("rtmp://a/live2", None) == "rtmp://a/live2"
+
+
+class TestTeeOutputParser:
+    """Tee failures name the slave that failed."""
+
+    @given(index=st.integers(min_value=0, max_value=20), total=st.integers(min_value=1, max_value=20))
+    def test_slave_failure(self, index, total):
+        line = f"[tee @ 0x55d1] Slave muxer #{index} failed: Connection refused, continuing with {total}/{total + 1} slaves."
+
+        assert TeeOutputParser().parse_slave_failure(line) == (index, "Connection refused")
+
+    def test_progress_is_not_a_failure(self):
+        line = "frame=  300 fps= 30 q=28.0 size=  2048kB time=00:00:10.00 bitrate=1677.7kbits/s drop=4 speed=1.00x"
+        parser = TeeOutputParser()
+
+        assert parser.parse_slave_failure(line) is None
+        assert parser.parse_dropped(line) == 4
+
+
+class FakeProcess:
+    """Popen stand-in whose stderr lines are fed by the test."""
+
+    def __init__(self, cmd, **kwargs):
+        self.args = cmd
+        self.lines = queue.Queue()
+        self.returncode = None
+        self.stderr = iter(self.lines.get, None)
+
+    def emit(self, line: str) -> None:
+        self.lines.put(line + "\n")
+
+    def exit(self, code: int = 0) -> None:
+        self.returncode = code
+        self.lines.put(None)
+
+    def poll(self):
+        return self.returncode
+
+    def wait(self, timeout=None):
+        return self.returncode
+
+    def terminate(self):
+        if self.returncode is None:
+            self.exit(-15)
+
+    kill = terminate
+
+
+class FakePopen:
+    def __init__(self):
+        self.processes: list[FakeProcess] = []
+
+    def __call__(self, cmd, **kwargs):
+        process = FakeProcess(cmd, **kwargs)
+        self.processes.append(process)
+        return process
+
+
+def wait_until(condition, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met"
+        time.sleep(0.01)
+
+
+def start_session(count: int, tap: bool = True):
+    popen = FakePopen()
+    outputs = [SimulcastOutput(uuid.uuid4(), f"rtmp://127.0.0.1/live/{i}") for i in range(count)]
+    session = SimulcastSession(
+        uuid.uuid4(), "in.mp4", SimulcastEncoding(), outputs,
+        tap=tap_urls("127.0.0.1", 27000) if tap else None, popen=popen,
+    )
+    session.start()
+    return session, outputs, popen
+
+
+class TestSimulcastSession:
+    """Failures stay with their target; the encode keeps running."""
+
+    @given(count=st.integers(min_value=2, max_value=5), data=st.data())
+    @settings(max_examples=20, deadline=None)
+    def test_failure_isolated_to_its_target(self, count, data):
+        failed = data.draw(st.integers(min_value=0, max_value=count - 1))
+        session, outputs, popen = start_session(count)
+        encoder = popen.processes[0]
+
+        encoder.emit(f"[tee @ 0x1] Slave muxer #{failed} failed: Broken pipe, continuing with {count}/{count + 1} slaves.")
+        encoder.emit("frame=  300 fps= 30 q=28.0 size=  2048kB time=00:00:10.00 bitrate=6000.0kbits/s drop=2 speed=1.00x")
+        wait_until(lambda: any(h.bitrate_kbps for h in session.health().values()))
+
+        health = session.health()
+        for i, output in enumerate(outputs):
+            if i == failed:
+                assert not health[output.target_id].alive
+                assert health[output.target_id].error == "Broken pipe"
+                assert health[output.target_id].bitrate_kbps == 0
+            else:
+                assert health[output.target_id].alive
+                assert (health[output.target_id].bitrate_kbps, health[output.target_id].dropped_frames) == (6000, 2)
+        assert session.is_running()
+        session.stop()
+
+    def test_readd_starts_a_relay_from_the_tap(self):
+        session, outputs, popen = start_session(2)
+        popen.processes[0].emit("[tee @ 0x1] Slave muxer #1 failed: Connection refused, continuing with 2/3 slaves.")
+        wait_until(lambda: not session.health()[outputs[1].target_id].alive)
+
+        session.readd(outputs[1].target_id, outputs[1].url)
+
+        relay = popen.processes[1]
+        assert arg_after(relay.args, "-i") == session.tap_reader
+        assert relay.args[-1] == outputs[1].url
+        assert session.health()[outputs[1].target_id].alive
+        assert popen.processes[0].poll() is None
+
+        relay.exit(1)
+        wait_until(lambda: not session.health()[outputs[1].target_id].alive)
+        assert session.health()[outputs[0].target_id].alive
+        session.stop()
+
+    def test_readd_refuses_live_targets_and_missing_tap(self):
+        session, outputs, _ = start_session(1)
+        with pytest.raises(SimulcastError):
+            session.readd(outputs[0].target_id, outputs[0].url)
+        session.stop()
+
+        session, outputs, _ = start_session(1, tap=False)
+        with pytest.raises(SimulcastError):
+            session.readd(uuid.uuid4(), "rtmp://127.0.0.1/live/new")
+        session.stop()
+
+    def test_encoder_exit_fails_every_target(self):
+        session, outputs, popen = start_session(3)
+
+        popen.processes[0].exit(1)
+
+        wait_until(lambda: not any(h.alive for h in session.health().values()))
+        assert not session.is_running()
+
+
+class TestSimulcastSupervisor:
+    def test_each_running_event_gets_its_own_tap_port(self):
+        supervisor = SimulcastSupervisor(tap_host="127.0.0.1", tap_port_base=27000)
+        popen = FakePopen()
+        outputs = [SimulcastOutput(uuid.uuid4(), "rtmp://127.0.0.1/live/k")]
+        first, second = uuid.uuid4(), uuid.uuid4()
+
+        a = supervisor.start(first, "in.mp4", SimulcastEncoding(), outputs, popen=popen)
+        b = supervisor.start(second, "in.mp4", SimulcastEncoding(), outputs, popen=popen)
+
+        assert a.tap_writer != b.tap_writer
+        assert supervisor.stop(first) and not supervisor.stop(first)
+        assert supervisor.get(second) is b
+        supervisor.stop(second)
+
+
+def udp_sink() -> socket.socket:
+    sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sink.bind(("127.0.0.1", 0))
+    sink.settimeout(10)
+    return sink
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="FFmpeg not installed")
+class TestTeeWithLocalSinks:
+    """A dead RTMP target does not stop delivery to the others."""
+
+    def test_failed_target_is_isolated_and_readded(self):
+        sinks = [udp_sink(), udp_sink()]
+        tap_sock = udp_sink()
+        tap_port = tap_sock.getsockname()[1]
+        tap_sock.close()
+        readd_sink = udp_sink()
+
+        outputs = [
+            SimulcastOutput(uuid.uuid4(), f"udp://127.0.0.1:{sinks[0].getsockname()[1]}"),
+            SimulcastOutput(uuid.uuid4(), "rtmp://127.0.0.1:1/live/refused"),
+            SimulcastOutput(uuid.uuid4(), f"udp://127.0.0.1:{sinks[1].getsockname()[1]}"),
+        ]
+        session = SimulcastSession(
+            uuid.uuid4(),
+            "testsrc=size=320x240:rate=30",
+            SimulcastEncoding(resolution="720p", target_bitrate=1000),
+            outputs,
+            tap=tap_urls("127.0.0.1", tap_port),
+            builder=LavfiBuilder(),
+        )
+        session.start()
+        try:
+            wait_until(lambda: not session.health()[outputs[1].target_id].alive, timeout=15)
+            for sink in sinks:
+                assert sink.recv(2048)
+            assert session.health()[outputs[0].target_id].alive
+            assert session.health()[outputs[2].target_id].alive
+
+            readd_url = f"udp://127.0.0.1:{readd_sink.getsockname()[1]}"
+            session.readd(outputs[1].target_id, readd_url)
+            assert readd_sink.recv(2048)
+            assert session.is_running()
+        finally:
+            session.stop()
+            for sink in sinks + [readd_sink]:
+                sink.close()
+
+
+class LavfiBuilder(SimulcastCommandBuilder):
+    """Reads a lavfi source and relays to UDP sinks as MPEG-TS."""
+
+    def build_simulcast_command(self, source, encoding, outputs, tap_url=None, realtime=True):
+        cmd = super().build_simulcast_command(source, encoding, outputs, tap_url, realtime)
+        cmd[cmd.index("-i"):cmd.index("-i")] = ["-f", "lavfi"]
+        cmd[-1] = cmd[-1].replace("[f=flv:onfail=ignore]udp", "[f=mpegts:onfail=ignore]udp")
+        return cmd
+
+    def build_relay_command(self, tap_url, url):
+        cmd = super().build_relay_command(tap_url, url)
+        cmd[-3:] = ["-f", "mpegts", url]
+        return cmd
@@ -0,0 +1,297 @@
+"""Property-based tests for the node-local stream source cache.
+
+**Feature: youtube-automation, Stream Source Cache**
+**Validates: Requirements 11.1**
+
+Properties:
+- Disk usage never exceeds the budget; least recently used files go first
+- Files leased to a running stream are never evicted
+- Concurrent requests for one source download it once
+- Playlist starts download every cacheable item, several at once, so
+  FFmpeg never loops over a presigned URL
+- Hits, fills and bytes served from cache are reported
+"""
+
+import os
+import threading
+import time
+import uuid
+
+import pytest
+from hypothesis import given, settings, strategies as st
+
+from app.core.metrics import (
+    STREAM_SOURCE_CACHE_FILL_BYTES_TOTAL,
+    STREAM_SOURCE_CACHE_SERVED_BYTES_TOTAL,
+)
+from app.modules.stream.source_cache import (
+    SourceCacheError,
+    StreamSourceCache,
+    resolve_sources,
+)
+
+
+class FakeStorage:
+    """Object storage stand-in counting downloads."""
+
+    def __init__(self, objects: dict[str, bytes], delay: float = 0.0, fail: bool = False):
+        self.objects = objects
+        self.delay = delay
+        self.fail = fail
+        self.downloads: list[str] = []
+        self._lock = threading.Lock()
+
+    def get_size(self, key):
+        data = self.objects.get(key)
+        return len(data) if data is not None else None
+
+    def download(self, key, destination, progress_callback=None):
+        with self._lock:
+            self.downloads.append(key)
+        time.sleep(self.delay)
+        if self.fail:
+            return False
+        with open(destination, "wb") as f:
+            f.write(self.objects[key])
+        return True
+
+
+def videos(count: int, size: int = 100) -> dict[str, bytes]:
+    return {f"videos/u/{i}.mp4": bytes([i % 256]) * size for i in range(count)}
+
+
+def make_cache(tmp_path, objects, max_bytes=1000, **storage_kwargs) -> StreamSourceCache:
+    return StreamSourceCache(str(tmp_path / uuid.uuid4().hex), max_bytes, FakeStorage(objects, **storage_kwargs))
+
+
+class TestLruBudget:
+    """The cache stays within its byte budget."""
+
+    @given(requests=st.lists(st.integers(min_value=0, max_value=9), min_size=1, max_size=40))
+    @settings(max_examples=50, deadline=None)
+    def test_usage_within_budget_and_contents_are_exact(self, tmp_path_factory, requests):
+        objects = videos(10)
+        cache = make_cache(tmp_path_factory.mktemp("cache"), objects, max_bytes=350)
+
+        for index in requests:
+            key = f"videos/u/{index}.mp4"
+            path = cache.fetch(key)
+            with open(path, "rb") as f:
+                assert f.read() == objects[key]
+            assert cache.usage_bytes() <= 350
+
+    def test_least_recently_used_is_evicted(self, tmp_path):
+        cache = make_cache(tmp_path, videos(4), max_bytes=300)
+        for index in (0, 1, 2):
+            cache.fetch(f"videos/u/{index}.mp4")
+            time.sleep(0.01)
+        cache.get("videos/u/0.mp4")  # 1 is now the oldest
+
+        cache.fetch("videos/u/3.mp4")
+
+        assert [cache.is_cached(f"videos/u/{i}.mp4") for i in range(4)] == [True, False, True, True]
+
+    def test_oversized_source_is_rejected(self, tmp_path):
+        cache = make_cache(tmp_path, {"videos/big.mp4": b"x" * 2000})
+
+        with pytest.raises(SourceCacheError):
+            cache.fetch("videos/big.mp4")
+        assert cache.usage_bytes() == 0
+
+    def test_failed_download_leaves_nothing_behind(self, tmp_path):
+        cache = make_cache(tmp_path, videos(1), fail=True)
+
+        with pytest.raises(SourceCacheError):
+            cache.fetch("videos/u/0.mp4", job_id="job")
+
+        assert cache.usage_bytes() == 0
+        assert cache.leased_paths("job") == []
+
+
+class TestLeases:
+    """In-use files are reference-counted and never evicted."""
+
+    @given(
+        leased=st.sets(st.integers(min_value=0, max_value=4), max_size=3),
+        later=st.lists(st.integers(min_value=5, max_value=9), min_size=1, max_size=10),
+    )
+    @settings(max_examples=40, deadline=None)
+    def test_leased_files_survive_eviction(self, tmp_path_factory, leased, later):
+        cache = make_cache(tmp_path_factory.mktemp("cache"), videos(10), max_bytes=500)
+        for index in leased:
+            cache.fetch(f"videos/u/{index}.mp4", job_id="running")
+
+        for index in later:
+            cache.fetch(f"videos/u/{index}.mp4")
+
+        assert all(cache.is_cached(f"videos/u/{index}.mp4") for index in leased)
+
+    def test_full_of_leased_files_refuses_new_sources(self, tmp_path):
+        cache = make_cache(tmp_path, videos(3), max_bytes=200)
+        cache.fetch("videos/u/0.mp4", job_id="a")
+        cache.fetch("videos/u/1.mp4", job_id="b")
+
+        with pytest.raises(SourceCacheError, match="full"):
+            cache.fetch("videos/u/2.mp4")
+
+        cache.release("a")
+        assert cache.fetch("videos/u/2.mp4")
+        assert not cache.is_cached("videos/u/0.mp4")
+
+    def test_inactive_leases_released_after_grace(self, tmp_path):
+        cache = make_cache(tmp_path, videos(2))
+        cache.fetch("videos/u/0.mp4", job_id="alive")
+        cache.fetch("videos/u/1.mp4", job_id="crashed")
+
+        assert cache.release_inactive(["alive"]) == 0  # still within grace
+        assert cache.release_inactive(["alive"], grace_seconds=-1) == 1
+        assert cache.leased_paths("crashed") == []
+        assert len(cache.leased_paths("alive")) == 1
+
+
+class TestConcurrentFetch:
+    """One download per source, however many streams ask at once."""
+
+    def test_same_source_downloaded_once(self, tmp_path):
+        storage_objects = videos(1)
+        cache = make_cache(tmp_path, storage_objects, delay=0.1)
+        paths = []
+
+        threads = [
+            threading.Thread(target=lambda i=i: paths.append(cache.fetch("videos/u/0.mp4", job_id=f"job-{i}")))
+            for i in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert cache.storage.downloads == ["videos/u/0.mp4"]
+        assert len(set(paths)) == 1
+        assert cache.stats()["hits"] == 4 and cache.stats()["misses"] == 1
+
+    def test_non_waiting_fetch_skips_download_in_progress(self, tmp_path):
+        cache = make_cache(tmp_path, videos(1), delay=0.2)
+        worker = threading.Thread(target=cache.fetch, args=("videos/u/0.mp4",))
+        worker.start()
+        time.sleep(0.05)
+
+        assert cache.fetch("videos/u/0.mp4", wait=False) is None
+        worker.join()
+        assert cache.storage.downloads == ["videos/u/0.mp4"]
+
+
+class TestPlaylistStart:
+    """Starting a playlist downloads every cacheable item first."""
+
+    @given(count=st.integers(min_value=1, max_value=8), concurrency=st.integers(min_value=0, max_value=4))
+    @settings(max_examples=40, deadline=None)
+    def test_every_item_downloaded_before_start(self, tmp_path_factory, count, concurrency):
+        objects = videos(count)
+        cache = make_cache(tmp_path_factory.mktemp("cache"), objects, max_bytes=10_000)
+        keys = list(objects) * 2  # a playlist may repeat a video
+
+        paths = resolve_sources(cache, "job", keys, concurrency)
+
+        assert sorted(cache.storage.downloads) == sorted(objects)
+        assert paths == [str(cache.path_for(key)) for key in keys]
+        assert all(os.path.exists(path) for path in paths)
+        assert sorted(cache.leased_paths("job")) == sorted(str(cache.path_for(key)) for key in objects)
+
+    def test_downloads_run_concurrently(self, tmp_path):
+        cache = make_cache(tmp_path, videos(4), delay=0.2)
+
+        started = time.monotonic()
+        resolve_sources(cache, "job", list(videos(4)), 4)
+
+        assert time.monotonic() - started < 0.6
+
+    def test_uncacheable_sources_fall_back_to_storage(self, tmp_path):
+        objects = {"videos/small.mp4": b"s" * 10, "videos/huge.mp4": b"h" * 5000}
+        cache = make_cache(tmp_path, objects, max_bytes=1000)
+
+        paths = resolve_sources(cache, "job", ["videos/huge.mp4", "videos/small.mp4", "videos/huge.mp4"], 2)
+
+        assert paths == [None, str(cache.path_for("videos/small.mp4")), None]
+        assert cache.storage.downloads == ["videos/small.mp4"]
+
+    def test_prefetched_sources_are_hits_on_next_start(self, tmp_path):
+        objects = videos(3)
+        cache = make_cache(tmp_path, objects)
+        for key in objects:
+            cache.fetch(key)
+
+        paths = resolve_sources(cache, "job", list(objects), 2)
+
+        assert all(os.path.exists(path) for path in paths)
+        assert len(cache.storage.downloads) == 3
+
+
+class TestEgressAccounting:
+    """Fills and bytes served from cache are counted."""
+
+    def test_fill_bytes_counted_once_per_download(self, tmp_path):
+        cache = make_cache(tmp_path, videos(2))
+        before = STREAM_SOURCE_CACHE_FILL_BYTES_TOTAL._value.get()
+
+        for _ in range(3):
+            cache.fetch("videos/u/0.mp4")
+            cache.fetch("videos/u/1.mp4")
+
+        assert STREAM_SOURCE_CACHE_FILL_BYTES_TOTAL._value.get() - before == 200
+        assert cache.stats()["hit_ratio"] == pytest.approx(4 / 6)
+
+    @given(samples=st.lists(st.integers(min_value=0, max_value=10**9), min_size=1, max_size=20))
+    @settings(max_examples=40, deadline=None)
+    def test_served_bytes_follow_monotonic_read_counter(self, tmp_path_factory, samples):
+        cache = make_cache(tmp_path_factory.mktemp("cache"), {})
+        cache.track_reads("job", pid=42)
+        before = STREAM_SOURCE_CACHE_SERVED_BYTES_TOTAL._value.get()
+        counter = 0
+
+        for increment in samples:
+            counter += increment
+            cache.record_reads("job", 42, counter)
+
+        assert STREAM_SOURCE_CACHE_SERVED_BYTES_TOTAL._value.get() - before == counter
+
+    def test_untracked_streams_are_not_counted(self, tmp_path):
+        cache = make_cache(tmp_path, {})
+
+        assert cache.record_reads("job", 42, 10_000) == 0
+
+
+MINIO_ENDPOINT = os.environ.get("STREAM_CACHE_TEST_MINIO_ENDPOINT")
+
+
+@pytest.mark.skipif(not MINIO_ENDPOINT, reason="set STREAM_CACHE_TEST_MINIO_ENDPOINT to run against MinIO")
+class TestAgainstMinio:
+    """The cache fills from a real S3-compatible store.
+
+    docker run -d -p 9000:9000 minio/minio server /data
+    STREAM_CACHE_TEST_MINIO_ENDPOINT=http://localhost:9000 pytest tests/stream/test_source_cache_property.py
+    """
+
+    def test_fill_and_hit(self, tmp_path):
+        from app.core.storage import S3Storage, StorageConfig
+
+        storage = S3Storage(StorageConfig(
+            backend="minio", bucket="stream-cache-test", endpoint_url=MINIO_ENDPOINT,
+            access_key="minioadmin", secret_key="minioadmin", use_ssl=False,
+        ))
+        client = storage._get_client()
+        try:
+            client.head_bucket(Bucket="stream-cache-test")
+        except Exception:
+            client.create_bucket(Bucket="stream-cache-test")
+        data = os.urandom(3 * 1024 * 1024)
+        client.put_object(Bucket="stream-cache-test", Key="videos/loop.mp4", Body=data)
+        cache = StreamSourceCache(str(tmp_path), 10 * 1024 * 1024, storage)
+
+        first = cache.fetch("videos/loop.mp4", job_id="job")
+        second = cache.fetch("videos/loop.mp4", job_id="job")
+
+        assert first == second
+        with open(first, "rb") as f:
+            assert f.read() == data
+        assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
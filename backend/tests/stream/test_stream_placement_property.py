@@ -0,0 +1,269 @@
+"""Property-based tests for capacity-aware stream placement.
+
+**Feature: video-streaming, Stream Placement**
+**Validates: Requirements 3.2, 3.3**
+
+Properties:
+- Stream units grow with resolution, frame rate and bitrate, and a stream
+  copy or a hardware encode costs less than a software encode
+- Only nodes within every limit are candidates, ranked by the policy
+- Concurrent placements never reserve more than a node offers
+- Reservations on lost nodes are released, and only those
+"""
+
+import asyncio
+from collections import defaultdict
+
+import pytest
+from hypothesis import given, settings, strategies as st
+
+from app.modules.stream.placement import (
+    BIN_PACK,
+    DECISIONS_KEY,
+    LEAST_LOADED,
+    MAX_DECISIONS,
+    RESERVED_JOBS_KEY,
+    NodeUtilization,
+    StreamDemand,
+    StreamPlacer,
+    _RELEASE_SCRIPT,
+    _RESERVE_SCRIPT,
+    node_reservations_key,
+    rank_nodes,
+)
+from app.modules.stream.supervisor import NodeCapacity, StreamNodeRegistry
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeRedis:
+    """In-memory Redis for the registry and placer.
+
+    Reads yield to other tasks, so concurrent placements race. Scripts run
+    without yielding, so they are atomic as in Redis; they are emulated by
+    identity.
+    """
+
+    def __init__(self):
+        self.lists: dict[str, list[str]] = defaultdict(list)
+        self.zsets: dict[str, dict[str, float]] = defaultdict(dict)
+        self.hashes: dict[str, dict[str, str]] = defaultdict(dict)
+        self.strings: dict[str, str] = {}
+
+    async def zadd(self, key, mapping):
+        self.zsets[key].update(mapping)
+
+    async def zremrangebyscore(self, key, low, high):
+        for member, score in list(self.zsets[key].items()):
+            if score <= float(high):
+                del self.zsets[key][member]
+
+    async def zrangebyscore(self, key, low, high):
+        return [m for m, s in sorted(self.zsets[key].items(), key=lambda i: i[1]) if s >= float(low)]
+
+    async def set(self, key, value, px=None):
+        self.strings[key] = value
+
+    async def mget(self, keys):
+        return [self.strings.get(key) for key in keys]
+
+    async def hgetall(self, key):
+        snapshot = dict(self.hashes[key])
+        await asyncio.sleep(0)  # let concurrent placements interleave
+        return snapshot
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.strings.pop(key, None)
+            self.hashes.pop(key, None)
+
+    async def lpush(self, key, value):
+        self.lists[key].insert(0, value)
+
+    async def ltrim(self, key, start, end):
+        self.lists[key] = self.lists[key][start:end + 1]
+
+    async def lrange(self, key, start, end):
+        return list(self.lists[key][start:end + 1])
+
+    async def eval(self, script, numkeys, *args):
+        reservations, jobs = (self.hashes[key] for key in args[:numkeys])
+        argv = [str(a) for a in args[numkeys:]]
+        if script == _RESERVE_SCRIPT:
+            job_id, units, capacity, node_id = argv[0], float(argv[1]), float(argv[2]), argv[3]
+            used = sum(float(u) for u in reservations.values()) - float(reservations.get(job_id, 0))
+            if capacity > 0 and used + units > capacity + 1e-6:
+                return 0
+            reservations[job_id] = argv[1]
+            jobs[job_id] = node_id
+            return 1
+        if script == _RELEASE_SCRIPT:
+            job_id, node_id = argv
+            if jobs.get(job_id) == node_id:
+                del jobs[job_id]
+            return 1 if reservations.pop(job_id, None) is not None else 0
+        raise AssertionError("unknown script")
+
+
+def node(node_id, capacity_units=8.0, **kwargs) -> NodeCapacity:
+    kwargs.setdefault("max_streams", 100)
+    return NodeCapacity(node_id, capacity_units=capacity_units, **kwargs)
+
+
+demands = st.builds(
+    StreamDemand,
+    width=st.sampled_from([1280, 1920, 2560, 3840]),
+    height=st.sampled_from([720, 1080, 1440, 2160]),
+    fps=st.sampled_from([24, 30, 60]),
+    bitrate_kbps=st.integers(min_value=500, max_value=50000),
+    stream_copy=st.booleans(),
+)
+
+
+class TestStreamUnits:
+    """Costs follow the work FFmpeg does."""
+
+    def test_reference_stream_is_one_unit_plus_transfer(self):
+        assert StreamDemand(1280, 720, 30, 0).units() == 1.0
+
+    @given(demand=demands, more_pixels=st.integers(min_value=1, max_value=3), more_kbps=st.integers(1, 10000))
+    def test_units_grow_with_work(self, demand, more_pixels, more_kbps):
+        bigger = StreamDemand(
+            demand.width * more_pixels, demand.height, demand.fps, demand.bitrate_kbps + more_kbps, demand.stream_copy
+        )
+        assert bigger.units() > demand.units()
+
+    @given(demand=demands)
+    def test_copy_and_hardware_are_cheaper(self, demand):
+        encode = StreamDemand(demand.width, demand.height, demand.fps, demand.bitrate_kbps)
+        copy = StreamDemand(demand.width, demand.height, demand.fps, demand.bitrate_kbps, stream_copy=True)
+
+        assert copy.units() < encode.units("h264_nvenc") < encode.units("libx264")
+        assert copy.units("h264_nvenc") == copy.units("libx264")
+
+
+class TestRanking:
+    """Candidates are within every limit, best first under the policy."""
+
+    @given(
+        reserved=st.lists(st.integers(min_value=0, max_value=80).map(lambda r: r / 10), min_size=1, max_size=8),
+        demand=demands,
+        policy=st.sampled_from([LEAST_LOADED, BIN_PACK]),
+    )
+    @settings(max_examples=100)
+    def test_ranked_nodes_fit_and_are_ordered(self, reserved, demand, policy):
+        nodes = [NodeUtilization(node(f"n{i}"), reserved_units=r) for i, r in enumerate(reserved)]
+
+        ranked = rank_nodes(nodes, demand, policy)
+
+        units = demand.units()
+        assert {n.node.node_id for n in ranked} == {n.node.node_id for n in nodes if n.reserved_units + units <= 8.0 + 1e-6}
+        key = (lambda n: 8.0 - n.reserved_units) if policy == BIN_PACK else (lambda n: n.reserved_units)
+        assert [key(n) for n in ranked] == sorted(key(n) for n in ranked)
+
+    def test_limits_other_than_units_exclude_nodes(self):
+        demand = StreamDemand()
+        nodes = [
+            NodeUtilization(node("busy-cpu", cpu_percent=90.0, max_cpu_percent=85.0)),
+            NodeUtilization(node("full", streams=3, max_streams=3)),
+            NodeUtilization(node("no-sessions", encoder="h264_nvenc", encoder_sessions=3, max_encoder_sessions=3)),
+            NodeUtilization(node("silent", capacity_units=0.0)),
+            NodeUtilization(node("ok")),
+        ]
+
+        assert [n.node.node_id for n in rank_nodes(nodes, demand)] == ["ok"]
+        # Stream copy does not need an encoder session
+        copy = StreamDemand(stream_copy=True)
+        assert [n.node.node_id for n in rank_nodes(nodes, copy)] == ["no-sessions", "ok"]
+
+
+async def make_placer(capacities: dict[str, float], clock=None) -> StreamPlacer:
+    clock = clock or FakeClock()
+    registry = StreamNodeRegistry(FakeRedis(), clock=clock)
+    for node_id, capacity_units in capacities.items():
+        await registry.heartbeat(node(node_id, capacity_units), ttl_seconds=20)
+    return StreamPlacer(registry, clock=clock)
+
+
+@pytest.mark.asyncio
+class TestPlacer:
+    """Reservations are atomic and follow the nodes."""
+
+    @given(
+        capacities=st.lists(st.integers(min_value=1, max_value=12), min_size=1, max_size=4),
+        jobs=st.lists(demands, min_size=1, max_size=30),
+        policy=st.sampled_from([LEAST_LOADED, BIN_PACK]),
+    )
+    @settings(max_examples=50, deadline=None)
+    async def test_concurrent_placements_never_overcommit(self, capacities, jobs, policy):
+        placer = await make_placer({f"n{i}": float(c) for i, c in enumerate(capacities)})
+
+        decisions = await asyncio.gather(*(
+            placer.place(f"job-{i}", demand, policy) for i, demand in enumerate(jobs)
+        ))
+
+        for usage in await placer.nodes():
+            assert usage.reserved_units <= usage.node.capacity_units + 1e-6
+        placed = {d.job_id: d.node_id for d in decisions if d.node_id}
+        assert await placer.redis.hgetall(RESERVED_JOBS_KEY) == placed
+
+    async def test_policies_spread_or_pack(self):
+        spread = await make_placer({"a": 4.0, "b": 4.0})
+        packed = await make_placer({"a": 4.0, "b": 4.0})
+
+        spread_nodes = [(await spread.place(f"j{i}", StreamDemand(), LEAST_LOADED)).node_id for i in range(2)]
+        packed_nodes = [(await packed.place(f"j{i}", StreamDemand(), BIN_PACK)).node_id for i in range(2)]
+
+        assert sorted(spread_nodes) == ["a", "b"]
+        assert packed_nodes[0] == packed_nodes[1]
+
+    async def test_no_room_leaves_job_unplaced(self):
+        placer = await make_placer({"a": 1.0})
+
+        decision = await placer.place("big", StreamDemand(3840, 2160, 60, 20000))
+
+        assert decision.node_id is None and decision.candidates == 0
+        assert (await placer.recent_decisions())[0].job_id == "big"
+
+    async def test_node_corrects_the_estimate(self):
+        placer = await make_placer({"a": 4.0})
+        await placer.place("j1", StreamDemand())
+
+        assert await placer.reserve("a", "j1", 0.2)
+
+        assert (await placer.nodes())[0].reserved_units == 0.2
+
+    async def test_dead_node_reservations_are_released(self):
+        clock = FakeClock()
+        placer = await make_placer({"a": 4.0, "b": 4.0}, clock=clock)
+        await placer.place("j1", StreamDemand(), LEAST_LOADED)
+        await placer.place("j2", StreamDemand(), LEAST_LOADED)
+        owners = await placer.redis.hgetall(RESERVED_JOBS_KEY)
+
+        released = await placer.release_dead_nodes(["a"])
+
+        assert released == {"b": [job for job, n in owners.items() if n == "b"]}
+        assert set((await placer.redis.hgetall(RESERVED_JOBS_KEY)).values()) == {"a"}
+        assert await placer.redis.hgetall(node_reservations_key("b")) == {}
+
+    async def test_release_only_by_the_owner(self):
+        placer = await make_placer({"a": 4.0})
+        await placer.place("j1", StreamDemand())
+
+        assert not await placer.release("j1", "b")
+        assert await placer.release("j1", "a")
+        assert await placer.redis.hgetall(RESERVED_JOBS_KEY) == {}
+
+    async def test_decision_log_is_bounded(self):
+        placer = await make_placer({"a": 1000.0})
+        for i in range(MAX_DECISIONS + 5):
+            await placer.place(f"j{i}", StreamDemand(stream_copy=True))
+
+        assert len(placer.redis.lists[DECISIONS_KEY]) == MAX_DECISIONS
+        assert (await placer.recent_decisions(1))[0].job_id == f"j{MAX_DECISIONS + 4}"
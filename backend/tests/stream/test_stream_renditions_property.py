@@ -0,0 +1,271 @@
+"""Property-based tests for stream-ready renditions.
+
+**Feature: video-streaming, Stream-ready Renditions**
+**Validates: Requirements 10.1, 10.2, 10.3, 10.4**
+
+Properties:
+- Jobs with the same output settings share a spec key; any setting change
+  gives a different key
+- The rendition encode matches the live encode's scale, rate control, fps
+  and GOP, with a fixed GOP and an audio track even for silent sources
+- With a rendition, single and playlist commands copy instead of encoding
+- A job streams renditions only when every source has a ready one
+"""
+
+import json
+import shutil
+import subprocess
+import uuid
+from unittest.mock import MagicMock
+
+import pytest
+from hypothesis import given, settings, strategies as st
+from sqlalchemy.dialects import postgresql
+
+from app.modules.stream.ffmpeg_builder import (
+    RESOLUTION_SCALE,
+    FFmpegCommandBuilder,
+    FFmpegPlaylistCommandBuilder,
+    validate_ffmpeg_command,
+)
+from app.modules.stream.renditions import (
+    RenditionSpec,
+    build_rendition_command,
+    claim_statement,
+    ready_renditions,
+    rendition_storage_key,
+)
+from app.modules.stream.stream_job_models import (
+    EncodingMode,
+    LoopMode,
+    Resolution,
+    StreamJob,
+)
+
+
+resolution_strategy = st.sampled_from([r.value for r in Resolution])
+fps_strategy = st.sampled_from([24, 30, 60])
+bitrate_strategy = st.integers(min_value=1000, max_value=10000)
+encoding_mode_strategy = st.sampled_from([m.value for m in EncodingMode])
+
+
+def create_test_job(
+    resolution: str = Resolution.RES_1080P.value,
+    target_bitrate: int = 6000,
+    target_fps: int = 30,
+    encoding_mode: str = EncodingMode.CBR.value,
+    loop_mode: str = LoopMode.INFINITE.value,
+    title: str = "Test Stream",
+) -> StreamJob:
+    """Create a test StreamJob with given parameters."""
+    job = StreamJob(
+        id=uuid.uuid4(),
+        user_id=uuid.uuid4(),
+        account_id=uuid.uuid4(),
+        video_path="/test/video.mp4",
+        title=title,
+        loop_mode=loop_mode,
+        resolution=resolution,
+        target_bitrate=target_bitrate,
+        target_fps=target_fps,
+        encoding_mode=encoding_mode,
+        rtmp_url="rtmp://a.rtmp.youtube.com/live2",
+    )
+    job.stream_key = "test-stream-key"
+    return job
+
+
+def arg_after(cmd: list[str], flag: str) -> str:
+    return cmd[cmd.index(flag) + 1]
+
+
+class TestRenditionSpec:
+    """Renditions are keyed by the settings they were encoded to."""
+
+    @given(
+        resolution=resolution_strategy,
+        fps=fps_strategy,
+        bitrate=bitrate_strategy,
+        encoding_mode=encoding_mode_strategy,
+        title=st.text(max_size=20),
+    )
+    @settings(max_examples=50, deadline=None)
+    def test_key_depends_only_on_output_settings(self, resolution, fps, bitrate, encoding_mode, title):
+        job = create_test_job(resolution, bitrate, fps, encoding_mode, title=title)
+        twin = create_test_job(resolution, bitrate, fps, encoding_mode, loop_mode=LoopMode.NONE.value)
+
+        assert RenditionSpec.for_job(job).key == RenditionSpec.for_job(twin).key
+
+    @given(
+        a=st.tuples(resolution_strategy, bitrate_strategy, fps_strategy, encoding_mode_strategy),
+        b=st.tuples(resolution_strategy, bitrate_strategy, fps_strategy, encoding_mode_strategy),
+    )
+    @settings(max_examples=100, deadline=None)
+    def test_different_settings_never_share_a_key(self, a, b):
+        spec_a = RenditionSpec.for_job(create_test_job(*a))
+        spec_b = RenditionSpec.for_job(create_test_job(*b))
+
+        assert (spec_a == spec_b) == (spec_a.key == spec_b.key)
+        assert (spec_a == spec_b) == (
+            rendition_storage_key("videos/u/a.mp4", spec_a) == rendition_storage_key("videos/u/a.mp4", spec_b)
+        )
+
+    def test_storage_key_is_per_source(self):
+        spec = RenditionSpec.for_job(create_test_job())
+
+        first = rendition_storage_key("videos/u/a.mp4", spec)
+        second = rendition_storage_key("videos/u/b.mp4", spec)
+
+        assert first != second
+        assert first.startswith(f"renditions/{spec.key}/") and first.endswith(".mp4")
+
+
+class TestRenditionCommand:
+    """The offline encode produces what the live encode would."""
+
+    @given(
+        resolution=resolution_strategy,
+        fps=fps_strategy,
+        bitrate=bitrate_strategy,
+        encoding_mode=encoding_mode_strategy,
+    )
+    @settings(max_examples=50, deadline=None)
+    def test_matches_live_encode_settings(self, resolution, fps, bitrate, encoding_mode):
+        job = create_test_job(resolution, bitrate, fps, encoding_mode)
+        spec = RenditionSpec.for_job(job)
+
+        cmd = build_rendition_command("in.mov", "out.mp4", spec, preset="veryfast")
+
+        assert arg_after(cmd, "-c:v") == "libx264"
+        assert arg_after(cmd, "-b:v") == f"{bitrate}k"
+        assert arg_after(cmd, "-r") == str(fps)
+        assert arg_after(cmd, "-g") == arg_after(cmd, "-keyint_min") == str(fps * 2)
+        assert arg_after(cmd, "-sc_threshold") == "0"
+        assert f"scale={RESOLUTION_SCALE[resolution]}" in arg_after(cmd, "-vf")
+        assert arg_after(cmd, "-c:a") == "aac"
+        assert arg_after(cmd, "-ar") == "44100"
+        if encoding_mode == EncodingMode.CBR.value:
+            assert arg_after(cmd, "-maxrate") == arg_after(cmd, "-minrate") == f"{bitrate}k"
+        assert cmd[-1] == "out.mp4"
+
+    def test_silent_source_gets_an_audio_track(self):
+        spec = RenditionSpec.for_job(create_test_job())
+
+        cmd = build_rendition_command("in.mp4", "out.mp4", spec, has_audio=False)
+
+        assert "anullsrc" in " ".join(cmd)
+        assert "1:a:0" in cmd and "-shortest" in cmd
+
+
+class TestStreamCopyCommands:
+    """Streams with renditions are sent without re-encoding."""
+
+    @given(resolution=resolution_strategy, fps=fps_strategy, loop_mode=st.sampled_from([m.value for m in LoopMode]))
+    @settings(max_examples=30, deadline=None)
+    def test_single_video_is_copied(self, resolution, fps, loop_mode):
+        job = create_test_job(resolution, target_fps=fps, loop_mode=loop_mode)
+        builder = FFmpegCommandBuilder()
+
+        cmd = builder.build_streaming_command(job, input_path="/cache/r.mp4", stream_copy=True)
+
+        assert arg_after(cmd, "-i") == "/cache/r.mp4"
+        assert arg_after(cmd, "-c:v") == "copy" and arg_after(cmd, "-c:a") == "copy"
+        assert "-vf" not in cmd and "-b:v" not in cmd
+        assert "-stream_loop" in cmd and "-re" in cmd
+        assert validate_ffmpeg_command(cmd) == (True, None)
+
+    def test_playlist_is_concatenated_and_copied(self, tmp_path):
+        job = create_test_job()
+        builder = FFmpegPlaylistCommandBuilder()
+        builder.concat_builder.temp_dir = str(tmp_path)
+
+        cmd, concat_path = builder.build_playlist_command(job, ["/r/a.mp4", "/r/b.mp4"], stream_copy=True)
+
+        assert arg_after(cmd, "-f") == "concat"
+        assert arg_after(cmd, "-c:v") == "copy"
+        assert "-vf" not in cmd
+        assert open(concat_path).read() == "file '/r/a.mp4'\nfile '/r/b.mp4'\n"
+
+
+class RowsSession:
+    """Session returning fixed (source_key, storage_key) rows."""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def execute(self, statement, *args, **kwargs):
+        result = MagicMock()
+        result.all.return_value = self.rows
+        return result
+
+
+@pytest.mark.asyncio
+class TestReadyRenditions:
+    """Stream copy needs a ready rendition for every source."""
+
+    @given(keys=st.lists(st.sampled_from(["a", "b", "c", "d"]), min_size=1, max_size=6), data=st.data())
+    @settings(max_examples=50, deadline=None)
+    async def test_all_or_nothing(self, keys, data):
+        ready = data.draw(st.sets(st.sampled_from(["a", "b", "c", "d"])))
+        rows = [(key, f"renditions/x/{key}.mp4") for key in sorted(ready)]
+        spec = RenditionSpec.for_job(create_test_job())
+
+        renditions = await ready_renditions(RowsSession(rows), keys, spec)
+
+        if set(keys) <= ready:
+            assert {key: renditions[key] for key in keys} == {key: f"renditions/x/{key}.mp4" for key in keys}
+        else:
+            assert renditions is None
+
+    async def test_no_sources_means_no_renditions(self):
+        spec = RenditionSpec.for_job(create_test_job())
+
+        assert await ready_renditions(RowsSession([]), [], spec) is None
+
+
+class TestClaim:
+    """Each rendition is encoded by one worker at a time."""
+
+    def test_claim_only_takes_over_stale_unfinished_renditions(self):
+        spec = RenditionSpec.for_job(create_test_job())
+
+        sql = str(claim_statement("videos/u/a.mp4", spec).compile(dialect=postgresql.dialect()))
+
+        assert "ON CONFLICT ON CONSTRAINT uq_stream_renditions_source_spec DO UPDATE" in sql
+        assert "stream_renditions.status !=" in sql
+        assert "stream_renditions.updated_at <" in sql
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None or shutil.which("ffprobe") is None, reason="FFmpeg not installed")
+class TestRenditionEncode:
+    """Encoding a testsrc clip yields a copyable rendition."""
+
+    def test_testsrc_rendition_has_fixed_gop_and_audio(self, tmp_path):
+        source = tmp_path / "source.mp4"
+        subprocess.run(
+            ["ffmpeg", "-hide_banner", "-y", "-f", "lavfi", "-i", "testsrc=size=640x360:rate=30:duration=4",
+             "-c:v", "libx264", "-preset", "ultrafast", str(source)],
+            check=True, capture_output=True,
+        )
+        spec = RenditionSpec(width=1280, height=720, fps=30, bitrate_k=2500, encoding_mode=EncodingMode.CBR.value)
+        output = tmp_path / "rendition.mp4"
+
+        subprocess.run(
+            build_rendition_command(str(source), str(output), spec, has_audio=False, preset="ultrafast"),
+            check=True, capture_output=True,
+        )
+
+        probe = json.loads(subprocess.run(
+            ["ffprobe", "-v", "quiet", "-print_format", "json", "-show_streams",
+             "-select_streams", "v:0", "-show_entries", "frame=key_frame", str(output)],
+            check=True, capture_output=True, text=True,
+        ).stdout)
+        keyframes = [i for i, frame in enumerate(probe["frames"]) if frame["key_frame"]]
+        assert keyframes == list(range(0, len(probe["frames"]), spec.gop))
+        assert (probe["streams"][0]["width"], probe["streams"][0]["height"]) == (1280, 720)
+
+        streams = json.loads(subprocess.run(
+            ["ffprobe", "-v", "quiet", "-print_format", "json", "-show_streams", str(output)],
+            check=True, capture_output=True, text=True,
+        ).stdout)["streams"]
+        assert [s["codec_name"] for s in streams] == ["h264", "aac"]
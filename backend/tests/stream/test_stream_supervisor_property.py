@@ -0,0 +1,486 @@
+"""Property-based tests for the per-node stream supervisor.
+
+**Feature: video-streaming, Stream Node Supervisor**
+**Validates: Requirements 1.2, 1.3, 3.2, 3.3, 3.4, 4.1**
+
+Properties:
+- FFmpeg -progress blocks parse into the same metrics as stats lines
+- A node's own commands come before shared starts, and it only takes
+  shared starts while it has room
+- Commands stay pending until acknowledged and survive a supervisor crash
+- An FFmpeg that exits unexpectedly is restarted with backoff; a stopped
+  one is not
+- A stream whose job was stopped or re-placed on another node is stopped
+- Stopping the supervisor hands its jobs to other nodes
+"""
+
+import asyncio
+import shutil
+import sys
+import time
+from collections import defaultdict
+from typing import Optional
+
+import pytest
+from hypothesis import given, settings, strategies as st
+
+from app.modules.stream.placement import RESERVED_JOBS_KEY, _RELEASE_SCRIPT, _RESERVE_SCRIPT
+from app.modules.stream.supervisor import (
+    NODES_KEY,
+    SHARED_COMMANDS_KEY,
+    START_STREAM,
+    STOP_STREAM,
+    NodeCapacity,
+    ProgressParser,
+    StreamCommand,
+    StreamLaunch,
+    StreamNodeRegistry,
+    StreamSupervisor,
+    node_commands_key,
+    node_processing_key,
+    restart_delay,
+    with_progress_pipe,
+)
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeRedis:
+    """In-memory lists, sorted sets, hashes and strings for the node registry.
+
+    The placement scripts are emulated by identity.
+    """
+
+    def __init__(self):
+        self.lists: dict[str, list[str]] = defaultdict(list)
+        self.zsets: dict[str, dict[str, float]] = defaultdict(dict)
+        self.hashes: dict[str, dict[str, str]] = defaultdict(dict)
+        self.strings: dict[str, str] = {}
+
+    async def lpush(self, key, value):
+        self.lists[key].insert(0, value)
+
+    async def rpush(self, key, value):
+        self.lists[key].append(value)
+
+    async def lrange(self, key, start, end):
+        return list(self.lists[key][start:end + 1 if end >= 0 else None])
+
+    async def lrem(self, key, count, value):
+        if value in self.lists[key]:
+            self.lists[key].remove(value)
+            return 1
+        return 0
+
+    async def lmove(self, source, destination, src, dest):
+        assert (src, dest) == ("RIGHT", "LEFT")
+        if not self.lists[source]:
+            return None
+        value = self.lists[source].pop()
+        self.lists[destination].insert(0, value)
+        return value
+
+    async def blmove(self, source, destination, timeout, src, dest):
+        value = await self.lmove(source, destination, src, dest)
+        if value is None:
+            await asyncio.sleep(min(timeout, 0.01))
+        return value
+
+    async def zadd(self, key, mapping):
+        self.zsets[key].update(mapping)
+
+    async def zrem(self, key, member):
+        return int(self.zsets[key].pop(member, None) is not None)
+
+    async def zremrangebyscore(self, key, low, high):
+        high = float(high)
+        for member, score in list(self.zsets[key].items()):
+            if score <= high:
+                del self.zsets[key][member]
+
+    async def zrangebyscore(self, key, low, high):
+        low = float(low)
+        return [m for m, s in sorted(self.zsets[key].items(), key=lambda i: i[1]) if s >= low]
+
+    async def set(self, key, value, px=None):
+        self.strings[key] = value
+
+    async def mget(self, keys):
+        return [self.strings.get(key) for key in keys]
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.strings.pop(key, None)
+            self.hashes.pop(key, None)
+
+    async def eval(self, script, numkeys, *args):
+        reservations, jobs = (self.hashes[key] for key in args[:numkeys])
+        job_id, *argv = [str(a) for a in args[numkeys:]]
+        if script == _RESERVE_SCRIPT:
+            reservations[job_id] = argv[0]
+            jobs[job_id] = argv[2]
+            return 1
+        assert script == _RELEASE_SCRIPT
+        if jobs.get(job_id) == argv[0]:
+            del jobs[job_id]
+        return 1 if reservations.pop(job_id, None) is not None else 0
+
+
+def progress_block(frame: int, fps: float, kbps: float, dropped: int, end: bool = False) -> list[str]:
+    return [
+        f"frame={frame}",
+        f"fps={fps:.2f}",
+        "stream_0_0_q=28.0",
+        f"bitrate={kbps:.1f}kbits/s",
+        "total_size=2048000",
+        "out_time_us=10000000",
+        "out_time=00:00:10.000000",
+        "dup_frames=0",
+        f"drop_frames={dropped}",
+        "speed=1.00x",
+        f"progress={'end' if end else 'continue'}",
+    ]
+
+
+class TestProgressParser:
+    """-progress output is read block by block."""
+
+    @given(
+        frame=st.integers(min_value=0, max_value=10**7),
+        fps=st.floats(min_value=0, max_value=120, allow_nan=False),
+        kbps=st.floats(min_value=0, max_value=50000, allow_nan=False),
+        dropped=st.integers(min_value=0, max_value=10**5),
+    )
+    @settings(max_examples=100)
+    def test_block_parses_to_metrics(self, frame, fps, kbps, dropped):
+        parser = ProgressParser()
+        results = [parser.feed(line + "\n") for line in progress_block(frame, fps, kbps, dropped)]
+
+        assert results[:-1] == [None] * (len(results) - 1)
+        progress = results[-1]
+        assert progress.metrics.frame_count == frame
+        assert progress.metrics.fps == pytest.approx(round(fps, 2))
+        assert progress.metrics.bitrate == int(round(kbps, 1) * 1000)
+        assert progress.metrics.speed == "1.00x"
+        assert progress.metrics.size_kb == 2000
+        assert progress.dropped_frames == dropped
+        assert not progress.ended
+
+    def test_na_values_and_end(self):
+        parser = ProgressParser()
+        for line in ["frame=0", "fps=0.00", "bitrate=N/A", "total_size=N/A", "speed=N/A"]:
+            parser.feed(line)
+
+        progress = parser.feed("progress=end")
+
+        assert progress.metrics.bitrate == 0 and progress.metrics.size_kb is None
+        assert progress.ended
+
+    def test_progress_pipe_goes_before_inputs(self):
+        cmd = with_progress_pipe(["ffmpeg", "-re", "-i", "in.mp4", "-f", "flv", "rtmp://a/b"])
+
+        assert cmd[:4] == ["ffmpeg", "-progress", "pipe:1", "-nostats"]
+        assert cmd[-1] == "rtmp://a/b"
+
+
+class TestCapacity:
+    """Nodes take shared starts only while under every limit."""
+
+    @given(
+        streams=st.integers(min_value=0, max_value=30),
+        max_streams=st.integers(min_value=1, max_value=30),
+        sessions=st.integers(min_value=0, max_value=10),
+        max_sessions=st.integers(min_value=0, max_value=10),
+        cpu=st.floats(min_value=0, max_value=100),
+    )
+    def test_has_room(self, streams, max_streams, sessions, max_sessions, cpu):
+        capacity = NodeCapacity("n", streams, sessions, cpu, max_streams, max_sessions, 85.0)
+
+        expected = streams < max_streams and cpu < 85.0 and (max_sessions == 0 or sessions < max_sessions)
+        assert capacity.has_room() == expected
+        assert NodeCapacity.from_json(capacity.to_json()) == capacity
+
+    @given(count=st.integers(min_value=0, max_value=20))
+    def test_restart_backoff_grows_and_is_capped(self, count):
+        assert restart_delay(count) <= restart_delay(count + 1) <= 300
+        assert restart_delay(0) == 5
+
+
+@pytest.mark.asyncio
+class TestRegistry:
+    """Commands reach the right node exactly once."""
+
+    async def test_own_commands_first_and_shared_only_with_room(self):
+        registry = StreamNodeRegistry(FakeRedis())
+        await registry.send(StreamCommand(START_STREAM, "shared"))
+        await registry.send(StreamCommand(STOP_STREAM, "mine"), node_id="a")
+
+        first = await registry.next_command("a", take_shared=True, timeout=0.01)
+        full = await registry.next_command("a", take_shared=False, timeout=0.01)
+        second = await registry.next_command("a", take_shared=True, timeout=0.01)
+
+        assert (first.action, first.job_id) == (STOP_STREAM, "mine")
+        assert full is None
+        assert (second.action, second.job_id) == (START_STREAM, "shared")
+
+    async def test_commands_are_pending_until_acked(self):
+        redis = FakeRedis()
+        registry = StreamNodeRegistry(redis)
+        await registry.send(StreamCommand(START_STREAM, "j1"))
+
+        command = await registry.next_command("a", take_shared=True, timeout=0.01)
+        assert redis.lists[node_processing_key("a")] == [command.raw]
+
+        await registry.ack("a", command)
+        assert redis.lists[node_processing_key("a")] == []
+
+    async def test_unacked_commands_are_requeued(self):
+        redis = FakeRedis()
+        registry = StreamNodeRegistry(redis)
+        await registry.send(StreamCommand(START_STREAM, "j1"))
+        await registry.send(StreamCommand(STOP_STREAM, "j2"), node_id="a")
+        await registry.next_command("a", take_shared=True, timeout=0.01)
+        await registry.next_command("a", take_shared=True, timeout=0.01)
+
+        assert await registry.requeue_unacked("a") == 2
+
+        assert [StreamCommand.from_json(r).job_id for r in redis.lists[SHARED_COMMANDS_KEY]] == ["j1"]
+        assert [StreamCommand.from_json(r).job_id for r in redis.lists[node_commands_key("a")]] == ["j2"]
+        assert redis.lists[node_processing_key("a")] == []
+
+    async def test_silent_nodes_drop_out(self):
+        clock = FakeClock()
+        registry = StreamNodeRegistry(FakeRedis(), clock=clock)
+        await registry.heartbeat(NodeCapacity("a", max_streams=5), ttl_seconds=20)
+        clock.now += 15
+        await registry.heartbeat(NodeCapacity("b", max_streams=5), ttl_seconds=20)
+        clock.now += 10
+
+        assert await registry.live_node_ids(ttl_seconds=20) == ["b"]
+        assert [node.node_id for node in await registry.live_nodes(ttl_seconds=20)] == ["b"]
+
+
+class FakeJobStore:
+    """Job state of a supervisor under test, with a fixed launch command."""
+
+    def __init__(self, cmd: list[str], restarts: int = 0, delay: float = 0.0, units: float = 1.0):
+        self.cmd = cmd
+        self.units = units
+        self.restarts_left = restarts
+        self.delay = delay
+        self.status: dict[str, str] = {}
+        self.nodes: dict[str, str] = {}
+        self.starts: list[tuple[str, int]] = []
+        self.exits: list[tuple[str, int]] = []
+        self.health: list = []
+        self.released: list[str] = []
+
+    async def prepare(self, job_id, node_id) -> Optional[StreamLaunch]:
+        if self.status.setdefault(job_id, "starting") != "starting":
+            return None
+        self.nodes[job_id] = node_id
+        return StreamLaunch(cmd=list(self.cmd), units=self.units)
+
+    async def started(self, job_id, node_id, pid):
+        self.status[job_id] = "running"
+        self.starts.append((job_id, pid))
+
+    async def exited(self, job_id, node_id, code):
+        self.exits.append((job_id, code))
+        if self.restarts_left > 0:
+            self.restarts_left -= 1
+            self.status[job_id] = "starting"
+            return self.delay
+        self.status[job_id] = "failed"
+        return None
+
+    async def record_health(self, job_id, progress, dropped_delta, cpu, memory):
+        self.health.append((job_id, progress, dropped_delta))
+
+    async def release(self, job_id, node_id):
+        self.released.append(job_id)
+        return True
+
+    async def owned_jobs(self, node_id):
+        return []
+
+    async def still_owned(self, job_ids, node_id):
+        return {
+            job_id for job_id in job_ids
+            if self.nodes.get(job_id) == node_id and self.status.get(job_id) in ("starting", "running")
+        }
+
+
+def fake_ffmpeg(seconds: float, code: int = 1) -> list[str]:
+    """A process that writes -progress blocks like FFmpeg, then exits."""
+    block = "\\n".join(progress_block(30, 30.0, 2500.0, 1))
+    script = (
+        "import sys, time\n"
+        f"end = time.time() + {seconds}\n"
+        "while time.time() < end:\n"
+        f"    print('{block}', flush=True)\n"
+        "    time.sleep(0.05)\n"
+        f"sys.exit({code})\n"
+    )
+    return [sys.executable, "-c", script]
+
+
+async def wait_for(condition, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met"
+        await asyncio.sleep(0.02)
+
+
+def make_supervisor(store, tmp_path, redis=None, **kwargs) -> StreamSupervisor:
+    return StreamSupervisor(
+        StreamNodeRegistry(redis or FakeRedis()),
+        store=store,
+        node_id="node-a",
+        max_streams=kwargs.pop("max_streams", 4),
+        max_cpu_percent=100.0,
+        max_encoder_sessions=0,
+        encoder="libx264",
+        capacity_units=kwargs.pop("capacity_units", 8.0),
+        log_dir=str(tmp_path),
+        poll_timeout=0.01,
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+class TestSupervisor:
+    """FFmpeg children are restarted, stopped and handed over."""
+
+    async def test_unexpected_exit_is_restarted_until_budget_is_spent(self, tmp_path):
+        store = FakeJobStore(fake_ffmpeg(0.2, code=1), restarts=2)
+        supervisor = make_supervisor(store, tmp_path)
+
+        supervisor.start_job("j1")
+        await wait_for(lambda: "j1" not in supervisor.tasks)
+
+        assert len(store.starts) == 3
+        assert store.exits == [("j1", 1)] * 3
+        assert store.status["j1"] == "failed"
+        assert (tmp_path / "ffmpeg_j1.log").exists()
+
+    async def test_stop_does_not_restart(self, tmp_path):
+        store = FakeJobStore(fake_ffmpeg(30), restarts=5)
+        supervisor = make_supervisor(store, tmp_path)
+        supervisor.start_job("j1")
+        await wait_for(lambda: store.starts)
+
+        assert await supervisor.stop_job("j1")
+
+        assert "j1" not in supervisor.tasks
+        assert store.exits == []
+        assert not await supervisor.stop_job("j1")
+
+    async def test_stop_cancels_a_pending_restart(self, tmp_path):
+        store = FakeJobStore(fake_ffmpeg(0.1), restarts=1, delay=60)
+        supervisor = make_supervisor(store, tmp_path)
+        supervisor.start_job("j1")
+        await wait_for(lambda: store.exits)
+
+        assert await supervisor.stop_job("j1")
+
+        assert len(store.starts) == 1 and "j1" not in supervisor.tasks
+
+    async def test_stream_units_are_reserved_while_supervised(self, tmp_path):
+        redis = FakeRedis()
+        store = FakeJobStore(fake_ffmpeg(30), units=1.5)
+        supervisor = make_supervisor(store, tmp_path, redis=redis, capacity_units=1.5)
+        supervisor.start_job("j1")
+        await wait_for(lambda: store.starts)
+
+        assert redis.hashes[RESERVED_JOBS_KEY] == {"j1": "node-a"}
+        assert supervisor.capacity().reserved_units == 1.5
+        assert not supervisor.capacity().has_room()
+
+        await supervisor.stop_job("j1")
+
+        assert redis.hashes[RESERVED_JOBS_KEY] == {}
+
+    async def test_health_comes_from_the_progress_pipe(self, tmp_path):
+        store = FakeJobStore(fake_ffmpeg(30))
+        supervisor = make_supervisor(store, tmp_path)
+        supervisor.start_job("j1")
+        await wait_for(lambda: supervisor.streams.get("j1") and supervisor.streams["j1"].progress)
+
+        await supervisor.report_health()
+        await supervisor.report_health()
+
+        (job_id, progress, delta), (_, _, second_delta) = store.health
+        assert job_id == "j1" and progress.metrics.bitrate == 2_500_000
+        assert (delta, second_delta) == (1, 0)
+        await supervisor.stop_job("j1")
+
+    async def test_streams_taken_over_or_stopped_elsewhere_are_stopped(self, tmp_path):
+        store = FakeJobStore(fake_ffmpeg(30), restarts=5)
+        supervisor = make_supervisor(store, tmp_path)
+        for job_id in ("j1", "j2", "j3"):
+            supervisor.start_job(job_id)
+        await wait_for(lambda: len(store.starts) == 3)
+
+        # j1 re-placed on another node after missed heartbeats; j2's STOP was lost
+        store.nodes["j1"] = "node-b"
+        store.status["j2"] = "stopped"
+        await supervisor.report_health()
+
+        assert sorted(supervisor.tasks) == ["j3"]
+        assert store.exits == [] and len(store.starts) == 3
+        await supervisor.stop_job("j3")
+
+    async def test_commands_and_handover(self, tmp_path):
+        redis = FakeRedis()
+        store = FakeJobStore(fake_ffmpeg(30))
+        supervisor = make_supervisor(store, tmp_path, redis=redis, max_streams=1)
+        await supervisor.registry.send(StreamCommand(START_STREAM, "j1"))
+        await supervisor.registry.send(StreamCommand(START_STREAM, "j2"))
+
+        run = asyncio.create_task(supervisor.run())
+        await wait_for(lambda: store.starts)
+        await asyncio.sleep(0.1)
+
+        # At capacity: the second start waits for another node
+        assert [job_id for job_id, _ in store.starts] == ["j1"]
+        assert "node-a" in redis.zsets[NODES_KEY]
+
+        supervisor.stop()
+        await asyncio.wait_for(run, timeout=10)
+
+        assert store.released == ["j1"]
+        assert sorted(StreamCommand.from_json(r).job_id for r in redis.lists[SHARED_COMMANDS_KEY]) == ["j1", "j2"]
+        assert "node-a" not in redis.zsets[NODES_KEY]
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="FFmpeg not installed")
+@pytest.mark.asyncio
+class TestSupervisorWithFFmpeg:
+    """A real FFmpeg to the null muxer is supervised end to end."""
+
+    async def test_null_muxer_stream_reports_progress_and_restarts(self, tmp_path):
+        cmd = with_progress_pipe([
+            "ffmpeg", "-hide_banner", "-re",
+            "-f", "lavfi", "-i", "testsrc=size=320x240:rate=30:duration=2",
+            "-c:v", "libx264", "-preset", "ultrafast",
+            "-f", "null", "-",
+        ])
+        store = FakeJobStore(cmd, restarts=1)
+        supervisor = make_supervisor(store, tmp_path)
+
+        supervisor.start_job("j1")
+        await wait_for(lambda: supervisor.streams.get("j1") and supervisor.streams["j1"].progress, timeout=20)
+        await supervisor.report_health()
+        await wait_for(lambda: "j1" not in supervisor.tasks, timeout=30)
+
+        _, progress, _ = store.health[0]
+        assert progress.metrics.frame_count > 0 and progress.metrics.fps >= 0
+        assert len(store.starts) == 2
+        assert store.exits == [("j1", 0), ("j1", 0)]
@@ -0,0 +1 @@
+"""Tests for system monitoring module."""
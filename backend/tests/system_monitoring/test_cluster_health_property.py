@@ -0,0 +1,186 @@
+"""Property-based tests for the cluster health snapshot.
+
+**Feature: system-monitoring, Cluster Health Snapshot**
+**Validates: Requirements 24.1, 24.2**
+
+Properties:
+- Workers are alive while they heartbeat and lost after missed heartbeats
+- Finished tasks are counted per queue over the window, then age out
+- Tasks of a lost worker no longer count as processing
+- A snapshot read back from Redis equals the one written, with its age
+"""
+
+from collections import defaultdict
+
+import pytest
+from hypothesis import given, settings, strategies as st
+
+from app.core.celery_queues import MEDIA_QUEUE, REALTIME_QUEUE, _QUEUE_DEPTH_SCRIPT
+from app.modules.system_monitoring.cluster_health import (
+    BUCKET_SECONDS,
+    HEARTBEAT_MISSES,
+    SNAPSHOT_KEY,
+    ClusterHealthAggregator,
+    ClusterHealthCollector,
+    ClusterSnapshot,
+    get_cluster_snapshot,
+)
+
+START_STREAM = "app.modules.stream.stream_job_tasks.start_ffmpeg_worker"
+TRANSCODE = "app.modules.transcoding.tasks.transcode_video_task"
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeRedis:
+    def __init__(self):
+        self.lists: dict[str, list[str]] = defaultdict(list)
+        self.strings: dict[str, str] = {}
+
+    async def eval(self, script, numkeys, *keys):
+        assert script == _QUEUE_DEPTH_SCRIPT
+        return [len(self.lists[key]) for key in keys]
+
+    async def set(self, key, value, ex=None):
+        self.strings[key] = value
+
+    async def get(self, key):
+        return self.strings.get(key)
+
+
+class FakeInspect:
+    def stats(self):
+        return {"realtime@host": {"pool": {"max-concurrency": 4, "implementation": "celery.concurrency.prefork:TaskPool"}}}
+
+    def active_queues(self):
+        return {"realtime@host": [{"name": "realtime"}]}
+
+
+class FakeApp:
+    class control:
+        @staticmethod
+        def inspect(timeout=None):
+            return FakeInspect()
+
+
+def heartbeat(hostname, active=0, processed=0, freq=2.0):
+    return {"type": "worker-heartbeat", "hostname": hostname, "active": active, "processed": processed, "freq": freq}
+
+
+def run_task(aggregator, task_id, name, hostname="w@host", failed=False):
+    aggregator.on_event({"type": "task-received", "uuid": task_id, "name": name, "hostname": hostname})
+    aggregator.on_event({"type": "task-started", "uuid": task_id, "hostname": hostname})
+    aggregator.on_event({"type": "task-failed" if failed else "task-succeeded", "uuid": task_id, "hostname": hostname})
+
+
+class TestWorkers:
+    """Liveness follows heartbeats."""
+
+    @given(silent=st.floats(min_value=0, max_value=60))
+    def test_alive_until_heartbeats_are_missed(self, silent):
+        clock = FakeClock()
+        aggregator = ClusterHealthAggregator(clock=clock)
+        aggregator.on_event(heartbeat("w@host", active=2, processed=10))
+
+        clock.now += silent
+        worker = aggregator.snapshot().workers[0]
+
+        assert worker.alive == (silent <= 2.0 * HEARTBEAT_MISSES)
+        assert worker.active == (2 if worker.alive else 0)
+        assert worker.processed == 10
+
+    def test_offline_worker_stops_processing(self):
+        clock = FakeClock()
+        aggregator = ClusterHealthAggregator(clock=clock)
+        aggregator.on_event(heartbeat("w@host", active=1))
+        aggregator.on_event({"type": "task-received", "uuid": "t1", "name": TRANSCODE, "hostname": "w@host"})
+        aggregator.on_event({"type": "task-started", "uuid": "t1", "hostname": "w@host"})
+
+        assert aggregator.snapshot().queues[0].processing == 1
+
+        aggregator.on_event({"type": "worker-offline", "hostname": "w@host"})
+        snapshot = aggregator.snapshot()
+
+        assert not snapshot.workers[0].alive and snapshot.processing == 0
+        assert all(q.processing == 0 for q in snapshot.queues)
+
+    def test_inspect_fills_pool_and_queues(self):
+        aggregator = ClusterHealthAggregator(clock=FakeClock())
+        aggregator.on_event(heartbeat("w@host", active=3))
+        aggregator.set_worker_info({"w@host": {"concurrency": 4, "pool": "TaskPool", "queues": ["realtime"]}})
+
+        snapshot = aggregator.snapshot()
+
+        assert snapshot.capacity == 4 and snapshot.processing == 3
+        assert snapshot.workers[0].queues == ["realtime"]
+
+
+class TestThroughput:
+    """Finished tasks are counted by queue over the window."""
+
+    @given(outcomes=st.lists(st.tuples(st.sampled_from([START_STREAM, TRANSCODE]), st.booleans()), max_size=50))
+    @settings(max_examples=50)
+    def test_counts_by_queue(self, outcomes):
+        aggregator = ClusterHealthAggregator(window_seconds=300, clock=FakeClock())
+        for i, (name, failed) in enumerate(outcomes):
+            run_task(aggregator, f"t{i}", name, failed=failed)
+
+        snapshot = aggregator.snapshot()
+        queues = {q.name: q for q in snapshot.queues}
+
+        for name, queue in ((START_STREAM, REALTIME_QUEUE), (TRANSCODE, MEDIA_QUEUE)):
+            failed = sum(1 for n, f in outcomes if n == name and f)
+            succeeded = sum(1 for n, f in outcomes if n == name and not f)
+            if failed or succeeded:
+                assert (queues[queue].succeeded, queues[queue].failed) == (succeeded, failed)
+        assert snapshot.failed == sum(1 for _, f in outcomes if f)
+        if outcomes:
+            assert snapshot.failure_rate == round(snapshot.failed / len(outcomes), 4)
+
+    def test_old_buckets_age_out(self):
+        clock = FakeClock()
+        aggregator = ClusterHealthAggregator(window_seconds=60, clock=clock)
+        run_task(aggregator, "old", START_STREAM, failed=True)
+
+        clock.now += 60 + BUCKET_SECONDS
+        run_task(aggregator, "new", START_STREAM)
+        snapshot = aggregator.snapshot()
+
+        assert (snapshot.succeeded, snapshot.failed) == (1, 0)
+        assert snapshot.failures_by_task == {}
+
+
+@pytest.mark.asyncio
+class TestSnapshotStore:
+    """Readers get what the collector wrote, in one read."""
+
+    async def test_publish_and_read_back(self):
+        clock = FakeClock()
+        redis = FakeRedis()
+        redis.lists["realtime:3"].extend(["m", "m"])
+        aggregator = ClusterHealthAggregator(clock=clock)
+        aggregator.on_event(heartbeat("realtime@host", active=1))
+        run_task(aggregator, "t1", START_STREAM, hostname="realtime@host", failed=True)
+        collector = ClusterHealthCollector(redis, app=FakeApp(), aggregator=aggregator)
+
+        written = await collector.publish()
+        read = await get_cluster_snapshot(redis)
+
+        assert read == written == ClusterSnapshot.from_json(redis.strings[SNAPSHOT_KEY])
+        realtime = next(q for q in read.queues if q.name == REALTIME_QUEUE)
+        assert realtime.depth == 2 and realtime.depth_by_priority == {3: 2}
+        assert read.workers[0].concurrency == 4 and read.workers[0].failed == 1
+        assert read.age_seconds(clock.now + 5) == 5
+
+    async def test_missing_or_corrupt_snapshot(self):
+        redis = FakeRedis()
+        assert await get_cluster_snapshot(redis) is None
+
+        redis.strings[SNAPSHOT_KEY] = "{not json"
+        assert await get_cluster_snapshot(redis) is None
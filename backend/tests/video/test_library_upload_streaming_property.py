@@ -0,0 +1,196 @@
+"""Property-based tests for streaming library uploads.
+
+**Feature: youtube-automation, Streaming Library Uploads**
+**Validates: Requirements 1.1, 1.2**
+
+Properties:
+- Uploads are copied to disk in chunks with constant memory, whatever the file size
+- The storage limit is checked while streaming and aborts the upload early
+- Aborted uploads leave no partial file and no video record behind
+"""
+
+import os
+import tracemalloc
+from io import BytesIO
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException, UploadFile
+from hypothesis import given, settings, strategies as st
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.modules.billing.feature_gate import LimitExceededError
+from app.modules.video.upload_handler import (
+    CHUNK_SIZE,
+    SIZE_CHECK_INTERVAL,
+    FileTooLargeError,
+    UploadAbortedError,
+    stream_upload_to_temp,
+)
+from app.modules.video.video_library_service import VideoLibraryService
+
+GIB = 1024 * 1024 * 1024
+
+
+def sparse_upload(path, size: int) -> UploadFile:
+    """An UploadFile backed by a sparse file of the given size."""
+    with open(path, "wb") as f:
+        f.truncate(size)
+    return UploadFile(filename="big_video.mp4", file=open(path, "rb"))
+
+
+def storage_gate(limit_bytes: int, checked: list):
+    """Fake FeatureGateService.check_storage_limit with a fixed limit."""
+    async def check_storage_limit(user_id, additional_bytes=0, raise_on_exceed=True):
+        checked.append(additional_bytes)
+        if additional_bytes > limit_bytes and raise_on_exceed:
+            raise LimitExceededError(
+                resource="Storage", current=0, limit=1, plan_name="Free",
+                message="Storage full",
+            )
+        return True, 0.0, limit_bytes / GIB, "Free"
+
+    return MagicMock(return_value=SimpleNamespace(check_storage_limit=check_storage_limit))
+
+
+@pytest.fixture
+def mock_db():
+    db = AsyncMock(spec=AsyncSession)
+    db.add = MagicMock()
+    return db
+
+
+@pytest.mark.asyncio
+class TestStreamingMemory:
+    """Upload memory does not grow with file size."""
+
+    async def test_multi_gb_upload_under_memory_cap(self, tmp_path):
+        size = 3 * GIB
+        upload = sparse_upload(tmp_path / "source.mp4", size)
+        destination = str(tmp_path / "dest.mp4")
+
+        tracemalloc.start()
+        try:
+            result = await stream_upload_to_temp(upload, file_path=destination)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+            upload.file.close()
+
+        assert result.file_size == size
+        assert os.path.getsize(destination) == size
+        # A handful of chunks at most, nowhere near the file size
+        assert peak < 8 * CHUNK_SIZE
+        os.remove(destination)
+
+    async def test_declared_size_rejected_before_reading(self, tmp_path):
+        upload = UploadFile(filename="video.mp4", file=BytesIO(b"x" * 10), size=5 * GIB)
+        upload.read = AsyncMock()
+
+        with pytest.raises(FileTooLargeError):
+            await stream_upload_to_temp(upload, file_path=str(tmp_path / "out.mp4"), max_size=GIB)
+
+        upload.read.assert_not_awaited()
+        assert not (tmp_path / "out.mp4").exists()
+
+
+@pytest.mark.asyncio
+class TestRunningStorageCheck:
+    """The storage limit is enforced while the file streams in."""
+
+    @given(
+        limit_chunks=st.integers(min_value=0, max_value=20),
+        file_chunks=st.integers(min_value=1, max_value=20),
+        interval_chunks=st.integers(min_value=1, max_value=5),
+    )
+    @settings(max_examples=50, deadline=None)
+    async def test_aborts_within_one_interval_of_the_limit(
+        self, limit_chunks: int, file_chunks: int, interval_chunks: int
+    ):
+        import tempfile
+
+        limit = limit_chunks * CHUNK_SIZE
+        interval = interval_chunks * CHUNK_SIZE
+        reads = []
+        upload = UploadFile(filename="video.mp4", file=BytesIO(b"\0" * (file_chunks * CHUNK_SIZE)))
+        original_read = upload.read
+
+        async def counting_read(size: int = -1) -> bytes:
+            chunk = await original_read(size)
+            reads.append(len(chunk))
+            return chunk
+
+        upload.read = counting_read
+
+        async def size_check(size: int) -> None:
+            if size > limit:
+                raise LimitExceededError("Storage", 0, 1, "Free", "Storage full")
+
+        with tempfile.TemporaryDirectory() as directory:
+            destination = os.path.join(directory, "out.mp4")
+            if file_chunks * CHUNK_SIZE > limit:
+                with pytest.raises(UploadAbortedError) as exc_info:
+                    await stream_upload_to_temp(
+                        upload, file_path=destination,
+                        size_check=size_check, size_check_interval=interval,
+                    )
+                assert isinstance(exc_info.value.__cause__, LimitExceededError)
+                assert not os.path.exists(destination)
+                # Never reads more than one check interval past the limit
+                assert sum(reads) <= limit + interval
+            else:
+                result = await stream_upload_to_temp(
+                    upload, file_path=destination,
+                    size_check=size_check, size_check_interval=interval,
+                )
+                assert result.file_size == file_chunks * CHUNK_SIZE
+
+
+@pytest.mark.asyncio
+class TestLibraryUpload:
+    """VideoLibraryService streams uploads instead of reading them whole."""
+
+    async def test_upload_streams_to_temp_and_queues_task(self, mock_db, tmp_path):
+        service = VideoLibraryService(mock_db)
+        upload = UploadFile(filename="clip.mp4", file=BytesIO(b"v" * (3 * CHUNK_SIZE + 17)))
+        upload.read = AsyncMock(side_effect=upload.read)
+        checked = []
+
+        with patch("app.modules.video.video_library_service.get_temp_dir", return_value=tmp_path), \
+             patch("app.modules.billing.feature_gate.FeatureGateService", storage_gate(GIB, checked)), \
+             patch("app.modules.video.tasks.process_library_upload_task") as task:
+            task.delay.return_value = SimpleNamespace(id="task-1")
+
+            video = await service.upload_to_library(user_id=uuid4(), file=upload, title="Clip")
+
+        assert video.file_size == 3 * CHUNK_SIZE + 17
+        assert checked[-1] == 3 * CHUNK_SIZE + 17
+        assert all(call.args == (CHUNK_SIZE,) for call in upload.read.await_args_list)
+        temp_path = task.delay.call_args.kwargs["temp_file_path"]
+        assert os.path.getsize(temp_path) == 3 * CHUNK_SIZE + 17
+        assert video.upload_job_id == "task-1"
+
+    async def test_storage_limit_aborts_upload(self, mock_db, tmp_path):
+        service = VideoLibraryService(mock_db)
+        upload = sparse_upload(tmp_path / "source.mp4", 2 * GIB)
+        checked = []
+
+        try:
+            with patch("app.modules.video.video_library_service.get_temp_dir", return_value=tmp_path / "temp"), \
+                 patch("app.modules.billing.feature_gate.FeatureGateService", storage_gate(4 * CHUNK_SIZE, checked)), \
+                 patch("app.modules.video.tasks.process_library_upload_task") as task:
+                (tmp_path / "temp").mkdir()
+
+                with pytest.raises(HTTPException) as exc_info:
+                    await service.upload_to_library(user_id=uuid4(), file=upload, title="Too big")
+        finally:
+            upload.file.close()
+
+        assert exc_info.value.status_code == 403
+        # Aborted one check interval past the limit, not after reading 2GB
+        assert max(checked) <= 4 * CHUNK_SIZE + SIZE_CHECK_INTERVAL
+        assert list((tmp_path / "temp").iterdir()) == []
+        mock_db.delete.assert_awaited_once()
+        task.delay.assert_not_called()
@@ -0,0 +1,368 @@
+"""Property-based tests for single-pass media analysis.
+
+**Feature: youtube-automation, Media Analysis**
+**Validates: Requirements 1.1**
+
+Properties:
+- An upload is probed once and scanned once, whatever later steps ask for
+- Keyframe index and loudness are parsed from the scan output
+- Thumbnail and sprite come out of the same FFmpeg pass as the keyframe index
+- Analyses round-trip through the Video row and are reused by content hash
+- A re-upload of a converted file reuses the analysis of the file as uploaded
+- Stream-copied outputs inherit keyframes and loudness without a rescan
+"""
+
+import json
+import os
+import shutil
+import subprocess
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+import sqlalchemy as sa
+from hypothesis import given, settings, strategies as st
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.modules.transcoding.ffmpeg import FFmpegTranscoder
+from app.modules.transcoding.models import Resolution
+from app.modules.video.media_analysis import (
+    ANALYSIS_VERSION,
+    MediaAnalysis,
+    MediaAnalyzer,
+    SpritePreview,
+    compute_content_hash,
+    parse_keyframes,
+    parse_loudness,
+    record_analysis,
+)
+
+HAS_FFMPEG = shutil.which("ffmpeg") is not None and shutil.which("ffprobe") is not None
+
+PROBE = {
+    "format": {"format_name": "mov,mp4,m4a,3gp,3g2,mj2", "duration": "42.5", "bit_rate": "4000000", "size": "21250000"},
+    "streams": [
+        {"codec_type": "video", "codec_name": "h264", "width": 1920, "height": 1080,
+         "r_frame_rate": "30000/1001", "pix_fmt": "yuv420p"},
+        {"codec_type": "audio", "codec_name": "pcm_s16le"},
+    ],
+}
+
+SUMMARY = """[Parsed_ebur128_4 @ 0x55d5] Summary:
+
+  Integrated loudness:
+    I:         -16.2 LUFS
+    Threshold: -26.4 LUFS
+
+  Loudness range:
+    LRA:         5.1 LU
+    Threshold: -36.5 LUFS
+
+  True peak:
+    Peak:       -1.3 dBFS
+"""
+
+
+def showinfo(times: list[float]) -> str:
+    lines = ["[Parsed_showinfo_0 @ 0x55d4] config in time_base: 1/15360, frame_rate: 30/1"]
+    lines += [
+        f"[Parsed_showinfo_0 @ 0x55d4] n:{n:4d} pts:{int(t * 15360):8d} pts_time:{t:<8.6g} "
+        f"duration:512 fmt:yuv420p iskey:1 type:I"
+        for n, t in enumerate(times)
+    ]
+    return "\n".join(lines) + "\n"
+
+
+class RecordingAnalyzer(MediaAnalyzer):
+    """Analyzer whose subprocesses are canned and counted."""
+
+    def __init__(self, probe: dict = PROBE, scan_stderr: str = ""):
+        super().__init__()
+        self.probe_output = probe
+        self.scan_stderr = scan_stderr
+        self.commands: list[list[str]] = []
+
+    def _run(self, cmd, timeout=None):
+        self.commands.append(cmd)
+        if cmd[0] == "ffprobe":
+            return subprocess.CompletedProcess(cmd, 0, json.dumps(self.probe_output), "")
+        return subprocess.CompletedProcess(cmd, 0, "", self.scan_stderr)
+
+    def count(self, binary: str) -> int:
+        return sum(1 for cmd in self.commands if cmd[0] == binary)
+
+
+def make_analysis(**overrides) -> MediaAnalysis:
+    analysis = MediaAnalysis.from_probe(PROBE, "a" * 64)
+    for name, value in overrides.items():
+        setattr(analysis, name, value)
+    return analysis
+
+
+class TestScanParsing:
+    """The scan's stderr yields the keyframe index and loudness."""
+
+    @given(times=st.lists(st.floats(min_value=0, max_value=7200, allow_nan=False), max_size=200))
+    @settings(max_examples=100)
+    def test_keyframes_recovered(self, times):
+        times = sorted({round(t, 2) for t in times})
+
+        assert parse_keyframes(showinfo(times) + SUMMARY) == pytest.approx(times, abs=1e-3)
+
+    def test_loudness_summary(self):
+        assert parse_loudness(showinfo([0, 2]) + SUMMARY) == {
+            "integrated_lufs": -16.2, "range_lu": 5.1, "true_peak_dbfs": -1.3,
+        }
+
+    def test_no_audio_no_loudness(self):
+        assert parse_loudness(showinfo([0, 2])) is None
+
+
+class TestScanCommand:
+    """Every keyframe-derived artifact comes from one FFmpeg invocation."""
+
+    @pytest.mark.parametrize("thumbnail", [None, "t.jpg"])
+    @pytest.mark.parametrize("sprite", [None, "s.jpg"])
+    @pytest.mark.parametrize("audio", [None, "aac"])
+    def test_outputs_share_one_decode(self, thumbnail, sprite, audio):
+        cmd = MediaAnalyzer().build_scan_command("in.mov", make_analysis(audio_codec=audio), thumbnail, sprite)
+        graph = cmd[cmd.index("-filter_complex") + 1]
+
+        assert cmd.count("-i") == 1
+        assert cmd[cmd.index("-skip_frame") + 1] == "nokey"
+        assert "showinfo" in graph
+        assert ("ebur128" in graph) == (audio is not None)
+        for path in (thumbnail, sprite):
+            if path:
+                assert cmd[cmd.index(path) - 6] == "-map"
+        if sprite:
+            assert "tile=10x10" in graph
+        assert cmd[-3:] == ["-f", "null", "-"]
+
+    def test_preview_only_skips_index_and_loudness(self):
+        cmd = MediaAnalyzer().build_scan_command("in.mov", make_analysis(), "t.jpg", "s.jpg", index=False)
+        graph = cmd[cmd.index("-filter_complex") + 1]
+
+        assert "showinfo" not in graph and "ebur128" not in graph
+        assert "null" not in cmd[-3:]
+
+
+@pytest.mark.asyncio
+class TestSingleProbe:
+    """An upload is probed and scanned once."""
+
+    async def test_analyze_runs_one_probe_and_one_scan(self, tmp_path):
+        source = tmp_path / "in.mov"
+        source.write_bytes(b"movie bytes")
+        analyzer = RecordingAnalyzer(scan_stderr=showinfo([0, 2.002, 4.004]) + SUMMARY)
+
+        analysis = await analyzer.analyze(str(source), str(tmp_path / "t.jpg"), str(tmp_path / "s.jpg"))
+
+        assert (analyzer.count("ffprobe"), analyzer.count("ffmpeg")) == (1, 1)
+        assert analysis.content_hash == compute_content_hash(str(source))
+        assert analysis.keyframes == [0, 2.002, 4.004]
+        assert analysis.loudness["integrated_lufs"] == -16.2
+        assert analysis.to_metadata().format == "mov"
+        assert analysis.to_metadata().audio_codec == "pcm_s16le"
+
+    async def test_repeat_probes_hit_cache_until_file_changes(self, tmp_path):
+        source = tmp_path / "in.mov"
+        source.write_bytes(b"movie bytes")
+        analyzer = RecordingAnalyzer()
+
+        for _ in range(3):
+            await analyzer.probe(str(source))
+        assert analyzer.count("ffprobe") == 1
+
+        source.write_bytes(b"different movie bytes")
+        await analyzer.probe(str(source))
+        assert analyzer.count("ffprobe") == 2
+
+    async def test_transcoder_validation_reuses_output_probe(self, tmp_path):
+        output = tmp_path / "out.mp4"
+        output.write_bytes(b"mp4")
+        analyzer = RecordingAnalyzer(probe={
+            "format": {"duration": "10", "bit_rate": "2000000"},
+            "streams": [{"codec_type": "video", "width": 1280, "height": 720}],
+        })
+        transcoder = FFmpegTranscoder()
+        transcoder._analyzer = analyzer
+
+        info = transcoder.get_video_info(str(output))
+        valid, width, height = transcoder.validate_output_dimensions(str(output), Resolution.RES_720P)
+
+        assert info["streams"][0]["width"] == 1280
+        assert (valid, width, height) == (True, 1280, 720)
+        assert analyzer.count("ffprobe") == 1
+
+    async def test_stream_copy_output_is_not_rescanned(self, tmp_path):
+        output = tmp_path / "out.mp4"
+        output.write_bytes(b"remuxed bytes")
+        analyzer = RecordingAnalyzer()
+        source = make_analysis(keyframes=[0.0, 2.0], loudness={"integrated_lufs": -14.0})
+
+        result = await analyzer.analyze_output(source, str(output), stream_copy=True, audio_codec="aac")
+
+        assert analyzer.commands == []
+        assert result.keyframes == [0.0, 2.0] and result.loudness == {"integrated_lufs": -14.0}
+        assert result.audio_codec == "aac" and result.to_metadata().format == "mov"
+        assert result.size == len(b"remuxed bytes")
+        assert result.content_hash == compute_content_hash(str(output))
+
+
+class TestStoredAnalysis:
+    """Analyses survive the JSON column unchanged."""
+
+    @given(
+        keyframes=st.lists(st.floats(min_value=0, max_value=1e4, allow_nan=False), max_size=50),
+        lufs=st.one_of(st.none(), st.floats(min_value=-70, max_value=0, allow_nan=False)),
+        with_sprite=st.booleans(),
+    )
+    @settings(max_examples=100)
+    def test_round_trip(self, keyframes, lufs, with_sprite):
+        analysis = make_analysis(
+            keyframes=keyframes,
+            loudness={"integrated_lufs": lufs} if lufs is not None else None,
+            sprite=SpritePreview("thumbnails/v_sprite.jpg", 10, 10, 160, 0.425) if with_sprite else None,
+        )
+
+        stored = json.loads(json.dumps(analysis.to_dict()))
+
+        assert MediaAnalysis.from_dict(stored) == analysis
+
+    def test_older_layout_is_ignored(self):
+        stored = make_analysis().to_dict()
+        stored["version"] = ANALYSIS_VERSION - 1
+
+        assert MediaAnalysis.from_dict(stored) is None
+        assert MediaAnalysis.from_dict(None) is None
+
+
+@pytest.mark.asyncio
+class TestContentHashCache:
+    """Identical bytes reuse the analysis stored on another Video row."""
+
+    def session_returning(self, stored):
+        result = MagicMock()
+        result.first.return_value = SimpleNamespace(
+            content_hash=stored["content_hash"], media_analysis=stored, source_media_analysis=None,
+        ) if stored else None
+        session = MagicMock()
+
+        async def execute(statement):
+            return result
+
+        session.execute = execute
+        return session
+
+    async def test_hit_renders_previews_only(self, tmp_path):
+        source = tmp_path / "in.mov"
+        source.write_bytes(b"same bytes")
+        stored = make_analysis(content_hash=compute_content_hash(str(source)), keyframes=[0.0, 2.0])
+        stored.sprite = SpritePreview("thumbnails/other_sprite.jpg", 10, 10, 160, 0.4)
+        analyzer = RecordingAnalyzer()
+
+        analysis, cached = await analyzer.get_or_analyze(
+            self.session_returning(stored.to_dict()), str(source), str(tmp_path / "t.jpg")
+        )
+
+        assert cached
+        assert analysis.keyframes == [0.0, 2.0] and analysis.sprite is None
+        assert analyzer.count("ffprobe") == 0
+        graph = analyzer.commands[0][analyzer.commands[0].index("-filter_complex") + 1]
+        assert "showinfo" not in graph
+
+    async def test_miss_analyzes(self, tmp_path):
+        source = tmp_path / "in.mov"
+        source.write_bytes(b"new bytes")
+        analyzer = RecordingAnalyzer(scan_stderr=showinfo([0.0]))
+
+        analysis, cached = await analyzer.get_or_analyze(self.session_returning(None), str(source))
+
+        assert not cached and analysis.keyframes == [0.0]
+        assert (analyzer.count("ffprobe"), analyzer.count("ffmpeg")) == (1, 1)
+
+
+@pytest.mark.asyncio
+class TestConvertedUploadCache:
+    """Converted uploads are found again by the hash of the uploaded bytes."""
+
+    @pytest.fixture
+    async def session(self):
+        # Only the cache columns of videos; the full model needs PostgreSQL types
+        metadata = sa.MetaData()
+        self.videos = sa.Table(
+            "videos", metadata,
+            sa.Column("id", sa.Integer, primary_key=True),
+            sa.Column("content_hash", sa.String(64)),
+            sa.Column("media_analysis", sa.JSON),
+            sa.Column("source_content_hash", sa.String(64)),
+            sa.Column("source_media_analysis", sa.JSON),
+        )
+        engine = create_async_engine("sqlite+aiosqlite://")
+        async with engine.begin() as conn:
+            await conn.run_sync(metadata.create_all)
+        async with AsyncSession(engine) as session:
+            yield session
+        await engine.dispose()
+
+    async def store(self, session, source, analysis):
+        video = SimpleNamespace()
+        record_analysis(video, source, analysis)
+        await session.execute(sa.insert(self.videos).values(**vars(video)))
+        await session.commit()
+
+    async def test_reupload_after_conversion_hits_cache(self, session, tmp_path):
+        upload = tmp_path / "in.mov"
+        upload.write_bytes(b"camera bytes")
+        converted = tmp_path / "converted.mp4"
+        converted.write_bytes(b"remuxed camera bytes")
+        analyzer = RecordingAnalyzer(scan_stderr=showinfo([0.0, 2.0]) + SUMMARY)
+
+        source, cached = await analyzer.get_or_analyze(session, str(upload))
+        output = await analyzer.analyze_output(source, str(converted), stream_copy=True, audio_codec="aac")
+        await self.store(session, source, output)
+
+        reupload = tmp_path / "again.mov"
+        reupload.write_bytes(b"camera bytes")
+        analyzer.commands.clear()
+        again, cached_again = await analyzer.get_or_analyze(session, str(reupload))
+
+        assert not cached and cached_again
+        assert analyzer.count("ffprobe") == 0
+        assert again.content_hash == source.content_hash != output.content_hash
+        assert again.audio_codec == "pcm_s16le" and again.keyframes == [0.0, 2.0]
+
+    async def test_stored_file_hits_cache(self, session, tmp_path):
+        upload = tmp_path / "in.mp4"
+        upload.write_bytes(b"browser-ready bytes")
+        analyzer = RecordingAnalyzer(scan_stderr=showinfo([0.0]))
+
+        source, _ = await analyzer.get_or_analyze(session, str(upload))
+        await self.store(session, source, source)
+        again, cached = await analyzer.get_or_analyze(session, str(upload))
+
+        assert cached and again.content_hash == source.content_hash
+
+
+@pytest.mark.skipif(not HAS_FFMPEG, reason="ffmpeg/ffprobe not installed")
+@pytest.mark.asyncio
+class TestSyntheticFixture:
+    """End-to-end on an FFmpeg-generated clip."""
+
+    async def test_real_scan(self, tmp_path):
+        source = tmp_path / "clip.mp4"
+        subprocess.run(
+            ["ffmpeg", "-v", "error", "-y",
+             "-f", "lavfi", "-i", "testsrc=size=320x240:rate=25:duration=12",
+             "-f", "lavfi", "-i", "sine=frequency=440:duration=12",
+             "-c:v", "libx264", "-g", "50", "-pix_fmt", "yuv420p", "-c:a", "aac", str(source)],
+            check=True, capture_output=True,
+        )
+        thumbnail, sprite = tmp_path / "t.jpg", tmp_path / "s.jpg"
+
+        analysis = await MediaAnalyzer().analyze(str(source), str(thumbnail), str(sprite))
+
+        assert analysis.keyframes[:3] == pytest.approx([0.0, 2.0, 4.0], abs=0.05)
+        assert analysis.loudness and analysis.loudness["integrated_lufs"] < 0
+        assert os.path.getsize(thumbnail) > 0 and os.path.getsize(sprite) > 0
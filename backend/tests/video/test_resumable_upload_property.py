@@ -0,0 +1,455 @@
+"""Property-based tests for resumable library uploads.
+
+**Feature: youtube-automation, Resumable Uploads**
+**Validates: Requirements 1.1, 1.2**
+
+Properties:
+- Any chunking of a file, with dropped connections and a different replica
+  accepting each chunk, reassembles the exact file
+- A chunk is only accepted at the current offset and with a matching checksum
+- Of two writers racing for the same offset, exactly one wins
+- S3 uploads become multipart parts that are completed on finalize
+- Expired sessions reject chunks and discard their data
+"""
+
+import asyncio
+import base64
+import copy
+import hashlib
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from hypothesis import given, settings, strategies as st
+
+from app.core.storage import StorageResult
+from app.modules.video import resumable_upload as resumable_module
+from app.modules.video.models import UploadSession, UploadSessionStatus, Video
+from app.modules.video.resumable_upload import (
+    InvalidUploadChunkError,
+    ResumableUploadService,
+    S3_MIN_PART_SIZE,
+    UploadChecksumMismatchError,
+    UploadIncompleteError,
+    UploadOffsetMismatchError,
+    UploadSessionExpiredError,
+    parse_checksum_header,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    def __call__(self) -> datetime:
+        return self.now
+
+
+class UploadDatabase:
+    """Shared upload_sessions/videos state, as seen by every API replica."""
+
+    def __init__(self):
+        self.sessions: dict[uuid.UUID, dict] = {}
+        self.videos: dict[uuid.UUID, Video] = {}
+        self.row_locks: dict[uuid.UUID, asyncio.Lock] = {}
+
+
+class FakeRepository:
+    """In-memory UploadSessionRepository with the same conditional update."""
+
+    def __init__(self, database: UploadDatabase, db):
+        self.database = database
+        self.db = db
+
+    def _load(self, row: dict) -> UploadSession:
+        session = UploadSession(**copy.deepcopy(row))
+        self.db.loaded.append(session)
+        return session
+
+    async def get_for_user(self, upload_id, user_id):
+        row = self.database.sessions.get(upload_id)
+        if row is None or row["user_id"] != user_id:
+            return None
+        return self._load(row)
+
+    async def lock_at_offset(self, upload_id, expected_offset):
+        lock = self.database.row_locks.setdefault(upload_id, asyncio.Lock())
+        await lock.acquire()
+        self.db.locks.append(lock)
+        row = self.database.sessions[upload_id]
+        return row["upload_offset"] == expected_offset and row["status"] == UploadSessionStatus.ACTIVE.value
+
+    async def advance_offset(self, upload_id, expected_offset, new_offset, parts, expires_at):
+        row = self.database.sessions[upload_id]
+        if row["upload_offset"] != expected_offset or row["status"] != UploadSessionStatus.ACTIVE.value:
+            return False
+        row.update(upload_offset=new_offset, parts=copy.deepcopy(parts), expires_at=expires_at)
+        return True
+
+    async def get_expired(self, now):
+        return [
+            self._load(row) for row in self.database.sessions.values()
+            if row["status"] == UploadSessionStatus.ACTIVE.value and row["expires_at"] <= now
+        ]
+
+
+COLUMNS = [
+    "id", "user_id", "filename", "content_type", "upload_length", "upload_offset",
+    "backend", "temp_path", "storage_key", "multipart_upload_id", "parts",
+    "upload_metadata", "status", "video_id", "expires_at",
+]
+
+
+class FakeSession:
+    """AsyncSession stand-in that persists on commit and then releases row locks."""
+
+    def __init__(self, database: UploadDatabase):
+        self.database = database
+        self.added = []
+        self.loaded: list[UploadSession] = []
+        self.locks: list[asyncio.Lock] = []
+
+    def _release_locks(self):
+        for lock in self.locks:
+            lock.release()
+        self.locks = []
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    async def flush(self):
+        for obj in self.added:
+            if isinstance(obj, Video) and obj.id is None:
+                obj.id = uuid.uuid4()
+
+    async def commit(self):
+        await self.flush()
+        for obj in self.added:
+            if isinstance(obj, UploadSession):
+                self.database.sessions[obj.id] = {c: copy.deepcopy(getattr(obj, c)) for c in COLUMNS}
+            elif isinstance(obj, Video):
+                self.database.videos[obj.id] = obj
+        self.added = []
+        for session in self.loaded:
+            row = self.database.sessions[session.id]
+            row.update(status=session.status, video_id=session.video_id)
+        self._release_locks()
+
+    async def rollback(self):
+        self.added = []
+        self._release_locks()
+
+    async def refresh(self, obj):
+        if isinstance(obj, UploadSession):
+            obj.upload_offset = self.database.sessions[obj.id]["upload_offset"]
+
+    async def get(self, model, key):
+        return self.database.videos.get(key)
+
+
+class FakeMultipartStorage:
+    """In-memory stand-in for an S3/MinIO bucket."""
+
+    supports_multipart = True
+
+    def __init__(self):
+        self.uploads: dict[str, dict[int, bytes]] = {}
+        self.objects: dict[str, bytes] = {}
+        self.aborted: list[str] = []
+
+    def create_multipart_upload(self, key, content_type="application/octet-stream"):
+        upload_id = uuid.uuid4().hex
+        self.uploads[upload_id] = {}
+        return upload_id
+
+    def upload_part(self, key, upload_id, part_number, data):
+        self.uploads[upload_id][part_number] = data
+        return hashlib.md5(data).hexdigest()
+
+    def complete_multipart_upload(self, key, upload_id, parts):
+        stored = self.uploads.pop(upload_id)
+        for part in parts:
+            assert hashlib.md5(stored[part["part_number"]]).hexdigest() == part["etag"]
+        self.objects[key] = b"".join(stored[p["part_number"]] for p in sorted(parts, key=lambda p: p["part_number"]))
+        return StorageResult(success=True, key=key, url="", file_size=len(self.objects[key]))
+
+    def abort_multipart_upload(self, key, upload_id):
+        self.uploads.pop(upload_id, None)
+        self.aborted.append(upload_id)
+        return True
+
+
+def checksum(data: bytes, algorithm: str = "sha256") -> str:
+    return f"{algorithm} {base64.b64encode(hashlib.new(algorithm, data).digest()).decode()}"
+
+
+async def body(data: bytes, piece: int = 4096, drop_after: int = None):
+    """Request body stream; raises after drop_after bytes to simulate a dropped connection."""
+    sent = 0
+    for start in range(0, len(data), piece):
+        if drop_after is not None and sent >= drop_after:
+            raise ConnectionResetError("client disconnected")
+        chunk = data[start:start + piece]
+        sent += len(chunk)
+        yield chunk
+
+
+class Cluster:
+    """Several API replicas sharing one database, temp volume and bucket."""
+
+    def __init__(self, tmp_path, backend="local", replicas=2):
+        self.database = UploadDatabase()
+        self.storage = FakeMultipartStorage()
+        self.clock = FakeClock()
+        self.tmp_path = tmp_path
+        self.backend = backend
+        self.replicas = replicas
+        self.task = MagicMock()
+        self.task.delay.return_value = SimpleNamespace(id="task-1")
+        self.user_id = uuid.uuid4()
+
+    def service(self) -> ResumableUploadService:
+        db = FakeSession(self.database)
+        service = ResumableUploadService(db, storage=self.storage, backend=self.backend, clock=self.clock)
+        service.repo = FakeRepository(self.database, db)
+        return service
+
+    def patches(self):
+        gate = MagicMock(return_value=SimpleNamespace(check_storage_limit=AsyncMock()))
+        return (
+            patch.object(resumable_module, "get_temp_dir", return_value=self.tmp_path),
+            patch("app.modules.billing.feature_gate.FeatureGateService", gate),
+            patch("app.modules.video.tasks.process_library_upload_task", self.task),
+        )
+
+
+async def run(cluster: Cluster, coro_factory):
+    p1, p2, p3 = cluster.patches()
+    with p1, p2, p3:
+        return await coro_factory()
+
+
+@pytest.mark.asyncio
+class TestLocalResumableUpload:
+    """Chunks written to a shared temp file."""
+
+    @given(
+        data=st.binary(min_size=1, max_size=64 * 1024),
+        cuts=st.lists(st.floats(min_value=0, max_value=1), max_size=6),
+        drops=st.lists(st.booleans(), min_size=7, max_size=7),
+    )
+    @settings(max_examples=40, deadline=None)
+    async def test_any_chunking_with_drops_reassembles_file(self, tmp_path_factory, data, cuts, drops):
+        tmp_path = tmp_path_factory.mktemp("uploads")
+        cluster = Cluster(tmp_path)
+        boundaries = sorted({0, len(data), *(int(c * len(data)) for c in cuts)})
+
+        async def scenario():
+            upload = await cluster.service().create(
+                cluster.user_id, "movie.mkv", len(data), title="Movie"
+            )
+            for index, (start, end) in enumerate(zip(boundaries, boundaries[1:])):
+                chunk = data[start:end]
+                if drops[index] and len(chunk) > 1:
+                    with pytest.raises(ConnectionResetError):
+                        await cluster.service().write_chunk(
+                            cluster.user_id, upload.id, start, body(chunk, len(chunk) // 2, drop_after=1), checksum(chunk)
+                        )
+                # Resume from the offset reported by another replica
+                offset = (await cluster.service().get_active(cluster.user_id, upload.id)).upload_offset
+                assert offset == start
+                await cluster.service().write_chunk(
+                    cluster.user_id, upload.id, offset, body(chunk), checksum(chunk)
+                )
+            return upload, await cluster.service().finalize(cluster.user_id, upload.id)
+
+        upload, video = await run(cluster, scenario)
+
+        kwargs = cluster.task.delay.call_args.kwargs
+        with open(kwargs["temp_file_path"], "rb") as f:
+            assert f.read() == data
+        assert kwargs["video_id"] == str(video.id)
+        assert kwargs["source_storage_key"] is None
+        assert video.file_size == len(data)
+        assert cluster.database.sessions[upload.id]["status"] == UploadSessionStatus.COMPLETED.value
+        # No staged chunks left behind
+        assert [p.name for p in tmp_path.iterdir()] == [f"resumable_{upload.id}.mkv"]
+
+    async def test_checksum_mismatch_rejected_and_offset_unchanged(self, tmp_path):
+        cluster = Cluster(tmp_path)
+
+        async def scenario():
+            upload = await cluster.service().create(cluster.user_id, "a.mp4", 10, title="A")
+            with pytest.raises(UploadChecksumMismatchError):
+                await cluster.service().write_chunk(
+                    cluster.user_id, upload.id, 0, body(b"hello"), checksum(b"HELLO")
+                )
+            return upload
+
+        upload = await run(cluster, scenario)
+
+        assert cluster.database.sessions[upload.id]["upload_offset"] == 0
+        assert (tmp_path / f"resumable_{upload.id}.mp4").read_bytes() == b""
+
+    @given(offset=st.integers(min_value=0, max_value=20), accepted=st.integers(min_value=1, max_value=10))
+    @settings(max_examples=30, deadline=None)
+    async def test_chunk_only_accepted_at_current_offset(self, tmp_path_factory, offset, accepted):
+        cluster = Cluster(tmp_path_factory.mktemp("uploads"))
+
+        async def scenario():
+            upload = await cluster.service().create(cluster.user_id, "a.mp4", 30, title="A")
+            await cluster.service().write_chunk(
+                cluster.user_id, upload.id, 0, body(b"x" * accepted), checksum(b"x" * accepted)
+            )
+            if offset == accepted:
+                await cluster.service().write_chunk(
+                    cluster.user_id, upload.id, offset, body(b"y"), checksum(b"y")
+                )
+                return None
+            with pytest.raises(UploadOffsetMismatchError) as exc_info:
+                await cluster.service().write_chunk(
+                    cluster.user_id, upload.id, offset, body(b"y"), checksum(b"y")
+                )
+            return exc_info.value.current_offset
+
+        current = await run(cluster, scenario)
+
+        if offset != accepted:
+            assert current == accepted
+
+    async def test_racing_writers_only_one_wins(self, tmp_path):
+        cluster = Cluster(tmp_path)
+        release = asyncio.Event()
+        data = b"z" * 1000
+        late = b"y" * 1000
+
+        async def slow_body():
+            await release.wait()
+            yield late
+
+        async def scenario():
+            upload = await cluster.service().create(cluster.user_id, "a.mp4", 2000, title="A")
+            slow = asyncio.create_task(
+                cluster.service().write_chunk(cluster.user_id, upload.id, 0, slow_body(), checksum(late))
+            )
+            await asyncio.sleep(0.01)
+            await cluster.service().write_chunk(cluster.user_id, upload.id, 0, body(data), checksum(data))
+            release.set()
+            with pytest.raises(UploadOffsetMismatchError) as exc_info:
+                await slow
+            return upload, exc_info.value.current_offset
+
+        upload, current = await run(cluster, scenario)
+
+        assert current == 1000
+        assert cluster.database.sessions[upload.id]["upload_offset"] == 1000
+        # The losing writer never touched the accepted bytes
+        with open(cluster.database.sessions[upload.id]["temp_path"], "rb") as f:
+            assert f.read(1000) == data
+
+    async def test_finalize_requires_all_bytes_and_is_idempotent(self, tmp_path):
+        cluster = Cluster(tmp_path)
+
+        async def scenario():
+            upload = await cluster.service().create(cluster.user_id, "a.mp4", 4, title="A")
+            with pytest.raises(UploadIncompleteError):
+                await cluster.service().finalize(cluster.user_id, upload.id)
+            await cluster.service().write_chunk(cluster.user_id, upload.id, 0, body(b"abcd"), checksum(b"abcd", "md5"))
+            first = await cluster.service().finalize(cluster.user_id, upload.id)
+            second = await cluster.service().finalize(cluster.user_id, upload.id)
+            return first, second
+
+        first, second = await run(cluster, scenario)
+
+        assert first.id == second.id
+        assert cluster.task.delay.call_count == 1
+
+    async def test_expired_session_rejects_chunks_and_discards_data(self, tmp_path):
+        cluster = Cluster(tmp_path)
+
+        async def scenario():
+            upload = await cluster.service().create(cluster.user_id, "a.mp4", 10, title="A")
+            cluster.clock.now += timedelta(hours=25)
+            with pytest.raises(UploadSessionExpiredError):
+                await cluster.service().write_chunk(cluster.user_id, upload.id, 0, body(b"a"), checksum(b"a"))
+            return upload
+
+        upload = await run(cluster, scenario)
+
+        assert cluster.database.sessions[upload.id]["status"] == UploadSessionStatus.EXPIRED.value
+        assert list(tmp_path.iterdir()) == []
+
+    async def test_cleanup_discards_only_expired_sessions(self, tmp_path):
+        cluster = Cluster(tmp_path)
+
+        async def scenario():
+            old = await cluster.service().create(cluster.user_id, "old.mp4", 10, title="Old")
+            cluster.clock.now += timedelta(hours=20)
+            fresh = await cluster.service().create(cluster.user_id, "new.mp4", 10, title="New")
+            cluster.clock.now += timedelta(hours=5)
+            return old, fresh, await cluster.service().cleanup_expired()
+
+        old, fresh, expired = await run(cluster, scenario)
+
+        assert expired == 1
+        assert cluster.database.sessions[old.id]["status"] == UploadSessionStatus.EXPIRED.value
+        assert cluster.database.sessions[fresh.id]["status"] == UploadSessionStatus.ACTIVE.value
+
+
+@pytest.mark.asyncio
+class TestS3ResumableUpload:
+    """Chunks uploaded straight to S3 multipart parts."""
+
+    async def test_chunks_become_parts_and_finalize_completes(self, tmp_path):
+        cluster = Cluster(tmp_path, backend="s3")
+        data = bytes(range(256)) * (S3_MIN_PART_SIZE // 256) + b"tail"
+
+        async def scenario():
+            upload = await cluster.service().create(cluster.user_id, "clip.mov", len(data), title="Clip")
+            first, rest = data[:S3_MIN_PART_SIZE], data[S3_MIN_PART_SIZE:]
+            await cluster.service().write_chunk(cluster.user_id, upload.id, 0, body(first, 65536), checksum(first))
+            await cluster.service().write_chunk(
+                cluster.user_id, upload.id, len(first), body(rest), checksum(rest, "sha1")
+            )
+            await cluster.service().finalize(cluster.user_id, upload.id)
+            return upload
+
+        upload = await run(cluster, scenario)
+
+        key = cluster.database.sessions[upload.id]["storage_key"]
+        assert cluster.storage.objects[key] == data
+        assert [p["part_number"] for p in cluster.database.sessions[upload.id]["parts"]] == [1, 2]
+        kwargs = cluster.task.delay.call_args.kwargs
+        assert kwargs["source_storage_key"] == key
+        assert not list(tmp_path.iterdir())
+
+    async def test_small_non_final_part_rejected(self, tmp_path):
+        cluster = Cluster(tmp_path, backend="s3")
+
+        async def scenario():
+            upload = await cluster.service().create(cluster.user_id, "clip.mp4", S3_MIN_PART_SIZE * 2, title="Clip")
+            with pytest.raises(InvalidUploadChunkError):
+                await cluster.service().write_chunk(cluster.user_id, upload.id, 0, body(b"tiny"), checksum(b"tiny"))
+            await cluster.service().abort(cluster.user_id, upload.id)
+            return upload
+
+        upload = await run(cluster, scenario)
+
+        assert cluster.database.sessions[upload.id]["status"] == UploadSessionStatus.ABORTED.value
+        assert cluster.storage.aborted == [cluster.database.sessions[upload.id]["multipart_upload_id"]]
+
+
+class TestChecksumHeader:
+    """Upload-Checksum parsing."""
+
+    @given(data=st.binary(max_size=256), algorithm=st.sampled_from(["sha256", "sha1", "md5"]))
+    @settings(max_examples=50)
+    def test_round_trip(self, data: bytes, algorithm: str):
+        assert parse_checksum_header(checksum(data, algorithm)) == (algorithm, hashlib.new(algorithm, data).digest())
+
+    @pytest.mark.parametrize("value", [None, "", "sha256", "crc32 AAAA", "sha256 not-base64!"])
+    def test_invalid_headers_rejected(self, value):
+        with pytest.raises(InvalidUploadChunkError):
+            parse_checksum_header(value)
@@ -0,0 +1,301 @@
+"""Property-based tests for S3/MinIO transfers.
+
+**Feature: youtube-automation, Object Storage Transfers**
+**Validates: Requirements 1.1**
+
+Properties:
+- Multipart uploads reassemble the exact file for any size and part size
+- No more parts run at once than the configured concurrency
+- Failed parts are retried; a part that keeps failing aborts the upload
+- Ranged downloads reproduce the object and report monotonic progress
+- Small objects download with a single GET and no HEAD
+- Listing pages through every key instead of stopping at the first page
+"""
+
+import io
+import re
+import threading
+import time
+
+import pytest
+from hypothesis import given, settings, strategies as st
+
+from app.core import storage as storage_module
+from app.core.storage import S3Storage, StorageConfig
+
+KB = 1024
+
+
+class FakeBody:
+    def __init__(self, data: bytes):
+        self.data = data
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+    def iter_chunks(self, chunk_size: int):
+        for start in range(0, len(self.data), chunk_size):
+            yield self.data[start:start + chunk_size]
+
+
+class FakeS3Client:
+    """Thread-safe in-memory S3 client recording concurrency and calls."""
+
+    def __init__(self, part_failures: int = 0, delay: float = 0.0):
+        self.objects: dict[str, bytes] = {}
+        self.uploads: dict[str, dict[int, bytes]] = {}
+        self.aborted: list[str] = []
+        self.part_failures = part_failures
+        self.delay = delay
+        self.put_calls = 0
+        self.ranged_gets = 0
+        self.plain_gets = 0
+        self.head_calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def _enter(self):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def _exit(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def put_object(self, Bucket, Key, Body, ContentType):
+        self.put_calls += 1
+        self.objects[Key] = Body.read()
+        return {"ETag": '"single"'}
+
+    def create_multipart_upload(self, Bucket, Key, ContentType):
+        upload_id = f"upload-{len(self.uploads)}"
+        self.uploads[upload_id] = {}
+        return {"UploadId": upload_id}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        self._enter()
+        try:
+            time.sleep(self.delay)
+            with self._lock:
+                if self.part_failures > 0:
+                    self.part_failures -= 1
+                    raise ConnectionError("connection reset")
+            self.uploads[UploadId][PartNumber] = Body
+            return {"ETag": f'"etag-{PartNumber}"'}
+        finally:
+            self._exit()
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        stored = self.uploads.pop(UploadId)
+        numbers = [part["PartNumber"] for part in MultipartUpload["Parts"]]
+        assert numbers == sorted(stored)
+        self.objects[Key] = b"".join(stored[number] for number in numbers)
+        return {"ETag": '"multipart"'}
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.uploads.pop(UploadId, None)
+        self.aborted.append(UploadId)
+
+    def head_object(self, Bucket, Key):
+        self.head_calls += 1
+        return {"ContentLength": len(self.objects[Key])}
+
+    def get_object(self, Bucket, Key, Range=None):
+        self._enter()
+        try:
+            time.sleep(self.delay)
+            if Range is None:
+                self.plain_gets += 1
+                data = self.objects[Key]
+                return {"Body": FakeBody(data), "ContentLength": len(data)}
+            start, end = map(int, re.fullmatch(r"bytes=(\d+)-(\d+)", Range).groups())
+            self.ranged_gets += 1
+            return {"Body": FakeBody(self.objects[Key][start:end + 1])}
+        finally:
+            self._exit()
+
+    def get_paginator(self, operation):
+        assert operation == "list_objects_v2"
+        client = self
+
+        class Paginator:
+            def paginate(self, Bucket, Prefix):
+                keys = sorted(k for k in client.objects if k.startswith(Prefix))
+                for start in range(0, len(keys), 1000):
+                    yield {"Contents": [{"Key": k} for k in keys[start:start + 1000]]}
+
+        return Paginator()
+
+
+def make_storage(client: FakeS3Client, **overrides) -> S3Storage:
+    config = StorageConfig(
+        backend="s3",
+        bucket="videos",
+        multipart_threshold=overrides.pop("multipart_threshold", 64 * KB),
+        part_size=overrides.pop("part_size", 64 * KB),
+        max_concurrency=overrides.pop("max_concurrency", 4),
+        max_part_attempts=overrides.pop("max_part_attempts", 3),
+    )
+    storage = S3Storage(config)
+    storage._client = client
+    return storage
+
+
+@pytest.fixture(autouse=True)
+def small_parts(monkeypatch):
+    """Shrink S3's part limits so tests move kilobytes, not gigabytes."""
+    monkeypatch.setattr(storage_module, "S3_MIN_PART_SIZE", 4 * KB)
+    monkeypatch.setattr(storage_module, "PART_RETRY_BACKOFF_SECONDS", 0)
+
+
+class TestMultipartUpload:
+    """Large files are uploaded as parallel parts."""
+
+    @given(
+        size=st.integers(min_value=0, max_value=200 * KB),
+        part_kb=st.integers(min_value=4, max_value=48),
+        concurrency=st.integers(min_value=1, max_value=6),
+    )
+    @settings(max_examples=40, deadline=None)
+    def test_upload_reassembles_file(self, tmp_path_factory, size, part_kb, concurrency):
+        data = bytes(i % 251 for i in range(size))
+        path = tmp_path_factory.mktemp("upload") / "video.mp4"
+        path.write_bytes(data)
+        client = FakeS3Client()
+        storage = make_storage(client, multipart_threshold=16 * KB, part_size=part_kb * KB,
+                               max_concurrency=concurrency)
+        reports = []
+
+        result = storage.upload(str(path), "videos/a.mp4", "video/mp4",
+                                progress_callback=lambda done, total: reports.append((done, total)))
+
+        assert result.success and result.file_size == size
+        assert client.objects["videos/a.mp4"] == data
+        assert client.max_in_flight <= concurrency
+        if size >= 16 * KB:
+            assert client.put_calls == 0
+            assert len(reports) == -(-size // (part_kb * KB))
+        else:
+            assert client.put_calls == 1
+        assert [done for done, _ in reports] == sorted(done for done, _ in reports)
+        assert reports[-1] == (size, size)
+
+    def test_parts_run_concurrently(self, tmp_path):
+        path = tmp_path / "video.mp4"
+        path.write_bytes(b"v" * 256 * KB)
+        client = FakeS3Client(delay=0.05)
+
+        make_storage(client, part_size=32 * KB, max_concurrency=4).upload(str(path), "k")
+
+        assert client.max_in_flight == 4
+
+    def test_failed_parts_are_retried(self, tmp_path):
+        path = tmp_path / "video.mp4"
+        path.write_bytes(b"r" * 128 * KB)
+        client = FakeS3Client(part_failures=2)
+
+        result = make_storage(client).upload(str(path), "k")
+
+        assert result.success
+        assert client.objects["k"] == b"r" * 128 * KB
+        assert client.aborted == []
+
+    def test_exhausted_retries_abort_upload(self, tmp_path):
+        path = tmp_path / "video.mp4"
+        path.write_bytes(b"x" * 128 * KB)
+        client = FakeS3Client(part_failures=100)
+
+        result = make_storage(client, max_part_attempts=2).upload(str(path), "k")
+
+        assert not result.success
+        assert "connection reset" in result.error_message
+        assert client.aborted == ["upload-0"]
+        assert "k" not in client.objects
+
+    def test_part_size_grows_to_stay_under_part_limit(self, monkeypatch):
+        monkeypatch.setattr(storage_module, "S3_MAX_PARTS", 10)
+        storage = make_storage(FakeS3Client(), part_size=4 * KB)
+
+        ranges = storage._part_ranges(100 * KB)
+
+        assert len(ranges) <= 10
+        assert sum(length for _, _, length in ranges) == 100 * KB
+
+    def test_fileobj_upload_uses_parts(self):
+        data = bytes(range(256)) * 512
+        client = FakeS3Client()
+
+        result = make_storage(client, part_size=16 * KB).upload_fileobj(io.BytesIO(data), "k")
+
+        assert result.success and result.file_size == len(data)
+        assert client.objects["k"] == data
+        assert client.put_calls == 0
+
+
+class TestRangedDownload:
+    """Large objects are fetched as parallel ranged GETs."""
+
+    @given(size=st.integers(min_value=0, max_value=200 * KB), part_kb=st.integers(min_value=4, max_value=48))
+    @settings(max_examples=40, deadline=None)
+    def test_download_reproduces_object(self, tmp_path_factory, size, part_kb):
+        data = bytes((i * 7) % 256 for i in range(size))
+        client = FakeS3Client()
+        client.objects["k"] = data
+        destination = tmp_path_factory.mktemp("download") / "out.mp4"
+        reports = []
+
+        ok = make_storage(client, multipart_threshold=16 * KB, part_size=part_kb * KB).download(
+            "k", str(destination), progress_callback=lambda done, total: reports.append(done)
+        )
+
+        assert ok
+        assert destination.read_bytes() == data
+        assert reports == sorted(reports)
+        if size:
+            assert reports[-1] == size
+        if size >= 16 * KB:
+            assert client.ranged_gets == -(-size // (part_kb * KB))
+
+    def test_small_object_takes_one_get(self, tmp_path):
+        client = FakeS3Client()
+        client.objects["k"] = b"d" * 8 * KB
+        destination = tmp_path / "out.mp4"
+
+        assert make_storage(client).download("k", str(destination))
+        assert destination.read_bytes() == client.objects["k"]
+        assert (client.plain_gets, client.ranged_gets, client.head_calls) == (1, 0, 0)
+
+    def test_failed_download_removes_partial_file(self, tmp_path):
+        client = FakeS3Client()
+        client.objects["k"] = b"d" * 128 * KB
+        client.get_object = lambda **kwargs: (_ for _ in ()).throw(ConnectionError("reset"))
+        destination = tmp_path / "out.mp4"
+
+        assert not make_storage(client).download("k", str(destination))
+        assert not destination.exists()
+
+
+class TestListing:
+    """Listing pages through every key."""
+
+    @given(count=st.integers(min_value=0, max_value=3500))
+    @settings(max_examples=10, deadline=None)
+    def test_lists_past_first_page(self, count):
+        client = FakeS3Client()
+        client.objects = {f"videos/{i:05d}.mp4": b"" for i in range(count)}
+        client.objects["thumbnails/a.jpg"] = b""
+        storage = make_storage(client)
+
+        assert len(storage.list_files("videos/")) == count
+        assert sum(1 for _ in storage.iter_files("videos/")) == count
+
+    def test_client_failure_yields_nothing(self):
+        storage = make_storage(FakeS3Client())
+        storage._client = None
+        storage._get_client = lambda: (_ for _ in ()).throw(RuntimeError("boto3 is required"))
+
+        assert list(storage.iter_files("videos/")) == []
+        assert storage.list_files("videos/") == []
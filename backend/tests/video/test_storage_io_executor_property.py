@@ -0,0 +1,181 @@
+"""Property-based tests for the async storage facade.
+
+**Feature: youtube-automation, Non-blocking Storage I/O**
+**Validates: Requirements 1.1**
+
+Properties:
+- Blocking backend calls never stall the event loop
+- No more operations run at once than the executor admits
+- Operations time out, and queued operations whose caller gave up never run
+- Queue depth and in-flight gauges return to zero once work drains
+"""
+
+import asyncio
+import io
+import threading
+import time
+
+import pytest
+from hypothesis import given, settings, strategies as st
+
+from app.core.metrics import (
+    STORAGE_IO_IN_FLIGHT,
+    STORAGE_IO_OPERATIONS_TOTAL,
+    STORAGE_IO_QUEUE_DEPTH,
+)
+from app.core.storage import (
+    StorageIOExecutor,
+    StorageResult,
+    StorageService,
+    StorageTimeoutError,
+)
+
+
+class SlowBackend:
+    """Storage stand-in whose calls block like boto3 on a slow network."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.calls: list[str] = []
+        self.running = 0
+        self.max_running = 0
+        self._lock = threading.Lock()
+
+    def _block(self, name: str):
+        with self._lock:
+            self.calls.append(name)
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(self.delay)
+        with self._lock:
+            self.running -= 1
+
+    def upload_fileobj(self, fileobj, key, content_type):
+        self._block(key)
+        return StorageResult(success=True, key=key, url="", file_size=len(fileobj.read()))
+
+    def upload(self, file_path, key, content_type, progress_callback=None):
+        self._block(key)
+        return StorageResult(success=True, key=key, url="")
+
+    def download(self, key, destination, progress_callback=None):
+        self._block(key)
+        return True
+
+    def exists(self, key):
+        self._block(key)
+        return True
+
+    def delete(self, key):
+        self._block(key)
+        return True
+
+    def get_url(self, key, expires_in=3600):
+        return f"https://cdn.example.com/{key}"
+
+
+async def measure_loop_lag(stop: asyncio.Event, interval: float = 0.01) -> float:
+    """Largest delay past the expected wake-up of a periodic ticker."""
+    worst = 0.0
+    while not stop.is_set():
+        expected = time.monotonic() + interval
+        await asyncio.sleep(interval)
+        worst = max(worst, time.monotonic() - expected)
+    return worst
+
+
+@pytest.mark.asyncio
+class TestEventLoopResponsiveness:
+    """Large transfers do not freeze other handlers."""
+
+    async def test_loop_stays_responsive_during_transfers(self):
+        backend = SlowBackend(delay=0.5)
+        service = StorageService(backend, StorageIOExecutor(max_workers=4, max_pending=8, timeout=5))
+        stop = asyncio.Event()
+        ticker = asyncio.create_task(measure_loop_lag(stop))
+
+        await asyncio.gather(
+            service.upload_file("videos/a.mp4", b"x" * 1024),
+            service.upload_path("/tmp/b.mp4", "videos/b.mp4"),
+            service.download_file("videos/c.mp4", "/tmp/c.mp4"),
+            service.delete_file("videos/d.mp4"),
+        )
+        stop.set()
+        lag = await ticker
+
+        assert lag < 0.1
+        assert backend.max_running == 4
+
+    async def test_direct_backend_call_would_block(self):
+        """Baseline: the same call made inline stalls the loop for its whole duration."""
+        backend = SlowBackend(delay=0.3)
+        stop = asyncio.Event()
+        ticker = asyncio.create_task(measure_loop_lag(stop))
+        await asyncio.sleep(0.02)
+
+        backend.upload_fileobj(io.BytesIO(b"x"), "k", "video/mp4")
+        stop.set()
+
+        assert await ticker >= 0.25
+
+
+@pytest.mark.asyncio
+class TestBackpressure:
+    """Admitted operations are bounded."""
+
+    @given(
+        operations=st.integers(min_value=1, max_value=12),
+        max_pending=st.integers(min_value=1, max_value=4),
+        workers=st.integers(min_value=1, max_value=6),
+    )
+    @settings(max_examples=20, deadline=None)
+    async def test_concurrency_bounded_and_gauges_drain(self, operations, max_pending, workers):
+        backend = SlowBackend(delay=0.01)
+        service = StorageService(backend, StorageIOExecutor(workers, max_pending, timeout=10))
+
+        results = await asyncio.gather(*(service.exists(f"k{i}") for i in range(operations)))
+
+        assert results == [True] * operations
+        assert backend.max_running <= min(max_pending, workers)
+        assert len(backend.calls) == operations
+        assert STORAGE_IO_QUEUE_DEPTH._value.get() == 0
+        assert STORAGE_IO_IN_FLIGHT._value.get() == 0
+
+
+@pytest.mark.asyncio
+class TestTimeouts:
+    """Slow operations fail fast instead of hanging the request."""
+
+    async def test_slow_operation_times_out(self):
+        backend = SlowBackend(delay=0.3)
+        service = StorageService(backend, StorageIOExecutor(max_workers=1, max_pending=4, timeout=0.05))
+        before = STORAGE_IO_OPERATIONS_TOTAL.labels(operation="exists", status="timeout")._value.get()
+
+        with pytest.raises(StorageTimeoutError):
+            await service.exists("videos/slow.mp4")
+
+        after = STORAGE_IO_OPERATIONS_TOTAL.labels(operation="exists", status="timeout")._value.get()
+        assert after == before + 1
+        await asyncio.sleep(0.35)
+
+    async def test_abandoned_queued_operation_never_runs(self):
+        backend = SlowBackend(delay=0.2)
+        executor = StorageIOExecutor(max_workers=1, max_pending=4, timeout=5)
+        service = StorageService(backend, executor)
+
+        running = asyncio.create_task(service.delete_file("first"))
+        await asyncio.sleep(0.02)
+        # Waits behind "first" for the only thread, then gives up
+        with pytest.raises(StorageTimeoutError):
+            await executor.run("delete", backend.delete, "second", timeout=0.05)
+        await running
+        await asyncio.sleep(0.05)
+
+        assert backend.calls == ["first"]
+        assert STORAGE_IO_QUEUE_DEPTH._value.get() == 0
+
+    async def test_get_url_runs_inline(self):
+        backend = SlowBackend(delay=1)
+        service = StorageService(backend, StorageIOExecutor(max_workers=1, max_pending=1, timeout=5))
+
+        assert await service.get_url("thumbnails/a.jpg") == "https://cdn.example.com/thumbnails/a.jpg"
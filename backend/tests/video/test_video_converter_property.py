@@ -0,0 +1,206 @@
+"""Property-based tests for remux-first video conversion.
+
+**Feature: youtube-automation, Remux-first Conversion**
+**Validates: Requirements 1.1**
+
+Properties:
+- Uploads with browser-compatible streams are remuxed, never re-encoded
+- Only the audio is transcoded when just the audio is incompatible
+- Everything else is fully re-encoded
+- A stream copy that FFmpeg rejects falls back to a full re-encode
+- Synthetic FFmpeg fixtures end up as browser-playable, fast-start MP4s
+"""
+
+import json
+import shutil
+import subprocess
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from hypothesis import given, settings, strategies as st
+
+from app.modules.video.video_converter import (
+    ConversionPlan,
+    ConversionStrategy,
+    VideoConverter,
+)
+from app.modules.video.video_metadata_extractor import (
+    VideoFileMetadata,
+    VideoMetadataExtractor,
+)
+
+HAS_FFMPEG = shutil.which("ffmpeg") is not None and shutil.which("ffprobe") is not None
+
+VIDEO_CODECS = ["h264", "hevc", "mpeg4", "prores", "vp9", "mjpeg"]
+PIXEL_FORMATS = ["yuv420p", "yuvj420p", "yuv420p10le", "yuv422p", None]
+AUDIO_CODECS = ["aac", "mp3", "pcm_s16le", "ac3", "opus", "flac", None]
+
+
+def metadata(codec="h264", pixel_format="yuv420p", audio_codec="aac", fmt="mov", duration=60):
+    return VideoFileMetadata(
+        duration=duration, resolution="1920x1080", width=1920, height=1080,
+        frame_rate=30.0, bitrate=8000, codec=codec, format=fmt, file_size=60_000_000,
+        audio_codec=audio_codec, pixel_format=pixel_format,
+    )
+
+
+class TestConversionPlanner:
+    """The planner picks the cheapest conversion that plays in browsers."""
+
+    @given(
+        codec=st.sampled_from(VIDEO_CODECS),
+        pixel_format=st.sampled_from(PIXEL_FORMATS),
+        audio_codec=st.sampled_from(AUDIO_CODECS),
+        fmt=st.sampled_from(["mov", "matroska", "avi", "flv"]),
+    )
+    @settings(max_examples=200)
+    def test_strategy_follows_stream_compatibility(self, codec, pixel_format, audio_codec, fmt):
+        plan = VideoConverter.plan_conversion(metadata(codec, pixel_format, audio_codec, fmt))
+
+        video_copyable = codec == "h264" and pixel_format in ("yuv420p", "yuvj420p", None)
+        if not video_copyable:
+            assert plan.strategy == ConversionStrategy.REENCODE
+        elif audio_codec in ("aac", "mp3", None):
+            assert plan.strategy == ConversionStrategy.REMUX
+        else:
+            assert plan.strategy == ConversionStrategy.TRANSCODE_AUDIO
+        assert plan.reason
+
+    @pytest.mark.parametrize("fmt", ["mp4", "webm", "ogg"])
+    def test_browser_containers_need_nothing(self, fmt):
+        assert VideoConverter.plan_conversion(metadata(codec="hevc", fmt=fmt)).strategy == ConversionStrategy.NONE
+
+    def test_without_stream_info_falls_back_to_container(self):
+        assert VideoConverter.plan_conversion(None, "mov").strategy == ConversionStrategy.REENCODE
+        assert VideoConverter.plan_conversion(None, "mp4").strategy == ConversionStrategy.NONE
+
+    @given(duration=st.integers(min_value=1, max_value=7200))
+    @settings(max_examples=50)
+    def test_reencode_estimate_scales_with_duration_and_preset(self, duration):
+        fast = VideoConverter.estimate_reencode_seconds(metadata(duration=duration), "fast")
+        slow = VideoConverter.estimate_reencode_seconds(metadata(duration=duration), "slow")
+        assert 0 < fast < slow
+
+
+class TestFfmpegCommand:
+    """Each plan maps to the matching FFmpeg arguments."""
+
+    @pytest.mark.parametrize("strategy", list(ConversionStrategy)[1:])
+    def test_command_shape(self, strategy):
+        cmd = VideoConverter.build_command(ConversionPlan(strategy, "test"), "in.mov", "out.mp4")
+
+        assert cmd[-1] == "out.mp4"
+        assert cmd[cmd.index("-movflags") + 1] == "+faststart"
+        video_codec = cmd[cmd.index("-c:v") + 1]
+        audio_codec = cmd[cmd.index("-c:a") + 1]
+        if strategy == ConversionStrategy.REMUX:
+            assert (video_codec, audio_codec) == ("copy", "copy")
+        elif strategy == ConversionStrategy.TRANSCODE_AUDIO:
+            assert (video_codec, audio_codec) == ("copy", "aac")
+        else:
+            assert (video_codec, audio_codec) == ("libx264", "aac")
+            assert "-preset" in cmd and "-crf" in cmd
+
+
+@pytest.mark.asyncio
+class TestPlannedConversion:
+    """convert() runs the plan and reports what it saved."""
+
+    async def test_remux_reports_time_saved(self, tmp_path):
+        source = tmp_path / "in.mov"
+        source.write_bytes(b"video")
+        output = tmp_path / "out.mp4"
+        plan = ConversionPlan(ConversionStrategy.REMUX, "copyable", estimated_reencode_seconds=120)
+
+        async def fake_ffmpeg(cmd):
+            output.write_bytes(b"video")
+
+        with patch.object(VideoConverter, "_run_ffmpeg", side_effect=fake_ffmpeg) as run:
+            result = await VideoConverter.convert(str(source), str(output), plan, remove_input=True)
+
+        assert result.success and result.output_path == str(output)
+        assert result.plan.strategy == ConversionStrategy.REMUX
+        assert 119 < result.time_saved_seconds <= 120
+        assert "copy" in run.call_args.args[0]
+        assert not source.exists()
+
+    async def test_rejected_stream_copy_falls_back_to_reencode(self, tmp_path):
+        source = tmp_path / "in.mov"
+        source.write_bytes(b"video")
+        output = tmp_path / "out.mp4"
+        plan = ConversionPlan(ConversionStrategy.REMUX, "copyable", estimated_reencode_seconds=120)
+        commands = []
+
+        async def fake_ffmpeg(cmd):
+            commands.append(cmd)
+            if "copy" in cmd:
+                raise subprocess.CalledProcessError(1, cmd, stderr="Could not find tag for codec")
+            output.write_bytes(b"video")
+
+        with patch.object(VideoConverter, "_run_ffmpeg", side_effect=fake_ffmpeg):
+            result = await VideoConverter.convert(str(source), str(output), plan)
+
+        assert result.success
+        assert result.plan.strategy == ConversionStrategy.REENCODE
+        assert result.time_saved_seconds == 0
+        assert len(commands) == 2 and "libx264" in commands[1]
+
+    async def test_none_plan_keeps_input(self, tmp_path):
+        run = AsyncMock()
+        with patch.object(VideoConverter, "_run_ffmpeg", run):
+            result = await VideoConverter.convert(
+                "in.webm", plan=ConversionPlan(ConversionStrategy.NONE, "plays")
+            )
+
+        assert result.success and result.output_path == "in.webm"
+        run.assert_not_awaited()
+
+
+def ffmpeg(*args: str) -> None:
+    subprocess.run(["ffmpeg", "-v", "error", "-y", *args], check=True, capture_output=True)
+
+
+def probe_streams(path) -> dict:
+    out = subprocess.run(
+        ["ffprobe", "-v", "quiet", "-print_format", "json", "-show_streams", str(path)],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return {s["codec_type"]: s["codec_name"] for s in json.loads(out)["streams"]}
+
+
+def moov_before_mdat(path) -> bool:
+    data = path.read_bytes()
+    return 0 <= data.find(b"moov") < data.find(b"mdat")
+
+
+SOURCES = "-f lavfi -i testsrc=size=320x240:rate=25:duration=2 -f lavfi -i sine=frequency=440:duration=2".split()
+
+
+@pytest.mark.skipif(not HAS_FFMPEG, reason="ffmpeg/ffprobe not installed")
+@pytest.mark.asyncio
+class TestSyntheticFixtures:
+    """End-to-end on FFmpeg-generated fixtures for each strategy."""
+
+    @pytest.mark.parametrize(
+        "name,encode,expected",
+        [
+            ("phone.mov", "-c:v libx264 -pix_fmt yuv420p -c:a aac", ConversionStrategy.REMUX),
+            ("pcm.mov", "-c:v libx264 -pix_fmt yuv420p -c:a pcm_s16le", ConversionStrategy.TRANSCODE_AUDIO),
+            ("legacy.avi", "-c:v mpeg4 -c:a mp3", ConversionStrategy.REENCODE),
+            ("hdr.mkv", "-c:v libx264 -pix_fmt yuv422p -c:a aac", ConversionStrategy.REENCODE),
+        ],
+    )
+    async def test_fixture_converted_with_expected_strategy(self, tmp_path, name, encode, expected):
+        source = tmp_path / name
+        ffmpeg(*SOURCES, *encode.split(), str(source))
+
+        info = await VideoMetadataExtractor().extract_metadata(str(source))
+        plan = VideoConverter.plan_conversion(info, preset="ultrafast")
+        result = await VideoConverter.convert(
+            str(source), str(tmp_path / "out.mp4"), plan, preset="ultrafast"
+        )
+
+        assert plan.strategy == expected
+        assert result.success and result.plan.strategy == expected
+        assert probe_streams(result.output_path) == {"video": "h264", "audio": "aac"}
+        assert moov_before_mdat(tmp_path / "out.mp4")